@@ -16,12 +16,21 @@ from sqlalchemy import event
 from sqlalchemy.engine import Engine
 
 
-from .config_db import load_env_once, resolve_database_uri, resolve_secret_key
+from .config_db import (
+    load_env_once,
+    resolve_database_uri,
+    resolve_engine_options,
+    resolve_secret_key,
+)
+from .schema_registry import SchemaRegistry
+from .sql_profiler import SQLProfiler
 from .time_utils import local_now
 
 db = SQLAlchemy()
 migrate = Migrate()
 csrf = CSRFProtect()
+sql_profiler = SQLProfiler()
+schema_registry = SchemaRegistry()
 
 
 @event.listens_for(Engine, "connect")
@@ -66,6 +75,9 @@ def create_app():
     # Load .env dan resolve DSN/SECRET
     load_env_once()
     app.config["SQLALCHEMY_DATABASE_URI"] = resolve_database_uri()
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = resolve_engine_options(
+        app.config["SQLALCHEMY_DATABASE_URI"]
+    )
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
     app.config["SECRET_KEY"] = resolve_secret_key()
     # CSRF token dibiarkan tidak kedaluwarsa agar interaksi form panjang tidak gagal
@@ -74,6 +86,8 @@ def create_app():
     db.init_app(app)
     migrate.init_app(app, db)
     csrf.init_app(app)
+    sql_profiler.init_app(app)
+    schema_registry.init_app(app)
     app.jinja_env.filters["normalize_phone"] = normalize_phone
 
     # Optional: register blueprint jika ada
@@ -84,6 +98,10 @@ def create_app():
     except Exception:
         pass
 
+    from app.commands import register_commands
+
+    register_commands(app)
+
     @app.context_processor
     def inject_template_globals():
         return {"current_year": local_now().year}
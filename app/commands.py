@@ -0,0 +1,225 @@
+"""Perintah CLI tambahan (``flask <perintah>``)."""
+
+from datetime import datetime
+
+import click
+from flask.cli import AppGroup, with_appcontext
+
+from app import db
+
+sales_summary_cli = AppGroup("sales-summary", help="Kelola rekap harian penjualan.")
+sales_search_cli = AppGroup("sales-search", help="Kelola indeks pencarian laporan penjualan.")
+schema_cli = AppGroup("schema", help="Periksa dan lengkapi skema database.")
+shifts_cli = AppGroup("shifts", help="Kelola shift kasir.")
+ledger_cli = AppGroup("ledger", help="Kelola snapshot saldo buku besar.")
+catalog_cli = AppGroup("catalog", help="Kelola log perubahan katalog POS.")
+
+
+def _parse_cli_date(value):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError as exc:
+        raise click.BadParameter("Gunakan format YYYY-MM-DD.") from exc
+
+
+@sales_summary_cli.command("rebuild")
+@click.option("--start", "start_date", help="Tanggal awal (YYYY-MM-DD).")
+@click.option("--end", "end_date", help="Tanggal akhir (YYYY-MM-DD).")
+def rebuild_sales_summary_command(start_date, end_date):
+    """Susun ulang sales_daily_summary dari tabel penjualan."""
+    from app.services.sales_summary_service import rebuild_sales_summary
+
+    start = _parse_cli_date(start_date)
+    end = _parse_cli_date(end_date)
+    try:
+        rows = rebuild_sales_summary(start, end)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    click.echo(f"Rekap penjualan disusun ulang: {rows} baris.")
+
+
+@sales_search_cli.command("rebuild")
+def rebuild_sales_search_command():
+    """Susun ulang sales_search_index dari tabel penjualan."""
+    from app.services.sales_search_service import rebuild_sales_search_index
+
+    try:
+        rows = rebuild_sales_search_index()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    click.echo(f"Indeks pencarian penjualan disusun ulang: {rows} baris.")
+
+
+@click.command("seed-bench")
+@click.option("--products", default=2000, show_default=True, type=int)
+@click.option("--customers", default=1000, show_default=True, type=int)
+@click.option("--sales", default=20000, show_default=True, type=int)
+@click.option("--lines", "lines_per_sale", default=3.0, show_default=True, type=float,
+              help="Rata-rata item per transaksi.")
+@click.option("--purchases", default=500, show_default=True, type=int)
+@click.option("--journals", default=2000, show_default=True, type=int)
+@click.option("--days", default=180, show_default=True, type=int,
+              help="Rentang hari transaksi, berakhir hari ini (atau --end).")
+@click.option("--cashiers", default=3, show_default=True, type=int)
+@click.option("--suppliers", default=20, show_default=True, type=int)
+@click.option("--seed", default=42, show_default=True, type=int)
+@click.option("--end", "end_date", help="Tanggal transaksi terakhir (YYYY-MM-DD).")
+@click.option("--force", is_flag=True,
+              help="Tetap tambah data walau database sudah berisi produk/penjualan.")
+@with_appcontext
+def seed_bench_command(
+    products,
+    customers,
+    sales,
+    lines_per_sale,
+    purchases,
+    journals,
+    days,
+    cashiers,
+    suppliers,
+    seed,
+    end_date,
+    force,
+):
+    """Isi database dengan data sintetis untuk benchmark lokal."""
+    from app.models import Penjualan, Produk
+    from app.services.seed_service import (
+        BENCH_ADMIN_USERNAME,
+        BENCH_PASSWORD,
+        generate_bench_dataset,
+    )
+    from app.time_utils import local_now
+
+    tag = ""
+    if db.session.query(Produk.id).first() or db.session.query(Penjualan.id).first():
+        if not force:
+            raise click.ClickException(
+                "Database sudah berisi data. Pakai database kosong atau tambahkan --force."
+            )
+        tag = local_now().strftime("%y%m%d%H%M%S")
+
+    try:
+        counts = generate_bench_dataset(
+            products=products,
+            customers=customers,
+            sales=sales,
+            lines_per_sale=lines_per_sale,
+            purchases=purchases,
+            journals=journals,
+            days=days,
+            cashiers=cashiers,
+            suppliers=suppliers,
+            seed=seed,
+            end_date=_parse_cli_date(end_date),
+            tag=tag,
+            progress=click.echo,
+        )
+    except Exception:
+        db.session.rollback()
+        raise
+    for name, value in counts.items():
+        click.echo(f"{name}: {value}")
+    click.echo(f"Login: {BENCH_ADMIN_USERNAME} / {BENCH_PASSWORD}")
+
+
+@schema_cli.command("status")
+def schema_status_command():
+    """Tampilkan DDL yang belum diterapkan (tanpa mengubah database)."""
+    from app.schema_registry import probe_schema
+
+    pending = probe_schema(db.engine).pending_ddl()
+    if not pending:
+        click.echo("Skema lengkap.")
+        return
+    for statement in pending:
+        click.echo(statement)
+    raise SystemExit(1)
+
+
+@schema_cli.command("apply")
+def schema_apply_command():
+    """Buat tabel & kolom yang kurang, lalu perbarui peta skema proses ini."""
+    from flask import current_app
+
+    from app.schema_registry import apply_schema
+
+    state, applied = apply_schema(db.engine)
+    current_app.extensions["schema_registry"]["state"] = state
+    if not applied:
+        click.echo("Skema sudah lengkap.")
+        return
+    for statement in applied:
+        click.echo(f"diterapkan: {statement}")
+
+
+@schema_cli.command("search-index")
+@click.option("--no-rebuild", is_flag=True, help="Pasang saja tanpa mengisi ulang indeks.")
+def schema_search_index_command(no_rebuild):
+    """Pasang indeks pencarian produk untuk database ini dan isi ulang."""
+    from app.services.product_search import install_search_index, reset_search_backend
+
+    backend = install_search_index(db.engine, rebuild=not no_rebuild)
+    reset_search_backend()
+    if not backend.indexed:
+        click.echo(f"Dialect {db.engine.dialect.name} memakai pencarian ilike biasa.")
+        return
+    click.echo(f"Indeks pencarian produk siap ({backend.name}).")
+
+
+@shifts_cli.command("close-stale")
+def close_stale_shifts_command():
+    """Tutup shift kasir yang masih terbuka dari hari sebelumnya (untuk cron)."""
+    from app.services.shift_service import close_stale_shifts
+
+    result = close_stale_shifts(collect=True)
+    click.echo(f"Shift lama ditutup: {result['count']}.")
+    for item in result["items"]:
+        click.echo(f"  {item['user']} {item['shift_date']} mulai {item['opened_at']}")
+    if result["extra_count"]:
+        click.echo(f"  +{result['extra_count']} shift lainnya.")
+
+
+@ledger_cli.command("refresh-snapshots")
+def refresh_ledger_snapshots_command():
+    """Hitung snapshot saldo periode yang basi atau belum ada."""
+    from app.services.ledger_service import refresh_account_period_balances
+
+    try:
+        refreshed = refresh_account_period_balances()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    click.echo(f"Snapshot saldo periode dihitung ulang: {refreshed} periode.")
+
+
+@catalog_cli.command("compact")
+@click.option("--days", default=30, show_default=True, type=int,
+              help="Simpan log perubahan sebanyak hari ini.")
+def compact_catalog_command(days):
+    """Hapus log perubahan katalog lama (untuk cron); klien lama sinkron ulang penuh."""
+    from app.services.catalog_service import compact_catalog_changes
+
+    try:
+        removed = compact_catalog_changes(days)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    click.echo(f"Log perubahan katalog dihapus: {removed} baris.")
+
+
+def register_commands(app):
+    app.cli.add_command(sales_summary_cli)
+    app.cli.add_command(sales_search_cli)
+    app.cli.add_command(schema_cli)
+    app.cli.add_command(shifts_cli)
+    app.cli.add_command(ledger_cli)
+    app.cli.add_command(catalog_cli)
+    app.cli.add_command(seed_bench_command)
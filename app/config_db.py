@@ -3,6 +3,9 @@ from urllib.parse import quote_plus
 from typing import Optional
 
 from dotenv import load_dotenv, dotenv_values
+from sqlalchemy.engine.url import make_url
+
+from .db_pool import TimedQueuePool
 
 _ENV_LOADED = False
 _DOTENV_VALUES = {}
@@ -104,3 +107,72 @@ def resolve_secret_key() -> str:
     return _first_nonempty(os.environ.get("SECRET_KEY"),
                            _DOTENV_VALUES.get("SECRET_KEY"),
                            "dev-secret-key")  # jangan pakai di production
+
+
+# Default pool per backend. MySQL memutus koneksi idle (wait_timeout, proxy/LB
+# sering lebih pendek), jadi koneksi didaur ulang sebelum 5 menit dan dicek
+# dengan pre-ping. Total koneksi per host = worker x (pool_size + max_overflow).
+_POOL_DEFAULTS = {
+    "mysql": {
+        "pool_size": 5,
+        "max_overflow": 5,
+        "pool_timeout": 10,
+        "pool_recycle": 280,
+        "pool_pre_ping": True,
+    },
+    "postgresql": {
+        "pool_size": 5,
+        "max_overflow": 5,
+        "pool_timeout": 10,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+    },
+    "sqlite": {
+        "pool_size": 5,
+        "max_overflow": 10,
+        "pool_timeout": 30,
+        "pool_recycle": -1,
+        "pool_pre_ping": False,
+    },
+}
+# MariaDB (mariadb+pymysql://) memakai profil MySQL
+_POOL_DEFAULTS["mariadb"] = _POOL_DEFAULTS["mysql"]
+
+_POOL_ENV = {
+    "pool_size": ("DB_POOL_SIZE", int),
+    "max_overflow": ("DB_MAX_OVERFLOW", int),
+    "pool_timeout": ("DB_POOL_TIMEOUT", float),
+    "pool_recycle": ("DB_POOL_RECYCLE", int),
+    "pool_pre_ping": ("DB_POOL_PRE_PING", lambda v: v.lower() not in {"0", "false", "no", "off"}),
+}
+
+
+def resolve_engine_options(database_uri: str) -> dict:
+    """
+    SQLALCHEMY_ENGINE_OPTIONS untuk pool koneksi, per backend (mysql/mariadb/postgresql/sqlite).
+    Default di _POOL_DEFAULTS bisa ditimpa lewat ENV/.env:
+      DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING
+    SQLite in-memory dibiarkan kosong (Flask-SQLAlchemy memakai StaticPool).
+    """
+    try:
+        url = make_url(database_uri)
+    except Exception:
+        return {}
+    backend = url.get_backend_name()
+    if backend == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    defaults = _POOL_DEFAULTS.get(backend)
+    if defaults is None:
+        return {}
+
+    options = dict(defaults)
+    for key, (env_key, cast) in _POOL_ENV.items():
+        raw = _first_nonempty(os.environ.get(env_key), _DOTENV_VALUES.get(env_key))
+        if raw is None:
+            continue
+        try:
+            options[key] = cast(raw)
+        except ValueError:
+            continue
+    options["poolclass"] = TimedQueuePool
+    return options
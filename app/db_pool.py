@@ -0,0 +1,87 @@
+"""Pool koneksi dengan statistik tunggu, untuk halaman status server.
+
+``TimedQueuePool`` sama dengan ``QueuePool`` bawaan SQLAlchemy, ditambah
+pencatatan berapa lama worker menunggu koneksi dari pool (termasuk membuka
+koneksi overflow baru) dan berapa kali menunggu sampai ``pool_timeout``.
+Statistik hidup per proses dan ter-reset saat pool dibuat ulang (dispose).
+"""
+
+import threading
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+# tunggu di atas batas ini dihitung "lambat" di halaman status
+SLOW_WAIT_SECONDS = 0.1
+
+
+class PoolWaitStats:
+    __slots__ = ("lock", "checkouts", "total_wait", "max_wait", "slow", "timeouts")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.slow = 0
+        self.timeouts = 0
+
+    def record(self, elapsed, timed_out=False):
+        with self.lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.total_wait += elapsed
+            self.max_wait = max(self.max_wait, elapsed)
+            if elapsed >= SLOW_WAIT_SECONDS:
+                self.slow += 1
+
+    def as_dict(self):
+        with self.lock:
+            return {
+                "checkouts": self.checkouts,
+                "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 2)
+                if self.checkouts
+                else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 2),
+                "slow_waits": self.slow,
+                "timeouts": self.timeouts,
+            }
+
+
+class TimedQueuePool(QueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.wait_stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - started)
+        return connection
+
+
+def pool_status(engine):
+    """Ringkasan pool engine: ukuran, koneksi dipakai, overflow dan waktu tunggu."""
+    pool = engine.pool
+    info = {"class": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        info.update(
+            {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+                "timeout": pool.timeout(),
+            }
+        )
+    stats = getattr(pool, "wait_stats", None)
+    if stats is not None:
+        info["wait"] = stats.as_dict()
+    return info
@@ -8,6 +8,10 @@ class User(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     password = db.Column(db.String(200), nullable=False)
     role = db.Column(db.String(50), nullable=False, default='sales')
+    # dinaikkan saat username/email/role/password berubah; dicocokkan dengan session
+    auth_version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
+    # dinaikkan saat password diganti/direset; session dengan nilai lama harus login ulang
+    password_version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
 
     def __repr__(self):
         return f'<User {self.username}>'
@@ -191,6 +195,9 @@ class Pelanggan(db.Model):
     price_level_id = db.Column(db.Integer, db.ForeignKey('price_level.id'), nullable=True)
     price_level = db.relationship('PriceLevel', backref=db.backref('pelanggan', lazy=True))
 
+    # urutan keyset untuk saran pelanggan (nama, id)
+    __table_args__ = (db.Index("ix_pelanggan_nama_id", "nama", "id"),)
+
     @staticmethod
     def generate_pelanggan_id():
         # Ambil pelanggan terakhir berdasarkan ID
@@ -524,6 +531,8 @@ class DetailPenjualan(db.Model):
     diskon = db.Column(db.Float, nullable=False, default=0.0)
     pajak = db.Column(db.Float, nullable=False, default=0.0)
     harga_total = db.Column(db.Float, nullable=False)
+    # HPP per unit saat checkout; rekap, hapus dan rebuild memakai nilai ini
+    hpp_satuan = db.Column(db.Float, nullable=True)
 
     penjualan = db.relationship('Penjualan', backref='detail_penjualan')
     produk = db.relationship('Produk', backref='detail_penjualan')
@@ -811,3 +820,229 @@ class FixedAsset(db.Model):
 
     def __repr__(self):
         return f"<FixedAsset {self.name}>"
+
+
+class CatalogChange(db.Model):
+    """Log perubahan katalog POS; id dipakai sebagai nomor versi untuk delta sync."""
+
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(20), nullable=False)
+    # entity_id kosong berarti klien harus sinkron ulang penuh
+    entity_id = db.Column(db.Integer, nullable=True)
+    op = db.Column(db.String(10), nullable=False, default="upsert")
+    created_at = db.Column(db.DateTime, nullable=False, default=local_now)
+
+    __table_args__ = (
+        db.Index("ix_catalog_change_entity_id", "entity", "id"),
+        db.Index("ix_catalog_change_entity_created", "entity", "created_at"),
+    )
+
+    def __repr__(self):
+        return f"<CatalogChange {self.id} {self.entity}:{self.entity_id} {self.op}>"
+
+
+class DocumentSequence(db.Model):
+    """Penghitung nomor dokumen per prefix dan periode (mis. F + 20261017)."""
+
+    __tablename__ = "document_sequence"
+
+    id = db.Column(db.Integer, primary_key=True)
+    prefix = db.Column(db.String(32), nullable=False)
+    # periode kosong berarti nomor tidak pernah di-reset
+    period = db.Column(db.String(16), nullable=False, default="")
+    counter = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(
+        db.DateTime, nullable=False, default=local_now, onupdate=local_now
+    )
+
+    __table_args__ = (
+        db.UniqueConstraint(
+            "prefix", "period", name="uq_document_sequence_prefix_period"
+        ),
+    )
+
+    def __repr__(self):
+        return f"<DocumentSequence {self.prefix}{self.period}:{self.counter}>"
+
+
+class SalesDailySummary(db.Model):
+    """
+    Rekap penjualan harian per shift, sales dan metode bayar.
+
+    Diperbarui di transaksi yang sama dengan simpan/hapus penjualan; gunakan
+    ``flask sales-summary rebuild`` untuk menyusun ulang dari data transaksi.
+    """
+
+    __tablename__ = "sales_daily_summary"
+
+    id = db.Column(db.Integer, primary_key=True)
+    summary_date = db.Column(db.Date, nullable=False)
+    # 0 = penjualan tanpa shift; dipakai agar unique key tidak berisi NULL
+    shift_id = db.Column(db.Integer, nullable=False, default=0)
+    sales_id = db.Column(db.Integer, nullable=False, default=0)
+    payment_method = db.Column(db.String(20), nullable=False, default="")
+    orders = db.Column(db.Integer, nullable=False, default=0)
+    # total_harga (termasuk pajak & ongkir) dan versi bersihnya (net_revenue)
+    total_amount = db.Column(db.Float, nullable=False, default=0.0)
+    net_revenue = db.Column(db.Float, nullable=False, default=0.0)
+    # nilai baris setelah diskon sebelum pajak, dan versi bersihnya per faktur
+    gross_sales = db.Column(db.Float, nullable=False, default=0.0)
+    net_sales = db.Column(db.Float, nullable=False, default=0.0)
+    discount_total = db.Column(db.Float, nullable=False, default=0.0)
+    tax_total = db.Column(db.Float, nullable=False, default=0.0)
+    marketplace_cost = db.Column(db.Float, nullable=False, default=0.0)
+    units = db.Column(db.Integer, nullable=False, default=0)
+    hpp = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(
+        db.DateTime, nullable=False, default=local_now, onupdate=local_now
+    )
+
+    __table_args__ = (
+        db.UniqueConstraint(
+            "summary_date",
+            "shift_id",
+            "sales_id",
+            "payment_method",
+            name="uq_sales_daily_summary_key",
+        ),
+        db.Index("ix_sales_daily_summary_shift", "shift_id"),
+    )
+
+    def __repr__(self):
+        return f"<SalesDailySummary {self.summary_date} shift={self.shift_id} orders={self.orders}>"
+
+
+class AccountPeriodBalance(db.Model):
+    """
+    Snapshot saldo akun pada akhir periode akuntansi.
+
+    ``closing_balance`` adalah kumulatif debit - kredit sampai ``period_end``;
+    ``closing_adjustment`` bagian yang berasal dari jurnal "Penyesuaian".
+    Baris ditandai ``is_stale`` bila ada jurnal bertanggal <= ``period_end``
+    yang berubah, lalu dihitung ulang saat dibutuhkan.
+    """
+
+    __tablename__ = "account_period_balance"
+
+    id = db.Column(db.Integer, primary_key=True)
+    period_id = db.Column(
+        db.Integer,
+        db.ForeignKey("accounting_period.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    account_id = db.Column(
+        db.Integer, db.ForeignKey("account.id", ondelete="CASCADE"), nullable=False
+    )
+    period_start = db.Column(db.Date, nullable=False)
+    period_end = db.Column(db.Date, nullable=False)
+    debit = db.Column(db.Float, nullable=False, default=0.0)
+    credit = db.Column(db.Float, nullable=False, default=0.0)
+    closing_balance = db.Column(db.Float, nullable=False, default=0.0)
+    closing_adjustment = db.Column(db.Float, nullable=False, default=0.0)
+    is_stale = db.Column(db.Boolean, nullable=False, default=False)
+    refreshed_at = db.Column(db.DateTime, nullable=False, default=local_now)
+
+    period = db.relationship(
+        "AccountingPeriod",
+        backref=db.backref("account_balances", lazy=True, cascade="all, delete-orphan"),
+    )
+    account = db.relationship("Account")
+
+    __table_args__ = (
+        db.UniqueConstraint(
+            "period_id", "account_id", name="uq_account_period_balance"
+        ),
+        db.Index("ix_account_period_balance_end", "period_end"),
+    )
+
+    def __repr__(self):
+        return f"<AccountPeriodBalance period={self.period_id} account={self.account_id}>"
+
+
+class AppSetting(db.Model):
+    """Pengaturan aplikasi (profil perusahaan, struk, faktur) per key.
+
+    Baris ``__version__`` menyimpan nomor revisi global; setiap penyimpanan
+    menaikkannya supaya cache di worker lain tahu harus memuat ulang.
+    """
+
+    __tablename__ = "app_setting"
+
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(100), nullable=False, unique=True)
+    value = db.Column(db.Text, nullable=True)
+    revision = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(
+        db.DateTime, nullable=False, default=local_now, onupdate=local_now
+    )
+    updated_by = db.Column(
+        db.Integer, db.ForeignKey("user.id", ondelete="SET NULL"), nullable=True
+    )
+
+    def __repr__(self):
+        return f"<AppSetting {self.key} r{self.revision}>"
+
+
+class SalesSearchIndex(db.Model):
+    """
+    Kata kunci pencarian laporan penjualan: faktur, pelanggan dan sales.
+
+    Satu baris per (entitas, kata kunci). Kata kunci adalah label huruf kecil
+    mulai dari setiap awal kata, jadi pencarian cukup prefix ber-indeks.
+    ``first_date``/``last_date`` adalah rentang tanggal penjualan entitas itu.
+    Diperbarui saat penjualan ditulis; ``flask sales-search rebuild`` menyusun
+    ulang dari data transaksi.
+    """
+
+    __tablename__ = "sales_search_index"
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    term = db.Column(db.String(120), nullable=False)
+    label = db.Column(db.String(150), nullable=False)
+    subtext = db.Column(db.String(200), nullable=True)
+    first_date = db.Column(db.Date, nullable=False)
+    last_date = db.Column(db.Date, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint(
+            "kind", "entity_id", "term", name="uq_sales_search_index_entity_term"
+        ),
+        db.Index("ix_sales_search_index_kind_term", "kind", "term"),
+    )
+
+    def __repr__(self):
+        return f"<SalesSearchIndex {self.kind}:{self.entity_id} {self.term!r}>"
+
+
+class ImportJob(db.Model):
+    """
+    Import file (produk, pelanggan, supplier, stok opname, level harga) yang
+    diproses di latar belakang. Request upload langsung mengembalikan id job;
+    status, progres dan ringkasan dibaca lewat ``/api/import-jobs/<id>``.
+    ``summary`` berisi JSON ringkasan/catatan baris, juga untuk job gagal.
+    """
+
+    __tablename__ = "import_job"
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(30), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="queued")
+    progress = db.Column(db.Integer, nullable=False, default=0)
+    message = db.Column(db.String(255), nullable=True)
+    filename = db.Column(db.String(255), nullable=True)
+    options = db.Column(db.Text, nullable=True)
+    summary = db.Column(db.Text, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_by = db.Column(
+        db.Integer, db.ForeignKey("user.id", ondelete="SET NULL"), nullable=True
+    )
+    created_at = db.Column(db.DateTime, nullable=False, default=local_now)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    # heartbeat: diperbarui setiap progres ditulis; job tanpa heartbeat lama dianggap mati
+    updated_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<ImportJob {self.id} {self.kind} {self.status}>"
@@ -1,15090 +0,0 @@
-from flask import (
-    Blueprint,
-    render_template,
-    request,
-    redirect,
-    flash,
-    url_for,
-    session,
-    g,
-    jsonify,
-    current_app,
-    Response,
-    send_from_directory,
-)
-from functools import wraps
-from urllib.parse import urlparse, urljoin
-import shutil
-from collections import defaultdict
-import secrets
-import json
-from datetime import datetime, timedelta
-import csv
-import logging
-from io import BytesIO, StringIO
-import math
-import os
-import re
-import time
-import sqlite3
-from importlib import util
-from pathlib import Path
-_psutil_spec = util.find_spec("psutil")
-psutil = __import__("psutil") if _psutil_spec else None
-
-import pandas as pd
-from flask import make_response
-from sqlalchemy import or_, and_, case, func, inspect, text
-from sqlalchemy.exc import IntegrityError, OperationalError
-from sqlalchemy.orm import joinedload
-from sqlalchemy.engine.url import make_url
-from werkzeug.security import generate_password_hash, check_password_hash
-from werkzeug.utils import secure_filename
-
-from app import csrf, normalize_phone
-from app.time_utils import local_now, local_today
-from app.forms import SalesForm
-from app.models import (
-    User,
-    db,
-    Supplier,
-    Expedisi,
-    ExpedisiVolumetricItem,
-    PaymentChannel,
-    Satuan,
-    Kategori,
-    Produk,
-    Pelanggan,
-    Pembelian,
-    BarangPembelian,
-    Penjualan,
-    ReceivablePayment,
-    DetailPenjualan,
-    Quotation,
-    QuotationItem,
-    PasswordResetToken,
-    PriceLevel,
-    ProductPriceLevel,
-    PriceLevelCost,
-    PriceChange,
-    StockOpnameSession,
-    StockOpnameItem,
-    CashierShift,
-    PurchaseOrder,
-    PurchaseOrderItem,
-    AccountingSetting,
-    AccountingPeriod,
-    Account,
-    JournalEntry,
-    JournalLine,
-    PayablePayment,
-    FixedAsset,
-    MarketplacePricingSetting,
-)
-
-bp = Blueprint("main", __name__)
-
-INDONESIAN_MONTHS = [
-    "Januari",
-    "Februari",
-    "Maret",
-    "April",
-    "Mei",
-    "Juni",
-    "Juli",
-    "Agustus",
-    "September",
-    "Oktober",
-    "November",
-    "Desember",
-]
-
-ROLE_ADMIN = "admin"
-ROLE_KASIR = "kasir"
-ROLE_SALES = "sales"
-ROLE_GUDANG = "gudang"
-ALL_ROLES = {ROLE_ADMIN, ROLE_KASIR, ROLE_SALES, ROLE_GUDANG}
-ALL_ROLE_CHOICES = (ROLE_ADMIN, ROLE_KASIR, ROLE_SALES, ROLE_GUDANG)
-INVENTORY_ROLES = (ROLE_ADMIN, ROLE_GUDANG)
-SALES_ROLES = (ROLE_ADMIN, ROLE_KASIR, ROLE_SALES)
-ADMIN_ONLY = (ROLE_ADMIN,)
-MIN_PASSWORD_LENGTH = 8
-
-
-def _is_safe_redirect_target(target: str) -> bool:
-    if not target:
-        return False
-    ref_url = urlparse(request.host_url)
-    test_url = urlparse(urljoin(request.host_url, target))
-    return test_url.scheme in ("http", "https") and ref_url.netloc == test_url.netloc
-
-
-def _resolve_next_target(default_target):
-    next_target = request.form.get("next") or request.referrer or default_target
-    return next_target if _is_safe_redirect_target(next_target) else default_target
-
-
-def _accepts_json():
-    if request.path.startswith("/api/") or request.is_json:
-        return True
-
-    if not request.accept_mimetypes:
-        return False
-
-    best_match = request.accept_mimetypes.best_match(
-        ["text/html", "application/json"]
-    )
-    if not best_match:
-        return False
-
-    return (
-        best_match == "application/json"
-        and request.accept_mimetypes[best_match]
-        > request.accept_mimetypes["text/html"]
-    )
-
-
-def _auth_required_response():
-    if _accepts_json():
-        return jsonify({"error": "Authentication required"}), 401
-
-    flash("Silakan login untuk mengakses halaman tersebut.", "warning")
-    if request.method == "GET":
-        next_target = request.full_path or request.path
-    else:
-        next_target = request.referrer or request.path
-    if not _is_safe_redirect_target(next_target):
-        next_target = url_for("main.dashboard")
-    return redirect(url_for("main.login", next=next_target))
-
-
-def _forbidden_response(allowed_roles):
-    if _accepts_json():
-        return (
-            jsonify(
-                {
-                    "error": "Forbidden",
-                    "allowed_roles": sorted(r for r in allowed_roles),
-                }
-            ),
-            403,
-        )
-
-    flash("Anda tidak memiliki akses ke halaman tersebut.", "danger")
-    return redirect(url_for("main.dashboard"))
-
-
-def get_current_user():
-    if hasattr(g, "_current_user"):
-        return g._current_user
-
-    user = None
-    user_id = session.get("user_id")
-    if user_id:
-        user = db.session.get(User, user_id)
-        if user:
-            session["username"] = user.username
-            session["role"] = user.role
-            session["email"] = user.email
-
-    if not user:
-        session.pop("user_id", None)
-        session.pop("username", None)
-        session.pop("role", None)
-        session.pop("email", None)
-
-    g._current_user = user
-    return user
-
-
-def _get_open_shift(user_id):
-    if not user_id:
-        return None
-    return (
-        CashierShift.query.filter(
-            CashierShift.user_id == user_id,
-            CashierShift.closed_at.is_(None),
-        )
-        .order_by(CashierShift.opened_at.desc())
-        .first()
-    )
-
-
-def _append_shift_note(existing_note, new_note):
-    if not new_note:
-        return existing_note
-    if existing_note:
-        combined = f"{existing_note} | {new_note}"
-    else:
-        combined = new_note
-    return combined[:255]
-
-
-def _auto_close_stale_shifts(actor_id, only_user_id=None, collect=False, log_limit=12):
-    if not actor_id:
-        return {"count": 0, "items": [], "extra_count": 0} if collect else 0
-    today = local_today()
-    now = local_now()
-    query = CashierShift.query.filter(
-        CashierShift.closed_at.is_(None),
-        CashierShift.shift_date < today,
-    )
-    if only_user_id:
-        query = query.filter(CashierShift.user_id == only_user_id)
-    if collect:
-        query = query.options(joinedload(CashierShift.user))
-    stale_shifts = query.order_by(CashierShift.opened_at.asc()).all()
-    if not stale_shifts:
-        return {"count": 0, "items": [], "extra_count": 0} if collect else 0
-    log_items = []
-    extra_count = 0
-    if collect:
-        sample_shifts = stale_shifts[:log_limit]
-        for shift in sample_shifts:
-            log_items.append(
-                {
-                    "user_id": shift.user_id,
-                    "user": shift.user.username if shift.user else "-",
-                    "shift_date": shift.shift_date.strftime("%d %b %Y")
-                    if shift.shift_date
-                    else "-",
-                    "opened_at": shift.opened_at.strftime("%H:%M")
-                    if shift.opened_at
-                    else "-",
-                    "closed_at": now.strftime("%H:%M"),
-                }
-            )
-        extra_count = max(len(stale_shifts) - log_limit, 0)
-    for shift in stale_shifts:
-        shift.closed_at = now
-        shift.closed_by = actor_id
-        shift.forced_close = True
-        note = f"Auto-close {now.strftime('%d/%m/%Y %H:%M')}"
-        shift.note = _append_shift_note(shift.note, note)
-    db.session.commit()
-    if collect:
-        return {
-            "count": len(stale_shifts),
-            "items": log_items,
-            "extra_count": extra_count,
-        }
-    return len(stale_shifts)
-
-
-def login_required(view_func):
-    @wraps(view_func)
-    def wrapped_view(*args, **kwargs):
-        if not get_current_user():
-            return _auth_required_response()
-        return view_func(*args, **kwargs)
-
-    return wrapped_view
-
-
-def roles_required(*allowed_roles, allow_admin=True):
-    allowed_set = {role.lower() for role in allowed_roles if role}
-
-    def decorator(view_func):
-        @wraps(view_func)
-        def wrapped_view(*args, **kwargs):
-            user = get_current_user()
-            if not user:
-                return _auth_required_response()
-
-            user_role = (user.role or "").lower()
-            if allow_admin and user_role == ROLE_ADMIN:
-                return view_func(*args, **kwargs)
-
-            if allowed_set and user_role in allowed_set:
-                return view_func(*args, **kwargs)
-
-            return _forbidden_response(allowed_set or ALL_ROLES)
-
-        return wrapped_view
-
-    return decorator
-
-
-def _safe_next_url(default_endpoint="main.dashboard", candidate=None):
-    target = candidate or request.args.get("next")
-    if target and _is_safe_redirect_target(target):
-        return target
-    return url_for(default_endpoint)
-
-
-def _normalize_price_value(raw_value):
-    if raw_value in (None, "", "null"):
-        return None
-    if isinstance(raw_value, (int, float)):
-        return float(raw_value)
-    try:
-        value = str(raw_value).strip()
-    except Exception:
-        return None
-    if not value:
-        return None
-    cleaned = value.replace("Rp", "").replace(" ", "")
-    if "," in cleaned and "." in cleaned:
-        if cleaned.find(",") > cleaned.find("."):
-            cleaned = cleaned.replace(".", "").replace(",", ".")
-        else:
-            cleaned = cleaned.replace(",", "")
-    else:
-        cleaned = cleaned.replace(",", ".")
-    try:
-        return float(cleaned)
-    except Exception:
-        try:
-            return float(value)
-        except Exception:
-            return None
-
-
-def _build_price_level_entries(payload, level_lookup):
-    payload = payload or []
-    normalized_entries = []
-    seen = set()
-    for row in payload:
-        if not isinstance(row, dict):
-            continue
-        try:
-            level_id = int(row.get("level_id"))
-        except (TypeError, ValueError):
-            continue
-        if level_id in seen or level_id not in level_lookup:
-            continue
-        price_value = _normalize_price_value(row.get("price"))
-        if price_value is None:
-            continue
-        seen.add(level_id)
-        normalized_entries.append(
-            {
-                "level_id": level_id,
-                "price": price_value,
-            }
-        )
-    return normalized_entries
-
-
-def _sync_product_price_levels(
-    product, payload, level_lookup, normalized_entries=None
-):
-    normalized_entries = (
-        normalized_entries
-        if normalized_entries is not None
-        else _build_price_level_entries(payload, level_lookup)
-    )
-
-    existing_entries = {entry.level_id: entry for entry in product.level_prices}
-    keep_ids = set()
-
-    for entry in normalized_entries:
-        level_id = entry["level_id"]
-        keep_ids.add(level_id)
-        record = existing_entries.get(level_id)
-        if record:
-            record.price = entry["price"]
-        else:
-            record = ProductPriceLevel(
-                product_id=product.id,
-                level_id=level_id,
-                price=entry["price"],
-            )
-            db.session.add(record)
-
-    for level_id, record in list(existing_entries.items()):
-        if level_id not in keep_ids:
-            db.session.delete(record)
-
-    db.session.flush()
-
-    default_entry = None
-    if product.level_prices:
-        retail_level_id = next(
-            (
-                level_id
-                for level_id in keep_ids
-                if level_lookup.get(level_id)
-                and (level_lookup[level_id].name or "").lower() == "retail"
-            ),
-            None,
-        )
-        if retail_level_id is not None:
-            default_entry = next(
-                (
-                    entry
-                    for entry in product.level_prices
-                    if entry.level_id == retail_level_id
-                ),
-                None,
-            )
-        if not default_entry:
-            default_entry = product.level_prices[0]
-
-    product.harga = float(default_entry.price) if default_entry else 0.0
-
-
-def _create_password_reset_token(user, ttl_hours=1):
-    PasswordResetToken.query.filter_by(user_id=user.id, used=False).update(
-        {"used": True}
-    )
-    token_value = secrets.token_urlsafe(32)
-    expires_at = local_now() + timedelta(hours=ttl_hours)
-    reset_token = PasswordResetToken(
-        user_id=user.id, token=token_value, expires_at=expires_at
-    )
-    db.session.add(reset_token)
-    db.session.commit()
-    return reset_token
-
-
-def _get_valid_reset_token(token_value):
-    if not token_value:
-        return None
-    token = PasswordResetToken.query.filter_by(token=token_value).first()
-    if (
-        not token
-        or token.used
-        or token.expires_at < local_now()
-        or not token.user
-    ):
-        return None
-    return token
-
-
-def _parse_int_param(value):
-    try:
-        return int(value)
-    except (TypeError, ValueError):
-        return None
-
-
-def _parse_float_param(value):
-    try:
-        return float(value)
-    except (TypeError, ValueError):
-        return None
-
-
-def _parse_date_param(value):
-    if not value:
-        return None
-    try:
-        return datetime.strptime(value, "%Y-%m-%d").date()
-    except ValueError:
-        return None
-
-
-def _parse_bool_param(value, default=False):
-    if value is None:
-        return default
-    if isinstance(value, bool):
-        return value
-    return str(value).strip().lower() in {"1", "true", "yes", "y", "on"}
-
-
-def _parse_journal_lines(payload):
-    lines = payload.get("lines") or []
-    if not lines or len(lines) < 2:
-        return None, "Minimal dua baris jurnal (debit/kredit)."
-
-    total_debit = 0.0
-    total_credit = 0.0
-    parsed_lines = []
-    for idx, raw in enumerate(lines, start=1):
-        account_id = raw.get("account_id")
-        description = (raw.get("description") or "").strip()
-        try:
-            account_id = int(account_id)
-        except (TypeError, ValueError):
-            return None, f"Akun tidak valid (baris {idx})."
-        account = db.session.get(Account, account_id)
-        if not account:
-            return None, f"Akun ID {account_id} tidak ditemukan (baris {idx})."
-        try:
-            debit = float(raw.get("debit") or 0.0)
-            credit = float(raw.get("credit") or 0.0)
-        except (TypeError, ValueError):
-            return None, f"Nominal tidak valid (baris {idx})."
-        if debit < 0 or credit < 0:
-            return None, f"Debit/kredit tidak boleh negatif (baris {idx})."
-        if debit == 0 and credit == 0:
-            return None, f"Isi salah satu debit/kredit (baris {idx})."
-        if debit > 0 and credit > 0:
-            return None, f"Debit dan kredit tidak boleh diisi bersamaan (baris {idx})."
-
-        total_debit += debit
-        total_credit += credit
-        parsed_lines.append(
-            {
-                "account": account,
-                "description": description,
-                "debit": debit,
-                "credit": credit,
-            }
-        )
-
-    if round(total_debit, 2) != round(total_credit, 2):
-        return None, "Total debit dan kredit harus seimbang."
-
-    return parsed_lines, None
-
-
-def _get_company_profile():
-    return {
-        "name": os.environ.get("COMPANY_NAME", "GOLDEN FARM 99"),
-        "address": os.environ.get(
-            "COMPANY_ADDRESS",
-            "Jln. Mawar putih blok a18 no 8n Taman meruya ilir - Meruya utara, Kembangan",
-        ),
-        "city": os.environ.get("COMPANY_CITY", "Jakarta"),
-        "phone": os.environ.get("COMPANY_PHONE", "0877-8809-5686"),
-        "email": os.environ.get("COMPANY_EMAIL", "goldenfarm99@gmail.com"),
-        "website": os.environ.get("COMPANY_WEBSITE", "https://goldenfarm99.com"),
-        "logo_url": os.environ.get("COMPANY_LOGO_URL", ""),
-        "bank_info": os.environ.get(
-            "COMPANY_BANK_INFO",
-            "BCA 5045218560 A.n. Golden Farm 99",
-        ),
-    }
-
-
-def _get_receipt_settings():
-    raw_thank_you = os.environ.get("RECEIPT_THANK_YOU_TEXT")
-    thank_you_text = "Terima kasih" if raw_thank_you is None else raw_thank_you
-
-    raw_font_weight = _parse_int_param(os.environ.get("RECEIPT_FONT_WEIGHT"))
-    font_weight = raw_font_weight if raw_font_weight is not None else 500
-    font_weight = min(700, max(300, font_weight))
-
-    raw_font_size = _parse_float_param(os.environ.get("RECEIPT_FONT_SIZE"))
-    font_size = raw_font_size if raw_font_size is not None else 12.5
-    font_size = min(16.0, max(9.0, font_size))
-    font_size_css = f"{font_size:g}"
-    font_size_print = str(int(round(font_size)))
-
-    font_family = os.environ.get("RECEIPT_FONT_FAMILY") or "Roboto Mono"
-
-    return {
-        "font_family": font_family,
-        "font_weight": font_weight,
-        "font_size": font_size_css,
-        "font_size_print": font_size_print,
-        "thank_you_text": thank_you_text.strip(),
-        "promo_barcode_label": os.environ.get("RECEIPT_PROMO_LABEL", "Promo").strip(),
-        "promo_barcode_value": os.environ.get("RECEIPT_PROMO_BARCODE", "").strip(),
-        "show_promo_barcode": _parse_bool_param(
-            os.environ.get("RECEIPT_SHOW_PROMO_BARCODE", "0")
-        ),
-    }
-
-
-def _update_env_file(updates, env_path=None):
-    env_path = env_path or os.path.join(os.getcwd(), ".env")
-    cleaned_updates = {
-        key: (value or "").replace("\n", " ").strip()
-        for key, value in updates.items()
-    }
-    if os.path.exists(env_path):
-        with open(env_path, "r", encoding="utf-8") as handle:
-            lines = handle.read().splitlines()
-    else:
-        lines = []
-
-    updated_keys = set()
-    new_lines = []
-    for line in lines:
-        stripped = line.strip()
-        if not stripped or stripped.startswith("#") or "=" not in line:
-            new_lines.append(line)
-            continue
-        key, _, _ = line.partition("=")
-        if key in cleaned_updates:
-            new_lines.append(f"{key}={cleaned_updates[key]}")
-            updated_keys.add(key)
-        else:
-            new_lines.append(line)
-
-    for key, value in cleaned_updates.items():
-        if key not in updated_keys:
-            new_lines.append(f"{key}={value}")
-
-    content = "\n".join(new_lines).rstrip() + "\n"
-    with open(env_path, "w", encoding="utf-8") as handle:
-        handle.write(content)
-
-
-def _get_env_value(key, default=""):
-    value = os.environ.get(key)
-    if value is None:
-        return default
-    value = value.strip()
-    return value if value else default
-
-
-def _parse_tax_value(value, default=0.0):
-    try:
-        tax = float(value)
-    except (TypeError, ValueError):
-        return default
-    if tax < 0:
-        return 0.0
-    if tax > 100:
-        return 100.0
-    return tax
-
-
-def _get_sales_invoice_prefix():
-    return _get_env_value("SALES_INVOICE_PREFIX", "F")
-
-
-def _get_purchase_invoice_prefix():
-    return _get_env_value("PURCHASE_INVOICE_PREFIX", "INV")
-
-
-def _get_default_sales_tax():
-    return _parse_tax_value(_get_env_value("DEFAULT_SALES_TAX_PERCENT", "0"))
-
-
-def _get_default_purchase_tax():
-    return _parse_tax_value(_get_env_value("DEFAULT_PURCHASE_TAX_PERCENT", "0"))
-
-
-def _build_sale_print_payload(sale):
-    items = []
-    subtotal = 0.0
-    discount_total = 0.0
-    tax_total = 0.0
-    total_weight = 0.0
-
-    for detail in sale.detail_penjualan:
-        qty = detail.jumlah or 0
-        price = detail.harga_satuan or 0.0
-        discount_pct = detail.diskon or 0.0
-        tax_pct = detail.pajak or 0.0
-        unit_weight = (
-            float(detail.produk.berat or 0.0) if detail.produk else 0.0
-        )
-
-        line_subtotal = price * qty
-        line_discount = line_subtotal * (discount_pct / 100.0)
-        taxable = line_subtotal - line_discount
-        line_tax = taxable * (tax_pct / 100.0)
-        line_total = taxable + line_tax
-        line_weight = unit_weight * qty
-
-        subtotal += line_subtotal
-        discount_total += line_discount
-        tax_total += line_tax
-        total_weight += line_weight
-
-        items.append(
-            {
-                "name": detail.produk.nama_produk if detail.produk else "-",
-                "sku": detail.produk.sku if detail.produk else "-",
-                "qty": qty,
-                "price": price,
-                "discount_pct": discount_pct,
-                "tax_pct": tax_pct,
-                "total": line_total,
-                "unit_weight": unit_weight,
-                "total_weight": line_weight,
-            }
-        )
-
-    shipping_fee = float(sale.shipping_fee or 0.0)
-    net_subtotal = subtotal - discount_total
-    grand_total = net_subtotal + tax_total + shipping_fee
-
-    payment_label = sale.payment_method or "-"
-    if sale.payment_method in {"Kartu", "Transfer", "QRIS"} and sale.payment_channel:
-        payment_label = f"{sale.payment_method} - {sale.payment_channel.name}"
-
-    return {
-        "items": items,
-        "subtotal": subtotal,
-        "discount_total": discount_total,
-        "tax_total": tax_total,
-        "shipping_fee": shipping_fee,
-        "grand_total": grand_total,
-        "net_subtotal": net_subtotal,
-        "total_weight": total_weight,
-        "payment_label": payment_label,
-    }
-
-
-def _build_invoice_payload_from_items(raw_items, shipping_fee=0.0):
-    normalized_items = []
-    for item in raw_items or []:
-        product_id = _parse_int_param(item.get("product_id"))
-        if not product_id:
-            continue
-        qty = _parse_float_param(item.get("qty")) or 0.0
-        if qty <= 0:
-            continue
-        price = _parse_float_param(item.get("price")) or 0.0
-        discount_pct = _parse_tax_value(item.get("discount"), default=0.0)
-        tax_pct = _parse_tax_value(item.get("tax"), default=0.0)
-        normalized_items.append(
-            {
-                "product_id": product_id,
-                "qty": qty,
-                "price": max(0.0, price),
-                "discount_pct": discount_pct,
-                "tax_pct": tax_pct,
-            }
-        )
-
-    product_map = {}
-    if normalized_items:
-        product_ids = [item["product_id"] for item in normalized_items]
-        products = Produk.query.filter(Produk.id.in_(product_ids)).all()
-        product_map = {product.id: product for product in products}
-
-    items = []
-    subtotal = 0.0
-    discount_total = 0.0
-    tax_total = 0.0
-    total_weight = 0.0
-
-    for item in normalized_items:
-        product = product_map.get(item["product_id"])
-        if not product:
-            continue
-        qty = item["qty"]
-        price = item["price"]
-        discount_pct = item["discount_pct"]
-        tax_pct = item["tax_pct"]
-        unit_weight = float(product.berat or 0.0)
-
-        line_subtotal = price * qty
-        line_discount = line_subtotal * (discount_pct / 100.0)
-        taxable = line_subtotal - line_discount
-        line_tax = taxable * (tax_pct / 100.0)
-        line_total = taxable + line_tax
-        line_weight = unit_weight * qty
-
-        subtotal += line_subtotal
-        discount_total += line_discount
-        tax_total += line_tax
-        total_weight += line_weight
-
-        items.append(
-            {
-                "product_id": item["product_id"],
-                "name": product.nama_produk or "-",
-                "sku": product.sku or "-",
-                "qty": qty,
-                "price": price,
-                "discount_pct": discount_pct,
-                "tax_pct": tax_pct,
-                "total": line_total,
-                "unit_weight": unit_weight,
-                "total_weight": line_weight,
-            }
-        )
-
-    shipping_fee = float(_parse_float_param(shipping_fee) or 0.0)
-    net_subtotal = subtotal - discount_total
-    grand_total = net_subtotal + tax_total + shipping_fee
-
-    return {
-        "items": items,
-        "subtotal": subtotal,
-        "discount_total": discount_total,
-        "tax_total": tax_total,
-        "shipping_fee": shipping_fee,
-        "grand_total": grand_total,
-        "net_subtotal": net_subtotal,
-        "total_weight": total_weight,
-    }
-
-
-def _build_sales_filters(args):
-    search_query = (args.get("search") or "").strip()
-    pelanggan_id = _parse_int_param(args.get("pelanggan"))
-    sales_id = _parse_int_param(args.get("sales"))
-    start_date = _parse_date_param(args.get("start_date"))
-    end_date = _parse_date_param(args.get("end_date"))
-    min_total = _parse_float_param(args.get("min_total"))
-    max_total = _parse_float_param(args.get("max_total"))
-
-    filters = []
-    if search_query:
-        like = f"%{search_query}%"
-        filters.append(
-            or_(
-                Penjualan.no_faktur.ilike(like),
-                Penjualan.pelanggan.has(Pelanggan.nama.ilike(like)),
-                Penjualan.sales.has(User.username.ilike(like)),
-            )
-        )
-
-    if pelanggan_id:
-        filters.append(Penjualan.pelanggan_id == pelanggan_id)
-
-    if sales_id:
-        filters.append(Penjualan.sales_id == sales_id)
-
-    if start_date:
-        filters.append(Penjualan.tanggal_penjualan >= start_date)
-
-    if end_date:
-        filters.append(Penjualan.tanggal_penjualan <= end_date)
-
-    expr = case(
-        (
-            Penjualan.total_harga
-            - func.coalesce(Penjualan.marketplace_cost_total, 0)
-            < 0,
-            0,
-        ),
-        else_=Penjualan.total_harga
-        - func.coalesce(Penjualan.marketplace_cost_total, 0),
-    )
-    if min_total is not None:
-        filters.append(expr >= min_total)
-
-    if max_total is not None:
-        filters.append(expr <= max_total)
-
-    return {
-        "filters": filters,
-        "search_query": search_query,
-        "pelanggan_id": pelanggan_id,
-        "sales_id": sales_id,
-        "start_date": start_date,
-        "end_date": end_date,
-        "min_total": min_total,
-        "max_total": max_total,
-    }
-
-
-def _format_date_id(date_value):
-    if not date_value:
-        return "-"
-    try:
-        month_label = INDONESIAN_MONTHS[date_value.month - 1]
-    except IndexError:
-        month_label = date_value.strftime("%b")
-    return f"{date_value.day:02d} {month_label} {date_value.year}"
-
-
-def _clean_import_str(value):
-    if pd.isna(value):
-        return None
-    value = str(value).strip()
-    return value or None
-
-
-def _clean_import_int(value):
-    if pd.isna(value) or value == "":
-        return None
-    try:
-        return int(value)
-    except (TypeError, ValueError):
-        return None
-
-
-def _clean_import_float(value):
-    if pd.isna(value) or value == "":
-        return None
-    try:
-        return float(value)
-    except (TypeError, ValueError):
-        return None
-
-
-def _clean_import_date(value):
-    if pd.isna(value) or value == "":
-        return None
-    if isinstance(value, datetime):
-        return value.date()
-    try:
-        return pd.to_datetime(value).date()
-    except Exception:
-        return None
-
-
-def _ensure_receivable_payment_table() -> bool:
-    try:
-        inspector = inspect(db.engine)
-        if inspector.has_table("receivable_payment"):
-            return True
-        ReceivablePayment.__table__.create(db.engine, checkfirst=True)
-        return True
-    except Exception:
-        return False
-
-
-def _ensure_accounting_setting_columns() -> bool:
-    try:
-        inspector = inspect(db.engine)
-        if not inspector.has_table("accounting_setting"):
-            return False
-        columns = {col["name"] for col in inspector.get_columns("accounting_setting")}
-        statements = []
-        if "inventory_adjustment_account_id" not in columns:
-            statements.append(
-                "ALTER TABLE accounting_setting "
-                "ADD COLUMN inventory_adjustment_account_id INTEGER"
-            )
-        if not statements:
-            return True
-        with db.engine.begin() as connection:
-            for stmt in statements:
-                connection.execute(text(stmt))
-        return True
-    except Exception:
-        return False
-
-
-def _ensure_purchase_payment_columns() -> bool:
-    try:
-        inspector = inspect(db.engine)
-        if not inspector.has_table("pembelian"):
-            return False
-        columns = {col["name"] for col in inspector.get_columns("pembelian")}
-        statements = []
-        if "due_date" not in columns:
-            statements.append("ALTER TABLE pembelian ADD COLUMN due_date DATE")
-        if "payment_bank" not in columns:
-            statements.append(
-                "ALTER TABLE pembelian ADD COLUMN payment_bank VARCHAR(120)"
-            )
-        if "payment_reference" not in columns:
-            statements.append(
-                "ALTER TABLE pembelian ADD COLUMN payment_reference VARCHAR(100)"
-            )
-        if not statements:
-            return True
-        with db.engine.begin() as connection:
-            for stmt in statements:
-                connection.execute(text(stmt))
-        return True
-    except Exception:
-        return False
-
-
-_PURCHASE_PAYMENT_COLUMNS_READY = False
-_ACCOUNTING_SETTING_COLUMNS_READY = False
-
-
-@bp.before_app_request
-def _ensure_purchase_columns_once():
-    global _PURCHASE_PAYMENT_COLUMNS_READY
-    global _ACCOUNTING_SETTING_COLUMNS_READY
-    if not _PURCHASE_PAYMENT_COLUMNS_READY:
-        if _ensure_purchase_payment_columns():
-            _PURCHASE_PAYMENT_COLUMNS_READY = True
-    if not _ACCOUNTING_SETTING_COLUMNS_READY:
-        if _ensure_accounting_setting_columns():
-            _ACCOUNTING_SETTING_COLUMNS_READY = True
-
-
-def _perform_produk_import(df, progress_cb=None):
-    required_columns = [
-        "Kode Produk",
-        "SKU",
-        "Nama Produk",
-        "Satuan ID",
-        "Kategori ID",
-        "Supplier ID",
-        "Berat",
-        "Stok Minimal",
-        "Tanggal Expired",
-    ]
-    if not all(column in df.columns for column in required_columns):
-        raise ValueError(
-            "Format file tidak valid! Pastikan semua kolom yang diperlukan ada."
-        )
-
-    created_count = 0
-    updated_count = 0
-    skipped_notes = []
-
-    total_rows = len(df.index) or 1
-
-    kode_set = set()
-    satuan_ids = set()
-    kategori_ids = set()
-    supplier_ids = set()
-
-    for _, row in df.iterrows():
-        kode_val = _clean_import_str(row.get("Kode Produk"))
-        if kode_val:
-            kode_set.add(kode_val)
-        satuan_val = _clean_import_int(row.get("Satuan ID"))
-        kategori_val = _clean_import_int(row.get("Kategori ID"))
-        supplier_val = _clean_import_int(row.get("Supplier ID"))
-        if satuan_val:
-            satuan_ids.add(satuan_val)
-        if kategori_val:
-            kategori_ids.add(kategori_val)
-        if supplier_val:
-            supplier_ids.add(supplier_val)
-
-    existing_products = (
-        Produk.query.filter(Produk.kode_produk.in_(list(kode_set))).all()
-        if kode_set
-        else []
-    )
-    product_by_code = {p.kode_produk: p for p in existing_products}
-    sku_lookup = {p.sku: p.id for p in existing_products if p.sku}
-
-    satuan_map = (
-        {s.id: s for s in Satuan.query.filter(Satuan.id.in_(list(satuan_ids))).all()}
-        if satuan_ids
-        else {}
-    )
-    kategori_map = (
-        {
-            k.id: k
-            for k in Kategori.query.filter(Kategori.id.in_(list(kategori_ids))).all()
-        }
-        if kategori_ids
-        else {}
-    )
-    supplier_map = (
-        {
-            s.id: s
-            for s in Supplier.query.filter(Supplier.id.in_(list(supplier_ids))).all()
-        }
-        if supplier_ids
-        else {}
-    )
-
-    def report_progress(value, message):
-        if progress_cb:
-            progress_cb(value, message)
-
-    report_progress(5, "Memeriksa kolom dan menyiapkan data...")
-
-    for idx, row in df.iterrows():
-        row_number = idx + 2  # +2 karena header di baris pertama
-        kode_produk = _clean_import_str(row.get("Kode Produk"))
-        if not kode_produk:
-            skipped_notes.append(f"Baris {row_number}: Kode Produk kosong.")
-            continue
-
-        sku = _clean_import_str(row.get("SKU"))
-        nama_produk = _clean_import_str(row.get("Nama Produk"))
-        satuan_id = _clean_import_int(row.get("Satuan ID"))
-        kategori_id = _clean_import_int(row.get("Kategori ID"))
-        supplier_id = _clean_import_int(row.get("Supplier ID"))
-        berat = _clean_import_float(row.get("Berat"))
-        stok_minimal = _clean_import_int(row.get("Stok Minimal"))
-        tanggal_expired = _clean_import_date(row.get("Tanggal Expired"))
-
-        progress_value = 10 + int(((idx + 1) / total_rows) * 80)
-        report_progress(progress_value, f"Memproses baris {row_number}")
-
-        existing_produk = product_by_code.get(kode_produk)
-        if existing_produk:
-            changes = []
-
-            if sku and sku != existing_produk.sku:
-                owner_id = sku_lookup.get(sku)
-                if owner_id and owner_id != existing_produk.id:
-                    skipped_notes.append(
-                        f"Baris {row_number}: SKU {sku} sudah dipakai produk lain."
-                    )
-                else:
-                    existing_produk.sku = sku
-                    changes.append("SKU")
-                    sku_lookup[sku] = existing_produk.id
-
-            if nama_produk and nama_produk != existing_produk.nama_produk:
-                existing_produk.nama_produk = nama_produk
-                changes.append("Nama Produk")
-
-            if satuan_id:
-                satuan = satuan_map.get(satuan_id)
-                if satuan:
-                    existing_produk.satuan_id = satuan_id
-                    changes.append("Satuan")
-                else:
-                    skipped_notes.append(
-                        f"Baris {row_number}: Satuan ID {satuan_id} tidak ditemukan."
-                    )
-
-            if kategori_id:
-                kategori = kategori_map.get(kategori_id)
-                if kategori:
-                    existing_produk.kategori_id = kategori_id
-                    changes.append("Kategori")
-                else:
-                    skipped_notes.append(
-                        f"Baris {row_number}: Kategori ID {kategori_id} tidak ditemukan."
-                    )
-
-            if supplier_id:
-                supplier = supplier_map.get(supplier_id)
-                if supplier:
-                    existing_produk.supplier_id = supplier_id
-                    changes.append("Supplier")
-                else:
-                    skipped_notes.append(
-                        f"Baris {row_number}: Supplier ID {supplier_id} tidak ditemukan."
-                    )
-
-            if berat is not None:
-                existing_produk.berat = berat
-                changes.append("Berat")
-
-            if stok_minimal is not None:
-                existing_produk.stok_minimal = stok_minimal
-                changes.append("Stok Minimal")
-
-            if tanggal_expired is not None:
-                existing_produk.tanggal_expired = tanggal_expired
-                changes.append("Tanggal Expired")
-
-            if changes:
-                updated_count += 1
-
-            continue
-
-        if not nama_produk:
-            skipped_notes.append(
-                f"Baris {row_number}: Nama Produk kosong untuk kode {kode_produk}."
-            )
-            continue
-
-        satuan = satuan_map.get(satuan_id) if satuan_id else None
-        kategori = kategori_map.get(kategori_id) if kategori_id else None
-        supplier = supplier_map.get(supplier_id) if supplier_id else None
-
-        if not satuan or not kategori or not supplier:
-            skipped_notes.append(
-                f"Baris {row_number}: Satuan/Kategori/Supplier tidak valid untuk {kode_produk}."
-            )
-            continue
-
-        if sku:
-            if sku in sku_lookup:
-                skipped_notes.append(
-                    f"Baris {row_number}: SKU {sku} sudah dipakai produk lain."
-                )
-                sku = None
-            else:
-                sku_lookup[sku] = -1
-
-        produk = Produk(
-            kode_produk=kode_produk,
-            sku=sku,
-            nama_produk=nama_produk,
-            satuan_id=satuan.id,
-            kategori_id=kategori.id,
-            supplier_id=supplier.id,
-            berat=berat if berat is not None else 0.0,
-            stok_minimal=stok_minimal if stok_minimal is not None else 0,
-            tanggal_expired=tanggal_expired,
-        )
-        db.session.add(produk)
-        created_count += 1
-
-    report_progress(92, "Menulis data ke database...")
-    db.session.commit()
-    report_progress(100, "Import selesai")
-
-    return {
-        "created": created_count,
-        "updated": updated_count,
-        "skipped_notes": skipped_notes,
-    }
-
-
-@bp.route("/")
-def index():
-    stats = {
-        "produk": Produk.query.count(),
-        "penjualan": Penjualan.query.count(),
-        "pembelian": Pembelian.query.count(),
-        "pelanggan": Pelanggan.query.count(),
-        "supplier": Supplier.query.count(),
-    }
-
-    recent_sales = (
-        Penjualan.query.order_by(Penjualan.tanggal_penjualan.desc()).limit(5).all()
-    )
-    recent_purchases = (
-        Pembelian.query.order_by(Pembelian.tanggal_faktur.desc()).limit(5).all()
-    )
-
-    if session.get("user_id"):
-        quick_links = [
-            {
-                "title": "Mulai Penjualan",
-                "subtitle": "Catat transaksi baru",
-                "icon": "fa-cash-register",
-                "url": url_for("main.penjualan"),
-                "tag": "Transaksi",
-            },
-            {
-                "title": "Tambah Produk",
-                "subtitle": "Kelola inventori",
-                "icon": "fa-box-open",
-                "url": url_for("main.produk"),
-                "tag": "Inventori",
-            },
-            {
-                "title": "Kelola Supplier",
-                "subtitle": "Bangun relasi pemasok",
-                "icon": "fa-truck",
-                "url": url_for("main.supplier"),
-                "tag": "Relasi",
-            },
-            {
-                "title": "Data Pelanggan",
-                "subtitle": "Lihat daftar pelanggan",
-                "icon": "fa-users",
-                "url": url_for("main.pelanggan"),
-                "tag": "CRM",
-            },
-        ]
-    else:
-        quick_links = [
-            {
-                "title": "Masuk ke akun",
-                "subtitle": "Lihat fitur lengkap aplikasi",
-                "icon": "fa-sign-in-alt",
-                "url": url_for("main.login"),
-                "tag": "Akses",
-            },
-            {
-                "title": "Buat akun baru",
-                "subtitle": "Mulai kelola penjualan secara digital",
-                "icon": "fa-user-plus",
-                "url": url_for("main.register"),
-                "tag": "Daftar",
-            },
-            {
-                "title": "Jelajahi fitur",
-                "subtitle": "Kenali kemampuan POS lebih dekat",
-                "icon": "fa-info-circle",
-                "url": url_for("main.about"),
-                "tag": "Panduan",
-            },
-            {
-                "title": "Hubungi tim",
-                "subtitle": "Siap bantu setup pertama Anda",
-                "icon": "fa-headset",
-                "url": url_for("main.about"),
-                "tag": "Dukungan",
-            },
-        ]
-
-    return render_template(
-        "index.html",
-        stats=stats,
-        recent_sales=recent_sales,
-        recent_purchases=recent_purchases,
-        quick_links=quick_links,
-    )
-
-
-@bp.route("/about")
-def about():
-    return render_template("about.html")
-
-
-@bp.route("/register", methods=["GET", "POST"])
-def register():
-    if request.method == "POST":
-        username = (request.form.get("username") or "").strip()
-        email = (request.form.get("email") or "").strip()
-        password = request.form.get("password", "")
-        confirm_password = request.form.get("confirm_password", "")
-
-        if not username:
-            flash("Username wajib diisi.", "danger")
-            return render_template("register.html")
-
-        # Validasi password
-        if len(password) < MIN_PASSWORD_LENGTH:
-            flash(
-                f"Password minimal {MIN_PASSWORD_LENGTH} karakter.",
-                "danger",
-            )
-            return render_template("register.html")
-        if password != confirm_password:
-            flash("Passwords do not match!", "danger")
-            return render_template("register.html")
-
-        existing_username = (
-            User.query.filter(func.lower(User.username) == username.lower()).first()
-            if username
-            else None
-        )
-        if existing_username:
-            flash(
-                "Username is already registered. Please use a different username.",
-                "danger",
-            )
-            return render_template("register.html")
-
-        # Periksa apakah email sudah ada
-        existing_user = User.query.filter_by(email=email).first()
-        if existing_user:
-            flash(
-                "Email is already registered. Please use a different email.", "danger"
-            )
-            return render_template("register.html")
-
-        # Hash password dan simpan ke database
-        hashed_password = generate_password_hash(
-            password, method="pbkdf2:sha256", salt_length=8
-        )
-        new_user = User(username=username, email=email, password=hashed_password)
-
-        db.session.add(new_user)
-        db.session.commit()
-
-        flash("Registration successful! Please log in.", "success")
-        return redirect("/login")
-
-    return render_template("register.html")
-
-
-@bp.route("/dashboard")
-@login_required
-@roles_required(*ALL_ROLE_CHOICES)
-def dashboard():
-    username = session.get("username")
-    role = (session.get("role") or "").lower()
-    is_admin = role == ROLE_ADMIN
-    is_sales_role = role in SALES_ROLES
-    is_inventory_role = role in INVENTORY_ROLES
-    is_cashier = role == ROLE_KASIR
-    is_sales_staff = role == ROLE_SALES
-    is_gudang = role == ROLE_GUDANG
-    is_inventory_only = is_inventory_role and not is_sales_role
-    auto_closed_shift_log = session.pop("auto_closed_shift_log", None)
-    today = local_today()
-    now = local_now()
-    month_start = now.replace(day=1).date()
-
-    net_expr = case(
-        (
-            Penjualan.total_harga
-            - func.coalesce(Penjualan.marketplace_cost_total, 0)
-            < 0,
-            0,
-        ),
-        else_=Penjualan.total_harga
-        - func.coalesce(Penjualan.marketplace_cost_total, 0),
-    )
-    total_net_revenue = (
-        db.session.query(func.coalesce(func.sum(net_expr), 0)).scalar() or 0
-    )
-    total_marketplace_cost = (
-        db.session.query(func.coalesce(func.sum(Penjualan.marketplace_cost_total), 0)).scalar()
-        or 0
-    )
-    total_transactions = Penjualan.query.count()
-    average_ticket = total_net_revenue / total_transactions if total_transactions else 0
-
-    today_sales = Penjualan.query.filter(Penjualan.tanggal_penjualan == today).all()
-    today_revenue = sum(sale.net_revenue for sale in today_sales)
-    today_transactions = len(today_sales)
-
-    month_sales = Penjualan.query.filter(
-        Penjualan.tanggal_penjualan >= month_start
-    ).all()
-    month_revenue = sum(sale.net_revenue for sale in month_sales)
-    month_transactions = len(month_sales)
-
-    monthly_sales_map = {}
-    for sale in Penjualan.query.order_by(Penjualan.tanggal_penjualan.asc()):
-        if sale.tanggal_penjualan:
-            key = (sale.tanggal_penjualan.year, sale.tanggal_penjualan.month)
-        monthly_sales_map[key] = monthly_sales_map.get(key, 0) + sale.net_revenue
-
-    monthly_trend = []
-    for (year, month), amount in sorted(monthly_sales_map.items())[-6:]:
-        label = datetime(year=year, month=month, day=1).strftime("%b %Y")
-        monthly_trend.append({"label": label, "amount": amount})
-
-    top_products_raw = (
-        db.session.query(
-            Produk.nama_produk.label("name"),
-            func.sum(DetailPenjualan.jumlah).label("units"),
-            func.sum(DetailPenjualan.harga_total).label("revenue"),
-        )
-        .join(Produk, Produk.id == DetailPenjualan.produk_id)
-        .group_by(Produk.id)
-        .order_by(func.sum(DetailPenjualan.jumlah).desc())
-        .limit(5)
-        .all()
-    )
-    top_products = [
-        {
-            "name": row.name,
-            "units": int(row.units or 0),
-            "revenue": float(row.revenue or 0),
-        }
-        for row in top_products_raw
-    ]
-
-    low_stock_query = Produk.query.filter(
-        Produk.stok_minimal.isnot(None),
-        Produk.stok_minimal > 0,
-        Produk.stok_lama <= Produk.stok_minimal,
-    )
-    low_stock_count = low_stock_query.count()
-    low_stock_products = (
-        low_stock_query.order_by(Produk.stok_lama.asc()).limit(5).all()
-    )
-
-    dashboard_summary = {
-        "total_net_revenue": total_net_revenue,
-        "total_marketplace_cost": total_marketplace_cost,
-        "total_transactions": total_transactions,
-        "average_ticket": average_ticket,
-        "today_net_revenue": today_revenue,
-        "today_transactions": today_transactions,
-        "month_net_revenue": month_revenue,
-        "month_transactions": month_transactions,
-        "customer_count": Pelanggan.query.count(),
-        "product_count": Produk.query.count(),
-        "low_stock_count": low_stock_count,
-    }
-    supplier_count = Supplier.query.count()
-
-    outstanding_expr = Penjualan.total_harga - func.coalesce(Penjualan.amount_paid, 0)
-    overdue_filters = [
-        Penjualan.payment_method == "Tempo",
-        outstanding_expr > 0,
-        Penjualan.due_date.isnot(None),
-        Penjualan.due_date < today,
-    ]
-    overdue_total = (
-        db.session.query(func.coalesce(func.sum(outstanding_expr), 0))
-        .filter(*overdue_filters)
-        .scalar()
-        or 0
-    )
-    overdue_count = (
-        db.session.query(func.count(Penjualan.id)).filter(*overdue_filters).scalar()
-        or 0
-    )
-    overdue_sales = (
-        Penjualan.query.options(
-            joinedload(Penjualan.pelanggan),
-            joinedload(Penjualan.sales),
-        )
-        .filter(*overdue_filters)
-        .order_by(Penjualan.due_date.asc(), Penjualan.id.desc())
-        .limit(5)
-        .all()
-    )
-    overdue_rows = []
-    for sale in overdue_sales:
-        total = float(sale.total_harga or 0.0)
-        amount_paid = float(sale.amount_paid or 0.0)
-        outstanding = max(total - amount_paid, 0.0)
-        days_overdue = (today - sale.due_date).days if sale.due_date else 0
-        overdue_rows.append(
-            {
-                "id": sale.id,
-                "invoice": sale.no_faktur,
-                "customer_name": sale.pelanggan.nama if sale.pelanggan else "Umum",
-                "due_date": sale.due_date,
-                "outstanding": outstanding,
-                "days_overdue": days_overdue,
-            }
-        )
-
-    active_shifts = (
-        CashierShift.query.options(joinedload(CashierShift.user))
-        .filter(CashierShift.closed_at.is_(None))
-        .order_by(CashierShift.opened_at.desc())
-        .all()
-    )
-    active_shift_rows = [
-        {
-            "id": shift.id,
-            "username": shift.user.username if shift.user else "-",
-            "opened_at": shift.opened_at,
-            "shift_date": shift.shift_date,
-        }
-        for shift in active_shifts
-    ]
-
-    recent_sales = (
-        Penjualan.query.options(
-            joinedload(Penjualan.pelanggan),
-            joinedload(Penjualan.sales),
-        )
-        .order_by(Penjualan.tanggal_penjualan.desc(), Penjualan.id.desc())
-        .limit(5)
-        .all()
-    )
-    recent_rows = [
-        {
-            "id": sale.id,
-            "invoice": sale.no_faktur,
-            "sale_date": sale.tanggal_penjualan,
-            "customer_name": sale.pelanggan.nama if sale.pelanggan else "Umum",
-            "sales_name": sale.sales.username if sale.sales else "-",
-            "payment_method": sale.payment_method or "-",
-            "total": float(sale.total_harga or 0.0),
-        }
-        for sale in recent_sales
-    ]
-
-    return render_template(
-        "dashboard.html",
-        username=username,
-        summary=dashboard_summary,
-        monthly_trend=monthly_trend,
-        top_products=top_products,
-        low_stock_products=low_stock_products,
-        supplier_count=supplier_count,
-        overdue_summary={
-            "total": overdue_total,
-            "count": overdue_count,
-        },
-        overdue_rows=overdue_rows,
-        active_shifts=active_shift_rows,
-        recent_sales=recent_rows,
-        is_admin=is_admin,
-        is_sales_role=is_sales_role,
-        is_inventory_role=is_inventory_role,
-        is_inventory_only=is_inventory_only,
-        is_cashier=is_cashier,
-        is_sales_staff=is_sales_staff,
-        is_gudang=is_gudang,
-        auto_closed_shift_log=auto_closed_shift_log,
-    )
-
-
-@bp.route("/logout")
-@login_required
-def logout():
-    session.clear()
-    flash("You have been logged out.", "info")
-    return redirect("/login")
-
-
-@bp.route("/login", methods=["GET", "POST"])
-def login():
-    if session.get("user_id"):
-        return redirect(_safe_next_url())
-
-    next_value = request.args.get("next")
-    if request.method == "POST":
-        email = request.form["email"]
-        password = request.form["password"]
-        next_value = request.form.get("next") or next_value
-
-        # Cari pengguna di database
-        user = User.query.filter_by(email=email).first()
-
-        if user and check_password_hash(user.password, password):
-            session["user_id"] = user.id
-            session["username"] = user.username
-            session["role"] = user.role
-            session["email"] = user.email
-            flash("Login successful!", "success")
-            return redirect(_safe_next_url(candidate=next_value))
-        else:
-            flash("Invalid email or password.", "danger")
-
-    return render_template("login.html", next=next_value)
-
-
-@bp.route("/forgot-password", methods=["GET", "POST"])
-def forgot_password():
-    if session.get("user_id"):
-        flash("Anda sudah masuk ke sistem.", "info")
-        return redirect(url_for("main.dashboard"))
-
-    if request.method == "POST":
-        email_input = request.form.get("email", "").strip()
-        if not email_input:
-            flash("Masukkan email yang terdaftar.", "warning")
-            return redirect(url_for("main.forgot_password"))
-
-        user = User.query.filter(func.lower(User.email) == email_input.lower()).first()
-        if user:
-            reset_token = _create_password_reset_token(user)
-            reset_link = url_for(
-                "main.reset_password", token=reset_token.token, _external=True
-            )
-            flash(
-                "Gunakan tautan berikut untuk mengatur ulang password (sementara ditampilkan untuk pengujian): "
-                f"{reset_link}",
-                "info",
-            )
-        flash("Jika email terdaftar, tautan reset password telah dikirim.", "success")
-        return redirect(url_for("main.login"))
-
-    return render_template("forgot_password.html")
-
-
-@bp.route("/reset-password/<token>", methods=["GET", "POST"])
-def reset_password(token):
-    if session.get("user_id"):
-        flash("Keluar dari akun terlebih dahulu untuk reset password.", "info")
-        return redirect(url_for("main.dashboard"))
-
-    reset_token = _get_valid_reset_token(token)
-    if not reset_token:
-        flash("Token reset password tidak valid atau sudah kedaluwarsa.", "danger")
-        return redirect(url_for("main.forgot_password"))
-
-    if request.method == "POST":
-        password = request.form.get("password", "")
-        confirm_password = request.form.get("confirm_password", "")
-
-        if not password or not confirm_password:
-            flash("Password dan konfirmasi wajib diisi.", "warning")
-            return redirect(url_for("main.reset_password", token=token))
-        if len(password) < MIN_PASSWORD_LENGTH:
-            flash(
-                f"Password minimal {MIN_PASSWORD_LENGTH} karakter.",
-                "warning",
-            )
-            return redirect(url_for("main.reset_password", token=token))
-        if password != confirm_password:
-            flash("Konfirmasi password tidak cocok.", "warning")
-            return redirect(url_for("main.reset_password", token=token))
-
-        reset_token.user.password = generate_password_hash(
-            password, method="pbkdf2:sha256", salt_length=8
-        )
-        reset_token.mark_used()
-        db.session.commit()
-        flash("Password berhasil diperbarui. Silakan login kembali.", "success")
-        return redirect(url_for("main.login"))
-
-    return render_template("reset_password.html", token=token)
-
-
-@bp.route("/profile", methods=["GET", "POST"])
-@login_required
-def profile():
-    user = db.session.get(User, session["user_id"])
-
-    if request.method == "POST":
-        username = (request.form.get("username") or "").strip()
-        email = (request.form.get("email") or "").strip()
-        current_password = request.form.get("current_password", "")
-        new_password = request.form.get("new_password", "")
-        confirm_password = request.form.get("confirm_password", "")
-        password_change_requested = any(
-            [current_password, new_password, confirm_password]
-        )
-
-        if not username:
-            flash("Username wajib diisi.", "warning")
-            return redirect("/profile")
-        if not email:
-            flash("Email wajib diisi.", "warning")
-            return redirect("/profile")
-        if not re.match(r"^[^@\s]+@[^@\s]+\.[^@\s]+$", email):
-            flash("Format email tidak valid.", "warning")
-            return redirect("/profile")
-
-        existing_username = (
-            User.query.filter(func.lower(User.username) == username.lower())
-            .filter(User.id != user.id)
-            .first()
-        )
-        if existing_username:
-            flash("Username sudah digunakan.", "warning")
-            return redirect("/profile")
-
-        existing_email = (
-            User.query.filter(func.lower(User.email) == email.lower())
-            .filter(User.id != user.id)
-            .first()
-        )
-        if existing_email:
-            flash("Email sudah terdaftar.", "warning")
-            return redirect("/profile")
-
-        if password_change_requested:
-            if not current_password:
-                flash("Password lama wajib diisi.", "warning")
-                return redirect("/profile")
-            if not check_password_hash(user.password, current_password):
-                flash("Password lama tidak sesuai.", "danger")
-                return redirect("/profile")
-            if not new_password or not confirm_password:
-                flash("Password baru dan konfirmasi wajib diisi.", "warning")
-                return redirect("/profile")
-            if len(new_password) < MIN_PASSWORD_LENGTH:
-                flash(
-                    f"Password minimal {MIN_PASSWORD_LENGTH} karakter.",
-                    "warning",
-                )
-                return redirect("/profile")
-            if new_password != confirm_password:
-                flash("Konfirmasi password baru tidak cocok.", "warning")
-                return redirect("/profile")
-            hashed_password = generate_password_hash(
-                new_password, method="pbkdf2:sha256", salt_length=8
-            )
-            user.password = hashed_password
-
-        # Update username and email
-        user.username = username
-        user.email = email
-
-        # Commit changes to the database
-        db.session.commit()
-        flash("Profile updated successfully!", "success")
-        return redirect("/profile")
-
-    return render_template("profile.html", username=user.username, email=user.email)
-
-
-@bp.route("/pengaturan/perusahaan", methods=["GET", "POST"])
-@login_required
-@roles_required(*ADMIN_ONLY)
-def pengaturan_perusahaan():
-    profile = _get_company_profile()
-
-    if request.method == "POST":
-        name = (request.form.get("company_name") or "").strip()
-        address = (request.form.get("company_address") or "").strip()
-        city = (request.form.get("company_city") or "").strip()
-        phone = (request.form.get("company_phone") or "").strip()
-        email = (request.form.get("company_email") or "").strip()
-        website = (request.form.get("company_website") or "").strip()
-        logo_url = (request.form.get("company_logo_url") or "").strip()
-        bank_info = (request.form.get("company_bank_info") or "").strip()
-
-        if not name:
-            flash("Nama perusahaan wajib diisi.", "warning")
-            return redirect(url_for("main.pengaturan_perusahaan"))
-        if not address:
-            flash("Alamat perusahaan wajib diisi.", "warning")
-            return redirect(url_for("main.pengaturan_perusahaan"))
-        if not city:
-            flash("Kota perusahaan wajib diisi.", "warning")
-            return redirect(url_for("main.pengaturan_perusahaan"))
-
-        updates = {
-            "COMPANY_NAME": name,
-            "COMPANY_ADDRESS": address,
-            "COMPANY_CITY": city,
-            "COMPANY_PHONE": phone,
-            "COMPANY_EMAIL": email,
-            "COMPANY_WEBSITE": website,
-            "COMPANY_LOGO_URL": logo_url,
-            "COMPANY_BANK_INFO": bank_info,
-        }
-        _update_env_file(updates)
-        for key, value in updates.items():
-            os.environ[key] = value
-
-        flash("Profil perusahaan berhasil diperbarui.", "success")
-        return redirect(url_for("main.pengaturan_perusahaan"))
-
-    return render_template("pengaturan_perusahaan.html", profile=profile)
-
-
-@bp.route("/pengaturan/faktur-pajak", methods=["GET", "POST"])
-@login_required
-@roles_required(*ADMIN_ONLY)
-def pengaturan_faktur_pajak():
-    if request.method == "POST":
-        sales_prefix = (request.form.get("sales_invoice_prefix") or "").strip().upper()
-        purchase_prefix = (
-            request.form.get("purchase_invoice_prefix") or ""
-        ).strip().upper()
-        sales_tax_raw = request.form.get("default_sales_tax") or "0"
-        purchase_tax_raw = request.form.get("default_purchase_tax") or "0"
-
-        if not sales_prefix:
-            flash("Prefix faktur penjualan wajib diisi.", "warning")
-            return redirect(url_for("main.pengaturan_faktur_pajak"))
-        if not purchase_prefix:
-            flash("Prefix faktur pembelian wajib diisi.", "warning")
-            return redirect(url_for("main.pengaturan_faktur_pajak"))
-
-        sales_tax = _parse_tax_value(sales_tax_raw, default=0.0)
-        purchase_tax = _parse_tax_value(purchase_tax_raw, default=0.0)
-
-        updates = {
-            "SALES_INVOICE_PREFIX": sales_prefix,
-            "PURCHASE_INVOICE_PREFIX": purchase_prefix,
-            "DEFAULT_SALES_TAX_PERCENT": str(sales_tax),
-            "DEFAULT_PURCHASE_TAX_PERCENT": str(purchase_tax),
-        }
-        _update_env_file(updates)
-        for key, value in updates.items():
-            os.environ[key] = value
-
-        flash("Pengaturan faktur & pajak berhasil diperbarui.", "success")
-        return redirect(url_for("main.pengaturan_faktur_pajak"))
-
-    sales_prefix = _get_sales_invoice_prefix()
-    purchase_prefix = _get_purchase_invoice_prefix()
-    sales_tax = _get_default_sales_tax()
-    purchase_tax = _get_default_purchase_tax()
-
-    now = local_now()
-    preview_stamp = now.strftime("%Y%m%d%H%M")
-    return render_template(
-        "pengaturan_faktur_pajak.html",
-        sales_prefix=sales_prefix,
-        purchase_prefix=purchase_prefix,
-        sales_tax=sales_tax,
-        purchase_tax=purchase_tax,
-        sales_preview=f"{sales_prefix}{preview_stamp}",
-        purchase_preview=f"{purchase_prefix}{preview_stamp}",
-    )
-
-
-@bp.route("/pengaturan/struk", methods=["GET", "POST"])
-@login_required
-@roles_required(*ADMIN_ONLY)
-def pengaturan_struk():
-    settings = _get_receipt_settings()
-
-    if request.method == "POST":
-        font_family = (request.form.get("receipt_font_family") or "").strip()
-        font_weight_raw = request.form.get("receipt_font_weight")
-        font_size_raw = request.form.get("receipt_font_size")
-        thank_you_text = (request.form.get("receipt_thank_you_text") or "").strip()
-        promo_label = (request.form.get("receipt_promo_label") or "").strip()
-        promo_barcode = (request.form.get("receipt_promo_barcode") or "").strip()
-        show_promo_barcode = _parse_bool_param(
-            request.form.get("receipt_show_promo_barcode"), default=False
-        )
-
-        if not font_family:
-            flash("Font struk wajib diisi.", "warning")
-            return redirect(url_for("main.pengaturan_struk"))
-
-        font_weight = _parse_int_param(font_weight_raw)
-        if font_weight is None:
-            font_weight = 500
-        font_weight = min(700, max(300, font_weight))
-
-        font_size = _parse_float_param(font_size_raw)
-        if font_size is None:
-            font_size = 12.5
-        font_size = min(16.0, max(9.0, font_size))
-
-        updates = {
-            "RECEIPT_FONT_FAMILY": font_family,
-            "RECEIPT_FONT_WEIGHT": str(font_weight),
-            "RECEIPT_FONT_SIZE": f"{font_size:g}",
-            "RECEIPT_THANK_YOU_TEXT": thank_you_text,
-            "RECEIPT_PROMO_LABEL": promo_label,
-            "RECEIPT_PROMO_BARCODE": promo_barcode,
-            "RECEIPT_SHOW_PROMO_BARCODE": "1" if show_promo_barcode else "0",
-        }
-        _update_env_file(updates)
-        for key, value in updates.items():
-            os.environ[key] = value
-
-        flash("Pengaturan struk berhasil diperbarui.", "success")
-        return redirect(url_for("main.pengaturan_struk"))
-
-    return render_template("pengaturan_struk.html", settings=settings)
-
-
-@bp.route("/pengaturan/database", methods=["GET", "POST"])
-@login_required
-@roles_required(*ADMIN_ONLY)
-def pengaturan_database():
-    if request.method == "POST":
-        action = (request.form.get("action") or "").strip()
-        backup_supported = _resolve_sqlite_path() is not None
-
-        if action == "check":
-            result = _check_db_connection()
-            flash(
-                result["message"],
-                "success" if result["ok"] else "danger",
-            )
-            return redirect(url_for("main.pengaturan_database"))
-
-        if action == "backup":
-            if not backup_supported:
-                flash("Backup hanya tersedia untuk database SQLite.", "warning")
-                return redirect(url_for("main.pengaturan_database"))
-            backup_name, error = _backup_sqlite_database()
-            if error:
-                flash(error, "danger")
-            else:
-                flash(f"Backup tersimpan: {backup_name}", "success")
-            return redirect(url_for("main.pengaturan_database"))
-
-        if action == "restore":
-            if not backup_supported:
-                flash("Restore hanya tersedia untuk database SQLite.", "warning")
-                return redirect(url_for("main.pengaturan_database"))
-            backup_dir = _get_backup_directory()
-            uploaded = request.files.get("backup_file")
-            selected_name = (request.form.get("backup_choice") or "").strip()
-            backup_path = None
-
-            if uploaded and uploaded.filename:
-                safe_name = secure_filename(uploaded.filename)
-                if not _is_allowed_backup_name(safe_name):
-                    flash("Format file backup tidak didukung.", "warning")
-                    return redirect(url_for("main.pengaturan_database"))
-                stamp = local_now().strftime("%Y%m%d%H%M%S")
-                stored_name = f"restore_{stamp}_{safe_name}"
-                backup_path = os.path.join(backup_dir, stored_name)
-                uploaded.save(backup_path)
-            elif selected_name:
-                selected_name = os.path.basename(selected_name)
-                backup_path = os.path.join(backup_dir, selected_name)
-
-            if not backup_path:
-                flash("Pilih file backup atau unggah file untuk restore.", "warning")
-                return redirect(url_for("main.pengaturan_database"))
-
-            error = _restore_sqlite_database(backup_path)
-            if error:
-                flash(error, "danger")
-            else:
-                flash("Restore database berhasil.", "success")
-            return redirect(url_for("main.pengaturan_database"))
-
-        if action == "delete":
-            if not backup_supported:
-                flash("Hapus backup hanya tersedia untuk database SQLite.", "warning")
-                return redirect(url_for("main.pengaturan_database"))
-            target_name = (request.form.get("backup_name") or "").strip()
-            if not target_name:
-                flash("Nama file backup tidak ditemukan.", "warning")
-                return redirect(url_for("main.pengaturan_database"))
-            target_name = os.path.basename(target_name)
-            if not _is_allowed_backup_name(target_name):
-                flash("Format file backup tidak didukung.", "warning")
-                return redirect(url_for("main.pengaturan_database"))
-            backup_path = os.path.join(_get_backup_directory(), target_name)
-            if not os.path.exists(backup_path):
-                flash("File backup tidak ditemukan.", "warning")
-                return redirect(url_for("main.pengaturan_database"))
-            try:
-                os.remove(backup_path)
-                flash("Backup berhasil dihapus.", "success")
-            except Exception as exc:
-                flash(f"Gagal menghapus backup: {exc}", "danger")
-            return redirect(url_for("main.pengaturan_database"))
-
-        flash("Aksi pengaturan database tidak dikenal.", "warning")
-        return redirect(url_for("main.pengaturan_database"))
-
-    connection_status = _check_db_connection()
-    db_info = _collect_system_metrics().get("database", {})
-    backup_supported = _resolve_sqlite_path() is not None
-    backups = _list_db_backups() if backup_supported else []
-
-    return render_template(
-        "pengaturan_database.html",
-        connection_status=connection_status,
-        db_info=db_info,
-        backup_supported=backup_supported,
-        backups=backups,
-    )
-
-
-@bp.route("/pengaturan/database/backup/<path:backup_name>")
-@login_required
-@roles_required(*ADMIN_ONLY)
-def download_db_backup(backup_name):
-    if _resolve_sqlite_path() is None:
-        flash("Download hanya tersedia untuk database SQLite.", "warning")
-        return redirect(url_for("main.pengaturan_database"))
-
-    safe_name = os.path.basename(backup_name or "")
-    if not _is_allowed_backup_name(safe_name):
-        flash("Format file backup tidak didukung.", "warning")
-        return redirect(url_for("main.pengaturan_database"))
-
-    backup_dir = _get_backup_directory()
-    backup_path = os.path.join(backup_dir, safe_name)
-    if not os.path.exists(backup_path):
-        flash("File backup tidak ditemukan.", "warning")
-        return redirect(url_for("main.pengaturan_database"))
-
-    return send_from_directory(backup_dir, safe_name, as_attachment=True, download_name=safe_name)
-
-
-def _normalize_fee(value, default):
-    try:
-        fee = float(value)
-    except (TypeError, ValueError):
-        return default
-    if fee > 1:
-        fee = fee / 100.0
-    if fee < 0:
-        fee = 0.0
-    if fee >= 0.95:
-        fee = 0.95
-    return fee
-
-
-@bp.route("/kelola-harga", methods=["GET", "POST"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def kelola_harga():
-    _ensure_table(MarketplacePricingSetting)
-    rounding_options = [
-        {"value": "none", "label": "Tidak dibulatkan"},
-        {"value": "round_100", "label": "Ke atas kelipatan 100"},
-        {"value": "round_500", "label": "Ke atas kelipatan 500"},
-        {"value": "round_1000", "label": "Ke atas kelipatan 1.000"},
-        {"value": "round_900", "label": "Psikologis (xx.900)"},
-    ]
-    rounding_lookup = {opt["value"]: opt["label"] for opt in rounding_options}
-
-    def _round_up_multiple(value, step):
-        if step <= 0:
-            return math.ceil(value)
-        return math.ceil(value / step) * step
-
-    def _round_psych_900(value):
-        base = math.floor(value / 1000) * 1000
-        candidate = base + 900
-        if candidate < value:
-            candidate += 1000
-        return candidate
-
-    def _apply_rounding(value, mode):
-        if mode == "round_100":
-            return _round_up_multiple(value, 100)
-        if mode == "round_500":
-            return _round_up_multiple(value, 500)
-        if mode == "round_1000":
-            return _round_up_multiple(value, 1000)
-        if mode == "round_900":
-            return _round_psych_900(value)
-        return math.ceil(value)
-
-    price_levels = PriceLevel.query.order_by(PriceLevel.name.asc()).all()
-    cost_entries = (
-        PriceLevelCost.query.filter(PriceLevelCost.is_active.is_(True))
-        .order_by(PriceLevelCost.level_id.asc(), PriceLevelCost.name.asc())
-        .all()
-    )
-    fee_map = {
-        level.id: {"percent": 0.0, "nominal": 0.0}
-        for level in price_levels
-    }
-    for cost in cost_entries:
-        bucket = fee_map.setdefault(cost.level_id, {"percent": 0.0, "nominal": 0.0})
-        if cost.type == "percent":
-            bucket["percent"] += float(cost.value or 0.0)
-        else:
-            bucket["nominal"] += float(cost.value or 0.0)
-
-    marketplace_levels = []
-    for level in price_levels:
-        totals = fee_map.get(level.id, {"percent": 0.0, "nominal": 0.0})
-        marketplace_levels.append(
-            {
-                "id": level.id,
-                "name": level.name,
-                "fee_percent": totals["percent"],
-                "fee_nominal": totals["nominal"],
-            }
-        )
-    has_price_levels = bool(price_levels)
-    if not marketplace_levels:
-        marketplace_levels = [
-            {
-                "id": 0,
-                "name": "Tokopedia / Shopee",
-                "fee_percent": 18.0,
-                "fee_nominal": 0.0,
-            },
-            {
-                "id": 1,
-                "name": "Blibli / Lazada",
-                "fee_percent": 10.5,
-                "fee_nominal": 0.0,
-            },
-        ]
-
-    form_data = {
-        "product_name": "",
-        "sku": "",
-        "cost": "",
-        "packing": "",
-        "target_profit": "",
-        "rounding_mode": "round_100",
-    }
-
-    if request.method == "POST":
-        action = (request.form.get("action") or "").strip()
-        if action == "save":
-            record_id = _parse_int_param(request.form.get("record_id"))
-            product_name = (request.form.get("product_name") or "").strip()
-            sku = (request.form.get("sku") or "").strip()
-            cost = _parse_float_param(request.form.get("cost"))
-            packing = _parse_float_param(request.form.get("packing"))
-            target_profit = _parse_float_param(request.form.get("target_profit"))
-            rounding_mode = (request.form.get("rounding_mode") or "").strip()
-            if rounding_mode not in rounding_lookup:
-                rounding_mode = "round_100"
-
-            if cost is None or packing is None or target_profit is None:
-                flash("HPP, packing, dan target laba wajib diisi.", "warning")
-                return redirect(url_for("main.kelola_harga"))
-            if cost < 0 or packing < 0 or target_profit < 0:
-                flash("Nilai biaya tidak boleh negatif.", "warning")
-                return redirect(url_for("main.kelola_harga"))
-
-            if record_id:
-                record = db.session.get(MarketplacePricingSetting, record_id)
-            else:
-                record = None
-
-            if record:
-                record.product_name = product_name or None
-                record.sku = sku or None
-                record.cost = cost
-                record.packing = packing
-                record.target_profit = target_profit
-                record.rounding_mode = rounding_mode
-                record.created_by = record.created_by or session.get("user_id")
-            else:
-                record = MarketplacePricingSetting(
-                    product_name=product_name or None,
-                    sku=sku or None,
-                    cost=cost,
-                    packing=packing,
-                    target_profit=target_profit,
-                    rounding_mode=rounding_mode,
-                    created_by=session.get("user_id"),
-                )
-                db.session.add(record)
-            db.session.commit()
-            flash("Setting harga marketplace disimpan.", "success")
-            return redirect(url_for("main.kelola_harga", load=record.id))
-
-        if action == "delete":
-            record_id = _parse_int_param(request.form.get("record_id"))
-            if not record_id:
-                flash("Data tidak ditemukan.", "warning")
-                return redirect(url_for("main.kelola_harga"))
-            record = db.session.get(MarketplacePricingSetting, record_id)
-            if record:
-                db.session.delete(record)
-                db.session.commit()
-                flash("Data pricing dihapus.", "success")
-            return redirect(url_for("main.kelola_harga"))
-
-        if action == "apply_levels":
-            if not has_price_levels:
-                flash("Level harga belum tersedia untuk diterapkan.", "warning")
-                return redirect(url_for("main.kelola_harga"))
-            product_id = _parse_int_param(request.form.get("product_id"))
-            cost = _parse_float_param(request.form.get("cost"))
-            packing = _parse_float_param(request.form.get("packing"))
-            target_profit = _parse_float_param(request.form.get("target_profit"))
-            rounding_mode = (request.form.get("rounding_mode") or "").strip()
-            if rounding_mode not in rounding_lookup:
-                rounding_mode = "round_100"
-
-            if not product_id:
-                flash("Pilih produk dari daftar sebelum menerapkan.", "warning")
-                return redirect(url_for("main.kelola_harga"))
-            if cost is None or packing is None or target_profit is None:
-                flash("HPP, packing, dan target laba wajib diisi.", "warning")
-                return redirect(url_for("main.kelola_harga"))
-            if cost < 0 or packing < 0 or target_profit < 0:
-                flash("Nilai biaya tidak boleh negatif.", "warning")
-                return redirect(url_for("main.kelola_harga"))
-
-            product = db.session.get(Produk, product_id)
-            if not product:
-                flash("Produk tidak ditemukan.", "warning")
-                return redirect(url_for("main.kelola_harga"))
-
-            level_ids = []
-            for raw_level in request.form.getlist("level_ids"):
-                try:
-                    level_id = int(raw_level)
-                except (TypeError, ValueError):
-                    continue
-                if level_id in fee_map:
-                    level_ids.append(level_id)
-
-            if not level_ids:
-                flash("Pilih minimal satu level harga untuk diterapkan.", "warning")
-                return redirect(url_for("main.kelola_harga"))
-
-            base = cost + packing
-            updated_count = 0
-            for level_id in level_ids:
-                totals = fee_map.get(level_id, {"percent": 0.0, "nominal": 0.0})
-                fee = min(max((totals["percent"] or 0.0) / 100, 0), 0.95)
-                base_with_nominal = base + float(totals["nominal"] or 0.0)
-                raw_price = (
-                    (base_with_nominal + target_profit) / (1 - fee)
-                    if fee < 1
-                    else 0.0
-                )
-                rounded_price = _apply_rounding(raw_price, rounding_mode)
-                entry = ProductPriceLevel.query.filter_by(
-                    product_id=product_id, level_id=level_id
-                ).first()
-                if entry:
-                    entry.price = rounded_price
-                else:
-                    entry = ProductPriceLevel(
-                        product_id=product_id,
-                        level_id=level_id,
-                        price=rounded_price,
-                    )
-                    db.session.add(entry)
-                updated_count += 1
-
-            db.session.commit()
-            flash(
-                f"Berhasil menerapkan {updated_count} harga level untuk {product.nama_produk}.",
-                "success",
-            )
-            return redirect(url_for("main.kelola_harga"))
-
-    loaded_product = None
-    load_id = _parse_int_param(request.args.get("load"))
-    if load_id:
-        record = db.session.get(MarketplacePricingSetting, load_id)
-        if record:
-            form_data.update(
-                {
-                    "product_name": record.product_name or "",
-                    "sku": record.sku or "",
-                    "cost": record.cost,
-                    "packing": record.packing,
-                    "target_profit": record.target_profit,
-                    "rounding_mode": record.rounding_mode,
-                    "record_id": record.id,
-                }
-            )
-            product_match = None
-            if record.sku:
-                product_match = Produk.query.filter(
-                    func.lower(Produk.sku) == record.sku.lower()
-                ).first()
-            if not product_match and record.product_name:
-                product_match = Produk.query.filter(
-                    func.lower(Produk.nama_produk) == record.product_name.lower()
-                ).first()
-            if not product_match and record.product_name:
-                product_match = Produk.query.filter(
-                    func.lower(Produk.kode_produk) == record.product_name.lower()
-                ).first()
-            if product_match:
-                form_data["product_id"] = product_match.id
-                form_data["product_name"] = (
-                    product_match.nama_produk or form_data["product_name"]
-                )
-                form_data["sku"] = product_match.sku or form_data["sku"]
-                level_entries = (
-                    ProductPriceLevel.query.options(joinedload(ProductPriceLevel.level))
-                    .filter(ProductPriceLevel.product_id == product_match.id)
-                    .all()
-                )
-                loaded_product = {
-                    "id": product_match.id,
-                    "kode_produk": product_match.kode_produk,
-                    "nama_produk": product_match.nama_produk,
-                    "sku": product_match.sku,
-                    "price_levels": sorted(
-                        [
-                            {
-                                "level_id": entry.level_id,
-                                "level_name": entry.level.name if entry.level else "",
-                                "price": entry.price,
-                            }
-                            for entry in level_entries
-                        ],
-                        key=lambda item: (item.get("level_name") or "").lower(),
-                    ),
-                }
-
-    records = (
-        MarketplacePricingSetting.query.order_by(
-            MarketplacePricingSetting.updated_at.desc(),
-            MarketplacePricingSetting.id.desc(),
-        )
-        .limit(50)
-        .all()
-    )
-    record_rows = []
-    for record in records:
-        base = float(record.cost or 0.0) + float(record.packing or 0.0)
-        record_rows.append(
-            {
-                "id": record.id,
-                "product_name": record.product_name or "-",
-                "sku": record.sku or "-",
-                "base": base,
-                "target_profit": record.target_profit,
-                "rounding": rounding_lookup.get(record.rounding_mode, record.rounding_mode),
-                "updated_at": record.updated_at,
-            }
-        )
-
-    return render_template(
-        "kelola_harga.html",
-        form_data=form_data,
-        rounding_options=rounding_options,
-        records=record_rows,
-        marketplace_levels=marketplace_levels,
-        has_price_levels=has_price_levels,
-        loaded_product=loaded_product,
-    )
-
-
-@bp.route("/pricing", methods=["GET"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def pricing():
-    return redirect(url_for("main.kelola_harga"))
-
-
-def _build_supplier_page_context(
-    edit_supplier=None, search_query="", page=1, per_page=10
-):
-    base_query = Supplier.query.order_by(Supplier.name.asc())
-    if search_query:
-        like = f"%{search_query}%"
-        base_query = base_query.filter(
-            or_(
-                Supplier.name.ilike(like),
-                Supplier.email.ilike(like),
-                Supplier.contact_person.ilike(like),
-                Supplier.phone.ilike(like),
-            )
-        )
-
-    pagination = base_query.paginate(page=page, per_page=per_page, error_out=False)
-    suppliers = pagination.items
-
-    total_suppliers = Supplier.query.count()
-    contact_complete = Supplier.query.filter(
-        Supplier.phone.isnot(None), Supplier.phone != ""
-    ).count()
-    email_complete = Supplier.query.filter(
-        Supplier.email.isnot(None), Supplier.email != ""
-    ).count()
-    website_complete = Supplier.query.filter(
-        Supplier.website.isnot(None), Supplier.website != ""
-    ).count()
-    contact_missing = total_suppliers - contact_complete
-    email_missing = total_suppliers - email_complete
-
-    purchase_count = Pembelian.query.count()
-
-    supplier_stat_cards = [
-        {
-            "label": "Total Supplier",
-            "value": total_suppliers,
-            "icon": "fa-truck",
-            "accent": "text-primary",
-            "type": "count",
-            "description": "Partner pemasok yang siap dihubungi.",
-        },
-        {
-            "label": "Kontak Lengkap",
-            "value": contact_complete,
-            "icon": "fa-phone-alt",
-            "accent": "text-success",
-            "type": "count",
-            "description": "Supplier dengan nomor telepon tercatat.",
-        },
-        {
-            "label": "Punya Website",
-            "value": website_complete,
-            "icon": "fa-globe",
-            "accent": "text-info",
-            "type": "count",
-            "description": "Supplier yang menyediakan alamat website.",
-        },
-        {
-            "label": "Faktur Pembelian",
-            "value": purchase_count,
-            "icon": "fa-file-invoice",
-            "accent": "text-warning",
-            "type": "count",
-            "description": "Jumlah transaksi pembelian tercatat.",
-        },
-    ]
-
-    supplier_insights = [
-        {
-            "title": "Perlu nomor kontak",
-            "value": contact_missing,
-            "status": "warning" if contact_missing else "success",
-            "type": "count",
-            "description": "Lengkapi nomor telepon untuk respons cepat.",
-        },
-        {
-            "title": "Perlu email",
-            "value": email_missing,
-            "status": "info" if email_missing else "success",
-            "type": "count",
-            "description": "Email memudahkan pengiriman PO dan faktur.",
-        },
-        {
-            "title": "Memiliki website",
-            "value": website_complete,
-            "status": "success" if website_complete else "secondary",
-            "type": "count",
-            "description": "Website membantu akses katalog pemasok.",
-        },
-    ]
-
-    top_supplier = (
-        db.session.query(Supplier.name, func.count(Pembelian.id).label("jumlah"))
-        .join(Pembelian, Pembelian.supplier_id == Supplier.id)
-        .group_by(Supplier.id)
-        .order_by(func.count(Pembelian.id).desc())
-        .first()
-    )
-    if top_supplier:
-        supplier_insights.append(
-            {
-                "title": "Partner teraktif",
-                "value": top_supplier.jumlah,
-                "status": "success",
-                "type": "count",
-                "description": f"{top_supplier.name} paling sering memasok.",
-            }
-        )
-
-    supplier_payload = [
-        {
-            "id": supplier.id,
-            "name": supplier.name,
-            "address": supplier.address,
-            "phone": supplier.phone,
-            "bank_account": supplier.bank_account,
-            "account_name": supplier.account_name,
-            "contact_person": supplier.contact_person,
-            "email": supplier.email,
-            "website": supplier.website,
-        }
-        for supplier in suppliers
-    ]
-
-    recent_purchases = []
-    recent_query = (
-        Pembelian.query.order_by(Pembelian.tanggal_faktur.desc(), Pembelian.id.desc())
-        .limit(5)
-        .all()
-    )
-    for purchase in recent_query:
-        total_units = sum(item.jumlah or 0 for item in purchase.barang)
-        total_cost = sum(item.hpp or 0.0 for item in purchase.barang)
-        recent_purchases.append(
-            {
-                "no_faktur": purchase.no_faktur,
-                "tanggal": (
-                    purchase.tanggal_faktur.strftime("%d %b %Y")
-                    if purchase.tanggal_faktur
-                    else "-"
-                ),
-                "supplier": (
-                    purchase.supplier.name if purchase.supplier else "Tanpa supplier"
-                ),
-                "items": total_units,
-                "total": total_cost,
-            }
-        )
-
-    return {
-        "suppliers": suppliers,
-        "pagination": pagination,
-        "filtered_count": pagination.total,
-        "page": page,
-        "per_page": per_page,
-        "supplier_payload": supplier_payload,
-        "supplier_stat_cards": supplier_stat_cards,
-        "supplier_insights": supplier_insights,
-        "recent_purchases": recent_purchases,
-        "search_query": search_query,
-        "edit_supplier": edit_supplier,
-    }
-
-
-@bp.route("/supplier", methods=["GET", "POST"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def supplier():
-    search_query = request.args.get("search", "").strip()
-    page = request.args.get("page", 1, type=int)
-    per_page = request.args.get("per_page", 10, type=int)
-    per_page = max(5, min(per_page, 50))
-
-    if request.method == "POST":
-        # Ambil data dari formulir
-        name = request.form["name"].strip()
-        address = request.form["address"].strip()
-        phone = normalize_phone(request.form["phone"].strip())
-        bank_name = request.form.get("bank_name", "").strip()
-        bank_account = request.form["bank_account"].strip()
-        account_name = request.form["account_name"].strip()
-        contact_person = request.form["contact_person"].strip()
-        email_input = request.form.get("email", "").strip()
-        email = email_input or None
-        website = request.form["website"].strip() or None
-
-        required_fields = {
-            "Nama Supplier": name,
-            "Alamat": address,
-            "Nomor Telepon": phone,
-            "Nama Bank": bank_name,
-            "No. Rekening Bank": bank_account,
-            "Nama Rekening": account_name,
-            "Kontak Person": contact_person,
-        }
-        missing_fields = [
-            label for label, value in required_fields.items() if not value
-        ]
-        if missing_fields:
-            flash(f"Kolom berikut wajib diisi: {', '.join(missing_fields)}.", "warning")
-            return redirect(url_for("main.supplier", search=search_query, page=page))
-
-        if email:
-            existing_supplier = Supplier.query.filter_by(email=email).first()
-            if existing_supplier:
-                flash("Email supplier sudah terdaftar.", "warning")
-                return redirect(url_for("main.supplier"))
-
-        # Simpan ke database
-        new_supplier = Supplier(
-            name=name,
-            address=address,
-            phone=phone,
-            bank_name=bank_name or None,
-            bank_account=bank_account,
-            account_name=account_name,
-            contact_person=contact_person,
-            email=email,
-            website=website,
-        )
-
-        db.session.add(new_supplier)
-        db.session.commit()
-        flash("Supplier added successfully!", "success")
-        return redirect(url_for("main.supplier"))
-
-    return render_template(
-        "supplier.html",
-        **_build_supplier_page_context(
-            search_query=search_query, page=page, per_page=per_page
-        ),
-    )
-
-
-@bp.route("/supplier/edit/<int:supplier_id>", methods=["GET", "POST"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def edit_supplier(supplier_id):
-    search_query = request.args.get("search", "").strip()
-    page = request.args.get("page", 1, type=int)
-    per_page = request.args.get("per_page", 10, type=int)
-    per_page = max(5, min(per_page, 50))
-    supplier = Supplier.query.get_or_404(supplier_id)
-
-    if request.method == "POST":
-        supplier.name = request.form["name"].strip()
-        supplier.address = request.form["address"].strip()
-        supplier.phone = normalize_phone(request.form["phone"].strip())
-        supplier.bank_name = request.form.get("bank_name", "").strip() or None
-        supplier.bank_account = request.form["bank_account"].strip()
-        supplier.account_name = request.form["account_name"].strip()
-        supplier.contact_person = request.form["contact_person"].strip()
-        email_input = request.form.get("email", "").strip()
-        email = email_input or None
-        supplier.website = request.form["website"].strip() or None
-
-        required_fields = {
-            "Nama Supplier": supplier.name,
-            "Alamat": supplier.address,
-            "Nomor Telepon": supplier.phone,
-            "Nama Bank": supplier.bank_name,
-            "No. Rekening Bank": supplier.bank_account,
-            "Nama Rekening": supplier.account_name,
-            "Kontak Person": supplier.contact_person,
-        }
-        missing_fields = [
-            label for label, value in required_fields.items() if not value
-        ]
-        if missing_fields:
-            flash(f"Kolom berikut wajib diisi: {', '.join(missing_fields)}.", "warning")
-            return redirect(
-                url_for(
-                    "main.edit_supplier",
-                    supplier_id=supplier_id,
-                    search=search_query,
-                    page=page,
-                )
-            )
-
-        if email:
-            existing = Supplier.query.filter(
-                Supplier.email == email, Supplier.id != supplier.id
-            ).first()
-            if existing:
-                flash("Email supplier sudah digunakan oleh supplier lain.", "warning")
-                return redirect(url_for("main.edit_supplier", supplier_id=supplier_id))
-
-        supplier.email = email
-
-        db.session.commit()
-        flash("Supplier updated successfully!", "success")
-        return redirect(url_for("main.supplier", search=search_query, page=page))
-
-    return render_template(
-        "supplier.html",
-        **_build_supplier_page_context(
-            edit_supplier=supplier,
-            search_query=search_query,
-            page=page,
-            per_page=per_page,
-        ),
-    )
-
-
-@bp.route("/supplier/delete/<int:supplier_id>", methods=["POST"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def delete_supplier(supplier_id):
-    supplier = Supplier.query.get_or_404(supplier_id)
-    linked_products = Produk.query.filter_by(supplier_id=supplier.id).count()
-    linked_purchases = Pembelian.query.filter_by(supplier_id=supplier.id).count()
-    if linked_products or linked_purchases:
-        flash(
-            "Supplier tidak dapat dihapus karena masih dipakai pada produk atau faktur pembelian.",
-            "warning",
-        )
-        return redirect(url_for("main.supplier"))
-    db.session.delete(supplier)
-    db.session.commit()
-    flash("Supplier deleted successfully!", "success")
-    return redirect("/supplier")
-
-
-@bp.route("/expedisi", methods=["GET", "POST"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def expedisi():
-    _ensure_expedisi_volume_divisor()
-    if request.method == "POST":
-        name = request.form.get("name", "").strip()
-        phone = request.form.get("phone", "").strip()
-        address = request.form.get("address", "").strip()
-        note = request.form.get("note", "").strip()
-        volume_divisor = _parse_float_param(request.form.get("volume_divisor"))
-        if volume_divisor is None or volume_divisor <= 0:
-            volume_divisor = 6000.0
-        if not name:
-            flash("Nama expedisi wajib diisi.", "warning")
-            return redirect("/expedisi")
-        existing = Expedisi.query.filter(func.lower(Expedisi.name) == name.lower()).first()
-        if existing:
-            flash("Nama expedisi sudah terdaftar.", "warning")
-            return redirect("/expedisi")
-        new_expedisi = Expedisi(
-            name=name,
-            phone=phone or None,
-            address=address or None,
-            note=note or None,
-            volume_divisor=volume_divisor,
-        )
-        db.session.add(new_expedisi)
-        db.session.commit()
-        flash("Expedisi added successfully!", "success")
-        return redirect("/expedisi")
-
-    expedisi_list = Expedisi.query.order_by(Expedisi.name.asc()).all()
-    payment_channels = (
-        PaymentChannel.query.filter(
-            PaymentChannel.channel_type.in_(["Kartu", "Transfer", "QRIS"])
-        )
-        .order_by(PaymentChannel.channel_type.asc(), PaymentChannel.name.asc())
-        .all()
-    )
-    return render_template("data_expedisi.html", expedisi_list=expedisi_list)
-
-
-@bp.route("/expedisi/volumetrik", methods=["GET", "POST"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def expedisi_volumetrik():
-    _ensure_expedisi_volume_divisor()
-    _ensure_table(ExpedisiVolumetricItem)
-    action = (request.form.get("action") or "").strip()
-    if request.method == "POST":
-        if action == "save":
-            item_id = _parse_int_param(request.form.get("item_id"))
-            expedisi_id = _parse_int_param(request.form.get("expedisi_id"))
-            product_id = _parse_int_param(request.form.get("product_id"))
-            packaging = (request.form.get("packaging") or "").strip()
-            qty_per_pack = _parse_int_param(request.form.get("qty_per_pack")) or 1
-            length_cm = _parse_float_param(request.form.get("length_cm"))
-            width_cm = _parse_float_param(request.form.get("width_cm"))
-            height_cm = _parse_float_param(request.form.get("height_cm"))
-            actual_weight = _parse_float_param(request.form.get("actual_weight"))
-            use_volumetric = request.form.get("use_volumetric") == "1"
-            note = (request.form.get("note") or "").strip()
-
-            if not expedisi_id or not product_id or not packaging:
-                flash("Expedisi, produk, dan kemasan wajib diisi.", "warning")
-                return redirect(url_for("main.expedisi_volumetrik"))
-            if qty_per_pack <= 0:
-                flash("Qty per kemasan minimal 1.", "warning")
-                return redirect(url_for("main.expedisi_volumetrik"))
-            if not length_cm or not width_cm or not height_cm:
-                flash("Dimensi kemasan wajib diisi.", "warning")
-                return redirect(url_for("main.expedisi_volumetrik"))
-            if length_cm <= 0 or width_cm <= 0 or height_cm <= 0:
-                flash("Dimensi harus lebih dari 0.", "warning")
-                return redirect(url_for("main.expedisi_volumetrik"))
-
-            expedisi_obj = db.session.get(Expedisi, expedisi_id)
-            product_obj = db.session.get(Produk, product_id)
-            if not expedisi_obj or not product_obj:
-                flash("Expedisi atau produk tidak ditemukan.", "warning")
-                return redirect(url_for("main.expedisi_volumetrik"))
-
-            existing = ExpedisiVolumetricItem.query.filter_by(
-                expedisi_id=expedisi_id,
-                product_id=product_id,
-                packaging=packaging,
-            ).first()
-
-            if item_id:
-                item = db.session.get(ExpedisiVolumetricItem, item_id)
-                if not item:
-                    flash("Data volumetrik tidak ditemukan.", "warning")
-                    return redirect(url_for("main.expedisi_volumetrik"))
-                if existing and existing.id != item.id:
-                    flash("Kombinasi produk, expedisi, dan kemasan sudah ada.", "warning")
-                    return redirect(
-                        url_for("main.expedisi_volumetrik", edit=item.id)
-                    )
-            else:
-                if existing:
-                    item = existing
-                    flash("Data sudah ada, diperbarui otomatis.", "info")
-                else:
-                    item = ExpedisiVolumetricItem(
-                        expedisi_id=expedisi_id,
-                        product_id=product_id,
-                        packaging=packaging,
-                    )
-                    db.session.add(item)
-
-            item.expedisi_id = expedisi_id
-            item.product_id = product_id
-            item.packaging = packaging
-            item.qty_per_pack = qty_per_pack
-            item.length_cm = length_cm
-            item.width_cm = width_cm
-            item.height_cm = height_cm
-            item.actual_weight = actual_weight
-            item.use_volumetric = use_volumetric
-            item.note = note or None
-            db.session.commit()
-            flash("Data volumetrik tersimpan.", "success")
-            return redirect(url_for("main.expedisi_volumetrik"))
-
-        if action == "delete":
-            item_id = _parse_int_param(request.form.get("item_id"))
-            if not item_id:
-                flash("Data tidak ditemukan.", "warning")
-                return redirect(url_for("main.expedisi_volumetrik"))
-            item = db.session.get(ExpedisiVolumetricItem, item_id)
-            if item:
-                db.session.delete(item)
-                db.session.commit()
-                flash("Data volumetrik dihapus.", "success")
-            return redirect(url_for("main.expedisi_volumetrik"))
-
-    search = (request.args.get("q") or "").strip()
-    edit_id = _parse_int_param(request.args.get("edit"))
-    edit_item = (
-        ExpedisiVolumetricItem.query.options(
-            joinedload(ExpedisiVolumetricItem.produk),
-            joinedload(ExpedisiVolumetricItem.expedisi),
-        ).get(edit_id)
-        if edit_id
-        else None
-    )
-
-    expedisi_list = Expedisi.query.order_by(Expedisi.name.asc()).all()
-    items_query = ExpedisiVolumetricItem.query.options(
-        joinedload(ExpedisiVolumetricItem.produk),
-        joinedload(ExpedisiVolumetricItem.expedisi),
-    ).join(Expedisi, Expedisi.id == ExpedisiVolumetricItem.expedisi_id).join(
-        Produk, Produk.id == ExpedisiVolumetricItem.product_id
-    )
-    if search:
-        like = f"%{search}%"
-        items_query = items_query.filter(
-            or_(
-                Produk.nama_produk.ilike(like),
-                Produk.kode_produk.ilike(like),
-                Expedisi.name.ilike(like),
-                ExpedisiVolumetricItem.packaging.ilike(like),
-            )
-        )
-
-    items = items_query.order_by(
-        ExpedisiVolumetricItem.updated_at.desc(),
-        ExpedisiVolumetricItem.id.desc(),
-    ).all()
-
-    item_rows = []
-    for item in items:
-        factor = float(item.expedisi.volume_divisor or 0.0) if item.expedisi else 0.0
-        volume_weight = (
-            (item.length_cm * item.width_cm * item.height_cm) / factor
-            if factor > 0
-            else 0.0
-        )
-        actual_weight_value = float(item.actual_weight or 0.0)
-        chargeable = (
-            volume_weight
-            if item.use_volumetric
-            else max(actual_weight_value, volume_weight)
-        )
-        item_rows.append(
-            {
-                "id": item.id,
-                "expedisi_name": item.expedisi.name if item.expedisi else "-",
-                "expedisi_factor": factor,
-                "product_name": item.produk.nama_produk if item.produk else "-",
-                "product_code": item.produk.kode_produk if item.produk else "-",
-                "packaging": item.packaging,
-                "qty_per_pack": item.qty_per_pack,
-                "length_cm": item.length_cm,
-                "width_cm": item.width_cm,
-                "height_cm": item.height_cm,
-                "volume_weight": volume_weight,
-                "actual_weight": item.actual_weight,
-                "chargeable_weight": chargeable,
-                "use_volumetric": item.use_volumetric,
-                "note": item.note,
-            }
-        )
-
-    return render_template(
-        "expedisi_volumetrik.html",
-        expedisi_list=expedisi_list,
-        items=item_rows,
-        search_query=search,
-        edit_item=edit_item,
-    )
-
-
-@bp.route("/expedisi/edit/<int:expedisi_id>", methods=["GET", "POST"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def edit_expedisi(expedisi_id):
-    expedisi_item = Expedisi.query.get_or_404(expedisi_id)
-    if request.method == "POST":
-        name = request.form.get("name", "").strip()
-        phone = request.form.get("phone", "").strip()
-        address = request.form.get("address", "").strip()
-        note = request.form.get("note", "").strip()
-        volume_divisor = _parse_float_param(request.form.get("volume_divisor"))
-        if volume_divisor is None or volume_divisor <= 0:
-            volume_divisor = 6000.0
-        if not name:
-            flash("Nama expedisi wajib diisi.", "warning")
-            return redirect(url_for("main.edit_expedisi", expedisi_id=expedisi_id))
-        existing = Expedisi.query.filter(
-            func.lower(Expedisi.name) == name.lower(),
-            Expedisi.id != expedisi_item.id,
-        ).first()
-        if existing:
-            flash("Nama expedisi sudah digunakan.", "warning")
-            return redirect(url_for("main.edit_expedisi", expedisi_id=expedisi_id))
-        expedisi_item.name = name
-        expedisi_item.phone = phone or None
-        expedisi_item.address = address or None
-        expedisi_item.note = note or None
-        expedisi_item.volume_divisor = volume_divisor
-        db.session.commit()
-        flash("Expedisi updated successfully!", "success")
-        return redirect("/expedisi")
-
-    expedisi_list = Expedisi.query.order_by(Expedisi.name.asc()).all()
-    return render_template(
-        "data_expedisi.html",
-        expedisi_list=expedisi_list,
-        edit_expedisi=expedisi_item,
-    )
-
-
-@bp.route("/expedisi/delete/<int:expedisi_id>", methods=["POST"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def delete_expedisi(expedisi_id):
-    expedisi_item = Expedisi.query.get_or_404(expedisi_id)
-    if Penjualan.query.filter_by(expedition_id=expedisi_item.id).count():
-        flash(
-            "Tidak dapat menghapus expedisi karena masih digunakan pada transaksi.",
-            "warning",
-        )
-        return redirect("/expedisi")
-    db.session.delete(expedisi_item)
-    db.session.commit()
-    flash("Expedisi deleted successfully!", "success")
-    return redirect("/expedisi")
-
-
-@bp.route("/metode_pembayaran", methods=["GET", "POST"])
-@login_required
-@roles_required(*SALES_ROLES)
-def metode_pembayaran():
-    if request.method == "POST":
-        name = request.form.get("name", "").strip()
-        channel_type = request.form.get("channel_type", "Kartu").strip()
-        note = request.form.get("note", "").strip()
-        if not name:
-            flash("Nama metode pembayaran wajib diisi.", "warning")
-            return redirect("/metode_pembayaran")
-        if channel_type not in {"Kartu", "Tunai", "Tempo", "Transfer", "QRIS"}:
-            flash("Jenis metode pembayaran tidak valid.", "warning")
-            return redirect("/metode_pembayaran")
-        existing = PaymentChannel.query.filter(
-            func.lower(PaymentChannel.name) == name.lower()
-        ).first()
-        if existing:
-            flash("Nama metode pembayaran sudah terdaftar.", "warning")
-            return redirect("/metode_pembayaran")
-        new_channel = PaymentChannel(
-            name=name,
-            channel_type=channel_type,
-            note=note or None,
-        )
-        db.session.add(new_channel)
-        db.session.commit()
-        flash("Metode pembayaran added successfully!", "success")
-        return redirect("/metode_pembayaran")
-
-    channels = PaymentChannel.query.order_by(
-        PaymentChannel.channel_type.asc(), PaymentChannel.name.asc()
-    ).all()
-    return render_template("data_metode_pembayaran.html", channels=channels)
-
-
-@bp.route("/metode_pembayaran/edit/<int:channel_id>", methods=["GET", "POST"])
-@login_required
-@roles_required(*SALES_ROLES)
-def edit_metode_pembayaran(channel_id):
-    channel = PaymentChannel.query.get_or_404(channel_id)
-    if request.method == "POST":
-        name = request.form.get("name", "").strip()
-        channel_type = request.form.get("channel_type", "Kartu").strip()
-        note = request.form.get("note", "").strip()
-        if not name:
-            flash("Nama metode pembayaran wajib diisi.", "warning")
-            return redirect(url_for("main.edit_metode_pembayaran", channel_id=channel_id))
-        if channel_type not in {"Kartu", "Tunai", "Tempo", "Transfer", "QRIS"}:
-            flash("Jenis metode pembayaran tidak valid.", "warning")
-            return redirect(url_for("main.edit_metode_pembayaran", channel_id=channel_id))
-        existing = PaymentChannel.query.filter(
-            func.lower(PaymentChannel.name) == name.lower(),
-            PaymentChannel.id != channel.id,
-        ).first()
-        if existing:
-            flash("Nama metode pembayaran sudah digunakan.", "warning")
-            return redirect(url_for("main.edit_metode_pembayaran", channel_id=channel_id))
-        channel.name = name
-        channel.channel_type = channel_type
-        channel.note = note or None
-        db.session.commit()
-        flash("Metode pembayaran updated successfully!", "success")
-        return redirect("/metode_pembayaran")
-
-    channels = PaymentChannel.query.order_by(
-        PaymentChannel.channel_type.asc(), PaymentChannel.name.asc()
-    ).all()
-    return render_template(
-        "data_metode_pembayaran.html",
-        channels=channels,
-        edit_channel=channel,
-    )
-
-
-@bp.route("/metode_pembayaran/delete/<int:channel_id>", methods=["POST"])
-@login_required
-@roles_required(*SALES_ROLES)
-def delete_metode_pembayaran(channel_id):
-    channel = PaymentChannel.query.get_or_404(channel_id)
-    if Penjualan.query.filter_by(payment_channel_id=channel.id).count():
-        flash(
-            "Metode pembayaran tidak dapat dihapus karena sudah digunakan pada transaksi.",
-            "warning",
-        )
-        return redirect("/metode_pembayaran")
-    db.session.delete(channel)
-    db.session.commit()
-    flash("Metode pembayaran deleted successfully!", "success")
-    return redirect("/metode_pembayaran")
-
-
-@bp.route("/supplier/<int:supplier_id>", methods=["GET"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def supplier_detail(supplier_id):
-    supplier = Supplier.query.get_or_404(supplier_id)
-    return render_template("supplier_detail.html", supplier=supplier)
-
-
-def _supplier_report_query(search_query):
-    base_query = Supplier.query.order_by(Supplier.name.asc())
-    if search_query:
-        like = f"%{search_query}%"
-        filters = [
-            Supplier.name.ilike(like),
-            Supplier.contact_person.ilike(like),
-            Supplier.phone.ilike(like),
-            Supplier.email.ilike(like),
-            Supplier.bank_account.ilike(like),
-            Supplier.bank_name.ilike(like),
-            Supplier.account_name.ilike(like),
-            Supplier.address.ilike(like),
-            Supplier.website.ilike(like),
-        ]
-        if search_query.isdigit():
-            filters.append(Supplier.id == int(search_query))
-        base_query = base_query.filter(or_(*filters))
-    return base_query
-
-
-@bp.route("/supplier/export", methods=["GET"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def export_suppliers():
-    suppliers = Supplier.query.all()
-
-    def _normalize_phone(value):
-        return normalize_phone(value)
-
-    # Data untuk Excel
-    data = [
-        {
-            "ID Supplier": supplier.id,
-            "Nama Supplier": supplier.name,
-            "Alamat": supplier.address,
-            "No Telp": _normalize_phone(supplier.phone),
-            "Nama Bank": supplier.bank_name or "",
-            "No Rekening Bank": supplier.bank_account,
-            "Nama Rekening": supplier.account_name,
-            "Kontak Person": supplier.contact_person,
-            "Email": supplier.email,
-            "Website": supplier.website,
-        }
-        for supplier in suppliers
-    ]
-
-    # Buat DataFrame pandas
-    df = pd.DataFrame(data)
-
-    # Simpan ke file Excel di memori
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        df.to_excel(writer, index=False)
-    output.seek(0)
-
-    # Buat respons Flask
-    response = make_response(output.read())
-    response.headers["Content-Disposition"] = "attachment; filename=suppliers.xlsx"
-    response.headers["Content-Type"] = (
-        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
-    return response
-
-
-@bp.route("/laporan/supplier", methods=["GET"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def laporan_supplier():
-    search_query = (request.args.get("search") or "").strip()
-    suppliers = _supplier_report_query(search_query).all()
-    total = Supplier.query.count()
-    return render_template(
-        "laporan_supplier.html",
-        suppliers=suppliers,
-        total=total,
-        search_query=search_query,
-    )
-
-
-@bp.route("/laporan/supplier/preview", methods=["GET"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def laporan_supplier_preview():
-    search_query = (request.args.get("search") or "").strip()
-    suppliers = _supplier_report_query(search_query).all()
-    total = Supplier.query.count()
-    return render_template(
-        "laporan_supplier_preview.html",
-        suppliers=suppliers,
-        total=total,
-        filtered_total=len(suppliers),
-        search_query=search_query,
-        printed_at=local_now(),
-        company_profile=_get_company_profile(),
-    )
-
-
-@bp.route("/laporan/supplier/export", methods=["GET"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def laporan_supplier_export():
-    search_query = (request.args.get("search") or "").strip()
-    suppliers = _supplier_report_query(search_query).all()
-
-    data = [
-        {
-            "ID Supplier": supplier.id,
-            "Nama Supplier": supplier.name,
-            "Alamat": supplier.address,
-            "No Telp": normalize_phone(supplier.phone),
-            "Nama Bank": supplier.bank_name or "",
-            "No Rekening Bank": supplier.bank_account,
-            "Nama Rekening": supplier.account_name,
-            "Kontak Person": supplier.contact_person,
-            "Email": supplier.email,
-            "Website": supplier.website,
-        }
-        for supplier in suppliers
-    ]
-
-    df = pd.DataFrame(data)
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        df.to_excel(writer, index=False)
-    output.seek(0)
-
-    response = make_response(output.read())
-    response.headers["Content-Disposition"] = "attachment; filename=laporan_supplier.xlsx"
-    response.headers["Content-Type"] = (
-        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
-    return response
-
-
-@bp.route("/supplier/import", methods=["POST"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def import_suppliers():
-    if "file" not in request.files:
-        flash("No file uploaded!", "danger")
-        return redirect("/supplier")
-
-    file = request.files["file"]
-
-    if file.filename == "":
-        flash("No selected file!", "danger")
-        return redirect("/supplier")
-
-    # Baca file Excel menggunakan pandas
-    try:
-        df = pd.read_excel(file)
-    except Exception as e:
-        flash(f"Error reading file: {e}", "danger")
-        return redirect("/supplier")
-
-    # Validasi kolom yang diperlukan
-    required_columns = ["Nama Supplier", "Alamat"]
-    missing_columns = [column for column in required_columns if column not in df.columns]
-    if missing_columns:
-        flash(
-            "Invalid file format! Missing required columns: "
-            + ", ".join(missing_columns),
-            "danger",
-        )
-        return redirect("/supplier")
-
-    # Simpan data ke database
-    def _clean_cell(value):
-        if pd.isna(value):
-            return ""
-        return str(value).strip()
-
-    def _normalize_phone(value):
-        value = (value or "").strip()
-        if not value:
-            return ""
-        if re.fullmatch(r"\d+\.0+", value):
-            value = value.split(".", 1)[0]
-        digits = re.sub(r"\D", "", value)
-        if digits.startswith("62"):
-            digits = digits[2:]
-        if not digits.startswith("0"):
-            digits = "0" + digits
-        return digits
-
-    def _normalize_bank_account(value):
-        value = (value or "").strip()
-        if not value:
-            return ""
-        if re.fullmatch(r"\d+\.0+", value):
-            value = value.split(".", 1)[0]
-        digits = re.sub(r"\D", "", value)
-        return digits.lstrip("0") or digits
-
-    created_count = 0
-    updated_count = 0
-    skipped = 0
-    existing_bank_map = {}
-    for s in Supplier.query.all():
-        key = _normalize_bank_account(s.bank_account)
-        if key:
-            existing_bank_map.setdefault(key, s)
-
-    for _, row in df.iterrows():
-        name = _clean_cell(row.get("Nama Supplier", ""))
-        address = _clean_cell(row.get("Alamat", ""))
-        phone_raw = _clean_cell(row.get("No Telp", ""))
-        phone = _normalize_phone(phone_raw)
-        bank_name = _clean_cell(row.get("Nama Bank", row.get("Bank", "")))
-        bank_account = _clean_cell(
-            row.get("No Rekening Bank", row.get("No Rekening", ""))
-        )
-        bank_account_key = _normalize_bank_account(bank_account)
-        account_name = _clean_cell(row.get("Nama Rekening", ""))
-        contact_person = _clean_cell(row.get("Kontak Person", ""))
-        email_value = _clean_cell(row.get("Email", ""))
-        website_value = _clean_cell(row.get("Website", "")) or None
-        email = email_value or None
-        phone_key = _normalize_phone(phone_raw)
-
-        if not name or not address:
-            flash(
-                f'Data supplier "{name or "-"}" tidak lengkap dan dilewati.', "warning"
-            )
-            continue
-
-        existing = None
-        candidate_queries = []
-        if bank_account_key and bank_account_key in existing_bank_map:
-            existing = existing_bank_map[bank_account_key]
-        if not existing and bank_account:
-            candidate_queries.append(Supplier.query.filter_by(bank_account=bank_account))
-        if email:
-            candidate_queries.append(Supplier.query.filter_by(email=email))
-        if phone_key:
-            candidate_queries.append(Supplier.query.filter(Supplier.phone.in_([phone_key, phone_raw])))
-        if name:
-            candidate_queries.append(Supplier.query.filter(func.lower(Supplier.name) == name.lower()))
-
-        for q in candidate_queries:
-            if existing:
-                break
-            existing = q.first()
-
-        if existing:
-            existing.name = name or existing.name
-            existing.address = address or existing.address
-            existing.phone = phone_key or existing.phone
-            existing.bank_name = bank_name or existing.bank_name
-            existing.bank_account = bank_account or existing.bank_account
-            existing.account_name = account_name or existing.account_name
-            existing.contact_person = contact_person or existing.contact_person
-            existing.email = email or existing.email
-            existing.website = website_value or existing.website
-            updated_count += 1
-            if bank_account_key:
-                existing_bank_map[bank_account_key] = existing
-            continue
-
-        supplier = Supplier(
-            name=name,
-            address=address,
-            phone=phone_key,
-            bank_name=bank_name,
-            bank_account=bank_account,
-            account_name=account_name,
-            contact_person=contact_person,
-            email=email,
-            website=website_value,
-        )
-        db.session.add(supplier)
-        if bank_account_key:
-            existing_bank_map[bank_account_key] = supplier
-        created_count += 1
-
-    db.session.commit()
-    message_parts = []
-    if created_count:
-        message_parts.append(f"{created_count} supplier baru")
-    if updated_count:
-        message_parts.append(f"{updated_count} supplier diupdate")
-    summary = ", ".join(message_parts) if message_parts else "Tidak ada perubahan"
-    flash(f"Import supplier selesai: {summary}.", "success")
-    return redirect("/supplier")
-
-
-# Route to fetch supplier data
-@bp.route("/api/suppliers", methods=["GET"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def get_suppliers():
-    try:
-        kategori_id = request.args.get("kategori_id", type=int)
-        search_term = (request.args.get("q") or "").strip().lower()
-        limit = request.args.get("limit", type=int) or 10
-        limit = max(1, min(limit, 30))
-
-        query = Supplier.query
-        if kategori_id:
-            query = (
-                query.join(Produk, Produk.supplier_id == Supplier.id)
-                .filter(Produk.kategori_id == kategori_id)
-                .distinct()
-            )
-        if search_term:
-            like = f"%{search_term}%"
-            query = query.filter(
-                or_(
-                    func.lower(Supplier.name).like(like),
-                    func.lower(Supplier.contact_person).like(like),
-                    func.lower(Supplier.phone).like(like),
-                    func.lower(Supplier.email).like(like),
-                )
-            )
-        suppliers = query.order_by(Supplier.name.asc()).limit(limit).all()
-        suppliers_data = [
-            {
-                "id": supplier.id,
-                "name": supplier.name,
-                "contact_person": supplier.contact_person,
-                "phone": supplier.phone,
-                "email": supplier.email,
-                "address": supplier.address,
-                "website": supplier.website,
-                "bank_name": supplier.bank_name,
-                "bank_account": supplier.bank_account,
-            }
-            for supplier in suppliers
-        ]
-        return jsonify({"suppliers": suppliers_data}), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-
-
-@bp.route("/satuan", methods=["GET", "POST"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def satuan():
-    if request.method == "POST":
-        # Ambil data dari formulir
-        name = request.form["satuan"]
-
-        # Simpan ke database
-        new_satuan = Satuan(name=name)
-        db.session.add(new_satuan)
-        db.session.commit()
-        flash("Satuan added successfully!", "success")
-        return redirect("/satuan")
-
-    # Ambil semua data satuan untuk ditampilkan
-    satuans = Satuan.query.all()
-    return render_template("data_satuan.html", satuans=satuans)
-
-
-@bp.route("/satuan/edit/<int:satuan_id>", methods=["GET", "POST"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def edit_satuan(satuan_id):
-    satuan = Satuan.query.get_or_404(satuan_id)
-
-    if request.method == "POST":
-        # Ambil data dari formulir dan perbarui database
-        satuan.name = request.form["satuan"]
-        db.session.commit()
-        flash("Satuan updated successfully!", "success")
-        return redirect("/satuan")
-
-    # Kirim data satuan ke template untuk diisi di formulir
-    satuans = Satuan.query.all()
-    return render_template("data_satuan.html", edit_satuan=satuan, satuans=satuans)
-
-
-@bp.route("/satuan/delete/<int:satuan_id>", methods=["POST"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def delete_satuan(satuan_id):
-    satuan = Satuan.query.get_or_404(satuan_id)
-    if Produk.query.filter_by(satuan_id=satuan.id).count():
-        flash(
-            "Tidak dapat menghapus satuan karena masih digunakan oleh produk.",
-            "warning",
-        )
-        return redirect(url_for("main.satuan"))
-    db.session.delete(satuan)
-    db.session.commit()
-    flash("Satuan deleted successfully!", "success")
-    return redirect("/satuan")
-
-
-@bp.route("/kategori", methods=["GET", "POST"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def kategori():
-    if request.method == "POST":
-        # Ambil data dari formulir
-        name = request.form["kategori"]
-
-        # Simpan ke database
-        new_kategori = Kategori(name=name)
-        db.session.add(new_kategori)
-        db.session.commit()
-        flash("Kategori added successfully!", "success")
-        return redirect("/kategori")
-
-    # Ambil semua data kategori untuk ditampilkan
-    kategoris = Kategori.query.all()
-    return render_template("data_kategori.html", kategoris=kategoris)
-
-
-@bp.route("/kategori/edit/<int:kategori_id>", methods=["GET", "POST"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def edit_kategori(kategori_id):
-    kategori = Kategori.query.get_or_404(kategori_id)
-
-    if request.method == "POST":
-        # Ambil data dari formulir dan perbarui di database
-        kategori.name = request.form["kategori"]
-        db.session.commit()
-        flash("Kategori updated successfully!", "success")
-        return redirect("/kategori")
-
-    # Kirim data kategori yang akan diedit ke template
-    kategoris = Kategori.query.all()
-    return render_template(
-        "data_kategori.html", edit_kategori=kategori, kategoris=kategoris
-    )
-
-
-@bp.route("/kategori/delete/<int:kategori_id>", methods=["POST"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def delete_kategori(kategori_id):
-    kategori = Kategori.query.get_or_404(kategori_id)
-    if Produk.query.filter_by(kategori_id=kategori.id).count():
-        flash(
-            "Tidak dapat menghapus kategori karena masih digunakan oleh produk.",
-            "warning",
-        )
-        return redirect(url_for("main.kategori"))
-    db.session.delete(kategori)
-    db.session.commit()
-    flash("Kategori deleted successfully!", "success")
-    return redirect("/kategori")
-
-
-@bp.route("/produk", methods=["GET", "POST"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def produk():
-    satuans = Satuan.query.all()
-    kategoris = Kategori.query.all()
-    suppliers = Supplier.query.all()
-    price_levels = PriceLevel.query.order_by(PriceLevel.name.asc()).all()
-    price_level_lookup = {level.id: level for level in price_levels}
-
-    # Ambil parameter pencarian dan filter
-    search_query = request.args.get("search", "").strip()
-    kategori_filter = request.args.get("kategori", "").strip()
-    supplier_filter = request.args.get("supplier", "").strip()
-
-    # Jika pengguna mengklik tombol edit
-    produk_id = request.args.get("edit")
-    produk_to_edit = db.session.get(Produk, produk_id) if produk_id else None
-
-    def _parse_float(value, default=None):
-        if value is None:
-            return default
-        try:
-            value = str(value).strip()
-            if not value:
-                return default
-            return float(value)
-        except (TypeError, ValueError):
-            return default
-
-    def _parse_int(value, default=None):
-        if value is None:
-            return default
-        try:
-            value = str(value).strip()
-            if not value:
-                return default
-            return int(value)
-        except (TypeError, ValueError):
-            return default
-
-    def _parse_date(value):
-        if not value:
-            return None
-        try:
-            return datetime.strptime(value, "%Y-%m-%d").date()
-        except (TypeError, ValueError):
-            return None
-
-    def _shape_price_levels_for_prefill(entries):
-        shaped = []
-        for entry in entries or []:
-            try:
-                level_id = int(entry.get("level_id"))
-            except (TypeError, ValueError):
-                continue
-            level = price_level_lookup.get(level_id)
-            shaped.append(
-                {
-                    "level_id": level_id,
-                    "level_name": level.name if level else "",
-                    "price": entry.get("price", 0),
-                }
-            )
-        return shaped
-
-    def _store_prefill(form_data, normalized_price_entries=None, focus_field=None):
-        snapshot = {
-            "kode_produk": (form_data.get("kode_produk") or "").strip(),
-            "sku": (form_data.get("sku") or "").strip(),
-            "barcode": (form_data.get("barcode") or "").strip(),
-            "nama_produk": (form_data.get("nama_produk") or "").strip(),
-            "satuan": (form_data.get("satuan") or "").strip(),
-            "kategori": (form_data.get("kategori") or "").strip(),
-            "supplier": (form_data.get("supplier") or "").strip(),
-            "berat": (form_data.get("berat") or "").strip(),
-            "stok_minimal": (form_data.get("stok_minimal") or "").strip(),
-            "tanggal_expired": (form_data.get("tanggal_expired") or "").strip(),
-            "price_levels": _shape_price_levels_for_prefill(
-                normalized_price_entries or []
-            ),
-        }
-        session["produk_form_prefill"] = {
-            "snapshot": snapshot,
-            "focus_field": focus_field,
-        }
-
-    if request.method == "POST":
-        if not produk_to_edit:
-            produk_id_form = request.form.get("produk_id")
-            if produk_id_form:
-                produk_to_edit = db.session.get(Produk, produk_id_form)
-
-        redirect_target = (
-            url_for("main.produk", edit=produk_to_edit.id)
-            if produk_to_edit
-            else url_for("main.produk")
-        )
-
-        kode_produk = request.form.get("kode_produk", "").strip()
-        nama_produk = request.form.get("nama_produk", "").strip()
-        satuan_id = _parse_int(request.form.get("satuan"))
-        kategori_id = _parse_int(request.form.get("kategori"))
-        supplier_id = _parse_int(request.form.get("supplier"))
-        sku = request.form.get("sku", "").strip() or None
-        barcode = request.form.get("barcode", "").strip() or None
-        berat = _parse_float(request.form.get("berat"))
-        stok_minimal = _parse_int(request.form.get("stok_minimal"), default=0)
-        tanggal_expired = _parse_date(request.form.get("tanggal_expired"))
-        raw_price_payload = (request.form.get("price_level_payload") or "").strip()
-        price_level_payload = []
-
-        if raw_price_payload:
-            try:
-                parsed_payload = json.loads(raw_price_payload)
-            except (TypeError, ValueError):
-                _store_prefill(
-                    request.form,
-                    normalized_price_entries=[],
-                    focus_field="kode_produk",
-                )
-                flash(
-                    "Format level harga tidak valid. Muat ulang halaman lalu coba lagi.",
-                    "danger",
-                )
-                return redirect(redirect_target)
-            if isinstance(parsed_payload, list):
-                price_level_payload = parsed_payload
-            else:
-                _store_prefill(
-                    request.form,
-                    normalized_price_entries=[],
-                    focus_field="kode_produk",
-                )
-                flash("Format level harga tidak dikenali.", "danger")
-                return redirect(redirect_target)
-
-        if not price_levels:
-            _store_prefill(
-                request.form,
-                normalized_price_entries=[],
-                focus_field="kode_produk",
-            )
-            flash(
-                "Belum ada level harga. Buat level terlebih dahulu di menu Level Harga.",
-                "warning",
-            )
-            return redirect(redirect_target)
-
-        normalized_price_entries = _build_price_level_entries(
-            price_level_payload, price_level_lookup
-        )
-
-        if not normalized_price_entries:
-            _store_prefill(
-                request.form,
-                normalized_price_entries=[],
-                focus_field="price_level_value",
-            )
-            flash(
-                "Tambahkan minimal satu level harga dengan nilai rupiah yang valid.",
-                "warning",
-            )
-            return redirect(redirect_target)
-
-        retail_level = next(
-            (
-                level
-                for level in price_levels
-                if (level.name or "").strip().lower() == "retail"
-            ),
-            None,
-        )
-
-        if retail_level and not any(
-            entry["level_id"] == retail_level.id for entry in normalized_price_entries
-        ):
-            _store_prefill(
-                request.form,
-                normalized_price_entries=normalized_price_entries,
-                focus_field="price_level_value",
-            )
-            flash(
-                "Isi harga untuk level Retail agar dapat menjadi harga default kasir.",
-                "warning",
-            )
-            return redirect(redirect_target)
-
-        if (
-            not kode_produk
-            or not nama_produk
-            or not satuan_id
-            or not kategori_id
-            or not supplier_id
-        ):
-            missing_field = None
-            for field_name, value in [
-                ("kode_produk", kode_produk),
-                ("nama_produk", nama_produk),
-                ("satuan", satuan_id),
-                ("kategori", kategori_id),
-                ("supplier", supplier_id),
-            ]:
-                if not value:
-                    missing_field = field_name
-                    break
-            _store_prefill(
-                request.form,
-                normalized_price_entries=normalized_price_entries,
-                focus_field=missing_field or "kode_produk",
-            )
-            flash("Pastikan semua field wajib diisi.", "warning")
-            return redirect(url_for("main.produk"))
-
-        try:
-            if produk_to_edit:
-                existing = Produk.query.filter(
-                    Produk.kode_produk == kode_produk, Produk.id != produk_to_edit.id
-                ).first()
-                if existing:
-                    _store_prefill(
-                        request.form,
-                        normalized_price_entries=normalized_price_entries,
-                        focus_field="kode_produk",
-                    )
-                    flash(f"Kode produk {kode_produk} sudah digunakan.", "warning")
-                    return redirect(url_for("main.produk", edit=produk_to_edit.id))
-
-                produk_to_edit.kode_produk = kode_produk
-                produk_to_edit.sku = sku
-                produk_to_edit.barcode = barcode
-                produk_to_edit.nama_produk = nama_produk
-                produk_to_edit.satuan_id = satuan_id
-                produk_to_edit.kategori_id = kategori_id
-                produk_to_edit.supplier_id = supplier_id
-                produk_to_edit.berat = berat
-                produk_to_edit.stok_minimal = stok_minimal or 0
-                produk_to_edit.tanggal_expired = tanggal_expired
-                _sync_product_price_levels(
-                    produk_to_edit,
-                    price_level_payload,
-                    price_level_lookup,
-                    normalized_entries=normalized_price_entries,
-                )
-                db.session.commit()
-                session.pop("produk_form_prefill", None)
-                flash("Produk updated successfully!", "success")
-            else:
-                existing = Produk.query.filter_by(kode_produk=kode_produk).first()
-                if existing:
-                    _store_prefill(
-                        request.form,
-                        normalized_price_entries=normalized_price_entries,
-                        focus_field="kode_produk",
-                    )
-                    flash(f"Kode produk {kode_produk} sudah digunakan.", "warning")
-                    return redirect(url_for("main.produk"))
-
-                new_produk = Produk(
-                    kode_produk=kode_produk,
-                    sku=sku,
-                    barcode=barcode,
-                    nama_produk=nama_produk,
-                    satuan_id=satuan_id,
-                    kategori_id=kategori_id,
-                    supplier_id=supplier_id,
-                    berat=berat,
-                    stok_minimal=stok_minimal or 0,
-                    tanggal_expired=tanggal_expired,
-                )
-                db.session.add(new_produk)
-                db.session.flush()
-                _sync_product_price_levels(
-                    new_produk,
-                    price_level_payload,
-                    price_level_lookup,
-                    normalized_entries=normalized_price_entries,
-                )
-                db.session.commit()
-                session.pop("produk_form_prefill", None)
-                flash("Produk added successfully!", "success")
-
-        except IntegrityError as exc:
-            db.session.rollback()
-            _store_prefill(
-                request.form,
-                normalized_price_entries=normalized_price_entries,
-                focus_field="kode_produk",
-            )
-            flash(f"Gagal menyimpan produk: {str(exc.orig)}", "danger")
-        except Exception as exc:
-            db.session.rollback()
-            logging.exception("Gagal menyimpan produk")
-            _store_prefill(
-                request.form,
-                normalized_price_entries=normalized_price_entries,
-                focus_field="kode_produk",
-            )
-            flash(f"Error: {str(exc)}", "danger")
-
-        return redirect("/produk")
-
-    # Logika pencarian dan filter
-    query = Produk.query
-    if search_query:
-        query = query.filter(
-            or_(
-                Produk.nama_produk.ilike(f"%{search_query}%"),
-                Produk.kode_produk.ilike(f"%{search_query}%"),
-                Produk.sku.ilike(f"%{search_query}%"),
-                Produk.barcode.ilike(f"%{search_query}%"),
-            )
-        )
-    if kategori_filter:
-        query = query.filter(Produk.kategori_id == kategori_filter)
-    if supplier_filter:
-        query = query.filter(Produk.supplier_id == supplier_filter)
-
-    page = request.args.get("page", 1, type=int)
-    per_page = request.args.get("per_page", 10, type=int)
-    per_page = max(5, min(per_page, 50))
-
-    base_query = (
-        query.options(
-            joinedload(Produk.satuan),
-            joinedload(Produk.kategori),
-            joinedload(Produk.supplier),
-        )
-        .order_by(Produk.nama_produk.asc())
-    )
-    pagination = base_query.paginate(page=page, per_page=per_page, error_out=False)
-    produks = pagination.items
-
-    product_ids = [produk.id for produk in produks]
-    product_price_levels_map = defaultdict(list)
-    if product_ids:
-        level_rows = (
-            ProductPriceLevel.query.options(
-                joinedload(ProductPriceLevel.level)
-            )
-            .join(PriceLevel)
-            .filter(ProductPriceLevel.product_id.in_(product_ids))
-            .order_by(PriceLevel.name.asc())
-            .all()
-        )
-        for row in level_rows:
-            product_price_levels_map[row.product_id].append(
-                {
-                    "level_id": row.level_id,
-                    "level_name": row.level.name if row.level else "Level",
-                    "price": row.price,
-                }
-            )
-
-    product_price_levels = {
-        product_id: sorted(
-            entries,
-            key=lambda item: (item["level_name"] or "").lower(),
-        )
-        for product_id, entries in product_price_levels_map.items()
-    }
-    price_updates = {}
-    if product_ids:
-        try:
-            _ensure_table(PriceChange)
-            latest_changes = (
-                PriceChange.query.filter(PriceChange.product_id.in_(product_ids))
-                .order_by(PriceChange.product_id.asc(), PriceChange.created_at.desc())
-                .all()
-            )
-            for change in latest_changes:
-                if change.product_id not in price_updates:
-                    price_updates[change.product_id] = {
-                        "new_price": change.new_price,
-                        "updated_at": change.created_at,
-                        "user": change.user.username if change.user else None,
-                    }
-        except Exception:
-            price_updates = {}
-
-    total_produk = pagination.total
-    total_kategori = len(kategoris)
-    total_suppliers = len(suppliers)
-    stok_threshold_missing = Produk.query.filter(
-        or_(Produk.stok_minimal.is_(None), Produk.stok_minimal <= 0)
-    ).count()
-    expiry_tracked = Produk.query.filter(Produk.tanggal_expired.isnot(None)).count()
-    no_barcode = Produk.query.filter(
-        or_(Produk.barcode.is_(None), Produk.barcode == "")
-    ).count()
-
-    prefill_state = session.pop("produk_form_prefill", None)
-    prefill_data = (prefill_state or {}).get("snapshot")
-    focus_field = (prefill_state or {}).get("focus_field")
-
-    edit_price_levels = []
-    if prefill_data and prefill_data.get("price_levels"):
-        edit_price_levels = prefill_data.get("price_levels") or []
-    elif produk_to_edit:
-        edit_price_levels = [
-            {
-                "level_id": entry.level_id,
-                "level_name": entry.level.name if entry.level else "",
-                "price": entry.price,
-            }
-            for entry in sorted(
-                produk_to_edit.level_prices,
-                key=lambda record: (
-                    (record.level.name or "").lower() if record.level else ""
-                ),
-            )
-        ]
-
-    stat_cards = [
-        {
-            "label": "Produk Aktif",
-            "value": total_produk,
-            "icon": "fa-box-open",
-            "accent": "text-primary",
-            "description": "Item tersedia di katalog",
-        },
-        {
-            "label": "Kategori",
-            "value": total_kategori,
-            "icon": "fa-tags",
-            "accent": "text-success",
-            "description": "Kelompok produk yang digunakan",
-        },
-        {
-            "label": "Supplier Terhubung",
-            "value": total_suppliers,
-            "icon": "fa-truck",
-            "accent": "text-warning",
-            "description": "Relasi pemasok tersimpan",
-        },
-        {
-            "label": "Kadaluarsa Dipantau",
-            "value": expiry_tracked,
-            "icon": "fa-hourglass-half",
-            "accent": "text-danger",
-            "description": "Produk memiliki tanggal expired",
-        },
-    ]
-
-    health_insights = [
-        {
-            "title": "Butuh target stok",
-            "value": stok_threshold_missing,
-            "status": "warning" if stok_threshold_missing else "success",
-            "description": "Produk belum memiliki batas stok minimal. Atur angka untuk menghindari kehabisan.",
-        },
-        {
-            "title": "Belum ada barcode",
-            "value": no_barcode,
-            "status": "info" if no_barcode else "success",
-            "description": "Lengkapi barcode agar proses penjualan kasir lebih cepat.",
-        },
-        {
-            "title": "Tanggal expired tercatat",
-            "value": expiry_tracked,
-            "status": "success" if expiry_tracked else "secondary",
-            "description": "Pantau masa kadaluarsa barang sensitif dan atur promo lebih awal.",
-        },
-    ]
-
-    expiring_products = (
-        Produk.query.filter(Produk.tanggal_expired.isnot(None))
-        .order_by(Produk.tanggal_expired.asc())
-        .limit(5)
-        .all()
-    )
-
-    product_import_schema = [
-        {
-            "column": "Kode Produk",
-            "required": True,
-            "description": "Kode unik setiap barang (maks. 50 karakter).",
-        },
-        {"column": "SKU", "required": False, "description": "Kode internal opsional."},
-        {
-            "column": "Nama Produk",
-            "required": True,
-            "description": "Nama barang sesuai katalog.",
-        },
-        {
-            "column": "Satuan ID",
-            "required": True,
-            "description": "ID dari master Data Satuan.",
-        },
-        {
-            "column": "Kategori ID",
-            "required": True,
-            "description": "ID dari master Data Kategori.",
-        },
-        {
-            "column": "Supplier ID",
-            "required": True,
-            "description": "ID pemasok terkait.",
-        },
-        {
-            "column": "Berat",
-            "required": False,
-            "description": "Dalam kilogram, gunakan titik untuk desimal.",
-        },
-        {
-            "column": "Stok Minimal",
-            "required": False,
-            "description": "Batas stok untuk peringatan restock.",
-        },
-        {
-            "column": "Tanggal Expired",
-            "required": False,
-            "description": "Format YYYY-MM-DD, kosongkan jika tidak perlu.",
-        },
-    ]
-
-    price_levels_context = [
-        {"id": level.id, "name": level.name or "", "description": level.description or ""}
-        for level in price_levels
-    ]
-
-    pagination_args = {
-        key: value
-        for key, value in request.args.to_dict().items()
-        if key not in {"page", "ajax"}
-    }
-    if request.args.get("ajax") == "1":
-        return render_template(
-            "partials/product_table.html",
-            produks=produks,
-            pagination=pagination,
-            pagination_args=pagination_args,
-            price_updates=price_updates,
-            product_price_levels=product_price_levels,
-        )
-
-    return render_template(
-        "data_produk.html",
-        produks=produks,
-        satuans=satuans,
-        kategoris=kategoris,
-        suppliers=suppliers,
-        price_levels=price_levels,
-        price_levels_context=price_levels_context,
-        stat_cards=stat_cards,
-        health_insights=health_insights,
-        expiring_products=expiring_products,
-        edit_produk=produk_to_edit,
-        edit_price_levels=edit_price_levels,
-        product_price_levels=product_price_levels,
-        product_import_schema=product_import_schema,
-        price_updates=price_updates,
-        pagination=pagination,
-        page=page,
-        per_page=per_page,
-        pagination_args=pagination_args,
-        prefill_data=prefill_data,
-        focus_field=focus_field,
-    )
-
-
-@bp.route("/produk/<int:produk_id>/json", methods=["GET"])
-@login_required
-@roles_required(*ALL_ROLE_CHOICES)
-def produk_data(produk_id):
-    produk = (
-        Produk.query.options(
-            joinedload(Produk.satuan),
-            joinedload(Produk.kategori),
-            joinedload(Produk.supplier),
-            joinedload(Produk.level_prices).joinedload(ProductPriceLevel.level),
-        )
-        .get_or_404(produk_id)
-    )
-
-    def _format_price_entries(entries):
-        sorted_entries = sorted(
-            entries,
-            key=lambda record: (
-                (record.level.name or "").lower() if record.level else ""
-            ),
-        )
-        result = []
-        for entry in sorted_entries:
-            result.append(
-                {
-                    "level_id": entry.level_id,
-                    "level_name": (entry.level.name if entry.level else ""),
-                    "price": float(entry.price or 0),
-                }
-            )
-        return result
-
-    payload = {
-        "id": produk.id,
-        "kode_produk": produk.kode_produk,
-        "sku": produk.sku,
-        "barcode": produk.barcode,
-        "nama_produk": produk.nama_produk,
-        "satuan_id": produk.satuan_id,
-        "kategori_id": produk.kategori_id,
-        "supplier_id": produk.supplier_id,
-        "berat": float(produk.berat) if produk.berat is not None else None,
-        "stok_minimal": produk.stok_minimal,
-        "tanggal_expired": produk.tanggal_expired.strftime("%Y-%m-%d")
-        if produk.tanggal_expired
-        else None,
-        "price_levels": _format_price_entries(produk.level_prices),
-    }
-    return jsonify(payload)
-
-
-@bp.route("/produk/check-code", methods=["GET"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def check_produk_code():
-    code = (request.args.get("code") or "").strip()
-    exclude_id = _parse_int_param(request.args.get("exclude_id"))
-    if not code:
-        return jsonify({"available": False, "message": "Kode produk kosong."})
-
-    existing = Produk.query.filter(
-        func.lower(Produk.kode_produk) == code.lower()
-    ).first()
-    if existing and exclude_id and existing.id == exclude_id:
-        existing = None
-
-    if existing:
-        return jsonify(
-            {
-                "available": False,
-                "message": f"Kode produk {code} sudah digunakan.",
-            }
-        )
-    return jsonify({"available": True, "message": "Kode produk tersedia."})
-
-
-@bp.route("/produk/check-sku", methods=["GET"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def check_produk_sku():
-    sku = (request.args.get("sku") or "").strip()
-    exclude_id = _parse_int_param(request.args.get("exclude_id"))
-    if not sku:
-        return jsonify({"available": True, "message": ""})
-
-    existing = Produk.query.filter(func.lower(Produk.sku) == sku.lower()).first()
-    if existing and exclude_id and existing.id == exclude_id:
-        existing = None
-
-    if existing:
-        return jsonify(
-            {
-                "available": False,
-                "message": f"SKU {sku} sudah digunakan.",
-            }
-        )
-    return jsonify({"available": True, "message": "SKU tersedia."})
-
-
-@bp.route("/produk/check-barcode", methods=["GET"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def check_produk_barcode():
-    barcode = (request.args.get("barcode") or "").strip()
-    exclude_id = _parse_int_param(request.args.get("exclude_id"))
-    if not barcode:
-        return jsonify({"available": True, "message": ""})
-
-    existing = Produk.query.filter(
-        func.lower(Produk.barcode) == barcode.lower()
-    ).first()
-    if existing and exclude_id and existing.id == exclude_id:
-        existing = None
-
-    if existing:
-        return jsonify(
-            {
-                "available": False,
-                "message": f"Barcode {barcode} sudah digunakan.",
-            }
-        )
-    return jsonify({"available": True, "message": "Barcode tersedia."})
-
-
-@bp.route("/akun", methods=["GET", "POST"])
-@login_required
-@roles_required(*ADMIN_ONLY)
-def akun():
-    _ensure_table(Account)
-    _ensure_table(AccountingSetting)
-    _ensure_table(JournalLine)
-    if request.method == "POST":
-        code = (request.form.get("code") or "").strip().upper()
-        name = (request.form.get("name") or "").strip()
-        acc_type = (request.form.get("type") or "").strip().lower()
-        parent_id = request.form.get("parent_id")
-        is_active = request.form.get("is_active", "1") == "1"
-
-        valid_types = {"asset", "liability", "equity", "income", "expense"}
-        if not code or not name or acc_type not in valid_types:
-            flash("Kode, nama, dan tipe akun wajib diisi.", "warning")
-            return redirect(url_for("main.akun"))
-        if Account.query.filter_by(code=code).first():
-            flash(f"Kode akun {code} sudah digunakan.", "warning")
-            return redirect(url_for("main.akun"))
-
-        parent = None
-        if parent_id:
-            try:
-                parent = db.session.get(Account, int(parent_id))
-            except (TypeError, ValueError):
-                parent = None
-
-        account = Account(
-            code=code,
-            name=name,
-            type=acc_type,
-            parent=parent,
-            is_active=is_active,
-        )
-        db.session.add(account)
-        db.session.commit()
-        flash("Akun berhasil ditambahkan.", "success")
-        return redirect(url_for("main.akun"))
-
-    edit_id = _parse_int_param(request.args.get("edit"))
-    edit_account = db.session.get(Account, edit_id) if edit_id else None
-
-    accounts = Account.query.order_by(Account.code.asc()).all()
-    type_labels = {
-        "asset": "Aset",
-        "liability": "Liabilitas",
-        "equity": "Ekuitas",
-        "income": "Pendapatan",
-        "expense": "Beban",
-    }
-    summary = defaultdict(int)
-    for account in accounts:
-        summary[account.type] += 1
-
-    summary_cards = [
-        {
-            "label": type_labels.get(acc_type, acc_type.title()),
-            "value": summary.get(acc_type, 0),
-            "icon": icon,
-            "accent": accent,
-        }
-        for acc_type, icon, accent in [
-            ("asset", "fa-piggy-bank", "text-primary"),
-            ("liability", "fa-balance-scale", "text-warning"),
-            ("equity", "fa-university", "text-success"),
-            ("income", "fa-chart-line", "text-info"),
-            ("expense", "fa-receipt", "text-danger"),
-        ]
-    ]
-
-    return render_template(
-        "akun.html",
-        accounts=accounts,
-        summary_cards=summary_cards,
-        type_labels=type_labels,
-        edit_account=edit_account,
-    )
-
-
-@bp.route("/akun/edit/<int:account_id>", methods=["POST"])
-@login_required
-@roles_required(*ADMIN_ONLY)
-def akun_edit(account_id):
-    _ensure_table(Account)
-    _ensure_table(AccountingSetting)
-    account = Account.query.get_or_404(account_id)
-
-    code = (request.form.get("code") or "").strip().upper()
-    name = (request.form.get("name") or "").strip()
-    acc_type = (request.form.get("type") or "").strip().lower()
-    parent_id = request.form.get("parent_id")
-    is_active = request.form.get("is_active", "1") == "1"
-
-    valid_types = {"asset", "liability", "equity", "income", "expense"}
-    if not code or not name or acc_type not in valid_types:
-        flash("Kode, nama, dan tipe akun wajib diisi.", "warning")
-        return redirect(url_for("main.akun", edit=account.id))
-    if Account.query.filter(Account.code == code, Account.id != account.id).first():
-        flash(f"Kode akun {code} sudah digunakan.", "warning")
-        return redirect(url_for("main.akun", edit=account.id))
-
-    parent = None
-    if parent_id:
-        try:
-            parent = db.session.get(Account, int(parent_id))
-        except (TypeError, ValueError):
-            parent = None
-    if parent and parent.id == account.id:
-        flash("Akun induk tidak boleh sama dengan akun yang diedit.", "warning")
-        return redirect(url_for("main.akun", edit=account.id))
-
-    account.code = code
-    account.name = name
-    account.type = acc_type
-    account.parent = parent
-    account.is_active = is_active
-    db.session.commit()
-    flash("Akun berhasil diperbarui.", "success")
-    return redirect(url_for("main.akun"))
-
-
-@bp.route("/akun/toggle/<int:account_id>", methods=["POST"])
-@login_required
-@roles_required(*ADMIN_ONLY)
-def akun_toggle(account_id):
-    _ensure_table(Account)
-    account = Account.query.get_or_404(account_id)
-    account.is_active = not account.is_active
-    db.session.commit()
-    status_label = "diaktifkan" if account.is_active else "dinonaktifkan"
-    flash(f"Akun berhasil {status_label}.", "success")
-    return redirect(url_for("main.akun"))
-
-
-@bp.route("/akun/delete/<int:account_id>", methods=["POST"])
-@login_required
-@roles_required(*ADMIN_ONLY)
-def akun_delete(account_id):
-    _ensure_table(Account)
-    _ensure_table(AccountingSetting)
-    _ensure_table(JournalLine)
-    account = Account.query.get_or_404(account_id)
-
-    has_children = Account.query.filter_by(parent_id=account.id).first() is not None
-    has_journal = (
-        JournalLine.query.filter_by(account_id=account.id).first() is not None
-    )
-    used_in_settings = (
-        AccountingSetting.query.filter(
-            or_(
-                AccountingSetting.inventory_account_id == account.id,
-                AccountingSetting.cogs_account_id == account.id,
-                AccountingSetting.inventory_adjustment_account_id == account.id,
-                AccountingSetting.marketplace_expense_account_id == account.id,
-                AccountingSetting.marketplace_payable_account_id == account.id,
-            )
-        ).first()
-        is not None
-    )
-
-    if has_children:
-        flash(
-            "Akun ini memiliki akun turunan. Hapus/ubah dulu akun turunannya.",
-            "warning",
-        )
-        return redirect(url_for("main.akun"))
-    if has_journal or used_in_settings:
-        flash(
-            "Akun ini sudah digunakan. Nonaktifkan saja agar laporan tetap konsisten.",
-            "warning",
-        )
-        return redirect(url_for("main.akun"))
-
-    db.session.delete(account)
-    db.session.commit()
-    flash("Akun berhasil dihapus.", "success")
-    return redirect(url_for("main.akun"))
-
-
-@bp.route("/saldo-awal", methods=["GET", "POST"])
-@login_required
-@roles_required(*ADMIN_ONLY)
-def saldo_awal():
-    _ensure_table(Account)
-    _ensure_table(JournalEntry)
-    _ensure_table(JournalLine)
-
-    accounts = Account.query.order_by(Account.code.asc()).all()
-    today = local_today()
-    default_date = today.replace(month=1, day=1)
-
-    if request.method == "POST":
-        date_value = _parse_date_param(request.form.get("date")) or default_date
-        memo_note = (request.form.get("memo") or "").strip()
-        total_debit = 0.0
-        total_credit = 0.0
-        lines = []
-
-        for account in accounts:
-            raw_debit = (request.form.get(f"debit_{account.id}") or "").strip()
-            raw_credit = (request.form.get(f"credit_{account.id}") or "").strip()
-            debit = _parse_float_param(raw_debit) if raw_debit else 0.0
-            credit = _parse_float_param(raw_credit) if raw_credit else 0.0
-
-            if debit is None or credit is None:
-                flash(
-                    f"Nominal tidak valid untuk akun {account.code}.",
-                    "warning",
-                )
-                return redirect(url_for("main.saldo_awal"))
-            if debit < 0 or credit < 0:
-                flash(
-                    f"Nominal negatif tidak diperbolehkan untuk akun {account.code}.",
-                    "warning",
-                )
-                return redirect(url_for("main.saldo_awal"))
-            if debit and credit:
-                flash(
-                    f"Akun {account.code} tidak boleh diisi debit dan kredit bersamaan.",
-                    "warning",
-                )
-                return redirect(url_for("main.saldo_awal"))
-            if debit or credit:
-                lines.append(
-                    {
-                        "account_id": account.id,
-                        "debit": float(debit or 0.0),
-                        "credit": float(credit or 0.0),
-                        "description": memo_note or None,
-                    }
-                )
-                total_debit += float(debit or 0.0)
-                total_credit += float(credit or 0.0)
-
-        if not lines:
-            flash("Isi minimal satu saldo awal.", "warning")
-            return redirect(url_for("main.saldo_awal"))
-        if round(total_debit, 2) != round(total_credit, 2):
-            flash("Total debit dan kredit harus seimbang.", "warning")
-            return redirect(url_for("main.saldo_awal"))
-
-        memo_prefix = "Saldo Awal"
-        memo = f"{memo_prefix} - {memo_note}" if memo_note else memo_prefix
-        entry = JournalEntry(
-            reference=_generate_journal_reference_with_prefix("SA"),
-            date=date_value,
-            memo=memo,
-            created_by=session.get("user_id"),
-        )
-        db.session.add(entry)
-        db.session.flush()
-
-        for line in lines:
-            db.session.add(
-                JournalLine(
-                    entry_id=entry.id,
-                    account_id=line["account_id"],
-                    description=line["description"],
-                    debit=line["debit"],
-                    credit=line["credit"],
-                )
-            )
-        db.session.commit()
-        flash("Saldo awal berhasil disimpan.", "success")
-        return redirect(url_for("main.saldo_awal"))
-
-    recent_entries = (
-        JournalEntry.query.options(
-            joinedload(JournalEntry.lines).joinedload(JournalLine.account)
-        )
-        .filter(JournalEntry.memo.ilike("Saldo Awal%"))
-        .order_by(JournalEntry.date.desc(), JournalEntry.id.desc())
-        .limit(5)
-        .all()
-    )
-
-    type_labels = {
-        "asset": "Aset",
-        "liability": "Liabilitas",
-        "equity": "Ekuitas",
-        "income": "Pendapatan",
-        "expense": "Beban",
-    }
-    normal_side = {
-        "asset": "Debit",
-        "expense": "Debit",
-        "liability": "Kredit",
-        "equity": "Kredit",
-        "income": "Kredit",
-    }
-
-    return render_template(
-        "saldo_awal.html",
-        accounts=accounts,
-        recent_entries=recent_entries,
-        default_date=default_date.strftime("%Y-%m-%d"),
-        type_labels=type_labels,
-        normal_side=normal_side,
-    )
-
-
-@bp.route("/pengaturan-akuntansi", methods=["GET", "POST"])
-@login_required
-@roles_required(*ADMIN_ONLY)
-def accounting_settings():
-    _ensure_table(AccountingSetting)
-    accounts = Account.query.order_by(Account.code.asc()).all()
-    settings = _get_accounting_setting()
-    auto_filter = JournalEntry.memo.ilike("Auto COGS%")
-
-    if request.method == "POST":
-        inventory_account_id = _parse_int_param(request.form.get("inventory_account"))
-        cogs_account_id = _parse_int_param(request.form.get("cogs_account"))
-        inventory_adjustment_account_id = _parse_int_param(
-            request.form.get("inventory_adjustment_account")
-        )
-        marketplace_expense_account_id = _parse_int_param(
-            request.form.get("marketplace_expense_account")
-        )
-        marketplace_payable_account_id = _parse_int_param(
-            request.form.get("marketplace_payable_account")
-        )
-        errors = []
-
-        if inventory_account_id:
-            if not db.session.get(Account, inventory_account_id):
-                errors.append("Akun persediaan tidak ditemukan.")
-
-        if cogs_account_id:
-            if not db.session.get(Account, cogs_account_id):
-                errors.append("Akun COGS tidak ditemukan.")
-
-        if inventory_adjustment_account_id:
-            if not db.session.get(Account, inventory_adjustment_account_id):
-                errors.append("Akun penyesuaian persediaan tidak ditemukan.")
-
-        if marketplace_expense_account_id:
-            if not db.session.get(Account, marketplace_expense_account_id):
-                errors.append("Akun beban marketplace tidak ditemukan.")
-
-        if marketplace_payable_account_id:
-            if not db.session.get(Account, marketplace_payable_account_id):
-                errors.append("Akun utang marketplace tidak ditemukan.")
-
-        if (
-            marketplace_expense_account_id
-            and marketplace_payable_account_id
-            and marketplace_expense_account_id == marketplace_payable_account_id
-        ):
-            errors.append(
-                "Akun beban dan utang marketplace tidak boleh sama."
-            )
-        if (
-            inventory_adjustment_account_id
-            and inventory_account_id
-            and inventory_adjustment_account_id == inventory_account_id
-        ):
-            errors.append(
-                "Akun penyesuaian persediaan tidak boleh sama dengan akun persediaan."
-            )
-
-        if errors:
-            for message in errors:
-                flash(message, "warning")
-            return redirect(url_for("main.accounting_settings"))
-
-        if not settings:
-            settings = AccountingSetting()
-
-        settings.inventory_account_id = inventory_account_id
-        settings.cogs_account_id = cogs_account_id
-        settings.inventory_adjustment_account_id = inventory_adjustment_account_id
-        settings.marketplace_expense_account_id = marketplace_expense_account_id
-        settings.marketplace_payable_account_id = marketplace_payable_account_id
-        settings.updated_by = session.get("user_id")
-        settings.updated_at = local_now()
-
-        db.session.add(settings)
-        db.session.commit()
-        flash("Pengaturan akuntansi otomatis berhasil disimpan.", "success")
-        return redirect(url_for("main.accounting_settings"))
-
-    auto_count = JournalEntry.query.filter(auto_filter).count()
-    auto_total_amount = (
-        db.session.query(func.coalesce(func.sum(JournalLine.debit), 0))
-        .join(JournalEntry, JournalLine.entry_id == JournalEntry.id)
-        .filter(auto_filter)
-        .scalar()
-        or 0.0
-    )
-    recent_entries = (
-        JournalEntry.query.options(joinedload(JournalEntry.lines).joinedload(JournalLine.account))
-        .filter(auto_filter)
-        .order_by(JournalEntry.date.desc(), JournalEntry.id.desc())
-        .limit(5)
-        .all()
-    )
-    recent_auto = [
-        {
-            "reference": entry.reference,
-            "date_label": _format_date_id(entry.date),
-            "memo": entry.memo or "Auto COGS",
-            "amount": sum(line.debit for line in entry.lines),
-        }
-        for entry in recent_entries
-    ]
-
-    return render_template(
-        "accounting_settings.html",
-        accounts=accounts,
-        settings=settings,
-        auto_total_amount=auto_total_amount,
-        auto_count=auto_count,
-        recent_auto=recent_auto,
-    )
-
-
-@bp.route("/tutup-buku", methods=["GET", "POST"])
-@login_required
-@roles_required(*ADMIN_ONLY)
-def close_books():
-    today = local_today()
-    open_period = (
-        AccountingPeriod.query.filter_by(status="open")
-        .order_by(AccountingPeriod.start_date.desc())
-        .first()
-    )
-    if open_period:
-        default_start = open_period.start_date
-        default_end = open_period.end_date
-    else:
-        first_day = today.replace(day=1)
-        prev_month_end = first_day - timedelta(days=1)
-        default_start = prev_month_end.replace(day=1)
-        default_end = prev_month_end
-
-    start_date = _parse_date_param(request.args.get("start_date")) or default_start
-    end_date = _parse_date_param(request.args.get("end_date")) or default_end
-    summary = _build_period_metrics(start_date, end_date)
-
-    open_periods = (
-        AccountingPeriod.query.filter(AccountingPeriod.status == "open")
-        .order_by(AccountingPeriod.start_date.desc())
-        .all()
-    )
-    recent_closed = (
-        AccountingPeriod.query.filter(AccountingPeriod.status == "closed")
-        .order_by(AccountingPeriod.closed_at.desc())
-        .limit(5)
-        .all()
-    )
-
-    warning_message = None
-    if summary and summary["difference"] != 0:
-        warning_message = (
-            f"Rekonsiliasi menunjukkan selisih Rp "
-            f"{('{:,.0f}'.format(abs(summary['difference']))).replace(',', '.')} "
-            f"antara nilai persediaan dan HPP."
-        )
-
-    if request.method == "POST":
-        label = (request.form.get("label") or "").strip()
-        description = (request.form.get("description") or "").strip()
-        form_start = _parse_date_param(request.form.get("start_date"))
-        form_end = _parse_date_param(request.form.get("end_date"))
-        if not form_start or not form_end:
-            flash("Tanggal awal dan akhir periode wajib diisi.", "warning")
-        else:
-            try:
-                _close_accounting_period(label, form_start, form_end, session.get("user_id"), description or None)
-                db.session.commit()
-                flash(f"Periode {label or form_start.strftime('%b %Y')} berhasil ditutup.", "success")
-                return redirect(
-                    url_for(
-                        "main.close_books",
-                        start_date=form_start.strftime("%Y-%m-%d"),
-                        end_date=form_end.strftime("%Y-%m-%d"),
-                    )
-                )
-            except ValueError as exc:
-                db.session.rollback()
-                flash(str(exc), "warning")
-            except Exception as exc:
-                db.session.rollback()
-                logging.exception("Gagal menutup periode")
-                flash(f"Gagal menutup periode: {str(exc)}", "danger")
-        start_date = form_start or start_date
-        end_date = form_end or end_date
-        summary = _build_period_metrics(start_date, end_date)
-        if summary and summary["difference"] != 0:
-            warning_message = (
-                f"Rekonsiliasi menunjukkan selisih Rp "
-                f"{('{:,.0f}'.format(abs(summary['difference']))).replace(',', '.')} "
-                f"antara nilai persediaan dan HPP."
-            )
-
-    selected_range = {
-        "start_date": start_date.strftime("%Y-%m-%d") if start_date else "",
-        "end_date": end_date.strftime("%Y-%m-%d") if end_date else "",
-    }
-
-    return render_template(
-        "accounting_close.html",
-        open_periods=open_periods,
-        recent_closed=recent_closed,
-        summary=summary,
-        selected_range=selected_range,
-        warning_message=warning_message,
-    )
-
-
-@bp.route("/status", methods=["GET"])
-@login_required
-@roles_required(*ADMIN_ONLY)
-def status():
-    metrics = _collect_system_metrics()
-    return render_template("server_status.html", metrics=metrics)
-
-
-@bp.route("/jurnal", methods=["GET", "POST"])
-@login_required
-@roles_required(*ADMIN_ONLY)
-def jurnal():
-    _ensure_table(Account)
-    _ensure_table(JournalEntry)
-    _ensure_table(JournalLine)
-
-    if request.method == "POST":
-        if not request.is_json:
-            return jsonify({"success": False, "message": "Gunakan JSON payload."}), 415
-        payload = request.get_json(silent=True) or {}
-        parsed_lines, error_message = _parse_journal_lines(payload)
-        if error_message:
-            return jsonify({"success": False, "message": error_message}), 400
-
-        date_value = _parse_date_param(payload.get("date")) or local_today()
-        memo = (payload.get("memo") or "").strip()
-        reference = (
-            payload.get("reference") or ""
-        ).strip() or _generate_journal_reference()
-
-        entry = JournalEntry(
-            reference=reference,
-            date=date_value,
-            memo=memo or None,
-            created_by=session.get("user_id"),
-        )
-        db.session.add(entry)
-        db.session.flush()
-
-        for line in parsed_lines:
-            db.session.add(
-                JournalLine(
-                    entry_id=entry.id,
-                    account_id=line["account"].id,
-                    description=line["description"] or None,
-                    debit=line["debit"],
-                    credit=line["credit"],
-                )
-            )
-        db.session.commit()
-        return jsonify(
-            {
-                "success": True,
-                "message": "Jurnal berhasil disimpan.",
-                "reference": reference,
-            }
-        )
-
-    accounts = Account.query.order_by(Account.code.asc()).all()
-    accounts_for_js = [
-        {
-            "id": account.id,
-            "code": account.code,
-            "name": account.name,
-        }
-        for account in accounts
-    ]
-    exclude_adjustment = or_(
-        JournalEntry.memo.is_(None), ~JournalEntry.memo.ilike("Penyesuaian%")
-    )
-    exclude_opening = or_(
-        JournalEntry.memo.is_(None), ~JournalEntry.memo.ilike("Saldo Awal%")
-    )
-    recent_entries = (
-        JournalEntry.query.options(
-            joinedload(JournalEntry.lines).joinedload(JournalLine.account)
-        )
-        .filter(exclude_adjustment, exclude_opening)
-        .order_by(JournalEntry.date.desc(), JournalEntry.id.desc())
-        .limit(10)
-        .all()
-    )
-    net_expr = case(
-        (
-            Penjualan.total_harga
-            - func.coalesce(Penjualan.marketplace_cost_total, 0)
-            < 0,
-            0,
-        ),
-        else_=Penjualan.total_harga
-        - func.coalesce(Penjualan.marketplace_cost_total, 0),
-    )
-    total_net_revenue = (
-        db.session.query(func.coalesce(func.sum(net_expr), 0)).scalar() or 0.0
-    )
-    total_marketplace_cost = (
-        db.session.query(func.coalesce(func.sum(Penjualan.marketplace_cost_total), 0)).scalar()
-        or 0.0
-    )
-
-    return render_template(
-        "jurnal.html",
-        accounts=accounts,
-        accounts_for_js=accounts_for_js,
-        recent_entries=recent_entries,
-        default_date=local_today().strftime("%Y-%m-%d"),
-        net_revenue_total=total_net_revenue,
-        marketplace_cost_total=total_marketplace_cost,
-    )
-
-
-@bp.route("/jurnal-penyesuaian", methods=["GET", "POST"])
-@login_required
-@roles_required(*ADMIN_ONLY)
-def jurnal_penyesuaian():
-    _ensure_table(Account)
-    _ensure_table(JournalEntry)
-    _ensure_table(JournalLine)
-
-    if request.method == "POST":
-        if not request.is_json:
-            return jsonify({"success": False, "message": "Gunakan JSON payload."}), 415
-        payload = request.get_json(silent=True) or {}
-        parsed_lines, error_message = _parse_journal_lines(payload)
-        if error_message:
-            return jsonify({"success": False, "message": error_message}), 400
-
-        date_value = _parse_date_param(payload.get("date")) or local_today()
-        memo_raw = (payload.get("memo") or "").strip()
-        memo_prefix = "Penyesuaian"
-        if memo_raw:
-            memo_lower = memo_raw.lower()
-            memo = (
-                memo_raw
-                if memo_lower.startswith(("penyesuaian", "jurnal penyesuaian"))
-                else f"{memo_prefix} - {memo_raw}"
-            )
-        else:
-            memo = memo_prefix
-        reference = (
-            payload.get("reference") or ""
-        ).strip() or _generate_journal_reference_with_prefix("JP")
-
-        entry = JournalEntry(
-            reference=reference,
-            date=date_value,
-            memo=memo,
-            created_by=session.get("user_id"),
-        )
-        db.session.add(entry)
-        db.session.flush()
-
-        for line in parsed_lines:
-            db.session.add(
-                JournalLine(
-                    entry_id=entry.id,
-                    account_id=line["account"].id,
-                    description=line["description"] or None,
-                    debit=line["debit"],
-                    credit=line["credit"],
-                )
-            )
-        db.session.commit()
-        return jsonify(
-            {
-                "success": True,
-                "message": "Jurnal penyesuaian berhasil disimpan.",
-                "reference": reference,
-            }
-        )
-
-    accounts = Account.query.order_by(Account.code.asc()).all()
-    accounts_for_js = [
-        {
-            "id": account.id,
-            "code": account.code,
-            "name": account.name,
-        }
-        for account in accounts
-    ]
-    recent_entries = (
-        JournalEntry.query.options(
-            joinedload(JournalEntry.lines).joinedload(JournalLine.account)
-        )
-        .filter(JournalEntry.memo.ilike("Penyesuaian%"))
-        .order_by(JournalEntry.date.desc(), JournalEntry.id.desc())
-        .limit(10)
-        .all()
-    )
-
-    return render_template(
-        "jurnal_penyesuaian.html",
-        accounts=accounts,
-        accounts_for_js=accounts_for_js,
-        recent_entries=recent_entries,
-        default_date=local_today().strftime("%Y-%m-%d"),
-    )
-
-
-@bp.route("/buku-besar", methods=["GET"])
-@login_required
-@roles_required(*ADMIN_ONLY)
-def buku_besar():
-    _ensure_table(Account)
-    _ensure_table(JournalEntry)
-    _ensure_table(JournalLine)
-
-    today = local_today()
-    default_start = today.replace(day=1)
-    start_date = _parse_date_param(request.args.get("start_date")) or default_start
-    end_date = _parse_date_param(request.args.get("end_date")) or today
-    if end_date < start_date:
-        start_date, end_date = end_date, start_date
-
-    account_id = _parse_int_param(request.args.get("account"))
-    accounts = Account.query.order_by(Account.code.asc()).all()
-    selected_account = db.session.get(Account, account_id) if account_id else None
-
-    ledger_rows = []
-    summary_rows = []
-    summary_totals = {"debit": 0.0, "credit": 0.0}
-    opening_balance = 0.0
-    total_debit = 0.0
-    total_credit = 0.0
-    closing_balance = 0.0
-
-    type_labels = {
-        "asset": "Aset",
-        "liability": "Liabilitas",
-        "equity": "Ekuitas",
-        "income": "Pendapatan",
-        "expense": "Beban",
-    }
-
-    if selected_account:
-        opening_balance = (
-            db.session.query(
-                func.coalesce(func.sum(JournalLine.debit - JournalLine.credit), 0.0)
-            )
-            .join(JournalEntry, JournalLine.entry_id == JournalEntry.id)
-            .filter(JournalLine.account_id == selected_account.id)
-            .filter(JournalEntry.date < start_date)
-            .scalar()
-            or 0.0
-        )
-
-        entries = (
-            db.session.query(JournalLine, JournalEntry)
-            .join(JournalEntry, JournalLine.entry_id == JournalEntry.id)
-            .filter(JournalLine.account_id == selected_account.id)
-            .filter(JournalEntry.date >= start_date)
-            .filter(JournalEntry.date <= end_date)
-            .order_by(
-                JournalEntry.date.asc(),
-                JournalEntry.id.asc(),
-                JournalLine.id.asc(),
-            )
-            .all()
-        )
-
-        running_balance = opening_balance
-        for line, entry in entries:
-            debit = float(line.debit or 0.0)
-            credit = float(line.credit or 0.0)
-            total_debit += debit
-            total_credit += credit
-            running_balance += debit - credit
-            ledger_rows.append(
-                {
-                    "date_label": _format_date_id(entry.date),
-                    "reference": entry.reference,
-                    "memo": entry.memo or "-",
-                    "description": line.description or "-",
-                    "debit": debit,
-                    "credit": credit,
-                    "balance": running_balance,
-                }
-            )
-        closing_balance = running_balance
-    else:
-        line_sums = (
-            db.session.query(
-                JournalLine.account_id.label("account_id"),
-                func.coalesce(func.sum(JournalLine.debit), 0.0).label("debit"),
-                func.coalesce(func.sum(JournalLine.credit), 0.0).label("credit"),
-            )
-            .join(JournalEntry, JournalLine.entry_id == JournalEntry.id)
-            .filter(JournalEntry.date >= start_date)
-            .filter(JournalEntry.date <= end_date)
-            .group_by(JournalLine.account_id)
-            .subquery()
-        )
-
-        rows = (
-            db.session.query(
-                Account,
-                line_sums.c.debit,
-                line_sums.c.credit,
-            )
-            .outerjoin(line_sums, line_sums.c.account_id == Account.id)
-            .order_by(Account.code.asc())
-            .all()
-        )
-
-        for account, debit, credit in rows:
-            debit = float(debit or 0.0)
-            credit = float(credit or 0.0)
-            if debit == 0 and credit == 0:
-                continue
-            net = debit - credit
-            summary_rows.append(
-                {
-                    "account_id": account.id,
-                    "code": account.code,
-                    "name": account.name,
-                    "type_label": type_labels.get(account.type, account.type.title()),
-                    "debit": debit,
-                    "credit": credit,
-                    "balance": abs(net),
-                    "balance_side": "Debit" if net >= 0 else "Kredit",
-                }
-            )
-            summary_totals["debit"] += debit
-            summary_totals["credit"] += credit
-
-    summary_cards = []
-    if selected_account:
-        summary_cards = [
-            {
-                "label": "Saldo Awal",
-                "value": opening_balance,
-                "icon": "fa-coins",
-                "accent": "text-secondary",
-            },
-            {
-                "label": "Total Debit",
-                "value": total_debit,
-                "icon": "fa-arrow-down",
-                "accent": "text-success",
-            },
-            {
-                "label": "Total Kredit",
-                "value": total_credit,
-                "icon": "fa-arrow-up",
-                "accent": "text-danger",
-            },
-            {
-                "label": "Saldo Akhir",
-                "value": closing_balance,
-                "icon": "fa-balance-scale",
-                "accent": "text-primary",
-            },
-        ]
-
-    range_label = f"{_format_date_id(start_date)} - {_format_date_id(end_date)}"
-    filter_values = {
-        "start_date": start_date.strftime("%Y-%m-%d"),
-        "end_date": end_date.strftime("%Y-%m-%d"),
-        "account": selected_account.id if selected_account else None,
-    }
-
-    return render_template(
-        "buku_besar.html",
-        accounts=accounts,
-        selected_account=selected_account,
-        ledger_rows=ledger_rows,
-        summary_rows=summary_rows,
-        summary_totals=summary_totals,
-        summary_cards=summary_cards,
-        total_debit=total_debit,
-        total_credit=total_credit,
-        opening_balance=opening_balance,
-        closing_balance=closing_balance,
-        range_label=range_label,
-        filter_values=filter_values,
-    )
-
-
-@bp.route("/neraca-saldo", methods=["GET"])
-@login_required
-@roles_required(*ADMIN_ONLY)
-def neraca_saldo():
-    _ensure_table(Account)
-    _ensure_table(JournalEntry)
-    _ensure_table(JournalLine)
-
-    today = local_today()
-    default_start = today.replace(day=1)
-    start_date = _parse_date_param(request.args.get("start_date")) or default_start
-    end_date = _parse_date_param(request.args.get("end_date")) or today
-    if end_date < start_date:
-        start_date, end_date = end_date, start_date
-
-    show_zero = _parse_bool_param(request.args.get("show_zero"), default=False)
-    adjustment_filter = or_(
-        JournalEntry.memo.is_(None), ~JournalEntry.memo.ilike("Penyesuaian%")
-    )
-
-    line_sums = (
-        db.session.query(
-            JournalLine.account_id.label("account_id"),
-            func.coalesce(func.sum(JournalLine.debit), 0.0).label("debit"),
-            func.coalesce(func.sum(JournalLine.credit), 0.0).label("credit"),
-        )
-        .join(JournalEntry, JournalLine.entry_id == JournalEntry.id)
-        .filter(adjustment_filter)
-        .filter(JournalEntry.date >= start_date)
-        .filter(JournalEntry.date <= end_date)
-        .group_by(JournalLine.account_id)
-        .subquery()
-    )
-
-    rows = (
-        db.session.query(
-            Account,
-            line_sums.c.debit,
-            line_sums.c.credit,
-        )
-        .outerjoin(line_sums, line_sums.c.account_id == Account.id)
-        .order_by(Account.code.asc())
-        .all()
-    )
-
-    type_labels = {
-        "asset": "Aset",
-        "liability": "Liabilitas",
-        "equity": "Ekuitas",
-        "income": "Pendapatan",
-        "expense": "Beban",
-    }
-    normal_side = {
-        "asset": "Debit",
-        "expense": "Debit",
-        "liability": "Kredit",
-        "equity": "Kredit",
-        "income": "Kredit",
-    }
-
-    trial_rows = []
-    total_debit = 0.0
-    total_credit = 0.0
-    for account, debit, credit in rows:
-        debit = float(debit or 0.0)
-        credit = float(credit or 0.0)
-        net = debit - credit
-        debit_balance = net if net > 0 else 0.0
-        credit_balance = -net if net < 0 else 0.0
-        if not show_zero and debit_balance == 0 and credit_balance == 0:
-            continue
-        normal = normal_side.get(account.type, "Debit")
-        is_abnormal = (
-            (normal == "Debit" and credit_balance > 0)
-            or (normal == "Kredit" and debit_balance > 0)
-        )
-        trial_rows.append(
-            {
-                "code": account.code,
-                "name": account.name,
-                "type_label": type_labels.get(account.type, account.type.title()),
-                "debit": debit_balance,
-                "credit": credit_balance,
-                "normal_side": normal,
-                "is_abnormal": is_abnormal,
-            }
-        )
-        total_debit += debit_balance
-        total_credit += credit_balance
-
-    difference = round(total_debit - total_credit, 2)
-    warning_message = abs(difference) if difference != 0 else None
-
-    summary_cards = [
-        {
-            "label": "Total Debit",
-            "value": total_debit,
-            "icon": "fa-arrow-down",
-            "accent": "text-success",
-        },
-        {
-            "label": "Total Kredit",
-            "value": total_credit,
-            "icon": "fa-arrow-up",
-            "accent": "text-danger",
-        },
-        {
-            "label": "Selisih",
-            "value": abs(difference),
-            "icon": "fa-balance-scale",
-            "accent": "text-warning" if difference != 0 else "text-success",
-        },
-        {
-            "label": "Jumlah Akun",
-            "value": len(trial_rows),
-            "icon": "fa-layer-group",
-            "accent": "text-primary",
-            "type": "count",
-        },
-    ]
-
-    range_label = f"{_format_date_id(start_date)} - {_format_date_id(end_date)}"
-    filter_values = {
-        "start_date": start_date.strftime("%Y-%m-%d"),
-        "end_date": end_date.strftime("%Y-%m-%d"),
-        "show_zero": show_zero,
-    }
-
-    return render_template(
-        "neraca_saldo.html",
-        trial_rows=trial_rows,
-        summary_cards=summary_cards,
-        range_label=range_label,
-        filter_values=filter_values,
-        warning_message=warning_message,
-    )
-
-
-@bp.route("/kas-bank", methods=["GET", "POST"])
-@login_required
-@roles_required(*ADMIN_ONLY)
-def kas_bank():
-    _ensure_table(Account)
-    _ensure_table(JournalEntry)
-    _ensure_table(JournalLine)
-
-    cash_accounts = (
-        Account.query.filter_by(type="asset", is_active=True)
-        .order_by(Account.code.asc())
-        .all()
-    )
-    active_accounts = (
-        Account.query.filter_by(is_active=True)
-        .order_by(Account.code.asc())
-        .all()
-    )
-
-    if request.method == "POST":
-        date_value = _parse_date_param(request.form.get("date")) or local_today()
-        cash_account_id = _parse_int_param(request.form.get("account_id"))
-        offset_account_id = _parse_int_param(request.form.get("offset_account_id"))
-        direction = (request.form.get("direction") or "").strip()
-        amount = _parse_float_param(request.form.get("amount"))
-        note = (request.form.get("note") or "").strip()
-        next_target = _resolve_next_target(url_for("main.kas_bank"))
-
-        cash_account = (
-            db.session.get(Account, cash_account_id) if cash_account_id else None
-        )
-        offset_account = (
-            db.session.get(Account, offset_account_id) if offset_account_id else None
-        )
-
-        if not cash_account or cash_account.type != "asset":
-            flash("Pilih akun kas/bank yang valid.", "warning")
-            return redirect(next_target)
-        if not offset_account or not offset_account.is_active:
-            flash("Pilih akun lawan yang valid.", "warning")
-            return redirect(next_target)
-        if offset_account.id == cash_account.id:
-            flash("Akun lawan tidak boleh sama dengan akun kas/bank.", "warning")
-            return redirect(next_target)
-        if not amount or amount <= 0:
-            flash("Nominal koreksi harus lebih dari 0.", "warning")
-            return redirect(next_target)
-        if direction not in {"in", "out"}:
-            flash("Pilih jenis koreksi yang valid.", "warning")
-            return redirect(next_target)
-
-        memo_prefix = "Koreksi Kas/Bank"
-        memo = f"{memo_prefix} - {note}" if note else memo_prefix
-        entry = JournalEntry(
-            reference=_generate_journal_reference_with_prefix("KB"),
-            date=date_value,
-            memo=memo,
-            created_by=session.get("user_id"),
-        )
-        db.session.add(entry)
-        db.session.flush()
-
-        if direction == "in":
-            db.session.add(
-                JournalLine(
-                    entry_id=entry.id,
-                    account_id=cash_account.id,
-                    description=note or None,
-                    debit=amount,
-                    credit=0.0,
-                )
-            )
-            db.session.add(
-                JournalLine(
-                    entry_id=entry.id,
-                    account_id=offset_account.id,
-                    description=note or None,
-                    debit=0.0,
-                    credit=amount,
-                )
-            )
-        else:
-            db.session.add(
-                JournalLine(
-                    entry_id=entry.id,
-                    account_id=offset_account.id,
-                    description=note or None,
-                    debit=amount,
-                    credit=0.0,
-                )
-            )
-            db.session.add(
-                JournalLine(
-                    entry_id=entry.id,
-                    account_id=cash_account.id,
-                    description=note or None,
-                    debit=0.0,
-                    credit=amount,
-                )
-            )
-
-        db.session.commit()
-        flash("Koreksi kas/bank berhasil disimpan.", "success")
-        return redirect(next_target)
-
-    today = local_today()
-    default_start = today.replace(day=1)
-    start_date = _parse_date_param(request.args.get("start_date")) or default_start
-    end_date = _parse_date_param(request.args.get("end_date")) or today
-    if end_date < start_date:
-        start_date, end_date = end_date, start_date
-
-    account_id = _parse_int_param(request.args.get("account"))
-    selected_account = next(
-        (acc for acc in cash_accounts if acc.id == account_id), None
-    )
-
-    ledger_rows = []
-    summary_rows = []
-    summary_totals = {"debit": 0.0, "credit": 0.0}
-    opening_balance = 0.0
-    total_debit = 0.0
-    total_credit = 0.0
-    closing_balance = 0.0
-
-    if selected_account:
-        opening_balance = (
-            db.session.query(
-                func.coalesce(func.sum(JournalLine.debit - JournalLine.credit), 0.0)
-            )
-            .join(JournalEntry, JournalLine.entry_id == JournalEntry.id)
-            .filter(JournalLine.account_id == selected_account.id)
-            .filter(JournalEntry.date < start_date)
-            .scalar()
-            or 0.0
-        )
-
-        entries = (
-            db.session.query(JournalLine, JournalEntry)
-            .join(JournalEntry, JournalLine.entry_id == JournalEntry.id)
-            .filter(JournalLine.account_id == selected_account.id)
-            .filter(JournalEntry.date >= start_date)
-            .filter(JournalEntry.date <= end_date)
-            .order_by(
-                JournalEntry.date.asc(),
-                JournalEntry.id.asc(),
-                JournalLine.id.asc(),
-            )
-            .all()
-        )
-
-        running_balance = opening_balance
-        for line, entry in entries:
-            debit = float(line.debit or 0.0)
-            credit = float(line.credit or 0.0)
-            total_debit += debit
-            total_credit += credit
-            running_balance += debit - credit
-            ledger_rows.append(
-                {
-                    "date_label": _format_date_id(entry.date),
-                    "reference": entry.reference,
-                    "memo": entry.memo or "-",
-                    "description": line.description or "-",
-                    "debit": debit,
-                    "credit": credit,
-                    "balance": running_balance,
-                }
-            )
-        closing_balance = running_balance
-    else:
-        account_ids = [acc.id for acc in cash_accounts]
-        if account_ids:
-            line_sums = (
-                db.session.query(
-                    JournalLine.account_id.label("account_id"),
-                    func.coalesce(func.sum(JournalLine.debit), 0.0).label("debit"),
-                    func.coalesce(func.sum(JournalLine.credit), 0.0).label("credit"),
-                )
-                .join(JournalEntry, JournalLine.entry_id == JournalEntry.id)
-                .filter(JournalLine.account_id.in_(account_ids))
-                .filter(JournalEntry.date >= start_date)
-                .filter(JournalEntry.date <= end_date)
-                .group_by(JournalLine.account_id)
-                .subquery()
-            )
-
-            rows = (
-                db.session.query(
-                    Account,
-                    line_sums.c.debit,
-                    line_sums.c.credit,
-                )
-                .outerjoin(line_sums, line_sums.c.account_id == Account.id)
-                .filter(Account.id.in_(account_ids))
-                .order_by(Account.code.asc())
-                .all()
-            )
-
-            for account, debit, credit in rows:
-                debit = float(debit or 0.0)
-                credit = float(credit or 0.0)
-                if debit == 0 and credit == 0:
-                    continue
-                net = debit - credit
-                summary_rows.append(
-                    {
-                        "account_id": account.id,
-                        "code": account.code,
-                        "name": account.name,
-                        "debit": debit,
-                        "credit": credit,
-                        "balance": abs(net),
-                        "balance_side": "Debit" if net >= 0 else "Kredit",
-                    }
-                )
-                summary_totals["debit"] += debit
-                summary_totals["credit"] += credit
-
-    summary_cards = []
-    if selected_account:
-        summary_cards = [
-            {
-                "label": "Saldo Awal",
-                "value": opening_balance,
-                "icon": "fa-wallet",
-                "accent": "text-secondary",
-            },
-            {
-                "label": "Uang Masuk",
-                "value": total_debit,
-                "icon": "fa-arrow-down",
-                "accent": "text-success",
-            },
-            {
-                "label": "Uang Keluar",
-                "value": total_credit,
-                "icon": "fa-arrow-up",
-                "accent": "text-danger",
-            },
-            {
-                "label": "Saldo Akhir",
-                "value": closing_balance,
-                "icon": "fa-university",
-                "accent": "text-primary",
-            },
-        ]
-
-    range_label = f"{_format_date_id(start_date)} - {_format_date_id(end_date)}"
-    filter_values = {
-        "start_date": start_date.strftime("%Y-%m-%d"),
-        "end_date": end_date.strftime("%Y-%m-%d"),
-        "account": selected_account.id if selected_account else None,
-    }
-
-    offset_accounts = [
-        account
-        for account in active_accounts
-        if not selected_account or account.id != selected_account.id
-    ]
-
-    return render_template(
-        "kas_bank.html",
-        accounts=cash_accounts,
-        offset_accounts=offset_accounts,
-        selected_account=selected_account,
-        ledger_rows=ledger_rows,
-        summary_rows=summary_rows,
-        summary_totals=summary_totals,
-        summary_cards=summary_cards,
-        opening_balance=opening_balance,
-        total_debit=total_debit,
-        total_credit=total_credit,
-        closing_balance=closing_balance,
-        range_label=range_label,
-        filter_values=filter_values,
-    )
-
-
-@bp.route("/aset-tetap", methods=["GET", "POST"])
-@login_required
-@roles_required(*ADMIN_ONLY)
-def aset_tetap():
-    _ensure_table(FixedAsset)
-
-    if request.method == "POST":
-        name = (request.form.get("name") or "").strip()
-        category = (request.form.get("category") or "").strip() or None
-        acquisition_date = _parse_date_param(request.form.get("acquisition_date"))
-        cost = _parse_float_param(request.form.get("cost"))
-        salvage_value = _parse_float_param(request.form.get("salvage_value"))
-        useful_life_months = _parse_int_param(request.form.get("useful_life_months"))
-        method = (request.form.get("method") or "straight_line").strip()
-        note = (request.form.get("note") or "").strip() or None
-        is_active = request.form.get("is_active") != "0"
-        next_target = _resolve_next_target(url_for("main.aset_tetap"))
-
-        salvage_value = max(salvage_value or 0.0, 0.0)
-        useful_life_months = useful_life_months or 0
-
-        if not name:
-            flash("Nama aset wajib diisi.", "warning")
-            return redirect(next_target)
-        if not acquisition_date:
-            flash("Tanggal perolehan wajib diisi.", "warning")
-            return redirect(next_target)
-        if cost is None or cost <= 0:
-            flash("Biaya perolehan harus lebih dari 0.", "warning")
-            return redirect(next_target)
-        if useful_life_months <= 0:
-            flash("Umur manfaat wajib lebih dari 0 bulan.", "warning")
-            return redirect(next_target)
-        if salvage_value > cost:
-            flash("Nilai sisa tidak boleh lebih besar dari biaya perolehan.", "warning")
-            return redirect(next_target)
-        if method not in {"straight_line"}:
-            method = "straight_line"
-
-        asset = FixedAsset(
-            name=name,
-            category=category,
-            acquisition_date=acquisition_date,
-            cost=cost,
-            salvage_value=salvage_value,
-            useful_life_months=useful_life_months,
-            method=method,
-            note=note,
-            is_active=is_active,
-            created_by=session.get("user_id"),
-        )
-        db.session.add(asset)
-        db.session.commit()
-        flash("Aset tetap berhasil disimpan.", "success")
-        return redirect(next_target)
-
-    search_query = (request.args.get("search") or "").strip()
-    status_filter = (request.args.get("status") or "active").strip()
-    as_of_date = _parse_date_param(request.args.get("as_of")) or local_today()
-
-    asset_query = FixedAsset.query
-    if status_filter == "active":
-        asset_query = asset_query.filter(FixedAsset.is_active.is_(True))
-    elif status_filter == "inactive":
-        asset_query = asset_query.filter(FixedAsset.is_active.is_(False))
-
-    if search_query:
-        like = f"%{search_query}%"
-        asset_query = asset_query.filter(
-            or_(
-                FixedAsset.name.ilike(like),
-                FixedAsset.category.ilike(like),
-            )
-        )
-
-    assets = (
-        asset_query.order_by(
-            FixedAsset.acquisition_date.desc(), FixedAsset.id.desc()
-        )
-        .all()
-    )
-
-    asset_rows = []
-    total_cost = 0.0
-    total_accumulated = 0.0
-    total_book = 0.0
-
-    for asset in assets:
-        cost = float(asset.cost or 0.0)
-        salvage = float(asset.salvage_value or 0.0)
-        life_months = int(asset.useful_life_months or 0) or 1
-        months_elapsed = _months_between(asset.acquisition_date, as_of_date)
-        months_used = min(months_elapsed, life_months)
-        depreciable_base = max(cost - salvage, 0.0)
-        monthly_depreciation = (
-            depreciable_base / life_months if life_months > 0 else 0.0
-        )
-        accumulated = round(monthly_depreciation * months_used, 2)
-        book_value = max(cost - accumulated, 0.0)
-
-        total_cost += cost
-        total_accumulated += accumulated
-        total_book += book_value
-
-        asset_rows.append(
-            {
-                "id": asset.id,
-                "name": asset.name,
-                "category": asset.category or "-",
-                "acquisition_date": asset.acquisition_date,
-                "cost": cost,
-                "salvage_value": salvage,
-                "life_months": life_months,
-                "method": asset.method,
-                "note": asset.note or "",
-                "months_used": months_used,
-                "monthly_depreciation": monthly_depreciation,
-                "accumulated": accumulated,
-                "book_value": book_value,
-                "status_label": "Aktif" if asset.is_active else "Nonaktif",
-                "status_badge": "badge-soft-success"
-                if asset.is_active
-                else "badge-soft-secondary",
-            }
-        )
-
-    summary_cards = [
-        {
-            "label": "Total biaya aset",
-            "value": total_cost,
-            "type": "currency",
-            "icon": "fa-cubes",
-            "accent": "text-primary",
-            "description": "Akumulasi biaya perolehan aset.",
-        },
-        {
-            "label": "Akumulasi penyusutan",
-            "value": total_accumulated,
-            "type": "currency",
-            "icon": "fa-chart-line",
-            "accent": "text-warning",
-            "description": "Total penyusutan sampai tanggal pilihan.",
-        },
-        {
-            "label": "Nilai buku",
-            "value": total_book,
-            "type": "currency",
-            "icon": "fa-balance-scale",
-            "accent": "text-success",
-            "description": "Nilai aset setelah penyusutan.",
-        },
-        {
-            "label": "Jumlah aset",
-            "value": len(asset_rows),
-            "type": "count",
-            "icon": "fa-layer-group",
-            "accent": "text-secondary",
-            "description": "Jumlah aset di daftar.",
-        },
-    ]
-
-    filter_values = {
-        "search": search_query,
-        "status": status_filter,
-        "as_of": as_of_date.strftime("%Y-%m-%d"),
-    }
-
-    return render_template(
-        "aset_tetap.html",
-        asset_rows=asset_rows,
-        summary_cards=summary_cards,
-        filter_values=filter_values,
-        as_of_label=_format_date_id(as_of_date),
-        format_date=_format_date_id,
-    )
-
-
-@bp.route("/biaya-operasional", methods=["GET", "POST"])
-@login_required
-@roles_required(*ADMIN_ONLY)
-def biaya_operasional():
-    _ensure_table(Account)
-    _ensure_table(JournalEntry)
-    _ensure_table(JournalLine)
-
-    expense_accounts = (
-        Account.query.filter_by(type="expense", is_active=True)
-        .order_by(Account.code.asc())
-        .all()
-    )
-    payment_accounts = (
-        Account.query.filter(
-            Account.is_active.is_(True),
-            Account.type.in_(["asset", "liability"]),
-        )
-        .order_by(Account.code.asc())
-        .all()
-    )
-
-    if request.method == "POST":
-        date_value = _parse_date_param(request.form.get("date")) or local_today()
-        expense_account_id = _parse_int_param(request.form.get("expense_account"))
-        payment_account_id = _parse_int_param(request.form.get("payment_account"))
-        amount = _parse_float_param(request.form.get("amount"))
-        note = (request.form.get("note") or "").strip()
-
-        if not amount or amount <= 0:
-            flash("Nominal biaya harus lebih dari 0.", "warning")
-            return redirect(url_for("main.biaya_operasional"))
-
-        expense_account = (
-            db.session.get(Account, expense_account_id) if expense_account_id else None
-        )
-        payment_account = (
-            db.session.get(Account, payment_account_id) if payment_account_id else None
-        )
-
-        if (
-            not expense_account
-            or not expense_account.is_active
-            or expense_account.type != "expense"
-        ):
-            flash("Pilih akun beban yang valid.", "warning")
-            return redirect(url_for("main.biaya_operasional"))
-
-        if (
-            not payment_account
-            or not payment_account.is_active
-            or payment_account.type not in ("asset", "liability")
-        ):
-            flash("Pilih akun pembayaran (kas/bank/utang) yang valid.", "warning")
-            return redirect(url_for("main.biaya_operasional"))
-
-        memo_core = note or expense_account.name
-        memo = f"Biaya Operasional - {memo_core}".strip()
-        reference = _generate_journal_reference()
-        entry = JournalEntry(
-            reference=reference,
-            date=date_value,
-            memo=memo,
-            created_by=session.get("user_id"),
-        )
-        db.session.add(entry)
-        db.session.flush()
-        db.session.add(
-            JournalLine(
-                entry_id=entry.id,
-                account_id=expense_account.id,
-                description=note or None,
-                debit=amount,
-                credit=0.0,
-            )
-        )
-        db.session.add(
-            JournalLine(
-                entry_id=entry.id,
-                account_id=payment_account.id,
-                description=note or None,
-                debit=0.0,
-                credit=amount,
-            )
-        )
-        db.session.commit()
-        flash("Biaya operasional berhasil disimpan.", "success")
-        return redirect(url_for("main.biaya_operasional"))
-
-    recent_entries = (
-        JournalEntry.query.options(
-            joinedload(JournalEntry.lines).joinedload(JournalLine.account)
-        )
-        .filter(JournalEntry.memo.like("Biaya Operasional%"))
-        .order_by(JournalEntry.date.desc(), JournalEntry.id.desc())
-        .limit(12)
-        .all()
-    )
-
-    display_entries = []
-    for entry in recent_entries:
-        expense_line = next(
-            (line for line in entry.lines if line.debit and line.debit > 0), None
-        )
-        payment_line = next(
-            (line for line in entry.lines if line.credit and line.credit > 0), None
-        )
-        display_entries.append(
-            {
-                "reference": entry.reference,
-                "date": entry.date,
-                "memo": entry.memo or "",
-                "amount": expense_line.debit if expense_line else 0.0,
-                "expense_account": expense_line.account if expense_line else None,
-                "payment_account": payment_line.account if payment_line else None,
-            }
-        )
-
-    today = local_today()
-    month_start = today.replace(day=1)
-    base_expense_filter = [
-        JournalEntry.memo.like("Biaya Operasional%"),
-        JournalLine.debit > 0,
-    ]
-    total_today = (
-        db.session.query(func.coalesce(func.sum(JournalLine.debit), 0))
-        .join(JournalEntry)
-        .filter(*base_expense_filter, JournalEntry.date == today)
-        .scalar()
-        or 0.0
-    )
-    total_month = (
-        db.session.query(func.coalesce(func.sum(JournalLine.debit), 0))
-        .join(JournalEntry)
-        .filter(
-            *base_expense_filter,
-            JournalEntry.date >= month_start,
-            JournalEntry.date <= today,
-        )
-        .scalar()
-        or 0.0
-    )
-    total_entries = (
-        db.session.query(func.count(JournalEntry.id))
-        .filter(JournalEntry.memo.like("Biaya Operasional%"))
-        .scalar()
-        or 0
-    )
-
-    return render_template(
-        "biaya_operasional.html",
-        expense_accounts=expense_accounts,
-        payment_accounts=payment_accounts,
-        recent_entries=display_entries,
-        default_date=today.strftime("%Y-%m-%d"),
-        total_today=total_today,
-        total_month=total_month,
-        total_entries=total_entries,
-    )
-
-
-@bp.route("/produk/edit/<int:produk_id>", methods=["GET", "POST"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def edit_produk(produk_id):
-    produk = Produk.query.get_or_404(produk_id)
-
-    if request.method == "POST":
-        produk.kode_produk = request.form["kode_produk"]
-        produk.barcode = request.form["barcode"]
-        produk.nama_produk = request.form["nama_produk"]
-        produk.satuan_id = request.form["satuan"]
-        produk.kategori_id = request.form["kategori"]
-        produk.supplier_id = request.form["supplier"]
-        produk.berat = float(request.form["berat"]) if request.form["berat"] else None
-        produk.stok_minimal = (
-            int(request.form["stok_minimal"]) if request.form["stok_minimal"] else None
-        )
-        produk.tanggal_expired = (
-            request.form["tanggal_expired"] if request.form["tanggal_expired"] else None
-        )
-
-        db.session.commit()
-        flash("Produk updated successfully!", "success")
-        return redirect("/produk")
-
-    satuans = Satuan.query.all()
-    kategoris = Kategori.query.all()
-    suppliers = Supplier.query.all()
-    return render_template(
-        "edit_produk.html",
-        produk=produk,
-        satuans=satuans,
-        kategoris=kategoris,
-        suppliers=suppliers,
-    )
-
-
-@bp.route("/produk/delete/<int:produk_id>", methods=["POST"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def delete_produk(produk_id):
-    produk = Produk.query.get_or_404(produk_id)
-    try:
-        db.session.delete(produk)
-        db.session.commit()
-        flash("Produk deleted successfully!", "success")
-    except IntegrityError as exc:
-        db.session.rollback()
-        flash(
-            "Produk tidak dapat dihapus karena masih memiliki relasi transaksi.",
-            "warning",
-        )
-    except Exception as exc:
-        db.session.rollback()
-        logging.exception("Gagal menghapus produk")
-        flash(f"Gagal menghapus produk: {str(exc)}", "danger")
-    return redirect("/produk")
-
-
-@bp.route("/produk/detail/<int:produk_id>", methods=["GET"])
-@login_required
-@roles_required(*ALL_ROLE_CHOICES)
-def detail_produk(produk_id):
-    produk = Produk.query.get_or_404(produk_id)
-    return render_template("detail_produk.html", produk=produk)
-
-
-@bp.route("/produk/export", methods=["GET"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def export_produk():
-    produks = Produk.query.all()
-
-    data = [
-        {
-            "Kode Produk": produk.kode_produk,
-            "SKU": produk.sku or "",
-            "Nama Produk": produk.nama_produk,
-            "Satuan ID": produk.satuan_id,
-            "Kategori ID": produk.kategori_id,
-            "Supplier ID": produk.supplier_id,
-            "Berat": produk.berat or "",
-            "Stok Minimal": produk.stok_minimal or 0,
-            "Tanggal Expired": (
-                produk.tanggal_expired.strftime("%Y-%m-%d")
-                if produk.tanggal_expired
-                else ""
-            ),
-        }
-        for produk in produks
-    ]
-
-    df = pd.DataFrame(data)
-
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        df.to_excel(writer, index=False)
-    output.seek(0)
-
-    response = make_response(output.read())
-    response.headers["Content-Disposition"] = "attachment; filename=produk.xlsx"
-    response.headers["Content-Type"] = (
-        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
-    return response
-
-
-@bp.route("/produk/import", methods=["POST"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def import_produk():
-    if "file" not in request.files:
-        flash("Tidak ada file yang diunggah!", "danger")
-        return redirect("/produk")
-
-    file = request.files["file"]
-
-    if file.filename == "":
-        flash("File tidak dipilih!", "danger")
-        return redirect("/produk")
-
-    file_bytes = file.read()
-    filename = (file.filename or "").lower()
-
-    def build_summary_message(summary):
-        status_parts = []
-        if summary.get("created"):
-            status_parts.append(f"{summary['created']} produk baru ditambahkan")
-        if summary.get("updated"):
-            status_parts.append(f"{summary['updated']} produk diperbarui")
-        if not status_parts:
-            status_parts.append("Tidak ada perubahan dari file import")
-        return "; ".join(status_parts)
-
-    def warn_skipped(summary):
-        skipped_notes = summary.get("skipped_notes") or []
-        if skipped_notes:
-            detail = "; ".join(skipped_notes[:5])
-            if len(skipped_notes) > 5:
-                detail += f"; dan {len(skipped_notes) - 5} baris lainnya."
-            return detail
-        return None
-
-    try:
-        if filename.endswith(".xls"):
-            try:
-                df = pd.read_excel(BytesIO(file_bytes), engine="xlrd")
-            except ImportError:
-                flash(
-                    "File .xls membutuhkan modul xlrd. Simpan sebagai .xlsx atau install xlrd.",
-                    "danger",
-                )
-                return redirect("/produk")
-        else:
-            df = pd.read_excel(BytesIO(file_bytes))
-    except Exception as e:
-        flash(f"Gagal membaca file: {e}", "danger")
-        return redirect("/produk")
-
-    try:
-        summary = _perform_produk_import(df)
-    except ValueError as exc:
-        flash(str(exc), "danger")
-        return redirect("/produk")
-    except Exception as exc:
-        db.session.rollback()
-        logging.exception("Gagal import produk")
-        flash(f"Gagal menyimpan data produk: {exc}", "danger")
-        return redirect("/produk")
-
-    flash(build_summary_message(summary), "success")
-    skipped_detail = warn_skipped(summary)
-    if skipped_detail:
-        flash(f"Beberapa baris dilewati: {skipped_detail}", "warning")
-
-    return redirect("/produk")
-
-
-def _build_customer_page_context(
-    edit_pelanggan=None,
-    search_query="",
-    page=1,
-    per_page=10,
-    show_duplicate_contacts=False,
-):
-    price_levels = PriceLevel.query.order_by(PriceLevel.name.asc()).all()
-    filtered_query = Pelanggan.query.order_by(Pelanggan.id.desc())
-    if search_query:
-        like_pattern = f"%{search_query}%"
-        filtered_query = filtered_query.filter(
-            or_(
-                Pelanggan.nama.ilike(like_pattern),
-                Pelanggan.pelanggan_id.ilike(like_pattern),
-                Pelanggan.kontak.ilike(like_pattern),
-                Pelanggan.email.ilike(like_pattern),
-            )
-        )
-    if show_duplicate_contacts:
-        duplicate_contact_values = (
-            db.session.query(func.lower(Pelanggan.kontak).label("kontak"))
-            .filter(Pelanggan.kontak.isnot(None), Pelanggan.kontak != "")
-            .group_by(func.lower(Pelanggan.kontak))
-            .having(func.count(Pelanggan.id) > 1)
-            .subquery()
-        )
-        filtered_query = filtered_query.filter(
-            func.lower(Pelanggan.kontak).in_(
-                db.session.query(duplicate_contact_values.c.kontak)
-            )
-        )
-
-    pagination = filtered_query.paginate(page=page, per_page=per_page, error_out=False)
-    pelanggans = pagination.items
-
-    total_customers = Pelanggan.query.count()
-    complete_contacts = Pelanggan.query.filter(
-        Pelanggan.kontak.isnot(None), Pelanggan.kontak != ""
-    ).count()
-    complete_addresses = Pelanggan.query.filter(
-        Pelanggan.alamat.isnot(None), Pelanggan.alamat != ""
-    ).count()
-    missing_contact = total_customers - complete_contacts
-    missing_address = total_customers - complete_addresses
-
-    unique_contacts = (
-        db.session.query(func.count(func.distinct(func.lower(Pelanggan.kontak))))
-        .filter(Pelanggan.kontak.isnot(None), Pelanggan.kontak != "")
-        .scalar()
-        or 0
-    )
-    duplicate_contacts = max(0, complete_contacts - unique_contacts)
-
-    contact_completion = (
-        int(round((complete_contacts / total_customers) * 100))
-        if total_customers
-        else 0
-    )
-    address_completion = (
-        int(round((complete_addresses / total_customers) * 100))
-        if total_customers
-        else 0
-    )
-
-    stat_cards = [
-        {
-            "label": "Total Pelanggan",
-            "value": total_customers,
-            "icon": "fa-users",
-            "accent": "text-primary",
-            "description": "Relasi aktif tersimpan",
-        },
-        {
-            "label": "Kontak Lengkap",
-            "value": complete_contacts,
-            "icon": "fa-phone-alt",
-            "accent": "text-success",
-            "description": f"{contact_completion}% siap dihubungi",
-        },
-        {
-            "label": "Alamat Tercatat",
-            "value": complete_addresses,
-            "icon": "fa-map-marker-alt",
-            "accent": "text-info",
-            "description": f"{address_completion}% siap dikunjungi",
-        },
-        {
-            "label": "Perlu Kontak",
-            "value": missing_contact,
-            "icon": "fa-user-clock",
-            "accent": "text-warning",
-            "description": "Lengkapi agar mudah follow-up",
-        },
-    ]
-
-    insights = [
-        {
-            "title": "Pelanggan tanpa kontak",
-            "value": missing_contact,
-            "status": "warning" if missing_contact else "success",
-            "description": "Tambahkan nomor telepon agar mudah dihubungi.",
-        },
-        {
-            "title": "Pelanggan tanpa alamat",
-            "value": missing_address,
-            "status": "info" if missing_address else "success",
-            "description": "Alamat penting untuk pengiriman dan layanan purna jual.",
-        },
-        {
-            "title": "Kontak duplikat",
-            "value": duplicate_contacts,
-            "status": "secondary" if duplicate_contacts == 0 else "warning",
-            "description": "Gunakan data unik supaya kampanye marketing lebih akurat.",
-            "action_label": "Lihat duplikat" if duplicate_contacts else None,
-            "action_url": url_for("main.pelanggan", duplicate=1)
-            if duplicate_contacts
-            else None,
-        },
-    ]
-
-    next_customer_id = Pelanggan.generate_pelanggan_id()
-    recent_customers = Pelanggan.query.order_by(Pelanggan.id.desc()).limit(5).all()
-
-    return {
-        "pelanggans": pelanggans,
-        "pagination": pagination,
-        "filtered_count": pagination.total,
-        "page": page,
-        "per_page": per_page,
-        "stat_cards": stat_cards,
-        "insights": insights,
-        "recent_customers": recent_customers,
-        "contact_completion": contact_completion,
-        "address_completion": address_completion,
-        "next_customer_id": next_customer_id,
-        "edit_pelanggan": edit_pelanggan,
-        "search_query": search_query,
-        "total_customers": total_customers,
-        "price_levels": price_levels,
-        "show_duplicate_contacts": show_duplicate_contacts,
-    }
-
-
-@bp.route("/pelanggan", methods=["GET", "POST"])
-@login_required
-@roles_required(*SALES_ROLES)
-def pelanggan():
-    search_query = request.args.get("search", "").strip()
-    page = request.args.get("page", 1, type=int)
-    per_page = request.args.get("per_page", 10, type=int)
-    per_page = max(5, min(per_page, 50))
-    show_duplicate_contacts = (
-        str(request.args.get("duplicate", "")).lower() in ("1", "true", "yes")
-    )
-
-    if request.method == "POST":
-        # Gunakan generate_pelanggan_id jika pelanggan_id tidak diisi
-        pelanggan_id = (
-            request.form.get("pelanggan_id") or Pelanggan.generate_pelanggan_id()
-        )
-        nama = request.form["nama"].strip()
-        kontak = request.form["kontak"].strip()
-        email_input = request.form.get("email", "").strip()
-        email = email_input or None
-        alamat = request.form["alamat"].strip()
-        price_level_raw = request.form.get("price_level_id")
-        price_level_obj = None
-        if price_level_raw not in (None, "", "0"):
-            try:
-                price_level_obj = db.session.get(PriceLevel, int(price_level_raw))
-            except (TypeError, ValueError):
-                price_level_obj = None
-
-        required_fields = {"Nama Pelanggan": nama, "Kontak": kontak, "Alamat": alamat}
-        missing_fields = [
-            label for label, value in required_fields.items() if not value
-        ]
-        if missing_fields:
-            flash(f"Kolom berikut wajib diisi: {', '.join(missing_fields)}.", "warning")
-            return redirect(
-                url_for(
-                    "main.pelanggan",
-                    search=search_query,
-                    page=page,
-                    duplicate=1 if show_duplicate_contacts else None,
-                )
-            )
-
-        # Tambahkan pelanggan baru
-        new_pelanggan = Pelanggan(
-            pelanggan_id=pelanggan_id,
-            nama=nama,
-            kontak=kontak,
-            email=email,
-            alamat=alamat,
-            price_level=price_level_obj,
-        )
-        db.session.add(new_pelanggan)
-        db.session.commit()
-        flash("Pelanggan added successfully!", "success")
-        return redirect(url_for("main.pelanggan"))
-
-    return render_template(
-        "data_pelanggan.html",
-        **_build_customer_page_context(
-            search_query=search_query,
-            page=page,
-            per_page=per_page,
-            show_duplicate_contacts=show_duplicate_contacts,
-        ),
-    )
-
-
-@bp.route("/pelanggan/edit/<int:pelanggan_id>", methods=["GET", "POST"])
-@login_required
-@roles_required(*SALES_ROLES)
-def edit_pelanggan(pelanggan_id):
-    search_query = request.args.get("search", "").strip()
-    page = request.args.get("page", 1, type=int)
-    per_page = request.args.get("per_page", 10, type=int)
-    per_page = max(5, min(per_page, 50))
-    show_duplicate_contacts = (
-        str(request.args.get("duplicate", "")).lower() in ("1", "true", "yes")
-    )
-    pelanggan = Pelanggan.query.get_or_404(pelanggan_id)
-
-    if request.method == "POST":
-        nama = request.form["nama"].strip()
-        kontak = request.form["kontak"].strip()
-        email_input = request.form.get("email", "").strip()
-        email = email_input or None
-        alamat = request.form["alamat"].strip()
-        price_level_raw = request.form.get("price_level_id")
-        price_level_obj = None
-        if price_level_raw not in (None, "", "0"):
-            try:
-                price_level_obj = db.session.get(PriceLevel, int(price_level_raw))
-            except (TypeError, ValueError):
-                price_level_obj = None
-
-        if not nama or not kontak or not alamat:
-            flash("Nama, kontak, dan alamat wajib diisi.", "warning")
-            return redirect(
-                url_for(
-                    "main.edit_pelanggan",
-                    pelanggan_id=pelanggan_id,
-                    search=search_query,
-                    page=page,
-                    duplicate=1 if show_duplicate_contacts else None,
-                )
-            )
-
-        pelanggan.nama = nama
-        pelanggan.kontak = kontak
-        pelanggan.email = email
-        pelanggan.alamat = alamat
-        pelanggan.price_level = price_level_obj
-        db.session.commit()
-        flash(f"Pelanggan {pelanggan.nama} updated successfully!", "success")
-        return redirect(url_for("main.pelanggan", search=search_query, page=page))
-
-    return render_template(
-        "data_pelanggan.html",
-        **_build_customer_page_context(
-            edit_pelanggan=pelanggan,
-            search_query=search_query,
-            page=page,
-            per_page=per_page,
-            show_duplicate_contacts=show_duplicate_contacts,
-        ),
-    )
-
-
-@bp.route("/pelanggan/delete/<int:pelanggan_id>", methods=["POST"])
-@login_required
-@roles_required(*SALES_ROLES)
-def delete_pelanggan(pelanggan_id):
-    pelanggan = Pelanggan.query.get_or_404(pelanggan_id)
-    if Penjualan.query.filter_by(pelanggan_id=pelanggan.id).count():
-        flash(
-            "Pelanggan masih memiliki riwayat transaksi dan tidak dapat dihapus.",
-            "warning",
-        )
-        return redirect("/pelanggan")
-    pelanggan_name = pelanggan.nama  # Simpan nama pelanggan untuk pesan flash
-    db.session.delete(pelanggan)
-    db.session.commit()
-    flash(f"Pelanggan {pelanggan_name} deleted successfully!", "success")
-    return redirect("/pelanggan")
-
-
-@bp.route("/pelanggan/export", methods=["GET"])
-@login_required
-@roles_required(*SALES_ROLES)
-def export_pelanggan():
-    customers = Pelanggan.query.order_by(Pelanggan.nama.asc()).all()
-    data = [
-        {
-            "ID Pelanggan": customer.pelanggan_id,
-            "Nama Pelanggan": customer.nama,
-            "Kontak": customer.kontak,
-            "Email": customer.email or "",
-            "Alamat": customer.alamat,
-            "Level Harga": customer.price_level.name if customer.price_level else "",
-        }
-        for customer in customers
-    ]
-
-    df = pd.DataFrame(data)
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        df.to_excel(writer, index=False)
-    output.seek(0)
-
-    response = make_response(output.read())
-    response.headers["Content-Disposition"] = "attachment; filename=pelanggan.xlsx"
-    response.headers["Content-Type"] = (
-        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
-    return response
-
-
-@bp.route("/pelanggan/import", methods=["POST"])
-@login_required
-@roles_required(*SALES_ROLES)
-def import_pelanggan():
-    if "file" not in request.files:
-        flash("No file uploaded!", "danger")
-        return redirect("/pelanggan")
-
-    file = request.files["file"]
-    if file.filename == "":
-        flash("No selected file!", "danger")
-        return redirect("/pelanggan")
-
-    try:
-        df = pd.read_excel(file)
-    except Exception as e:
-        flash(f"Error reading file: {e}", "danger")
-        return redirect("/pelanggan")
-
-    required_columns = ["Nama Pelanggan", "Kontak", "Alamat"]
-    missing_columns = [column for column in required_columns if column not in df.columns]
-    if missing_columns:
-        flash(
-            "Invalid file format! Missing required columns: "
-            + ", ".join(missing_columns),
-            "danger",
-        )
-        return redirect("/pelanggan")
-
-    def _clean_cell(value):
-        if pd.isna(value):
-            return ""
-        text = str(value).strip()
-        if re.fullmatch(r"\d+\.0+", text):
-            text = text.split(".", 1)[0]
-        return text
-
-    price_levels = PriceLevel.query.all()
-    price_level_by_id = {level.id: level for level in price_levels}
-    price_level_by_name = {
-        level.name.lower(): level for level in price_levels if level.name
-    }
-
-    existing_ids = {
-        row[0] for row in db.session.query(Pelanggan.pelanggan_id).all() if row[0]
-    }
-    new_ids = set()
-    next_id_num = 1
-    last_customer = Pelanggan.query.order_by(Pelanggan.id.desc()).first()
-    if last_customer and last_customer.pelanggan_id:
-        match = re.match(r"(?i)^CUST(\d+)$", last_customer.pelanggan_id.strip())
-        if match:
-            next_id_num = int(match.group(1)) + 1
-
-    def _generate_id():
-        nonlocal next_id_num
-        while True:
-            candidate = f"CUST{next_id_num:03d}"
-            next_id_num += 1
-            if candidate not in existing_ids and candidate not in new_ids:
-                new_ids.add(candidate)
-                return candidate
-
-    created_count = 0
-    updated_count = 0
-    skipped_count = 0
-
-    for idx, row in df.iterrows():
-        row_number = idx + 2
-        pelanggan_id = _clean_cell(row.get("ID Pelanggan", row.get("Pelanggan ID", "")))
-        nama = _clean_cell(row.get("Nama Pelanggan", ""))
-        kontak = _clean_cell(row.get("Kontak", ""))
-        email_value = _clean_cell(row.get("Email", ""))
-        email = email_value or None
-        alamat = _clean_cell(row.get("Alamat", ""))
-
-        if not nama or not kontak or not alamat:
-            skipped_count += 1
-            flash(
-                f'Baris {row_number}: Data pelanggan "{nama or "-"}" tidak lengkap dan dilewati.',
-                "warning",
-            )
-            continue
-
-        level_obj = None
-        level_id_raw = _clean_cell(row.get("Level Harga ID", ""))
-        if level_id_raw:
-            try:
-                level_id = int(level_id_raw)
-            except ValueError:
-                level_id = None
-            if level_id:
-                level_obj = price_level_by_id.get(level_id)
-        if not level_obj:
-            level_name = _clean_cell(row.get("Level Harga", ""))
-            if level_name:
-                level_obj = price_level_by_name.get(level_name.lower())
-
-        existing = None
-        if pelanggan_id:
-            existing = Pelanggan.query.filter_by(pelanggan_id=pelanggan_id).first()
-        if not existing and email:
-            existing = Pelanggan.query.filter_by(email=email).first()
-        if not existing and nama and kontak:
-            existing = Pelanggan.query.filter(
-                func.lower(Pelanggan.nama) == nama.lower(),
-                Pelanggan.kontak == kontak,
-            ).first()
-
-        if existing:
-            existing.nama = nama
-            existing.kontak = kontak
-            if email is not None:
-                existing.email = email
-            existing.alamat = alamat
-            if level_obj is not None:
-                existing.price_level = level_obj
-            updated_count += 1
-            continue
-
-        if pelanggan_id:
-            if pelanggan_id in new_ids:
-                skipped_count += 1
-                flash(
-                    f'Baris {row_number}: ID pelanggan "{pelanggan_id}" duplikat di file dan dilewati.',
-                    "warning",
-                )
-                continue
-            if pelanggan_id in existing_ids:
-                pelanggan_id = _generate_id()
-            else:
-                new_ids.add(pelanggan_id)
-        else:
-            pelanggan_id = _generate_id()
-
-        pelanggan = Pelanggan(
-            pelanggan_id=pelanggan_id,
-            nama=nama,
-            kontak=kontak,
-            email=email,
-            alamat=alamat,
-            price_level=level_obj,
-        )
-        db.session.add(pelanggan)
-        created_count += 1
-
-    db.session.commit()
-    message_parts = []
-    if created_count:
-        message_parts.append(f"{created_count} pelanggan baru")
-    if updated_count:
-        message_parts.append(f"{updated_count} pelanggan diupdate")
-    if skipped_count:
-        message_parts.append(f"{skipped_count} dilewati")
-    summary = ", ".join(message_parts) if message_parts else "Tidak ada perubahan"
-    flash(f"Import pelanggan selesai: {summary}.", "success")
-    return redirect("/pelanggan")
-
-
-@bp.route("/api/get_product", methods=["GET"])
-@login_required
-@roles_required(*ALL_ROLE_CHOICES)
-def get_product():
-    product_code = request.args.get("product_code")
-    product = Produk.query.filter_by(kode_produk=product_code).first()
-
-    if product:
-        return {
-            "success": True,
-            "product_name": product.nama_produk,
-            "category": product.kategori.name,
-            "satuan": product.satuan.name,
-        }
-    else:
-        return {"success": False, "message": "Produk tidak ditemukan."}, 404
-
-
-@bp.route("/api/products", methods=["GET"])
-@login_required
-@roles_required(*ALL_ROLE_CHOICES)
-def get_products():
-    search_query = request.args.get("q", "").strip()
-    products = Produk.query.options(
-        joinedload(Produk.kategori), joinedload(Produk.satuan)
-    )
-
-    if search_query:
-        products = products.filter(
-            or_(
-                Produk.nama_produk.ilike(f"%{search_query}%"),
-                Produk.kode_produk.ilike(f"%{search_query}%"),
-                Produk.sku.ilike(f"%{search_query}%"),
-                Produk.barcode.ilike(f"%{search_query}%"),
-            )
-        )
-
-    products = products.limit(50).all()  # Batasi jumlah hasil untuk performa
-    product_ids = [prod.id for prod in products]
-
-    level_entries = []
-    if product_ids:
-        level_entries = (
-            ProductPriceLevel.query.options(joinedload(ProductPriceLevel.level))
-            .filter(ProductPriceLevel.product_id.in_(product_ids))
-            .all()
-        )
-
-    price_map = {}
-    for entry in level_entries:
-        price_map.setdefault(entry.product_id, []).append(
-            {
-                "level_id": entry.level_id,
-                "level_name": entry.level.name if entry.level else "",
-                "price": entry.price,
-            }
-        )
-
-    product_list = []
-    for product in products:
-        product_list.append(
-            {
-                "id": product.id,
-                "kode_produk": product.kode_produk,
-                "nama_produk": product.nama_produk,
-                "sku": product.sku,
-                "barcode": product.barcode,
-                "kategori": (
-                    product.kategori.name if product.kategori else "Tidak dikategorikan"
-                ),
-                "satuan": product.satuan.name if product.satuan else "",
-                "price_levels": sorted(
-                    price_map.get(product.id, []),
-                    key=lambda item: (item.get("level_name") or "").lower(),
-                ),
-            }
-        )
-
-    return {"products": product_list}
-
-
-@bp.route("/api/pelanggan/suggest", methods=["GET"])
-@login_required
-@roles_required(*SALES_ROLES)
-def pelanggan_suggest():
-    term = (request.args.get("q") or "").strip()
-    page = request.args.get("page", 1, type=int)
-    per_page = request.args.get("per_page", 8, type=int)
-    page = max(1, page)
-    per_page = max(5, min(per_page, 20))
-
-    if not term:
-        return {
-            "customers": [],
-            "page": page,
-            "per_page": per_page,
-            "total": 0,
-            "has_next": False,
-        }
-
-    like = f"%{term}%"
-    base_query = (
-        Pelanggan.query.options(joinedload(Pelanggan.price_level))
-        .filter(
-            or_(
-                Pelanggan.nama.ilike(like),
-                Pelanggan.pelanggan_id.ilike(like),
-                Pelanggan.kontak.ilike(like),
-                Pelanggan.email.ilike(like),
-            )
-        )
-        .order_by(Pelanggan.nama.asc())
-    )
-    pagination = base_query.paginate(page=page, per_page=per_page, error_out=False)
-    customers = pagination.items
-
-    payload = [
-        {
-            "id": customer.id,
-            "pelanggan_id": customer.pelanggan_id,
-            "nama": customer.nama,
-            "kontak": customer.kontak,
-            "price_level": customer.price_level.name if customer.price_level else "",
-        }
-        for customer in customers
-    ]
-    return {
-        "customers": payload,
-        "page": page,
-        "per_page": per_page,
-        "total": pagination.total,
-        "has_next": bool(pagination.has_next),
-    }
-
-
-@bp.route("/api/price_level_costs", methods=["GET"])
-@login_required
-@roles_required(*ALL_ROLE_CHOICES)
-def get_price_level_costs():
-    level_id = request.args.get("level_id")
-    try:
-        level_id_int = int(level_id)
-    except (TypeError, ValueError):
-        return {"costs": []}
-
-    costs = (
-        PriceLevelCost.query.filter_by(level_id=level_id_int, is_active=True)
-        .order_by(PriceLevelCost.name.asc())
-        .all()
-    )
-    payload = [
-        {
-            "id": cost.id,
-            "name": cost.name,
-            "type": cost.type,
-            "value": cost.value,
-        }
-        for cost in costs
-    ]
-    return {"costs": payload}
-
-
-@bp.route("/pembelian", methods=["GET", "POST"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def pembelian():
-    if not _ensure_purchase_payment_columns():
-        flash(
-            "Kolom pembayaran pembelian belum tersedia. Jalankan migrasi untuk pembelian.",
-            "warning",
-        )
-    if request.method == "POST":
-        try:
-            if not request.is_json:
-                return (
-                    jsonify(
-                        {
-                            "success": False,
-                            "message": "Content-Type harus 'application/json'",
-                        }
-                    ),
-                    415,
-                )
-
-            payload = request.get_json(silent=True) or {}
-
-            tanggal_faktur = payload.get("tanggal_faktur")
-            no_faktur = (payload.get("no_faktur") or "").strip()
-            supplier_id = payload.get("supplier")
-            items = payload.get("items") or []
-            jenis_pembayaran = (payload.get("jenis_pembayaran") or "Tunai").strip()
-            due_date_raw = (payload.get("due_date") or "").strip()
-            payment_bank = (payload.get("payment_bank") or "").strip()
-            payment_reference = (payload.get("payment_reference") or "").strip()
-            allowed_payments = {"Tunai", "Tempo", "Transfer"}
-
-            if not tanggal_faktur or not no_faktur or not supplier_id:
-                return (
-                    jsonify({"success": False, "message": "Data utama tidak lengkap."}),
-                    400,
-                )
-
-            if jenis_pembayaran not in allowed_payments:
-                return (
-                    jsonify(
-                        {"success": False, "message": "Jenis pembayaran tidak valid."}
-                    ),
-                    400,
-                )
-
-            if Pembelian.query.filter_by(no_faktur=no_faktur).first():
-                return (
-                    jsonify(
-                        {
-                            "success": False,
-                            "message": f"Nomor faktur {no_faktur} sudah ada.",
-                        }
-                    ),
-                    400,
-                )
-
-            parsed_date = None
-            try:
-                parsed_date = datetime.strptime(tanggal_faktur, "%Y-%m-%d").date()
-            except ValueError:
-                return (
-                    jsonify(
-                        {
-                            "success": False,
-                            "message": "Format tanggal faktur tidak valid.",
-                        }
-                    ),
-                    400,
-                )
-
-            due_date = None
-            if due_date_raw:
-                try:
-                    due_date = datetime.strptime(due_date_raw, "%Y-%m-%d").date()
-                except ValueError:
-                    return (
-                        jsonify(
-                            {
-                                "success": False,
-                                "message": "Format tanggal jatuh tempo tidak valid.",
-                            }
-                        ),
-                        400,
-                    )
-
-            if jenis_pembayaran == "Tempo" and not due_date:
-                return (
-                    jsonify(
-                        {
-                            "success": False,
-                            "message": "Tanggal jatuh tempo wajib diisi untuk pembayaran tempo.",
-                        }
-                    ),
-                    400,
-                )
-            if jenis_pembayaran == "Transfer" and not payment_reference:
-                return (
-                    jsonify(
-                        {
-                            "success": False,
-                            "message": "Nomor referensi wajib diisi untuk pembayaran transfer.",
-                        }
-                    ),
-                    400,
-                )
-            if jenis_pembayaran != "Transfer":
-                payment_bank = ""
-                payment_reference = ""
-            if jenis_pembayaran != "Tempo":
-                due_date = None
-
-            try:
-                supplier_id = int(supplier_id)
-            except (TypeError, ValueError):
-                return (
-                    jsonify({"success": False, "message": "Supplier tidak valid."}),
-                    400,
-                )
-
-            supplier = db.session.get(Supplier, supplier_id)
-            if not supplier:
-                return (
-                    jsonify({"success": False, "message": "Supplier tidak ditemukan."}),
-                    404,
-                )
-
-            locked_period_for_purchase = _get_locked_period_for_date(parsed_date)
-            if locked_period_for_purchase:
-                return (
-                    jsonify(
-                        {
-                            "success": False,
-                            "message": f"Periode {locked_period_for_purchase.label} sudah ditutup; tidak bisa menyimpan pembelian.",
-                        }
-                    ),
-                    400,
-                )
-
-            if not items:
-                return (
-                    jsonify(
-                        {
-                            "success": False,
-                            "message": "Tidak ada data barang yang dikirim.",
-                        }
-                    ),
-                    400,
-                )
-
-            valid_items = []
-            errors = []
-
-            for index, item in enumerate(items, start=1):
-                kode_barang = (item.get("kode_barang") or "").strip()
-                nama_barang = (item.get("nama_barang") or "").strip()
-                kategori = (item.get("kategori") or "").strip()
-
-                try:
-                    jumlah = int(item.get("jumlah") or 0)
-                except (TypeError, ValueError):
-                    jumlah = 0
-
-                try:
-                    harga_beli = float(item.get("harga_beli") or 0.0)
-                except (TypeError, ValueError):
-                    harga_beli = 0.0
-
-                try:
-                    diskon = float(item.get("diskon") or 0.0)
-                except (TypeError, ValueError):
-                    diskon = 0.0
-
-                try:
-                    pajak = float(item.get("pajak") or 0.0)
-                except (TypeError, ValueError):
-                    pajak = 0.0
-
-                try:
-                    harga_jual = float(item.get("harga_jual") or 0.0)
-                except (TypeError, ValueError):
-                    harga_jual = 0.0
-
-                exp_date_raw = item.get("exp_date")
-                exp_date = None
-                if exp_date_raw:
-                    try:
-                        exp_date = datetime.strptime(exp_date_raw, "%Y-%m-%d")
-                    except ValueError:
-                        errors.append(f"Tanggal exp tidak valid pada baris {index}.")
-
-                if not kode_barang or not nama_barang or not kategori:
-                    errors.append(
-                        f"Kode, nama, dan kategori wajib diisi (baris {index})."
-                    )
-                    continue
-
-                if jumlah <= 0:
-                    errors.append(f"Jumlah harus lebih dari 0 (baris {index}).")
-                    continue
-
-                diskon = max(0.0, min(diskon, 100.0))
-                pajak = max(0.0, pajak)
-
-                discount_amount = harga_beli * (diskon / 100.0)
-                net_cost = max(harga_beli - discount_amount, 0.0)
-                tax_amount = net_cost * (pajak / 100.0)
-                harga_final = net_cost + tax_amount
-                total_hpp = net_cost * jumlah  # HPP tanpa memasukkan pajak
-
-                produk = Produk.query.filter_by(kode_produk=kode_barang).first()
-                if not produk:
-                    errors.append(
-                        f"Produk dengan kode {kode_barang} tidak ditemukan (baris {index})."
-                    )
-                    continue
-
-                valid_items.append(
-                    {
-                        "kode_barang": kode_barang,
-                        "nama_barang": nama_barang,
-                        "kategori": kategori,
-                        "jumlah": jumlah,
-                        "harga_beli": harga_beli,
-                        "diskon": diskon,
-                        "pajak": pajak,
-                        "harga_jual": harga_jual,
-                        "exp_date": exp_date,
-                        "harga_final": harga_final,  # tetap simpan harga akhir termasuk pajak bila perlu dilaporkan
-                        "total_hpp": total_hpp,
-                        "produk": produk,
-                        "cost_basis": net_cost,
-                    }
-                )
-
-            if errors:
-                return jsonify({"success": False, "message": " ".join(errors)}), 400
-
-            if not valid_items:
-                return (
-                    jsonify(
-                        {
-                            "success": False,
-                            "message": "Tidak ada baris barang yang valid.",
-                        }
-                    ),
-                    400,
-                )
-
-            pembelian = Pembelian(
-                tanggal_faktur=parsed_date,
-                no_faktur=no_faktur,
-                supplier_id=supplier_id,
-                jenis_pembayaran=jenis_pembayaran,
-                due_date=due_date,
-                payment_bank=payment_bank or None,
-                payment_reference=payment_reference or None,
-            )
-            db.session.add(pembelian)
-            db.session.flush()
-
-            total_pembelian = 0.0
-            total_items = 0
-
-            for item in valid_items:
-                produk = item["produk"]
-                if produk:
-                    produk.update_stok_dan_hpp(item["cost_basis"], item["jumlah"])
-
-                barang_pembelian = BarangPembelian(
-                    pembelian_id=pembelian.id,
-                    kode_barang=item["kode_barang"],
-                    nama_barang=item["nama_barang"],
-                    kategori=item["kategori"],
-                    jumlah=item["jumlah"],
-                    harga_beli=item["harga_beli"],
-                    diskon=item["diskon"],
-                    pajak=item["pajak"],
-                    harga_jual=item["harga_jual"],
-                    exp_date=item["exp_date"],
-                    hpp=item["total_hpp"],
-                )
-                total_pembelian += item["total_hpp"]
-                total_items += item["jumlah"]
-                db.session.add(barang_pembelian)
-
-            db.session.commit()
-
-            return (
-                jsonify(
-                    {
-                        "success": True,
-                        "message": "Pembelian berhasil disimpan!",
-                        "total_biaya": total_pembelian,
-                        "total_barang": total_items,
-                    }
-                ),
-                200,
-            )
-
-        except Exception as exc:
-            db.session.rollback()
-            logging.exception("Gagal menyimpan pembelian")
-            return jsonify({"success": False, "message": f"Error: {str(exc)}"}), 500
-
-    po_id = _parse_int_param(request.args.get("po_id"))
-
-    suppliers = Supplier.query.order_by(Supplier.name.asc()).all()
-    supplier_payload = [
-        {
-            "id": supplier.id,
-            "name": supplier.name,
-            "contact_person": supplier.contact_person,
-            "phone": supplier.phone,
-            "email": supplier.email,
-            "address": supplier.address,
-        }
-        for supplier in suppliers
-    ]
-
-    supplier_lookup = {supplier["id"]: supplier for supplier in supplier_payload}
-
-    produk_records = Produk.query.order_by(Produk.nama_produk.asc()).all()
-    level_price_entries_penjualan = ProductPriceLevel.query.all()
-    level_price_map = {}
-    for entry in level_price_entries_penjualan:
-        level_price_map.setdefault(entry.product_id, {})[entry.level_id] = float(
-            entry.price or 0.0
-        )
-    price_levels = PriceLevel.query.order_by(PriceLevel.name.asc()).all()
-    product_payload = [
-        {
-            "id": produk.id,
-            "kode": produk.kode_produk,
-            "nama": produk.nama_produk,
-            "kategori": produk.kategori.name if produk.kategori else None,
-            "harga_beli": float(produk.harga_beli or 0.0),
-            "harga_jual": float(produk.harga or 0.0),
-            "sku": produk.sku,
-            "supplier": produk.supplier.name if produk.supplier else None,
-            "satuan": produk.satuan.name if produk.satuan else None,
-            "stok": produk.stok_lama,
-            "stok_minimal": produk.stok_minimal,
-        }
-        for produk in produk_records
-    ]
-
-    default_purchase_tax_value = _get_default_purchase_tax()
-    po_prefill = None
-    if po_id:
-        _ensure_table(PurchaseOrder)
-        _ensure_table(PurchaseOrderItem)
-        po = (
-            PurchaseOrder.query.options(
-                joinedload(PurchaseOrder.items),
-                joinedload(PurchaseOrder.supplier),
-            )
-            .filter(PurchaseOrder.id == po_id)
-            .first()
-        )
-        if not po:
-            flash("PO tidak ditemukan.", "warning")
-        elif po.status != "received":
-            flash("PO belum berstatus received, belum bisa dibuatkan pembelian.", "warning")
-        else:
-            product_lookup = {product["id"]: product for product in product_payload}
-            items = []
-            for item in po.items:
-                product = product_lookup.get(item.product_id)
-                if not product:
-                    continue
-                items.append(
-                    {
-                        "kode_barang": product.get("kode") or "",
-                        "nama_barang": product.get("nama") or "",
-                        "kategori": product.get("kategori") or "Tanpa kategori",
-                        "satuan": product.get("satuan") or "",
-                        "jumlah": float(item.qty or 0),
-                        "harga_beli": float(item.unit_price or 0.0),
-                        "diskon": 0,
-                        "pajak": float(default_purchase_tax_value or 0),
-                        "harga_jual": float(product.get("harga_jual") or 0.0),
-                        "exp_date": None,
-                    }
-                )
-            if items:
-                po_prefill = {
-                    "po_id": po.id,
-                    "po_number": po.po_number,
-                    "supplier_id": po.supplier_id,
-                    "items": items,
-                }
-            else:
-                flash("Item PO tidak ditemukan untuk prefill pembelian.", "warning")
-
-    total_invoices = Pembelian.query.count()
-    total_spent = (
-        db.session.query(func.coalesce(func.sum(BarangPembelian.hpp), 0)).scalar()
-        or 0.0
-    )
-    total_items = (
-        db.session.query(func.coalesce(func.sum(BarangPembelian.jumlah), 0)).scalar()
-        or 0
-    )
-    today = local_today()
-    today_invoices = Pembelian.query.filter(Pembelian.tanggal_faktur == today).count()
-    average_invoice = total_spent / total_invoices if total_invoices else 0.0
-
-    purchase_stat_cards = [
-        {
-            "label": "Total Faktur",
-            "value": total_invoices,
-            "icon": "fa-file-invoice",
-            "accent": "text-primary",
-            "type": "count",
-            "description": "Jumlah transaksi pembelian tersimpan.",
-        },
-        {
-            "label": "Total Pengeluaran",
-            "value": total_spent,
-            "icon": "fa-coins",
-            "accent": "text-success",
-            "type": "currency",
-            "description": "Akumulasi biaya restock.",
-        },
-        {
-            "label": "Faktur Hari Ini",
-            "value": today_invoices,
-            "icon": "fa-calendar-day",
-            "accent": "text-info",
-            "type": "count",
-            "description": "Restock yang tercatat hari ini.",
-        },
-        {
-            "label": "Rata-rata Faktur",
-            "value": average_invoice,
-            "icon": "fa-chart-bar",
-            "accent": "text-warning",
-            "type": "currency",
-            "description": "Nilai rata-rata per transaksi pembelian.",
-        },
-    ]
-
-    purchase_insights = [
-        {
-            "title": "Total barang masuk",
-            "value": total_items,
-            "status": "info" if total_items else "secondary",
-            "type": "count",
-            "description": "Jumlah unit yang direstock dari seluruh faktur.",
-        },
-        {
-            "title": "Supplier aktif",
-            "value": len(suppliers),
-            "status": "success" if suppliers else "secondary",
-            "type": "count",
-            "description": "Partner pemasok yang siap memenuhi restock.",
-        },
-        {
-            "title": "Pengeluaran rata-rata",
-            "value": average_invoice,
-            "status": "warning" if average_invoice else "secondary",
-            "type": "currency",
-            "description": "Gunakan sebagai acuan budgeting pembelian.",
-        },
-    ]
-
-    upcoming_expiry = (
-        BarangPembelian.query.filter(BarangPembelian.exp_date.isnot(None))
-        .order_by(BarangPembelian.exp_date.asc())
-        .limit(5)
-        .all()
-    )
-    if upcoming_expiry:
-        earliest = upcoming_expiry[0]
-        purchase_insights.append(
-            {
-                "title": "Produk mendekati kadaluarsa",
-                "value": (
-                    earliest.exp_date.strftime("%d %b %Y") if earliest.exp_date else "-"
-                ),
-                "status": "warning",
-                "type": "text",
-                "description": f"{earliest.nama_barang} perlu diprioritaskan.",
-            }
-        )
-
-    recent_purchases = []
-    recent_query = (
-        Pembelian.query.order_by(Pembelian.tanggal_faktur.desc(), Pembelian.id.desc())
-        .limit(5)
-        .all()
-    )
-    for purchase in recent_query:
-        total_cost = sum(barang.hpp for barang in purchase.barang)
-        total_units = sum(barang.jumlah for barang in purchase.barang)
-        recent_purchases.append(
-            {
-                "no_faktur": purchase.no_faktur,
-                "tanggal": (
-                    purchase.tanggal_faktur.strftime("%d %b %Y")
-                    if purchase.tanggal_faktur
-                    else "-"
-                ),
-                "supplier": (
-                    purchase.supplier.name if purchase.supplier else "Tanpa supplier"
-                ),
-                "total": total_cost,
-                "items": total_units,
-            }
-        )
-
-    return render_template(
-        "pembelian.html",
-        supplier_payload=supplier_payload,
-        supplier_lookup=supplier_lookup,
-        product_payload=product_payload,
-        purchase_stat_cards=purchase_stat_cards,
-        purchase_insights=purchase_insights,
-        recent_purchases=recent_purchases,
-        default_purchase_tax=default_purchase_tax_value,
-        po_prefill=po_prefill,
-        draft_purchase_invoice=_build_draft_invoice(
-            _get_purchase_invoice_prefix(), Pembelian
-        ),
-    )
-
-
-@bp.route("/check_no_faktur", methods=["POST"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def check_no_faktur():
-    try:
-        # Pastikan request dalam format JSON
-        if not request.is_json:
-            return (
-                jsonify(
-                    {
-                        "success": False,
-                        "message": "Content-Type harus 'application/json'",
-                    }
-                ),
-                415,
-            )
-
-        # Ambil data dari request
-        data = request.json
-        no_faktur = data.get("no_faktur")
-
-        if not no_faktur:
-            return (
-                jsonify({"success": False, "message": "Nomor faktur tidak diberikan."}),
-                400,
-            )
-
-        # Cek apakah nomor faktur sudah ada
-        existing_pembelian = Pembelian.query.filter_by(no_faktur=no_faktur).first()
-        if existing_pembelian:
-            return (
-                jsonify(
-                    {
-                        "success": True,
-                        "available": False,
-                        "exists": True,
-                        "message": f"Nomor faktur {no_faktur} sudah ada.",
-                    }
-                ),
-                200,
-            )
-
-        # Jika tidak ada
-        return (
-            jsonify(
-                {
-                    "success": True,
-                    "available": True,
-                    "exists": False,
-                    "message": "Nomor faktur tersedia.",
-                }
-            ),
-            200,
-        )
-
-    except Exception as e:
-        print("Error:", str(e))
-        return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
-
-
-@bp.route("/shift/open", methods=["POST"])
-@login_required
-@roles_required(*SALES_ROLES)
-def shift_open():
-    user = get_current_user()
-    if not user:
-        return _auth_required_response()
-
-    today = local_today()
-    next_target = _resolve_next_target(url_for("main.penjualan"))
-    handover = request.form.get("handover") == "1"
-
-    is_admin = (user.role or "").lower() == ROLE_ADMIN
-    if is_admin:
-        _auto_close_stale_shifts(user.id)
-    else:
-        _auto_close_stale_shifts(user.id, only_user_id=user.id)
-
-    existing_today = CashierShift.query.filter_by(
-        user_id=user.id, shift_date=today
-    ).first()
-    if existing_today and not handover:
-        flash("Shift hari ini sudah dibuat. Tidak bisa membuka shift baru.", "warning")
-        return redirect(next_target)
-
-    open_shift = _get_open_shift(user.id)
-    if open_shift and not handover:
-        flash("Shift masih terbuka. Tutup shift sebelumnya terlebih dahulu.", "warning")
-        return redirect(next_target)
-
-    if existing_today and handover:
-        prev_opened = existing_today.opened_at
-        prev_closed = existing_today.closed_at or local_now()
-        existing_today.opened_at = local_now()
-        existing_today.closed_at = None
-        existing_today.closed_by = None
-        existing_today.forced_close = False
-        note = f"Handover {prev_opened.strftime('%H:%M')}-{prev_closed.strftime('%H:%M')}"
-        existing_today.note = _append_shift_note(existing_today.note, note)
-        db.session.commit()
-        flash("Shift baru dibuka (handover).", "success")
-        return redirect(next_target)
-
-    shift = CashierShift(user_id=user.id, shift_date=today, opened_at=local_now())
-    db.session.add(shift)
-    db.session.commit()
-    flash("Shift kasir berhasil dibuka.", "success")
-    return redirect(next_target)
-
-
-@bp.route("/shift/close/<int:shift_id>", methods=["POST"])
-@login_required
-@roles_required(*SALES_ROLES)
-def shift_close(shift_id):
-    user = get_current_user()
-    if not user:
-        return _auth_required_response()
-
-    shift = CashierShift.query.get_or_404(shift_id)
-    next_target = _resolve_next_target(url_for("main.penjualan"))
-    is_admin = (user.role or "").lower() == ROLE_ADMIN
-    force_close = request.form.get("force") == "1"
-
-    if not is_admin and shift.user_id != user.id:
-        return _forbidden_response({ROLE_ADMIN, ROLE_KASIR, ROLE_SALES})
-
-    if shift.closed_at:
-        flash("Shift ini sudah ditutup.", "info")
-        return redirect(next_target)
-
-    shift.closed_at = local_now()
-    shift.closed_by = user.id
-    shift.forced_close = bool(force_close and is_admin)
-    db.session.commit()
-    flash(
-        "Shift ditutup paksa." if shift.forced_close else "Shift berhasil ditutup.",
-        "success",
-    )
-    return redirect(next_target)
-
-
-@bp.route("/shift/auto-close", methods=["POST"])
-@login_required
-@roles_required(*ADMIN_ONLY)
-def shift_auto_close():
-    user = get_current_user()
-    if not user:
-        return _auth_required_response()
-
-    next_target = _resolve_next_target(url_for("main.dashboard"))
-    result = _auto_close_stale_shifts(user.id, collect=True)
-    closed_count = result["count"]
-    if closed_count:
-        session["auto_closed_shift_log"] = result
-        flash(f"{closed_count} shift lama berhasil ditutup otomatis.", "success")
-    else:
-        session.pop("auto_closed_shift_log", None)
-        flash("Tidak ada shift lama yang perlu ditutup.", "info")
-    return redirect(next_target)
-
-
-@bp.route("/shift/user/<int:user_id>")
-@login_required
-@roles_required(*ADMIN_ONLY)
-def shift_user_detail(user_id):
-    user = User.query.get_or_404(user_id)
-    shifts = (
-        CashierShift.query.options(joinedload(CashierShift.closed_by_user))
-        .filter(CashierShift.user_id == user_id)
-        .order_by(CashierShift.opened_at.desc())
-        .limit(120)
-        .all()
-    )
-    open_count = sum(1 for shift in shifts if shift.closed_at is None)
-    total_count = len(shifts)
-    return render_template(
-        "shift_user_detail.html",
-        shift_user=user,
-        shifts=shifts,
-        open_count=open_count,
-        total_count=total_count,
-    )
-
-
-@bp.route("/penjualan", methods=["GET", "POST"])
-@login_required
-@roles_required(*SALES_ROLES)
-def penjualan():
-    form = SalesForm()
-    user = get_current_user()
-    if user:
-        is_admin = (user.role or "").lower() == ROLE_ADMIN
-        if is_admin:
-            _auto_close_stale_shifts(user.id)
-        else:
-            _auto_close_stale_shifts(user.id, only_user_id=user.id)
-    today = local_today()
-    active_shift = _get_open_shift(user.id) if user else None
-    shift_today = None
-    if user:
-        shift_today = (
-            CashierShift.query.filter_by(user_id=user.id, shift_date=today)
-            .order_by(CashierShift.id.desc())
-            .first()
-        )
-    is_admin = bool(user and (user.role or "").lower() == ROLE_ADMIN)
-    open_shifts = []
-    if is_admin:
-        open_shifts = (
-            CashierShift.query.options(joinedload(CashierShift.user))
-            .filter(CashierShift.closed_at.is_(None))
-            .order_by(CashierShift.opened_at.asc())
-            .all()
-        )
-
-    pelanggan_records = Pelanggan.query.order_by(Pelanggan.nama.asc()).all()
-    form.pelanggan_id.choices = [(0, "Pilih pelanggan")] + [
-        (p.id, f"{p.nama} ({p.pelanggan_id})") for p in pelanggan_records
-    ]
-    if form.pelanggan_id.data is None:
-        form.pelanggan_id.data = 0
-
-    produk_records = Produk.query.order_by(Produk.nama_produk.asc()).all()
-    level_price_entries_penjualan = ProductPriceLevel.query.all()
-    level_price_map = {}
-    for entry in level_price_entries_penjualan:
-        level_price_map.setdefault(entry.product_id, {})[entry.level_id] = float(
-            entry.price or 0.0
-        )
-    produk_payload = [
-        {
-            "id": produk.id,
-            "name": produk.nama_produk,
-            "code": produk.kode_produk,
-            "price": float(produk.harga or 0.0),
-            "sku": produk.sku,
-            "kategori": produk.kategori.name if produk.kategori else None,
-            "level_prices": level_price_map.get(produk.id, {}),
-            "stok": produk.stok_lama,
-            "stok_minimal": produk.stok_minimal,
-            "hpp": float(produk.harga_lama or produk.harga_beli or 0.0),
-            "last_cost": float(produk.harga_beli or 0.0),
-            "harga_beli": float(produk.harga_beli or 0.0),
-            "weight": float(produk.berat or 0.0),
-        }
-        for produk in produk_records
-    ]
-
-    settings = _get_accounting_setting()
-
-    customer_lookup = {
-        pelanggan.id: {
-            "name": pelanggan.nama,
-            "code": pelanggan.pelanggan_id,
-            "kontak": pelanggan.kontak,
-            "alamat": pelanggan.alamat,
-            "price_level_id": pelanggan.price_level_id,
-            "price_level_name": (
-                pelanggan.price_level.name if pelanggan.price_level else None
-            ),
-        }
-        for pelanggan in pelanggan_records
-    }
-
-    # Load available price levels for use in the sales UI (if needed)
-    price_levels = PriceLevel.query.order_by(PriceLevel.name.asc()).all()
-    expedisi_list = Expedisi.query.order_by(Expedisi.name.asc()).all()
-    payment_channels = (
-        PaymentChannel.query.filter(
-            PaymentChannel.channel_type.in_(["Kartu", "Transfer", "QRIS"])
-        )
-        .order_by(PaymentChannel.channel_type.asc(), PaymentChannel.name.asc())
-        .all()
-    )
-
-    total_orders = Penjualan.query.count()
-    total_revenue = (
-        db.session.query(func.coalesce(func.sum(Penjualan.total_harga), 0)).scalar()
-        or 0.0
-    )
-    items_sold = (
-        db.session.query(func.coalesce(func.sum(DetailPenjualan.jumlah), 0)).scalar()
-        or 0
-    )
-    today_orders = Penjualan.query.filter(Penjualan.tanggal_penjualan == today).count()
-    average_order = total_revenue / total_orders if total_orders else 0.0
-
-    sale_date_display = _format_date_id(today)
-    sales_prefix = _get_sales_invoice_prefix()
-    draft_invoice = _build_draft_invoice(sales_prefix, Penjualan)
-    sales_operator = session.get("username") or "Sales"
-
-    sales_stat_cards = [
-        {
-            "label": "Total Transaksi",
-            "value": total_orders,
-            "icon": "fa-receipt",
-            "accent": "text-primary",
-            "type": "count",
-            "description": "Jumlah penjualan tercatat.",
-        },
-        {
-            "label": "Pendapatan",
-            "value": total_revenue,
-            "icon": "fa-wallet",
-            "accent": "text-success",
-            "type": "currency",
-            "description": "Akumulasi nilai transaksi.",
-        },
-        {
-            "label": "Rata-rata Order",
-            "value": average_order,
-            "icon": "fa-chart-line",
-            "accent": "text-info",
-            "type": "currency",
-            "description": "Nilai rata-rata per transaksi.",
-        },
-        {
-            "label": "Transaksi Hari Ini",
-            "value": today_orders,
-            "icon": "fa-calendar-day",
-            "accent": "text-warning",
-            "type": "count",
-            "description": "Order yang tercatat pada tanggal ini.",
-        },
-    ]
-
-    sales_insights = [
-        {
-            "title": "Unit terjual",
-            "value": items_sold,
-            "status": "warning" if items_sold else "secondary",
-            "type": "count",
-            "description": "Akumulasi kuantitas produk di seluruh transaksi.",
-        },
-        {
-            "title": "Transaksi hari ini",
-            "value": today_orders,
-            "status": "info" if today_orders else "secondary",
-            "type": "count",
-            "description": "Pantau aktivitas penjualan harian.",
-        },
-        {
-            "title": "Rata-rata order",
-            "value": average_order,
-            "status": "success" if average_order else "secondary",
-            "type": "currency",
-            "description": "Indikasi nilai order rata-rata pelanggan.",
-        },
-    ]
-
-    top_customer = (
-        db.session.query(Pelanggan.nama, func.count(Penjualan.id).label("jumlah"))
-        .join(Penjualan, Penjualan.pelanggan_id == Pelanggan.id)
-        .group_by(Pelanggan.id)
-        .order_by(func.count(Penjualan.id).desc())
-        .first()
-    )
-    if top_customer:
-        sales_insights.append(
-            {
-                "title": "Pelanggan teraktif",
-                "value": top_customer.jumlah,
-                "status": "success",
-                "type": "count",
-                "description": f"{top_customer.nama} paling sering bertransaksi.",
-            }
-        )
-
-    recent_sales_query = (
-        Penjualan.query.order_by(
-            Penjualan.tanggal_penjualan.desc(), Penjualan.id.desc()
-        )
-        .limit(5)
-        .all()
-    )
-    recent_sales = [
-        {
-            "no_faktur": sale.no_faktur,
-            "tanggal": (
-                sale.tanggal_penjualan.strftime("%d %b %Y")
-                if sale.tanggal_penjualan
-                else "-"
-            ),
-            "pelanggan": sale.pelanggan.nama if sale.pelanggan else "Umum",
-            "total": float(sale.total_harga or 0.0),
-            "items": sum(detail.jumlah for detail in sale.detail_penjualan),
-        }
-        for sale in recent_sales_query
-    ]
-
-    if form.validate_on_submit():
-        try:
-            sales_id = session.get("user_id")
-            if not sales_id:
-                raise ValueError("Silakan login sebelum mencatat penjualan.")
-
-            if not form.pelanggan_id.data or form.pelanggan_id.data == 0:
-                raise ValueError("Pilih pelanggan sebelum menyimpan transaksi.")
-
-            customer_exists = db.session.get(Pelanggan, form.pelanggan_id.data)
-            if not customer_exists:
-                raise ValueError("Pelanggan tidak ditemukan. Pilih pelanggan yang valid.")
-
-            locked_period = _get_locked_period_for_date(today)
-            if locked_period:
-                raise ValueError(
-                    f"Periode {locked_period.label} sudah ditutup; tidak bisa mencatat penjualan baru."
-                )
-
-            active_shift = _get_open_shift(sales_id)
-            if not active_shift:
-                raise ValueError(
-                    "Shift kasir belum dibuka. Buka shift terlebih dahulu sebelum mencatat penjualan."
-                )
-
-            produk_id_list = request.form.getlist("produk_id[]")
-            jumlah_list = request.form.getlist("jumlah[]")
-            harga_list = request.form.getlist("harga[]")
-            diskon_list = request.form.getlist("diskon[]")
-            pajak_list = request.form.getlist("pajak[]")
-            payment_method = (request.form.get("payment_method") or "").strip()
-            due_date = _parse_date_param(request.form.get("due_date"))
-            expedition_id = _parse_int_param(request.form.get("expedition_id"))
-            payment_channel_id = _parse_int_param(
-                request.form.get("payment_channel_id")
-            )
-            shipping_fee = _parse_float_param(request.form.get("shipping_fee")) or 0.0
-            amount_paid = _parse_float_param(request.form.get("amount_paid")) or 0.0
-            change_due = _parse_float_param(request.form.get("change_due")) or 0.0
-            quotation_id = _parse_int_param(request.form.get("quotation_id"))
-
-            line_items = []
-            errors = []
-            reserved_stock = defaultdict(int)
-
-            for idx, raw_product_id in enumerate(produk_id_list):
-                if not raw_product_id:
-                    continue
-
-                try:
-                    product_id = int(raw_product_id)
-                except (TypeError, ValueError):
-                    errors.append(f"Produk tidak valid pada baris {idx + 1}.")
-                    continue
-
-                product = db.session.get(Produk, product_id)
-                if not product:
-                    errors.append(
-                        f"Produk dengan ID {product_id} tidak ditemukan (baris {idx + 1})."
-                    )
-                    continue
-
-                available_stock = (product.stok_lama or 0) - reserved_stock[product.id]
-                if available_stock < 0:
-                    available_stock = 0
-
-                qty_raw = jumlah_list[idx] if idx < len(jumlah_list) else ""
-                price_raw = harga_list[idx] if idx < len(harga_list) else ""
-                diskon_raw = diskon_list[idx] if idx < len(diskon_list) else ""
-                pajak_raw = pajak_list[idx] if idx < len(pajak_list) else ""
-
-                try:
-                    qty = int(qty_raw)
-                except (TypeError, ValueError):
-                    qty = 0
-
-                if qty <= 0:
-                    errors.append(
-                        f"Jumlah harus lebih dari 0 untuk {product.nama_produk}."
-                    )
-                    continue
-
-                if qty > available_stock:
-                    errors.append(
-                        f"Stok {product.nama_produk} tidak mencukupi. Sisa {available_stock}, diminta {qty}."
-                    )
-                    continue
-
-                try:
-                    price = (
-                        float(price_raw)
-                        if price_raw not in (None, "")
-                        else float(product.harga or 0.0)
-                    )
-                except (TypeError, ValueError):
-                    price = float(product.harga or 0.0)
-
-                try:
-                    discount = (
-                        float(diskon_raw) if diskon_raw not in (None, "") else 0.0
-                    )
-                except (TypeError, ValueError):
-                    discount = 0.0
-
-                try:
-                    tax = float(pajak_raw) if pajak_raw not in (None, "") else 0.0
-                except (TypeError, ValueError):
-                    tax = 0.0
-
-                discount = max(0.0, min(discount, 100.0))
-                tax = max(0.0, tax)
-
-                base_total = price * qty
-                discount_amount = base_total * (discount / 100.0)
-                taxable_base = base_total - discount_amount
-                tax_amount = taxable_base * (tax / 100.0)
-                line_total = taxable_base + tax_amount
-
-                line_items.append(
-                    {
-                        "product": product,
-                        "qty": qty,
-                        "price": price,
-                        "discount": discount,
-                        "tax": tax,
-                        "line_total": line_total,
-                        "stock_before": available_stock,
-                        "weight": float(product.berat or 0.0),
-                    }
-                )
-                reserved_stock[product.id] += qty
-
-            if errors:
-                raise ValueError(" ".join(errors))
-
-            if not line_items:
-                raise ValueError("Tambahkan minimal satu produk dengan jumlah valid.")
-
-            allowed_methods = {"Tunai", "Kartu", "Tempo", "Transfer", "QRIS"}
-            if payment_method not in allowed_methods:
-                raise ValueError("Metode pembayaran tidak valid.")
-            if payment_method == "Tempo" and not due_date:
-                raise ValueError("Tanggal jatuh tempo wajib diisi untuk pembayaran tempo.")
-            payment_channel = None
-            channel_methods = {"Kartu", "Transfer", "QRIS"}
-            if payment_method in channel_methods:
-                if not payment_channel_id:
-                    raise ValueError("Pilih detail pembayaran untuk metode tersebut.")
-                payment_channel = db.session.get(PaymentChannel, payment_channel_id)
-                if not payment_channel or payment_channel.channel_type != payment_method:
-                    raise ValueError("Detail metode pembayaran tidak valid.")
-            else:
-                payment_channel_id = None
-            shipping_fee = max(0.0, shipping_fee)
-            line_items_total = sum(item["line_total"] for item in line_items)
-            grand_total = line_items_total + shipping_fee
-            if payment_method != "Tempo":
-                if amount_paid < grand_total:
-                    raise ValueError(
-                        "Jumlah bayar kurang dari grand total. Periksa kembali pembayaran."
-                    )
-                change_due = max(0.0, amount_paid - grand_total)
-            else:
-                amount_paid = max(0.0, amount_paid)
-                change_due = max(0.0, amount_paid - grand_total)
-
-            hpp_total = _calculate_line_items_hpp(line_items)
-            if hpp_total <= 0:
-                hpp_total = 0.0
-
-            price_level_id_raw = request.form.get("price_level_id")
-            marketplace_cost_total_raw = request.form.get("marketplace_cost_total", "0")
-            marketplace_cost_details_raw = request.form.get("marketplace_cost_details", "[]")
-            try:
-                price_level_id_value = int(price_level_id_raw)
-            except (TypeError, ValueError):
-                price_level_id_value = None
-            try:
-                marketplace_cost_total_value = float(marketplace_cost_total_raw)
-            except (TypeError, ValueError):
-                marketplace_cost_total_value = 0.0
-            marketplace_cost_total_value = max(0.0, marketplace_cost_total_value)
-            marketplace_cost_details_value = (
-                marketplace_cost_details_raw
-                if isinstance(marketplace_cost_details_raw, str)
-                else str(marketplace_cost_details_raw)
-            )
-            if not marketplace_cost_details_value:
-                marketplace_cost_details_value = "[]"
-
-            penjualan = Penjualan(
-                sales_id=sales_id,
-                pelanggan_id=form.pelanggan_id.data,
-                total_harga=0.0,
-                price_level_id=price_level_id_value,
-                marketplace_cost_total=marketplace_cost_total_value,
-                marketplace_cost_details=marketplace_cost_details_value,
-                expedition_id=expedition_id,
-                payment_channel_id=payment_channel_id,
-                shipping_fee=shipping_fee,
-                payment_method=payment_method,
-                due_date=due_date,
-                amount_paid=amount_paid,
-                change_due=change_due,
-                total_weight=0.0,
-                shift_id=active_shift.id if active_shift else None,
-            )
-            draft_invoice = (request.form.get("draft_invoice") or "").strip()
-            if draft_invoice:
-                candidate = draft_invoice
-                counter = 1
-                while Penjualan.query.filter_by(no_faktur=candidate).first():
-                    candidate = f"{draft_invoice}-{counter}"
-                    counter += 1
-                penjualan.no_faktur = candidate
-            else:
-                penjualan.no_faktur = _generate_invoice_number()
-            db.session.add(penjualan)
-            db.session.flush()
-
-            for item in line_items:
-                detail = DetailPenjualan(
-                    penjualan_id=penjualan.id,
-                    produk_id=item["product"].id,
-                    jumlah=item["qty"],
-                    harga_satuan=item["price"],
-                    diskon=item["discount"],
-                    pajak=item["tax"],
-                    harga_total=item["line_total"],
-                )
-                penjualan.total_harga += item["line_total"]
-                penjualan.total_weight += item["weight"] * item["qty"]
-                current_stock = item["product"].stok_lama or 0
-                item["product"].stok_lama = max(0, current_stock - item["qty"])
-                db.session.add(detail)
-
-            penjualan.total_harga += shipping_fee
-
-            if (
-                settings
-                and settings.inventory_account_id
-                and settings.cogs_account_id
-                and hpp_total > 0
-            ):
-                _record_auto_cogs_journal(
-                    penjualan,
-                    hpp_total,
-                    settings,
-                    user_id=sales_id,
-                )
-
-            if (
-                settings
-                and settings.marketplace_expense_account_id
-                and settings.marketplace_payable_account_id
-                and marketplace_cost_total_value > 0
-            ):
-                _record_marketplace_fee_journal(
-                    penjualan,
-                    marketplace_cost_total_value,
-                    settings,
-                    user_id=sales_id,
-                )
-
-            if quotation_id:
-                quotation = db.session.get(Quotation, quotation_id)
-                if quotation and quotation.status != "cancelled":
-                    quotation.status = "converted"
-                    quotation.converted_sale_id = penjualan.id
-
-            db.session.commit()
-            flash(
-                f"Penjualan berhasil disimpan (total Rp {penjualan.total_harga:,.0f}).",
-                "success",
-            )
-            return redirect(url_for("main.penjualan_receipt", sale_id=penjualan.id))
-
-        except ValueError as exc:
-            db.session.rollback()
-            flash(str(exc), "warning")
-        except Exception as e:
-            db.session.rollback()
-            logging.exception("Gagal menyimpan penjualan")
-            flash(f"Error: {str(e)}", "danger")
-
-    return render_template(
-        "penjualan.html",
-        form=form,
-        produk_list=produk_records,
-        produk_payload=produk_payload,
-        sales_stat_cards=sales_stat_cards,
-        sales_insights=sales_insights,
-        recent_sales=recent_sales,
-        customer_lookup=customer_lookup,
-        sales_operator=sales_operator,
-        draft_invoice=draft_invoice,
-        sale_date_display=sale_date_display,
-        price_levels=price_levels,
-        expedisi_list=expedisi_list,
-        payment_channels=payment_channels,
-        default_sales_tax=_get_default_sales_tax(),
-        active_shift=active_shift,
-        shift_today=shift_today,
-        open_shifts=open_shifts,
-        is_admin=is_admin,
-    )
-
-
-@bp.route("/penjualan/receipt/<int:sale_id>")
-@login_required
-@roles_required(*SALES_ROLES)
-def penjualan_receipt(sale_id):
-    sale = (
-        Penjualan.query.options(
-            joinedload(Penjualan.detail_penjualan).joinedload(DetailPenjualan.produk),
-            joinedload(Penjualan.pelanggan),
-            joinedload(Penjualan.sales),
-            joinedload(Penjualan.expedition),
-            joinedload(Penjualan.payment_channel),
-        )
-        .filter(Penjualan.id == sale_id)
-        .first_or_404()
-    )
-    payload = _build_sale_print_payload(sale)
-    receipt_settings = _get_receipt_settings()
-
-    return render_template(
-        "penjualan_struk.html",
-        sale=sale,
-        items=payload["items"],
-        subtotal=payload["subtotal"],
-        discount_total=payload["discount_total"],
-        tax_total=payload["tax_total"],
-        shipping_fee=payload["shipping_fee"],
-        grand_total=payload["grand_total"],
-        payment_label=payload["payment_label"],
-        total_weight=payload["total_weight"],
-        company_profile=_get_company_profile(),
-        receipt_settings=receipt_settings,
-    )
-
-
-@bp.route("/penjualan/invoice-draft", methods=["POST"])
-@login_required
-@roles_required(*SALES_ROLES)
-def penjualan_invoice_draft():
-    payload_raw = (request.form.get("draft_payload") or "").strip()
-    if not payload_raw:
-        flash("Draft invoice kosong.", "warning")
-        return redirect(url_for("main.penjualan"))
-
-    try:
-        draft_payload = json.loads(payload_raw)
-    except (TypeError, ValueError):
-        flash("Draft invoice tidak valid.", "warning")
-        return redirect(url_for("main.penjualan"))
-
-    raw_items = draft_payload.get("items") or []
-    shipping_fee = draft_payload.get("shipping_fee") or 0.0
-    payload = _build_invoice_payload_from_items(raw_items, shipping_fee=shipping_fee)
-    if not payload["items"]:
-        flash("Tambahkan minimal satu produk sebelum cetak invoice sementara.", "warning")
-        return redirect(url_for("main.penjualan"))
-
-    customer_id = _parse_int_param(draft_payload.get("customer_id"))
-    customer_label = (draft_payload.get("customer_label") or "").strip()
-    customer = db.session.get(Pelanggan, customer_id) if customer_id else None
-    customer_name = customer.nama if customer else (customer_label or "Customer")
-    customer_phone = customer.kontak if customer else "-"
-    customer_address = customer.alamat if customer else "-"
-
-    draft_invoice = (draft_payload.get("draft_invoice") or "").strip()
-    if not draft_invoice:
-        draft_invoice = _build_draft_invoice(_get_sales_invoice_prefix(), Penjualan)
-
-    payment_method = (draft_payload.get("payment_method") or "-").strip()
-    payment_channel_id = _parse_int_param(draft_payload.get("payment_channel_id"))
-    payment_channel = (
-        db.session.get(PaymentChannel, payment_channel_id) if payment_channel_id else None
-    )
-    payment_label = payment_method or "-"
-    if payment_method in {"Kartu", "Transfer", "QRIS"} and payment_channel:
-        payment_label = f"{payment_method} - {payment_channel.name}"
-
-    expedition_id = _parse_int_param(draft_payload.get("expedition_id"))
-    expedition = db.session.get(Expedisi, expedition_id) if expedition_id else None
-
-    return render_template(
-        "penjualan_invoice_draft.html",
-        invoice_number=draft_invoice,
-        invoice_date=local_now(),
-        customer={
-            "name": customer_name,
-            "phone": customer_phone,
-            "address": customer_address,
-        },
-        sales_name=session.get("username") or "-",
-        payment_label=payment_label,
-        payment_method=payment_method,
-        expedition_name=expedition.name if expedition else "-",
-        items=payload["items"],
-        subtotal=payload["subtotal"],
-        discount_total=payload["discount_total"],
-        tax_total=payload["tax_total"],
-        shipping_fee=payload["shipping_fee"],
-        grand_total=payload["grand_total"],
-        total_weight=payload["total_weight"],
-        company_profile=_get_company_profile(),
-    )
-
-
-@bp.route("/penjualan/invoice/<int:sale_id>")
-@login_required
-@roles_required(*SALES_ROLES)
-def penjualan_invoice(sale_id):
-    sale = (
-        Penjualan.query.options(
-            joinedload(Penjualan.detail_penjualan).joinedload(DetailPenjualan.produk),
-            joinedload(Penjualan.pelanggan),
-            joinedload(Penjualan.sales),
-            joinedload(Penjualan.expedition),
-            joinedload(Penjualan.payment_channel),
-        )
-        .filter(Penjualan.id == sale_id)
-        .first_or_404()
-    )
-    payload = _build_sale_print_payload(sale)
-    return render_template(
-        "penjualan_invoice.html",
-        sale=sale,
-        items=payload["items"],
-        subtotal=payload["subtotal"],
-        discount_total=payload["discount_total"],
-        tax_total=payload["tax_total"],
-        shipping_fee=payload["shipping_fee"],
-        grand_total=payload["grand_total"],
-        net_subtotal=payload["net_subtotal"],
-        payment_label=payload["payment_label"],
-        total_weight=payload["total_weight"],
-        company_profile=_get_company_profile(),
-    )
-
-
-@bp.route("/quotation")
-@login_required
-@roles_required(*SALES_ROLES)
-def quotation_list():
-    _ensure_table(Quotation)
-    _ensure_table(QuotationItem)
-
-    status_filter = (request.args.get("status") or "draft").strip().lower()
-    query = Quotation.query.options(
-        joinedload(Quotation.pelanggan),
-        joinedload(Quotation.sales),
-        joinedload(Quotation.items),
-    ).order_by(Quotation.created_at.desc(), Quotation.id.desc())
-    if status_filter and status_filter != "all":
-        query = query.filter(Quotation.status == status_filter)
-    quotations = query.limit(200).all()
-
-    status_counts = dict(
-        db.session.query(Quotation.status, func.count(Quotation.id)).group_by(
-            Quotation.status
-        )
-    )
-    total_all = sum(status_counts.values())
-
-    return render_template(
-        "quotation_list.html",
-        quotations=quotations,
-        status_filter=status_filter,
-        status_counts=status_counts,
-        total_all=total_all,
-    )
-
-
-@bp.route("/quotation/create", methods=["POST"])
-@login_required
-@roles_required(*SALES_ROLES)
-def quotation_create():
-    _ensure_table(Quotation)
-    _ensure_table(QuotationItem)
-
-    payload_raw = (request.form.get("draft_payload") or "").strip()
-    if not payload_raw:
-        flash("Draft quotation kosong.", "warning")
-        return redirect(url_for("main.penjualan"))
-
-    try:
-        draft_payload = json.loads(payload_raw)
-    except (TypeError, ValueError):
-        flash("Draft quotation tidak valid.", "warning")
-        return redirect(url_for("main.penjualan"))
-
-    raw_items = draft_payload.get("items") or []
-    shipping_fee = draft_payload.get("shipping_fee") or 0.0
-    payload = _build_invoice_payload_from_items(raw_items, shipping_fee=shipping_fee)
-    if not payload["items"]:
-        flash("Tambahkan minimal satu produk sebelum menyimpan quotation.", "warning")
-        return redirect(url_for("main.penjualan"))
-
-    customer_id = _parse_int_param(draft_payload.get("customer_id"))
-    customer_label = (draft_payload.get("customer_label") or "").strip()
-    customer = db.session.get(Pelanggan, customer_id) if customer_id else None
-    if customer and not customer_label:
-        customer_label = customer.nama
-
-    price_level_id = _parse_int_param(draft_payload.get("price_level_id"))
-    expedition_id = _parse_int_param(draft_payload.get("expedition_id"))
-    payment_channel_id = _parse_int_param(draft_payload.get("payment_channel_id"))
-    payment_method = (draft_payload.get("payment_method") or "").strip()
-    due_date = _parse_date_param(draft_payload.get("due_date"))
-
-    quotation = Quotation(
-        quote_number=_generate_quotation_number(),
-        sales_id=session.get("user_id"),
-        pelanggan_id=customer_id,
-        customer_label=customer_label or None,
-        price_level_id=price_level_id,
-        expedition_id=expedition_id,
-        payment_channel_id=payment_channel_id,
-        payment_method=payment_method or None,
-        due_date=due_date,
-        subtotal=payload["subtotal"],
-        discount_total=payload["discount_total"],
-        tax_total=payload["tax_total"],
-        shipping_fee=payload["shipping_fee"],
-        grand_total=payload["grand_total"],
-        total_weight=payload["total_weight"],
-    )
-
-    try:
-        db.session.add(quotation)
-        db.session.flush()
-
-        for item in payload["items"]:
-            db.session.add(
-                QuotationItem(
-                    quotation_id=quotation.id,
-                    product_id=item.get("product_id"),
-                    product_name=item.get("name") or "-",
-                    sku=item.get("sku") or "-",
-                    qty=item.get("qty") or 0.0,
-                    price=item.get("price") or 0.0,
-                    discount_pct=item.get("discount_pct") or 0.0,
-                    tax_pct=item.get("tax_pct") or 0.0,
-                    total=item.get("total") or 0.0,
-                    unit_weight=item.get("unit_weight") or 0.0,
-                    total_weight=item.get("total_weight") or 0.0,
-                )
-            )
-
-        db.session.commit()
-    except Exception as exc:
-        db.session.rollback()
-        logging.exception("Gagal menyimpan quotation")
-        flash(f"Gagal menyimpan quotation: {str(exc)}", "danger")
-        return redirect(url_for("main.penjualan"))
-
-    return redirect(url_for("main.quotation_print", quotation_id=quotation.id))
-
-
-@bp.route("/quotation/<int:quotation_id>/print")
-@login_required
-@roles_required(*SALES_ROLES)
-def quotation_print(quotation_id):
-    _ensure_table(Quotation)
-    _ensure_table(QuotationItem)
-
-    quotation = (
-        Quotation.query.options(
-            joinedload(Quotation.items),
-            joinedload(Quotation.sales),
-            joinedload(Quotation.pelanggan),
-            joinedload(Quotation.expedition),
-            joinedload(Quotation.payment_channel),
-        )
-        .filter(Quotation.id == quotation_id)
-        .first_or_404()
-    )
-
-    customer_name = quotation.customer_label or "-"
-    customer_phone = "-"
-    customer_address = "-"
-    if quotation.pelanggan:
-        customer_name = quotation.pelanggan.nama or customer_name
-        customer_phone = quotation.pelanggan.kontak or "-"
-        customer_address = quotation.pelanggan.alamat or "-"
-
-    payment_label = quotation.payment_method or "-"
-    if (
-        quotation.payment_method in {"Kartu", "Transfer", "QRIS"}
-        and quotation.payment_channel
-    ):
-        payment_label = f"{quotation.payment_method} - {quotation.payment_channel.name}"
-
-    return render_template(
-        "quotation_print.html",
-        quotation=quotation,
-        items=quotation.items,
-        customer={
-            "name": customer_name,
-            "phone": customer_phone,
-            "address": customer_address,
-        },
-        sales_name=quotation.sales.username if quotation.sales else "-",
-        payment_label=payment_label,
-        expedition_name=quotation.expedition.name if quotation.expedition else "-",
-        company_profile=_get_company_profile(),
-    )
-
-
-@bp.route("/quotation/<int:quotation_id>/cancel", methods=["POST"])
-@login_required
-@roles_required(*SALES_ROLES)
-def quotation_cancel(quotation_id):
-    _ensure_table(Quotation)
-
-    quotation = Quotation.query.get_or_404(quotation_id)
-    if quotation.status == "converted":
-        flash("Quotation sudah dikonversi ke penjualan dan tidak bisa dibatalkan.", "warning")
-        return redirect(_resolve_next_target(url_for("main.quotation_list")))
-    if quotation.status != "cancelled":
-        quotation.status = "cancelled"
-        db.session.commit()
-        flash(f"Quotation {quotation.quote_number} dibatalkan.", "success")
-    return redirect(_resolve_next_target(url_for("main.quotation_list")))
-
-
-@bp.route("/quotation/<int:quotation_id>/convert")
-@login_required
-@roles_required(*SALES_ROLES)
-def quotation_convert(quotation_id):
-    _ensure_table(Quotation)
-    _ensure_table(QuotationItem)
-
-    quotation = (
-        Quotation.query.options(
-            joinedload(Quotation.items),
-        )
-        .filter(Quotation.id == quotation_id)
-        .first_or_404()
-    )
-    if quotation.status == "cancelled":
-        flash("Quotation sudah dibatalkan dan tidak bisa dikonversi.", "warning")
-        return redirect(url_for("main.quotation_list"))
-
-    items_payload = []
-    for item in quotation.items:
-        if not item.product_id:
-            continue
-        items_payload.append(
-            {
-                "product_id": item.product_id,
-                "qty": item.qty,
-                "price": item.price,
-                "discount": item.discount_pct,
-                "tax": item.tax_pct,
-            }
-        )
-
-    due_date = quotation.due_date.isoformat() if quotation.due_date else ""
-    payload = {
-        "items": items_payload,
-        "customer_id": quotation.pelanggan_id or "",
-        "customer_label": quotation.customer_label or "",
-        "price_level_id": quotation.price_level_id or "",
-        "shipping_fee": quotation.shipping_fee or "",
-        "payment_method": quotation.payment_method or "",
-        "payment_channel_id": quotation.payment_channel_id or "",
-        "due_date": due_date,
-        "expedition_id": quotation.expedition_id or "",
-        "amount_paid": "",
-        "quotation_id": quotation.id,
-        "quotation_number": quotation.quote_number,
-        "updated_at": int(local_now().timestamp() * 1000),
-    }
-
-    return render_template(
-        "quotation_convert.html",
-        payload=payload,
-    )
-
-
-@bp.route("/penjualan/surat_jalan/<int:sale_id>")
-@login_required
-@roles_required(*SALES_ROLES)
-def penjualan_surat_jalan(sale_id):
-    sale = (
-        Penjualan.query.options(
-            joinedload(Penjualan.detail_penjualan).joinedload(DetailPenjualan.produk),
-            joinedload(Penjualan.pelanggan),
-            joinedload(Penjualan.sales),
-            joinedload(Penjualan.expedition),
-        )
-        .filter(Penjualan.id == sale_id)
-        .first_or_404()
-    )
-    payload = _build_sale_print_payload(sale)
-    return render_template(
-        "penjualan_surat_jalan.html",
-        sale=sale,
-        items=payload["items"],
-        total_weight=payload["total_weight"],
-        company_profile=_get_company_profile(),
-    )
-
-
-@bp.route("/penjualan/delete/<int:sale_id>", methods=["POST"])
-@login_required
-@roles_required(*ADMIN_ONLY)
-def delete_penjualan(sale_id):
-    sale = (
-        Penjualan.query.options(
-            joinedload(Penjualan.detail_penjualan).joinedload(DetailPenjualan.produk)
-        )
-        .get_or_404(sale_id)
-    )
-    locked_period = _get_locked_period_for_date(sale.tanggal_penjualan)
-    if sale.is_locked or locked_period:
-        label = locked_period.label if locked_period else "periode terkunci"
-        flash(
-            f"Penjualan tidak bisa dihapus karena {label} sudah ditutup.",
-            "warning",
-        )
-        return redirect(url_for("main.data_penjualan"))
-
-    memo = f"Auto COGS – Penjualan {sale.no_faktur}"
-    journal_entries = JournalEntry.query.filter(JournalEntry.memo == memo).all()
-    if any(entry.is_locked for entry in journal_entries):
-        flash(
-            "Penjualan tidak bisa dihapus karena jurnal terkait sudah dikunci.",
-            "warning",
-        )
-        return redirect(url_for("main.data_penjualan"))
-
-    try:
-        for detail in sale.detail_penjualan:
-            product = detail.produk
-            if product:
-                product.stok_lama = int(product.stok_lama or 0) + int(
-                    detail.jumlah or 0
-                )
-
-        for entry in journal_entries:
-            db.session.delete(entry)
-
-        for detail in list(sale.detail_penjualan):
-            db.session.delete(detail)
-
-        db.session.delete(sale)
-        db.session.commit()
-        flash(f"Penjualan {sale.no_faktur} berhasil dihapus.", "success")
-    except Exception as exc:
-        db.session.rollback()
-        logging.exception("Gagal menghapus penjualan")
-        flash(f"Gagal menghapus penjualan: {str(exc)}", "danger")
-
-    next_target = (request.form.get("next") or "").strip()
-    if next_target and _is_safe_redirect_target(next_target):
-        return redirect(next_target)
-    return redirect(url_for("main.data_penjualan"))
-
-
-@bp.route("/data_penjualan")
-@login_required
-@roles_required(*SALES_ROLES)
-def data_penjualan():
-    filter_payload = _build_sales_filters(request.args)
-    filters = filter_payload["filters"]
-    sort_option = request.args.get("sort", "date_desc")
-    per_page = request.args.get("per_page", type=int) or 10
-    per_page = max(5, min(per_page, 50))
-    page = request.args.get("page", type=int) or 1
-    if page < 1:
-        page = 1
-
-    def apply_filters(query):
-        return query.filter(*filters) if filters else query
-
-    def build_filtered_query(base_query):
-        return base_query.filter(*filters) if filters else base_query
-
-    net_expr = case(
-        (
-            Penjualan.total_harga
-            - func.coalesce(Penjualan.marketplace_cost_total, 0)
-            < 0,
-            0,
-        ),
-        else_=Penjualan.total_harga
-        - func.coalesce(Penjualan.marketplace_cost_total, 0),
-    )
-    sort_map = {
-        "date_asc": Penjualan.tanggal_penjualan.asc(),
-        "date_desc": Penjualan.tanggal_penjualan.desc(),
-        "total_asc": net_expr.asc(),
-        "total_desc": net_expr.desc(),
-    }
-    order_clause = sort_map.get(sort_option, Penjualan.tanggal_penjualan.desc())
-
-    total_records = (
-        apply_filters(db.session.query(func.count(Penjualan.id))).scalar() or 0
-    )
-    total_pages = max(1, (total_records + per_page - 1) // per_page)
-    if page > total_pages:
-        page = total_pages
-    offset = (page - 1) * per_page
-
-    base_query = apply_filters(
-        Penjualan.query.options(
-            joinedload(Penjualan.pelanggan),
-            joinedload(Penjualan.sales),
-            joinedload(Penjualan.detail_penjualan).joinedload(DetailPenjualan.produk),
-        )
-    )
-
-    penjualan_records = (
-        base_query.order_by(order_clause, Penjualan.id.desc())
-        .offset(offset)
-        .limit(per_page)
-        .all()
-    )
-
-    total_revenue = (
-        apply_filters(
-            db.session.query(func.coalesce(func.sum(net_expr), 0))
-        ).scalar()
-        or 0.0
-    )
-    average_order = total_revenue / total_records if total_records else 0.0
-    items_sold = (
-        apply_filters(
-            db.session.query(func.coalesce(func.sum(DetailPenjualan.jumlah), 0)).join(
-                Penjualan, DetailPenjualan.penjualan_id == Penjualan.id
-            )
-        ).scalar()
-        or 0
-    )
-    distinct_customers = (
-        apply_filters(
-            db.session.query(func.count(func.distinct(Penjualan.pelanggan_id)))
-        ).scalar()
-        or 0
-    )
-    total_marketplace_costs = (
-        apply_filters(
-            db.session.query(func.coalesce(func.sum(Penjualan.marketplace_cost_total), 0))
-        ).scalar()
-        or 0.0
-    )
-    today = local_today()
-    today_revenue = (
-        apply_filters(
-            db.session.query(func.coalesce(func.sum(net_expr), 0))
-        )
-        .filter(Penjualan.tanggal_penjualan == today)
-        .scalar()
-        or 0.0
-    )
-
-    net_sum_sales = func.coalesce(func.sum(net_expr), 0).label("total")
-    top_sales_raw = (
-        build_filtered_query(
-            db.session.query(
-                User.username.label("name"),
-                func.count(Penjualan.id).label("orders"),
-                net_sum_sales,
-            )
-            .join(User, Penjualan.sales_id == User.id)
-            .group_by(User.id)
-            .order_by(net_sum_sales.desc())
-        )
-        .limit(5)
-        .all()
-    )
-    net_sum_customers = func.coalesce(func.sum(net_expr), 0).label("total")
-    top_customers_raw = (
-        build_filtered_query(
-            db.session.query(
-                Pelanggan.nama.label("name"),
-                func.count(Penjualan.id).label("orders"),
-                net_sum_customers,
-            )
-            .join(Pelanggan, Penjualan.pelanggan_id == Pelanggan.id)
-            .group_by(Pelanggan.id)
-            .order_by(net_sum_customers.desc())
-        )
-        .limit(5)
-        .all()
-    )
-    top_products_raw = (
-        build_filtered_query(
-            db.session.query(
-                Produk.nama_produk.label("name"),
-                func.sum(DetailPenjualan.jumlah).label("qty"),
-                func.coalesce(func.sum(DetailPenjualan.harga_total), 0).label("total"),
-            )
-            .join(DetailPenjualan, DetailPenjualan.produk_id == Produk.id)
-            .join(Penjualan, DetailPenjualan.penjualan_id == Penjualan.id)
-            .group_by(Produk.id)
-            .order_by(func.sum(DetailPenjualan.jumlah).desc())
-        )
-        .limit(5)
-        .all()
-    )
-    daily_summary_raw = (
-        build_filtered_query(
-            db.session.query(
-                Penjualan.tanggal_penjualan.label("date"),
-                func.count(Penjualan.id).label("orders"),
-                func.coalesce(func.sum(net_expr), 0).label("total"),
-            )
-            .group_by(Penjualan.tanggal_penjualan)
-            .order_by(Penjualan.tanggal_penjualan.desc())
-        )
-        .limit(7)
-        .all()
-    )
-
-    top_sales = [
-        {"name": row.name, "orders": row.orders, "total": row.total}
-        for row in top_sales_raw
-    ]
-    top_customers = [
-        {"name": row.name, "orders": row.orders, "total": row.total}
-        for row in top_customers_raw
-    ]
-    top_products = [
-        {"name": row.name, "qty": row.qty, "total": row.total}
-        for row in top_products_raw
-    ]
-    daily_summary = [
-        {
-            "date": row.date,
-            "label": _format_date_id(row.date),
-            "orders": row.orders,
-            "total": row.total,
-        }
-        for row in daily_summary_raw
-    ]
-
-    filter_active = any(
-        [
-            filter_payload["search_query"],
-            filter_payload["pelanggan_id"],
-            filter_payload["sales_id"],
-            filter_payload["start_date"],
-            filter_payload["end_date"],
-            filter_payload["min_total"] is not None,
-            filter_payload["max_total"] is not None,
-        ]
-    )
-
-    def _date_value_to_str(value):
-        return value.strftime("%Y-%m-%d") if value else ""
-
-    filter_values = {
-        "search": filter_payload["search_query"],
-        "pelanggan": filter_payload["pelanggan_id"] or "",
-        "sales": filter_payload["sales_id"] or "",
-        "start_date": _date_value_to_str(filter_payload["start_date"]),
-        "end_date": _date_value_to_str(filter_payload["end_date"]),
-        "min_total": (
-            filter_payload["min_total"]
-            if filter_payload["min_total"] is not None
-            else ""
-        ),
-        "max_total": (
-            filter_payload["max_total"]
-            if filter_payload["max_total"] is not None
-            else ""
-        ),
-    }
-
-    if filter_payload["start_date"] and filter_payload["end_date"]:
-        range_label = f"{_format_date_id(filter_payload['start_date'])} - {_format_date_id(filter_payload['end_date'])}"
-    elif filter_payload["start_date"]:
-        range_label = f"Mulai {_format_date_id(filter_payload['start_date'])}"
-    elif filter_payload["end_date"]:
-        range_label = f"Sampai {_format_date_id(filter_payload['end_date'])}"
-    else:
-        range_label = "Semua tanggal"
-
-    stats_cards = [
-        {
-            "label": "Pendapatan Bersih",
-            "value": total_revenue,
-            "icon": "fa-wallet",
-            "accent": "text-success",
-            "type": "currency",
-            "description": "Setelah biaya marketplace.",
-        },
-        {
-            "label": "Biaya Marketplace",
-            "value": total_marketplace_costs,
-            "icon": "fa-coins",
-            "accent": "text-danger",
-            "type": "currency",
-            "description": "Komisi, cashback, dan bebas ongkir.",
-        },
-        {
-            "label": "Rata-rata Order",
-            "value": average_order,
-            "icon": "fa-divide",
-            "accent": "text-info",
-            "type": "currency",
-            "description": "Nilai rata-rata per faktur.",
-        },
-        {
-            "label": "Item Terjual",
-            "value": items_sold,
-            "icon": "fa-cubes",
-            "accent": "text-warning",
-            "description": "Akumulasi kuantitas produk.",
-        },
-    ]
-
-    insight_cards = [
-        {
-            "title": "Pelanggan unik",
-            "value": distinct_customers,
-            "description": "Jumlah pelanggan berbeda dalam hasil filter.",
-        },
-        {
-            "title": "Pendapatan hari ini",
-            "value": today_revenue,
-            "type": "currency",
-            "description": "Nilai bersih transaksi hari ini.",
-        },
-        {
-            "title": "Rentang tanggal",
-            "value": range_label,
-            "type": "text",
-            "description": "Periode data yang sedang dianalisis.",
-        },
-    ]
-
-    sales_options = User.query.order_by(User.username.asc()).all()
-    customer_options = Pelanggan.query.order_by(Pelanggan.nama.asc()).all()
-
-    query_args = request.args.to_dict(flat=True)
-    query_args.pop("page", None)
-    base_args = query_args.copy()
-
-    prev_url = (
-        url_for("main.data_penjualan", page=page - 1, **base_args) if page > 1 else None
-    )
-    next_url = (
-        url_for("main.data_penjualan", page=page + 1, **base_args)
-        if page < total_pages
-        else None
-    )
-
-    page_window_start = max(1, page - 2)
-    page_window_end = min(total_pages, page + 2)
-    page_links = [
-        {
-            "number": number,
-            "url": url_for("main.data_penjualan", page=number, **base_args),
-            "current": number == page,
-        }
-        for number in range(page_window_start, page_window_end + 1)
-    ]
-    pagination = {
-        "page": page,
-        "per_page": per_page,
-        "total_pages": total_pages,
-        "total_records": total_records,
-        "has_prev": page > 1,
-        "has_next": page < total_pages,
-        "base_args": base_args,
-        "prev_url": prev_url,
-        "next_url": next_url,
-        "page_links": page_links,
-    }
-
-    return render_template(
-        "data_penjualan.html",
-        penjualan_records=penjualan_records,
-        stats_cards=stats_cards,
-        insight_cards=insight_cards,
-        top_sales=top_sales,
-        top_customers=top_customers,
-        top_products=top_products,
-        daily_summary=daily_summary,
-        filter_values=filter_values,
-        sort_option=sort_option,
-        per_page=per_page,
-        pagination=pagination,
-        filter_active=filter_active,
-        sales_options=sales_options,
-        customer_options=customer_options,
-        format_date=_format_date_id,
-    )
-
-
-@bp.route("/laporan/laba-rugi")
-@login_required
-@roles_required(*ADMIN_ONLY)
-def laporan_laba_rugi():
-    today = local_today()
-    default_start = today.replace(day=1)
-    start_date = _parse_date_param(request.args.get("start_date")) or default_start
-    end_date = _parse_date_param(request.args.get("end_date")) or today
-    if end_date < start_date:
-        start_date, end_date = end_date, start_date
-
-    sales_records = (
-        Penjualan.query.options(
-            joinedload(Penjualan.detail_penjualan).joinedload(DetailPenjualan.produk)
-        )
-        .filter(Penjualan.tanggal_penjualan >= start_date)
-        .filter(Penjualan.tanggal_penjualan <= end_date)
-        .order_by(Penjualan.tanggal_penjualan.asc())
-        .all()
-    )
-
-    totals = {
-        "gross_revenue": 0.0,
-        "net_revenue": 0.0,
-        "cogs": 0.0,
-        "gross_profit": 0.0,
-        "net_profit": 0.0,
-        "discount": 0.0,
-        "tax": 0.0,
-        "marketplace_costs": 0.0,
-        "orders": len(sales_records),
-        "units": 0,
-    }
-    daily_map = defaultdict(lambda: {"revenue": 0.0, "gross": 0.0})
-    monthly_map = defaultdict(lambda: {"revenue": 0.0, "gross": 0.0})
-    product_map = defaultdict(
-        lambda: {"name": "Produk dihapus", "units": 0, "revenue": 0.0, "gross": 0.0}
-    )
-
-    for sale in sales_records:
-        sale_date = sale.tanggal_penjualan or today
-        month_key = (sale_date.year, sale_date.month)
-        invoice_revenue = 0.0
-        for detail in sale.detail_penjualan:
-            qty = detail.jumlah or 0
-            price = detail.harga_satuan or 0.0
-            discount_pct = detail.diskon or 0.0
-            tax_pct = detail.pajak or 0.0
-            base_amount = price * qty
-            discount_value = base_amount * (discount_pct / 100.0)
-            taxable = base_amount - discount_value
-            tax_value = taxable * (tax_pct / 100.0)
-            product_cost = 0.0
-            if detail.produk:
-                product_cost = (
-                    detail.produk.harga_lama
-                    or detail.produk.harga_beli
-                    or detail.produk.harga
-                    or 0.0
-                )
-            cost_value = product_cost * qty
-            gross_value = taxable - cost_value
-
-            totals["units"] += qty
-            totals["gross_revenue"] += taxable
-            totals["discount"] += discount_value
-            totals["tax"] += tax_value
-            totals["cogs"] += cost_value
-            totals["gross_profit"] += gross_value
-
-            invoice_revenue += taxable
-
-            daily_map[sale_date]["revenue"] += taxable
-            daily_map[sale_date]["gross"] += gross_value
-            monthly_map[month_key]["revenue"] += taxable
-            monthly_map[month_key]["gross"] += gross_value
-
-            product_key = detail.produk.id if detail.produk else f"detail-{detail.id}"
-            if detail.produk:
-                product_map[product_key]["name"] = detail.produk.nama_produk
-            product_map[product_key]["units"] += qty
-            product_map[product_key]["revenue"] += taxable
-            product_map[product_key]["gross"] += gross_value
-
-        cost_total = float(sale.marketplace_cost_total or 0.0)
-        totals["marketplace_costs"] += cost_total
-
-    totals["net_revenue"] = totals["gross_revenue"] - totals["marketplace_costs"]
-    totals["net_profit"] = totals["gross_profit"] - totals["marketplace_costs"]
-
-    gross_margin_percent = (
-        (totals["gross_profit"] / totals["gross_revenue"]) * 100
-        if totals["gross_revenue"]
-        else 0.0
-    )
-    net_margin_percent = (
-        (totals["net_profit"] / totals["net_revenue"]) * 100
-        if totals["net_revenue"]
-        else 0.0
-    )
-    average_order = totals["net_revenue"] / totals["orders"] if totals["orders"] else 0.0
-
-    daily_points = [
-        {
-            "date": date_key.isoformat(),
-            "label": _format_date_id(date_key),
-            "revenue": round(values["revenue"], 2),
-            "gross": round(values["gross"], 2),
-        }
-        for date_key, values in sorted(daily_map.items())
-    ]
-
-    monthly_breakdown = [
-        {
-            "label": datetime(year=year, month=month, day=1).strftime("%b %Y"),
-            "revenue": values["revenue"],
-            "gross": values["gross"],
-        }
-        for (year, month), values in sorted(monthly_map.items())
-    ]
-
-    top_products = sorted(
-        product_map.values(), key=lambda item: item["gross"], reverse=True
-    )[:5]
-
-    summary_cards = [
-        {
-            "label": "Penjualan Kotor",
-            "value": totals["gross_revenue"],
-            "icon": "fa-coins",
-            "accent": "text-primary",
-            "subtitle": "Sebelum biaya marketplace",
-        },
-        {
-            "label": "Penjualan Bersih",
-            "value": totals["net_revenue"],
-            "icon": "fa-wallet",
-            "accent": "text-info",
-            "subtitle": "Setelah biaya marketplace",
-        },
-        {
-            "label": "Biaya Marketplace",
-            "value": totals["marketplace_costs"],
-            "icon": "fa-coins",
-            "accent": "text-danger",
-            "subtitle": "Komisi, cashback, bebas ongkir",
-        },
-        {
-            "label": "HPP",
-            "value": totals["cogs"],
-            "icon": "fa-boxes",
-            "accent": "text-secondary",
-            "subtitle": "Total biaya barang",
-        },
-        {
-            "label": "Laba Kotor",
-            "value": totals["gross_profit"],
-            "icon": "fa-chart-line",
-            "accent": "text-success",
-            "subtitle": f"Margin kotor {gross_margin_percent:.1f}%",
-        },
-        {
-            "label": "Laba Bersih",
-            "value": totals["net_profit"],
-            "icon": "fa-balance-scale",
-            "accent": "text-success",
-            "subtitle": f"Margin bersih {net_margin_percent:.1f}%",
-        },
-    ]
-
-    insight_cards = [
-        {
-            "title": "Rata-rata Order",
-            "value": average_order,
-            "type": "currency",
-            "description": "Nilai penjualan bersih per transaksi.",
-        },
-        {
-            "title": "Total Transaksi",
-            "value": totals["orders"],
-            "type": "count",
-            "description": "Jumlah faktur pada periode ini.",
-        },
-        {
-            "title": "Item Terjual",
-            "value": totals["units"],
-            "type": "count",
-            "description": "Agregasi kuantitas dari seluruh penjualan.",
-        },
-        {
-            "title": "Diskon Diberikan",
-            "value": totals["discount"],
-            "type": "currency",
-            "description": "Total nilai potongan harga.",
-        },
-    ]
-
-    range_label = f"{_format_date_id(start_date)} - {_format_date_id(end_date)}"
-    filter_values = {
-        "start_date": start_date.strftime("%Y-%m-%d"),
-        "end_date": end_date.strftime("%Y-%m-%d"),
-    }
-
-    return render_template(
-        "laporan_laba_rugi.html",
-        summary_cards=summary_cards,
-        insight_cards=insight_cards,
-        top_products=top_products,
-        daily_points=daily_points,
-        monthly_breakdown=monthly_breakdown,
-        totals=totals,
-        gross_margin_percent=gross_margin_percent,
-        net_margin_percent=net_margin_percent,
-        average_order=average_order,
-        range_label=range_label,
-        filter_values=filter_values,
-    )
-
-
-@bp.route("/laporan/neraca")
-@login_required
-@roles_required(*ADMIN_ONLY)
-def laporan_neraca():
-    _ensure_table(Account)
-    _ensure_table(JournalEntry)
-    _ensure_table(JournalLine)
-
-    today = local_today()
-    default_start = today.replace(month=1, day=1)
-    start_date = _parse_date_param(request.args.get("start_date")) or default_start
-    end_date = _parse_date_param(request.args.get("end_date")) or today
-    if end_date < start_date:
-        start_date, end_date = end_date, start_date
-
-    show_zero = _parse_bool_param(request.args.get("show_zero"), default=False)
-
-    line_sums = (
-        db.session.query(
-            JournalLine.account_id.label("account_id"),
-            func.coalesce(func.sum(JournalLine.debit), 0.0).label("debit"),
-            func.coalesce(func.sum(JournalLine.credit), 0.0).label("credit"),
-        )
-        .join(JournalEntry, JournalLine.entry_id == JournalEntry.id)
-        .filter(JournalEntry.date >= start_date)
-        .filter(JournalEntry.date <= end_date)
-        .group_by(JournalLine.account_id)
-        .subquery()
-    )
-
-    rows = (
-        db.session.query(
-            Account,
-            line_sums.c.debit,
-            line_sums.c.credit,
-        )
-        .outerjoin(line_sums, line_sums.c.account_id == Account.id)
-        .filter(Account.type.in_(["asset", "liability", "equity"]))
-        .order_by(Account.code.asc())
-        .all()
-    )
-
-    groups = {"asset": [], "liability": [], "equity": []}
-    totals = {
-        "asset": {"debit": 0.0, "credit": 0.0, "net": 0.0},
-        "liability": {"debit": 0.0, "credit": 0.0, "net": 0.0},
-        "equity": {"debit": 0.0, "credit": 0.0, "net": 0.0},
-    }
-    for account, debit, credit in rows:
-        debit = float(debit or 0.0)
-        credit = float(credit or 0.0)
-        net = debit - credit
-        debit_balance = net if net > 0 else 0.0
-        credit_balance = -net if net < 0 else 0.0
-        if not show_zero and debit_balance == 0 and credit_balance == 0:
-            continue
-        groups[account.type].append(
-            {
-                "code": account.code,
-                "name": account.name,
-                "debit": debit_balance,
-                "credit": credit_balance,
-            }
-        )
-        totals[account.type]["debit"] += debit_balance
-        totals[account.type]["credit"] += credit_balance
-        totals[account.type]["net"] += net
-
-    asset_total = totals["asset"]["net"]
-    liability_total = -totals["liability"]["net"]
-    equity_total = -totals["equity"]["net"]
-    total_le = liability_total + equity_total
-    difference = asset_total - total_le
-    warning_message = abs(difference) if difference != 0 else None
-
-    summary_cards = [
-        {
-            "label": "Total Aset",
-            "value": asset_total,
-            "icon": "fa-piggy-bank",
-            "accent": "text-primary",
-        },
-        {
-            "label": "Total Liabilitas",
-            "value": liability_total,
-            "icon": "fa-balance-scale",
-            "accent": "text-warning",
-        },
-        {
-            "label": "Total Ekuitas",
-            "value": equity_total,
-            "icon": "fa-university",
-            "accent": "text-success",
-        },
-        {
-            "label": "Selisih",
-            "value": abs(difference),
-            "icon": "fa-exclamation-triangle",
-            "accent": "text-danger" if difference != 0 else "text-success",
-        },
-    ]
-
-    type_labels = {
-        "asset": "Aset",
-        "liability": "Liabilitas",
-        "equity": "Ekuitas",
-    }
-    range_label = f"{_format_date_id(start_date)} - {_format_date_id(end_date)}"
-    filter_values = {
-        "start_date": start_date.strftime("%Y-%m-%d"),
-        "end_date": end_date.strftime("%Y-%m-%d"),
-        "show_zero": show_zero,
-    }
-
-    return render_template(
-        "laporan_neraca.html",
-        groups=groups,
-        totals=totals,
-        summary_cards=summary_cards,
-        warning_message=warning_message,
-        type_labels=type_labels,
-        range_label=range_label,
-        filter_values=filter_values,
-        total_le=total_le,
-    )
-
-
-@bp.route("/laporan/pembelian")
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def laporan_pembelian():
-    _ensure_purchase_payment_columns()
-    today = local_today()
-    default_start = today.replace(day=1)
-    start_date = _parse_date_param(request.args.get("start_date")) or default_start
-    end_date = _parse_date_param(request.args.get("end_date")) or today
-    if end_date < start_date:
-        start_date, end_date = end_date, start_date
-    search_query = (request.args.get("search") or "").strip()
-    supplier_id = _parse_int_param(request.args.get("supplier"))
-
-    purchase_query = (
-        Pembelian.query.options(
-            joinedload(Pembelian.barang),
-            joinedload(Pembelian.supplier),
-        )
-        .filter(Pembelian.tanggal_faktur >= start_date)
-        .filter(Pembelian.tanggal_faktur <= end_date)
-        .order_by(Pembelian.tanggal_faktur.asc(), Pembelian.id.asc())
-    )
-    if supplier_id:
-        purchase_query = purchase_query.filter(Pembelian.supplier_id == supplier_id)
-    if search_query:
-        like = f"%{search_query}%"
-        purchase_query = purchase_query.outerjoin(Supplier).filter(
-            or_(Pembelian.no_faktur.ilike(like), Supplier.name.ilike(like))
-        )
-    purchase_records = purchase_query.all()
-
-    totals = {
-        "spend": 0.0,
-        "discount": 0.0,
-        "tax": 0.0,
-        "units": 0,
-        "invoices": len(purchase_records),
-    }
-    daily_map = defaultdict(lambda: {"spent": 0.0, "units": 0})
-    monthly_map = defaultdict(lambda: {"spent": 0.0, "units": 0})
-    supplier_map = defaultdict(
-        lambda: {"name": "Tanpa supplier", "spent": 0.0, "units": 0, "invoices": 0}
-    )
-
-    largest_invoice = {"amount": 0.0, "supplier": "Tanpa supplier", "date": "-"}
-    purchase_table = []
-
-    for purchase in purchase_records:
-        invoice_total = 0.0
-        invoice_units = 0
-        invoice_date = purchase.tanggal_faktur or today
-        month_key = (invoice_date.year, invoice_date.month)
-        line_items = []
-
-        for item in purchase.barang:
-            qty = item.jumlah or 0
-            unit_price = item.harga_beli or 0.0
-            discount_pct = item.diskon or 0.0
-            tax_pct = item.pajak or 0.0
-
-            base_total = unit_price * qty
-            discount_value = base_total * (discount_pct / 100.0)
-            taxable_total = base_total - discount_value
-            tax_value = taxable_total * (tax_pct / 100.0)
-            final_total = taxable_total + tax_value
-
-            totals["spend"] += final_total
-            totals["discount"] += discount_value
-            totals["tax"] += tax_value
-            totals["units"] += qty
-
-            invoice_total += final_total
-            invoice_units += qty
-            line_items.append(
-                {
-                    "name": item.nama_barang,
-                    "code": item.kode_barang,
-                    "qty": qty,
-                    "unit_price": unit_price,
-                    "discount": f"{discount_pct:.1f}%",
-                    "tax": f"{tax_pct:.1f}%",
-                    "line_total": final_total,
-                }
-            )
-
-        daily_map[invoice_date]["spent"] += invoice_total
-        daily_map[invoice_date]["units"] += invoice_units
-        monthly_map[month_key]["spent"] += invoice_total
-        monthly_map[month_key]["units"] += invoice_units
-
-        supplier_key = purchase.supplier_id or f"anon-{purchase.id}"
-        supplier_entry = supplier_map[supplier_key]
-        if purchase.supplier:
-            supplier_entry["name"] = purchase.supplier.name
-        supplier_entry["spent"] += invoice_total
-        supplier_entry["units"] += invoice_units
-        supplier_entry["invoices"] += 1
-
-        if invoice_total > largest_invoice["amount"]:
-            largest_invoice["amount"] = invoice_total
-            largest_invoice["supplier"] = (
-                purchase.supplier.name if purchase.supplier else "Tanpa supplier"
-            )
-            largest_invoice["date"] = _format_date_id(invoice_date)
-        payment_label = purchase.jenis_pembayaran or "Tunai"
-        if purchase.jenis_pembayaran == "Tempo" and purchase.due_date:
-            payment_label = f"Tempo • {_format_date_id(purchase.due_date)}"
-        elif purchase.jenis_pembayaran == "Transfer":
-            transfer_detail = purchase.payment_reference or purchase.payment_bank
-            if transfer_detail:
-                payment_label = f"Transfer • {transfer_detail}"
-        purchase_table.append(
-            {
-                "id": purchase.id,
-                "no_faktur": purchase.no_faktur,
-                "supplier": purchase.supplier.name if purchase.supplier else "Tanpa supplier",
-                "tanggal_label": _format_date_id(invoice_date),
-                "payment": payment_label,
-                "payment_raw": purchase.jenis_pembayaran,
-                "due_date_label": _format_date_id(purchase.due_date) if purchase.due_date else "-",
-                "payment_bank": purchase.payment_bank or "-",
-                "payment_reference": purchase.payment_reference or "-",
-                "units": invoice_units,
-                "total": invoice_total,
-                "line_items": line_items,
-            }
-        )
-
-    average_invoice = (
-        totals["spend"] / totals["invoices"] if totals["invoices"] else 0.0
-    )
-    active_suppliers = len([entry for entry in supplier_map.values() if entry["spent"]])
-
-    daily_points = [
-        {
-            "date": date_key.isoformat(),
-            "label": _format_date_id(date_key),
-            "spent": round(values["spent"], 2),
-        }
-        for date_key, values in sorted(daily_map.items())
-    ]
-
-    monthly_breakdown = [
-        {
-            "label": datetime(year=year, month=month, day=1).strftime("%b %Y"),
-            "spent": values["spent"],
-            "units": values["units"],
-        }
-        for (year, month), values in sorted(monthly_map.items())
-    ]
-
-    top_suppliers = sorted(
-        supplier_map.values(), key=lambda entry: entry["spent"], reverse=True
-    )[:5]
-    supplier_breakdown = [
-        entry for entry in supplier_map.values() if entry["spent"]
-    ]
-    supplier_breakdown = sorted(
-        supplier_breakdown, key=lambda entry: entry["spent"], reverse=True
-    )
-
-    summary_cards = [
-        {
-            "label": "Total Pengeluaran",
-            "value": totals["spend"],
-            "icon": "fa-coins",
-            "accent": "text-primary",
-            "subtitle": "Nilai faktur bersih",
-        },
-        {
-            "label": "Diskon Diterima",
-            "value": totals["discount"],
-            "icon": "fa-percentage",
-            "accent": "text-success",
-            "subtitle": "Potongan supplier",
-        },
-        {
-            "label": "Pajak Dibayar",
-            "value": totals["tax"],
-            "icon": "fa-file-invoice-dollar",
-            "accent": "text-warning",
-            "subtitle": "PPN pembelian",
-        },
-        {
-            "label": "Barang Direstock",
-            "value": totals["units"],
-            "icon": "fa-boxes",
-            "accent": "text-info",
-            "subtitle": "Total unit masuk",
-        },
-    ]
-
-    insight_cards = [
-        {
-            "title": "Rata-rata Faktur",
-            "value": average_invoice,
-            "type": "currency",
-            "description": "Pengeluaran rata-rata per transaksi.",
-        },
-        {
-            "title": "Supplier aktif",
-            "value": active_suppliers,
-            "type": "count",
-            "description": "Partner yang memasok periode ini.",
-        },
-        {
-            "title": "Faktur terbesar",
-            "value": largest_invoice["amount"],
-            "type": "currency",
-            "description": f"{largest_invoice['supplier']} • {largest_invoice['date']}",
-        },
-        {
-            "title": "Jumlah faktur",
-            "value": totals["invoices"],
-            "type": "count",
-            "description": "Banyaknya transaksi pembelian.",
-        },
-    ]
-
-    filter_values = {
-        "start_date": start_date.strftime("%Y-%m-%d"),
-        "end_date": end_date.strftime("%Y-%m-%d"),
-        "supplier": supplier_id or "",
-        "search": search_query,
-    }
-    range_label = f"{_format_date_id(start_date)} - {_format_date_id(end_date)}"
-    filter_active = any(
-        [
-            search_query,
-            supplier_id,
-            request.args.get("start_date"),
-            request.args.get("end_date"),
-        ]
-    )
-    supplier_options = Supplier.query.order_by(Supplier.name.asc()).all()
-
-    return render_template(
-        "laporan_pembelian.html",
-        summary_cards=summary_cards,
-        insight_cards=insight_cards,
-        purchase_table=purchase_table,
-        filter_active=filter_active,
-        supplier_options=supplier_options,
-        supplier_breakdown=supplier_breakdown,
-        top_suppliers=top_suppliers,
-        daily_points=daily_points,
-        monthly_breakdown=monthly_breakdown,
-        totals=totals,
-        average_invoice=average_invoice,
-        active_suppliers=active_suppliers,
-        largest_invoice=largest_invoice,
-        range_label=range_label,
-        filter_values=filter_values,
-    )
-
-
-@bp.route("/laporan/pembelian/print")
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def laporan_pembelian_print():
-    _ensure_purchase_payment_columns()
-    today = local_today()
-    default_start = today.replace(day=1)
-    start_date = _parse_date_param(request.args.get("start_date")) or default_start
-    end_date = _parse_date_param(request.args.get("end_date")) or today
-    if end_date < start_date:
-        start_date, end_date = end_date, start_date
-    search_query = (request.args.get("search") or "").strip()
-    supplier_id = _parse_int_param(request.args.get("supplier"))
-
-    purchase_query = (
-        Pembelian.query.options(
-            joinedload(Pembelian.barang),
-            joinedload(Pembelian.supplier),
-        )
-        .filter(Pembelian.tanggal_faktur >= start_date)
-        .filter(Pembelian.tanggal_faktur <= end_date)
-        .order_by(Pembelian.tanggal_faktur.asc(), Pembelian.id.asc())
-    )
-    if supplier_id:
-        purchase_query = purchase_query.filter(Pembelian.supplier_id == supplier_id)
-    if search_query:
-        like = f"%{search_query}%"
-        purchase_query = purchase_query.outerjoin(Supplier).filter(
-            or_(Pembelian.no_faktur.ilike(like), Supplier.name.ilike(like))
-        )
-
-    purchase_records = purchase_query.all()
-    purchase_table = []
-    total_spend = 0.0
-    total_units = 0
-
-    for purchase in purchase_records:
-        invoice_total = 0.0
-        invoice_units = 0
-        invoice_date = purchase.tanggal_faktur or today
-        line_items = []
-
-        for item in purchase.barang:
-            qty = item.jumlah or 0
-            unit_price = item.harga_beli or 0.0
-            discount_pct = item.diskon or 0.0
-            tax_pct = item.pajak or 0.0
-
-            base_total = unit_price * qty
-            discount_value = base_total * (discount_pct / 100.0)
-            taxable_total = base_total - discount_value
-            tax_value = taxable_total * (tax_pct / 100.0)
-            final_total = taxable_total + tax_value
-
-            invoice_total += final_total
-            invoice_units += qty
-            line_items.append(
-                {
-                    "name": item.nama_barang,
-                    "code": item.kode_barang,
-                    "qty": qty,
-                    "unit_price": unit_price,
-                    "discount": f"{discount_pct:.1f}%",
-                    "tax": f"{tax_pct:.1f}%",
-                    "line_total": final_total,
-                }
-            )
-
-        payment_label = purchase.jenis_pembayaran or "Tunai"
-        if purchase.jenis_pembayaran == "Tempo" and purchase.due_date:
-            payment_label = f"Tempo • {_format_date_id(purchase.due_date)}"
-        elif purchase.jenis_pembayaran == "Transfer":
-            transfer_detail = purchase.payment_reference or purchase.payment_bank
-            if transfer_detail:
-                payment_label = f"Transfer • {transfer_detail}"
-
-        purchase_table.append(
-            {
-                "id": purchase.id,
-                "no_faktur": purchase.no_faktur,
-                "supplier": purchase.supplier.name if purchase.supplier else "Tanpa supplier",
-                "tanggal_label": _format_date_id(invoice_date),
-                "payment": payment_label,
-                "units": invoice_units,
-                "total": invoice_total,
-                "line_items": line_items,
-            }
-        )
-        total_spend += invoice_total
-        total_units += invoice_units
-
-    range_label = f"{_format_date_id(start_date)} - {_format_date_id(end_date)}"
-    supplier_name = "-"
-    if supplier_id:
-        supplier = db.session.get(Supplier, supplier_id)
-        if supplier:
-            supplier_name = supplier.name
-
-    return render_template(
-        "laporan_pembelian_print.html",
-        purchase_table=purchase_table,
-        range_label=range_label,
-        search_query=search_query,
-        supplier_name=supplier_name,
-        total_spend=total_spend,
-        total_units=total_units,
-        total_invoices=len(purchase_table),
-        printed_at=local_now(),
-        company_profile=_get_company_profile(),
-    )
-
-
-@bp.route("/laporan/pembelian/print/<int:purchase_id>")
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def laporan_pembelian_print_detail(purchase_id):
-    _ensure_purchase_payment_columns()
-    purchase = (
-        Pembelian.query.options(
-            joinedload(Pembelian.barang),
-            joinedload(Pembelian.supplier),
-        )
-        .filter(Pembelian.id == purchase_id)
-        .first_or_404()
-    )
-    invoice_date = purchase.tanggal_faktur or local_today()
-    line_items = []
-    invoice_total = 0.0
-    total_units = 0
-
-    for item in purchase.barang:
-        qty = item.jumlah or 0
-        unit_price = item.harga_beli or 0.0
-        discount_pct = item.diskon or 0.0
-        tax_pct = item.pajak or 0.0
-
-        base_total = unit_price * qty
-        discount_value = base_total * (discount_pct / 100.0)
-        taxable_total = base_total - discount_value
-        tax_value = taxable_total * (tax_pct / 100.0)
-        final_total = taxable_total + tax_value
-
-        invoice_total += final_total
-        total_units += qty
-        line_items.append(
-            {
-                "name": item.nama_barang,
-                "code": item.kode_barang,
-                "qty": qty,
-                "unit_price": unit_price,
-                "discount": f"{discount_pct:.1f}%",
-                "tax": f"{tax_pct:.1f}%",
-                "line_total": final_total,
-            }
-        )
-
-    payment_label = purchase.jenis_pembayaran or "Tunai"
-    if purchase.jenis_pembayaran == "Tempo" and purchase.due_date:
-        payment_label = f"Tempo • {_format_date_id(purchase.due_date)}"
-    elif purchase.jenis_pembayaran == "Transfer":
-        transfer_detail = purchase.payment_reference or purchase.payment_bank
-        if transfer_detail:
-            payment_label = f"Transfer • {transfer_detail}"
-
-    return render_template(
-        "pembelian_print.html",
-        purchase=purchase,
-        invoice_date=_format_date_id(invoice_date),
-        payment_label=payment_label,
-        line_items=line_items,
-        total_units=total_units,
-        total_amount=invoice_total,
-        printed_at=local_now(),
-        company_profile=_get_company_profile(),
-    )
-
-
-def _product_cost_basis(product):
-    return float(product.harga_lama or product.harga_beli or product.harga or 0.0)
-
-
-def _get_locked_period_for_date(date_value):
-    if not date_value:
-        return None
-    return (
-        AccountingPeriod.query.filter(
-            AccountingPeriod.is_locked == True,
-            AccountingPeriod.start_date <= date_value,
-            AccountingPeriod.end_date >= date_value,
-        )
-        .order_by(AccountingPeriod.start_date.desc())
-        .first()
-    )
-
-
-def _build_period_metrics(start_date, end_date):
-    if not start_date or not end_date:
-        return None
-    if start_date > end_date:
-        return None
-
-    sales_total = (
-        db.session.query(func.coalesce(func.sum(Penjualan.total_harga), 0.0))
-        .filter(Penjualan.tanggal_penjualan >= start_date)
-        .filter(Penjualan.tanggal_penjualan <= end_date)
-        .scalar()
-        or 0.0
-    )
-
-    purchase_total = (
-        db.session.query(func.coalesce(func.sum(BarangPembelian.hpp), 0.0))
-        .join(Pembelian, BarangPembelian.pembelian)
-        .filter(Pembelian.tanggal_faktur >= start_date)
-        .filter(Pembelian.tanggal_faktur <= end_date)
-        .scalar()
-        or 0.0
-    )
-
-    hpp_total = (
-        db.session.query(
-            func.coalesce(
-                func.sum(
-                    DetailPenjualan.jumlah
-                    * func.coalesce(Produk.harga_lama, Produk.harga_beli, 0.0)
-                ),
-                0.0,
-            )
-        )
-        .join(Produk, DetailPenjualan.produk)
-        .join(Penjualan, DetailPenjualan.penjualan)
-        .filter(Penjualan.tanggal_penjualan >= start_date)
-        .filter(Penjualan.tanggal_penjualan <= end_date)
-        .scalar()
-        or 0.0
-    )
-
-    inventory_value = (
-        db.session.query(
-            func.coalesce(
-                func.sum(
-                    Produk.stok_lama
-                    * func.coalesce(Produk.harga_lama, Produk.harga_beli, 0.0)
-                ),
-                0.0,
-            )
-        )
-        .scalar()
-        or 0.0
-    )
-
-    net_income = round(sales_total - hpp_total, 2)
-
-    return {
-        "sales_total": round(sales_total, 2),
-        "purchase_total": round(purchase_total, 2),
-        "hpp_total": round(hpp_total, 2),
-        "inventory_value": round(inventory_value, 2),
-        "net_income": net_income,
-        "difference": round(inventory_value - hpp_total, 2),
-    }
-
-
-def _close_accounting_period(label, start_date, end_date, user_id, description=None):
-    if not label:
-        raise ValueError("Label periode wajib diisi.")
-    if not start_date or not end_date:
-        raise ValueError("Tanggal awal dan akhir periode wajib diisi.")
-    if start_date > end_date:
-        raise ValueError("Tanggal awal tidak boleh melewati tanggal akhir.")
-
-    overlap_closed = AccountingPeriod.query.filter(
-        AccountingPeriod.start_date <= end_date,
-        AccountingPeriod.end_date >= start_date,
-        AccountingPeriod.is_locked == True,
-    ).first()
-    if overlap_closed:
-        raise ValueError(f"Periode {overlap_closed.label} sudah ditutup.")
-
-    period = AccountingPeriod.query.filter(
-        AccountingPeriod.start_date == start_date,
-        AccountingPeriod.end_date == end_date,
-        AccountingPeriod.status == "open",
-    ).first()
-
-    if not period:
-        period = AccountingPeriod(
-            label=label,
-            start_date=start_date,
-            end_date=end_date,
-            description=description,
-            created_by=user_id,
-        )
-        db.session.add(period)
-        db.session.flush()
-
-    period.label = label
-    period.status = "closed"
-    period.description = description or period.description
-    period.is_locked = True
-    period.closed_by = user_id
-    period.closed_at = local_now()
-
-    sales = (
-        Penjualan.query.filter(Penjualan.tanggal_penjualan >= start_date)
-        .filter(Penjualan.tanggal_penjualan <= end_date)
-        .all()
-    )
-    for sale in sales:
-        sale.accounting_period_id = period.id
-        sale.is_locked = True
-
-    purchases = (
-        Pembelian.query.filter(Pembelian.tanggal_faktur >= start_date)
-        .filter(Pembelian.tanggal_faktur <= end_date)
-        .all()
-    )
-    for purchase in purchases:
-        purchase.accounting_period_id = period.id
-        purchase.is_locked = True
-
-    journals = (
-        JournalEntry.query.filter(JournalEntry.date >= start_date)
-        .filter(JournalEntry.date <= end_date)
-        .all()
-    )
-    for journal in journals:
-        journal.accounting_period_id = period.id
-        journal.is_locked = True
-
-    summary = _build_period_metrics(start_date, end_date)
-    if not summary:
-        summary = {
-            "sales_total": 0.0,
-            "hpp_total": 0.0,
-            "net_income": 0.0,
-        }
-    income_account = Account.query.filter_by(type="income", is_active=True).order_by(Account.code).first()
-    expense_account = Account.query.filter_by(type="expense", is_active=True).order_by(Account.code).first()
-    equity_account = Account.query.filter_by(type="equity", is_active=True).order_by(Account.code).first()
-
-    net_income = summary.get("net_income", 0.0)
-    closing_entry = None
-    if income_account and (expense_account or equity_account):
-        closing_entry = JournalEntry(
-            reference=_generate_journal_reference(),
-            date=end_date,
-            memo=f"Penutupan periode {label}",
-            created_by=user_id,
-            accounting_period_id=period.id,
-            is_locked=True,
-        )
-        db.session.add(closing_entry)
-        db.session.flush()
-
-        description = f"Rekap penutupan periode {label}"
-        if summary["sales_total"] > 0 and income_account:
-            db.session.add(
-                JournalLine(
-                    entry_id=closing_entry.id,
-                    account_id=income_account.id,
-                    debit=summary["sales_total"],
-                    credit=0.0,
-                    description=description,
-                )
-            )
-
-        if summary["hpp_total"] > 0 and expense_account:
-            db.session.add(
-                JournalLine(
-                    entry_id=closing_entry.id,
-                    account_id=expense_account.id,
-                    debit=0.0,
-                    credit=summary["hpp_total"],
-                    description=description,
-                )
-            )
-
-        if net_income != 0 and equity_account:
-            if net_income > 0:
-                db.session.add(
-                    JournalLine(
-                        entry_id=closing_entry.id,
-                        account_id=equity_account.id,
-                        debit=0.0,
-                        credit=net_income,
-                        description="Laba bersih periode ditutup",
-                    )
-                )
-            else:
-                db.session.add(
-                    JournalLine(
-                        entry_id=closing_entry.id,
-                        account_id=equity_account.id,
-                        debit=abs(net_income),
-                        credit=0.0,
-                        description="Rugi bersih periode ditutup",
-                    )
-                )
-    else:
-        logging.warning("Kredit penutupan tidak lengkap: pastikan ada akun income/expense/equity aktif.")
-
-    return period
-
-
-def _ensure_table(model):
-    try:
-        engine = db.session.get_bind()
-        model.__table__.create(bind=engine, checkfirst=True)
-    except Exception:
-        pass
-
-
-_EXPEDISI_VOLUME_CHECKED = False
-
-
-def _ensure_expedisi_volume_divisor():
-    global _EXPEDISI_VOLUME_CHECKED
-    if _EXPEDISI_VOLUME_CHECKED:
-        return
-    try:
-        engine = db.session.get_bind()
-        inspector = inspect(engine)
-        columns = [col["name"] for col in inspector.get_columns("expedisi")]
-        if "volume_divisor" not in columns:
-            db.session.execute(
-                text(
-                    "ALTER TABLE expedisi ADD COLUMN volume_divisor FLOAT DEFAULT 6000"
-                )
-            )
-            db.session.commit()
-    except Exception:
-        db.session.rollback()
-    _EXPEDISI_VOLUME_CHECKED = True
-
-
-def _generate_stock_reference():
-    base = f"SO{local_now().strftime('%Y%m%d%H%M%S')}"
-    candidate = base
-    counter = 1
-    while StockOpnameSession.query.filter_by(reference=candidate).first():
-        candidate = f"{base}-{counter}"
-        counter += 1
-    return candidate
-
-
-def _generate_journal_reference_with_prefix(prefix="JV"):
-    clean_prefix = (prefix or "JV").strip() or "JV"
-    base = f"{clean_prefix}{local_now().strftime('%Y%m%d%H%M%S')}"
-    candidate = base
-    counter = 1
-    while JournalEntry.query.filter_by(reference=candidate).first():
-        candidate = f"{base}-{counter}"
-        counter += 1
-    return candidate
-
-
-def _generate_journal_reference():
-    return _generate_journal_reference_with_prefix("JV")
-
-
-def _generate_invoice_number(prefix=None):
-    """
-    Generate unique invoice number using timestamp (minute precision) and fallback counter.
-    """
-    prefix = (prefix or _get_sales_invoice_prefix()).strip() or "F"
-    base = f"{prefix}{local_now().strftime('%Y%m%d%H%M')}"
-    candidate = base
-    counter = 1
-    while Penjualan.query.filter_by(no_faktur=candidate).first():
-        candidate = f"{base}-{counter}"
-        counter += 1
-    return candidate
-
-
-def _generate_quotation_number(prefix=None):
-    prefix = (prefix or "Q").strip() or "Q"
-    base = f"{prefix}{local_now().strftime('%Y%m%d%H%M')}"
-    candidate = base
-    counter = 1
-    while Quotation.query.filter_by(quote_number=candidate).first():
-        candidate = f"{base}-{counter}"
-        counter += 1
-    return candidate
-
-
-def _generate_purchase_invoice_number(prefix=None):
-    prefix = (prefix or _get_purchase_invoice_prefix()).strip() or "INV"
-    base = f"{prefix}{local_now().strftime('%Y%m%d%H%M%S%f')}"
-    candidate = base
-    counter = 1
-    while Pembelian.query.filter_by(no_faktur=candidate).first():
-        candidate = f"{base}-{counter}"
-        counter += 1
-    return candidate
-
-
-def _generate_po_number(prefix=None):
-    prefix = (prefix or "PO").strip() or "PO"
-    base = f"{prefix}{local_now().strftime('%Y%m%d%H%M')}"
-    candidate = base
-    counter = 1
-    while PurchaseOrder.query.filter_by(po_number=candidate).first():
-        candidate = f"{base}-{counter}"
-        counter += 1
-    return candidate
-
-
-def _build_draft_invoice(prefix, model):
-    base = f"{prefix}{local_now().strftime('%Y%m%d%H%M')}"
-    candidate = base
-    counter = 1
-    while model.query.filter_by(no_faktur=candidate).first():
-        candidate = f"{base}-{counter}"
-        counter += 1
-    return candidate
-
-
-def _get_accounting_setting():
-    _ensure_table(AccountingSetting)
-    _ensure_accounting_setting_columns()
-    return AccountingSetting.query.first()
-
-
-def _calculate_line_items_hpp(line_items):
-    total = 0.0
-    for item in line_items:
-        product = item.get("product")
-        if not product:
-            continue
-        cost_basis = float(
-            product.harga_lama
-            or product.harga_beli
-            or product.harga
-            or 0.0
-        )
-        total += cost_basis * (item.get("qty") or 0)
-    return round(total, 2)
-
-
-def _calculate_purchase_total(items):
-    total = 0.0
-    for item in items:
-        qty = float(item.jumlah or 0)
-        price = float(item.harga_beli or 0.0)
-        discount_pct = float(item.diskon or 0.0)
-        tax_pct = float(item.pajak or 0.0)
-        base_total = price * qty
-        discount_value = base_total * (discount_pct / 100.0)
-        taxable_total = base_total - discount_value
-        tax_value = taxable_total * (tax_pct / 100.0)
-        total += taxable_total + tax_value
-    return round(total, 2)
-
-
-def _purchase_total_subquery():
-    base_total = BarangPembelian.harga_beli * BarangPembelian.jumlah
-    discount_pct = func.coalesce(BarangPembelian.diskon, 0) / 100.0
-    tax_pct = func.coalesce(BarangPembelian.pajak, 0) / 100.0
-    line_total = base_total * (1 - discount_pct) * (1 + tax_pct)
-    return (
-        db.session.query(
-            BarangPembelian.pembelian_id.label("pembelian_id"),
-            func.coalesce(func.sum(line_total), 0.0).label("total_amount"),
-        )
-        .group_by(BarangPembelian.pembelian_id)
-        .subquery()
-    )
-
-
-def _payable_payment_sum_subquery():
-    return (
-        db.session.query(
-            PayablePayment.pembelian_id.label("pembelian_id"),
-            func.coalesce(func.sum(PayablePayment.amount), 0.0).label("amount_paid"),
-        )
-        .group_by(PayablePayment.pembelian_id)
-        .subquery()
-    )
-
-
-def _months_between(start_date, end_date):
-    if not start_date or not end_date or end_date < start_date:
-        return 0
-    months = (end_date.year - start_date.year) * 12 + (end_date.month - start_date.month)
-    if end_date.day < start_date.day:
-        months -= 1
-    return max(0, months)
-
-
-def _record_auto_cogs_journal(penjualan, amount, settings, user_id=None):
-    if (
-        not settings
-        or not settings.inventory_account_id
-        or not settings.cogs_account_id
-        or amount <= 0
-    ):
-        return None
-
-    entry = JournalEntry(
-        reference=_generate_journal_reference(),
-        date=penjualan.tanggal_penjualan or local_today(),
-        memo=f"Auto COGS – Penjualan {penjualan.no_faktur}",
-        created_by=user_id,
-    )
-    db.session.add(entry)
-    db.session.flush()
-
-    description = f"HPP otomatis untuk invoice {penjualan.no_faktur}"
-    db.session.add(
-        JournalLine(
-            entry_id=entry.id,
-            account_id=settings.cogs_account_id,
-            debit=amount,
-            credit=0.0,
-            description=description,
-        )
-    )
-    db.session.add(
-        JournalLine(
-            entry_id=entry.id,
-            account_id=settings.inventory_account_id,
-            debit=0.0,
-            credit=amount,
-            description=description,
-        )
-    )
-    return entry
-
-
-def _record_marketplace_fee_journal(penjualan, amount, settings, user_id=None):
-    if (
-        not settings
-        or not settings.marketplace_expense_account_id
-        or not settings.marketplace_payable_account_id
-        or amount <= 0
-    ):
-        return None
-
-    entry = JournalEntry(
-        reference=_generate_journal_reference(),
-        date=penjualan.tanggal_penjualan or local_today(),
-        memo=f"Auto Marketplace Fee – Penjualan {penjualan.no_faktur}",
-        created_by=user_id,
-    )
-    db.session.add(entry)
-    db.session.flush()
-
-    description = f"Biaya marketplace otomatis untuk invoice {penjualan.no_faktur}"
-    db.session.add(
-        JournalLine(
-            entry_id=entry.id,
-            account_id=settings.marketplace_expense_account_id,
-            debit=amount,
-            credit=0.0,
-            description=description,
-        )
-    )
-    db.session.add(
-        JournalLine(
-            entry_id=entry.id,
-            account_id=settings.marketplace_payable_account_id,
-            debit=0.0,
-            credit=amount,
-            description=description,
-        )
-    )
-    return entry
-
-
-def _resolve_sqlite_path():
-    uri = current_app.config.get("SQLALCHEMY_DATABASE_URI") or ""
-    if not uri.startswith("sqlite:"):
-        return None
-    trimmed = uri.split("sqlite://")[1]
-    if trimmed.startswith("/"):
-        trimmed = trimmed[1:]
-    return os.path.abspath(trimmed)
-
-
-def _check_db_connection():
-    start = time.perf_counter()
-    try:
-        db.session.execute(text("SELECT 1"))
-        latency_ms = (time.perf_counter() - start) * 1000
-        return {
-            "ok": True,
-            "message": "Koneksi database berhasil.",
-            "latency_ms": round(latency_ms, 2),
-        }
-    except Exception as exc:
-        db.session.rollback()
-        return {"ok": False, "message": f"Gagal: {exc}", "latency_ms": None}
-
-
-def _get_backup_directory():
-    base_dir = current_app.instance_path or os.getcwd()
-    backup_dir = os.path.join(base_dir, "db_backups")
-    os.makedirs(backup_dir, exist_ok=True)
-    return backup_dir
-
-
-def _list_db_backups():
-    backup_dir = _get_backup_directory()
-    backups = []
-    for name in os.listdir(backup_dir):
-        path = os.path.join(backup_dir, name)
-        if not os.path.isfile(path):
-            continue
-        stat = os.stat(path)
-        backups.append(
-            {
-                "name": name,
-                "size": stat.st_size,
-                "mtime": datetime.fromtimestamp(stat.st_mtime),
-                "path": path,
-            }
-        )
-    backups.sort(key=lambda item: item["mtime"], reverse=True)
-    return backups
-
-
-def _is_allowed_backup_name(filename):
-    if not filename:
-        return False
-    lowered = filename.lower()
-    return lowered.endswith((".db", ".sqlite", ".sqlite3", ".bak"))
-
-
-def _backup_sqlite_database():
-    db_path = _resolve_sqlite_path()
-    if not db_path or not os.path.exists(db_path):
-        return None, "Database SQLite tidak ditemukan."
-    backup_dir = _get_backup_directory()
-    stamp = local_now().strftime("%Y%m%d%H%M%S")
-    backup_name = f"backup_{stamp}.sqlite3"
-    backup_path = os.path.join(backup_dir, backup_name)
-
-    try:
-        with sqlite3.connect(db_path) as source, sqlite3.connect(backup_path) as target:
-            source.backup(target)
-        return backup_name, None
-    except Exception as exc:
-        return None, f"Gagal membuat backup: {exc}"
-
-
-def _restore_sqlite_database(backup_path):
-    db_path = _resolve_sqlite_path()
-    if not db_path:
-        return "Database SQLite tidak ditemukan."
-    if not backup_path or not os.path.exists(backup_path):
-        return "File backup tidak ditemukan."
-
-    try:
-        db.session.remove()
-        db.engine.dispose()
-    except Exception:
-        pass
-
-    os.makedirs(os.path.dirname(db_path), exist_ok=True)
-    try:
-        with sqlite3.connect(backup_path) as source, sqlite3.connect(db_path) as target:
-            source.backup(target)
-        return None
-    except Exception as exc:
-        return f"Gagal restore database: {exc}"
-
-
-def _collect_system_metrics():
-    metrics = {
-        "timestamp": local_now().strftime("%Y-%m-%d %H:%M:%S"),
-        "environment": current_app.config.get("FLASK_ENV", "production"),
-    }
-
-    db_info = {
-        "engine": None,
-        "name": None,
-        "host": None,
-        "path": None,
-        "size": None,
-    }
-    base_dir = current_app.instance_path
-
-    db_uri = current_app.config.get("SQLALCHEMY_DATABASE_URI") or ""
-    url_obj = None
-    try:
-        url_obj = make_url(db_uri)
-        db_info.update(
-            {
-                "engine": url_obj.get_backend_name(),
-                "name": url_obj.database,
-                "host": url_obj.host,
-            }
-        )
-    except Exception:
-        url_obj = None
-
-    db_path = _resolve_sqlite_path()
-    if url_obj and url_obj.get_backend_name().startswith("sqlite"):
-        if db_path and os.path.exists(db_path):
-            db_info["path"] = db_path
-            db_info["size"] = os.path.getsize(db_path)
-            base_dir = os.path.dirname(db_path) or base_dir
-    elif url_obj:
-        db_info["size"] = _fetch_remote_db_size(url_obj)
-
-    metrics["database"] = db_info
-
-    if not os.path.exists(base_dir):
-        base_dir = os.getcwd()
-
-    try:
-        disk = shutil.disk_usage(base_dir)
-        metrics["disk"] = {
-            "total": disk.total,
-            "used": disk.used,
-            "free": disk.free,
-        }
-    except Exception:
-        metrics["disk"] = {"total": None, "used": None, "free": None}
-
-    if psutil:
-        vm = psutil.virtual_memory()
-        metrics["memory"] = {
-            "total": vm.total,
-            "available": vm.available,
-            "percent": vm.percent,
-        }
-        metrics["cpu"] = {
-            "count": psutil.cpu_count(logical=True),
-            "percent": psutil.cpu_percent(interval=0.1),
-            "load_avg": os.getloadavg() if hasattr(os, "getloadavg") else None,
-        }
-        process = psutil.Process()
-        mem_info = process.memory_full_info()
-        metrics["process_memory"] = {
-            "rss": mem_info.rss,
-            "uss": getattr(mem_info, "uss", None),
-        }
-    else:
-        metrics["memory"] = None
-        metrics["cpu"] = {
-            "count": os.cpu_count(),
-            "percent": None,
-            "load_avg": os.getloadavg() if hasattr(os, "getloadavg") else None,
-        }
-        metrics["process_memory"] = None
-
-    return metrics
-
-
-def _fetch_remote_db_size(url_obj):
-    backend = url_obj.get_backend_name() if url_obj else None
-    if backend == "postgresql":
-        query = text("SELECT pg_database_size(current_database())")
-    elif backend == "mysql":
-        query = text(
-            "SELECT SUM(data_length + index_length) "
-            "FROM information_schema.tables WHERE table_schema = DATABASE()"
-        )
-    else:
-        return None
-
-    try:
-        result = db.session.execute(query).scalar()
-        return int(result) if result is not None else None
-    except Exception:
-        return None
-
-
-@bp.route("/update-harga", methods=["GET", "POST"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def update_harga():
-    if request.method == "POST":
-        if not request.is_json:
-            return (
-                jsonify(
-                    {
-                        "success": False,
-                        "message": "Content-Type harus application/json.",
-                    }
-                ),
-                415,
-            )
-
-        payload = request.get_json(silent=True) or {}
-        items = payload.get("items") or []
-        if not isinstance(items, list) or not items:
-            return (
-                jsonify(
-                    {
-                        "success": False,
-                        "message": "Kirim minimal satu produk yang akan diperbarui.",
-                    }
-                ),
-                400,
-            )
-
-        errors = []
-        updated_rows = []
-        now = local_now()
-        inspector = inspect(db.session.get_bind())
-        price_log_available = inspector.has_table("price_change")
-        for index, item in enumerate(items, start=1):
-            product_id = item.get("product_id")
-            new_price_raw = item.get("new_price")
-            reason = (item.get("reason") or "").strip()
-
-            try:
-                product_id = int(product_id)
-            except (TypeError, ValueError):
-                errors.append(f"Produk pada baris {index} tidak valid.")
-                continue
-
-            try:
-                new_price = float(new_price_raw)
-            except (TypeError, ValueError):
-                errors.append(f"Harga baru tidak valid (baris {index}).")
-                continue
-
-            if new_price <= 0:
-                errors.append(f"Harga harus lebih besar dari 0 (baris {index}).")
-                continue
-
-            product = db.session.get(Produk, product_id)
-            if not product:
-                errors.append(f"Produk dengan ID {product_id} tidak ditemukan.")
-                continue
-
-            old_price = float(product.harga or 0.0)
-            if math.isclose(old_price, new_price, rel_tol=0.0, abs_tol=0.005):
-                continue
-
-            cost_basis = _product_cost_basis(product)
-            margin_before = old_price - cost_basis
-            margin_after = new_price - cost_basis
-
-            product.harga = new_price
-            if price_log_available:
-                price_change = PriceChange(
-                    product_id=product.id,
-                    user_id=session.get("user_id"),
-                    old_price=old_price,
-                    new_price=new_price,
-                    margin_before=margin_before,
-                    margin_after=margin_after,
-                    reason=reason or None,
-                    created_at=now,
-                )
-                db.session.add(price_change)
-            updated_rows.append(
-                {
-                    "product_id": product.id,
-                    "name": product.nama_produk,
-                    "old_price": old_price,
-                    "new_price": new_price,
-                    "margin_after": margin_after,
-                }
-            )
-
-        if errors:
-            db.session.rollback()
-            return jsonify({"success": False, "message": " ".join(errors)}), 400
-
-        if not updated_rows:
-            return (
-                jsonify(
-                    {
-                        "success": False,
-                        "message": "Tidak ada harga yang berubah dari nilai sebelumnya.",
-                    }
-                ),
-                400,
-            )
-
-        db.session.commit()
-        return jsonify(
-            {
-                "success": True,
-                "message": (
-                    f"{len(updated_rows)} harga berhasil diperbarui."
-                    + (
-                        " (Catatan: histori harga belum aktif, jalankan migrasi.)"
-                        if not price_log_available
-                        else ""
-                    )
-                ),
-                "updated": updated_rows,
-            }
-        )
-
-    products = (
-        Produk.query.options(
-            joinedload(Produk.kategori),
-            joinedload(Produk.supplier),
-        )
-        .order_by(Produk.nama_produk.asc())
-        .all()
-    )
-    product_rows = []
-    for product in products:
-        cost_basis = _product_cost_basis(product)
-        current_price = float(product.harga or 0.0)
-        margin_value = current_price - cost_basis
-        margin_pct = (margin_value / cost_basis * 100) if cost_basis else 0.0
-        product_rows.append(
-            {
-                "id": product.id,
-                "code": product.kode_produk,
-                "name": product.nama_produk,
-                "sku": product.sku or "-",
-                "kategori": (
-                    product.kategori.name if product.kategori else "Tanpa kategori"
-                ),
-                "supplier": (
-                    product.supplier.name if product.supplier else "Tanpa supplier"
-                ),
-                "cost": cost_basis,
-                "price": current_price,
-                "margin_value": margin_value,
-                "margin_percent": margin_pct,
-            }
-        )
-
-    inspector = inspect(db.session.get_bind())
-    price_change_ready = inspector.has_table("price_change")
-    recent_changes = []
-    if price_change_ready:
-        try:
-            recent_changes = (
-                PriceChange.query.options(
-                    joinedload(PriceChange.product),
-                    joinedload(PriceChange.user),
-                )
-                .order_by(PriceChange.created_at.desc())
-                .limit(10)
-                .all()
-            )
-        except OperationalError:
-            db.session.rollback()
-            price_change_ready = False
-
-    return render_template(
-        "update_harga.html",
-        products=product_rows,
-        recent_changes=recent_changes,
-        price_change_ready=price_change_ready,
-    )
-
-
-@bp.route("/stok-opname", methods=["GET", "POST"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def stok_opname():
-    if request.method == "POST":
-        if not request.is_json:
-            return (
-                jsonify(
-                    {
-                        "success": False,
-                        "message": "Content-Type harus application/json.",
-                    }
-                ),
-                415,
-            )
-        payload = request.get_json(silent=True) or {}
-        items = payload.get("items") or []
-        if not items:
-            return (
-                jsonify(
-                    {
-                        "success": False,
-                        "message": "Tambahkan minimal satu produk untuk stock opname.",
-                    }
-                ),
-                400,
-            )
-        location = (payload.get("location") or "").strip()
-        note = (payload.get("note") or "").strip()
-        reference = (
-            payload.get("reference") or ""
-        ).strip() or _generate_stock_reference()
-
-        opname_session = StockOpnameSession(
-            reference=reference,
-            location=location or None,
-            note=note or None,
-            status="completed",
-            created_by=session.get("user_id"),
-            created_at=local_now(),
-            finalized_at=local_now(),
-        )
-        db.session.add(opname_session)
-        adjustments = []
-        increase_value = 0.0
-        decrease_value = 0.0
-        errors = []
-        for index, item in enumerate(items, start=1):
-            product_id = item.get("product_id")
-            counted_raw = item.get("counted_qty")
-            item_note = (item.get("note") or "").strip()
-            try:
-                product_id = int(product_id)
-            except (TypeError, ValueError):
-                errors.append(f"Produk tidak valid pada baris {index}.")
-                continue
-            try:
-                counted_qty = int(counted_raw)
-            except (TypeError, ValueError):
-                errors.append(f"Jumlah fisik tidak valid (baris {index}).")
-                continue
-            if counted_qty < 0:
-                errors.append(f"Jumlah fisik tidak boleh negatif (baris {index}).")
-                continue
-            product = db.session.get(Produk, product_id)
-            if not product:
-                errors.append(f"Produk dengan ID {product_id} tidak ditemukan.")
-                continue
-            system_qty = int(product.stok_lama or 0)
-            difference = counted_qty - system_qty
-            product.stok_lama = counted_qty
-            opname_item = StockOpnameItem(
-                session=opname_session,
-                product_id=product.id,
-                system_qty=system_qty,
-                counted_qty=counted_qty,
-                difference_qty=difference,
-                note=item_note or None,
-            )
-            db.session.add(opname_item)
-            if difference != 0:
-                cost_basis = float(
-                    product.harga_lama
-                    or product.harga_beli
-                    or product.harga
-                    or 0.0
-                )
-                adjustment_value = abs(difference) * cost_basis
-                if difference > 0:
-                    increase_value += adjustment_value
-                else:
-                    decrease_value += adjustment_value
-            adjustments.append(
-                {
-                    "product_id": product.id,
-                    "name": product.nama_produk,
-                    "system_qty": system_qty,
-                    "counted_qty": counted_qty,
-                    "difference": difference,
-                }
-            )
-        if errors:
-            db.session.rollback()
-            return jsonify({"success": False, "message": " ".join(errors)}), 400
-        if not adjustments:
-            db.session.rollback()
-            return (
-                jsonify(
-                    {
-                        "success": False,
-                        "message": "Tidak ada baris valid yang diproses.",
-                    }
-                ),
-                400,
-            )
-        journal_entry = None
-        journal_warning = None
-        if increase_value > 0 or decrease_value > 0:
-            _ensure_table(JournalEntry)
-            _ensure_table(JournalLine)
-            settings = _get_accounting_setting()
-            inventory_account = settings.inventory_account if settings else None
-            adjustment_account = (
-                settings.inventory_adjustment_account if settings else None
-            )
-            if inventory_account and adjustment_account:
-                journal_entry = JournalEntry(
-                    reference=_generate_journal_reference_with_prefix("SOJ"),
-                    date=local_today(),
-                    memo=f"Penyesuaian Persediaan - {reference}",
-                    created_by=session.get("user_id"),
-                )
-                db.session.add(journal_entry)
-                db.session.flush()
-                if increase_value > 0:
-                    db.session.add(
-                        JournalLine(
-                            entry_id=journal_entry.id,
-                            account_id=inventory_account.id,
-                            debit=round(increase_value, 2),
-                            credit=0.0,
-                            description="Penyesuaian persediaan (selisih lebih)",
-                        )
-                    )
-                    db.session.add(
-                        JournalLine(
-                            entry_id=journal_entry.id,
-                            account_id=adjustment_account.id,
-                            debit=0.0,
-                            credit=round(increase_value, 2),
-                            description="Penyesuaian persediaan (selisih lebih)",
-                        )
-                    )
-                if decrease_value > 0:
-                    db.session.add(
-                        JournalLine(
-                            entry_id=journal_entry.id,
-                            account_id=adjustment_account.id,
-                            debit=round(decrease_value, 2),
-                            credit=0.0,
-                            description="Penyesuaian persediaan (selisih kurang)",
-                        )
-                    )
-                    db.session.add(
-                        JournalLine(
-                            entry_id=journal_entry.id,
-                            account_id=inventory_account.id,
-                            debit=0.0,
-                            credit=round(decrease_value, 2),
-                            description="Penyesuaian persediaan (selisih kurang)",
-                        )
-                    )
-            else:
-                journal_warning = (
-                    "Jurnal penyesuaian tidak dibuat karena akun Persediaan/"
-                    "Penyesuaian Persediaan belum dikonfigurasi."
-                )
-        db.session.commit()
-        plus = sum(item["difference"] for item in adjustments if item["difference"] > 0)
-        minus = sum(
-            item["difference"] for item in adjustments if item["difference"] < 0
-        )
-        return jsonify(
-            {
-                "success": True,
-                "reference": reference,
-                "message": "Stock opname berhasil disimpan dan stok diperbarui.",
-                "summary": {
-                    "rows": len(adjustments),
-                    "plus": plus,
-                    "minus": minus,
-                },
-                "journal": {
-                    "created": bool(journal_entry),
-                    "reference": journal_entry.reference if journal_entry else None,
-                    "warning": journal_warning,
-                },
-            }
-        )
-
-    products = Produk.query.order_by(Produk.nama_produk.asc()).all()
-    product_payload = [
-        {
-            "id": product.id,
-            "code": product.kode_produk,
-            "name": product.nama_produk,
-            "sku": product.sku or "-",
-            "kategori": product.kategori.name if product.kategori else "Tanpa kategori",
-            "stock": int(product.stok_lama or 0),
-        }
-        for product in products
-    ]
-    inspector = inspect(db.session.get_bind())
-    opname_ready = inspector.has_table("stock_opname_session")
-    sessions = []
-    if opname_ready:
-        try:
-            sessions = (
-                StockOpnameSession.query.options(
-                    joinedload(StockOpnameSession.user),
-                    joinedload(StockOpnameSession.items).joinedload(
-                        StockOpnameItem.product
-                    ),
-                )
-                .order_by(StockOpnameSession.created_at.desc())
-                .limit(5)
-                .all()
-            )
-        except OperationalError:
-            db.session.rollback()
-            opname_ready = False
-    session_payload = []
-    for opname in sessions:
-        diff_total = sum(item.difference_qty for item in opname.items)
-        item_count = len(opname.items)
-        session_payload.append(
-            {
-                "reference": opname.reference,
-                "created_at": (
-                    _format_date_id(opname.created_at.date())
-                    if opname.created_at
-                    else "-"
-                ),
-                "user": opname.user.username if opname.user else "System",
-                "location": opname.location or "-",
-                "status": opname.status.title() if opname.status else "-",
-                "item_count": item_count,
-                "diff_total": diff_total,
-            }
-        )
-    stats = {
-        "product_count": len(products),
-        "session_count": StockOpnameSession.query.count() if opname_ready else 0,
-        "last_reference": session_payload[0]["reference"] if session_payload else None,
-    }
-    import_status = (request.args.get("import_status") or "").strip().lower()
-    import_rows = _parse_int_param(request.args.get("import_rows"))
-    if import_status not in {"success"}:
-        import_status = None
-        import_rows = None
-    opname_import_schema = [
-        {
-            "column": "Kode Produk",
-            "required": False,
-            "description": "Kode unik barang (disarankan untuk akurasi).",
-        },
-        {"column": "SKU", "required": False, "description": "Kode internal opsional."},
-        {
-            "column": "Nama Produk",
-            "required": False,
-            "description": "Nama barang sesuai katalog (hindari nama ganda).",
-        },
-        {
-            "column": "Qty Fisik",
-            "required": True,
-            "description": "Jumlah fisik hasil hitung (angka bulat).",
-        },
-        {
-            "column": "HPP",
-            "required": False,
-            "description": "Harga pokok rata-rata per item (opsional).",
-        },
-        {
-            "column": "Catatan",
-            "required": False,
-            "description": "Catatan per item (opsional).",
-        },
-    ]
-    return render_template(
-        "stok_opname.html",
-        product_payload=product_payload,
-        sessions=session_payload,
-        stats=stats,
-        opname_ready=opname_ready,
-        opname_import_schema=opname_import_schema,
-        import_status=import_status,
-        import_rows=import_rows,
-    )
-
-
-@bp.route("/stok-opname/import", methods=["POST"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def import_stok_opname():
-    inspector = inspect(db.session.get_bind())
-    if not (
-        inspector.has_table("stock_opname_session")
-        and inspector.has_table("stock_opname_item")
-    ):
-        flash(
-            "Modul stok opname belum siap. Jalankan migrasi flask db upgrade terlebih dahulu.",
-            "warning",
-        )
-        return redirect(url_for("main.stok_opname"))
-
-    if "file" not in request.files:
-        flash("Tidak ada file yang diunggah!", "danger")
-        return redirect(url_for("main.stok_opname"))
-
-    file = request.files["file"]
-    if file.filename == "":
-        flash("File tidak dipilih!", "danger")
-        return redirect(url_for("main.stok_opname"))
-
-    file_bytes = file.read()
-    if not file_bytes:
-        flash("File kosong atau tidak dapat dibaca.", "danger")
-        return redirect(url_for("main.stok_opname"))
-
-    filename = (file.filename or "").lower()
-    try:
-        if filename.endswith(".csv"):
-            try:
-                df = pd.read_csv(
-                    BytesIO(file_bytes), encoding="utf-8-sig", sep=None, engine="python"
-                )
-            except Exception:
-                df = pd.read_csv(BytesIO(file_bytes))
-        else:
-            df = pd.read_excel(BytesIO(file_bytes))
-    except Exception as exc:
-        flash(f"Gagal membaca file: {exc}", "danger")
-        return redirect(url_for("main.stok_opname"))
-
-    if df.empty:
-        flash("File tidak memiliki data untuk diproses.", "warning")
-        return redirect(url_for("main.stok_opname"))
-
-    def normalize_column_name(value):
-        value = str(value or "").strip().lower()
-        return re.sub(r"[\s_]+", " ", value)
-
-    column_map = {normalize_column_name(col): col for col in df.columns}
-    kode_keys = [
-        "kode produk",
-        "kode barang",
-        "kode",
-        "kode_produk",
-        "product code",
-    ]
-    sku_keys = ["sku", "kode sku"]
-    nama_keys = ["nama produk", "nama barang", "nama", "product name", "produk"]
-    qty_keys = [
-        "qty fisik",
-        "qty",
-        "stok fisik",
-        "jumlah fisik",
-        "qty hitung",
-        "counted qty",
-    ]
-    hpp_keys = [
-        "hpp",
-        "harga pokok",
-        "harga pokok rata-rata",
-        "harga pokok rata rata",
-        "harga pokok rata2",
-        "harga beli",
-        "cost",
-        "cost basis",
-    ]
-    note_keys = ["catatan", "keterangan", "note"]
-
-    if not any(key in column_map for key in qty_keys):
-        flash(
-            "Kolom Qty Fisik tidak ditemukan. Gunakan header seperti 'Qty Fisik' atau 'Qty'.",
-            "danger",
-        )
-        return redirect(url_for("main.stok_opname"))
-
-    if not any(key in column_map for key in (kode_keys + sku_keys + nama_keys)):
-        flash(
-            "Kolom identitas produk tidak ditemukan. Gunakan 'Kode Produk', 'SKU', atau 'Nama Produk'.",
-            "danger",
-        )
-        return redirect(url_for("main.stok_opname"))
-
-    products = Produk.query.order_by(Produk.id.asc()).all()
-    kode_map = {
-        (product.kode_produk or "").strip().lower(): product
-        for product in products
-        if product.kode_produk
-    }
-    sku_map = {
-        (product.sku or "").strip().lower(): product
-        for product in products
-        if product.sku
-    }
-    nama_map = defaultdict(list)
-    for product in products:
-        key = (product.nama_produk or "").strip().lower()
-        if key:
-            nama_map[key].append(product)
-
-    def read_row_value(row, keys):
-        for key in keys:
-            col = column_map.get(key)
-            if col is not None:
-                return row.get(col)
-        return None
-
-    def has_value(value):
-        return not pd.isna(value) and str(value).strip() != ""
-
-    def parse_counted_qty(value):
-        if pd.isna(value) or value == "":
-            return None
-        raw = str(value).strip()
-        if not raw:
-            return None
-        raw = raw.replace(" ", "")
-        if raw.isdigit():
-            return int(raw)
-        if re.fullmatch(r"\d{1,3}(\.\d{3})+", raw):
-            return int(raw.replace(".", ""))
-        if re.fullmatch(r"\d{1,3}(,\d{3})+", raw):
-            return int(raw.replace(",", ""))
-        try:
-            number = float(raw.replace(",", "."))
-        except (TypeError, ValueError):
-            return None
-        if not number.is_integer():
-            return None
-        return int(number)
-
-    def parse_cost(value):
-        if pd.isna(value) or value == "":
-            return None
-        raw = str(value).strip()
-        if not raw:
-            return None
-        raw = raw.replace(" ", "")
-        if re.fullmatch(r"\d{1,3}(\.\d{3})+(,\d+)?", raw):
-            normalized = raw.replace(".", "").replace(",", ".")
-        elif re.fullmatch(r"\d{1,3}(,\d{3})+(\.\d+)?", raw):
-            normalized = raw.replace(",", "")
-        else:
-            normalized = raw.replace(",", ".")
-        try:
-            return float(normalized)
-        except (TypeError, ValueError):
-            return None
-
-    prepared_rows = []
-    errors = []
-    error_count = 0
-    seen_product_ids = set()
-    max_errors = 8
-
-    for index, row in df.iterrows():
-        row_number = index + 2
-        kode_val = _clean_import_str(read_row_value(row, kode_keys))
-        sku_val = _clean_import_str(read_row_value(row, sku_keys))
-        nama_val = _clean_import_str(read_row_value(row, nama_keys))
-        qty_raw = read_row_value(row, qty_keys)
-        hpp_raw = read_row_value(row, hpp_keys)
-        note_val = _clean_import_str(read_row_value(row, note_keys))
-
-        if (
-            not any([kode_val, sku_val, nama_val])
-            and (pd.isna(qty_raw) or qty_raw == "")
-            and not has_value(hpp_raw)
-            and not note_val
-        ):
-            continue
-
-        product = None
-        if kode_val:
-            product = kode_map.get(kode_val.lower())
-            if not product:
-                error_count += 1
-                if len(errors) < max_errors:
-                    errors.append(
-                        f"Baris {row_number}: Kode Produk {kode_val} tidak ditemukan."
-                    )
-                continue
-        elif sku_val:
-            product = sku_map.get(sku_val.lower())
-            if not product:
-                error_count += 1
-                if len(errors) < max_errors:
-                    errors.append(
-                        f"Baris {row_number}: SKU {sku_val} tidak ditemukan."
-                    )
-                continue
-        elif nama_val:
-            matches = nama_map.get(nama_val.lower(), [])
-            if not matches:
-                error_count += 1
-                if len(errors) < max_errors:
-                    errors.append(
-                        f"Baris {row_number}: Nama Produk {nama_val} tidak ditemukan."
-                    )
-                continue
-            if len(matches) > 1:
-                error_count += 1
-                if len(errors) < max_errors:
-                    errors.append(
-                        f"Baris {row_number}: Nama Produk {nama_val} duplikat, gunakan Kode Produk atau SKU."
-                    )
-                continue
-            product = matches[0]
-        else:
-            error_count += 1
-            if len(errors) < max_errors:
-                errors.append(
-                    f"Baris {row_number}: Identitas produk kosong atau tidak dikenali."
-                )
-            continue
-
-        if product.id in seen_product_ids:
-            error_count += 1
-            if len(errors) < max_errors:
-                errors.append(
-                    f"Baris {row_number}: Produk {product.kode_produk} duplikat di file."
-                )
-            continue
-
-        counted_qty = parse_counted_qty(qty_raw)
-        if counted_qty is None:
-            error_count += 1
-            if len(errors) < max_errors:
-                errors.append(
-                    f"Baris {row_number}: Qty fisik tidak valid atau bukan angka bulat."
-                )
-            continue
-        if counted_qty < 0:
-            error_count += 1
-            if len(errors) < max_errors:
-                errors.append(
-                    f"Baris {row_number}: Qty fisik tidak boleh negatif."
-                )
-            continue
-
-        hpp_value = None
-        if has_value(hpp_raw):
-            hpp_value = parse_cost(hpp_raw)
-            if hpp_value is None:
-                error_count += 1
-                if len(errors) < max_errors:
-                    errors.append(
-                        f"Baris {row_number}: HPP tidak valid."
-                    )
-                continue
-            if hpp_value < 0:
-                error_count += 1
-                if len(errors) < max_errors:
-                    errors.append(
-                        f"Baris {row_number}: HPP tidak boleh negatif."
-                    )
-                continue
-
-        seen_product_ids.add(product.id)
-        prepared_rows.append(
-            {
-                "product": product,
-                "counted_qty": counted_qty,
-                "hpp": hpp_value,
-                "note": note_val,
-            }
-        )
-
-    if error_count:
-        message = "; ".join(errors)
-        if error_count > max_errors:
-            message += f"; dan {error_count - max_errors} baris lainnya."
-        flash(f"Gagal import stok opname: {message}", "danger")
-        return redirect(url_for("main.stok_opname"))
-
-    if not prepared_rows:
-        flash("Tidak ada baris valid yang diproses dari file import.", "warning")
-        return redirect(url_for("main.stok_opname"))
-
-    location = (request.form.get("location") or "").strip() or None
-    note = (request.form.get("note") or "").strip() or None
-    reference = _generate_stock_reference()
-
-    opname_session = StockOpnameSession(
-        reference=reference,
-        location=location,
-        note=note,
-        status="completed",
-        created_by=session.get("user_id"),
-        created_at=local_now(),
-        finalized_at=local_now(),
-    )
-    db.session.add(opname_session)
-
-    summary = {"rows": 0, "plus": 0, "minus": 0}
-    for row in prepared_rows:
-        product = row["product"]
-        counted_qty = row["counted_qty"]
-        system_qty = int(product.stok_lama or 0)
-        difference = counted_qty - system_qty
-        product.stok_lama = counted_qty
-        if row["hpp"] is not None:
-            product.harga_lama = row["hpp"]
-            product.harga_beli = row["hpp"]
-        db.session.add(
-            StockOpnameItem(
-                session=opname_session,
-                product_id=product.id,
-                system_qty=system_qty,
-                counted_qty=counted_qty,
-                difference_qty=difference,
-                note=row["note"] or None,
-            )
-        )
-        summary["rows"] += 1
-        if difference > 0:
-            summary["plus"] += difference
-        elif difference < 0:
-            summary["minus"] += difference
-
-    db.session.commit()
-    flash(
-        f"Import stok opname berhasil. {summary['rows']} item diproses.",
-        "success",
-    )
-    return redirect(
-        url_for(
-            "main.stok_opname",
-            import_status="success",
-            import_rows=summary["rows"],
-        )
-    )
-
-
-@bp.route("/stok-opname/template")
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def stok_opname_template():
-    fmt = (request.args.get("format") or "xlsx").strip().lower()
-    template_columns = [
-        "Kode Produk",
-        "SKU",
-        "Nama Produk",
-        "Qty Fisik",
-        "HPP",
-        "Catatan",
-    ]
-    df = pd.DataFrame(columns=template_columns)
-
-    if fmt == "csv":
-        output = StringIO()
-        df.to_csv(output, index=False)
-        response = make_response(output.getvalue().encode("utf-8-sig"))
-        response.headers["Content-Type"] = "text/csv; charset=utf-8"
-        response.headers["Content-Disposition"] = (
-            "attachment; filename=template_stok_opname.csv"
-        )
-        return response
-
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        df.to_excel(writer, index=False)
-    output.seek(0)
-    response = make_response(output.read())
-    response.headers["Content-Disposition"] = (
-        "attachment; filename=template_stok_opname.xlsx"
-    )
-    response.headers["Content-Type"] = (
-        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
-    return response
-
-
-@bp.route("/stok-opname/export")
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def export_stok_opname():
-    fmt = (request.args.get("format") or "xlsx").strip().lower()
-    products = Produk.query.order_by(Produk.nama_produk.asc()).all()
-    data = [
-        {
-            "Kode Produk": product.kode_produk,
-            "SKU": product.sku or "",
-            "Nama Produk": product.nama_produk,
-            "Qty Fisik": int(product.stok_lama or 0),
-            "HPP": _product_cost_basis(product),
-            "Catatan": "",
-        }
-        for product in products
-    ]
-    df = pd.DataFrame(data)
-
-    if fmt == "csv":
-        output = StringIO()
-        df.to_csv(output, index=False)
-        response = make_response(output.getvalue().encode("utf-8-sig"))
-        response.headers["Content-Type"] = "text/csv; charset=utf-8"
-        response.headers["Content-Disposition"] = (
-            "attachment; filename=stok_opname_export.csv"
-        )
-        return response
-
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        df.to_excel(writer, index=False)
-    output.seek(0)
-    response = make_response(output.read())
-    response.headers["Content-Disposition"] = (
-        "attachment; filename=stok_opname_export.xlsx"
-    )
-    response.headers["Content-Type"] = (
-        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
-    return response
-
-
-@bp.route("/laporan/stok-opname")
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def laporan_stok_opname():
-    start_date = _parse_date_param(request.args.get("start_date"))
-    end_date = _parse_date_param(request.args.get("end_date"))
-    today = local_today()
-    if not start_date or not end_date:
-        end_date = today
-        start_date = today.replace(day=1)
-    if end_date < start_date:
-        start_date, end_date = end_date, start_date
-
-    try:
-        _ensure_table(StockOpnameSession)
-        _ensure_table(StockOpnameItem)
-        opname_ready = True
-    except Exception:
-        opname_ready = False
-
-    sessions = []
-    if opname_ready:
-        sessions = (
-            StockOpnameSession.query.options(
-                joinedload(StockOpnameSession.items).joinedload(
-                    StockOpnameItem.product
-                ),
-                joinedload(StockOpnameSession.user),
-            )
-            .filter(
-                StockOpnameSession.created_at
-                >= datetime.combine(start_date, datetime.min.time())
-            )
-            .filter(
-                StockOpnameSession.created_at
-                <= datetime.combine(end_date, datetime.max.time())
-            )
-            .order_by(StockOpnameSession.created_at.desc())
-            .all()
-        )
-
-    totals = {
-        "sessions": len(sessions),
-        "items": 0,
-        "over": 0,
-        "short": 0,
-    }
-    daily_map = defaultdict(lambda: {"count": 0, "over": 0, "short": 0})
-    product_variances = defaultdict(lambda: {"name": "", "diff": 0})
-
-    for session in sessions:
-        session_date = session.created_at.date() if session.created_at else today
-        diff = sum(item.difference_qty for item in session.items)
-        totals["items"] += len(session.items)
-        for item in session.items:
-            difference = item.difference_qty or 0
-            if difference > 0:
-                totals["over"] += difference
-                daily_map[session_date]["over"] += difference
-            elif difference < 0:
-                totals["short"] += difference
-                daily_map[session_date]["short"] += difference
-            product = item.product
-            key = item.product_id
-            if key not in product_variances and product:
-                product_variances[key]["name"] = product.nama_produk
-            product_variances[key]["diff"] += difference
-        daily_map[session_date]["count"] += 1
-
-    daily_points = [
-        {
-            "date": date.isoformat(),
-            "label": _format_date_id(date),
-            "sessions": values["count"],
-            "over": values["over"],
-            "short": values["short"],
-        }
-        for date, values in sorted(daily_map.items())
-    ]
-
-    top_variances = sorted(
-        product_variances.values(), key=lambda entry: abs(entry["diff"]), reverse=True
-    )[:5]
-
-    summary_cards = [
-        {
-            "label": "Total Sesi",
-            "value": totals["sessions"],
-            "icon": "fa-clipboard-check",
-            "accent": "text-primary",
-            "subtitle": "Rentang dipilih",
-        },
-        {
-            "label": "Item Dihitung",
-            "value": totals["items"],
-            "icon": "fa-boxes",
-            "accent": "text-success",
-            "subtitle": "Total baris opname",
-        },
-        {
-            "label": "Selisih +",
-            "value": totals["over"],
-            "icon": "fa-plus-circle",
-            "accent": "text-info",
-            "subtitle": "Penambahan stok",
-        },
-        {
-            "label": "Selisih -",
-            "value": totals["short"],
-            "icon": "fa-minus-circle",
-            "accent": "text-danger",
-            "subtitle": "Pengurangan stok",
-        },
-    ]
-
-    recent_sessions = []
-    for session in sessions[:5]:
-        diff_total = 0
-        plus_total = 0
-        minus_total = 0
-        for item in session.items:
-            difference = item.difference_qty or 0
-            diff_total += difference
-            if difference > 0:
-                plus_total += difference
-            elif difference < 0:
-                minus_total += abs(difference)
-        recent_sessions.append(
-            {
-                "reference": session.reference,
-                "date": (
-                    _format_date_id(session.created_at.date())
-                    if session.created_at
-                    else "-"
-                ),
-                "user": session.user.username if session.user else "System",
-                "location": session.location or "-",
-                "items": len(session.items),
-                "diff": diff_total,
-                "plus": plus_total,
-                "minus": minus_total,
-            }
-        )
-
-    range_label = f"{_format_date_id(start_date)} - {_format_date_id(end_date)}"
-    filter_values = {
-        "start_date": start_date.strftime("%Y-%m-%d"),
-        "end_date": end_date.strftime("%Y-%m-%d"),
-    }
-
-    return render_template(
-        "laporan_stok_opname.html",
-        summary_cards=summary_cards,
-        daily_points=daily_points,
-        top_variances=top_variances,
-        recent_sessions=recent_sessions,
-        totals=totals,
-        range_label=range_label,
-        filter_values=filter_values,
-        opname_ready=opname_ready,
-    )
-
-
-@bp.route("/laporan/stok-barang")
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def laporan_stok_barang():
-    search_query = (request.args.get("search") or "").strip()
-    kategori_filter = request.args.get("kategori")
-    supplier_filter = request.args.get("supplier")
-
-    filtered_query = Produk.query
-    if search_query:
-        like = f"%{search_query}%"
-        filtered_query = filtered_query.filter(
-            or_(
-                Produk.nama_produk.ilike(like),
-                Produk.kode_produk.ilike(like),
-                Produk.sku.ilike(like),
-            )
-        )
-    if kategori_filter:
-        filtered_query = filtered_query.filter(Produk.kategori_id == kategori_filter)
-    if supplier_filter:
-        filtered_query = filtered_query.filter(Produk.supplier_id == supplier_filter)
-
-    query = filtered_query.options(
-        joinedload(Produk.kategori),
-        joinedload(Produk.supplier),
-        joinedload(Produk.satuan),
-    )
-
-    page = request.args.get("page", 1, type=int)
-    per_page = request.args.get("per_page", 15, type=int)
-    per_page = max(5, min(per_page, 100))
-
-    base_query = query.order_by(Produk.nama_produk.asc())
-    pagination = base_query.paginate(page=page, per_page=per_page, error_out=False)
-    products = pagination.items
-    total_products = pagination.total
-    aggregate = (
-        filtered_query.with_entities(
-            func.coalesce(func.sum(Produk.stok_lama), 0).label("total_stock"),
-            func.coalesce(
-                func.sum(
-                    Produk.stok_lama
-                    * func.coalesce(
-                        Produk.harga_lama, Produk.harga_beli, Produk.harga, 0.0
-                    )
-                ),
-                0.0,
-            ).label("total_value"),
-            func.coalesce(
-                func.sum(
-                    Produk.stok_lama * func.coalesce(Produk.harga, 0.0)
-                ),
-                0.0,
-            ).label("total_sell_value"),
-        ).first()
-    )
-    total_stock = int(aggregate.total_stock or 0) if aggregate else 0
-    total_value = float(aggregate.total_value or 0.0) if aggregate else 0.0
-    total_sell_value = (
-        float(aggregate.total_sell_value or 0.0) if aggregate else 0.0
-    )
-
-    low_stock_items = []
-    category_map = defaultdict(lambda: {"label": "Tanpa kategori", "stock": 0})
-
-    product_rows = []
-    for product in products:
-        stock = int(product.stok_lama or 0)
-        cost = _product_cost_basis(product)
-        price = float(product.harga or 0.0)
-        minimal = int(product.stok_minimal or 0)
-        low_stock = minimal > 0 and stock <= minimal
-        if low_stock:
-            low_stock_items.append(
-                {
-                    "name": product.nama_produk,
-                    "code": product.kode_produk,
-                    "stock": stock,
-                    "minimal": minimal,
-                    "supplier": (
-                        product.supplier.name if product.supplier else "Tanpa supplier"
-                    ),
-                }
-            )
-        category_name = product.kategori.name if product.kategori else "Tanpa kategori"
-        category_entry = category_map[category_name]
-        category_entry["label"] = category_name
-        category_entry["stock"] += stock
-
-        product_rows.append(
-            {
-                "id": product.id,
-                "name": product.nama_produk,
-                "code": product.kode_produk,
-                "sku": product.sku or "-",
-                "kategori": category_name,
-                "supplier": (
-                    product.supplier.name if product.supplier else "Tanpa supplier"
-                ),
-                "stock": stock,
-                "minimal": minimal,
-                "cost": cost,
-                "price": price,
-                "value": stock * cost,
-                "unit_value": stock * cost / stock if stock else cost,
-            }
-        )
-
-    low_stock_items = sorted(low_stock_items, key=lambda item: item["stock"])[:5]
-    category_distribution = sorted(
-        category_map.values(), key=lambda entry: entry["stock"], reverse=True
-    )
-
-    summary_cards = [
-        {
-            "label": "Produk Ditampilkan",
-            "value": total_products,
-            "icon": "fa-box-open",
-            "accent": "text-primary",
-            "subtitle": f"Halaman {pagination.page} dari {pagination.pages}" if pagination.pages else "Sesuai filter",
-        },
-        {
-            "label": "Total Stok (pcs)",
-            "value": total_stock,
-            "icon": "fa-layer-group",
-            "accent": "text-success",
-            "subtitle": "Jumlah unit fisik",
-        },
-        {
-            "label": "Nilai HPP",
-            "value": total_value,
-            "icon": "fa-coins",
-            "accent": "text-warning",
-            "subtitle": "Stok × biaya",
-        },
-        {
-            "label": "Nilai Jual",
-            "value": total_sell_value,
-            "icon": "fa-wallet",
-            "accent": "text-info",
-            "subtitle": "Potensi revenue",
-        },
-    ]
-
-    filter_values = {
-        "search": search_query,
-        "kategori": kategori_filter or "",
-        "supplier": supplier_filter or "",
-    }
-
-    kategori_options = Kategori.query.order_by(Kategori.name.asc()).all()
-    supplier_options = Supplier.query.order_by(Supplier.name.asc()).all()
-
-    return render_template(
-        "laporan_stok_barang.html",
-        summary_cards=summary_cards,
-        products=product_rows,
-        low_stock_items=low_stock_items,
-        category_distribution=category_distribution,
-        filter_values=filter_values,
-        kategori_options=kategori_options,
-        supplier_options=supplier_options,
-        pagination=pagination,
-        page=page,
-        per_page=per_page,
-        pagination_args={k: v for k, v in request.args.to_dict().items() if k != "page"},
-    )
-
-
-@bp.route("/laporan/shift")
-@login_required
-@roles_required(*ADMIN_ONLY)
-def laporan_shift():
-    today = local_today()
-    default_start = today.replace(day=1)
-    start_date = _parse_date_param(request.args.get("start_date")) or default_start
-    end_date = _parse_date_param(request.args.get("end_date")) or today
-    if end_date < start_date:
-        start_date, end_date = end_date, start_date
-
-    user_id = _parse_int_param(request.args.get("user"))
-    status = (request.args.get("status") or "all").strip().lower()
-    if status not in {"all", "open", "closed", "auto"}:
-        status = "all"
-
-    filters = [
-        CashierShift.shift_date >= start_date,
-        CashierShift.shift_date <= end_date,
-    ]
-    if user_id:
-        filters.append(CashierShift.user_id == user_id)
-    if status == "open":
-        filters.append(CashierShift.closed_at.is_(None))
-    elif status == "closed":
-        filters.append(CashierShift.closed_at.isnot(None))
-        filters.append(CashierShift.forced_close.is_(False))
-    elif status == "auto":
-        filters.append(CashierShift.closed_at.isnot(None))
-        filters.append(CashierShift.forced_close.is_(True))
-
-    shifts = (
-        CashierShift.query.options(
-            joinedload(CashierShift.user),
-            joinedload(CashierShift.closed_by_user),
-        )
-        .filter(*filters)
-        .order_by(CashierShift.opened_at.desc())
-        .all()
-    )
-
-    def format_minutes(total_minutes):
-        total_minutes = max(int(total_minutes), 0)
-        hours = total_minutes // 60
-        minutes = total_minutes % 60
-        if hours and minutes:
-            return f"{hours}j {minutes}m"
-        if hours:
-            return f"{hours}j"
-        return f"{minutes}m"
-
-    def format_duration(start, end):
-        if not start or not end:
-            return "-"
-        total_minutes = int((end - start).total_seconds() / 60)
-        return format_minutes(total_minutes)
-
-    total_shifts = len(shifts)
-    open_count = sum(1 for shift in shifts if shift.closed_at is None)
-    auto_count = sum(1 for shift in shifts if shift.closed_at and shift.forced_close)
-    closed_count = total_shifts - open_count
-    manual_closed_count = max(closed_count - auto_count, 0)
-
-    duration_minutes = 0
-    closed_shift_count = 0
-    for shift in shifts:
-        if shift.opened_at and shift.closed_at:
-            duration_minutes += int(
-                (shift.closed_at - shift.opened_at).total_seconds() / 60
-            )
-            closed_shift_count += 1
-    avg_duration_label = (
-        format_minutes(duration_minutes / closed_shift_count)
-        if closed_shift_count
-        else "-"
-    )
-
-    net_expr = case(
-        (
-            Penjualan.total_harga
-            - func.coalesce(Penjualan.marketplace_cost_total, 0)
-            < 0,
-            0,
-        ),
-        else_=Penjualan.total_harga
-        - func.coalesce(Penjualan.marketplace_cost_total, 0),
-    )
-    sales_summary = (
-        db.session.query(
-            func.count(Penjualan.id),
-            func.coalesce(func.sum(Penjualan.total_harga), 0),
-            func.coalesce(func.sum(net_expr), 0),
-        )
-        .join(CashierShift, Penjualan.shift_id == CashierShift.id)
-        .filter(*filters)
-        .first()
-    )
-    total_sales_count = int(sales_summary[0] or 0) if sales_summary else 0
-    total_gross = float(sales_summary[1] or 0.0) if sales_summary else 0.0
-    total_net = float(sales_summary[2] or 0.0) if sales_summary else 0.0
-    total_items = (
-        db.session.query(func.coalesce(func.sum(DetailPenjualan.jumlah), 0))
-        .join(Penjualan, DetailPenjualan.penjualan_id == Penjualan.id)
-        .join(CashierShift, Penjualan.shift_id == CashierShift.id)
-        .filter(*filters)
-        .scalar()
-        or 0
-    )
-
-    shift_ids = [shift.id for shift in shifts]
-    sales_map = {}
-    if shift_ids:
-        sales_rows = (
-            db.session.query(
-                Penjualan.shift_id.label("shift_id"),
-                func.count(Penjualan.id).label("transactions"),
-                func.coalesce(func.sum(Penjualan.total_harga), 0).label("gross_total"),
-                func.coalesce(func.sum(net_expr), 0).label("net_total"),
-                func.coalesce(func.sum(DetailPenjualan.jumlah), 0).label("items"),
-            )
-            .outerjoin(
-                DetailPenjualan, DetailPenjualan.penjualan_id == Penjualan.id
-            )
-            .filter(Penjualan.shift_id.in_(shift_ids))
-            .group_by(Penjualan.shift_id)
-            .all()
-        )
-        for row in sales_rows:
-            sales_map[row.shift_id] = {
-                "transactions": int(row.transactions or 0),
-                "gross_total": float(row.gross_total or 0.0),
-                "net_total": float(row.net_total or 0.0),
-                "items": int(row.items or 0),
-            }
-
-    now = local_now()
-    shift_rows = []
-    user_summary = {}
-    for shift in shifts:
-        summary = sales_map.get(
-            shift.id,
-            {"transactions": 0, "gross_total": 0.0, "net_total": 0.0, "items": 0},
-        )
-        is_open = shift.closed_at is None
-        duration_label = format_duration(
-            shift.opened_at, shift.closed_at if shift.closed_at else now
-        )
-        if is_open:
-            status_label = "Aktif"
-            status_class = "badge-warning"
-        elif shift.forced_close:
-            status_label = "Auto-close"
-            status_class = "badge-danger"
-        else:
-            status_label = "Selesai"
-            status_class = "badge-success"
-
-        shift_rows.append(
-            {
-                "id": shift.id,
-                "user_id": shift.user_id,
-                "user_name": shift.user.username if shift.user else "-",
-                "shift_date": shift.shift_date,
-                "opened_at": shift.opened_at,
-                "closed_at": shift.closed_at,
-                "closed_by": shift.closed_by_user.username
-                if shift.closed_by_user
-                else "-",
-                "forced_close": shift.forced_close,
-                "note": shift.note or "-",
-                "duration": duration_label,
-                "is_open": is_open,
-                "status_label": status_label,
-                "status_class": status_class,
-                "transactions": summary["transactions"],
-                "gross_total": summary["gross_total"],
-                "net_total": summary["net_total"],
-                "items_count": summary["items"],
-            }
-        )
-
-        entry = user_summary.setdefault(
-            shift.user_id,
-            {
-                "user_id": shift.user_id,
-                "user_name": shift.user.username if shift.user else "-",
-                "shift_count": 0,
-                "open_count": 0,
-                "auto_count": 0,
-                "transactions": 0,
-                "net_total": 0.0,
-            },
-        )
-        entry["shift_count"] += 1
-        if is_open:
-            entry["open_count"] += 1
-        if shift.forced_close:
-            entry["auto_count"] += 1
-        entry["transactions"] += summary["transactions"]
-        entry["net_total"] += summary["net_total"]
-
-    user_summary_rows = sorted(
-        user_summary.values(),
-        key=lambda row: (row["net_total"], row["shift_count"]),
-        reverse=True,
-    )
-
-    daily_map = {}
-    for shift in shifts:
-        date_key = shift.shift_date or (
-            shift.opened_at.date() if shift.opened_at else None
-        )
-        if not date_key:
-            continue
-        entry = daily_map.setdefault(
-            date_key, {"shift_count": 0, "transactions": 0, "net_total": 0.0}
-        )
-        entry["shift_count"] += 1
-        summary = sales_map.get(
-            shift.id,
-            {"transactions": 0, "gross_total": 0.0, "net_total": 0.0, "items": 0},
-        )
-        entry["transactions"] += summary["transactions"]
-        entry["net_total"] += summary["net_total"]
-
-    daily_points = [
-        {
-            "label": _format_date_id(date_key),
-            "shift_count": data["shift_count"],
-            "transactions": data["transactions"],
-            "net_total": round(data["net_total"], 2),
-        }
-        for date_key, data in sorted(daily_map.items())
-    ]
-
-    summary_cards = [
-        {
-            "label": "Total Shift",
-            "value": total_shifts,
-            "icon": "fa-calendar-check",
-            "accent": "text-primary",
-            "subtitle": f"{manual_closed_count} selesai manual",
-            "type": "count",
-        },
-        {
-            "label": "Shift Aktif",
-            "value": open_count,
-            "icon": "fa-user-clock",
-            "accent": "text-warning",
-            "subtitle": f"{auto_count} auto-close",
-            "type": "count",
-        },
-        {
-            "label": "Total Transaksi",
-            "value": total_sales_count,
-            "icon": "fa-receipt",
-            "accent": "text-info",
-            "subtitle": f"{int(total_items)} item terjual",
-            "type": "count",
-        },
-        {
-            "label": "Revenue Kotor",
-            "value": total_gross,
-            "icon": "fa-coins",
-            "accent": "text-success",
-            "subtitle": "Akumulasi per shift",
-            "type": "currency",
-        },
-        {
-            "label": "Revenue Bersih",
-            "value": total_net,
-            "icon": "fa-chart-line",
-            "accent": "text-primary",
-            "subtitle": "Sudah dikurangi biaya MP",
-            "type": "currency",
-        },
-        {
-            "label": "Rata-rata Durasi",
-            "value": avg_duration_label,
-            "icon": "fa-stopwatch",
-            "accent": "text-secondary",
-            "subtitle": f"{closed_shift_count} shift selesai",
-            "type": "text",
-        },
-    ]
-
-    filter_values = {
-        "start_date": start_date.strftime("%Y-%m-%d"),
-        "end_date": end_date.strftime("%Y-%m-%d"),
-        "user": user_id or "",
-        "status": status,
-    }
-    range_label = f"{_format_date_id(start_date)} - {_format_date_id(end_date)}"
-    filter_active = (
-        start_date != default_start
-        or end_date != today
-        or user_id
-        or status != "all"
-    )
-
-    cashier_options = (
-        User.query.filter(User.role.in_(SALES_ROLES))
-        .order_by(User.username.asc())
-        .all()
-    )
-
-    return render_template(
-        "laporan_shift.html",
-        summary_cards=summary_cards,
-        shift_rows=shift_rows,
-        user_summary_rows=user_summary_rows,
-        cashier_options=cashier_options,
-        filter_values=filter_values,
-        filter_active=filter_active,
-        range_label=range_label,
-        total_shifts=total_shifts,
-        daily_points=daily_points,
-    )
-
-
-@bp.route("/laporan/shift/export")
-@login_required
-@roles_required(*ADMIN_ONLY)
-def laporan_shift_export():
-    today = local_today()
-    default_start = today.replace(day=1)
-    start_date = _parse_date_param(request.args.get("start_date")) or default_start
-    end_date = _parse_date_param(request.args.get("end_date")) or today
-    if end_date < start_date:
-        start_date, end_date = end_date, start_date
-
-    user_id = _parse_int_param(request.args.get("user"))
-    status = (request.args.get("status") or "all").strip().lower()
-    if status not in {"all", "open", "closed", "auto"}:
-        status = "all"
-
-    filters = [
-        CashierShift.shift_date >= start_date,
-        CashierShift.shift_date <= end_date,
-    ]
-    if user_id:
-        filters.append(CashierShift.user_id == user_id)
-    if status == "open":
-        filters.append(CashierShift.closed_at.is_(None))
-    elif status == "closed":
-        filters.append(CashierShift.closed_at.isnot(None))
-        filters.append(CashierShift.forced_close.is_(False))
-    elif status == "auto":
-        filters.append(CashierShift.closed_at.isnot(None))
-        filters.append(CashierShift.forced_close.is_(True))
-
-    shifts = (
-        CashierShift.query.options(
-            joinedload(CashierShift.user),
-            joinedload(CashierShift.closed_by_user),
-        )
-        .filter(*filters)
-        .order_by(CashierShift.opened_at.desc())
-        .all()
-    )
-
-    net_expr = case(
-        (
-            Penjualan.total_harga
-            - func.coalesce(Penjualan.marketplace_cost_total, 0)
-            < 0,
-            0,
-        ),
-        else_=Penjualan.total_harga
-        - func.coalesce(Penjualan.marketplace_cost_total, 0),
-    )
-    shift_ids = [shift.id for shift in shifts]
-    sales_map = {}
-    if shift_ids:
-        sales_rows = (
-            db.session.query(
-                Penjualan.shift_id.label("shift_id"),
-                func.count(Penjualan.id).label("transactions"),
-                func.coalesce(func.sum(net_expr), 0).label("net_total"),
-                func.coalesce(func.sum(DetailPenjualan.jumlah), 0).label("items"),
-            )
-            .outerjoin(
-                DetailPenjualan, DetailPenjualan.penjualan_id == Penjualan.id
-            )
-            .filter(Penjualan.shift_id.in_(shift_ids))
-            .group_by(Penjualan.shift_id)
-            .all()
-        )
-        for row in sales_rows:
-            sales_map[row.shift_id] = {
-                "transactions": int(row.transactions or 0),
-                "net_total": float(row.net_total or 0.0),
-                "items": int(row.items or 0),
-            }
-
-    def format_datetime(dt):
-        if not dt:
-            return ""
-        return dt.strftime("%Y-%m-%d %H:%M")
-
-    def format_date(value):
-        if not value:
-            return ""
-        return value.strftime("%Y-%m-%d")
-
-    output = StringIO()
-    writer = csv.writer(output)
-    writer.writerow(
-        [
-            "Shift ID",
-            "Tanggal Shift",
-            "Kasir",
-            "Mulai",
-            "Selesai",
-            "Durasi Menit",
-            "Status",
-            "Auto Close",
-            "Ditutup Oleh",
-            "Transaksi",
-            "Item",
-            "Revenue Bersih",
-            "Catatan",
-        ]
-    )
-
-    for shift in shifts:
-        summary = sales_map.get(
-            shift.id, {"transactions": 0, "net_total": 0.0, "items": 0}
-        )
-        if shift.closed_at and shift.opened_at:
-            duration_minutes = int(
-                (shift.closed_at - shift.opened_at).total_seconds() / 60
-            )
-        elif shift.opened_at:
-            duration_minutes = int(
-                (local_now() - shift.opened_at).total_seconds() / 60
-            )
-        else:
-            duration_minutes = 0
-
-        if shift.closed_at is None:
-            status_label = "Aktif"
-        elif shift.forced_close:
-            status_label = "Auto-close"
-        else:
-            status_label = "Selesai"
-
-        writer.writerow(
-            [
-                shift.id,
-                format_date(shift.shift_date),
-                shift.user.username if shift.user else "-",
-                format_datetime(shift.opened_at),
-                format_datetime(shift.closed_at),
-                max(duration_minutes, 0),
-                status_label,
-                "Ya" if shift.forced_close else "Tidak",
-                shift.closed_by_user.username if shift.closed_by_user else "-",
-                summary["transactions"],
-                summary["items"],
-                summary["net_total"],
-                shift.note or "",
-            ]
-        )
-
-    filename = f"laporan_shift_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}.csv"
-    output.seek(0)
-    return Response(
-        output.getvalue(),
-        mimetype="text/csv",
-        headers={"Content-Disposition": f"attachment; filename={filename}"},
-    )
-
-
-@bp.route("/pembelian/po")
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def pembelian_po_list():
-    _ensure_table(PurchaseOrder)
-    _ensure_table(PurchaseOrderItem)
-
-    status = (request.args.get("status") or "all").strip().lower()
-    supplier_id = _parse_int_param(request.args.get("supplier"))
-    search_query = (request.args.get("search") or "").strip()
-
-    filters = []
-    if status and status != "all":
-        filters.append(PurchaseOrder.status == status)
-    if supplier_id:
-        filters.append(PurchaseOrder.supplier_id == supplier_id)
-    if search_query:
-        like = f"%{search_query}%"
-        filters.append(PurchaseOrder.po_number.ilike(like))
-
-    query = PurchaseOrder.query.options(
-        joinedload(PurchaseOrder.supplier),
-        joinedload(PurchaseOrder.items),
-    )
-    if filters:
-        query = query.filter(*filters)
-    purchase_orders = query.order_by(PurchaseOrder.created_at.desc()).limit(200).all()
-
-    status_counts = dict(
-        db.session.query(PurchaseOrder.status, func.count(PurchaseOrder.id)).group_by(
-            PurchaseOrder.status
-        )
-    )
-    total_all = sum(status_counts.values())
-
-    supplier_options = Supplier.query.order_by(Supplier.name.asc()).all()
-    filter_values = {
-        "status": status,
-        "supplier": supplier_id or "",
-        "search": search_query,
-    }
-
-    return render_template(
-        "pembelian_po_list.html",
-        purchase_orders=purchase_orders,
-        status_counts=status_counts,
-        total_all=total_all,
-        supplier_options=supplier_options,
-        filter_values=filter_values,
-    )
-
-
-@bp.route("/pembelian/po/new", methods=["GET", "POST"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def pembelian_po_new():
-    _ensure_table(PurchaseOrder)
-    _ensure_table(PurchaseOrderItem)
-
-    supplier_options = Supplier.query.order_by(Supplier.name.asc()).all()
-    product_options = Produk.query.order_by(Produk.nama_produk.asc()).all()
-    product_payload = [
-        {
-            "id": product.id,
-            "name": product.nama_produk,
-            "code": product.kode_produk,
-            "sku": product.sku,
-            "price": float(product.harga or 0.0),
-            "stock": float(product.stok_lama or 0),
-        }
-        for product in product_options
-    ]
-    draft_number = _generate_po_number()
-
-    if request.method == "POST":
-        try:
-            supplier_id = _parse_int_param(request.form.get("supplier_id"))
-            expected_date = _parse_date_param(request.form.get("expected_date"))
-            note = (request.form.get("note") or "").strip()
-            tax_percent = _parse_float_param(request.form.get("tax_percent")) or 0.0
-            shipping_fee = _parse_float_param(request.form.get("shipping_fee")) or 0.0
-
-            if not supplier_id:
-                raise ValueError("Supplier wajib dipilih.")
-
-            product_ids = request.form.getlist("product_id[]")
-            qty_list = request.form.getlist("qty[]")
-            price_list = request.form.getlist("price[]")
-
-            items = []
-            subtotal = 0.0
-            for idx, raw_product_id in enumerate(product_ids):
-                product_id = _parse_int_param(raw_product_id)
-                if not product_id:
-                    continue
-                qty = _parse_float_param(qty_list[idx]) if idx < len(qty_list) else 0.0
-                price = _parse_float_param(price_list[idx]) if idx < len(price_list) else 0.0
-                if not qty or qty <= 0:
-                    continue
-                product = db.session.get(Produk, product_id)
-                if not product:
-                    continue
-                total_price = max(qty, 0.0) * max(price, 0.0)
-                subtotal += total_price
-                items.append(
-                    {
-                        "product": product,
-                        "qty": qty,
-                        "price": price,
-                        "total": total_price,
-                    }
-                )
-
-            if not items:
-                raise ValueError("Tambahkan minimal satu item untuk PO.")
-
-            tax_percent = min(max(tax_percent, 0.0), 100.0)
-            tax_total = subtotal * (tax_percent / 100.0)
-            shipping_fee = max(shipping_fee, 0.0)
-            grand_total = subtotal + tax_total + shipping_fee
-
-            po = PurchaseOrder(
-                po_number=_generate_po_number(),
-                supplier_id=supplier_id,
-                status="draft",
-                created_by=session.get("user_id"),
-                expected_date=expected_date,
-                note=note or None,
-                tax_percent=tax_percent,
-                subtotal_estimate=subtotal,
-                tax_total=tax_total,
-                shipping_fee=shipping_fee,
-                grand_total_estimate=grand_total,
-            )
-            db.session.add(po)
-            db.session.flush()
-
-            for item in items:
-                product = item["product"]
-                db.session.add(
-                    PurchaseOrderItem(
-                        purchase_order_id=po.id,
-                        product_id=product.id,
-                        product_code=product.kode_produk,
-                        product_name=product.nama_produk,
-                        sku=product.sku,
-                        qty=item["qty"],
-                        unit_price=item["price"],
-                        total_price=item["total"],
-                    )
-                )
-
-            db.session.commit()
-            flash("PO berhasil dibuat sebagai draft.", "success")
-            return redirect(url_for("main.pembelian_po_detail", po_id=po.id))
-        except ValueError as exc:
-            db.session.rollback()
-            flash(str(exc), "warning")
-        except Exception as exc:
-            db.session.rollback()
-            logging.exception("Gagal membuat PO")
-            flash(f"Gagal membuat PO: {str(exc)}", "danger")
-
-    return render_template(
-        "pembelian_po_form.html",
-        supplier_options=supplier_options,
-        product_options=product_options,
-        product_payload=product_payload,
-        draft_number=draft_number,
-    )
-
-
-@bp.route("/pembelian/po/<int:po_id>")
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def pembelian_po_detail(po_id):
-    _ensure_table(PurchaseOrder)
-    _ensure_table(PurchaseOrderItem)
-
-    po = (
-        PurchaseOrder.query.options(
-            joinedload(PurchaseOrder.supplier),
-            joinedload(PurchaseOrder.items),
-            joinedload(PurchaseOrder.creator),
-            joinedload(PurchaseOrder.approver),
-            joinedload(PurchaseOrder.sender),
-            joinedload(PurchaseOrder.receiver),
-        )
-        .filter(PurchaseOrder.id == po_id)
-        .first_or_404()
-    )
-    return render_template("pembelian_po_detail.html", po=po)
-
-
-@bp.route("/pembelian/po/<int:po_id>/edit", methods=["GET", "POST"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def pembelian_po_edit(po_id):
-    _ensure_table(PurchaseOrder)
-    _ensure_table(PurchaseOrderItem)
-
-    po = (
-        PurchaseOrder.query.options(
-            joinedload(PurchaseOrder.items),
-        )
-        .filter(PurchaseOrder.id == po_id)
-        .first_or_404()
-    )
-    if po.status != "draft":
-        flash("Hanya PO draft yang bisa diedit.", "warning")
-        return redirect(url_for("main.pembelian_po_detail", po_id=po.id))
-
-    supplier_options = Supplier.query.order_by(Supplier.name.asc()).all()
-    product_options = Produk.query.order_by(Produk.nama_produk.asc()).all()
-    product_payload = [
-        {
-            "id": product.id,
-            "name": product.nama_produk,
-            "code": product.kode_produk,
-            "sku": product.sku,
-            "price": float(product.harga or 0.0),
-            "stock": float(product.stok_lama or 0),
-        }
-        for product in product_options
-    ]
-
-    if request.method == "POST":
-        try:
-            supplier_id = _parse_int_param(request.form.get("supplier_id"))
-            expected_date = _parse_date_param(request.form.get("expected_date"))
-            note = (request.form.get("note") or "").strip()
-            tax_percent = _parse_float_param(request.form.get("tax_percent")) or 0.0
-            shipping_fee = _parse_float_param(request.form.get("shipping_fee")) or 0.0
-
-            if not supplier_id:
-                raise ValueError("Supplier wajib dipilih.")
-
-            product_ids = request.form.getlist("product_id[]")
-            qty_list = request.form.getlist("qty[]")
-            price_list = request.form.getlist("price[]")
-
-            items = []
-            subtotal = 0.0
-            for idx, raw_product_id in enumerate(product_ids):
-                product_id = _parse_int_param(raw_product_id)
-                if not product_id:
-                    continue
-                qty = _parse_float_param(qty_list[idx]) if idx < len(qty_list) else 0.0
-                price = _parse_float_param(price_list[idx]) if idx < len(price_list) else 0.0
-                if not qty or qty <= 0:
-                    continue
-                product = db.session.get(Produk, product_id)
-                if not product:
-                    continue
-                total_price = max(qty, 0.0) * max(price, 0.0)
-                subtotal += total_price
-                items.append(
-                    {
-                        "product": product,
-                        "qty": qty,
-                        "price": price,
-                        "total": total_price,
-                    }
-                )
-
-            if not items:
-                raise ValueError("Tambahkan minimal satu item untuk PO.")
-
-            tax_percent = min(max(tax_percent, 0.0), 100.0)
-            tax_total = subtotal * (tax_percent / 100.0)
-            shipping_fee = max(shipping_fee, 0.0)
-            grand_total = subtotal + tax_total + shipping_fee
-
-            po.supplier_id = supplier_id
-            po.expected_date = expected_date
-            po.note = note or None
-            po.tax_percent = tax_percent
-            po.subtotal_estimate = subtotal
-            po.tax_total = tax_total
-            po.shipping_fee = shipping_fee
-            po.grand_total_estimate = grand_total
-
-            po.items.clear()
-            db.session.flush()
-
-            for item in items:
-                product = item["product"]
-                db.session.add(
-                    PurchaseOrderItem(
-                        purchase_order_id=po.id,
-                        product_id=product.id,
-                        product_code=product.kode_produk,
-                        product_name=product.nama_produk,
-                        sku=product.sku,
-                        qty=item["qty"],
-                        unit_price=item["price"],
-                        total_price=item["total"],
-                    )
-                )
-
-            db.session.commit()
-            flash("Draft PO berhasil diperbarui.", "success")
-            return redirect(url_for("main.pembelian_po_detail", po_id=po.id))
-        except ValueError as exc:
-            db.session.rollback()
-            flash(str(exc), "warning")
-        except Exception as exc:
-            db.session.rollback()
-            logging.exception("Gagal memperbarui PO")
-            flash(f"Gagal memperbarui PO: {str(exc)}", "danger")
-
-    return render_template(
-        "pembelian_po_form.html",
-        supplier_options=supplier_options,
-        product_options=product_options,
-        product_payload=product_payload,
-        draft_number=po.po_number,
-        po=po,
-        is_edit=True,
-        form_action=url_for("main.pembelian_po_edit", po_id=po.id),
-    )
-
-
-@bp.route("/pembelian/po/<int:po_id>/print")
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def pembelian_po_print(po_id):
-    _ensure_table(PurchaseOrder)
-    _ensure_table(PurchaseOrderItem)
-
-    po = (
-        PurchaseOrder.query.options(
-            joinedload(PurchaseOrder.items),
-            joinedload(PurchaseOrder.supplier),
-        )
-        .filter(PurchaseOrder.id == po_id)
-        .first_or_404()
-    )
-
-    return render_template(
-        "pembelian_po_print.html",
-        po=po,
-        printed_at=local_now(),
-        company_profile=_get_company_profile(),
-    )
-
-
-@bp.route("/pembelian/po/<int:po_id>/export")
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def pembelian_po_export(po_id):
-    _ensure_table(PurchaseOrder)
-    _ensure_table(PurchaseOrderItem)
-
-    po = (
-        PurchaseOrder.query.options(
-            joinedload(PurchaseOrder.items),
-            joinedload(PurchaseOrder.supplier),
-        )
-        .filter(PurchaseOrder.id == po_id)
-        .first_or_404()
-    )
-
-    output = StringIO()
-    writer = csv.writer(output)
-    writer.writerow(
-        [
-            "PO Number",
-            "Status",
-            "Supplier",
-            "Tanggal",
-            "Estimasi Datang",
-            "Kode Produk",
-            "Nama Produk",
-            "Qty",
-            "Harga Estimasi",
-            "Total Estimasi",
-        ]
-    )
-
-    for item in po.items:
-        writer.writerow(
-            [
-                po.po_number,
-                po.status,
-                po.supplier.name if po.supplier else "-",
-                po.created_at.strftime("%Y-%m-%d") if po.created_at else "",
-                po.expected_date.strftime("%Y-%m-%d") if po.expected_date else "",
-                item.product_code or "",
-                item.product_name,
-                item.qty,
-                item.unit_price,
-                item.total_price,
-            ]
-        )
-
-    filename = f"po_{po.po_number}.csv"
-    output.seek(0)
-    return Response(
-        output.getvalue(),
-        mimetype="text/csv",
-        headers={"Content-Disposition": f"attachment; filename={filename}"},
-    )
-
-@bp.route("/pembelian/po/<int:po_id>/approve", methods=["POST"])
-@login_required
-@roles_required(*ADMIN_ONLY)
-def pembelian_po_approve(po_id):
-    _ensure_table(PurchaseOrder)
-    po = PurchaseOrder.query.get_or_404(po_id)
-    if po.status != "draft":
-        flash("PO tidak berada di status draft.", "warning")
-        return redirect(url_for("main.pembelian_po_detail", po_id=po.id))
-    po.status = "approved"
-    po.approved_at = local_now()
-    po.approved_by = session.get("user_id")
-    db.session.commit()
-    flash("PO disetujui.", "success")
-    return redirect(url_for("main.pembelian_po_detail", po_id=po.id))
-
-
-@bp.route("/pembelian/po/<int:po_id>/send", methods=["POST"])
-@login_required
-@roles_required(*ADMIN_ONLY)
-def pembelian_po_send(po_id):
-    _ensure_table(PurchaseOrder)
-    po = PurchaseOrder.query.get_or_404(po_id)
-    if po.status != "approved":
-        flash("PO harus disetujui sebelum dikirim.", "warning")
-        return redirect(url_for("main.pembelian_po_detail", po_id=po.id))
-    po.status = "sent"
-    po.sent_at = local_now()
-    po.sent_by = session.get("user_id")
-    db.session.commit()
-    flash("PO ditandai sebagai terkirim.", "success")
-    return redirect(url_for("main.pembelian_po_detail", po_id=po.id))
-
-
-@bp.route("/pembelian/po/<int:po_id>/receive", methods=["POST"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def pembelian_po_receive(po_id):
-    _ensure_table(PurchaseOrder)
-    po = PurchaseOrder.query.get_or_404(po_id)
-    if po.status != "sent":
-        flash("PO harus terkirim sebelum diterima.", "warning")
-        return redirect(url_for("main.pembelian_po_detail", po_id=po.id))
-    po.status = "received"
-    po.received_at = local_now()
-    po.received_by = session.get("user_id")
-    db.session.commit()
-    flash("PO ditandai sudah diterima.", "success")
-    return redirect(url_for("main.pembelian_po_detail", po_id=po.id))
-
-
-@bp.route("/pembelian/po/<int:po_id>/cancel", methods=["POST"])
-@login_required
-@roles_required(*ADMIN_ONLY)
-def pembelian_po_cancel(po_id):
-    _ensure_table(PurchaseOrder)
-    po = PurchaseOrder.query.get_or_404(po_id)
-    if po.status == "received":
-        flash("PO yang sudah diterima tidak bisa dibatalkan.", "warning")
-        return redirect(url_for("main.pembelian_po_detail", po_id=po.id))
-    po.status = "cancelled"
-    db.session.commit()
-    flash("PO dibatalkan.", "info")
-    return redirect(url_for("main.pembelian_po_detail", po_id=po.id))
-
-
-@bp.route("/api/laporan/stok-barang/suggest", methods=["GET"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def laporan_stok_barang_suggest():
-    term = (request.args.get("q") or "").strip()
-    if len(term) < 2:
-        return jsonify({"products": []})
-
-    kategori_filter = request.args.get("kategori")
-    supplier_filter = request.args.get("supplier")
-    like = f"%{term}%"
-
-    query = Produk.query.options(
-        joinedload(Produk.kategori),
-        joinedload(Produk.supplier),
-    ).filter(
-        or_(
-            Produk.nama_produk.ilike(like),
-            Produk.kode_produk.ilike(like),
-            Produk.sku.ilike(like),
-        )
-    )
-    if kategori_filter:
-        query = query.filter(Produk.kategori_id == kategori_filter)
-    if supplier_filter:
-        query = query.filter(Produk.supplier_id == supplier_filter)
-
-    rows = query.order_by(Produk.nama_produk.asc()).limit(10).all()
-    payload = []
-    for product in rows:
-        payload.append(
-            {
-                "id": product.id,
-                "code": product.kode_produk,
-                "name": product.nama_produk,
-                "sku": product.sku or "-",
-                "stock": int(product.stok_lama or 0),
-                "kategori": product.kategori.name if product.kategori else "Tanpa kategori",
-                "supplier": product.supplier.name if product.supplier else "Tanpa supplier",
-            }
-        )
-
-    return jsonify({"products": payload})
-
-
-@bp.route("/laporan/penjualan")
-@login_required
-@roles_required(*SALES_ROLES)
-def laporan_penjualan_report():
-    today = local_today()
-    default_start = today.replace(day=1)
-    start_date = _parse_date_param(request.args.get("start_date")) or default_start
-    end_date = _parse_date_param(request.args.get("end_date")) or today
-    if end_date < start_date:
-        start_date, end_date = end_date, start_date
-
-    search_query = (request.args.get("search") or "").strip()
-    selected_sales_id = request.args.get("sales")
-    selected_customer_id = request.args.get("customer")
-    try:
-        selected_sales_id = int(selected_sales_id) if selected_sales_id else None
-    except (TypeError, ValueError):
-        selected_sales_id = None
-    try:
-        selected_customer_id = int(selected_customer_id) if selected_customer_id else None
-    except (TypeError, ValueError):
-        selected_customer_id = None
-
-    sales_query = (
-        Penjualan.query.options(
-            joinedload(Penjualan.detail_penjualan).joinedload(DetailPenjualan.produk),
-            joinedload(Penjualan.pelanggan),
-            joinedload(Penjualan.sales),
-            joinedload(Penjualan.payment_channel),
-        )
-        .filter(Penjualan.tanggal_penjualan >= start_date)
-        .filter(Penjualan.tanggal_penjualan <= end_date)
-        .order_by(Penjualan.tanggal_penjualan.asc(), Penjualan.id.asc())
-    )
-
-    if selected_sales_id:
-        sales_query = sales_query.filter(Penjualan.sales_id == selected_sales_id)
-    if selected_customer_id:
-        sales_query = sales_query.filter(Penjualan.pelanggan_id == selected_customer_id)
-    if search_query:
-        like = f"%{search_query}%"
-        sales_query = (
-            sales_query.join(Penjualan.pelanggan)
-            .join(Penjualan.sales)
-            .filter(
-                or_(
-                    Penjualan.no_faktur.ilike(like),
-                    Pelanggan.nama.ilike(like),
-                    User.username.ilike(like),
-                )
-            )
-        )
-    sales_records = sales_query.all()
-
-    totals = {
-        "gross_revenue": 0.0,
-        "net_revenue": 0.0,
-        "discount": 0.0,
-        "tax": 0.0,
-        "cogs": 0.0,
-        "gross_profit": 0.0,
-        "net_profit": 0.0,
-        "marketplace_costs": 0.0,
-        "orders": len(sales_records),
-        "items": 0,
-    }
-    daily_map = defaultdict(lambda: {"revenue": 0.0, "gross": 0.0})
-    monthly_map = defaultdict(lambda: {"revenue": 0.0, "gross": 0.0, "orders": 0})
-    product_map = defaultdict(
-        lambda: {"name": "Produk dihapus", "units": 0, "revenue": 0.0, "gross": 0.0}
-    )
-    customer_map = defaultdict(
-        lambda: {"name": "Pelanggan umum", "orders": 0, "revenue": 0.0}
-    )
-    sales_map = defaultdict(
-        lambda: {"name": "Sales", "orders": 0, "revenue": 0.0}
-    )
-    largest_invoice = {"amount": 0.0, "customer": "Pelanggan umum", "date": "-"}
-    transaction_details = []
-
-    for sale in sales_records:
-        sale_date = sale.tanggal_penjualan or today
-        month_key = (sale_date.year, sale_date.month)
-        invoice_revenue = 0.0
-        invoice_gross = 0.0
-        invoice_total = 0.0
-        gross_subtotal_sum = 0.0
-        discount_sum = 0.0
-        tax_sum = 0.0
-        cost_sum = 0.0
-        item_rows = []
-
-        for detail in sale.detail_penjualan:
-            qty = detail.jumlah or 0
-            price = detail.harga_satuan or 0.0
-            discount_pct = detail.diskon or 0.0
-            tax_pct = detail.pajak or 0.0
-
-            base_total = price * qty
-            discount_value = base_total * (discount_pct / 100.0)
-            taxable = base_total - discount_value
-            tax_value = taxable * (tax_pct / 100.0)
-            line_total = taxable + tax_value
-
-            product_cost = 0.0
-            if detail.produk:
-                product_cost = (
-                    detail.produk.harga_lama
-                    or detail.produk.harga_beli
-                    or detail.produk.harga
-                    or 0.0
-                )
-            cost_value = product_cost * qty
-            gross_value = taxable - cost_value
-
-            totals["items"] += qty
-            totals["gross_revenue"] += taxable
-            totals["discount"] += discount_value
-            totals["tax"] += tax_value
-            totals["cogs"] += cost_value
-            totals["gross_profit"] += gross_value
-
-            invoice_revenue += taxable
-            invoice_gross += gross_value
-            invoice_total += line_total
-            gross_subtotal_sum += base_total
-            discount_sum += discount_value
-            tax_sum += tax_value
-            cost_sum += cost_value
-
-            item_rows.append(
-                {
-                    "product_id": detail.produk.id if detail.produk else None,
-                    "product_name": (
-                        detail.produk.nama_produk if detail.produk else detail.produk_id
-                    ),
-                    "sku": detail.produk.sku if detail.produk else "-",
-                    "qty": qty,
-                    "unit_price": price,
-                    "discount_percent": discount_pct,
-                    "discount_value": discount_value,
-                    "tax_percent": tax_pct,
-                    "tax_value": tax_value,
-                    "line_total": line_total,
-                    "cost_value": cost_value,
-                    "gross_value": gross_value,
-                }
-            )
-
-            product_key = detail.produk.id if detail.produk else f"detail-{detail.id}"
-            if detail.produk:
-                product_map[product_key]["name"] = detail.produk.nama_produk
-            product_map[product_key]["units"] += qty
-            product_map[product_key]["revenue"] += taxable
-            product_map[product_key]["gross"] += gross_value
-
-        cost_total = float(sale.marketplace_cost_total or 0.0)
-        net_invoice_revenue = max(invoice_revenue - cost_total, 0.0)
-        totals["marketplace_costs"] += cost_total
-        totals["net_revenue"] += net_invoice_revenue
-        daily_map[sale_date]["revenue"] += invoice_revenue
-        daily_map[sale_date]["gross"] += invoice_gross
-        monthly_map[month_key]["revenue"] += invoice_revenue
-        monthly_map[month_key]["gross"] += invoice_gross
-        monthly_map[month_key]["orders"] += 1
-
-        customer_key = sale.pelanggan_id or f"anon-{sale.id}"
-        customer_entry = customer_map[customer_key]
-        if sale.pelanggan:
-            customer_entry["name"] = sale.pelanggan.nama
-        customer_entry["orders"] += 1
-        customer_entry["revenue"] += net_invoice_revenue
-
-        sales_key = sale.sales_id or f"sales-{sale.id}"
-        sales_entry = sales_map[sales_key]
-        if sale.sales:
-            sales_entry["name"] = sale.sales.username
-        sales_entry["orders"] += 1
-        sales_entry["revenue"] += net_invoice_revenue
-
-        if invoice_total > largest_invoice["amount"]:
-            largest_invoice["amount"] = invoice_total
-            largest_invoice["customer"] = (
-                sale.pelanggan.nama if sale.pelanggan else "Pelanggan umum"
-            )
-            largest_invoice["date"] = _format_date_id(sale_date)
-
-        net_subtotal = gross_subtotal_sum - discount_sum
-        staff_name = sale.sales.username if sale.sales else "Sales"
-        customer_name = sale.pelanggan.nama if sale.pelanggan else "Umum"
-        customer_code = sale.pelanggan.pelanggan_id if sale.pelanggan else "-"
-        price_level_name = (
-            sale.pelanggan.price_level.name
-            if sale.pelanggan and sale.pelanggan.price_level
-            else "Harga standar"
-        )
-        payment_label = sale.payment_method or "Belum dicatat"
-        if sale.payment_method in {"Kartu", "Transfer", "QRIS"}:
-            if sale.payment_channel and sale.payment_channel.name:
-                payment_label = f"{sale.payment_method} - {sale.payment_channel.name}"
-        items_count = sum(item["qty"] for item in item_rows)
-        transaction_details.append(
-            {
-                "id": sale.id,
-                "invoice": sale.no_faktur,
-                "timestamp": _format_date_id(sale_date),
-                "staff": staff_name,
-                "customer": {"name": customer_name, "code": customer_code},
-                "items": item_rows,
-                "line_items": item_rows,
-                "items_count": items_count,
-                "subtotal_before_discount": gross_subtotal_sum,
-                "total_discount": discount_sum,
-                "net_subtotal": net_subtotal,
-                "tax_total": tax_sum,
-                "grand_total": net_subtotal + tax_sum,
-                "shipping_fee": 0.0,
-                "extra_fee": 0.0,
-                "payment_method": payment_label,
-                "price_level": price_level_name,
-                "note": "-",
-                "status": "Selesai",
-                "cost_total": cost_sum,
-                "marketplace_cost_total": cost_total,
-                "gross_profit": net_subtotal - cost_sum,
-                "net_profit": net_invoice_revenue - cost_sum,
-                "net_revenue": net_invoice_revenue,
-                "print_link": url_for("main.penjualan_receipt", sale_id=sale.id),
-            }
-        )
-
-    totals["net_profit"] = totals["gross_profit"] - totals["marketplace_costs"]
-    average_order = (
-        totals["net_revenue"] / totals["orders"] if totals["orders"] else 0.0
-    )
-    gross_margin_percent = (
-        (totals["gross_profit"] / totals["gross_revenue"]) * 100
-        if totals["gross_revenue"]
-        else 0.0
-    )
-    net_margin_percent = (
-        (totals["net_profit"] / totals["net_revenue"]) * 100
-        if totals["net_revenue"]
-        else 0.0
-    )
-
-    daily_points = [
-        {
-            "date": date_key.isoformat(),
-            "label": _format_date_id(date_key),
-            "revenue": round(values["revenue"], 2),
-            "gross": round(values["gross"], 2),
-        }
-        for date_key, values in sorted(daily_map.items())
-    ]
-
-    monthly_breakdown = [
-        {
-            "label": datetime(year=year, month=month, day=1).strftime("%b %Y"),
-            "revenue": values["revenue"],
-            "gross": values["gross"],
-            "orders": values["orders"],
-            "avg_order": (
-                (values["revenue"] / values["orders"]) if values["orders"] else 0.0
-            ),
-        }
-        for (year, month), values in sorted(monthly_map.items())
-    ]
-
-    top_products = sorted(
-        product_map.values(), key=lambda entry: entry["revenue"], reverse=True
-    )[:5]
-    top_customers = sorted(
-        customer_map.values(), key=lambda entry: entry["revenue"], reverse=True
-    )[:5]
-    sales_breakdown = [
-        entry for entry in sales_map.values() if entry["revenue"]
-    ]
-    sales_breakdown = sorted(
-        sales_breakdown, key=lambda entry: entry["revenue"], reverse=True
-    )
-    customer_breakdown = [
-        entry for entry in customer_map.values() if entry["revenue"]
-    ]
-    customer_breakdown = sorted(
-        customer_breakdown, key=lambda entry: entry["revenue"], reverse=True
-    )
-
-    summary_cards = [
-        {
-            "label": "Pendapatan Kotor",
-            "value": totals["gross_revenue"],
-            "icon": "fa-coins",
-            "accent": "text-primary",
-            "subtitle": "Setelah diskon, sebelum biaya marketplace",
-        },
-        {
-            "label": "Pendapatan Bersih",
-            "value": totals["net_revenue"],
-            "icon": "fa-wallet",
-            "accent": "text-info",
-            "subtitle": "Setelah biaya marketplace",
-        },
-        {
-            "label": "Biaya Marketplace",
-            "value": totals["marketplace_costs"],
-            "icon": "fa-coins",
-            "accent": "text-danger",
-            "subtitle": "Komisi, cashback, bebas ongkir",
-        },
-        {
-            "label": "Laba Kotor",
-            "value": totals["gross_profit"],
-            "icon": "fa-chart-line",
-            "accent": "text-success",
-            "subtitle": f"Margin kotor {gross_margin_percent:.1f}%",
-        },
-        {
-            "label": "Laba Bersih",
-            "value": totals["net_profit"],
-            "icon": "fa-balance-scale",
-            "accent": "text-success",
-            "subtitle": f"Margin bersih {net_margin_percent:.1f}%",
-        },
-        {
-            "label": "Transaksi",
-            "value": totals["orders"],
-            "icon": "fa-receipt",
-            "accent": "text-info",
-            "subtitle": "Jumlah faktur",
-        },
-    ]
-
-    insight_cards = [
-        {
-            "title": "Rata-rata Order",
-            "value": average_order,
-            "type": "currency",
-            "description": "Nilai penjualan bersih per faktur.",
-        },
-        {
-            "title": "Barang Terjual",
-            "value": totals["items"],
-            "type": "count",
-            "description": "Total unit yang keluar.",
-        },
-        {
-            "title": "Diskon Diberikan",
-            "value": totals["discount"],
-            "type": "currency",
-            "description": "Potongan harga keseluruhan.",
-        },
-        {
-            "title": "Faktur terbesar",
-            "value": largest_invoice["amount"],
-            "type": "currency",
-            "description": f"{largest_invoice['customer']} • {largest_invoice['date']}",
-        },
-    ]
-
-    filter_values = {
-        "start_date": start_date.strftime("%Y-%m-%d"),
-        "end_date": end_date.strftime("%Y-%m-%d"),
-        "sales": selected_sales_id or "",
-        "customer": selected_customer_id or "",
-        "search": search_query,
-    }
-    range_label = f"{_format_date_id(start_date)} - {_format_date_id(end_date)}"
-
-    sales_options = (
-        User.query.filter(User.role.in_(SALES_ROLES)).order_by(User.username.asc()).all()
-    )
-    customer_options = Pelanggan.query.order_by(Pelanggan.nama.asc()).all()
-
-    return render_template(
-        "laporan_penjualan.html",
-        summary_cards=summary_cards,
-        insight_cards=insight_cards,
-        top_products=top_products,
-        top_customers=top_customers,
-        daily_points=daily_points,
-        monthly_breakdown=monthly_breakdown,
-        totals=totals,
-        average_order=average_order,
-        gross_margin_percent=gross_margin_percent,
-        net_margin_percent=net_margin_percent,
-        range_label=range_label,
-        filter_values=filter_values,
-        sales_options=sales_options,
-        customer_options=customer_options,
-        largest_invoice=largest_invoice,
-        transaction_details=transaction_details,
-        sales_breakdown=sales_breakdown,
-        customer_breakdown=customer_breakdown,
-    )
-
-
-@bp.route("/laporan/penjualan/print")
-@login_required
-@roles_required(*SALES_ROLES)
-def laporan_penjualan_print():
-    today = local_today()
-    default_start = today.replace(day=1)
-    start_date = _parse_date_param(request.args.get("start_date")) or default_start
-    end_date = _parse_date_param(request.args.get("end_date")) or today
-    if end_date < start_date:
-        start_date, end_date = end_date, start_date
-
-    search_query = (request.args.get("search") or "").strip()
-    selected_sales_id = _parse_int_param(request.args.get("sales"))
-    selected_customer_id = _parse_int_param(request.args.get("customer"))
-
-    sales_query = (
-        Penjualan.query.options(
-            joinedload(Penjualan.detail_penjualan).joinedload(DetailPenjualan.produk),
-            joinedload(Penjualan.pelanggan),
-            joinedload(Penjualan.sales),
-            joinedload(Penjualan.payment_channel),
-        )
-        .filter(Penjualan.tanggal_penjualan >= start_date)
-        .filter(Penjualan.tanggal_penjualan <= end_date)
-        .order_by(Penjualan.tanggal_penjualan.asc(), Penjualan.id.asc())
-    )
-
-    if selected_sales_id:
-        sales_query = sales_query.filter(Penjualan.sales_id == selected_sales_id)
-    if selected_customer_id:
-        sales_query = sales_query.filter(Penjualan.pelanggan_id == selected_customer_id)
-    if search_query:
-        like = f"%{search_query}%"
-        sales_query = (
-            sales_query.join(Penjualan.pelanggan)
-            .join(Penjualan.sales)
-            .filter(
-                or_(
-                    Penjualan.no_faktur.ilike(like),
-                    Pelanggan.nama.ilike(like),
-                    User.username.ilike(like),
-                )
-            )
-        )
-
-    sales_records = sales_query.all()
-    rows = []
-    total_revenue = 0.0
-    total_orders = 0
-    total_items = 0
-
-    for sale in sales_records:
-        sale_date = sale.tanggal_penjualan or today
-        invoice_total = 0.0
-        items_count = 0
-        for detail in sale.detail_penjualan:
-            qty = detail.jumlah or 0
-            price = detail.harga_satuan or 0.0
-            discount_pct = detail.diskon or 0.0
-            tax_pct = detail.pajak or 0.0
-
-            base_total = price * qty
-            discount_value = base_total * (discount_pct / 100.0)
-            taxable = base_total - discount_value
-            tax_value = taxable * (tax_pct / 100.0)
-            line_total = taxable + tax_value
-
-            invoice_total += line_total
-            items_count += qty
-
-        cost_total = float(sale.marketplace_cost_total or 0.0)
-        net_total = max(invoice_total - cost_total, 0.0)
-
-        total_revenue += net_total
-        total_orders += 1
-        total_items += items_count
-
-        payment_label = sale.payment_method or "Belum dicatat"
-        if sale.payment_method in {"Kartu", "Transfer", "QRIS"} and sale.payment_channel:
-            if sale.payment_channel.name:
-                payment_label = f"{sale.payment_method} - {sale.payment_channel.name}"
-        due_label = "-"
-        if sale.payment_method == "Tempo" and sale.due_date:
-            due_label = _format_date_id(sale.due_date)
-
-        rows.append(
-            {
-                "invoice": sale.no_faktur,
-                "date": _format_date_id(sale_date),
-                "customer": sale.pelanggan.nama if sale.pelanggan else "Umum",
-                "sales": sale.sales.username if sale.sales else "Sales",
-                "payment_method": payment_label,
-                "due_date": due_label,
-                "items_count": items_count,
-                "total": net_total,
-            }
-        )
-
-    sales_name = "-"
-    if selected_sales_id:
-        sales_user = db.session.get(User, selected_sales_id)
-        if sales_user:
-            sales_name = sales_user.username
-    customer_name = "-"
-    if selected_customer_id:
-        customer = db.session.get(Pelanggan, selected_customer_id)
-        if customer:
-            customer_name = customer.nama
-
-    return render_template(
-        "laporan_penjualan_print.html",
-        rows=rows,
-        range_label=f"{_format_date_id(start_date)} - {_format_date_id(end_date)}",
-        search_query=search_query,
-        sales_name=sales_name,
-        customer_name=customer_name,
-        total_revenue=total_revenue,
-        total_orders=total_orders,
-        total_items=total_items,
-        printed_at=local_now(),
-        company_profile=_get_company_profile(),
-    )
-
-
-@bp.route("/laporan/piutang")
-@login_required
-@roles_required(*SALES_ROLES)
-def laporan_piutang():
-    today = local_today()
-    search_query = (request.args.get("search") or "").strip()
-    pelanggan_id = _parse_int_param(request.args.get("pelanggan"))
-    sales_id = _parse_int_param(request.args.get("sales"))
-    status_filter = (request.args.get("status") or "").strip()
-    start_due = _parse_date_param(request.args.get("start_due"))
-    end_due = _parse_date_param(request.args.get("end_due"))
-    sort_option = request.args.get("sort", "due_asc")
-    per_page = request.args.get("per_page", type=int) or 10
-    per_page = max(5, min(per_page, 50))
-    page = request.args.get("page", type=int) or 1
-    if page < 1:
-        page = 1
-
-    base_filters = [Penjualan.payment_method == "Tempo"]
-    if search_query:
-        like = f"%{search_query}%"
-        base_filters.append(
-            or_(
-                Penjualan.no_faktur.ilike(like),
-                Penjualan.pelanggan.has(Pelanggan.nama.ilike(like)),
-                Penjualan.sales.has(User.username.ilike(like)),
-            )
-        )
-    if pelanggan_id:
-        base_filters.append(Penjualan.pelanggan_id == pelanggan_id)
-    if sales_id:
-        base_filters.append(Penjualan.sales_id == sales_id)
-    if start_due:
-        base_filters.append(Penjualan.due_date >= start_due)
-    if end_due:
-        base_filters.append(Penjualan.due_date <= end_due)
-
-    outstanding_expr = Penjualan.total_harga - func.coalesce(Penjualan.amount_paid, 0)
-    status_filters = []
-    if status_filter == "open":
-        status_filters.append(outstanding_expr > 0)
-    elif status_filter == "overdue":
-        status_filters.append(
-            and_(outstanding_expr > 0, Penjualan.due_date < today)
-        )
-    elif status_filter == "upcoming":
-        status_filters.append(
-            and_(outstanding_expr > 0, Penjualan.due_date >= today)
-        )
-    elif status_filter == "paid":
-        status_filters.append(outstanding_expr <= 0)
-    elif status_filter == "nodue":
-        status_filters.append(
-            and_(outstanding_expr > 0, Penjualan.due_date.is_(None))
-        )
-
-    list_filters = base_filters + status_filters
-
-    def apply_filters(query, filters):
-        return query.filter(*filters) if filters else query
-
-    total_records = (
-        apply_filters(db.session.query(func.count(Penjualan.id)), list_filters)
-        .scalar()
-        or 0
-    )
-    total_pages = max(1, (total_records + per_page - 1) // per_page)
-    if page > total_pages:
-        page = total_pages
-    offset = (page - 1) * per_page
-
-    sort_map = {
-        "due_asc": Penjualan.due_date.asc(),
-        "due_desc": Penjualan.due_date.desc(),
-        "total_desc": Penjualan.total_harga.desc(),
-        "total_asc": Penjualan.total_harga.asc(),
-        "outstanding_desc": outstanding_expr.desc(),
-        "outstanding_asc": outstanding_expr.asc(),
-    }
-    order_clause = sort_map.get(sort_option, Penjualan.due_date.asc())
-
-    base_query = apply_filters(
-        Penjualan.query.options(
-            joinedload(Penjualan.pelanggan),
-            joinedload(Penjualan.sales),
-            joinedload(Penjualan.payment_channel),
-        ),
-        list_filters,
-    )
-    records = (
-        base_query.order_by(order_clause, Penjualan.id.desc())
-        .offset(offset)
-        .limit(per_page)
-        .all()
-    )
-
-    summary_base = base_filters
-    total_outstanding = (
-        apply_filters(
-            db.session.query(func.coalesce(func.sum(outstanding_expr), 0)),
-            summary_base + [outstanding_expr > 0],
-        ).scalar()
-        or 0.0
-    )
-    open_count = (
-        apply_filters(
-            db.session.query(func.count(Penjualan.id)),
-            summary_base + [outstanding_expr > 0],
-        ).scalar()
-        or 0
-    )
-    overdue_count = (
-        apply_filters(
-            db.session.query(func.count(Penjualan.id)),
-            summary_base + [outstanding_expr > 0, Penjualan.due_date < today],
-        ).scalar()
-        or 0
-    )
-    due_soon_end = today + timedelta(days=7)
-    due_soon_count = (
-        apply_filters(
-            db.session.query(func.count(Penjualan.id)),
-            summary_base
-            + [
-                outstanding_expr > 0,
-                Penjualan.due_date >= today,
-                Penjualan.due_date <= due_soon_end,
-            ],
-        ).scalar()
-        or 0
-    )
-    no_due_count = (
-        apply_filters(
-            db.session.query(func.count(Penjualan.id)),
-            summary_base + [outstanding_expr > 0, Penjualan.due_date.is_(None)],
-        ).scalar()
-        or 0
-    )
-
-    aging_summary = {
-        "current": 0.0,
-        "1_30": 0.0,
-        "31_60": 0.0,
-        "61_90": 0.0,
-        "90_plus": 0.0,
-        "no_due": 0.0,
-    }
-    aging_rows = apply_filters(
-        db.session.query(Penjualan.due_date, outstanding_expr),
-        summary_base + [outstanding_expr > 0],
-    ).all()
-    for due_date, outstanding in aging_rows:
-        outstanding = float(outstanding or 0.0)
-        if outstanding <= 0:
-            continue
-        if not due_date:
-            aging_summary["no_due"] += outstanding
-            continue
-        if due_date >= today:
-            aging_summary["current"] += outstanding
-            continue
-        days_overdue = (today - due_date).days
-        if days_overdue <= 30:
-            aging_summary["1_30"] += outstanding
-        elif days_overdue <= 60:
-            aging_summary["31_60"] += outstanding
-        elif days_overdue <= 90:
-            aging_summary["61_90"] += outstanding
-        else:
-            aging_summary["90_plus"] += outstanding
-
-    receivable_rows = []
-    for sale in records:
-        total = float(sale.total_harga or 0.0)
-        amount_paid = float(sale.amount_paid or 0.0)
-        outstanding = max(total - amount_paid, 0.0)
-        due_date = sale.due_date
-        status_label = "Lunas"
-        status_badge = "badge-soft-success"
-        status_hint = ""
-        if outstanding > 0:
-            if due_date:
-                delta_days = (due_date - today).days
-                if delta_days < 0:
-                    status_label = "Jatuh tempo"
-                    status_badge = "badge-soft-danger"
-                    status_hint = f"Terlambat {abs(delta_days)} hari"
-                elif delta_days == 0:
-                    status_label = "Jatuh tempo"
-                    status_badge = "badge-soft-warning"
-                    status_hint = "Jatuh tempo hari ini"
-                else:
-                    status_label = "Belum jatuh tempo"
-                    status_badge = "badge-soft-warning"
-                    status_hint = f"H-{delta_days} hari"
-            else:
-                status_label = "Tanpa tanggal"
-                status_badge = "badge-soft-secondary"
-                status_hint = "Isi tanggal tempo"
-
-        customer_name = sale.pelanggan.nama if sale.pelanggan else "Umum"
-        customer_code = sale.pelanggan.pelanggan_id if sale.pelanggan else "-"
-        sales_name = sale.sales.username if sale.sales else "-"
-
-        receivable_rows.append(
-            {
-                "id": sale.id,
-                "invoice": sale.no_faktur,
-                "sale_date": sale.tanggal_penjualan,
-                "due_date": due_date,
-                "customer_name": customer_name,
-                "customer_code": customer_code,
-                "sales_name": sales_name,
-                "total": total,
-                "amount_paid": amount_paid,
-                "outstanding": outstanding,
-                "status_label": status_label,
-                "status_badge": status_badge,
-                "status_hint": status_hint,
-            }
-        )
-
-    filter_active = any(
-        [search_query, pelanggan_id, sales_id, start_due, end_due, status_filter]
-    )
-
-    def _date_value_to_str(value):
-        return value.strftime("%Y-%m-%d") if value else ""
-
-    filter_values = {
-        "search": search_query,
-        "pelanggan": pelanggan_id or "",
-        "sales": sales_id or "",
-        "start_due": _date_value_to_str(start_due),
-        "end_due": _date_value_to_str(end_due),
-        "status": status_filter,
-    }
-
-    summary_cards = [
-        {
-            "label": "Total piutang",
-            "value": total_outstanding,
-            "type": "currency",
-            "icon": "fa-wallet",
-            "accent": "text-danger",
-            "description": "Nilai tempo yang masih terbuka.",
-        },
-        {
-            "label": "Tempo terbuka",
-            "value": open_count,
-            "type": "count",
-            "icon": "fa-file-invoice-dollar",
-            "accent": "text-primary",
-            "description": "Jumlah faktur yang belum lunas.",
-        },
-        {
-            "label": "Jatuh tempo",
-            "value": overdue_count,
-            "type": "count",
-            "icon": "fa-exclamation-triangle",
-            "accent": "text-danger",
-            "description": "Faktur melewati tanggal jatuh tempo.",
-        },
-        {
-            "label": "Tempo 7 hari",
-            "value": due_soon_count,
-            "type": "count",
-            "icon": "fa-hourglass-half",
-            "accent": "text-warning",
-            "description": "Jatuh tempo dalam 7 hari ke depan.",
-        },
-    ]
-    aging_cards = [
-        {
-            "label": "Belum jatuh tempo",
-            "value": aging_summary["current"],
-            "accent": "text-info",
-        },
-        {
-            "label": "1-30 hari",
-            "value": aging_summary["1_30"],
-            "accent": "text-warning",
-        },
-        {
-            "label": "31-60 hari",
-            "value": aging_summary["31_60"],
-            "accent": "text-warning",
-        },
-        {
-            "label": "61-90 hari",
-            "value": aging_summary["61_90"],
-            "accent": "text-danger",
-        },
-        {
-            "label": ">90 hari",
-            "value": aging_summary["90_plus"],
-            "accent": "text-danger",
-        },
-        {
-            "label": "Tanpa tanggal",
-            "value": aging_summary["no_due"],
-            "accent": "text-secondary",
-        },
-    ]
-
-    sales_options = (
-        User.query.filter(User.role.in_(SALES_ROLES)).order_by(User.username.asc()).all()
-    )
-    customer_options = Pelanggan.query.order_by(Pelanggan.nama.asc()).all()
-
-    query_args = request.args.to_dict(flat=True)
-    query_args.pop("page", None)
-    base_args = query_args.copy()
-    prev_url = (
-        url_for("main.laporan_piutang", page=page - 1, **base_args)
-        if page > 1
-        else None
-    )
-    next_url = (
-        url_for("main.laporan_piutang", page=page + 1, **base_args)
-        if page < total_pages
-        else None
-    )
-    page_window_start = max(1, page - 2)
-    page_window_end = min(total_pages, page + 2)
-    page_links = [
-        {
-            "number": number,
-            "url": url_for("main.laporan_piutang", page=number, **base_args),
-            "current": number == page,
-        }
-        for number in range(page_window_start, page_window_end + 1)
-    ]
-    pagination = {
-        "page": page,
-        "per_page": per_page,
-        "total_pages": total_pages,
-        "total_records": total_records,
-        "has_prev": page > 1,
-        "has_next": page < total_pages,
-        "prev_url": prev_url,
-        "next_url": next_url,
-        "page_links": page_links,
-    }
-
-    return render_template(
-        "laporan_piutang.html",
-        receivable_rows=receivable_rows,
-        summary_cards=summary_cards,
-        aging_cards=aging_cards,
-        filter_values=filter_values,
-        sort_option=sort_option,
-        per_page=per_page,
-        pagination=pagination,
-        filter_active=filter_active,
-        sales_options=sales_options,
-        customer_options=customer_options,
-        no_due_count=no_due_count,
-        total_outstanding=total_outstanding,
-        overdue_count=overdue_count,
-        format_date=_format_date_id,
-    )
-
-
-@bp.route("/laporan/utang")
-@login_required
-@roles_required(*ADMIN_ONLY)
-def laporan_utang():
-    _ensure_table(PayablePayment)
-    today = local_today()
-    search_query = (request.args.get("search") or "").strip()
-    supplier_id = _parse_int_param(request.args.get("supplier"))
-    status_filter = (request.args.get("status") or "").strip()
-    start_due = _parse_date_param(request.args.get("start_due"))
-    end_due = _parse_date_param(request.args.get("end_due"))
-    sort_option = request.args.get("sort", "due_asc")
-    per_page = request.args.get("per_page", type=int) or 10
-    per_page = max(5, min(per_page, 50))
-    page = request.args.get("page", type=int) or 1
-    if page < 1:
-        page = 1
-
-    total_sub = _purchase_total_subquery()
-    paid_sub = _payable_payment_sum_subquery()
-    total_expr = func.coalesce(total_sub.c.total_amount, 0)
-    paid_expr = func.coalesce(paid_sub.c.amount_paid, 0)
-    outstanding_expr = total_expr - paid_expr
-
-    base_filters = [Pembelian.jenis_pembayaran == "Tempo"]
-    if search_query:
-        like = f"%{search_query}%"
-        base_filters.append(
-            or_(
-                Pembelian.no_faktur.ilike(like),
-                Pembelian.supplier.has(Supplier.name.ilike(like)),
-            )
-        )
-    if supplier_id:
-        base_filters.append(Pembelian.supplier_id == supplier_id)
-    if start_due:
-        base_filters.append(Pembelian.due_date >= start_due)
-    if end_due:
-        base_filters.append(Pembelian.due_date <= end_due)
-
-    status_filters = []
-    if status_filter == "open":
-        status_filters.append(outstanding_expr > 0)
-    elif status_filter == "overdue":
-        status_filters.append(
-            and_(outstanding_expr > 0, Pembelian.due_date < today)
-        )
-    elif status_filter == "upcoming":
-        status_filters.append(
-            and_(outstanding_expr > 0, Pembelian.due_date >= today)
-        )
-    elif status_filter == "paid":
-        status_filters.append(outstanding_expr <= 0)
-    elif status_filter == "nodue":
-        status_filters.append(
-            and_(outstanding_expr > 0, Pembelian.due_date.is_(None))
-        )
-
-    list_filters = base_filters + status_filters
-
-    def apply_filters(query, filters):
-        return query.filter(*filters) if filters else query
-
-    base_query = (
-        Pembelian.query.options(joinedload(Pembelian.supplier))
-        .outerjoin(total_sub, total_sub.c.pembelian_id == Pembelian.id)
-        .outerjoin(paid_sub, paid_sub.c.pembelian_id == Pembelian.id)
-    )
-    list_query = apply_filters(base_query, list_filters)
-
-    total_records = (
-        list_query.with_entities(func.count(Pembelian.id)).scalar() or 0
-    )
-    total_pages = max(1, (total_records + per_page - 1) // per_page)
-    if page > total_pages:
-        page = total_pages
-    offset = (page - 1) * per_page
-
-    sort_map = {
-        "due_asc": Pembelian.due_date.asc(),
-        "due_desc": Pembelian.due_date.desc(),
-        "total_desc": total_expr.desc(),
-        "total_asc": total_expr.asc(),
-        "outstanding_desc": outstanding_expr.desc(),
-        "outstanding_asc": outstanding_expr.asc(),
-    }
-    order_clause = sort_map.get(sort_option, Pembelian.due_date.asc())
-
-    records = (
-        list_query.add_columns(
-            total_expr.label("total_amount"),
-            paid_expr.label("amount_paid"),
-        )
-        .order_by(order_clause, Pembelian.id.desc())
-        .offset(offset)
-        .limit(per_page)
-        .all()
-    )
-
-    summary_query = apply_filters(base_query, base_filters)
-    total_outstanding = (
-        summary_query.with_entities(func.coalesce(func.sum(outstanding_expr), 0))
-        .filter(outstanding_expr > 0)
-        .scalar()
-        or 0.0
-    )
-    open_count = (
-        summary_query.with_entities(func.count(Pembelian.id))
-        .filter(outstanding_expr > 0)
-        .scalar()
-        or 0
-    )
-    overdue_count = (
-        summary_query.with_entities(func.count(Pembelian.id))
-        .filter(outstanding_expr > 0, Pembelian.due_date < today)
-        .scalar()
-        or 0
-    )
-    due_soon_end = today + timedelta(days=7)
-    due_soon_count = (
-        summary_query.with_entities(func.count(Pembelian.id))
-        .filter(
-            outstanding_expr > 0,
-            Pembelian.due_date >= today,
-            Pembelian.due_date <= due_soon_end,
-        )
-        .scalar()
-        or 0
-    )
-    no_due_count = (
-        summary_query.with_entities(func.count(Pembelian.id))
-        .filter(outstanding_expr > 0, Pembelian.due_date.is_(None))
-        .scalar()
-        or 0
-    )
-
-    aging_summary = {
-        "current": 0.0,
-        "1_30": 0.0,
-        "31_60": 0.0,
-        "61_90": 0.0,
-        "90_plus": 0.0,
-        "no_due": 0.0,
-    }
-    aging_rows = (
-        summary_query.with_entities(Pembelian.due_date, outstanding_expr)
-        .filter(outstanding_expr > 0)
-        .all()
-    )
-    for due_date, outstanding in aging_rows:
-        outstanding = float(outstanding or 0.0)
-        if outstanding <= 0:
-            continue
-        if not due_date:
-            aging_summary["no_due"] += outstanding
-            continue
-        if due_date >= today:
-            aging_summary["current"] += outstanding
-            continue
-        days_overdue = (today - due_date).days
-        if days_overdue <= 30:
-            aging_summary["1_30"] += outstanding
-        elif days_overdue <= 60:
-            aging_summary["31_60"] += outstanding
-        elif days_overdue <= 90:
-            aging_summary["61_90"] += outstanding
-        else:
-            aging_summary["90_plus"] += outstanding
-
-    payable_rows = []
-    for purchase, total_amount, amount_paid in records:
-        total_amount = float(total_amount or 0.0)
-        amount_paid = float(amount_paid or 0.0)
-        outstanding = max(total_amount - amount_paid, 0.0)
-        due_date = purchase.due_date
-        status_label = "Lunas"
-        status_badge = "badge-soft-success"
-        status_hint = ""
-        if outstanding > 0:
-            if due_date:
-                delta_days = (due_date - today).days
-                if delta_days < 0:
-                    status_label = "Jatuh tempo"
-                    status_badge = "badge-soft-danger"
-                    status_hint = f"Terlambat {abs(delta_days)} hari"
-                elif delta_days == 0:
-                    status_label = "Jatuh tempo"
-                    status_badge = "badge-soft-warning"
-                    status_hint = "Jatuh tempo hari ini"
-                else:
-                    status_label = "Belum jatuh tempo"
-                    status_badge = "badge-soft-warning"
-                    status_hint = f"H-{delta_days} hari"
-            else:
-                status_label = "Tanpa tanggal"
-                status_badge = "badge-soft-secondary"
-                status_hint = "Isi tanggal tempo"
-
-        supplier_name = purchase.supplier.name if purchase.supplier else "Tanpa supplier"
-        payable_rows.append(
-            {
-                "id": purchase.id,
-                "invoice": purchase.no_faktur,
-                "purchase_date": purchase.tanggal_faktur,
-                "due_date": due_date,
-                "supplier_name": supplier_name,
-                "total": total_amount,
-                "amount_paid": amount_paid,
-                "outstanding": outstanding,
-                "status_label": status_label,
-                "status_badge": status_badge,
-                "status_hint": status_hint,
-            }
-        )
-
-    filter_active = any(
-        [search_query, supplier_id, start_due, end_due, status_filter]
-    )
-
-    def _date_value_to_str(value):
-        return value.strftime("%Y-%m-%d") if value else ""
-
-    filter_values = {
-        "search": search_query,
-        "supplier": supplier_id or "",
-        "start_due": _date_value_to_str(start_due),
-        "end_due": _date_value_to_str(end_due),
-        "status": status_filter,
-    }
-
-    summary_cards = [
-        {
-            "label": "Total utang",
-            "value": total_outstanding,
-            "type": "currency",
-            "icon": "fa-wallet",
-            "accent": "text-danger",
-            "description": "Nilai tempo yang masih terbuka.",
-        },
-        {
-            "label": "Tempo terbuka",
-            "value": open_count,
-            "type": "count",
-            "icon": "fa-file-invoice-dollar",
-            "accent": "text-primary",
-            "description": "Jumlah faktur yang belum lunas.",
-        },
-        {
-            "label": "Jatuh tempo",
-            "value": overdue_count,
-            "type": "count",
-            "icon": "fa-exclamation-triangle",
-            "accent": "text-danger",
-            "description": "Faktur melewati tanggal jatuh tempo.",
-        },
-        {
-            "label": "Tempo 7 hari",
-            "value": due_soon_count,
-            "type": "count",
-            "icon": "fa-hourglass-half",
-            "accent": "text-warning",
-            "description": "Jatuh tempo dalam 7 hari ke depan.",
-        },
-    ]
-    aging_cards = [
-        {
-            "label": "Belum jatuh tempo",
-            "value": aging_summary["current"],
-            "accent": "text-info",
-        },
-        {
-            "label": "1-30 hari",
-            "value": aging_summary["1_30"],
-            "accent": "text-warning",
-        },
-        {
-            "label": "31-60 hari",
-            "value": aging_summary["31_60"],
-            "accent": "text-warning",
-        },
-        {
-            "label": "61-90 hari",
-            "value": aging_summary["61_90"],
-            "accent": "text-danger",
-        },
-        {
-            "label": ">90 hari",
-            "value": aging_summary["90_plus"],
-            "accent": "text-danger",
-        },
-        {
-            "label": "Tanpa tanggal",
-            "value": aging_summary["no_due"],
-            "accent": "text-secondary",
-        },
-    ]
-
-    supplier_options = Supplier.query.order_by(Supplier.name.asc()).all()
-
-    query_args = request.args.to_dict(flat=True)
-    query_args.pop("page", None)
-    base_args = query_args.copy()
-    prev_url = (
-        url_for("main.laporan_utang", page=page - 1, **base_args)
-        if page > 1
-        else None
-    )
-    next_url = (
-        url_for("main.laporan_utang", page=page + 1, **base_args)
-        if page < total_pages
-        else None
-    )
-    page_window_start = max(1, page - 2)
-    page_window_end = min(total_pages, page + 2)
-    page_links = [
-        {
-            "number": number,
-            "url": url_for("main.laporan_utang", page=number, **base_args),
-            "current": number == page,
-        }
-        for number in range(page_window_start, page_window_end + 1)
-    ]
-    pagination = {
-        "page": page,
-        "per_page": per_page,
-        "total_pages": total_pages,
-        "total_records": total_records,
-        "has_prev": page > 1,
-        "has_next": page < total_pages,
-        "prev_url": prev_url,
-        "next_url": next_url,
-        "page_links": page_links,
-    }
-
-    return render_template(
-        "laporan_utang.html",
-        payable_rows=payable_rows,
-        summary_cards=summary_cards,
-        aging_cards=aging_cards,
-        filter_values=filter_values,
-        sort_option=sort_option,
-        per_page=per_page,
-        pagination=pagination,
-        filter_active=filter_active,
-        supplier_options=supplier_options,
-        no_due_count=no_due_count,
-        total_outstanding=total_outstanding,
-        overdue_count=overdue_count,
-        format_date=_format_date_id,
-    )
-
-
-@bp.route("/utilitas/pembayaran-piutang", methods=["GET"])
-@login_required
-@roles_required(*SALES_ROLES)
-def pembayaran_piutang():
-    today = local_today()
-    default_start = today.replace(day=1)
-    start_date = _parse_date_param(request.args.get("start_date")) or default_start
-    end_date = _parse_date_param(request.args.get("end_date")) or today
-    if end_date < start_date:
-        start_date, end_date = end_date, start_date
-
-    search_query = (request.args.get("search") or "").strip()
-    open_id = _parse_int_param(request.args.get("open_id"))
-    pelanggan_id = _parse_int_param(request.args.get("pelanggan"))
-    sales_id = _parse_int_param(request.args.get("sales"))
-    per_page = request.args.get("per_page", type=int) or 10
-    per_page = max(5, min(per_page, 50))
-    page = request.args.get("page", type=int) or 1
-    if page < 1:
-        page = 1
-
-    outstanding_expr = Penjualan.total_harga - func.coalesce(Penjualan.amount_paid, 0)
-    base_filters = [
-        Penjualan.payment_method == "Tempo",
-        outstanding_expr > 0,
-    ]
-    if open_id:
-        base_filters.append(Penjualan.id == open_id)
-    else:
-        base_filters.extend(
-            [
-                Penjualan.tanggal_penjualan >= start_date,
-                Penjualan.tanggal_penjualan <= end_date,
-            ]
-        )
-        if pelanggan_id:
-            base_filters.append(Penjualan.pelanggan_id == pelanggan_id)
-        if sales_id:
-            base_filters.append(Penjualan.sales_id == sales_id)
-        if search_query:
-            like = f"%{search_query}%"
-            base_filters.append(
-                or_(
-                    Penjualan.no_faktur.ilike(like),
-                    Penjualan.pelanggan.has(Pelanggan.nama.ilike(like)),
-                    Penjualan.sales.has(User.username.ilike(like)),
-                )
-            )
-
-    total_records = (
-        db.session.query(func.count(Penjualan.id)).filter(*base_filters).scalar()
-        or 0
-    )
-    total_pages = max(1, (total_records + per_page - 1) // per_page)
-    if page > total_pages:
-        page = total_pages
-    offset = (page - 1) * per_page
-
-    nulls_last = case((Penjualan.due_date.is_(None), 1), else_=0)
-    order_clause = (
-        nulls_last.asc(),
-        Penjualan.due_date.asc(),
-        Penjualan.tanggal_penjualan.desc(),
-        Penjualan.id.desc(),
-    )
-
-    records = (
-        Penjualan.query.options(
-            joinedload(Penjualan.pelanggan),
-            joinedload(Penjualan.sales),
-        )
-        .filter(*base_filters)
-        .order_by(*order_clause)
-        .offset(offset)
-        .limit(per_page)
-        .all()
-    )
-
-    total_outstanding = (
-        db.session.query(func.coalesce(func.sum(outstanding_expr), 0))
-        .filter(*base_filters)
-        .scalar()
-        or 0.0
-    )
-
-    receivable_rows = []
-    for sale in records:
-        total = float(sale.total_harga or 0.0)
-        amount_paid = float(sale.amount_paid or 0.0)
-        outstanding = max(total - amount_paid, 0.0)
-        receivable_rows.append(
-            {
-                "id": sale.id,
-                "invoice": sale.no_faktur,
-                "sale_date": sale.tanggal_penjualan,
-                "due_date": sale.due_date,
-                "customer_name": sale.pelanggan.nama if sale.pelanggan else "Umum",
-                "customer_code": sale.pelanggan.pelanggan_id if sale.pelanggan else "-",
-                "sales_name": sale.sales.username if sale.sales else "-",
-                "total": total,
-                "amount_paid": amount_paid,
-                "outstanding": outstanding,
-            }
-        )
-
-    filter_values = {
-        "start_date": start_date.strftime("%Y-%m-%d"),
-        "end_date": end_date.strftime("%Y-%m-%d"),
-        "search": search_query,
-        "pelanggan": pelanggan_id or "",
-        "sales": sales_id or "",
-    }
-    filter_active = any([search_query, pelanggan_id, sales_id]) and not open_id
-
-    sales_options = (
-        User.query.filter(User.role.in_(SALES_ROLES)).order_by(User.username.asc()).all()
-    )
-    customer_options = Pelanggan.query.order_by(Pelanggan.nama.asc()).all()
-
-    query_args = request.args.to_dict(flat=True)
-    query_args.pop("page", None)
-    base_args = query_args.copy()
-    prev_url = (
-        url_for("main.pembayaran_piutang", page=page - 1, **base_args)
-        if page > 1
-        else None
-    )
-    next_url = (
-        url_for("main.pembayaran_piutang", page=page + 1, **base_args)
-        if page < total_pages
-        else None
-    )
-    page_window_start = max(1, page - 2)
-    page_window_end = min(total_pages, page + 2)
-    page_links = [
-        {
-            "number": number,
-            "url": url_for("main.pembayaran_piutang", page=number, **base_args),
-            "current": number == page,
-        }
-        for number in range(page_window_start, page_window_end + 1)
-    ]
-    pagination = {
-        "page": page,
-        "per_page": per_page,
-        "total_pages": total_pages,
-        "total_records": total_records,
-        "has_prev": page > 1,
-        "has_next": page < total_pages,
-        "prev_url": prev_url,
-        "next_url": next_url,
-        "page_links": page_links,
-    }
-
-    return render_template(
-        "pembayaran_piutang.html",
-        receivable_rows=receivable_rows,
-        filter_values=filter_values,
-        per_page=per_page,
-        pagination=pagination,
-        filter_active=filter_active,
-        total_outstanding=total_outstanding,
-        sales_options=sales_options,
-        customer_options=customer_options,
-        format_date=_format_date_id,
-        open_id=open_id,
-    )
-
-
-@bp.route("/utilitas/pembayaran-piutang/bayar", methods=["POST"])
-@login_required
-@roles_required(*SALES_ROLES)
-def pembayaran_piutang_bayar():
-    sale_id = _parse_int_param(request.form.get("sale_id"))
-    amount = _parse_float_param(request.form.get("payment_amount"))
-    payment_method = (request.form.get("payment_method") or "Tunai").strip()
-    reference = (request.form.get("reference") or "").strip() or None
-    note = (request.form.get("note") or "").strip() or None
-    update_due = request.form.get("update_due") == "1"
-    new_due_date = _parse_date_param(request.form.get("new_due_date"))
-    next_target = request.form.get("next") or url_for("main.pembayaran_piutang")
-
-    if not sale_id:
-        flash("Transaksi tidak ditemukan.", "warning")
-        return redirect(url_for("main.pembayaran_piutang"))
-
-    if not _ensure_receivable_payment_table():
-        flash(
-            "Tabel riwayat pembayaran belum tersedia. Jalankan migrasi terlebih dahulu.",
-            "warning",
-        )
-        return redirect(
-            next_target
-            if _is_safe_redirect_target(next_target)
-            else url_for("main.pembayaran_piutang")
-        )
-
-    sale = Penjualan.query.get_or_404(sale_id)
-    if sale.payment_method != "Tempo":
-        flash("Transaksi ini bukan pembayaran tempo.", "warning")
-        return redirect(url_for("main.pembayaran_piutang"))
-
-    if amount is None or amount <= 0:
-        flash("Jumlah bayar wajib diisi dan lebih dari 0.", "warning")
-        return redirect(
-            next_target
-            if _is_safe_redirect_target(next_target)
-            else url_for("main.pembayaran_piutang")
-        )
-
-    allowed_methods = {"Tunai", "Transfer", "Kartu", "QRIS"}
-    if payment_method not in allowed_methods:
-        payment_method = "Tunai"
-
-    if update_due and not new_due_date:
-        flash("Tanggal jatuh tempo baru wajib diisi.", "warning")
-        return redirect(
-            next_target
-            if _is_safe_redirect_target(next_target)
-            else url_for("main.pembayaran_piutang")
-        )
-
-    total = float(sale.total_harga or 0.0)
-    current_paid = float(sale.amount_paid or 0.0)
-    outstanding = max(total - current_paid, 0.0)
-    if outstanding <= 0:
-        flash("Piutang sudah lunas.", "info")
-        return redirect(
-            next_target
-            if _is_safe_redirect_target(next_target)
-            else url_for("main.pembayaran_piutang")
-        )
-
-    payment = ReceivablePayment(
-        penjualan_id=sale.id,
-        amount=amount,
-        payment_method=payment_method,
-        reference=reference,
-        note=note,
-        created_by=session.get("user_id"),
-    )
-    db.session.add(payment)
-
-    sale.amount_paid = current_paid + amount
-    sale.change_due = max(0.0, sale.amount_paid - total)
-    if update_due and new_due_date:
-        sale.due_date = new_due_date
-
-    db.session.commit()
-    flash("Pembayaran piutang berhasil disimpan.", "success")
-    return redirect(
-        next_target if _is_safe_redirect_target(next_target) else url_for("main.pembayaran_piutang")
-    )
-
-
-@bp.route("/api/piutang/history/<int:sale_id>", methods=["GET"])
-@login_required
-@roles_required(*SALES_ROLES)
-def pembayaran_piutang_history(sale_id):
-    sale = Penjualan.query.get_or_404(sale_id)
-    if sale.payment_method != "Tempo":
-        return jsonify({"payments": []})
-    if not _ensure_receivable_payment_table():
-        return jsonify({"payments": []})
-
-    payments = (
-        ReceivablePayment.query.options(joinedload(ReceivablePayment.created_by_user))
-        .filter(ReceivablePayment.penjualan_id == sale_id)
-        .order_by(ReceivablePayment.paid_at.desc(), ReceivablePayment.id.desc())
-        .all()
-    )
-    payload = []
-    for payment in payments:
-        paid_at = payment.paid_at or local_now()
-        date_label = f"{_format_date_id(paid_at.date())} {paid_at.strftime('%H:%M')}"
-        payload.append(
-            {
-                "id": payment.id,
-                "amount": float(payment.amount or 0.0),
-                "method": payment.payment_method or "-",
-                "reference": payment.reference or "-",
-                "note": payment.note or "-",
-                "paid_at": date_label,
-                "created_by": (
-                    payment.created_by_user.username
-                    if payment.created_by_user
-                    else "-"
-                ),
-            }
-        )
-
-    return jsonify({"payments": payload})
-
-
-@bp.route("/utilitas/pembayaran-utang", methods=["GET"])
-@login_required
-@roles_required(*ADMIN_ONLY)
-def pembayaran_utang():
-    _ensure_table(PayablePayment)
-    today = local_today()
-    default_start = today.replace(day=1)
-    start_date = _parse_date_param(request.args.get("start_date")) or default_start
-    end_date = _parse_date_param(request.args.get("end_date")) or today
-    if end_date < start_date:
-        start_date, end_date = end_date, start_date
-
-    search_query = (request.args.get("search") or "").strip()
-    open_id = _parse_int_param(request.args.get("open_id"))
-    supplier_id = _parse_int_param(request.args.get("supplier"))
-    per_page = request.args.get("per_page", type=int) or 10
-    per_page = max(5, min(per_page, 50))
-    page = request.args.get("page", type=int) or 1
-    if page < 1:
-        page = 1
-
-    total_sub = _purchase_total_subquery()
-    paid_sub = _payable_payment_sum_subquery()
-    total_expr = func.coalesce(total_sub.c.total_amount, 0)
-    paid_expr = func.coalesce(paid_sub.c.amount_paid, 0)
-    outstanding_expr = total_expr - paid_expr
-
-    base_filters = [
-        Pembelian.jenis_pembayaran == "Tempo",
-        outstanding_expr > 0,
-    ]
-    if open_id:
-        base_filters.append(Pembelian.id == open_id)
-    else:
-        base_filters.extend(
-            [
-                Pembelian.tanggal_faktur >= start_date,
-                Pembelian.tanggal_faktur <= end_date,
-            ]
-        )
-        if supplier_id:
-            base_filters.append(Pembelian.supplier_id == supplier_id)
-        if search_query:
-            like = f"%{search_query}%"
-            base_filters.append(
-                or_(
-                    Pembelian.no_faktur.ilike(like),
-                    Pembelian.supplier.has(Supplier.name.ilike(like)),
-                )
-            )
-
-    def apply_filters(query, filters):
-        return query.filter(*filters) if filters else query
-
-    base_query = (
-        Pembelian.query.options(joinedload(Pembelian.supplier))
-        .outerjoin(total_sub, total_sub.c.pembelian_id == Pembelian.id)
-        .outerjoin(paid_sub, paid_sub.c.pembelian_id == Pembelian.id)
-    )
-    list_query = apply_filters(base_query, base_filters)
-
-    total_records = (
-        list_query.with_entities(func.count(Pembelian.id)).scalar() or 0
-    )
-    total_pages = max(1, (total_records + per_page - 1) // per_page)
-    if page > total_pages:
-        page = total_pages
-    offset = (page - 1) * per_page
-
-    records = (
-        list_query.add_columns(
-            total_expr.label("total_amount"),
-            paid_expr.label("amount_paid"),
-        )
-        .order_by(Pembelian.tanggal_faktur.desc(), Pembelian.id.desc())
-        .offset(offset)
-        .limit(per_page)
-        .all()
-    )
-
-    total_outstanding = (
-        list_query.with_entities(func.coalesce(func.sum(outstanding_expr), 0))
-        .scalar()
-        or 0.0
-    )
-
-    payable_rows = []
-    for purchase, total_amount, amount_paid in records:
-        total_amount = float(total_amount or 0.0)
-        amount_paid = float(amount_paid or 0.0)
-        outstanding = max(total_amount - amount_paid, 0.0)
-        supplier_name = purchase.supplier.name if purchase.supplier else "Tanpa supplier"
-        payable_rows.append(
-            {
-                "id": purchase.id,
-                "invoice": purchase.no_faktur,
-                "purchase_date": purchase.tanggal_faktur,
-                "supplier_name": supplier_name,
-                "total": total_amount,
-                "amount_paid": amount_paid,
-                "outstanding": outstanding,
-                "due_date": purchase.due_date,
-            }
-        )
-
-    filter_active = any([search_query, supplier_id]) and not open_id
-
-    def _date_value_to_str(value):
-        return value.strftime("%Y-%m-%d") if value else ""
-
-    filter_values = {
-        "search": search_query,
-        "supplier": supplier_id or "",
-        "start_date": _date_value_to_str(start_date),
-        "end_date": _date_value_to_str(end_date),
-    }
-
-    supplier_options = Supplier.query.order_by(Supplier.name.asc()).all()
-
-    query_args = request.args.to_dict(flat=True)
-    query_args.pop("page", None)
-    base_args = query_args.copy()
-    prev_url = (
-        url_for("main.pembayaran_utang", page=page - 1, **base_args)
-        if page > 1
-        else None
-    )
-    next_url = (
-        url_for("main.pembayaran_utang", page=page + 1, **base_args)
-        if page < total_pages
-        else None
-    )
-    page_window_start = max(1, page - 2)
-    page_window_end = min(total_pages, page + 2)
-    page_links = [
-        {
-            "number": number,
-            "url": url_for("main.pembayaran_utang", page=number, **base_args),
-            "current": number == page,
-        }
-        for number in range(page_window_start, page_window_end + 1)
-    ]
-    pagination = {
-        "page": page,
-        "per_page": per_page,
-        "total_pages": total_pages,
-        "total_records": total_records,
-        "has_prev": page > 1,
-        "has_next": page < total_pages,
-        "prev_url": prev_url,
-        "next_url": next_url,
-        "page_links": page_links,
-    }
-
-    return render_template(
-        "pembayaran_utang.html",
-        payable_rows=payable_rows,
-        total_outstanding=total_outstanding,
-        filter_values=filter_values,
-        filter_active=filter_active,
-        per_page=per_page,
-        pagination=pagination,
-        supplier_options=supplier_options,
-        open_id=open_id,
-        format_date=_format_date_id,
-    )
-
-
-@bp.route("/utilitas/pembayaran-utang/bayar", methods=["POST"])
-@login_required
-@roles_required(*ADMIN_ONLY)
-def pembayaran_utang_bayar():
-    _ensure_table(PayablePayment)
-    purchase_id = _parse_int_param(request.form.get("purchase_id"))
-    amount = _parse_float_param(request.form.get("payment_amount"))
-    payment_method = (request.form.get("payment_method") or "Tunai").strip()
-    reference = (request.form.get("reference") or "").strip()
-    note = (request.form.get("note") or "").strip()
-    update_due = request.form.get("update_due") == "1"
-    new_due_date = _parse_date_param(request.form.get("new_due_date"))
-    next_target = request.form.get("next") or url_for("main.pembayaran_utang")
-
-    if not purchase_id:
-        flash("Data pembelian tidak valid.", "warning")
-        return redirect(url_for("main.pembayaran_utang"))
-
-    purchase = (
-        Pembelian.query.options(
-            joinedload(Pembelian.barang),
-            joinedload(Pembelian.supplier),
-        )
-        .filter(Pembelian.id == purchase_id)
-        .first()
-    )
-    if not purchase:
-        flash("Pembelian tidak ditemukan.", "warning")
-        return redirect(url_for("main.pembayaran_utang"))
-    if purchase.jenis_pembayaran != "Tempo":
-        flash("Pembelian ini bukan tempo.", "warning")
-        return redirect(next_target)
-
-    total_amount = _calculate_purchase_total(purchase.barang)
-    current_paid = sum(payment.amount for payment in purchase.payments)
-    outstanding = max(total_amount - current_paid, 0.0)
-    if outstanding <= 0:
-        flash("Utang sudah lunas.", "info")
-        return redirect(next_target)
-    if not amount or amount <= 0:
-        flash("Nominal pembayaran harus lebih dari 0.", "warning")
-        return redirect(next_target)
-    if update_due and not new_due_date:
-        flash("Tanggal jatuh tempo baru wajib diisi.", "warning")
-        return redirect(next_target)
-
-    allowed_methods = {"Tunai", "Transfer", "Kartu", "QRIS"}
-    if payment_method not in allowed_methods:
-        payment_method = "Tunai"
-    if amount > outstanding:
-        flash("Nominal pembayaran melebihi sisa utang.", "warning")
-        return redirect(next_target)
-
-    payment = PayablePayment(
-        pembelian_id=purchase.id,
-        amount=amount,
-        payment_method=payment_method,
-        reference=reference or None,
-        note=note or None,
-        created_by=session.get("user_id"),
-    )
-    db.session.add(payment)
-
-    if update_due and new_due_date:
-        purchase.due_date = new_due_date
-
-    db.session.commit()
-    flash("Pembayaran utang berhasil disimpan.", "success")
-    return redirect(
-        next_target if _is_safe_redirect_target(next_target) else url_for("main.pembayaran_utang")
-    )
-
-
-@bp.route("/api/utang/history/<int:purchase_id>", methods=["GET"])
-@login_required
-@roles_required(*ADMIN_ONLY)
-def pembayaran_utang_history(purchase_id):
-    _ensure_table(PayablePayment)
-    purchase = Pembelian.query.get_or_404(purchase_id)
-    if purchase.jenis_pembayaran != "Tempo":
-        return jsonify({"payments": []})
-
-    payments = (
-        PayablePayment.query.options(joinedload(PayablePayment.created_by_user))
-        .filter(PayablePayment.pembelian_id == purchase_id)
-        .order_by(PayablePayment.paid_at.desc(), PayablePayment.id.desc())
-        .all()
-    )
-    payload = []
-    for payment in payments:
-        paid_at = payment.paid_at or local_now()
-        date_label = f"{_format_date_id(paid_at.date())} {paid_at.strftime('%H:%M')}"
-        payload.append(
-            {
-                "id": payment.id,
-                "amount": float(payment.amount or 0.0),
-                "method": payment.payment_method or "-",
-                "reference": payment.reference or "-",
-                "note": payment.note or "-",
-                "paid_at": date_label,
-                "created_by": (
-                    payment.created_by_user.username
-                    if payment.created_by_user
-                    else "-"
-                ),
-            }
-        )
-
-    return jsonify({"payments": payload})
-
-
-@bp.route("/api/laporan/penjualan/suggest", methods=["GET"])
-@login_required
-@roles_required(*SALES_ROLES)
-def laporan_penjualan_suggest():
-    term = (request.args.get("q") or "").strip()
-    if len(term) < 2:
-        return jsonify({"results": []})
-
-    today = local_today()
-    default_start = today.replace(day=1)
-    start_date = _parse_date_param(request.args.get("start_date")) or default_start
-    end_date = _parse_date_param(request.args.get("end_date")) or today
-    if end_date < start_date:
-        start_date, end_date = end_date, start_date
-
-    like = f"%{term}%"
-    results = []
-
-    invoice_rows = (
-        Penjualan.query.options(joinedload(Penjualan.pelanggan))
-        .filter(Penjualan.tanggal_penjualan >= start_date)
-        .filter(Penjualan.tanggal_penjualan <= end_date)
-        .filter(Penjualan.no_faktur.ilike(like))
-        .order_by(Penjualan.tanggal_penjualan.desc(), Penjualan.id.desc())
-        .limit(6)
-        .all()
-    )
-    for sale in invoice_rows:
-        customer_name = sale.pelanggan.nama if sale.pelanggan else "Pelanggan umum"
-        date_label = (
-            _format_date_id(sale.tanggal_penjualan)
-            if sale.tanggal_penjualan
-            else "-"
-        )
-        results.append(
-            {
-                "kind": "faktur",
-                "label": sale.no_faktur,
-                "value": sale.no_faktur,
-                "subtext": f"{date_label} • {customer_name}",
-            }
-        )
-
-    customer_rows = (
-        Pelanggan.query.join(Pelanggan.penjualan)
-        .filter(Penjualan.tanggal_penjualan >= start_date)
-        .filter(Penjualan.tanggal_penjualan <= end_date)
-        .filter(Pelanggan.nama.ilike(like))
-        .distinct()
-        .order_by(Pelanggan.nama.asc())
-        .limit(6)
-        .all()
-    )
-    for customer in customer_rows:
-        subtext_parts = [customer.pelanggan_id]
-        if customer.kontak:
-            subtext_parts.append(customer.kontak)
-        results.append(
-            {
-                "kind": "pelanggan",
-                "label": customer.nama,
-                "value": customer.nama,
-                "subtext": " • ".join([p for p in subtext_parts if p]),
-            }
-        )
-
-    staff_rows = (
-        User.query.join(User.penjualan)
-        .filter(Penjualan.tanggal_penjualan >= start_date)
-        .filter(Penjualan.tanggal_penjualan <= end_date)
-        .filter(User.username.ilike(like))
-        .distinct()
-        .order_by(User.username.asc())
-        .limit(6)
-        .all()
-    )
-    for staff in staff_rows:
-        role_label = (staff.role or "").strip()
-        results.append(
-            {
-                "kind": "sales",
-                "label": staff.username,
-                "value": staff.username,
-                "subtext": role_label,
-            }
-        )
-
-    return jsonify({"results": results})
-
-
-@bp.route("/api/get_product1", methods=["GET"])
-@login_required
-@roles_required(*ALL_ROLE_CHOICES)
-def get_product1():
-    product_id = request.args.get("product_id")
-    product = db.session.get(Produk, product_id)
-
-    if product:
-        return jsonify(
-            {
-                "success": True,
-                "id": product.id,
-                "nama_produk": product.nama_produk,
-                "kode_produk": product.kode_produk,
-                "harga": product.harga,
-            }
-        )
-    return jsonify({"success": False, "message": "Produk tidak ditemukan."}), 404
-
-
-@bp.route("/sales_staff", methods=["GET", "POST"])
-@login_required
-@roles_required(*ADMIN_ONLY)
-def sales_staff():
-    role_choices = [
-        {"value": ROLE_ADMIN, "label": "Admin"},
-        {"value": ROLE_KASIR, "label": "Kasir"},
-        {"value": ROLE_SALES, "label": "Sales"},
-        {"value": ROLE_GUDANG, "label": "Gudang"},
-    ]
-    role_labels = {choice["value"]: choice["label"] for choice in role_choices}
-
-    form_errors = {}
-    edit_user = None
-    if request.method == "GET":
-        edit_id = request.args.get("edit", type=int)
-        if edit_id:
-            edit_user = db.session.get(User, edit_id)
-
-    def _default_form_values():
-        return {"username": "", "email": "", "role": ROLE_SALES}
-
-    if request.method == "POST":
-        form_values = {
-            "username": (request.form.get("username", "") or "").strip(),
-            "email": (request.form.get("email", "") or "").strip(),
-            "role": (request.form.get("role", ROLE_SALES) or ROLE_SALES).lower(),
-        }
-    elif edit_user:
-        form_values = {
-            "username": edit_user.username or "",
-            "email": edit_user.email or "",
-            "role": (edit_user.role or ROLE_SALES).lower(),
-        }
-    else:
-        form_values = _default_form_values()
-
-    if request.method == "POST":
-        username = form_values["username"]
-        email = form_values["email"]
-        password = request.form.get("password", "").strip()
-        role = (form_values["role"] or "sales").lower()
-        if role not in role_labels:
-            role = "sales"
-        edit_id = request.form.get("user_id")
-        is_edit = bool(edit_id)
-        target_user = None
-
-        if is_edit:
-            try:
-                target_user = db.session.get(User, int(edit_id))
-            except (TypeError, ValueError):
-                target_user = None
-            if not target_user:
-                flash("Pengguna yang akan diubah tidak ditemukan.", "warning")
-                return redirect(url_for("main.sales_staff"))
-            edit_user = target_user
-
-        if not username:
-            form_errors["username"] = "Nama login wajib diisi."
-        else:
-            existing_username = (
-                User.query.filter(func.lower(User.username) == username.lower())
-                .filter(User.id != (target_user.id if target_user else 0))
-                .first()
-            )
-            if existing_username:
-                form_errors["username"] = "Nama login sudah digunakan."
-
-        if not email:
-            form_errors["email"] = "Email wajib diisi."
-        else:
-            existing_email = (
-                User.query.filter(func.lower(User.email) == email.lower())
-                .filter(User.id != (target_user.id if target_user else 0))
-                .first()
-            )
-            if existing_email:
-                form_errors["email"] = "Email sudah terdaftar."
-
-        if is_edit:
-            # Password opsional saat edit
-            if password and len(password) < MIN_PASSWORD_LENGTH:
-                form_errors["password"] = (
-                    f"Password minimal {MIN_PASSWORD_LENGTH} karakter."
-                )
-        else:
-            if not password or len(password) < MIN_PASSWORD_LENGTH:
-                form_errors["password"] = (
-                    f"Password minimal {MIN_PASSWORD_LENGTH} karakter."
-                )
-
-        if not form_errors:
-            if is_edit and target_user:
-                target_user.username = username
-                target_user.email = email
-                target_user.role = role
-                if password:
-                    target_user.password = generate_password_hash(
-                        password, method="pbkdf2:sha256", salt_length=8
-                    )
-                db.session.commit()
-                flash("Pengguna berhasil diperbarui.", "success")
-                return redirect(url_for("main.sales_staff"))
-            else:
-                hashed_password = generate_password_hash(
-                    password, method="pbkdf2:sha256", salt_length=8
-                )
-                new_user = User(
-                    username=username, email=email, password=hashed_password, role=role
-                )
-                db.session.add(new_user)
-                db.session.commit()
-                flash(
-                    f"Pengguna {role_labels.get(role, role)} baru berhasil ditambahkan.",
-                    "success",
-                )
-                return redirect(url_for("main.sales_staff"))
-
-    staff_query = (
-        db.session.query(
-            User,
-            func.count(Penjualan.id).label("orders"),
-            func.coalesce(func.sum(Penjualan.total_harga), 0).label("revenue"),
-        )
-        .outerjoin(Penjualan, Penjualan.sales_id == User.id)
-        .filter(User.role.in_([choice["value"] for choice in role_choices]))
-        .group_by(User.id)
-        .order_by(User.username.asc())
-    )
-    staff_rows = staff_query.all()
-
-    role_breakdown = {
-        role["value"]: db.session.query(func.count(User.id))
-        .filter(User.role == role["value"])
-        .scalar()
-        or 0
-        for role in role_choices
-    }
-    total_staff = sum(role_breakdown.values())
-
-    total_transactions = sum(orders for _, orders, _ in staff_rows)
-
-    recent_sales = (
-        Penjualan.query.options(
-            joinedload(Penjualan.pelanggan), joinedload(Penjualan.sales)
-        )
-        .order_by(Penjualan.tanggal_penjualan.desc(), Penjualan.id.desc())
-        .limit(5)
-        .all()
-    )
-
-    stats_cards = [
-        {
-            "label": "Total Personel",
-            "value": total_staff,
-            "icon": "fa-users",
-            "accent": "text-primary",
-            "description": "Admin, sales, kasir, gudang aktif.",
-        },
-        {
-            "label": "Admin",
-            "value": role_breakdown.get(ROLE_ADMIN, 0),
-            "icon": "fa-user-shield",
-            "accent": "text-danger",
-            "description": "Pengelola sistem & konfigurasi.",
-        },
-        {
-            "label": "Sales",
-            "value": role_breakdown.get("sales", 0),
-            "icon": "fa-user-tie",
-            "accent": "text-success",
-            "description": "Tim penjualan lapangan.",
-        },
-        {
-            "label": "Kasir",
-            "value": role_breakdown.get("kasir", 0),
-            "icon": "fa-cash-register",
-            "accent": "text-warning",
-            "description": "Operator kasir aktif.",
-        },
-        {
-            "label": "Gudang",
-            "value": role_breakdown.get(ROLE_GUDANG, 0),
-            "icon": "fa-warehouse",
-            "accent": "text-info",
-            "description": "Pengelola stok & penerimaan barang.",
-        },
-        {
-            "label": "Transaksi tercatat",
-            "value": total_transactions,
-            "icon": "fa-receipt",
-            "accent": "text-info",
-            "description": "Akumulasi faktur dari tim.",
-        },
-    ]
-
-    staff_table = []
-    for user, orders, revenue in staff_rows:
-        customer_count = db.session.query(
-            func.count(func.distinct(Penjualan.pelanggan_id))
-        )
-        customer_count = (
-            customer_count.filter(Penjualan.sales_id == user.id).scalar() or 0
-        )
-        staff_table.append(
-            {
-                "id": user.id,
-                "username": user.username,
-                "email": user.email,
-                "role": role_labels.get(user.role, (user.role or "").title()),
-                "role_value": user.role or "",
-                "orders": orders,
-                "revenue": revenue,
-                "customers": customer_count,
-            }
-        )
-
-    role_permissions = [
-        {
-            "role": "Administrator",
-            "note": "Full akses semua menu & pengaturan",
-            "badge_class": "badge-soft-danger",
-            "accent_class": "permission-admin",
-            "items_list": [
-                "Semua transaksi & laporan",
-                "Master data (produk, pelanggan, supplier)",
-                "Pengaturan perusahaan & faktur/pajak",
-                "Pengaturan database & backup",
-                "Manajemen user & role",
-            ],
-        },
-        {
-            "role": "Sales",
-            "note": "Akses penjualan & piutang",
-            "badge_class": "badge-soft-info",
-            "accent_class": "permission-sales",
-            "items_list": [
-                "Input transaksi penjualan",
-                "Cetak struk / invoice / surat jalan",
-                "Kelola pelanggan",
-                "Laporan penjualan",
-                "Laporan & pembayaran piutang",
-            ],
-        },
-        {
-            "role": "Kasir",
-            "note": "Operasional kasir harian",
-            "badge_class": "badge-soft-success",
-            "accent_class": "permission-kasir",
-            "items_list": [
-                "Input transaksi penjualan",
-                "Cetak struk / invoice",
-                "Kelola pelanggan",
-                "Pembayaran piutang",
-                "Laporan penjualan",
-            ],
-        },
-        {
-            "role": "Gudang",
-            "note": "Stok & pembelian",
-            "badge_class": "badge-soft-warning",
-            "accent_class": "permission-gudang",
-            "items_list": [
-                "Pembelian & penerimaan barang",
-                "Master produk & kategori",
-                "Supplier & expedisi",
-                "Stok opname & update harga",
-                "Laporan pembelian & stok",
-            ],
-        },
-    ]
-
-    return render_template(
-        "sales_staff.html",
-        stats_cards=stats_cards,
-        staff_table=staff_table,
-        role_choices=role_choices,
-        form_errors=form_errors,
-        form_values=form_values,
-        edit_user=edit_user,
-        recent_sales=recent_sales,
-        role_labels=role_labels,
-        role_permissions=role_permissions,
-    )
-
-
-def _build_level_price_tables(price_levels, price_entries, req_args, per_page=8):
-    price_table = {}
-    price_table_pages = {}
-
-    args_dict = req_args.to_dict() if hasattr(req_args, "to_dict") else dict(req_args)
-
-    def _build_level_page_url(level_id, page_num, fragment=False):
-        params = dict(args_dict)
-        params[f"page_level_{level_id}"] = page_num
-        if fragment:
-            params["ajax"] = "1"
-            return url_for("main.harga_level_level_fragment", level_id=level_id, **params)
-        return url_for("main.harga_level", **params)
-
-    for level in price_levels:
-        level_entries = [
-            {
-                "id": entry.id,
-                "product_name": (
-                    entry.produk.nama_produk if entry.produk else "Produk dihapus"
-                ),
-                "product_code": entry.produk.kode_produk if entry.produk else "-",
-                "price": entry.price,
-            }
-            for entry in price_entries
-            if entry.level_id == level.id
-        ]
-
-        total_entries = len(level_entries)
-        total_pages = max(1, math.ceil(total_entries / per_page)) if total_entries else 1
-        page_param = f"page_level_{level.id}"
-        page = req_args.get(page_param, 1, type=int) if hasattr(req_args, "get") else 1
-        if not isinstance(page, int):
-            page = 1
-        if page < 1:
-            page = 1
-        if page > total_pages:
-            page = total_pages
-
-        start = (page - 1) * per_page
-        end = start + per_page
-        price_table[level.id] = level_entries[start:end]
-
-        page_links = [
-            {
-                "num": num,
-                "url": _build_level_page_url(level.id, num, fragment=False),
-                "fragment_url": _build_level_page_url(level.id, num, fragment=True),
-            }
-            for num in range(1, total_pages + 1)
-        ]
-
-        price_table_pages[level.id] = {
-            "page": page,
-            "pages": total_pages,
-            "has_prev": page > 1,
-            "has_next": page < total_pages,
-            "prev_url": _build_level_page_url(level.id, page - 1, fragment=False)
-            if page > 1
-            else None,
-            "next_url": _build_level_page_url(level.id, page + 1, fragment=False)
-            if page < total_pages
-            else None,
-            "prev_fragment_url": _build_level_page_url(level.id, page - 1, fragment=True)
-            if page > 1
-            else None,
-            "next_fragment_url": _build_level_page_url(level.id, page + 1, fragment=True)
-            if page < total_pages
-            else None,
-            "links": page_links,
-            "total": total_entries,
-        }
-
-    return price_table, price_table_pages
-
-
-def _build_level_price_export_rows(levels, products, entries, blank_prices=False):
-    entry_map = {(entry.product_id, entry.level_id): entry for entry in entries}
-    rows = []
-    for product in products:
-        for level in levels:
-            entry = entry_map.get((product.id, level.id))
-            price_value = None
-            if not blank_prices and entry:
-                price_value = entry.price
-            rows.append(
-                {
-                    "Level ID": level.id,
-                    "Level Name": level.name,
-                    "Product ID": product.id,
-                    "Product Code": product.kode_produk,
-                    "Product Name": product.nama_produk,
-                    "SKU": product.sku,
-                    "Barcode": product.barcode,
-                    "Price": price_value,
-                }
-            )
-    return rows
-
-
-@bp.route("/harga_level", methods=["GET", "POST"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def harga_level():
-    action = request.form.get("action") if request.method == "POST" else None
-    if action == "create_level":
-        name = (request.form.get("level_name") or "").strip()
-        description = (request.form.get("description") or "").strip()
-        if not name:
-            flash("Nama level harga wajib diisi.", "warning")
-        elif PriceLevel.query.filter(
-            func.lower(PriceLevel.name) == name.lower()
-        ).first():
-            flash("Nama level sudah digunakan.", "warning")
-        else:
-            new_level = PriceLevel(name=name, description=description)
-            db.session.add(new_level)
-            db.session.commit()
-            flash("Level harga baru berhasil ditambahkan.", "success")
-        return redirect(url_for("main.harga_level"))
-
-    if action == "set_price":
-        level_id = request.form.get("level_id")
-        product_id = request.form.get("product_id")
-        price_raw = request.form.get("price")
-        try:
-            level_id_int = int(level_id)
-            product_id_int = int(product_id)
-            price_value = float(price_raw)
-        except (TypeError, ValueError):
-            flash("Pastikan level, produk, dan harga valid.", "warning")
-            return redirect(url_for("main.harga_level"))
-
-        if price_value < 0:
-            flash("Harga tidak boleh negatif.", "warning")
-            return redirect(url_for("main.harga_level"))
-
-        level = db.session.get(PriceLevel, level_id_int)
-        product = db.session.get(Produk, product_id_int)
-        if not level or not product:
-            flash("Level atau produk tidak ditemukan.", "warning")
-            return redirect(url_for("main.harga_level"))
-
-        entry = ProductPriceLevel.query.filter_by(
-            product_id=product_id_int, level_id=level_id_int
-        ).first()
-        if entry:
-            entry.price = price_value
-        else:
-            entry = ProductPriceLevel(
-                product_id=product_id_int, level_id=level_id_int, price=price_value
-            )
-            db.session.add(entry)
-        db.session.commit()
-        flash(
-            f"Harga khusus untuk {product.nama_produk} ({level.name}) tersimpan.",
-            "success",
-        )
-        return redirect(url_for("main.harga_level"))
-
-    if action == "delete_price":
-        entry_id = request.form.get("entry_id")
-        try:
-            entry_int = int(entry_id)
-        except (TypeError, ValueError):
-            entry_int = None
-        if entry_int:
-            entry = db.session.get(ProductPriceLevel, entry_int)
-            if entry:
-                db.session.delete(entry)
-                db.session.commit()
-                flash("Harga khusus dihapus.", "success")
-        return redirect(url_for("main.harga_level"))
-
-    if action == "create_cost":
-        level_id = request.form.get("cost_level_id")
-        name = (request.form.get("cost_name") or "").strip()
-        cost_type = request.form.get("cost_type") or "percent"
-        value_raw = request.form.get("cost_value")
-        active_flag = request.form.get("cost_active") == "1"
-
-        try:
-            level_id_int = int(level_id)
-            value = float(value_raw)
-        except (TypeError, ValueError):
-            flash("Pastikan level dan nilai biaya valid.", "warning")
-            return redirect(url_for("main.harga_level"))
-
-        if value < 0:
-            flash("Nilai biaya tidak boleh negatif.", "warning")
-            return redirect(url_for("main.harga_level"))
-
-        level = db.session.get(PriceLevel, level_id_int)
-        if not level:
-            flash("Level harga tidak ditemukan.", "warning")
-            return redirect(url_for("main.harga_level"))
-
-        new_cost = PriceLevelCost(
-            level_id=level_id_int,
-            name=name or "Biaya baru",
-            type="percent" if cost_type not in ("nominal", "percent") else cost_type,
-            value=value,
-            is_active=active_flag,
-        )
-        db.session.add(new_cost)
-        db.session.commit()
-        flash("Biaya baru berhasil ditambahkan.", "success")
-        return redirect(url_for("main.harga_level"))
-
-    if action == "toggle_cost":
-        entry_id = request.form.get("cost_id")
-        try:
-            entry_int = int(entry_id)
-        except (TypeError, ValueError):
-            entry_int = None
-        if entry_int:
-            cost_entry = db.session.get(PriceLevelCost, entry_int)
-            if cost_entry:
-                cost_entry.is_active = not cost_entry.is_active
-                db.session.commit()
-                status = "diaktifkan" if cost_entry.is_active else "dinonaktifkan"
-                flash(f"Biaya {cost_entry.name} {status}.", "success")
-        return redirect(url_for("main.harga_level"))
-
-    if action == "delete_cost":
-        entry_id = request.form.get("cost_id")
-        try:
-            entry_int = int(entry_id)
-        except (TypeError, ValueError):
-            entry_int = None
-        if entry_int:
-            cost_entry = db.session.get(PriceLevelCost, entry_int)
-            if cost_entry:
-                db.session.delete(cost_entry)
-                db.session.commit()
-                flash(f"Biaya {cost_entry.name} dihapus.", "success")
-        return redirect(url_for("main.harga_level"))
-
-    price_levels = PriceLevel.query.order_by(PriceLevel.name.asc()).all()
-    price_entries = (
-        ProductPriceLevel.query.options(
-            joinedload(ProductPriceLevel.produk), joinedload(ProductPriceLevel.level)
-        )
-        .order_by(ProductPriceLevel.level_id.asc(), ProductPriceLevel.id.desc())
-        .all()
-    )
-
-    cost_entries = (
-        PriceLevelCost.query.options(joinedload(PriceLevelCost.level))
-        .order_by(PriceLevelCost.level_id.asc(), PriceLevelCost.name.asc())
-        .all()
-    )
-    price_level_costs = {}
-    for cost in cost_entries:
-        price_level_costs.setdefault(cost.level_id, []).append(cost)
-
-    cost_totals = {
-        level.id: {"percent": 0.0, "nominal": 0.0, "active": 0}
-        for level in price_levels
-    }
-    for cost in cost_entries:
-        if not cost.is_active:
-            continue
-        total_entry = cost_totals.setdefault(
-            cost.level_id, {"percent": 0.0, "nominal": 0.0, "active": 0}
-        )
-        if cost.type == "percent":
-            total_entry["percent"] += float(cost.value or 0.0)
-        else:
-            total_entry["nominal"] += float(cost.value or 0.0)
-        total_entry["active"] += 1
-
-    level_summary = []
-    for level in price_levels:
-        totals = cost_totals.get(level.id, {"percent": 0.0, "nominal": 0.0, "active": 0})
-        level_summary.append(
-            {
-                "id": level.id,
-                "name": level.name,
-                "description": level.description,
-                "customer_count": len(level.pelanggan),
-                "price_count": sum(
-                    1 for entry in price_entries if entry.level_id == level.id
-                ),
-                "cost_percent_total": totals["percent"],
-                "cost_nominal_total": totals["nominal"],
-                "cost_active_count": totals["active"],
-            }
-        )
-
-    price_table, price_table_pages = _build_level_price_tables(
-        price_levels, price_entries, request.args, per_page=8
-    )
-
-    return render_template(
-        "harga_level.html",
-        price_levels=price_levels,
-        level_summary=level_summary,
-        price_table=price_table,
-        price_table_pages=price_table_pages,
-        price_level_costs=price_level_costs,
-        cost_totals=cost_totals,
-    )
-
-
-@bp.route("/harga_level/level/<int:level_id>")
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def harga_level_level_fragment(level_id):
-    price_levels = PriceLevel.query.order_by(PriceLevel.name.asc()).all()
-    price_entries = (
-        ProductPriceLevel.query.options(
-            joinedload(ProductPriceLevel.produk), joinedload(ProductPriceLevel.level)
-        )
-        .order_by(ProductPriceLevel.level_id.asc(), ProductPriceLevel.id.desc())
-        .all()
-    )
-
-    level_lookup = {level.id: level for level in price_levels}
-    level = level_lookup.get(level_id)
-    if not level:
-        return jsonify({"error": "Level tidak ditemukan"}), 404
-
-    price_table, price_table_pages = _build_level_price_tables(
-        price_levels, price_entries, request.args, per_page=8
-    )
-
-    entries = price_table.get(level_id, [])
-    page_info = price_table_pages.get(level_id, {})
-
-    if request.args.get("ajax") == "1":
-        return render_template(
-            "partials/level_price_table.html",
-            entries=entries,
-            page_info=page_info,
-            level=level,
-        )
-
-    return redirect(url_for("main.harga_level", **request.args.to_dict()))
-
-
-@bp.route("/harga_level/export", methods=["GET"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def export_harga_level():
-    blank = request.args.get("template") == "1"
-    levels = PriceLevel.query.order_by(PriceLevel.name.asc()).all()
-    products = Produk.query.order_by(Produk.nama_produk.asc()).all()
-    entries = ProductPriceLevel.query.all()
-
-    rows = _build_level_price_export_rows(levels, products, entries, blank_prices=blank)
-    df = pd.DataFrame(rows)
-
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        df.to_excel(writer, index=False)
-    output.seek(0)
-
-    filename = "template_level_harga.xlsx" if blank else "level_harga.xlsx"
-    response = make_response(output.read())
-    response.headers["Content-Disposition"] = f"attachment; filename={filename}"
-    response.headers["Content-Type"] = (
-        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
-    return response
-
-
-@bp.route("/harga_level/import", methods=["POST"])
-@login_required
-@roles_required(*INVENTORY_ROLES)
-def import_harga_level():
-    if "file" not in request.files:
-        flash("File Excel belum dipilih.", "warning")
-        return redirect(url_for("main.harga_level"))
-
-    file = request.files["file"]
-    if not file or not file.filename:
-        flash("File Excel belum dipilih.", "warning")
-        return redirect(url_for("main.harga_level"))
-
-    try:
-        df = pd.read_excel(file)
-    except Exception as exc:
-        flash(f"Gagal membaca file Excel: {exc}", "danger")
-        return redirect(url_for("main.harga_level"))
-
-    if df.empty:
-        flash("File Excel kosong.", "warning")
-        return redirect(url_for("main.harga_level"))
-
-    def _normalize_col(name):
-        return re.sub(r"[^a-z0-9]+", "_", str(name).strip().lower())
-
-    normalized_columns = {_normalize_col(col): col for col in df.columns}
-    required_any = {"price", "harga"}
-    if not required_any.intersection(normalized_columns.keys()):
-        flash("Kolom harga tidak ditemukan di file Excel.", "warning")
-        return redirect(url_for("main.harga_level"))
-
-    levels = PriceLevel.query.all()
-    products = Produk.query.all()
-    level_by_id = {level.id: level for level in levels}
-    level_by_name = {level.name.lower(): level for level in levels}
-    product_by_id = {product.id: product for product in products}
-    product_by_code = {
-        (product.kode_produk or "").lower(): product for product in products
-    }
-    product_by_sku = {(product.sku or "").lower(): product for product in products}
-    product_by_barcode = {
-        (product.barcode or "").lower(): product for product in products
-    }
-
-    existing_entries = {
-        (entry.product_id, entry.level_id): entry
-        for entry in ProductPriceLevel.query.all()
-    }
-
-    created_count = 0
-    updated_count = 0
-    skipped_count = 0
-    errors = 0
-
-    for _, row in df.iterrows():
-        row_data = {
-            _normalize_col(col): row[col] for col in df.columns
-        }
-
-        def _get_value(*keys):
-            for key in keys:
-                if key in row_data:
-                    return row_data.get(key)
-            return None
-
-        level_id_value = _get_value("level_id", "id_level")
-        level_name_value = _get_value("level_name", "nama_level", "level")
-        product_id_value = _get_value("product_id", "id_produk", "produk_id")
-        product_code_value = _get_value("product_code", "kode_produk", "kode")
-        sku_value = _get_value("sku")
-        barcode_value = _get_value("barcode")
-        price_value = _get_value("price", "harga", "harga_level")
-
-        if pd.isna(price_value):
-            skipped_count += 1
-            continue
-
-        try:
-            price_value = float(price_value)
-        except (TypeError, ValueError):
-            errors += 1
-            continue
-
-        if price_value < 0:
-            errors += 1
-            continue
-
-        level = None
-        if not pd.isna(level_id_value):
-            try:
-                level = level_by_id.get(int(level_id_value))
-            except (TypeError, ValueError):
-                level = None
-        if not level and level_name_value and not pd.isna(level_name_value):
-            level = level_by_name.get(str(level_name_value).strip().lower())
-
-        product = None
-        if not pd.isna(product_id_value):
-            try:
-                product = product_by_id.get(int(product_id_value))
-            except (TypeError, ValueError):
-                product = None
-        if not product and product_code_value and not pd.isna(product_code_value):
-            product = product_by_code.get(str(product_code_value).strip().lower())
-        if not product and sku_value and not pd.isna(sku_value):
-            product = product_by_sku.get(str(sku_value).strip().lower())
-        if not product and barcode_value and not pd.isna(barcode_value):
-            product = product_by_barcode.get(str(barcode_value).strip().lower())
-
-        if not level or not product:
-            skipped_count += 1
-            continue
-
-        key = (product.id, level.id)
-        existing = existing_entries.get(key)
-        if existing:
-            if existing.price != price_value:
-                existing.price = price_value
-                updated_count += 1
-            else:
-                skipped_count += 1
-            continue
-
-        new_entry = ProductPriceLevel(
-            product_id=product.id, level_id=level.id, price=price_value
-        )
-        db.session.add(new_entry)
-        existing_entries[key] = new_entry
-        created_count += 1
-
-    if created_count or updated_count:
-        db.session.commit()
-
-    message_parts = []
-    if created_count:
-        message_parts.append(f"{created_count} dibuat")
-    if updated_count:
-        message_parts.append(f"{updated_count} diupdate")
-    if skipped_count:
-        message_parts.append(f"{skipped_count} dilewati")
-    if errors:
-        message_parts.append(f"{errors} error")
-    summary = ", ".join(message_parts) if message_parts else "Tidak ada perubahan"
-
-    flash(f"Import level harga selesai: {summary}.", "success")
-    return redirect(url_for("main.harga_level"))
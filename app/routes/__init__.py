@@ -0,0 +1,24 @@
+"""Route aplikasi dalam satu blueprint ``main``, dipecah per kelompok fitur.
+
+Setiap modul mendaftarkan view-nya ke ``bp`` yang sama, jadi nama endpoint
+(``url_for("main.<fungsi>")``) tidak berubah. Helper bersama ada di
+``app.routes.common``.
+"""
+
+from flask import Blueprint
+
+bp = Blueprint("main", __name__)
+
+# modul di-import untuk mendaftarkan route ke bp
+from app.routes import (  # noqa: E402,F401
+    accounting,
+    api,
+    auth,
+    common,
+    dashboard,
+    inventory,
+    pos,
+    purchasing,
+    reports,
+    settings,
+)
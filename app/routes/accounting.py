@@ -0,0 +1,1868 @@
+"""Route akuntansi: akun, saldo awal, jurnal, buku besar, kas/bank, aset, tutup buku."""
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from flask import flash, jsonify, redirect, render_template, request, session, url_for
+from sqlalchemy import case, func, or_
+from sqlalchemy.orm import joinedload
+
+from app.models import (
+    Account,
+    AccountingPeriod,
+    AccountingSetting,
+    BarangPembelian,
+    DetailPenjualan,
+    FixedAsset,
+    JournalEntry,
+    JournalLine,
+    Pembelian,
+    Penjualan,
+    Produk,
+    db,
+)
+from app.routes import bp
+from app.routes.common import (
+    ADMIN_ONLY,
+    _format_date_id,
+    _generate_journal_reference,
+    _generate_journal_reference_with_prefix,
+    _get_accounting_setting,
+    _parse_bool_param,
+    _parse_date_param,
+    _parse_float_param,
+    _parse_int_param,
+    _resolve_next_target,
+    login_required,
+    roles_required,
+)
+from app.services.ledger_service import (
+    account_net_movements,
+    opening_balance as ledger_opening_balance,
+    refresh_account_period_balances,
+)
+from app.services.sales_summary_service import detail_line_columns
+from app.time_utils import local_now, local_today
+
+
+def _parse_journal_lines(payload):
+    lines = payload.get("lines") or []
+    if not lines or len(lines) < 2:
+        return None, "Minimal dua baris jurnal (debit/kredit)."
+
+    total_debit = 0.0
+    total_credit = 0.0
+    parsed_lines = []
+    for idx, raw in enumerate(lines, start=1):
+        account_id = raw.get("account_id")
+        description = (raw.get("description") or "").strip()
+        try:
+            account_id = int(account_id)
+        except (TypeError, ValueError):
+            return None, f"Akun tidak valid (baris {idx})."
+        account = db.session.get(Account, account_id)
+        if not account:
+            return None, f"Akun ID {account_id} tidak ditemukan (baris {idx})."
+        try:
+            debit = float(raw.get("debit") or 0.0)
+            credit = float(raw.get("credit") or 0.0)
+        except (TypeError, ValueError):
+            return None, f"Nominal tidak valid (baris {idx})."
+        if debit < 0 or credit < 0:
+            return None, f"Debit/kredit tidak boleh negatif (baris {idx})."
+        if debit == 0 and credit == 0:
+            return None, f"Isi salah satu debit/kredit (baris {idx})."
+        if debit > 0 and credit > 0:
+            return None, f"Debit dan kredit tidak boleh diisi bersamaan (baris {idx})."
+
+        total_debit += debit
+        total_credit += credit
+        parsed_lines.append(
+            {
+                "account": account,
+                "description": description,
+                "debit": debit,
+                "credit": credit,
+            }
+        )
+
+    if round(total_debit, 2) != round(total_credit, 2):
+        return None, "Total debit dan kredit harus seimbang."
+
+    return parsed_lines, None
+
+
+@bp.route("/akun", methods=["GET", "POST"])
+@login_required
+@roles_required(*ADMIN_ONLY)
+def akun():
+    if request.method == "POST":
+        code = (request.form.get("code") or "").strip().upper()
+        name = (request.form.get("name") or "").strip()
+        acc_type = (request.form.get("type") or "").strip().lower()
+        parent_id = request.form.get("parent_id")
+        is_active = request.form.get("is_active", "1") == "1"
+
+        valid_types = {"asset", "liability", "equity", "income", "expense"}
+        if not code or not name or acc_type not in valid_types:
+            flash("Kode, nama, dan tipe akun wajib diisi.", "warning")
+            return redirect(url_for("main.akun"))
+        if Account.query.filter_by(code=code).first():
+            flash(f"Kode akun {code} sudah digunakan.", "warning")
+            return redirect(url_for("main.akun"))
+
+        parent = None
+        if parent_id:
+            try:
+                parent = db.session.get(Account, int(parent_id))
+            except (TypeError, ValueError):
+                parent = None
+
+        account = Account(
+            code=code,
+            name=name,
+            type=acc_type,
+            parent=parent,
+            is_active=is_active,
+        )
+        db.session.add(account)
+        db.session.commit()
+        flash("Akun berhasil ditambahkan.", "success")
+        return redirect(url_for("main.akun"))
+
+    edit_id = _parse_int_param(request.args.get("edit"))
+    edit_account = db.session.get(Account, edit_id) if edit_id else None
+
+    accounts = Account.query.order_by(Account.code.asc()).all()
+    type_labels = {
+        "asset": "Aset",
+        "liability": "Liabilitas",
+        "equity": "Ekuitas",
+        "income": "Pendapatan",
+        "expense": "Beban",
+    }
+    summary = defaultdict(int)
+    for account in accounts:
+        summary[account.type] += 1
+
+    summary_cards = [
+        {
+            "label": type_labels.get(acc_type, acc_type.title()),
+            "value": summary.get(acc_type, 0),
+            "icon": icon,
+            "accent": accent,
+        }
+        for acc_type, icon, accent in [
+            ("asset", "fa-piggy-bank", "text-primary"),
+            ("liability", "fa-balance-scale", "text-warning"),
+            ("equity", "fa-university", "text-success"),
+            ("income", "fa-chart-line", "text-info"),
+            ("expense", "fa-receipt", "text-danger"),
+        ]
+    ]
+
+    return render_template(
+        "akun.html",
+        accounts=accounts,
+        summary_cards=summary_cards,
+        type_labels=type_labels,
+        edit_account=edit_account,
+    )
+
+
+@bp.route("/akun/edit/<int:account_id>", methods=["POST"])
+@login_required
+@roles_required(*ADMIN_ONLY)
+def akun_edit(account_id):
+    account = Account.query.get_or_404(account_id)
+
+    code = (request.form.get("code") or "").strip().upper()
+    name = (request.form.get("name") or "").strip()
+    acc_type = (request.form.get("type") or "").strip().lower()
+    parent_id = request.form.get("parent_id")
+    is_active = request.form.get("is_active", "1") == "1"
+
+    valid_types = {"asset", "liability", "equity", "income", "expense"}
+    if not code or not name or acc_type not in valid_types:
+        flash("Kode, nama, dan tipe akun wajib diisi.", "warning")
+        return redirect(url_for("main.akun", edit=account.id))
+    if Account.query.filter(Account.code == code, Account.id != account.id).first():
+        flash(f"Kode akun {code} sudah digunakan.", "warning")
+        return redirect(url_for("main.akun", edit=account.id))
+
+    parent = None
+    if parent_id:
+        try:
+            parent = db.session.get(Account, int(parent_id))
+        except (TypeError, ValueError):
+            parent = None
+    if parent and parent.id == account.id:
+        flash("Akun induk tidak boleh sama dengan akun yang diedit.", "warning")
+        return redirect(url_for("main.akun", edit=account.id))
+
+    account.code = code
+    account.name = name
+    account.type = acc_type
+    account.parent = parent
+    account.is_active = is_active
+    db.session.commit()
+    flash("Akun berhasil diperbarui.", "success")
+    return redirect(url_for("main.akun"))
+
+
+@bp.route("/akun/toggle/<int:account_id>", methods=["POST"])
+@login_required
+@roles_required(*ADMIN_ONLY)
+def akun_toggle(account_id):
+    account = Account.query.get_or_404(account_id)
+    account.is_active = not account.is_active
+    db.session.commit()
+    status_label = "diaktifkan" if account.is_active else "dinonaktifkan"
+    flash(f"Akun berhasil {status_label}.", "success")
+    return redirect(url_for("main.akun"))
+
+
+@bp.route("/akun/delete/<int:account_id>", methods=["POST"])
+@login_required
+@roles_required(*ADMIN_ONLY)
+def akun_delete(account_id):
+    account = Account.query.get_or_404(account_id)
+
+    has_children = Account.query.filter_by(parent_id=account.id).first() is not None
+    has_journal = (
+        JournalLine.query.filter_by(account_id=account.id).first() is not None
+    )
+    used_in_settings = (
+        AccountingSetting.query.filter(
+            or_(
+                AccountingSetting.inventory_account_id == account.id,
+                AccountingSetting.cogs_account_id == account.id,
+                AccountingSetting.inventory_adjustment_account_id == account.id,
+                AccountingSetting.marketplace_expense_account_id == account.id,
+                AccountingSetting.marketplace_payable_account_id == account.id,
+            )
+        ).first()
+        is not None
+    )
+
+    if has_children:
+        flash(
+            "Akun ini memiliki akun turunan. Hapus/ubah dulu akun turunannya.",
+            "warning",
+        )
+        return redirect(url_for("main.akun"))
+    if has_journal or used_in_settings:
+        flash(
+            "Akun ini sudah digunakan. Nonaktifkan saja agar laporan tetap konsisten.",
+            "warning",
+        )
+        return redirect(url_for("main.akun"))
+
+    db.session.delete(account)
+    db.session.commit()
+    flash("Akun berhasil dihapus.", "success")
+    return redirect(url_for("main.akun"))
+
+
+@bp.route("/saldo-awal", methods=["GET", "POST"])
+@login_required
+@roles_required(*ADMIN_ONLY)
+def saldo_awal():
+
+    accounts = Account.query.order_by(Account.code.asc()).all()
+    today = local_today()
+    default_date = today.replace(month=1, day=1)
+
+    if request.method == "POST":
+        date_value = _parse_date_param(request.form.get("date")) or default_date
+        memo_note = (request.form.get("memo") or "").strip()
+        total_debit = 0.0
+        total_credit = 0.0
+        lines = []
+
+        for account in accounts:
+            raw_debit = (request.form.get(f"debit_{account.id}") or "").strip()
+            raw_credit = (request.form.get(f"credit_{account.id}") or "").strip()
+            debit = _parse_float_param(raw_debit) if raw_debit else 0.0
+            credit = _parse_float_param(raw_credit) if raw_credit else 0.0
+
+            if debit is None or credit is None:
+                flash(
+                    f"Nominal tidak valid untuk akun {account.code}.",
+                    "warning",
+                )
+                return redirect(url_for("main.saldo_awal"))
+            if debit < 0 or credit < 0:
+                flash(
+                    f"Nominal negatif tidak diperbolehkan untuk akun {account.code}.",
+                    "warning",
+                )
+                return redirect(url_for("main.saldo_awal"))
+            if debit and credit:
+                flash(
+                    f"Akun {account.code} tidak boleh diisi debit dan kredit bersamaan.",
+                    "warning",
+                )
+                return redirect(url_for("main.saldo_awal"))
+            if debit or credit:
+                lines.append(
+                    {
+                        "account_id": account.id,
+                        "debit": float(debit or 0.0),
+                        "credit": float(credit or 0.0),
+                        "description": memo_note or None,
+                    }
+                )
+                total_debit += float(debit or 0.0)
+                total_credit += float(credit or 0.0)
+
+        if not lines:
+            flash("Isi minimal satu saldo awal.", "warning")
+            return redirect(url_for("main.saldo_awal"))
+        if round(total_debit, 2) != round(total_credit, 2):
+            flash("Total debit dan kredit harus seimbang.", "warning")
+            return redirect(url_for("main.saldo_awal"))
+
+        memo_prefix = "Saldo Awal"
+        memo = f"{memo_prefix} - {memo_note}" if memo_note else memo_prefix
+        entry = JournalEntry(
+            reference=_generate_journal_reference_with_prefix("SA"),
+            date=date_value,
+            memo=memo,
+            created_by=session.get("user_id"),
+        )
+        db.session.add(entry)
+        db.session.flush()
+
+        for line in lines:
+            db.session.add(
+                JournalLine(
+                    entry_id=entry.id,
+                    account_id=line["account_id"],
+                    description=line["description"],
+                    debit=line["debit"],
+                    credit=line["credit"],
+                )
+            )
+        db.session.commit()
+        flash("Saldo awal berhasil disimpan.", "success")
+        return redirect(url_for("main.saldo_awal"))
+
+    recent_entries = (
+        JournalEntry.query.options(
+            joinedload(JournalEntry.lines).joinedload(JournalLine.account)
+        )
+        .filter(JournalEntry.memo.ilike("Saldo Awal%"))
+        .order_by(JournalEntry.date.desc(), JournalEntry.id.desc())
+        .limit(5)
+        .all()
+    )
+
+    type_labels = {
+        "asset": "Aset",
+        "liability": "Liabilitas",
+        "equity": "Ekuitas",
+        "income": "Pendapatan",
+        "expense": "Beban",
+    }
+    normal_side = {
+        "asset": "Debit",
+        "expense": "Debit",
+        "liability": "Kredit",
+        "equity": "Kredit",
+        "income": "Kredit",
+    }
+
+    return render_template(
+        "saldo_awal.html",
+        accounts=accounts,
+        recent_entries=recent_entries,
+        default_date=default_date.strftime("%Y-%m-%d"),
+        type_labels=type_labels,
+        normal_side=normal_side,
+    )
+
+
+@bp.route("/pengaturan-akuntansi", methods=["GET", "POST"])
+@login_required
+@roles_required(*ADMIN_ONLY)
+def accounting_settings():
+    accounts = Account.query.order_by(Account.code.asc()).all()
+    settings = _get_accounting_setting()
+    auto_filter = JournalEntry.memo.ilike("Auto COGS%")
+
+    if request.method == "POST":
+        inventory_account_id = _parse_int_param(request.form.get("inventory_account"))
+        cogs_account_id = _parse_int_param(request.form.get("cogs_account"))
+        inventory_adjustment_account_id = _parse_int_param(
+            request.form.get("inventory_adjustment_account")
+        )
+        marketplace_expense_account_id = _parse_int_param(
+            request.form.get("marketplace_expense_account")
+        )
+        marketplace_payable_account_id = _parse_int_param(
+            request.form.get("marketplace_payable_account")
+        )
+        errors = []
+
+        if inventory_account_id:
+            if not db.session.get(Account, inventory_account_id):
+                errors.append("Akun persediaan tidak ditemukan.")
+
+        if cogs_account_id:
+            if not db.session.get(Account, cogs_account_id):
+                errors.append("Akun COGS tidak ditemukan.")
+
+        if inventory_adjustment_account_id:
+            if not db.session.get(Account, inventory_adjustment_account_id):
+                errors.append("Akun penyesuaian persediaan tidak ditemukan.")
+
+        if marketplace_expense_account_id:
+            if not db.session.get(Account, marketplace_expense_account_id):
+                errors.append("Akun beban marketplace tidak ditemukan.")
+
+        if marketplace_payable_account_id:
+            if not db.session.get(Account, marketplace_payable_account_id):
+                errors.append("Akun utang marketplace tidak ditemukan.")
+
+        if (
+            marketplace_expense_account_id
+            and marketplace_payable_account_id
+            and marketplace_expense_account_id == marketplace_payable_account_id
+        ):
+            errors.append(
+                "Akun beban dan utang marketplace tidak boleh sama."
+            )
+        if (
+            inventory_adjustment_account_id
+            and inventory_account_id
+            and inventory_adjustment_account_id == inventory_account_id
+        ):
+            errors.append(
+                "Akun penyesuaian persediaan tidak boleh sama dengan akun persediaan."
+            )
+
+        if errors:
+            for message in errors:
+                flash(message, "warning")
+            return redirect(url_for("main.accounting_settings"))
+
+        if not settings:
+            settings = AccountingSetting()
+
+        settings.inventory_account_id = inventory_account_id
+        settings.cogs_account_id = cogs_account_id
+        settings.inventory_adjustment_account_id = inventory_adjustment_account_id
+        settings.marketplace_expense_account_id = marketplace_expense_account_id
+        settings.marketplace_payable_account_id = marketplace_payable_account_id
+        settings.updated_by = session.get("user_id")
+        settings.updated_at = local_now()
+
+        db.session.add(settings)
+        db.session.commit()
+        flash("Pengaturan akuntansi otomatis berhasil disimpan.", "success")
+        return redirect(url_for("main.accounting_settings"))
+
+    auto_count = JournalEntry.query.filter(auto_filter).count()
+    auto_total_amount = (
+        db.session.query(func.coalesce(func.sum(JournalLine.debit), 0))
+        .join(JournalEntry, JournalLine.entry_id == JournalEntry.id)
+        .filter(auto_filter)
+        .scalar()
+        or 0.0
+    )
+    recent_entries = (
+        JournalEntry.query.options(joinedload(JournalEntry.lines).joinedload(JournalLine.account))
+        .filter(auto_filter)
+        .order_by(JournalEntry.date.desc(), JournalEntry.id.desc())
+        .limit(5)
+        .all()
+    )
+    recent_auto = [
+        {
+            "reference": entry.reference,
+            "date_label": _format_date_id(entry.date),
+            "memo": entry.memo or "Auto COGS",
+            "amount": sum(line.debit for line in entry.lines),
+        }
+        for entry in recent_entries
+    ]
+
+    return render_template(
+        "accounting_settings.html",
+        accounts=accounts,
+        settings=settings,
+        auto_total_amount=auto_total_amount,
+        auto_count=auto_count,
+        recent_auto=recent_auto,
+    )
+
+
+@bp.route("/tutup-buku", methods=["GET", "POST"])
+@login_required
+@roles_required(*ADMIN_ONLY)
+def close_books():
+    today = local_today()
+    open_period = (
+        AccountingPeriod.query.filter_by(status="open")
+        .order_by(AccountingPeriod.start_date.desc())
+        .first()
+    )
+    if open_period:
+        default_start = open_period.start_date
+        default_end = open_period.end_date
+    else:
+        first_day = today.replace(day=1)
+        prev_month_end = first_day - timedelta(days=1)
+        default_start = prev_month_end.replace(day=1)
+        default_end = prev_month_end
+
+    start_date = _parse_date_param(request.args.get("start_date")) or default_start
+    end_date = _parse_date_param(request.args.get("end_date")) or default_end
+    summary = _build_period_metrics(start_date, end_date)
+
+    open_periods = (
+        AccountingPeriod.query.filter(AccountingPeriod.status == "open")
+        .order_by(AccountingPeriod.start_date.desc())
+        .all()
+    )
+    recent_closed = (
+        AccountingPeriod.query.filter(AccountingPeriod.status == "closed")
+        .order_by(AccountingPeriod.closed_at.desc())
+        .limit(5)
+        .all()
+    )
+
+    warning_message = None
+    if summary and summary["difference"] != 0:
+        warning_message = (
+            f"Rekonsiliasi menunjukkan selisih Rp "
+            f"{('{:,.0f}'.format(abs(summary['difference']))).replace(',', '.')} "
+            f"antara nilai persediaan dan HPP."
+        )
+
+    if request.method == "POST":
+        label = (request.form.get("label") or "").strip()
+        description = (request.form.get("description") or "").strip()
+        form_start = _parse_date_param(request.form.get("start_date"))
+        form_end = _parse_date_param(request.form.get("end_date"))
+        if not form_start or not form_end:
+            flash("Tanggal awal dan akhir periode wajib diisi.", "warning")
+        else:
+            try:
+                _close_accounting_period(label, form_start, form_end, session.get("user_id"), description or None)
+                db.session.commit()
+                flash(f"Periode {label or form_start.strftime('%b %Y')} berhasil ditutup.", "success")
+                return redirect(
+                    url_for(
+                        "main.close_books",
+                        start_date=form_start.strftime("%Y-%m-%d"),
+                        end_date=form_end.strftime("%Y-%m-%d"),
+                    )
+                )
+            except ValueError as exc:
+                db.session.rollback()
+                flash(str(exc), "warning")
+            except Exception as exc:
+                db.session.rollback()
+                logging.exception("Gagal menutup periode")
+                flash(f"Gagal menutup periode: {str(exc)}", "danger")
+        start_date = form_start or start_date
+        end_date = form_end or end_date
+        summary = _build_period_metrics(start_date, end_date)
+        if summary and summary["difference"] != 0:
+            warning_message = (
+                f"Rekonsiliasi menunjukkan selisih Rp "
+                f"{('{:,.0f}'.format(abs(summary['difference']))).replace(',', '.')} "
+                f"antara nilai persediaan dan HPP."
+            )
+
+    selected_range = {
+        "start_date": start_date.strftime("%Y-%m-%d") if start_date else "",
+        "end_date": end_date.strftime("%Y-%m-%d") if end_date else "",
+    }
+
+    return render_template(
+        "accounting_close.html",
+        open_periods=open_periods,
+        recent_closed=recent_closed,
+        summary=summary,
+        selected_range=selected_range,
+        warning_message=warning_message,
+    )
+
+
+@bp.route("/jurnal", methods=["GET", "POST"])
+@login_required
+@roles_required(*ADMIN_ONLY)
+def jurnal():
+
+    if request.method == "POST":
+        if not request.is_json:
+            return jsonify({"success": False, "message": "Gunakan JSON payload."}), 415
+        payload = request.get_json(silent=True) or {}
+        parsed_lines, error_message = _parse_journal_lines(payload)
+        if error_message:
+            return jsonify({"success": False, "message": error_message}), 400
+
+        date_value = _parse_date_param(payload.get("date")) or local_today()
+        memo = (payload.get("memo") or "").strip()
+        reference = (
+            payload.get("reference") or ""
+        ).strip() or _generate_journal_reference()
+
+        entry = JournalEntry(
+            reference=reference,
+            date=date_value,
+            memo=memo or None,
+            created_by=session.get("user_id"),
+        )
+        db.session.add(entry)
+        db.session.flush()
+
+        for line in parsed_lines:
+            db.session.add(
+                JournalLine(
+                    entry_id=entry.id,
+                    account_id=line["account"].id,
+                    description=line["description"] or None,
+                    debit=line["debit"],
+                    credit=line["credit"],
+                )
+            )
+        db.session.commit()
+        return jsonify(
+            {
+                "success": True,
+                "message": "Jurnal berhasil disimpan.",
+                "reference": reference,
+            }
+        )
+
+    accounts = Account.query.order_by(Account.code.asc()).all()
+    accounts_for_js = [
+        {
+            "id": account.id,
+            "code": account.code,
+            "name": account.name,
+        }
+        for account in accounts
+    ]
+    exclude_adjustment = or_(
+        JournalEntry.memo.is_(None), ~JournalEntry.memo.ilike("Penyesuaian%")
+    )
+    exclude_opening = or_(
+        JournalEntry.memo.is_(None), ~JournalEntry.memo.ilike("Saldo Awal%")
+    )
+    recent_entries = (
+        JournalEntry.query.options(
+            joinedload(JournalEntry.lines).joinedload(JournalLine.account)
+        )
+        .filter(exclude_adjustment, exclude_opening)
+        .order_by(JournalEntry.date.desc(), JournalEntry.id.desc())
+        .limit(10)
+        .all()
+    )
+    net_expr = case(
+        (
+            Penjualan.total_harga
+            - func.coalesce(Penjualan.marketplace_cost_total, 0)
+            < 0,
+            0,
+        ),
+        else_=Penjualan.total_harga
+        - func.coalesce(Penjualan.marketplace_cost_total, 0),
+    )
+    total_net_revenue = (
+        db.session.query(func.coalesce(func.sum(net_expr), 0)).scalar() or 0.0
+    )
+    total_marketplace_cost = (
+        db.session.query(func.coalesce(func.sum(Penjualan.marketplace_cost_total), 0)).scalar()
+        or 0.0
+    )
+
+    return render_template(
+        "jurnal.html",
+        accounts=accounts,
+        accounts_for_js=accounts_for_js,
+        recent_entries=recent_entries,
+        default_date=local_today().strftime("%Y-%m-%d"),
+        net_revenue_total=total_net_revenue,
+        marketplace_cost_total=total_marketplace_cost,
+    )
+
+
+@bp.route("/jurnal-penyesuaian", methods=["GET", "POST"])
+@login_required
+@roles_required(*ADMIN_ONLY)
+def jurnal_penyesuaian():
+
+    if request.method == "POST":
+        if not request.is_json:
+            return jsonify({"success": False, "message": "Gunakan JSON payload."}), 415
+        payload = request.get_json(silent=True) or {}
+        parsed_lines, error_message = _parse_journal_lines(payload)
+        if error_message:
+            return jsonify({"success": False, "message": error_message}), 400
+
+        date_value = _parse_date_param(payload.get("date")) or local_today()
+        memo_raw = (payload.get("memo") or "").strip()
+        memo_prefix = "Penyesuaian"
+        if memo_raw:
+            memo_lower = memo_raw.lower()
+            memo = (
+                memo_raw
+                if memo_lower.startswith(("penyesuaian", "jurnal penyesuaian"))
+                else f"{memo_prefix} - {memo_raw}"
+            )
+        else:
+            memo = memo_prefix
+        reference = (
+            payload.get("reference") or ""
+        ).strip() or _generate_journal_reference_with_prefix("JP")
+
+        entry = JournalEntry(
+            reference=reference,
+            date=date_value,
+            memo=memo,
+            created_by=session.get("user_id"),
+        )
+        db.session.add(entry)
+        db.session.flush()
+
+        for line in parsed_lines:
+            db.session.add(
+                JournalLine(
+                    entry_id=entry.id,
+                    account_id=line["account"].id,
+                    description=line["description"] or None,
+                    debit=line["debit"],
+                    credit=line["credit"],
+                )
+            )
+        db.session.commit()
+        return jsonify(
+            {
+                "success": True,
+                "message": "Jurnal penyesuaian berhasil disimpan.",
+                "reference": reference,
+            }
+        )
+
+    accounts = Account.query.order_by(Account.code.asc()).all()
+    accounts_for_js = [
+        {
+            "id": account.id,
+            "code": account.code,
+            "name": account.name,
+        }
+        for account in accounts
+    ]
+    recent_entries = (
+        JournalEntry.query.options(
+            joinedload(JournalEntry.lines).joinedload(JournalLine.account)
+        )
+        .filter(JournalEntry.memo.ilike("Penyesuaian%"))
+        .order_by(JournalEntry.date.desc(), JournalEntry.id.desc())
+        .limit(10)
+        .all()
+    )
+
+    return render_template(
+        "jurnal_penyesuaian.html",
+        accounts=accounts,
+        accounts_for_js=accounts_for_js,
+        recent_entries=recent_entries,
+        default_date=local_today().strftime("%Y-%m-%d"),
+    )
+
+
+@bp.route("/buku-besar", methods=["GET"])
+@login_required
+@roles_required(*ADMIN_ONLY)
+def buku_besar():
+
+    today = local_today()
+    default_start = today.replace(day=1)
+    start_date = _parse_date_param(request.args.get("start_date")) or default_start
+    end_date = _parse_date_param(request.args.get("end_date")) or today
+    if end_date < start_date:
+        start_date, end_date = end_date, start_date
+
+    account_id = _parse_int_param(request.args.get("account"))
+    accounts = Account.query.order_by(Account.code.asc()).all()
+    selected_account = db.session.get(Account, account_id) if account_id else None
+
+    ledger_rows = []
+    summary_rows = []
+    summary_totals = {"debit": 0.0, "credit": 0.0}
+    opening_balance = 0.0
+    total_debit = 0.0
+    total_credit = 0.0
+    closing_balance = 0.0
+
+    type_labels = {
+        "asset": "Aset",
+        "liability": "Liabilitas",
+        "equity": "Ekuitas",
+        "income": "Pendapatan",
+        "expense": "Beban",
+    }
+
+    if selected_account:
+        opening_balance = ledger_opening_balance(selected_account.id, start_date)
+
+        entries = (
+            db.session.query(JournalLine, JournalEntry)
+            .join(JournalEntry, JournalLine.entry_id == JournalEntry.id)
+            .filter(JournalLine.account_id == selected_account.id)
+            .filter(JournalEntry.date >= start_date)
+            .filter(JournalEntry.date <= end_date)
+            .order_by(
+                JournalEntry.date.asc(),
+                JournalEntry.id.asc(),
+                JournalLine.id.asc(),
+            )
+            .all()
+        )
+
+        running_balance = opening_balance
+        for line, entry in entries:
+            debit = float(line.debit or 0.0)
+            credit = float(line.credit or 0.0)
+            total_debit += debit
+            total_credit += credit
+            running_balance += debit - credit
+            ledger_rows.append(
+                {
+                    "date_label": _format_date_id(entry.date),
+                    "reference": entry.reference,
+                    "memo": entry.memo or "-",
+                    "description": line.description or "-",
+                    "debit": debit,
+                    "credit": credit,
+                    "balance": running_balance,
+                }
+            )
+        closing_balance = running_balance
+    else:
+        line_sums = (
+            db.session.query(
+                JournalLine.account_id.label("account_id"),
+                func.coalesce(func.sum(JournalLine.debit), 0.0).label("debit"),
+                func.coalesce(func.sum(JournalLine.credit), 0.0).label("credit"),
+            )
+            .join(JournalEntry, JournalLine.entry_id == JournalEntry.id)
+            .filter(JournalEntry.date >= start_date)
+            .filter(JournalEntry.date <= end_date)
+            .group_by(JournalLine.account_id)
+            .subquery()
+        )
+
+        rows = (
+            db.session.query(
+                Account,
+                line_sums.c.debit,
+                line_sums.c.credit,
+            )
+            .outerjoin(line_sums, line_sums.c.account_id == Account.id)
+            .order_by(Account.code.asc())
+            .all()
+        )
+
+        for account, debit, credit in rows:
+            debit = float(debit or 0.0)
+            credit = float(credit or 0.0)
+            if debit == 0 and credit == 0:
+                continue
+            net = debit - credit
+            summary_rows.append(
+                {
+                    "account_id": account.id,
+                    "code": account.code,
+                    "name": account.name,
+                    "type_label": type_labels.get(account.type, account.type.title()),
+                    "debit": debit,
+                    "credit": credit,
+                    "balance": abs(net),
+                    "balance_side": "Debit" if net >= 0 else "Kredit",
+                }
+            )
+            summary_totals["debit"] += debit
+            summary_totals["credit"] += credit
+
+    summary_cards = []
+    if selected_account:
+        summary_cards = [
+            {
+                "label": "Saldo Awal",
+                "value": opening_balance,
+                "icon": "fa-coins",
+                "accent": "text-secondary",
+            },
+            {
+                "label": "Total Debit",
+                "value": total_debit,
+                "icon": "fa-arrow-down",
+                "accent": "text-success",
+            },
+            {
+                "label": "Total Kredit",
+                "value": total_credit,
+                "icon": "fa-arrow-up",
+                "accent": "text-danger",
+            },
+            {
+                "label": "Saldo Akhir",
+                "value": closing_balance,
+                "icon": "fa-balance-scale",
+                "accent": "text-primary",
+            },
+        ]
+
+    range_label = f"{_format_date_id(start_date)} - {_format_date_id(end_date)}"
+    filter_values = {
+        "start_date": start_date.strftime("%Y-%m-%d"),
+        "end_date": end_date.strftime("%Y-%m-%d"),
+        "account": selected_account.id if selected_account else None,
+    }
+
+    return render_template(
+        "buku_besar.html",
+        accounts=accounts,
+        selected_account=selected_account,
+        ledger_rows=ledger_rows,
+        summary_rows=summary_rows,
+        summary_totals=summary_totals,
+        summary_cards=summary_cards,
+        total_debit=total_debit,
+        total_credit=total_credit,
+        opening_balance=opening_balance,
+        closing_balance=closing_balance,
+        range_label=range_label,
+        filter_values=filter_values,
+    )
+
+
+@bp.route("/neraca-saldo", methods=["GET"])
+@login_required
+@roles_required(*ADMIN_ONLY)
+def neraca_saldo():
+
+    today = local_today()
+    default_start = today.replace(day=1)
+    start_date = _parse_date_param(request.args.get("start_date")) or default_start
+    end_date = _parse_date_param(request.args.get("end_date")) or today
+    if end_date < start_date:
+        start_date, end_date = end_date, start_date
+
+    show_zero = _parse_bool_param(request.args.get("show_zero"), default=False)
+    movements = account_net_movements(start_date, end_date, exclude_adjustments=True)
+    accounts = Account.query.order_by(Account.code.asc()).all()
+
+    type_labels = {
+        "asset": "Aset",
+        "liability": "Liabilitas",
+        "equity": "Ekuitas",
+        "income": "Pendapatan",
+        "expense": "Beban",
+    }
+    normal_side = {
+        "asset": "Debit",
+        "expense": "Debit",
+        "liability": "Kredit",
+        "equity": "Kredit",
+        "income": "Kredit",
+    }
+
+    trial_rows = []
+    total_debit = 0.0
+    total_credit = 0.0
+    for account in accounts:
+        net = movements.get(account.id, 0.0)
+        debit_balance = net if net > 0 else 0.0
+        credit_balance = -net if net < 0 else 0.0
+        if not show_zero and debit_balance == 0 and credit_balance == 0:
+            continue
+        normal = normal_side.get(account.type, "Debit")
+        is_abnormal = (
+            (normal == "Debit" and credit_balance > 0)
+            or (normal == "Kredit" and debit_balance > 0)
+        )
+        trial_rows.append(
+            {
+                "code": account.code,
+                "name": account.name,
+                "type_label": type_labels.get(account.type, account.type.title()),
+                "debit": debit_balance,
+                "credit": credit_balance,
+                "normal_side": normal,
+                "is_abnormal": is_abnormal,
+            }
+        )
+        total_debit += debit_balance
+        total_credit += credit_balance
+
+    difference = round(total_debit - total_credit, 2)
+    warning_message = abs(difference) if difference != 0 else None
+
+    summary_cards = [
+        {
+            "label": "Total Debit",
+            "value": total_debit,
+            "icon": "fa-arrow-down",
+            "accent": "text-success",
+        },
+        {
+            "label": "Total Kredit",
+            "value": total_credit,
+            "icon": "fa-arrow-up",
+            "accent": "text-danger",
+        },
+        {
+            "label": "Selisih",
+            "value": abs(difference),
+            "icon": "fa-balance-scale",
+            "accent": "text-warning" if difference != 0 else "text-success",
+        },
+        {
+            "label": "Jumlah Akun",
+            "value": len(trial_rows),
+            "icon": "fa-layer-group",
+            "accent": "text-primary",
+            "type": "count",
+        },
+    ]
+
+    range_label = f"{_format_date_id(start_date)} - {_format_date_id(end_date)}"
+    filter_values = {
+        "start_date": start_date.strftime("%Y-%m-%d"),
+        "end_date": end_date.strftime("%Y-%m-%d"),
+        "show_zero": show_zero,
+    }
+
+    return render_template(
+        "neraca_saldo.html",
+        trial_rows=trial_rows,
+        summary_cards=summary_cards,
+        range_label=range_label,
+        filter_values=filter_values,
+        warning_message=warning_message,
+    )
+
+
+@bp.route("/kas-bank", methods=["GET", "POST"])
+@login_required
+@roles_required(*ADMIN_ONLY)
+def kas_bank():
+
+    cash_accounts = (
+        Account.query.filter_by(type="asset", is_active=True)
+        .order_by(Account.code.asc())
+        .all()
+    )
+    active_accounts = (
+        Account.query.filter_by(is_active=True)
+        .order_by(Account.code.asc())
+        .all()
+    )
+
+    if request.method == "POST":
+        date_value = _parse_date_param(request.form.get("date")) or local_today()
+        cash_account_id = _parse_int_param(request.form.get("account_id"))
+        offset_account_id = _parse_int_param(request.form.get("offset_account_id"))
+        direction = (request.form.get("direction") or "").strip()
+        amount = _parse_float_param(request.form.get("amount"))
+        note = (request.form.get("note") or "").strip()
+        next_target = _resolve_next_target(url_for("main.kas_bank"))
+
+        cash_account = (
+            db.session.get(Account, cash_account_id) if cash_account_id else None
+        )
+        offset_account = (
+            db.session.get(Account, offset_account_id) if offset_account_id else None
+        )
+
+        if not cash_account or cash_account.type != "asset":
+            flash("Pilih akun kas/bank yang valid.", "warning")
+            return redirect(next_target)
+        if not offset_account or not offset_account.is_active:
+            flash("Pilih akun lawan yang valid.", "warning")
+            return redirect(next_target)
+        if offset_account.id == cash_account.id:
+            flash("Akun lawan tidak boleh sama dengan akun kas/bank.", "warning")
+            return redirect(next_target)
+        if not amount or amount <= 0:
+            flash("Nominal koreksi harus lebih dari 0.", "warning")
+            return redirect(next_target)
+        if direction not in {"in", "out"}:
+            flash("Pilih jenis koreksi yang valid.", "warning")
+            return redirect(next_target)
+
+        memo_prefix = "Koreksi Kas/Bank"
+        memo = f"{memo_prefix} - {note}" if note else memo_prefix
+        entry = JournalEntry(
+            reference=_generate_journal_reference_with_prefix("KB"),
+            date=date_value,
+            memo=memo,
+            created_by=session.get("user_id"),
+        )
+        db.session.add(entry)
+        db.session.flush()
+
+        if direction == "in":
+            db.session.add(
+                JournalLine(
+                    entry_id=entry.id,
+                    account_id=cash_account.id,
+                    description=note or None,
+                    debit=amount,
+                    credit=0.0,
+                )
+            )
+            db.session.add(
+                JournalLine(
+                    entry_id=entry.id,
+                    account_id=offset_account.id,
+                    description=note or None,
+                    debit=0.0,
+                    credit=amount,
+                )
+            )
+        else:
+            db.session.add(
+                JournalLine(
+                    entry_id=entry.id,
+                    account_id=offset_account.id,
+                    description=note or None,
+                    debit=amount,
+                    credit=0.0,
+                )
+            )
+            db.session.add(
+                JournalLine(
+                    entry_id=entry.id,
+                    account_id=cash_account.id,
+                    description=note or None,
+                    debit=0.0,
+                    credit=amount,
+                )
+            )
+
+        db.session.commit()
+        flash("Koreksi kas/bank berhasil disimpan.", "success")
+        return redirect(next_target)
+
+    today = local_today()
+    default_start = today.replace(day=1)
+    start_date = _parse_date_param(request.args.get("start_date")) or default_start
+    end_date = _parse_date_param(request.args.get("end_date")) or today
+    if end_date < start_date:
+        start_date, end_date = end_date, start_date
+
+    account_id = _parse_int_param(request.args.get("account"))
+    selected_account = next(
+        (acc for acc in cash_accounts if acc.id == account_id), None
+    )
+
+    ledger_rows = []
+    summary_rows = []
+    summary_totals = {"debit": 0.0, "credit": 0.0}
+    opening_balance = 0.0
+    total_debit = 0.0
+    total_credit = 0.0
+    closing_balance = 0.0
+
+    if selected_account:
+        opening_balance = ledger_opening_balance(selected_account.id, start_date)
+
+        entries = (
+            db.session.query(JournalLine, JournalEntry)
+            .join(JournalEntry, JournalLine.entry_id == JournalEntry.id)
+            .filter(JournalLine.account_id == selected_account.id)
+            .filter(JournalEntry.date >= start_date)
+            .filter(JournalEntry.date <= end_date)
+            .order_by(
+                JournalEntry.date.asc(),
+                JournalEntry.id.asc(),
+                JournalLine.id.asc(),
+            )
+            .all()
+        )
+
+        running_balance = opening_balance
+        for line, entry in entries:
+            debit = float(line.debit or 0.0)
+            credit = float(line.credit or 0.0)
+            total_debit += debit
+            total_credit += credit
+            running_balance += debit - credit
+            ledger_rows.append(
+                {
+                    "date_label": _format_date_id(entry.date),
+                    "reference": entry.reference,
+                    "memo": entry.memo or "-",
+                    "description": line.description or "-",
+                    "debit": debit,
+                    "credit": credit,
+                    "balance": running_balance,
+                }
+            )
+        closing_balance = running_balance
+    else:
+        account_ids = [acc.id for acc in cash_accounts]
+        if account_ids:
+            line_sums = (
+                db.session.query(
+                    JournalLine.account_id.label("account_id"),
+                    func.coalesce(func.sum(JournalLine.debit), 0.0).label("debit"),
+                    func.coalesce(func.sum(JournalLine.credit), 0.0).label("credit"),
+                )
+                .join(JournalEntry, JournalLine.entry_id == JournalEntry.id)
+                .filter(JournalLine.account_id.in_(account_ids))
+                .filter(JournalEntry.date >= start_date)
+                .filter(JournalEntry.date <= end_date)
+                .group_by(JournalLine.account_id)
+                .subquery()
+            )
+
+            rows = (
+                db.session.query(
+                    Account,
+                    line_sums.c.debit,
+                    line_sums.c.credit,
+                )
+                .outerjoin(line_sums, line_sums.c.account_id == Account.id)
+                .filter(Account.id.in_(account_ids))
+                .order_by(Account.code.asc())
+                .all()
+            )
+
+            for account, debit, credit in rows:
+                debit = float(debit or 0.0)
+                credit = float(credit or 0.0)
+                if debit == 0 and credit == 0:
+                    continue
+                net = debit - credit
+                summary_rows.append(
+                    {
+                        "account_id": account.id,
+                        "code": account.code,
+                        "name": account.name,
+                        "debit": debit,
+                        "credit": credit,
+                        "balance": abs(net),
+                        "balance_side": "Debit" if net >= 0 else "Kredit",
+                    }
+                )
+                summary_totals["debit"] += debit
+                summary_totals["credit"] += credit
+
+    summary_cards = []
+    if selected_account:
+        summary_cards = [
+            {
+                "label": "Saldo Awal",
+                "value": opening_balance,
+                "icon": "fa-wallet",
+                "accent": "text-secondary",
+            },
+            {
+                "label": "Uang Masuk",
+                "value": total_debit,
+                "icon": "fa-arrow-down",
+                "accent": "text-success",
+            },
+            {
+                "label": "Uang Keluar",
+                "value": total_credit,
+                "icon": "fa-arrow-up",
+                "accent": "text-danger",
+            },
+            {
+                "label": "Saldo Akhir",
+                "value": closing_balance,
+                "icon": "fa-university",
+                "accent": "text-primary",
+            },
+        ]
+
+    range_label = f"{_format_date_id(start_date)} - {_format_date_id(end_date)}"
+    filter_values = {
+        "start_date": start_date.strftime("%Y-%m-%d"),
+        "end_date": end_date.strftime("%Y-%m-%d"),
+        "account": selected_account.id if selected_account else None,
+    }
+
+    offset_accounts = [
+        account
+        for account in active_accounts
+        if not selected_account or account.id != selected_account.id
+    ]
+
+    return render_template(
+        "kas_bank.html",
+        accounts=cash_accounts,
+        offset_accounts=offset_accounts,
+        selected_account=selected_account,
+        ledger_rows=ledger_rows,
+        summary_rows=summary_rows,
+        summary_totals=summary_totals,
+        summary_cards=summary_cards,
+        opening_balance=opening_balance,
+        total_debit=total_debit,
+        total_credit=total_credit,
+        closing_balance=closing_balance,
+        range_label=range_label,
+        filter_values=filter_values,
+    )
+
+
+@bp.route("/aset-tetap", methods=["GET", "POST"])
+@login_required
+@roles_required(*ADMIN_ONLY)
+def aset_tetap():
+
+    if request.method == "POST":
+        name = (request.form.get("name") or "").strip()
+        category = (request.form.get("category") or "").strip() or None
+        acquisition_date = _parse_date_param(request.form.get("acquisition_date"))
+        cost = _parse_float_param(request.form.get("cost"))
+        salvage_value = _parse_float_param(request.form.get("salvage_value"))
+        useful_life_months = _parse_int_param(request.form.get("useful_life_months"))
+        method = (request.form.get("method") or "straight_line").strip()
+        note = (request.form.get("note") or "").strip() or None
+        is_active = request.form.get("is_active") != "0"
+        next_target = _resolve_next_target(url_for("main.aset_tetap"))
+
+        salvage_value = max(salvage_value or 0.0, 0.0)
+        useful_life_months = useful_life_months or 0
+
+        if not name:
+            flash("Nama aset wajib diisi.", "warning")
+            return redirect(next_target)
+        if not acquisition_date:
+            flash("Tanggal perolehan wajib diisi.", "warning")
+            return redirect(next_target)
+        if cost is None or cost <= 0:
+            flash("Biaya perolehan harus lebih dari 0.", "warning")
+            return redirect(next_target)
+        if useful_life_months <= 0:
+            flash("Umur manfaat wajib lebih dari 0 bulan.", "warning")
+            return redirect(next_target)
+        if salvage_value > cost:
+            flash("Nilai sisa tidak boleh lebih besar dari biaya perolehan.", "warning")
+            return redirect(next_target)
+        if method not in {"straight_line"}:
+            method = "straight_line"
+
+        asset = FixedAsset(
+            name=name,
+            category=category,
+            acquisition_date=acquisition_date,
+            cost=cost,
+            salvage_value=salvage_value,
+            useful_life_months=useful_life_months,
+            method=method,
+            note=note,
+            is_active=is_active,
+            created_by=session.get("user_id"),
+        )
+        db.session.add(asset)
+        db.session.commit()
+        flash("Aset tetap berhasil disimpan.", "success")
+        return redirect(next_target)
+
+    search_query = (request.args.get("search") or "").strip()
+    status_filter = (request.args.get("status") or "active").strip()
+    as_of_date = _parse_date_param(request.args.get("as_of")) or local_today()
+
+    asset_query = FixedAsset.query
+    if status_filter == "active":
+        asset_query = asset_query.filter(FixedAsset.is_active.is_(True))
+    elif status_filter == "inactive":
+        asset_query = asset_query.filter(FixedAsset.is_active.is_(False))
+
+    if search_query:
+        like = f"%{search_query}%"
+        asset_query = asset_query.filter(
+            or_(
+                FixedAsset.name.ilike(like),
+                FixedAsset.category.ilike(like),
+            )
+        )
+
+    assets = (
+        asset_query.order_by(
+            FixedAsset.acquisition_date.desc(), FixedAsset.id.desc()
+        )
+        .all()
+    )
+
+    asset_rows = []
+    total_cost = 0.0
+    total_accumulated = 0.0
+    total_book = 0.0
+
+    for asset in assets:
+        cost = float(asset.cost or 0.0)
+        salvage = float(asset.salvage_value or 0.0)
+        life_months = int(asset.useful_life_months or 0) or 1
+        months_elapsed = _months_between(asset.acquisition_date, as_of_date)
+        months_used = min(months_elapsed, life_months)
+        depreciable_base = max(cost - salvage, 0.0)
+        monthly_depreciation = (
+            depreciable_base / life_months if life_months > 0 else 0.0
+        )
+        accumulated = round(monthly_depreciation * months_used, 2)
+        book_value = max(cost - accumulated, 0.0)
+
+        total_cost += cost
+        total_accumulated += accumulated
+        total_book += book_value
+
+        asset_rows.append(
+            {
+                "id": asset.id,
+                "name": asset.name,
+                "category": asset.category or "-",
+                "acquisition_date": asset.acquisition_date,
+                "cost": cost,
+                "salvage_value": salvage,
+                "life_months": life_months,
+                "method": asset.method,
+                "note": asset.note or "",
+                "months_used": months_used,
+                "monthly_depreciation": monthly_depreciation,
+                "accumulated": accumulated,
+                "book_value": book_value,
+                "status_label": "Aktif" if asset.is_active else "Nonaktif",
+                "status_badge": "badge-soft-success"
+                if asset.is_active
+                else "badge-soft-secondary",
+            }
+        )
+
+    summary_cards = [
+        {
+            "label": "Total biaya aset",
+            "value": total_cost,
+            "type": "currency",
+            "icon": "fa-cubes",
+            "accent": "text-primary",
+            "description": "Akumulasi biaya perolehan aset.",
+        },
+        {
+            "label": "Akumulasi penyusutan",
+            "value": total_accumulated,
+            "type": "currency",
+            "icon": "fa-chart-line",
+            "accent": "text-warning",
+            "description": "Total penyusutan sampai tanggal pilihan.",
+        },
+        {
+            "label": "Nilai buku",
+            "value": total_book,
+            "type": "currency",
+            "icon": "fa-balance-scale",
+            "accent": "text-success",
+            "description": "Nilai aset setelah penyusutan.",
+        },
+        {
+            "label": "Jumlah aset",
+            "value": len(asset_rows),
+            "type": "count",
+            "icon": "fa-layer-group",
+            "accent": "text-secondary",
+            "description": "Jumlah aset di daftar.",
+        },
+    ]
+
+    filter_values = {
+        "search": search_query,
+        "status": status_filter,
+        "as_of": as_of_date.strftime("%Y-%m-%d"),
+    }
+
+    return render_template(
+        "aset_tetap.html",
+        asset_rows=asset_rows,
+        summary_cards=summary_cards,
+        filter_values=filter_values,
+        as_of_label=_format_date_id(as_of_date),
+        format_date=_format_date_id,
+    )
+
+
+@bp.route("/biaya-operasional", methods=["GET", "POST"])
+@login_required
+@roles_required(*ADMIN_ONLY)
+def biaya_operasional():
+
+    expense_accounts = (
+        Account.query.filter_by(type="expense", is_active=True)
+        .order_by(Account.code.asc())
+        .all()
+    )
+    payment_accounts = (
+        Account.query.filter(
+            Account.is_active.is_(True),
+            Account.type.in_(["asset", "liability"]),
+        )
+        .order_by(Account.code.asc())
+        .all()
+    )
+
+    if request.method == "POST":
+        date_value = _parse_date_param(request.form.get("date")) or local_today()
+        expense_account_id = _parse_int_param(request.form.get("expense_account"))
+        payment_account_id = _parse_int_param(request.form.get("payment_account"))
+        amount = _parse_float_param(request.form.get("amount"))
+        note = (request.form.get("note") or "").strip()
+
+        if not amount or amount <= 0:
+            flash("Nominal biaya harus lebih dari 0.", "warning")
+            return redirect(url_for("main.biaya_operasional"))
+
+        expense_account = (
+            db.session.get(Account, expense_account_id) if expense_account_id else None
+        )
+        payment_account = (
+            db.session.get(Account, payment_account_id) if payment_account_id else None
+        )
+
+        if (
+            not expense_account
+            or not expense_account.is_active
+            or expense_account.type != "expense"
+        ):
+            flash("Pilih akun beban yang valid.", "warning")
+            return redirect(url_for("main.biaya_operasional"))
+
+        if (
+            not payment_account
+            or not payment_account.is_active
+            or payment_account.type not in ("asset", "liability")
+        ):
+            flash("Pilih akun pembayaran (kas/bank/utang) yang valid.", "warning")
+            return redirect(url_for("main.biaya_operasional"))
+
+        memo_core = note or expense_account.name
+        memo = f"Biaya Operasional - {memo_core}".strip()
+        reference = _generate_journal_reference()
+        entry = JournalEntry(
+            reference=reference,
+            date=date_value,
+            memo=memo,
+            created_by=session.get("user_id"),
+        )
+        db.session.add(entry)
+        db.session.flush()
+        db.session.add(
+            JournalLine(
+                entry_id=entry.id,
+                account_id=expense_account.id,
+                description=note or None,
+                debit=amount,
+                credit=0.0,
+            )
+        )
+        db.session.add(
+            JournalLine(
+                entry_id=entry.id,
+                account_id=payment_account.id,
+                description=note or None,
+                debit=0.0,
+                credit=amount,
+            )
+        )
+        db.session.commit()
+        flash("Biaya operasional berhasil disimpan.", "success")
+        return redirect(url_for("main.biaya_operasional"))
+
+    recent_entries = (
+        JournalEntry.query.options(
+            joinedload(JournalEntry.lines).joinedload(JournalLine.account)
+        )
+        .filter(JournalEntry.memo.like("Biaya Operasional%"))
+        .order_by(JournalEntry.date.desc(), JournalEntry.id.desc())
+        .limit(12)
+        .all()
+    )
+
+    display_entries = []
+    for entry in recent_entries:
+        expense_line = next(
+            (line for line in entry.lines if line.debit and line.debit > 0), None
+        )
+        payment_line = next(
+            (line for line in entry.lines if line.credit and line.credit > 0), None
+        )
+        display_entries.append(
+            {
+                "reference": entry.reference,
+                "date": entry.date,
+                "memo": entry.memo or "",
+                "amount": expense_line.debit if expense_line else 0.0,
+                "expense_account": expense_line.account if expense_line else None,
+                "payment_account": payment_line.account if payment_line else None,
+            }
+        )
+
+    today = local_today()
+    month_start = today.replace(day=1)
+    base_expense_filter = [
+        JournalEntry.memo.like("Biaya Operasional%"),
+        JournalLine.debit > 0,
+    ]
+    total_today = (
+        db.session.query(func.coalesce(func.sum(JournalLine.debit), 0))
+        .join(JournalEntry)
+        .filter(*base_expense_filter, JournalEntry.date == today)
+        .scalar()
+        or 0.0
+    )
+    total_month = (
+        db.session.query(func.coalesce(func.sum(JournalLine.debit), 0))
+        .join(JournalEntry)
+        .filter(
+            *base_expense_filter,
+            JournalEntry.date >= month_start,
+            JournalEntry.date <= today,
+        )
+        .scalar()
+        or 0.0
+    )
+    total_entries = (
+        db.session.query(func.count(JournalEntry.id))
+        .filter(JournalEntry.memo.like("Biaya Operasional%"))
+        .scalar()
+        or 0
+    )
+
+    return render_template(
+        "biaya_operasional.html",
+        expense_accounts=expense_accounts,
+        payment_accounts=payment_accounts,
+        recent_entries=display_entries,
+        default_date=today.strftime("%Y-%m-%d"),
+        total_today=total_today,
+        total_month=total_month,
+        total_entries=total_entries,
+    )
+
+
+def _build_period_metrics(start_date, end_date):
+    if not start_date or not end_date:
+        return None
+    if start_date > end_date:
+        return None
+
+    sales_total = (
+        db.session.query(func.coalesce(func.sum(Penjualan.total_harga), 0.0))
+        .filter(Penjualan.tanggal_penjualan >= start_date)
+        .filter(Penjualan.tanggal_penjualan <= end_date)
+        .scalar()
+        or 0.0
+    )
+
+    purchase_total = (
+        db.session.query(func.coalesce(func.sum(BarangPembelian.hpp), 0.0))
+        .join(Pembelian, BarangPembelian.pembelian)
+        .filter(Pembelian.tanggal_faktur >= start_date)
+        .filter(Pembelian.tanggal_faktur <= end_date)
+        .scalar()
+        or 0.0
+    )
+
+    # HPP memakai basis biaya yang sama dengan laporan laba rugi
+    # (hpp_satuan saat transaksi, biaya produk hanya untuk baris lama)
+    hpp_total = (
+        db.session.query(func.coalesce(func.sum(detail_line_columns()["cost"]), 0.0))
+        .select_from(DetailPenjualan)
+        .outerjoin(Produk, Produk.id == DetailPenjualan.produk_id)
+        .join(Penjualan, DetailPenjualan.penjualan)
+        .filter(Penjualan.tanggal_penjualan >= start_date)
+        .filter(Penjualan.tanggal_penjualan <= end_date)
+        .scalar()
+        or 0.0
+    )
+
+    inventory_value = (
+        db.session.query(
+            func.coalesce(
+                func.sum(
+                    Produk.stok_lama
+                    * func.coalesce(Produk.harga_lama, Produk.harga_beli, 0.0)
+                ),
+                0.0,
+            )
+        )
+        .scalar()
+        or 0.0
+    )
+
+    net_income = round(sales_total - hpp_total, 2)
+
+    return {
+        "sales_total": round(sales_total, 2),
+        "purchase_total": round(purchase_total, 2),
+        "hpp_total": round(hpp_total, 2),
+        "inventory_value": round(inventory_value, 2),
+        "net_income": net_income,
+        "difference": round(inventory_value - hpp_total, 2),
+    }
+
+
+def _close_accounting_period(label, start_date, end_date, user_id, description=None):
+    if not label:
+        raise ValueError("Label periode wajib diisi.")
+    if not start_date or not end_date:
+        raise ValueError("Tanggal awal dan akhir periode wajib diisi.")
+    if start_date > end_date:
+        raise ValueError("Tanggal awal tidak boleh melewati tanggal akhir.")
+
+    overlap_closed = AccountingPeriod.query.filter(
+        AccountingPeriod.start_date <= end_date,
+        AccountingPeriod.end_date >= start_date,
+        AccountingPeriod.is_locked == True,
+    ).first()
+    if overlap_closed:
+        raise ValueError(f"Periode {overlap_closed.label} sudah ditutup.")
+
+    period = AccountingPeriod.query.filter(
+        AccountingPeriod.start_date == start_date,
+        AccountingPeriod.end_date == end_date,
+        AccountingPeriod.status == "open",
+    ).first()
+
+    if not period:
+        period = AccountingPeriod(
+            label=label,
+            start_date=start_date,
+            end_date=end_date,
+            description=description,
+            created_by=user_id,
+        )
+        db.session.add(period)
+        db.session.flush()
+
+    period.label = label
+    period.status = "closed"
+    period.description = description or period.description
+    period.is_locked = True
+    period.closed_by = user_id
+    period.closed_at = local_now()
+
+    sales = (
+        Penjualan.query.filter(Penjualan.tanggal_penjualan >= start_date)
+        .filter(Penjualan.tanggal_penjualan <= end_date)
+        .all()
+    )
+    for sale in sales:
+        sale.accounting_period_id = period.id
+        sale.is_locked = True
+
+    purchases = (
+        Pembelian.query.filter(Pembelian.tanggal_faktur >= start_date)
+        .filter(Pembelian.tanggal_faktur <= end_date)
+        .all()
+    )
+    for purchase in purchases:
+        purchase.accounting_period_id = period.id
+        purchase.is_locked = True
+
+    journals = (
+        JournalEntry.query.filter(JournalEntry.date >= start_date)
+        .filter(JournalEntry.date <= end_date)
+        .all()
+    )
+    for journal in journals:
+        journal.accounting_period_id = period.id
+        journal.is_locked = True
+
+    summary = _build_period_metrics(start_date, end_date)
+    if not summary:
+        summary = {
+            "sales_total": 0.0,
+            "hpp_total": 0.0,
+            "net_income": 0.0,
+        }
+    income_account = Account.query.filter_by(type="income", is_active=True).order_by(Account.code).first()
+    expense_account = Account.query.filter_by(type="expense", is_active=True).order_by(Account.code).first()
+    equity_account = Account.query.filter_by(type="equity", is_active=True).order_by(Account.code).first()
+
+    net_income = summary.get("net_income", 0.0)
+    closing_entry = None
+    if income_account and (expense_account or equity_account):
+        closing_entry = JournalEntry(
+            reference=_generate_journal_reference(),
+            date=end_date,
+            memo=f"Penutupan periode {label}",
+            created_by=user_id,
+            accounting_period_id=period.id,
+            is_locked=True,
+        )
+        db.session.add(closing_entry)
+        db.session.flush()
+
+        description = f"Rekap penutupan periode {label}"
+        if summary["sales_total"] > 0 and income_account:
+            db.session.add(
+                JournalLine(
+                    entry_id=closing_entry.id,
+                    account_id=income_account.id,
+                    debit=summary["sales_total"],
+                    credit=0.0,
+                    description=description,
+                )
+            )
+
+        if summary["hpp_total"] > 0 and expense_account:
+            db.session.add(
+                JournalLine(
+                    entry_id=closing_entry.id,
+                    account_id=expense_account.id,
+                    debit=0.0,
+                    credit=summary["hpp_total"],
+                    description=description,
+                )
+            )
+
+        if net_income != 0 and equity_account:
+            if net_income > 0:
+                db.session.add(
+                    JournalLine(
+                        entry_id=closing_entry.id,
+                        account_id=equity_account.id,
+                        debit=0.0,
+                        credit=net_income,
+                        description="Laba bersih periode ditutup",
+                    )
+                )
+            else:
+                db.session.add(
+                    JournalLine(
+                        entry_id=closing_entry.id,
+                        account_id=equity_account.id,
+                        debit=abs(net_income),
+                        credit=0.0,
+                        description="Rugi bersih periode ditutup",
+                    )
+                )
+    else:
+        logging.warning("Kredit penutupan tidak lengkap: pastikan ada akun income/expense/equity aktif.")
+
+    # snapshot saldo akun per akhir periode, termasuk jurnal penutupan di atas
+    refresh_account_period_balances()
+    return period
+
+
+def _months_between(start_date, end_date):
+    if not start_date or not end_date or end_date < start_date:
+        return 0
+    months = (end_date.year - start_date.year) * 12 + (end_date.month - start_date.month)
+    if end_date.day < start_date.day:
+        months -= 1
+    return max(0, months)
@@ -0,0 +1,517 @@
+"""Endpoint JSON ``/api/...`` untuk POS, saran pencarian dan riwayat pembayaran."""
+
+import json
+import logging
+
+from flask import jsonify, make_response, request, session, url_for
+from sqlalchemy import func, or_
+from sqlalchemy.orm import joinedload
+
+from app.models import (
+    PayablePayment,
+    Pembelian,
+    Penjualan,
+    PriceLevelCost,
+    ProductPriceLevel,
+    Produk,
+    ReceivablePayment,
+    Supplier,
+    db,
+)
+from app.routes import bp
+from app.routes.common import (
+    ADMIN_ONLY,
+    ALL_ROLE_CHOICES,
+    INVENTORY_ROLES,
+    SALES_ROLES,
+    _CHECKOUT_SCALAR_FIELDS,
+    _format_date_id,
+    _owned_import_job,
+    _parse_date_param,
+    _parse_int_param,
+    _process_sale_checkout,
+    login_required,
+    roles_required,
+)
+from app.schema_registry import table_ready
+from app.services.catalog_service import (
+    CATALOG_KINDS,
+    build_catalog_payload,
+    catalog_etag,
+    get_catalog_state,
+)
+from app.services.customer_service import suggest_customers
+from app.services.import_jobs import job_payload
+from app.services.pos_snapshot import product_by_code, scan_product
+from app.services.product_search import search_products
+from app.services.sales_search_service import suggest_sales_entities
+from app.time_utils import local_now, local_today
+
+
+@bp.route("/api/import-jobs/<int:job_id>")
+@login_required
+def import_job_status(job_id):
+    job = _owned_import_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job import tidak ditemukan."}), 404
+    return jsonify(job_payload(job))
+
+
+# Route to fetch supplier data
+@bp.route("/api/suppliers", methods=["GET"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def get_suppliers():
+    try:
+        kategori_id = request.args.get("kategori_id", type=int)
+        search_term = (request.args.get("q") or "").strip().lower()
+        limit = request.args.get("limit", type=int) or 10
+        limit = max(1, min(limit, 30))
+
+        query = Supplier.query
+        if kategori_id:
+            query = (
+                query.join(Produk, Produk.supplier_id == Supplier.id)
+                .filter(Produk.kategori_id == kategori_id)
+                .distinct()
+            )
+        if search_term:
+            like = f"%{search_term}%"
+            query = query.filter(
+                or_(
+                    func.lower(Supplier.name).like(like),
+                    func.lower(Supplier.contact_person).like(like),
+                    func.lower(Supplier.phone).like(like),
+                    func.lower(Supplier.email).like(like),
+                )
+            )
+        suppliers = query.order_by(Supplier.name.asc()).limit(limit).all()
+        suppliers_data = [
+            {
+                "id": supplier.id,
+                "name": supplier.name,
+                "contact_person": supplier.contact_person,
+                "phone": supplier.phone,
+                "email": supplier.email,
+                "address": supplier.address,
+                "website": supplier.website,
+                "bank_name": supplier.bank_name,
+                "bank_account": supplier.bank_account,
+            }
+            for supplier in suppliers
+        ]
+        return jsonify({"suppliers": suppliers_data}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@bp.route("/api/get_product", methods=["GET"])
+@login_required
+@roles_required(*ALL_ROLE_CHOICES)
+def get_product():
+    product_code = request.args.get("product_code")
+    # dari snapshot katalog worker; hanya kode produk (scan barcode lewat /api/pos/scan)
+    product = product_by_code(product_code)
+
+    if product:
+        return {
+            "success": True,
+            "product_name": product.name,
+            "category": product.kategori,
+            "satuan": product.satuan,
+        }
+    else:
+        return {"success": False, "message": "Produk tidak ditemukan."}, 404
+
+
+@bp.route("/api/products", methods=["GET"])
+@login_required
+@roles_required(*ALL_ROLE_CHOICES)
+def get_products():
+    search_query = request.args.get("q", "").strip()
+    products = Produk.query.options(
+        joinedload(Produk.kategori), joinedload(Produk.satuan)
+    )
+
+    if search_query:
+        products = search_products(products, search_query)
+
+    products = products.limit(50).all()  # Batasi jumlah hasil untuk performa
+    product_ids = [prod.id for prod in products]
+
+    level_entries = []
+    if product_ids:
+        level_entries = (
+            ProductPriceLevel.query.options(joinedload(ProductPriceLevel.level))
+            .filter(ProductPriceLevel.product_id.in_(product_ids))
+            .all()
+        )
+
+    price_map = {}
+    for entry in level_entries:
+        price_map.setdefault(entry.product_id, []).append(
+            {
+                "level_id": entry.level_id,
+                "level_name": entry.level.name if entry.level else "",
+                "price": entry.price,
+            }
+        )
+
+    product_list = []
+    for product in products:
+        product_list.append(
+            {
+                "id": product.id,
+                "kode_produk": product.kode_produk,
+                "nama_produk": product.nama_produk,
+                "sku": product.sku,
+                "barcode": product.barcode,
+                "kategori": (
+                    product.kategori.name if product.kategori else "Tidak dikategorikan"
+                ),
+                "satuan": product.satuan.name if product.satuan else "",
+                "price_levels": sorted(
+                    price_map.get(product.id, []),
+                    key=lambda item: (item.get("level_name") or "").lower(),
+                ),
+            }
+        )
+
+    return {"products": product_list}
+
+
+@bp.route("/api/pelanggan/suggest", methods=["GET"])
+@login_required
+@roles_required(*SALES_ROLES)
+def pelanggan_suggest():
+    term = (request.args.get("q") or "").strip()
+    after = request.args.get("after") or None
+    per_page = request.args.get("per_page", 8, type=int)
+    per_page = max(5, min(per_page, 20))
+
+    if not term:
+        return {
+            "customers": [],
+            "per_page": per_page,
+            "next_after": None,
+            "has_next": False,
+        }
+
+    # keyset (nama, id) + limit+1: tanpa COUNT(*) di setiap ketikan
+    customers, next_after = suggest_customers(term, after=after, limit=per_page)
+
+    payload = [
+        {
+            "id": customer.id,
+            "pelanggan_id": customer.pelanggan_id,
+            "nama": customer.nama,
+            "kontak": customer.kontak,
+            "price_level": customer.price_level.name if customer.price_level else "",
+        }
+        for customer in customers
+    ]
+    return {
+        "customers": payload,
+        "per_page": per_page,
+        "next_after": next_after,
+        "has_next": next_after is not None,
+    }
+
+
+@bp.route("/api/price_level_costs", methods=["GET"])
+@login_required
+@roles_required(*ALL_ROLE_CHOICES)
+def get_price_level_costs():
+    level_id = request.args.get("level_id")
+    try:
+        level_id_int = int(level_id)
+    except (TypeError, ValueError):
+        return {"costs": []}
+
+    costs = (
+        PriceLevelCost.query.filter_by(level_id=level_id_int, is_active=True)
+        .order_by(PriceLevelCost.name.asc())
+        .all()
+    )
+    payload = [
+        {
+            "id": cost.id,
+            "name": cost.name,
+            "type": cost.type,
+            "value": cost.value,
+        }
+        for cost in costs
+    ]
+    return {"costs": payload}
+
+
+@bp.route("/api/pos/catalog/<kind>", methods=["GET"])
+@login_required
+@roles_required(*SALES_ROLES)
+def pos_catalog(kind):
+    if kind not in CATALOG_KINDS:
+        return jsonify({"error": "Katalog tidak dikenal."}), 404
+
+    since = request.args.get("since", 0, type=int)
+    window = request.args.get("window", None, type=int)
+    after = request.args.get("after", 0, type=int)
+    limit = request.args.get("limit", None, type=int)
+
+    # isi respons untuk URL yang sama hanya bergantung pada versi katalog
+    # (termasuk commit terlambat), jadi If-None-Match bisa dijawab tanpa payload
+    state = get_catalog_state(kind)
+    etag = catalog_etag(kind, state)
+    if request.if_none_match.contains_weak(etag):
+        response = make_response("", 304)
+    else:
+        payload = build_catalog_payload(
+            kind, since=since, after=after, limit=limit, state=state, window=window
+        )
+        response = jsonify(payload)
+    response.set_etag(etag, weak=True)
+    response.headers["X-Catalog-Version"] = str(state.version)
+    # selalu revalidasi; klien menyimpan salinannya sendiri di IndexedDB
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+@bp.route("/api/pos/scan", methods=["GET"])
+@login_required
+@roles_required(*SALES_ROLES)
+def pos_scan():
+    """Cari produk hasil scan (barcode, kode atau SKU) dari snapshot worker."""
+    code = (request.args.get("code") or "").strip()
+    if not code:
+        return jsonify({"success": False, "message": "Kode scan kosong."}), 400
+    product = scan_product(code)
+    if not product:
+        return jsonify({"success": False, "message": "Produk tidak ditemukan."}), 404
+    return jsonify({"success": True, "product": product.as_dict()})
+
+
+# field teks yang diproses dengan .strip()/strptime; field lain boleh angka JSON
+_CHECKOUT_TEXT_FIELDS = ("payment_method", "due_date", "draft_invoice")
+
+
+def _checkout_input_from_json(payload):
+    items = payload.get("items") or []
+    if not isinstance(items, list):
+        raise ValueError("Format item penjualan tidak valid.")
+    items = [item for item in items if isinstance(item, dict)]
+    marketplace_details = payload.get("marketplace_cost_details")
+    if marketplace_details is None:
+        marketplace_details = "[]"
+    elif isinstance(marketplace_details, (list, dict)):
+        marketplace_details = json.dumps(marketplace_details)
+    checkout = {
+        "pelanggan_id": _parse_int_param(payload.get("pelanggan_id")),
+        "produk_id": [item.get("produk_id") for item in items],
+        "jumlah": [item.get("jumlah") for item in items],
+        "harga": [item.get("harga") for item in items],
+        "diskon": [item.get("diskon") for item in items],
+        "pajak": [item.get("pajak") for item in items],
+        **{key: payload.get(key) for key in _CHECKOUT_SCALAR_FIELDS},
+    }
+    checkout["marketplace_cost_details"] = marketplace_details
+    for key in _CHECKOUT_SCALAR_FIELDS:
+        value = checkout[key]
+        if value is None or isinstance(value, str):
+            continue
+        is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+        if key in _CHECKOUT_TEXT_FIELDS or not is_number:
+            raise ValueError(f"Format field {key} tidak valid.")
+    return checkout
+
+
+@bp.route("/api/penjualan", methods=["POST"])
+@login_required
+@roles_required(*SALES_ROLES)
+def api_penjualan_checkout():
+    """Jalur checkout JSON untuk kasir: hanya validasi + simpan, tanpa render halaman."""
+    if not request.is_json:
+        return jsonify({"success": False, "message": "Gunakan JSON payload."}), 415
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({"success": False, "message": "Payload JSON harus berupa objek."}), 400
+
+    try:
+        checkout = _checkout_input_from_json(payload)
+        penjualan = _process_sale_checkout(session.get("user_id"), checkout)
+    except ValueError as exc:
+        db.session.rollback()
+        return jsonify({"success": False, "message": str(exc)}), 400
+    except Exception as e:
+        db.session.rollback()
+        logging.exception("Gagal menyimpan penjualan")
+        return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
+
+    return jsonify(
+        {
+            "success": True,
+            "message": f"Penjualan berhasil disimpan (total Rp {penjualan.total_harga:,.0f}).",
+            "sale_id": penjualan.id,
+            "no_faktur": penjualan.no_faktur,
+            "total": float(penjualan.total_harga or 0.0),
+            "change_due": float(penjualan.change_due or 0.0),
+            "receipt_url": url_for("main.penjualan_receipt", sale_id=penjualan.id),
+        }
+    ), 201
+
+
+@bp.route("/api/laporan/stok-barang/suggest", methods=["GET"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def laporan_stok_barang_suggest():
+    term = (request.args.get("q") or "").strip()
+    if len(term) < 2:
+        return jsonify({"products": []})
+
+    kategori_filter = request.args.get("kategori")
+    supplier_filter = request.args.get("supplier")
+    query = Produk.query.options(
+        joinedload(Produk.kategori),
+        joinedload(Produk.supplier),
+    )
+    if kategori_filter:
+        query = query.filter(Produk.kategori_id == kategori_filter)
+    if supplier_filter:
+        query = query.filter(Produk.supplier_id == supplier_filter)
+    query = search_products(query, term, ("nama_produk", "kode_produk", "sku"))
+
+    rows = query.limit(10).all()
+    payload = []
+    for product in rows:
+        payload.append(
+            {
+                "id": product.id,
+                "code": product.kode_produk,
+                "name": product.nama_produk,
+                "sku": product.sku or "-",
+                "stock": int(product.stok_lama or 0),
+                "kategori": product.kategori.name if product.kategori else "Tanpa kategori",
+                "supplier": product.supplier.name if product.supplier else "Tanpa supplier",
+            }
+        )
+
+    return jsonify({"products": payload})
+
+
+@bp.route("/api/piutang/history/<int:sale_id>", methods=["GET"])
+@login_required
+@roles_required(*SALES_ROLES)
+def pembayaran_piutang_history(sale_id):
+    sale = Penjualan.query.get_or_404(sale_id)
+    if sale.payment_method != "Tempo":
+        return jsonify({"payments": []})
+    if not table_ready("receivable_payment"):
+        return jsonify({"payments": []})
+
+    payments = (
+        ReceivablePayment.query.options(joinedload(ReceivablePayment.created_by_user))
+        .filter(ReceivablePayment.penjualan_id == sale_id)
+        .order_by(ReceivablePayment.paid_at.desc(), ReceivablePayment.id.desc())
+        .all()
+    )
+    payload = []
+    for payment in payments:
+        paid_at = payment.paid_at or local_now()
+        date_label = f"{_format_date_id(paid_at.date())} {paid_at.strftime('%H:%M')}"
+        payload.append(
+            {
+                "id": payment.id,
+                "amount": float(payment.amount or 0.0),
+                "method": payment.payment_method or "-",
+                "reference": payment.reference or "-",
+                "note": payment.note or "-",
+                "paid_at": date_label,
+                "created_by": (
+                    payment.created_by_user.username
+                    if payment.created_by_user
+                    else "-"
+                ),
+            }
+        )
+
+    return jsonify({"payments": payload})
+
+
+@bp.route("/api/utang/history/<int:purchase_id>", methods=["GET"])
+@login_required
+@roles_required(*ADMIN_ONLY)
+def pembayaran_utang_history(purchase_id):
+    purchase = Pembelian.query.get_or_404(purchase_id)
+    if purchase.jenis_pembayaran != "Tempo":
+        return jsonify({"payments": []})
+
+    payments = (
+        PayablePayment.query.options(joinedload(PayablePayment.created_by_user))
+        .filter(PayablePayment.pembelian_id == purchase_id)
+        .order_by(PayablePayment.paid_at.desc(), PayablePayment.id.desc())
+        .all()
+    )
+    payload = []
+    for payment in payments:
+        paid_at = payment.paid_at or local_now()
+        date_label = f"{_format_date_id(paid_at.date())} {paid_at.strftime('%H:%M')}"
+        payload.append(
+            {
+                "id": payment.id,
+                "amount": float(payment.amount or 0.0),
+                "method": payment.payment_method or "-",
+                "reference": payment.reference or "-",
+                "note": payment.note or "-",
+                "paid_at": date_label,
+                "created_by": (
+                    payment.created_by_user.username
+                    if payment.created_by_user
+                    else "-"
+                ),
+            }
+        )
+
+    return jsonify({"payments": payload})
+
+
+@bp.route("/api/laporan/penjualan/suggest", methods=["GET"])
+@login_required
+@roles_required(*SALES_ROLES)
+def laporan_penjualan_suggest():
+    term = (request.args.get("q") or "").strip()
+    if len(term) < 2:
+        return jsonify({"results": []})
+
+    today = local_today()
+    default_start = today.replace(day=1)
+    start_date = _parse_date_param(request.args.get("start_date")) or default_start
+    end_date = _parse_date_param(request.args.get("end_date")) or today
+    if end_date < start_date:
+        start_date, end_date = end_date, start_date
+
+    if not table_ready("sales_search_index"):
+        return jsonify({"results": []})
+    results = suggest_sales_entities(term, start_date, end_date)
+    for item in results:
+        last_date = item.pop("last_date")
+        if item["kind"] == "faktur":
+            item["subtext"] = f"{_format_date_id(last_date)} • {item['subtext']}"
+    return jsonify({"results": results})
+
+
+@bp.route("/api/get_product1", methods=["GET"])
+@login_required
+@roles_required(*ALL_ROLE_CHOICES)
+def get_product1():
+    product_id = request.args.get("product_id")
+    product = db.session.get(Produk, product_id)
+
+    if product:
+        return jsonify(
+            {
+                "success": True,
+                "id": product.id,
+                "nama_produk": product.nama_produk,
+                "kode_produk": product.kode_produk,
+                "harga": product.harga,
+            }
+        )
+    return jsonify({"success": False, "message": "Produk tidak ditemukan."}), 404
@@ -0,0 +1,591 @@
+"""Route login, registrasi, reset password, profil dan manajemen staf."""
+
+import re
+import secrets
+from datetime import timedelta
+
+from flask import flash, redirect, render_template, request, session, url_for
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from app.models import PasswordResetToken, Penjualan, User, db
+from app.routes import bp
+from app.routes.common import (
+    ADMIN_ONLY,
+    ROLE_ADMIN,
+    ROLE_GUDANG,
+    ROLE_KASIR,
+    ROLE_SALES,
+    _is_safe_redirect_target,
+    login_required,
+    roles_required,
+)
+from app.services.identity_service import remember_login
+from app.time_utils import local_now
+
+
+MIN_PASSWORD_LENGTH = 8
+
+
+def _safe_next_url(default_endpoint="main.dashboard", candidate=None):
+    target = candidate or request.args.get("next")
+    if target and _is_safe_redirect_target(target):
+        return target
+    return url_for(default_endpoint)
+
+
+def _create_password_reset_token(user, ttl_hours=1):
+    PasswordResetToken.query.filter_by(user_id=user.id, used=False).update(
+        {"used": True}
+    )
+    token_value = secrets.token_urlsafe(32)
+    expires_at = local_now() + timedelta(hours=ttl_hours)
+    reset_token = PasswordResetToken(
+        user_id=user.id, token=token_value, expires_at=expires_at
+    )
+    db.session.add(reset_token)
+    db.session.commit()
+    return reset_token
+
+
+def _get_valid_reset_token(token_value):
+    if not token_value:
+        return None
+    token = PasswordResetToken.query.filter_by(token=token_value).first()
+    if (
+        not token
+        or token.used
+        or token.expires_at < local_now()
+        or not token.user
+    ):
+        return None
+    return token
+
+
+@bp.route("/register", methods=["GET", "POST"])
+def register():
+    if request.method == "POST":
+        username = (request.form.get("username") or "").strip()
+        email = (request.form.get("email") or "").strip()
+        password = request.form.get("password", "")
+        confirm_password = request.form.get("confirm_password", "")
+
+        if not username:
+            flash("Username wajib diisi.", "danger")
+            return render_template("register.html")
+
+        # Validasi password
+        if len(password) < MIN_PASSWORD_LENGTH:
+            flash(
+                f"Password minimal {MIN_PASSWORD_LENGTH} karakter.",
+                "danger",
+            )
+            return render_template("register.html")
+        if password != confirm_password:
+            flash("Passwords do not match!", "danger")
+            return render_template("register.html")
+
+        existing_username = (
+            User.query.filter(func.lower(User.username) == username.lower()).first()
+            if username
+            else None
+        )
+        if existing_username:
+            flash(
+                "Username is already registered. Please use a different username.",
+                "danger",
+            )
+            return render_template("register.html")
+
+        # Periksa apakah email sudah ada
+        existing_user = User.query.filter_by(email=email).first()
+        if existing_user:
+            flash(
+                "Email is already registered. Please use a different email.", "danger"
+            )
+            return render_template("register.html")
+
+        # Hash password dan simpan ke database
+        hashed_password = generate_password_hash(
+            password, method="pbkdf2:sha256", salt_length=8
+        )
+        new_user = User(username=username, email=email, password=hashed_password)
+
+        db.session.add(new_user)
+        db.session.commit()
+
+        flash("Registration successful! Please log in.", "success")
+        return redirect("/login")
+
+    return render_template("register.html")
+
+
+@bp.route("/logout")
+@login_required
+def logout():
+    session.clear()
+    flash("You have been logged out.", "info")
+    return redirect("/login")
+
+
+@bp.route("/login", methods=["GET", "POST"])
+def login():
+    if session.get("user_id"):
+        return redirect(_safe_next_url())
+
+    next_value = request.args.get("next")
+    if request.method == "POST":
+        email = request.form["email"]
+        password = request.form["password"]
+        next_value = request.form.get("next") or next_value
+
+        # Cari pengguna di database
+        user = User.query.filter_by(email=email).first()
+
+        if user and check_password_hash(user.password, password):
+            remember_login(session, user)
+            flash("Login successful!", "success")
+            return redirect(_safe_next_url(candidate=next_value))
+        else:
+            flash("Invalid email or password.", "danger")
+
+    return render_template("login.html", next=next_value)
+
+
+@bp.route("/forgot-password", methods=["GET", "POST"])
+def forgot_password():
+    if session.get("user_id"):
+        flash("Anda sudah masuk ke sistem.", "info")
+        return redirect(url_for("main.dashboard"))
+
+    if request.method == "POST":
+        email_input = request.form.get("email", "").strip()
+        if not email_input:
+            flash("Masukkan email yang terdaftar.", "warning")
+            return redirect(url_for("main.forgot_password"))
+
+        user = User.query.filter(func.lower(User.email) == email_input.lower()).first()
+        if user:
+            reset_token = _create_password_reset_token(user)
+            reset_link = url_for(
+                "main.reset_password", token=reset_token.token, _external=True
+            )
+            flash(
+                "Gunakan tautan berikut untuk mengatur ulang password (sementara ditampilkan untuk pengujian): "
+                f"{reset_link}",
+                "info",
+            )
+        flash("Jika email terdaftar, tautan reset password telah dikirim.", "success")
+        return redirect(url_for("main.login"))
+
+    return render_template("forgot_password.html")
+
+
+@bp.route("/reset-password/<token>", methods=["GET", "POST"])
+def reset_password(token):
+    if session.get("user_id"):
+        flash("Keluar dari akun terlebih dahulu untuk reset password.", "info")
+        return redirect(url_for("main.dashboard"))
+
+    reset_token = _get_valid_reset_token(token)
+    if not reset_token:
+        flash("Token reset password tidak valid atau sudah kedaluwarsa.", "danger")
+        return redirect(url_for("main.forgot_password"))
+
+    if request.method == "POST":
+        password = request.form.get("password", "")
+        confirm_password = request.form.get("confirm_password", "")
+
+        if not password or not confirm_password:
+            flash("Password dan konfirmasi wajib diisi.", "warning")
+            return redirect(url_for("main.reset_password", token=token))
+        if len(password) < MIN_PASSWORD_LENGTH:
+            flash(
+                f"Password minimal {MIN_PASSWORD_LENGTH} karakter.",
+                "warning",
+            )
+            return redirect(url_for("main.reset_password", token=token))
+        if password != confirm_password:
+            flash("Konfirmasi password tidak cocok.", "warning")
+            return redirect(url_for("main.reset_password", token=token))
+
+        reset_token.user.password = generate_password_hash(
+            password, method="pbkdf2:sha256", salt_length=8
+        )
+        reset_token.mark_used()
+        db.session.commit()
+        flash("Password berhasil diperbarui. Silakan login kembali.", "success")
+        return redirect(url_for("main.login"))
+
+    return render_template("reset_password.html", token=token)
+
+
+@bp.route("/profile", methods=["GET", "POST"])
+@login_required
+def profile():
+    user = db.session.get(User, session["user_id"])
+
+    if request.method == "POST":
+        username = (request.form.get("username") or "").strip()
+        email = (request.form.get("email") or "").strip()
+        current_password = request.form.get("current_password", "")
+        new_password = request.form.get("new_password", "")
+        confirm_password = request.form.get("confirm_password", "")
+        password_change_requested = any(
+            [current_password, new_password, confirm_password]
+        )
+
+        if not username:
+            flash("Username wajib diisi.", "warning")
+            return redirect("/profile")
+        if not email:
+            flash("Email wajib diisi.", "warning")
+            return redirect("/profile")
+        if not re.match(r"^[^@\s]+@[^@\s]+\.[^@\s]+$", email):
+            flash("Format email tidak valid.", "warning")
+            return redirect("/profile")
+
+        existing_username = (
+            User.query.filter(func.lower(User.username) == username.lower())
+            .filter(User.id != user.id)
+            .first()
+        )
+        if existing_username:
+            flash("Username sudah digunakan.", "warning")
+            return redirect("/profile")
+
+        existing_email = (
+            User.query.filter(func.lower(User.email) == email.lower())
+            .filter(User.id != user.id)
+            .first()
+        )
+        if existing_email:
+            flash("Email sudah terdaftar.", "warning")
+            return redirect("/profile")
+
+        if password_change_requested:
+            if not current_password:
+                flash("Password lama wajib diisi.", "warning")
+                return redirect("/profile")
+            if not check_password_hash(user.password, current_password):
+                flash("Password lama tidak sesuai.", "danger")
+                return redirect("/profile")
+            if not new_password or not confirm_password:
+                flash("Password baru dan konfirmasi wajib diisi.", "warning")
+                return redirect("/profile")
+            if len(new_password) < MIN_PASSWORD_LENGTH:
+                flash(
+                    f"Password minimal {MIN_PASSWORD_LENGTH} karakter.",
+                    "warning",
+                )
+                return redirect("/profile")
+            if new_password != confirm_password:
+                flash("Konfirmasi password baru tidak cocok.", "warning")
+                return redirect("/profile")
+            hashed_password = generate_password_hash(
+                new_password, method="pbkdf2:sha256", salt_length=8
+            )
+            user.password = hashed_password
+
+        # Update username and email
+        user.username = username
+        user.email = email
+
+        # Commit changes to the database
+        db.session.commit()
+        # session ini tetap login; session lain keluar jika password berubah
+        remember_login(session, user)
+        flash("Profile updated successfully!", "success")
+        return redirect("/profile")
+
+    return render_template("profile.html", username=user.username, email=user.email)
+
+
+@bp.route("/sales_staff", methods=["GET", "POST"])
+@login_required
+@roles_required(*ADMIN_ONLY)
+def sales_staff():
+    role_choices = [
+        {"value": ROLE_ADMIN, "label": "Admin"},
+        {"value": ROLE_KASIR, "label": "Kasir"},
+        {"value": ROLE_SALES, "label": "Sales"},
+        {"value": ROLE_GUDANG, "label": "Gudang"},
+    ]
+    role_labels = {choice["value"]: choice["label"] for choice in role_choices}
+
+    form_errors = {}
+    edit_user = None
+    if request.method == "GET":
+        edit_id = request.args.get("edit", type=int)
+        if edit_id:
+            edit_user = db.session.get(User, edit_id)
+
+    def _default_form_values():
+        return {"username": "", "email": "", "role": ROLE_SALES}
+
+    if request.method == "POST":
+        form_values = {
+            "username": (request.form.get("username", "") or "").strip(),
+            "email": (request.form.get("email", "") or "").strip(),
+            "role": (request.form.get("role", ROLE_SALES) or ROLE_SALES).lower(),
+        }
+    elif edit_user:
+        form_values = {
+            "username": edit_user.username or "",
+            "email": edit_user.email or "",
+            "role": (edit_user.role or ROLE_SALES).lower(),
+        }
+    else:
+        form_values = _default_form_values()
+
+    if request.method == "POST":
+        username = form_values["username"]
+        email = form_values["email"]
+        password = request.form.get("password", "").strip()
+        role = (form_values["role"] or "sales").lower()
+        if role not in role_labels:
+            role = "sales"
+        edit_id = request.form.get("user_id")
+        is_edit = bool(edit_id)
+        target_user = None
+
+        if is_edit:
+            try:
+                target_user = db.session.get(User, int(edit_id))
+            except (TypeError, ValueError):
+                target_user = None
+            if not target_user:
+                flash("Pengguna yang akan diubah tidak ditemukan.", "warning")
+                return redirect(url_for("main.sales_staff"))
+            edit_user = target_user
+
+        if not username:
+            form_errors["username"] = "Nama login wajib diisi."
+        else:
+            existing_username = (
+                User.query.filter(func.lower(User.username) == username.lower())
+                .filter(User.id != (target_user.id if target_user else 0))
+                .first()
+            )
+            if existing_username:
+                form_errors["username"] = "Nama login sudah digunakan."
+
+        if not email:
+            form_errors["email"] = "Email wajib diisi."
+        else:
+            existing_email = (
+                User.query.filter(func.lower(User.email) == email.lower())
+                .filter(User.id != (target_user.id if target_user else 0))
+                .first()
+            )
+            if existing_email:
+                form_errors["email"] = "Email sudah terdaftar."
+
+        if is_edit:
+            # Password opsional saat edit
+            if password and len(password) < MIN_PASSWORD_LENGTH:
+                form_errors["password"] = (
+                    f"Password minimal {MIN_PASSWORD_LENGTH} karakter."
+                )
+        else:
+            if not password or len(password) < MIN_PASSWORD_LENGTH:
+                form_errors["password"] = (
+                    f"Password minimal {MIN_PASSWORD_LENGTH} karakter."
+                )
+
+        if not form_errors:
+            if is_edit and target_user:
+                target_user.username = username
+                target_user.email = email
+                target_user.role = role
+                if password:
+                    target_user.password = generate_password_hash(
+                        password, method="pbkdf2:sha256", salt_length=8
+                    )
+                db.session.commit()
+                if target_user.id == session.get("user_id"):
+                    remember_login(session, target_user)
+                flash("Pengguna berhasil diperbarui.", "success")
+                return redirect(url_for("main.sales_staff"))
+            else:
+                hashed_password = generate_password_hash(
+                    password, method="pbkdf2:sha256", salt_length=8
+                )
+                new_user = User(
+                    username=username, email=email, password=hashed_password, role=role
+                )
+                db.session.add(new_user)
+                db.session.commit()
+                flash(
+                    f"Pengguna {role_labels.get(role, role)} baru berhasil ditambahkan.",
+                    "success",
+                )
+                return redirect(url_for("main.sales_staff"))
+
+    staff_query = (
+        db.session.query(
+            User,
+            func.count(Penjualan.id).label("orders"),
+            func.coalesce(func.sum(Penjualan.total_harga), 0).label("revenue"),
+        )
+        .outerjoin(Penjualan, Penjualan.sales_id == User.id)
+        .filter(User.role.in_([choice["value"] for choice in role_choices]))
+        .group_by(User.id)
+        .order_by(User.username.asc())
+    )
+    staff_rows = staff_query.all()
+
+    role_breakdown = {
+        role["value"]: db.session.query(func.count(User.id))
+        .filter(User.role == role["value"])
+        .scalar()
+        or 0
+        for role in role_choices
+    }
+    total_staff = sum(role_breakdown.values())
+
+    total_transactions = sum(orders for _, orders, _ in staff_rows)
+
+    recent_sales = (
+        Penjualan.query.options(
+            joinedload(Penjualan.pelanggan), joinedload(Penjualan.sales)
+        )
+        .order_by(Penjualan.tanggal_penjualan.desc(), Penjualan.id.desc())
+        .limit(5)
+        .all()
+    )
+
+    stats_cards = [
+        {
+            "label": "Total Personel",
+            "value": total_staff,
+            "icon": "fa-users",
+            "accent": "text-primary",
+            "description": "Admin, sales, kasir, gudang aktif.",
+        },
+        {
+            "label": "Admin",
+            "value": role_breakdown.get(ROLE_ADMIN, 0),
+            "icon": "fa-user-shield",
+            "accent": "text-danger",
+            "description": "Pengelola sistem & konfigurasi.",
+        },
+        {
+            "label": "Sales",
+            "value": role_breakdown.get("sales", 0),
+            "icon": "fa-user-tie",
+            "accent": "text-success",
+            "description": "Tim penjualan lapangan.",
+        },
+        {
+            "label": "Kasir",
+            "value": role_breakdown.get("kasir", 0),
+            "icon": "fa-cash-register",
+            "accent": "text-warning",
+            "description": "Operator kasir aktif.",
+        },
+        {
+            "label": "Gudang",
+            "value": role_breakdown.get(ROLE_GUDANG, 0),
+            "icon": "fa-warehouse",
+            "accent": "text-info",
+            "description": "Pengelola stok & penerimaan barang.",
+        },
+        {
+            "label": "Transaksi tercatat",
+            "value": total_transactions,
+            "icon": "fa-receipt",
+            "accent": "text-info",
+            "description": "Akumulasi faktur dari tim.",
+        },
+    ]
+
+    staff_table = []
+    for user, orders, revenue in staff_rows:
+        customer_count = db.session.query(
+            func.count(func.distinct(Penjualan.pelanggan_id))
+        )
+        customer_count = (
+            customer_count.filter(Penjualan.sales_id == user.id).scalar() or 0
+        )
+        staff_table.append(
+            {
+                "id": user.id,
+                "username": user.username,
+                "email": user.email,
+                "role": role_labels.get(user.role, (user.role or "").title()),
+                "role_value": user.role or "",
+                "orders": orders,
+                "revenue": revenue,
+                "customers": customer_count,
+            }
+        )
+
+    role_permissions = [
+        {
+            "role": "Administrator",
+            "note": "Full akses semua menu & pengaturan",
+            "badge_class": "badge-soft-danger",
+            "accent_class": "permission-admin",
+            "items_list": [
+                "Semua transaksi & laporan",
+                "Master data (produk, pelanggan, supplier)",
+                "Pengaturan perusahaan & faktur/pajak",
+                "Pengaturan database & backup",
+                "Manajemen user & role",
+            ],
+        },
+        {
+            "role": "Sales",
+            "note": "Akses penjualan & piutang",
+            "badge_class": "badge-soft-info",
+            "accent_class": "permission-sales",
+            "items_list": [
+                "Input transaksi penjualan",
+                "Cetak struk / invoice / surat jalan",
+                "Kelola pelanggan",
+                "Laporan penjualan",
+                "Laporan & pembayaran piutang",
+            ],
+        },
+        {
+            "role": "Kasir",
+            "note": "Operasional kasir harian",
+            "badge_class": "badge-soft-success",
+            "accent_class": "permission-kasir",
+            "items_list": [
+                "Input transaksi penjualan",
+                "Cetak struk / invoice",
+                "Kelola pelanggan",
+                "Pembayaran piutang",
+                "Laporan penjualan",
+            ],
+        },
+        {
+            "role": "Gudang",
+            "note": "Stok & pembelian",
+            "badge_class": "badge-soft-warning",
+            "accent_class": "permission-gudang",
+            "items_list": [
+                "Pembelian & penerimaan barang",
+                "Master produk & kategori",
+                "Supplier & expedisi",
+                "Stok opname & update harga",
+                "Laporan pembelian & stok",
+            ],
+        },
+    ]
+
+    return render_template(
+        "sales_staff.html",
+        stats_cards=stats_cards,
+        staff_table=staff_table,
+        role_choices=role_choices,
+        form_errors=form_errors,
+        form_values=form_values,
+        edit_user=edit_user,
+        recent_sales=recent_sales,
+        role_labels=role_labels,
+        role_permissions=role_permissions,
+    )
@@ -0,0 +1,989 @@
+"""Helper, konstanta dan hook request yang dipakai beberapa kelompok route."""
+
+import logging
+import os
+import shutil
+import tempfile
+from collections import defaultdict
+from datetime import datetime
+from functools import wraps
+from urllib.parse import urljoin, urlparse
+
+from flask import current_app, flash, g, jsonify, redirect, request, session, url_for
+from sqlalchemy import func
+
+from app.models import (
+    AccountingSetting,
+    BarangPembelian,
+    CashierShift,
+    DetailPenjualan,
+    ImportJob,
+    JournalEntry,
+    JournalLine,
+    PayablePayment,
+    PaymentChannel,
+    Pelanggan,
+    Pembelian,
+    Penjualan,
+    Quotation,
+    db,
+)
+from app.routes import bp
+from app.schema_registry import table_ready
+from app.services.accounting_config_service import accounting_config, locked_period_for
+from app.services.document_number_service import (
+    DOCUMENT_JOURNAL,
+    DOCUMENT_PURCHASE_INVOICE,
+    DOCUMENT_SALES_INVOICE,
+    allocate_document_number,
+    claim_document_number,
+    preview_document_number,
+)
+from app.services.identity_service import current_identity
+from app.services.import_jobs import submit_import_job
+from app.services.import_service import IMPORT_RUNNERS
+from app.services.inventory_service import (
+    begin_stock_write_lock,
+    decrement_stock,
+    load_products_for_update,
+)
+from app.services.pos_snapshot import warm_snapshot_async
+from app.services.sales_search_service import ensure_sales_search_backfilled
+from app.services.sales_summary_service import (
+    apply_sale_to_summary,
+    ensure_sales_summary_backfilled,
+    product_cost_basis,
+)
+from app.services.settings_service import get_setting, seed_settings_from_env
+from app.services.shift_service import auto_close_enabled, sweep_stale_shifts_if_due
+from app.time_utils import local_today
+
+
+INDONESIAN_MONTHS = [
+    "Januari",
+    "Februari",
+    "Maret",
+    "April",
+    "Mei",
+    "Juni",
+    "Juli",
+    "Agustus",
+    "September",
+    "Oktober",
+    "November",
+    "Desember",
+]
+
+ROLE_ADMIN = "admin"
+ROLE_KASIR = "kasir"
+ROLE_SALES = "sales"
+ROLE_GUDANG = "gudang"
+ALL_ROLES = {ROLE_ADMIN, ROLE_KASIR, ROLE_SALES, ROLE_GUDANG}
+ALL_ROLE_CHOICES = (ROLE_ADMIN, ROLE_KASIR, ROLE_SALES, ROLE_GUDANG)
+INVENTORY_ROLES = (ROLE_ADMIN, ROLE_GUDANG)
+SALES_ROLES = (ROLE_ADMIN, ROLE_KASIR, ROLE_SALES)
+ADMIN_ONLY = (ROLE_ADMIN,)
+
+
+def _is_safe_redirect_target(target: str) -> bool:
+    if not target:
+        return False
+    ref_url = urlparse(request.host_url)
+    test_url = urlparse(urljoin(request.host_url, target))
+    return test_url.scheme in ("http", "https") and ref_url.netloc == test_url.netloc
+
+
+def _resolve_next_target(default_target):
+    next_target = request.form.get("next") or request.referrer or default_target
+    return next_target if _is_safe_redirect_target(next_target) else default_target
+
+
+def _accepts_json():
+    if request.path.startswith("/api/") or request.is_json:
+        return True
+
+    if not request.accept_mimetypes:
+        return False
+
+    best_match = request.accept_mimetypes.best_match(
+        ["text/html", "application/json"]
+    )
+    if not best_match:
+        return False
+
+    return (
+        best_match == "application/json"
+        and request.accept_mimetypes[best_match]
+        > request.accept_mimetypes["text/html"]
+    )
+
+
+def _auth_required_response():
+    if _accepts_json():
+        return jsonify({"error": "Authentication required"}), 401
+
+    flash("Silakan login untuk mengakses halaman tersebut.", "warning")
+    if request.method == "GET":
+        next_target = request.full_path or request.path
+    else:
+        next_target = request.referrer or request.path
+    if not _is_safe_redirect_target(next_target):
+        next_target = url_for("main.dashboard")
+    return redirect(url_for("main.login", next=next_target))
+
+
+def _forbidden_response(allowed_roles):
+    if _accepts_json():
+        return (
+            jsonify(
+                {
+                    "error": "Forbidden",
+                    "allowed_roles": sorted(r for r in allowed_roles),
+                }
+            ),
+            403,
+        )
+
+    flash("Anda tidak memiliki akses ke halaman tersebut.", "danger")
+    return redirect(url_for("main.dashboard"))
+
+
+def get_current_user():
+    if hasattr(g, "_current_user"):
+        return g._current_user
+
+    # identitas dari cache per proses; session hanya ditulis bila stamp berubah
+    user = current_identity(session)
+    g._current_user = user
+    return user
+
+
+def _get_open_shift(user_id):
+    if not user_id:
+        return None
+    return (
+        CashierShift.query.filter(
+            CashierShift.user_id == user_id,
+            CashierShift.closed_at.is_(None),
+        )
+        .order_by(CashierShift.opened_at.desc())
+        .first()
+    )
+
+
+def login_required(view_func):
+    @wraps(view_func)
+    def wrapped_view(*args, **kwargs):
+        if not get_current_user():
+            return _auth_required_response()
+        return view_func(*args, **kwargs)
+
+    return wrapped_view
+
+
+def roles_required(*allowed_roles, allow_admin=True):
+    allowed_set = {role.lower() for role in allowed_roles if role}
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapped_view(*args, **kwargs):
+            user = get_current_user()
+            if not user:
+                return _auth_required_response()
+
+            user_role = (user.role or "").lower()
+            if allow_admin and user_role == ROLE_ADMIN:
+                return view_func(*args, **kwargs)
+
+            if allowed_set and user_role in allowed_set:
+                return view_func(*args, **kwargs)
+
+            return _forbidden_response(allowed_set or ALL_ROLES)
+
+        return wrapped_view
+
+    return decorator
+
+
+def _parse_int_param(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_float_param(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_date_param(value):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def _parse_bool_param(value, default=False):
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in {"1", "true", "yes", "y", "on"}
+
+
+def _get_company_profile():
+    return {
+        "name": get_setting("COMPANY_NAME", "GOLDEN FARM 99"),
+        "address": get_setting(
+            "COMPANY_ADDRESS",
+            "Jln. Mawar putih blok a18 no 8n Taman meruya ilir - Meruya utara, Kembangan",
+        ),
+        "city": get_setting("COMPANY_CITY", "Jakarta"),
+        "phone": get_setting("COMPANY_PHONE", "0877-8809-5686"),
+        "email": get_setting("COMPANY_EMAIL", "goldenfarm99@gmail.com"),
+        "website": get_setting("COMPANY_WEBSITE", "https://goldenfarm99.com"),
+        "logo_url": get_setting("COMPANY_LOGO_URL", ""),
+        "bank_info": get_setting(
+            "COMPANY_BANK_INFO",
+            "BCA 5045218560 A.n. Golden Farm 99",
+        ),
+    }
+
+
+def _get_receipt_settings():
+    raw_thank_you = get_setting("RECEIPT_THANK_YOU_TEXT")
+    thank_you_text = "Terima kasih" if raw_thank_you is None else raw_thank_you
+
+    raw_font_weight = _parse_int_param(get_setting("RECEIPT_FONT_WEIGHT"))
+    font_weight = raw_font_weight if raw_font_weight is not None else 500
+    font_weight = min(700, max(300, font_weight))
+
+    raw_font_size = _parse_float_param(get_setting("RECEIPT_FONT_SIZE"))
+    font_size = raw_font_size if raw_font_size is not None else 12.5
+    font_size = min(16.0, max(9.0, font_size))
+    font_size_css = f"{font_size:g}"
+    font_size_print = str(int(round(font_size)))
+
+    font_family = get_setting("RECEIPT_FONT_FAMILY") or "Roboto Mono"
+
+    return {
+        "font_family": font_family,
+        "font_weight": font_weight,
+        "font_size": font_size_css,
+        "font_size_print": font_size_print,
+        "thank_you_text": thank_you_text.strip(),
+        "promo_barcode_label": get_setting("RECEIPT_PROMO_LABEL", "Promo").strip(),
+        "promo_barcode_value": get_setting("RECEIPT_PROMO_BARCODE", "").strip(),
+        "show_promo_barcode": _parse_bool_param(
+            get_setting("RECEIPT_SHOW_PROMO_BARCODE", "0")
+        ),
+    }
+
+
+def _get_env_value(key, default=""):
+    value = get_setting(key)
+    if value is None:
+        return default
+    value = value.strip()
+    return value if value else default
+
+
+def _parse_tax_value(value, default=0.0):
+    try:
+        tax = float(value)
+    except (TypeError, ValueError):
+        return default
+    if tax < 0:
+        return 0.0
+    if tax > 100:
+        return 100.0
+    return tax
+
+
+def _get_sales_invoice_prefix():
+    return _get_env_value("SALES_INVOICE_PREFIX", "F")
+
+
+def _get_purchase_invoice_prefix():
+    return _get_env_value("PURCHASE_INVOICE_PREFIX", "INV")
+
+
+def _get_default_sales_tax():
+    return _parse_tax_value(_get_env_value("DEFAULT_SALES_TAX_PERCENT", "0"))
+
+
+def _get_default_purchase_tax():
+    return _parse_tax_value(_get_env_value("DEFAULT_PURCHASE_TAX_PERCENT", "0"))
+
+
+def _format_date_id(date_value):
+    if not date_value:
+        return "-"
+    try:
+        month_label = INDONESIAN_MONTHS[date_value.month - 1]
+    except IndexError:
+        month_label = date_value.strftime("%b")
+    return f"{date_value.day:02d} {month_label} {date_value.year}"
+
+
+_SALES_BACKFILL_CHECKED = False
+_APP_SETTINGS_SEEDED = False
+_POS_SNAPSHOT_WARMED = False
+
+
+@bp.before_app_request
+def _backfill_sales_tables_once():
+    # tabel & kolom sudah dilengkapi schema_registry sebelum request pertama
+    global _SALES_BACKFILL_CHECKED
+    if _SALES_BACKFILL_CHECKED:
+        return
+    if table_ready("sales_daily_summary"):
+        try:
+            ensure_sales_summary_backfilled()
+        except Exception:
+            db.session.rollback()
+            logging.exception("Gagal mengisi rekap penjualan harian")
+    if table_ready("sales_search_index"):
+        try:
+            ensure_sales_search_backfilled()
+        except Exception:
+            db.session.rollback()
+            logging.exception("Gagal mengisi indeks pencarian penjualan")
+    _SALES_BACKFILL_CHECKED = True
+
+
+@bp.before_app_request
+def _seed_app_settings_once():
+    global _APP_SETTINGS_SEEDED
+    if _APP_SETTINGS_SEEDED:
+        return
+    if table_ready("app_setting"):
+        try:
+            seed_settings_from_env()
+        except Exception:
+            db.session.rollback()
+            logging.exception("Gagal menyalin pengaturan .env ke app_setting")
+    _APP_SETTINGS_SEEDED = True
+
+
+@bp.before_app_request
+def _sweep_stale_shifts_daily():
+    # sekali per hari per proses; request lain hanya membandingkan tanggal
+    if not auto_close_enabled(current_app) or not table_ready("cashier_shift"):
+        return
+    try:
+        sweep_stale_shifts_if_due()
+    except Exception:
+        db.session.rollback()
+        logging.exception("Gagal menutup shift lama secara otomatis")
+
+
+@bp.before_app_request
+def _warm_pos_snapshot_once():
+    global _POS_SNAPSHOT_WARMED
+    if _POS_SNAPSHOT_WARMED:
+        return
+    _POS_SNAPSHOT_WARMED = True
+    if table_ready("catalog_change"):
+        warm_snapshot_async(current_app._get_current_object())
+
+
+IMPORT_JOB_PAGES = {
+    "produk": "main.produk",
+    "pelanggan": "main.pelanggan",
+    "supplier": "main.supplier",
+    "stok_opname": "main.stok_opname",
+    "harga_level": "main.harga_level",
+}
+
+
+def _save_import_upload(file):
+    suffix = os.path.splitext(file.filename or "")[1].lower()
+    handle, path = tempfile.mkstemp(prefix="import-", suffix=suffix)
+    with os.fdopen(handle, "wb") as target:
+        shutil.copyfileobj(file.stream, target)
+    return path
+
+
+def _import_page_url(kind, summary=None):
+    if kind == "stok_opname" and summary and summary.get("rows"):
+        return url_for("main.stok_opname", import_status="success", import_rows=summary["rows"])
+    return url_for(IMPORT_JOB_PAGES[kind])
+
+
+def _flash_import_summary(summary, error=None):
+    if error:
+        flash(error, "danger")
+    for category, message in (summary or {}).get("messages") or []:
+        flash(message, category)
+
+
+def _start_import_job(kind, file, options=None):
+    """Simpan upload lalu proses sebagai job latar.
+
+    Request ``fetch`` (Accept JSON) menerima 202 berisi ``job_id`` dan URL
+    polling; form biasa diarahkan ke halaman hasil job.
+    """
+    path = _save_import_upload(file)
+    if not os.path.getsize(path):
+        os.unlink(path)
+        if _accepts_json():
+            return jsonify({"error": "File kosong atau tidak dapat dibaca."}), 400
+        flash("File kosong atau tidak dapat dibaca.", "danger")
+        return redirect(_import_page_url(kind))
+
+    if not table_ready("import_job"):
+        # skema belum lengkap: proses langsung di request seperti sebelumnya
+        summary = None
+        try:
+            summary = IMPORT_RUNNERS[kind](path, file.filename, **(options or {}))
+            _flash_import_summary(summary)
+        except ValueError as exc:
+            db.session.rollback()
+            flash(str(exc), "danger")
+        except Exception as exc:
+            db.session.rollback()
+            logging.exception("Gagal import %s", kind)
+            flash(f"Gagal import data: {exc}", "danger")
+        finally:
+            os.unlink(path)
+        target = _import_page_url(kind, summary)
+        if _accepts_json():
+            # flash sudah tersimpan; halaman tujuan yang menampilkannya
+            return jsonify({"redirect": target})
+        return redirect(target)
+
+    job = submit_import_job(
+        kind, path, file.filename, user_id=session.get("user_id"), options=options
+    )
+    result_url = url_for("main.import_job_result", job_id=job.id)
+    if _accepts_json():
+        return (
+            jsonify(
+                {
+                    "job_id": job.id,
+                    "status_url": url_for("main.import_job_status", job_id=job.id),
+                    "result_url": result_url,
+                }
+            ),
+            202,
+        )
+    return redirect(result_url)
+
+
+def _owned_import_job(job_id):
+    job = db.session.get(ImportJob, job_id)
+    if job is None:
+        return None
+    user = get_current_user()
+    if job.created_by != user.id and (user.role or "").lower() != ROLE_ADMIN:
+        return None
+    return job
+
+
+def _normalize_fee(value, default):
+    try:
+        fee = float(value)
+    except (TypeError, ValueError):
+        return default
+    if fee > 1:
+        fee = fee / 100.0
+    if fee < 0:
+        fee = 0.0
+    if fee >= 0.95:
+        fee = 0.95
+    return fee
+
+
+_CHECKOUT_SCALAR_FIELDS = (
+    "payment_method",
+    "due_date",
+    "expedition_id",
+    "payment_channel_id",
+    "shipping_fee",
+    "amount_paid",
+    "change_due",
+    "quotation_id",
+    "price_level_id",
+    "marketplace_cost_total",
+    "marketplace_cost_details",
+    "draft_invoice",
+)
+
+
+def _process_sale_checkout(sales_id, checkout):
+    """
+    Validasi dan simpan satu transaksi penjualan, lalu commit.
+
+    ``checkout`` berasal dari ``_checkout_input_from_form`` atau
+    ``_checkout_input_from_json``. Kesalahan input dilempar sebagai ValueError.
+    """
+    if not sales_id:
+        raise ValueError("Silakan login sebelum mencatat penjualan.")
+
+    pelanggan_id = checkout.get("pelanggan_id")
+    if not pelanggan_id:
+        raise ValueError("Pilih pelanggan sebelum menyimpan transaksi.")
+
+    customer_exists = db.session.get(Pelanggan, pelanggan_id)
+    if not customer_exists:
+        raise ValueError("Pelanggan tidak ditemukan. Pilih pelanggan yang valid.")
+
+    today = local_today()
+    locked_period = _get_locked_period_for_date(today)
+    if locked_period:
+        raise ValueError(
+            f"Periode {locked_period.label} sudah ditutup; tidak bisa mencatat penjualan baru."
+        )
+
+    active_shift = _get_open_shift(sales_id)
+    if not active_shift:
+        raise ValueError(
+            "Shift kasir belum dibuka. Buka shift terlebih dahulu sebelum mencatat penjualan."
+        )
+
+    produk_id_list = checkout.get("produk_id") or []
+    jumlah_list = checkout.get("jumlah") or []
+    harga_list = checkout.get("harga") or []
+    diskon_list = checkout.get("diskon") or []
+    pajak_list = checkout.get("pajak") or []
+    payment_method = (checkout.get("payment_method") or "").strip()
+    due_date = _parse_date_param(checkout.get("due_date"))
+    expedition_id = _parse_int_param(checkout.get("expedition_id"))
+    payment_channel_id = _parse_int_param(checkout.get("payment_channel_id"))
+    shipping_fee = _parse_float_param(checkout.get("shipping_fee")) or 0.0
+    amount_paid = _parse_float_param(checkout.get("amount_paid")) or 0.0
+    change_due = _parse_float_param(checkout.get("change_due")) or 0.0
+    quotation_id = _parse_int_param(checkout.get("quotation_id"))
+
+    line_items = []
+    errors = []
+    reserved_stock = defaultdict(int)
+
+    parsed_product_ids = []
+    for idx, raw_product_id in enumerate(produk_id_list):
+        if not raw_product_id:
+            parsed_product_ids.append(None)
+            continue
+        try:
+            parsed_product_ids.append(int(raw_product_id))
+        except (TypeError, ValueError):
+            parsed_product_ids.append(None)
+            errors.append(f"Produk tidak valid pada baris {idx + 1}.")
+
+    # satu query untuk seluruh keranjang; baris dikunci sampai commit
+    begin_stock_write_lock()
+    products_by_id = load_products_for_update(
+        product_id for product_id in parsed_product_ids if product_id
+    )
+
+    for idx, product_id in enumerate(parsed_product_ids):
+        if not product_id:
+            continue
+
+        product = products_by_id.get(product_id)
+        if not product:
+            errors.append(
+                f"Produk dengan ID {product_id} tidak ditemukan (baris {idx + 1})."
+            )
+            continue
+
+        available_stock = (product.stok_lama or 0) - reserved_stock[product.id]
+        if available_stock < 0:
+            available_stock = 0
+
+        qty_raw = jumlah_list[idx] if idx < len(jumlah_list) else ""
+        price_raw = harga_list[idx] if idx < len(harga_list) else ""
+        diskon_raw = diskon_list[idx] if idx < len(diskon_list) else ""
+        pajak_raw = pajak_list[idx] if idx < len(pajak_list) else ""
+
+        try:
+            qty = int(qty_raw)
+        except (TypeError, ValueError):
+            qty = 0
+
+        if qty <= 0:
+            errors.append(
+                f"Jumlah harus lebih dari 0 untuk {product.nama_produk}."
+            )
+            continue
+
+        if qty > available_stock:
+            errors.append(
+                f"Stok {product.nama_produk} tidak mencukupi. Sisa {available_stock}, diminta {qty}."
+            )
+            continue
+
+        try:
+            price = (
+                float(price_raw)
+                if price_raw not in (None, "")
+                else float(product.harga or 0.0)
+            )
+        except (TypeError, ValueError):
+            price = float(product.harga or 0.0)
+
+        try:
+            discount = (
+                float(diskon_raw) if diskon_raw not in (None, "") else 0.0
+            )
+        except (TypeError, ValueError):
+            discount = 0.0
+
+        try:
+            tax = float(pajak_raw) if pajak_raw not in (None, "") else 0.0
+        except (TypeError, ValueError):
+            tax = 0.0
+
+        discount = max(0.0, min(discount, 100.0))
+        tax = max(0.0, tax)
+
+        base_total = price * qty
+        discount_amount = base_total * (discount / 100.0)
+        taxable_base = base_total - discount_amount
+        tax_amount = taxable_base * (tax / 100.0)
+        line_total = taxable_base + tax_amount
+
+        line_items.append(
+            {
+                "product": product,
+                "qty": qty,
+                "price": price,
+                "discount": discount,
+                "tax": tax,
+                "line_total": line_total,
+                "stock_before": available_stock,
+                "weight": float(product.berat or 0.0),
+            }
+        )
+        reserved_stock[product.id] += qty
+
+    if errors:
+        raise ValueError(" ".join(errors))
+
+    if not line_items:
+        raise ValueError("Tambahkan minimal satu produk dengan jumlah valid.")
+
+    allowed_methods = {"Tunai", "Kartu", "Tempo", "Transfer", "QRIS"}
+    if payment_method not in allowed_methods:
+        raise ValueError("Metode pembayaran tidak valid.")
+    if payment_method == "Tempo" and not due_date:
+        raise ValueError("Tanggal jatuh tempo wajib diisi untuk pembayaran tempo.")
+    payment_channel = None
+    channel_methods = {"Kartu", "Transfer", "QRIS"}
+    if payment_method in channel_methods:
+        if not payment_channel_id:
+            raise ValueError("Pilih detail pembayaran untuk metode tersebut.")
+        payment_channel = db.session.get(PaymentChannel, payment_channel_id)
+        if not payment_channel or payment_channel.channel_type != payment_method:
+            raise ValueError("Detail metode pembayaran tidak valid.")
+    else:
+        payment_channel_id = None
+    shipping_fee = max(0.0, shipping_fee)
+    line_items_total = sum(item["line_total"] for item in line_items)
+    grand_total = line_items_total + shipping_fee
+    if payment_method != "Tempo":
+        if amount_paid < grand_total:
+            raise ValueError(
+                "Jumlah bayar kurang dari grand total. Periksa kembali pembayaran."
+            )
+        change_due = max(0.0, amount_paid - grand_total)
+    else:
+        amount_paid = max(0.0, amount_paid)
+        change_due = max(0.0, amount_paid - grand_total)
+
+    hpp_total = _calculate_line_items_hpp(line_items)
+    if hpp_total <= 0:
+        hpp_total = 0.0
+
+    price_level_id_raw = checkout.get("price_level_id")
+    marketplace_cost_total_raw = checkout.get("marketplace_cost_total", "0")
+    marketplace_cost_details_raw = checkout.get("marketplace_cost_details", "[]")
+    try:
+        price_level_id_value = int(price_level_id_raw)
+    except (TypeError, ValueError):
+        price_level_id_value = None
+    try:
+        marketplace_cost_total_value = float(marketplace_cost_total_raw)
+    except (TypeError, ValueError):
+        marketplace_cost_total_value = 0.0
+    marketplace_cost_total_value = max(0.0, marketplace_cost_total_value)
+    marketplace_cost_details_value = (
+        marketplace_cost_details_raw
+        if isinstance(marketplace_cost_details_raw, str)
+        else str(marketplace_cost_details_raw)
+    )
+    if not marketplace_cost_details_value:
+        marketplace_cost_details_value = "[]"
+
+    penjualan = Penjualan(
+        sales_id=sales_id,
+        pelanggan_id=pelanggan_id,
+        total_harga=0.0,
+        price_level_id=price_level_id_value,
+        marketplace_cost_total=marketplace_cost_total_value,
+        marketplace_cost_details=marketplace_cost_details_value,
+        expedition_id=expedition_id,
+        payment_channel_id=payment_channel_id,
+        shipping_fee=shipping_fee,
+        payment_method=payment_method,
+        due_date=due_date,
+        amount_paid=amount_paid,
+        change_due=change_due,
+        total_weight=0.0,
+        shift_id=active_shift.id if active_shift else None,
+    )
+    draft_invoice = (checkout.get("draft_invoice") or "").strip()
+    if draft_invoice:
+        # nomor pratinjau dari form: majukan sequence, pakai bila belum terpakai
+        claim_document_number(
+            DOCUMENT_SALES_INVOICE, draft_invoice, prefix=_get_sales_invoice_prefix()
+        )
+        if Penjualan.query.filter_by(no_faktur=draft_invoice).first():
+            draft_invoice = ""
+    penjualan.no_faktur = draft_invoice or _generate_invoice_number()
+    db.session.add(penjualan)
+    db.session.flush()
+
+    for item in line_items:
+        item["cost"] = product_cost_basis(item["product"])
+        detail = DetailPenjualan(
+            penjualan_id=penjualan.id,
+            produk_id=item["product"].id,
+            jumlah=item["qty"],
+            harga_satuan=item["price"],
+            diskon=item["discount"],
+            pajak=item["tax"],
+            harga_total=item["line_total"],
+            hpp_satuan=item["cost"],
+        )
+        penjualan.total_harga += item["line_total"]
+        penjualan.total_weight += item["weight"] * item["qty"]
+        db.session.add(detail)
+
+    decrement_stock(reserved_stock)
+
+    penjualan.total_harga += shipping_fee
+    apply_sale_to_summary(
+        penjualan,
+        [
+            {
+                "qty": item["qty"],
+                "price": item["price"],
+                "discount": item["discount"],
+                "tax": item["tax"],
+                "cost": item["cost"],
+            }
+            for item in line_items
+        ],
+    )
+
+    settings = accounting_config()
+    if (
+        settings
+        and settings.inventory_account_id
+        and settings.cogs_account_id
+        and hpp_total > 0
+    ):
+        _record_auto_cogs_journal(
+            penjualan,
+            hpp_total,
+            settings,
+            user_id=sales_id,
+        )
+
+    if (
+        settings
+        and settings.marketplace_expense_account_id
+        and settings.marketplace_payable_account_id
+        and marketplace_cost_total_value > 0
+    ):
+        _record_marketplace_fee_journal(
+            penjualan,
+            marketplace_cost_total_value,
+            settings,
+            user_id=sales_id,
+        )
+
+    if quotation_id:
+        quotation = db.session.get(Quotation, quotation_id)
+        if quotation and quotation.status != "cancelled":
+            quotation.status = "converted"
+            quotation.converted_sale_id = penjualan.id
+
+    db.session.commit()
+    return penjualan
+
+
+def _product_cost_basis(product):
+    return float(product.harga_lama or product.harga_beli or product.harga or 0.0)
+
+
+def _get_locked_period_for_date(date_value):
+    # indeks interval di memori, dimuat ulang saat periode/pengaturan berubah
+    return locked_period_for(date_value)
+
+
+def _generate_journal_reference_with_prefix(prefix="JV"):
+    return allocate_document_number(DOCUMENT_JOURNAL, prefix=prefix)
+
+
+def _generate_journal_reference():
+    return _generate_journal_reference_with_prefix("JV")
+
+
+def _generate_invoice_number(prefix=None):
+    """
+    Ambil nomor faktur penjualan berikutnya dari document_sequence.
+    """
+    return allocate_document_number(
+        DOCUMENT_SALES_INVOICE, prefix=prefix or _get_sales_invoice_prefix()
+    )
+
+
+def _generate_purchase_invoice_number(prefix=None):
+    return allocate_document_number(
+        DOCUMENT_PURCHASE_INVOICE, prefix=prefix or _get_purchase_invoice_prefix()
+    )
+
+
+_DRAFT_DOCUMENT_TYPES = {
+    Penjualan: DOCUMENT_SALES_INVOICE,
+    Pembelian: DOCUMENT_PURCHASE_INVOICE,
+}
+
+
+def _build_draft_invoice(prefix, model):
+    """Pratinjau nomor faktur untuk form; nomor baru dipesan saat disimpan."""
+    return preview_document_number(_DRAFT_DOCUMENT_TYPES[model], prefix=prefix)
+
+
+def _get_accounting_setting():
+    return AccountingSetting.query.first()
+
+
+def _calculate_line_items_hpp(line_items):
+    total = 0.0
+    for item in line_items:
+        product = item.get("product")
+        if not product:
+            continue
+        cost_basis = float(
+            product.harga_lama
+            or product.harga_beli
+            or product.harga
+            or 0.0
+        )
+        total += cost_basis * (item.get("qty") or 0)
+    return round(total, 2)
+
+
+def _purchase_total_subquery():
+    base_total = BarangPembelian.harga_beli * BarangPembelian.jumlah
+    discount_pct = func.coalesce(BarangPembelian.diskon, 0) / 100.0
+    tax_pct = func.coalesce(BarangPembelian.pajak, 0) / 100.0
+    line_total = base_total * (1 - discount_pct) * (1 + tax_pct)
+    return (
+        db.session.query(
+            BarangPembelian.pembelian_id.label("pembelian_id"),
+            func.coalesce(func.sum(line_total), 0.0).label("total_amount"),
+        )
+        .group_by(BarangPembelian.pembelian_id)
+        .subquery()
+    )
+
+
+def _payable_payment_sum_subquery():
+    return (
+        db.session.query(
+            PayablePayment.pembelian_id.label("pembelian_id"),
+            func.coalesce(func.sum(PayablePayment.amount), 0.0).label("amount_paid"),
+        )
+        .group_by(PayablePayment.pembelian_id)
+        .subquery()
+    )
+
+
+def _record_auto_cogs_journal(penjualan, amount, settings, user_id=None):
+    if (
+        not settings
+        or not settings.inventory_account_id
+        or not settings.cogs_account_id
+        or amount <= 0
+    ):
+        return None
+
+    entry = JournalEntry(
+        reference=_generate_journal_reference(),
+        date=penjualan.tanggal_penjualan or local_today(),
+        memo=f"Auto COGS – Penjualan {penjualan.no_faktur}",
+        created_by=user_id,
+    )
+    db.session.add(entry)
+    db.session.flush()
+
+    description = f"HPP otomatis untuk invoice {penjualan.no_faktur}"
+    db.session.add(
+        JournalLine(
+            entry_id=entry.id,
+            account_id=settings.cogs_account_id,
+            debit=amount,
+            credit=0.0,
+            description=description,
+        )
+    )
+    db.session.add(
+        JournalLine(
+            entry_id=entry.id,
+            account_id=settings.inventory_account_id,
+            debit=0.0,
+            credit=amount,
+            description=description,
+        )
+    )
+    return entry
+
+
+def _record_marketplace_fee_journal(penjualan, amount, settings, user_id=None):
+    if (
+        not settings
+        or not settings.marketplace_expense_account_id
+        or not settings.marketplace_payable_account_id
+        or amount <= 0
+    ):
+        return None
+
+    entry = JournalEntry(
+        reference=_generate_journal_reference(),
+        date=penjualan.tanggal_penjualan or local_today(),
+        memo=f"Auto Marketplace Fee – Penjualan {penjualan.no_faktur}",
+        created_by=user_id,
+    )
+    db.session.add(entry)
+    db.session.flush()
+
+    description = f"Biaya marketplace otomatis untuk invoice {penjualan.no_faktur}"
+    db.session.add(
+        JournalLine(
+            entry_id=entry.id,
+            account_id=settings.marketplace_expense_account_id,
+            debit=amount,
+            credit=0.0,
+            description=description,
+        )
+    )
+    db.session.add(
+        JournalLine(
+            entry_id=entry.id,
+            account_id=settings.marketplace_payable_account_id,
+            debit=0.0,
+            credit=amount,
+            description=description,
+        )
+    )
+    return entry
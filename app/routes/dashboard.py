@@ -0,0 +1,330 @@
+"""Halaman awal, about dan dashboard."""
+
+from datetime import datetime
+
+from flask import render_template, session, url_for
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+
+from app.models import (
+    CashierShift,
+    DetailPenjualan,
+    Pelanggan,
+    Pembelian,
+    Penjualan,
+    Produk,
+    SalesDailySummary,
+    Supplier,
+    db,
+)
+from app.routes import bp
+from app.routes.common import (
+    ALL_ROLE_CHOICES,
+    INVENTORY_ROLES,
+    ROLE_ADMIN,
+    ROLE_GUDANG,
+    ROLE_KASIR,
+    ROLE_SALES,
+    SALES_ROLES,
+    login_required,
+    roles_required,
+)
+from app.services.sales_summary_service import summary_grouped, summary_totals
+from app.services.shift_service import last_sweep
+from app.time_utils import local_now, local_today
+
+
+@bp.route("/")
+def index():
+    stats = {
+        "produk": Produk.query.count(),
+        "penjualan": Penjualan.query.count(),
+        "pembelian": Pembelian.query.count(),
+        "pelanggan": Pelanggan.query.count(),
+        "supplier": Supplier.query.count(),
+    }
+
+    recent_sales = (
+        Penjualan.query.order_by(Penjualan.tanggal_penjualan.desc()).limit(5).all()
+    )
+    recent_purchases = (
+        Pembelian.query.order_by(Pembelian.tanggal_faktur.desc()).limit(5).all()
+    )
+
+    if session.get("user_id"):
+        quick_links = [
+            {
+                "title": "Mulai Penjualan",
+                "subtitle": "Catat transaksi baru",
+                "icon": "fa-cash-register",
+                "url": url_for("main.penjualan"),
+                "tag": "Transaksi",
+            },
+            {
+                "title": "Tambah Produk",
+                "subtitle": "Kelola inventori",
+                "icon": "fa-box-open",
+                "url": url_for("main.produk"),
+                "tag": "Inventori",
+            },
+            {
+                "title": "Kelola Supplier",
+                "subtitle": "Bangun relasi pemasok",
+                "icon": "fa-truck",
+                "url": url_for("main.supplier"),
+                "tag": "Relasi",
+            },
+            {
+                "title": "Data Pelanggan",
+                "subtitle": "Lihat daftar pelanggan",
+                "icon": "fa-users",
+                "url": url_for("main.pelanggan"),
+                "tag": "CRM",
+            },
+        ]
+    else:
+        quick_links = [
+            {
+                "title": "Masuk ke akun",
+                "subtitle": "Lihat fitur lengkap aplikasi",
+                "icon": "fa-sign-in-alt",
+                "url": url_for("main.login"),
+                "tag": "Akses",
+            },
+            {
+                "title": "Buat akun baru",
+                "subtitle": "Mulai kelola penjualan secara digital",
+                "icon": "fa-user-plus",
+                "url": url_for("main.register"),
+                "tag": "Daftar",
+            },
+            {
+                "title": "Jelajahi fitur",
+                "subtitle": "Kenali kemampuan POS lebih dekat",
+                "icon": "fa-info-circle",
+                "url": url_for("main.about"),
+                "tag": "Panduan",
+            },
+            {
+                "title": "Hubungi tim",
+                "subtitle": "Siap bantu setup pertama Anda",
+                "icon": "fa-headset",
+                "url": url_for("main.about"),
+                "tag": "Dukungan",
+            },
+        ]
+
+    return render_template(
+        "index.html",
+        stats=stats,
+        recent_sales=recent_sales,
+        recent_purchases=recent_purchases,
+        quick_links=quick_links,
+    )
+
+
+@bp.route("/about")
+def about():
+    return render_template("about.html")
+
+
+@bp.route("/dashboard")
+@login_required
+@roles_required(*ALL_ROLE_CHOICES)
+def dashboard():
+    username = session.get("username")
+    role = (session.get("role") or "").lower()
+    is_admin = role == ROLE_ADMIN
+    is_sales_role = role in SALES_ROLES
+    is_inventory_role = role in INVENTORY_ROLES
+    is_cashier = role == ROLE_KASIR
+    is_sales_staff = role == ROLE_SALES
+    is_gudang = role == ROLE_GUDANG
+    is_inventory_only = is_inventory_role and not is_sales_role
+    auto_closed_shift_log = session.pop("auto_closed_shift_log", None) or last_sweep()
+    today = local_today()
+    now = local_now()
+    month_start = now.replace(day=1).date()
+
+    # angka penjualan diambil dari rekap harian, bukan dari seluruh riwayat
+    overall = summary_totals()
+    total_net_revenue = overall["net_revenue"]
+    total_marketplace_cost = overall["marketplace_cost"]
+    total_transactions = overall["orders"]
+    average_ticket = total_net_revenue / total_transactions if total_transactions else 0
+
+    today_summary = summary_totals(SalesDailySummary.summary_date == today)
+    today_revenue = today_summary["net_revenue"]
+    today_transactions = today_summary["orders"]
+
+    month_summary = summary_totals(SalesDailySummary.summary_date >= month_start)
+    month_revenue = month_summary["net_revenue"]
+    month_transactions = month_summary["orders"]
+
+    year_col = func.extract("year", SalesDailySummary.summary_date)
+    month_col = func.extract("month", SalesDailySummary.summary_date)
+    monthly_rows = summary_grouped(
+        [year_col, month_col],
+        order_by=[year_col.desc(), month_col.desc()],
+        limit=6,
+    )
+
+    monthly_trend = []
+    for (year, month), values in sorted(
+        ((int(year), int(month)), values) for (year, month), values in monthly_rows
+    ):
+        label = datetime(year=year, month=month, day=1).strftime("%b %Y")
+        monthly_trend.append({"label": label, "amount": values["net_revenue"]})
+
+    top_products_raw = (
+        db.session.query(
+            Produk.nama_produk.label("name"),
+            func.sum(DetailPenjualan.jumlah).label("units"),
+            func.sum(DetailPenjualan.harga_total).label("revenue"),
+        )
+        .join(Produk, Produk.id == DetailPenjualan.produk_id)
+        .group_by(Produk.id)
+        .order_by(func.sum(DetailPenjualan.jumlah).desc())
+        .limit(5)
+        .all()
+    )
+    top_products = [
+        {
+            "name": row.name,
+            "units": int(row.units or 0),
+            "revenue": float(row.revenue or 0),
+        }
+        for row in top_products_raw
+    ]
+
+    low_stock_query = Produk.query.filter(
+        Produk.stok_minimal.isnot(None),
+        Produk.stok_minimal > 0,
+        Produk.stok_lama <= Produk.stok_minimal,
+    )
+    low_stock_count = low_stock_query.count()
+    low_stock_products = (
+        low_stock_query.order_by(Produk.stok_lama.asc()).limit(5).all()
+    )
+
+    dashboard_summary = {
+        "total_net_revenue": total_net_revenue,
+        "total_marketplace_cost": total_marketplace_cost,
+        "total_transactions": total_transactions,
+        "average_ticket": average_ticket,
+        "today_net_revenue": today_revenue,
+        "today_transactions": today_transactions,
+        "month_net_revenue": month_revenue,
+        "month_transactions": month_transactions,
+        "customer_count": Pelanggan.query.count(),
+        "product_count": Produk.query.count(),
+        "low_stock_count": low_stock_count,
+    }
+    supplier_count = Supplier.query.count()
+
+    outstanding_expr = Penjualan.total_harga - func.coalesce(Penjualan.amount_paid, 0)
+    overdue_filters = [
+        Penjualan.payment_method == "Tempo",
+        outstanding_expr > 0,
+        Penjualan.due_date.isnot(None),
+        Penjualan.due_date < today,
+    ]
+    overdue_total = (
+        db.session.query(func.coalesce(func.sum(outstanding_expr), 0))
+        .filter(*overdue_filters)
+        .scalar()
+        or 0
+    )
+    overdue_count = (
+        db.session.query(func.count(Penjualan.id)).filter(*overdue_filters).scalar()
+        or 0
+    )
+    overdue_sales = (
+        Penjualan.query.options(
+            joinedload(Penjualan.pelanggan),
+            joinedload(Penjualan.sales),
+        )
+        .filter(*overdue_filters)
+        .order_by(Penjualan.due_date.asc(), Penjualan.id.desc())
+        .limit(5)
+        .all()
+    )
+    overdue_rows = []
+    for sale in overdue_sales:
+        total = float(sale.total_harga or 0.0)
+        amount_paid = float(sale.amount_paid or 0.0)
+        outstanding = max(total - amount_paid, 0.0)
+        days_overdue = (today - sale.due_date).days if sale.due_date else 0
+        overdue_rows.append(
+            {
+                "id": sale.id,
+                "invoice": sale.no_faktur,
+                "customer_name": sale.pelanggan.nama if sale.pelanggan else "Umum",
+                "due_date": sale.due_date,
+                "outstanding": outstanding,
+                "days_overdue": days_overdue,
+            }
+        )
+
+    active_shifts = (
+        CashierShift.query.options(joinedload(CashierShift.user))
+        .filter(CashierShift.closed_at.is_(None))
+        .order_by(CashierShift.opened_at.desc())
+        .all()
+    )
+    active_shift_rows = [
+        {
+            "id": shift.id,
+            "username": shift.user.username if shift.user else "-",
+            "opened_at": shift.opened_at,
+            "shift_date": shift.shift_date,
+        }
+        for shift in active_shifts
+    ]
+
+    recent_sales = (
+        Penjualan.query.options(
+            joinedload(Penjualan.pelanggan),
+            joinedload(Penjualan.sales),
+        )
+        .order_by(Penjualan.tanggal_penjualan.desc(), Penjualan.id.desc())
+        .limit(5)
+        .all()
+    )
+    recent_rows = [
+        {
+            "id": sale.id,
+            "invoice": sale.no_faktur,
+            "sale_date": sale.tanggal_penjualan,
+            "customer_name": sale.pelanggan.nama if sale.pelanggan else "Umum",
+            "sales_name": sale.sales.username if sale.sales else "-",
+            "payment_method": sale.payment_method or "-",
+            "total": float(sale.total_harga or 0.0),
+        }
+        for sale in recent_sales
+    ]
+
+    return render_template(
+        "dashboard.html",
+        username=username,
+        summary=dashboard_summary,
+        monthly_trend=monthly_trend,
+        top_products=top_products,
+        low_stock_products=low_stock_products,
+        supplier_count=supplier_count,
+        overdue_summary={
+            "total": overdue_total,
+            "count": overdue_count,
+        },
+        overdue_rows=overdue_rows,
+        active_shifts=active_shift_rows,
+        recent_sales=recent_rows,
+        is_admin=is_admin,
+        is_sales_role=is_sales_role,
+        is_inventory_role=is_inventory_role,
+        is_inventory_only=is_inventory_only,
+        is_cashier=is_cashier,
+        is_sales_staff=is_sales_staff,
+        is_gudang=is_gudang,
+        auto_closed_shift_log=auto_closed_shift_log,
+    )
@@ -0,0 +1,2378 @@
+"""Route produk, satuan, kategori, harga (level/update) dan stok opname."""
+
+import json
+import logging
+import math
+from collections import defaultdict
+from datetime import datetime
+from io import BytesIO, StringIO
+
+from flask import (
+    flash,
+    jsonify,
+    make_response,
+    redirect,
+    render_template,
+    request,
+    session,
+    url_for,
+)
+from sqlalchemy import func, or_
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import joinedload
+
+from app.models import (
+    JournalEntry,
+    JournalLine,
+    Kategori,
+    MarketplacePricingSetting,
+    PriceChange,
+    PriceLevel,
+    PriceLevelCost,
+    ProductPriceLevel,
+    Produk,
+    Satuan,
+    StockOpnameItem,
+    StockOpnameSession,
+    Supplier,
+    db,
+)
+from app.routes import bp
+from app.routes.common import (
+    ALL_ROLE_CHOICES,
+    INVENTORY_ROLES,
+    _format_date_id,
+    _generate_journal_reference_with_prefix,
+    _get_accounting_setting,
+    _parse_float_param,
+    _parse_int_param,
+    _product_cost_basis,
+    _start_import_job,
+    login_required,
+    roles_required,
+)
+from app.schema_registry import table_ready
+from app.services.document_number_service import DOCUMENT_STOCK_OPNAME, allocate_document_number
+from app.time_utils import local_now, local_today
+
+
+def _normalize_price_value(raw_value):
+    if raw_value in (None, "", "null"):
+        return None
+    if isinstance(raw_value, (int, float)):
+        return float(raw_value)
+    try:
+        value = str(raw_value).strip()
+    except Exception:
+        return None
+    if not value:
+        return None
+    cleaned = value.replace("Rp", "").replace(" ", "")
+    if "," in cleaned and "." in cleaned:
+        if cleaned.find(",") > cleaned.find("."):
+            cleaned = cleaned.replace(".", "").replace(",", ".")
+        else:
+            cleaned = cleaned.replace(",", "")
+    else:
+        cleaned = cleaned.replace(",", ".")
+    try:
+        return float(cleaned)
+    except Exception:
+        try:
+            return float(value)
+        except Exception:
+            return None
+
+
+def _build_price_level_entries(payload, level_lookup):
+    payload = payload or []
+    normalized_entries = []
+    seen = set()
+    for row in payload:
+        if not isinstance(row, dict):
+            continue
+        try:
+            level_id = int(row.get("level_id"))
+        except (TypeError, ValueError):
+            continue
+        if level_id in seen or level_id not in level_lookup:
+            continue
+        price_value = _normalize_price_value(row.get("price"))
+        if price_value is None:
+            continue
+        seen.add(level_id)
+        normalized_entries.append(
+            {
+                "level_id": level_id,
+                "price": price_value,
+            }
+        )
+    return normalized_entries
+
+
+def _sync_product_price_levels(
+    product, payload, level_lookup, normalized_entries=None
+):
+    normalized_entries = (
+        normalized_entries
+        if normalized_entries is not None
+        else _build_price_level_entries(payload, level_lookup)
+    )
+
+    existing_entries = {entry.level_id: entry for entry in product.level_prices}
+    keep_ids = set()
+
+    for entry in normalized_entries:
+        level_id = entry["level_id"]
+        keep_ids.add(level_id)
+        record = existing_entries.get(level_id)
+        if record:
+            record.price = entry["price"]
+        else:
+            record = ProductPriceLevel(
+                product_id=product.id,
+                level_id=level_id,
+                price=entry["price"],
+            )
+            db.session.add(record)
+
+    for level_id, record in list(existing_entries.items()):
+        if level_id not in keep_ids:
+            db.session.delete(record)
+
+    db.session.flush()
+
+    default_entry = None
+    if product.level_prices:
+        retail_level_id = next(
+            (
+                level_id
+                for level_id in keep_ids
+                if level_lookup.get(level_id)
+                and (level_lookup[level_id].name or "").lower() == "retail"
+            ),
+            None,
+        )
+        if retail_level_id is not None:
+            default_entry = next(
+                (
+                    entry
+                    for entry in product.level_prices
+                    if entry.level_id == retail_level_id
+                ),
+                None,
+            )
+        if not default_entry:
+            default_entry = product.level_prices[0]
+
+    product.harga = float(default_entry.price) if default_entry else 0.0
+
+
+@bp.route("/kelola-harga", methods=["GET", "POST"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def kelola_harga():
+    rounding_options = [
+        {"value": "none", "label": "Tidak dibulatkan"},
+        {"value": "round_100", "label": "Ke atas kelipatan 100"},
+        {"value": "round_500", "label": "Ke atas kelipatan 500"},
+        {"value": "round_1000", "label": "Ke atas kelipatan 1.000"},
+        {"value": "round_900", "label": "Psikologis (xx.900)"},
+    ]
+    rounding_lookup = {opt["value"]: opt["label"] for opt in rounding_options}
+
+    def _round_up_multiple(value, step):
+        if step <= 0:
+            return math.ceil(value)
+        return math.ceil(value / step) * step
+
+    def _round_psych_900(value):
+        base = math.floor(value / 1000) * 1000
+        candidate = base + 900
+        if candidate < value:
+            candidate += 1000
+        return candidate
+
+    def _apply_rounding(value, mode):
+        if mode == "round_100":
+            return _round_up_multiple(value, 100)
+        if mode == "round_500":
+            return _round_up_multiple(value, 500)
+        if mode == "round_1000":
+            return _round_up_multiple(value, 1000)
+        if mode == "round_900":
+            return _round_psych_900(value)
+        return math.ceil(value)
+
+    price_levels = PriceLevel.query.order_by(PriceLevel.name.asc()).all()
+    cost_entries = (
+        PriceLevelCost.query.filter(PriceLevelCost.is_active.is_(True))
+        .order_by(PriceLevelCost.level_id.asc(), PriceLevelCost.name.asc())
+        .all()
+    )
+    fee_map = {
+        level.id: {"percent": 0.0, "nominal": 0.0}
+        for level in price_levels
+    }
+    for cost in cost_entries:
+        bucket = fee_map.setdefault(cost.level_id, {"percent": 0.0, "nominal": 0.0})
+        if cost.type == "percent":
+            bucket["percent"] += float(cost.value or 0.0)
+        else:
+            bucket["nominal"] += float(cost.value or 0.0)
+
+    marketplace_levels = []
+    for level in price_levels:
+        totals = fee_map.get(level.id, {"percent": 0.0, "nominal": 0.0})
+        marketplace_levels.append(
+            {
+                "id": level.id,
+                "name": level.name,
+                "fee_percent": totals["percent"],
+                "fee_nominal": totals["nominal"],
+            }
+        )
+    has_price_levels = bool(price_levels)
+    if not marketplace_levels:
+        marketplace_levels = [
+            {
+                "id": 0,
+                "name": "Tokopedia / Shopee",
+                "fee_percent": 18.0,
+                "fee_nominal": 0.0,
+            },
+            {
+                "id": 1,
+                "name": "Blibli / Lazada",
+                "fee_percent": 10.5,
+                "fee_nominal": 0.0,
+            },
+        ]
+
+    form_data = {
+        "product_name": "",
+        "sku": "",
+        "cost": "",
+        "packing": "",
+        "target_profit": "",
+        "rounding_mode": "round_100",
+    }
+
+    if request.method == "POST":
+        action = (request.form.get("action") or "").strip()
+        if action == "save":
+            record_id = _parse_int_param(request.form.get("record_id"))
+            product_name = (request.form.get("product_name") or "").strip()
+            sku = (request.form.get("sku") or "").strip()
+            cost = _parse_float_param(request.form.get("cost"))
+            packing = _parse_float_param(request.form.get("packing"))
+            target_profit = _parse_float_param(request.form.get("target_profit"))
+            rounding_mode = (request.form.get("rounding_mode") or "").strip()
+            if rounding_mode not in rounding_lookup:
+                rounding_mode = "round_100"
+
+            if cost is None or packing is None or target_profit is None:
+                flash("HPP, packing, dan target laba wajib diisi.", "warning")
+                return redirect(url_for("main.kelola_harga"))
+            if cost < 0 or packing < 0 or target_profit < 0:
+                flash("Nilai biaya tidak boleh negatif.", "warning")
+                return redirect(url_for("main.kelola_harga"))
+
+            if record_id:
+                record = db.session.get(MarketplacePricingSetting, record_id)
+            else:
+                record = None
+
+            if record:
+                record.product_name = product_name or None
+                record.sku = sku or None
+                record.cost = cost
+                record.packing = packing
+                record.target_profit = target_profit
+                record.rounding_mode = rounding_mode
+                record.created_by = record.created_by or session.get("user_id")
+            else:
+                record = MarketplacePricingSetting(
+                    product_name=product_name or None,
+                    sku=sku or None,
+                    cost=cost,
+                    packing=packing,
+                    target_profit=target_profit,
+                    rounding_mode=rounding_mode,
+                    created_by=session.get("user_id"),
+                )
+                db.session.add(record)
+            db.session.commit()
+            flash("Setting harga marketplace disimpan.", "success")
+            return redirect(url_for("main.kelola_harga", load=record.id))
+
+        if action == "delete":
+            record_id = _parse_int_param(request.form.get("record_id"))
+            if not record_id:
+                flash("Data tidak ditemukan.", "warning")
+                return redirect(url_for("main.kelola_harga"))
+            record = db.session.get(MarketplacePricingSetting, record_id)
+            if record:
+                db.session.delete(record)
+                db.session.commit()
+                flash("Data pricing dihapus.", "success")
+            return redirect(url_for("main.kelola_harga"))
+
+        if action == "apply_levels":
+            if not has_price_levels:
+                flash("Level harga belum tersedia untuk diterapkan.", "warning")
+                return redirect(url_for("main.kelola_harga"))
+            product_id = _parse_int_param(request.form.get("product_id"))
+            cost = _parse_float_param(request.form.get("cost"))
+            packing = _parse_float_param(request.form.get("packing"))
+            target_profit = _parse_float_param(request.form.get("target_profit"))
+            rounding_mode = (request.form.get("rounding_mode") or "").strip()
+            if rounding_mode not in rounding_lookup:
+                rounding_mode = "round_100"
+
+            if not product_id:
+                flash("Pilih produk dari daftar sebelum menerapkan.", "warning")
+                return redirect(url_for("main.kelola_harga"))
+            if cost is None or packing is None or target_profit is None:
+                flash("HPP, packing, dan target laba wajib diisi.", "warning")
+                return redirect(url_for("main.kelola_harga"))
+            if cost < 0 or packing < 0 or target_profit < 0:
+                flash("Nilai biaya tidak boleh negatif.", "warning")
+                return redirect(url_for("main.kelola_harga"))
+
+            product = db.session.get(Produk, product_id)
+            if not product:
+                flash("Produk tidak ditemukan.", "warning")
+                return redirect(url_for("main.kelola_harga"))
+
+            level_ids = []
+            for raw_level in request.form.getlist("level_ids"):
+                try:
+                    level_id = int(raw_level)
+                except (TypeError, ValueError):
+                    continue
+                if level_id in fee_map:
+                    level_ids.append(level_id)
+
+            if not level_ids:
+                flash("Pilih minimal satu level harga untuk diterapkan.", "warning")
+                return redirect(url_for("main.kelola_harga"))
+
+            base = cost + packing
+            updated_count = 0
+            for level_id in level_ids:
+                totals = fee_map.get(level_id, {"percent": 0.0, "nominal": 0.0})
+                fee = min(max((totals["percent"] or 0.0) / 100, 0), 0.95)
+                base_with_nominal = base + float(totals["nominal"] or 0.0)
+                raw_price = (
+                    (base_with_nominal + target_profit) / (1 - fee)
+                    if fee < 1
+                    else 0.0
+                )
+                rounded_price = _apply_rounding(raw_price, rounding_mode)
+                entry = ProductPriceLevel.query.filter_by(
+                    product_id=product_id, level_id=level_id
+                ).first()
+                if entry:
+                    entry.price = rounded_price
+                else:
+                    entry = ProductPriceLevel(
+                        product_id=product_id,
+                        level_id=level_id,
+                        price=rounded_price,
+                    )
+                    db.session.add(entry)
+                updated_count += 1
+
+            db.session.commit()
+            flash(
+                f"Berhasil menerapkan {updated_count} harga level untuk {product.nama_produk}.",
+                "success",
+            )
+            return redirect(url_for("main.kelola_harga"))
+
+    loaded_product = None
+    load_id = _parse_int_param(request.args.get("load"))
+    if load_id:
+        record = db.session.get(MarketplacePricingSetting, load_id)
+        if record:
+            form_data.update(
+                {
+                    "product_name": record.product_name or "",
+                    "sku": record.sku or "",
+                    "cost": record.cost,
+                    "packing": record.packing,
+                    "target_profit": record.target_profit,
+                    "rounding_mode": record.rounding_mode,
+                    "record_id": record.id,
+                }
+            )
+            product_match = None
+            if record.sku:
+                product_match = Produk.query.filter(
+                    func.lower(Produk.sku) == record.sku.lower()
+                ).first()
+            if not product_match and record.product_name:
+                product_match = Produk.query.filter(
+                    func.lower(Produk.nama_produk) == record.product_name.lower()
+                ).first()
+            if not product_match and record.product_name:
+                product_match = Produk.query.filter(
+                    func.lower(Produk.kode_produk) == record.product_name.lower()
+                ).first()
+            if product_match:
+                form_data["product_id"] = product_match.id
+                form_data["product_name"] = (
+                    product_match.nama_produk or form_data["product_name"]
+                )
+                form_data["sku"] = product_match.sku or form_data["sku"]
+                level_entries = (
+                    ProductPriceLevel.query.options(joinedload(ProductPriceLevel.level))
+                    .filter(ProductPriceLevel.product_id == product_match.id)
+                    .all()
+                )
+                loaded_product = {
+                    "id": product_match.id,
+                    "kode_produk": product_match.kode_produk,
+                    "nama_produk": product_match.nama_produk,
+                    "sku": product_match.sku,
+                    "price_levels": sorted(
+                        [
+                            {
+                                "level_id": entry.level_id,
+                                "level_name": entry.level.name if entry.level else "",
+                                "price": entry.price,
+                            }
+                            for entry in level_entries
+                        ],
+                        key=lambda item: (item.get("level_name") or "").lower(),
+                    ),
+                }
+
+    records = (
+        MarketplacePricingSetting.query.order_by(
+            MarketplacePricingSetting.updated_at.desc(),
+            MarketplacePricingSetting.id.desc(),
+        )
+        .limit(50)
+        .all()
+    )
+    record_rows = []
+    for record in records:
+        base = float(record.cost or 0.0) + float(record.packing or 0.0)
+        record_rows.append(
+            {
+                "id": record.id,
+                "product_name": record.product_name or "-",
+                "sku": record.sku or "-",
+                "base": base,
+                "target_profit": record.target_profit,
+                "rounding": rounding_lookup.get(record.rounding_mode, record.rounding_mode),
+                "updated_at": record.updated_at,
+            }
+        )
+
+    return render_template(
+        "kelola_harga.html",
+        form_data=form_data,
+        rounding_options=rounding_options,
+        records=record_rows,
+        marketplace_levels=marketplace_levels,
+        has_price_levels=has_price_levels,
+        loaded_product=loaded_product,
+    )
+
+
+@bp.route("/pricing", methods=["GET"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def pricing():
+    return redirect(url_for("main.kelola_harga"))
+
+
+@bp.route("/satuan", methods=["GET", "POST"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def satuan():
+    if request.method == "POST":
+        # Ambil data dari formulir
+        name = request.form["satuan"]
+
+        # Simpan ke database
+        new_satuan = Satuan(name=name)
+        db.session.add(new_satuan)
+        db.session.commit()
+        flash("Satuan added successfully!", "success")
+        return redirect("/satuan")
+
+    # Ambil semua data satuan untuk ditampilkan
+    satuans = Satuan.query.all()
+    return render_template("data_satuan.html", satuans=satuans)
+
+
+@bp.route("/satuan/edit/<int:satuan_id>", methods=["GET", "POST"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def edit_satuan(satuan_id):
+    satuan = Satuan.query.get_or_404(satuan_id)
+
+    if request.method == "POST":
+        # Ambil data dari formulir dan perbarui database
+        satuan.name = request.form["satuan"]
+        db.session.commit()
+        flash("Satuan updated successfully!", "success")
+        return redirect("/satuan")
+
+    # Kirim data satuan ke template untuk diisi di formulir
+    satuans = Satuan.query.all()
+    return render_template("data_satuan.html", edit_satuan=satuan, satuans=satuans)
+
+
+@bp.route("/satuan/delete/<int:satuan_id>", methods=["POST"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def delete_satuan(satuan_id):
+    satuan = Satuan.query.get_or_404(satuan_id)
+    if Produk.query.filter_by(satuan_id=satuan.id).count():
+        flash(
+            "Tidak dapat menghapus satuan karena masih digunakan oleh produk.",
+            "warning",
+        )
+        return redirect(url_for("main.satuan"))
+    db.session.delete(satuan)
+    db.session.commit()
+    flash("Satuan deleted successfully!", "success")
+    return redirect("/satuan")
+
+
+@bp.route("/kategori", methods=["GET", "POST"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def kategori():
+    if request.method == "POST":
+        # Ambil data dari formulir
+        name = request.form["kategori"]
+
+        # Simpan ke database
+        new_kategori = Kategori(name=name)
+        db.session.add(new_kategori)
+        db.session.commit()
+        flash("Kategori added successfully!", "success")
+        return redirect("/kategori")
+
+    # Ambil semua data kategori untuk ditampilkan
+    kategoris = Kategori.query.all()
+    return render_template("data_kategori.html", kategoris=kategoris)
+
+
+@bp.route("/kategori/edit/<int:kategori_id>", methods=["GET", "POST"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def edit_kategori(kategori_id):
+    kategori = Kategori.query.get_or_404(kategori_id)
+
+    if request.method == "POST":
+        # Ambil data dari formulir dan perbarui di database
+        kategori.name = request.form["kategori"]
+        db.session.commit()
+        flash("Kategori updated successfully!", "success")
+        return redirect("/kategori")
+
+    # Kirim data kategori yang akan diedit ke template
+    kategoris = Kategori.query.all()
+    return render_template(
+        "data_kategori.html", edit_kategori=kategori, kategoris=kategoris
+    )
+
+
+@bp.route("/kategori/delete/<int:kategori_id>", methods=["POST"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def delete_kategori(kategori_id):
+    kategori = Kategori.query.get_or_404(kategori_id)
+    if Produk.query.filter_by(kategori_id=kategori.id).count():
+        flash(
+            "Tidak dapat menghapus kategori karena masih digunakan oleh produk.",
+            "warning",
+        )
+        return redirect(url_for("main.kategori"))
+    db.session.delete(kategori)
+    db.session.commit()
+    flash("Kategori deleted successfully!", "success")
+    return redirect("/kategori")
+
+
+@bp.route("/produk", methods=["GET", "POST"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def produk():
+    satuans = Satuan.query.all()
+    kategoris = Kategori.query.all()
+    suppliers = Supplier.query.all()
+    price_levels = PriceLevel.query.order_by(PriceLevel.name.asc()).all()
+    price_level_lookup = {level.id: level for level in price_levels}
+
+    # Ambil parameter pencarian dan filter
+    search_query = request.args.get("search", "").strip()
+    kategori_filter = request.args.get("kategori", "").strip()
+    supplier_filter = request.args.get("supplier", "").strip()
+
+    # Jika pengguna mengklik tombol edit
+    produk_id = request.args.get("edit")
+    produk_to_edit = db.session.get(Produk, produk_id) if produk_id else None
+
+    def _parse_float(value, default=None):
+        if value is None:
+            return default
+        try:
+            value = str(value).strip()
+            if not value:
+                return default
+            return float(value)
+        except (TypeError, ValueError):
+            return default
+
+    def _parse_int(value, default=None):
+        if value is None:
+            return default
+        try:
+            value = str(value).strip()
+            if not value:
+                return default
+            return int(value)
+        except (TypeError, ValueError):
+            return default
+
+    def _parse_date(value):
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, "%Y-%m-%d").date()
+        except (TypeError, ValueError):
+            return None
+
+    def _shape_price_levels_for_prefill(entries):
+        shaped = []
+        for entry in entries or []:
+            try:
+                level_id = int(entry.get("level_id"))
+            except (TypeError, ValueError):
+                continue
+            level = price_level_lookup.get(level_id)
+            shaped.append(
+                {
+                    "level_id": level_id,
+                    "level_name": level.name if level else "",
+                    "price": entry.get("price", 0),
+                }
+            )
+        return shaped
+
+    def _store_prefill(form_data, normalized_price_entries=None, focus_field=None):
+        snapshot = {
+            "kode_produk": (form_data.get("kode_produk") or "").strip(),
+            "sku": (form_data.get("sku") or "").strip(),
+            "barcode": (form_data.get("barcode") or "").strip(),
+            "nama_produk": (form_data.get("nama_produk") or "").strip(),
+            "satuan": (form_data.get("satuan") or "").strip(),
+            "kategori": (form_data.get("kategori") or "").strip(),
+            "supplier": (form_data.get("supplier") or "").strip(),
+            "berat": (form_data.get("berat") or "").strip(),
+            "stok_minimal": (form_data.get("stok_minimal") or "").strip(),
+            "tanggal_expired": (form_data.get("tanggal_expired") or "").strip(),
+            "price_levels": _shape_price_levels_for_prefill(
+                normalized_price_entries or []
+            ),
+        }
+        session["produk_form_prefill"] = {
+            "snapshot": snapshot,
+            "focus_field": focus_field,
+        }
+
+    if request.method == "POST":
+        if not produk_to_edit:
+            produk_id_form = request.form.get("produk_id")
+            if produk_id_form:
+                produk_to_edit = db.session.get(Produk, produk_id_form)
+
+        redirect_target = (
+            url_for("main.produk", edit=produk_to_edit.id)
+            if produk_to_edit
+            else url_for("main.produk")
+        )
+
+        kode_produk = request.form.get("kode_produk", "").strip()
+        nama_produk = request.form.get("nama_produk", "").strip()
+        satuan_id = _parse_int(request.form.get("satuan"))
+        kategori_id = _parse_int(request.form.get("kategori"))
+        supplier_id = _parse_int(request.form.get("supplier"))
+        sku = request.form.get("sku", "").strip() or None
+        barcode = request.form.get("barcode", "").strip() or None
+        berat = _parse_float(request.form.get("berat"))
+        stok_minimal = _parse_int(request.form.get("stok_minimal"), default=0)
+        tanggal_expired = _parse_date(request.form.get("tanggal_expired"))
+        raw_price_payload = (request.form.get("price_level_payload") or "").strip()
+        price_level_payload = []
+
+        if raw_price_payload:
+            try:
+                parsed_payload = json.loads(raw_price_payload)
+            except (TypeError, ValueError):
+                _store_prefill(
+                    request.form,
+                    normalized_price_entries=[],
+                    focus_field="kode_produk",
+                )
+                flash(
+                    "Format level harga tidak valid. Muat ulang halaman lalu coba lagi.",
+                    "danger",
+                )
+                return redirect(redirect_target)
+            if isinstance(parsed_payload, list):
+                price_level_payload = parsed_payload
+            else:
+                _store_prefill(
+                    request.form,
+                    normalized_price_entries=[],
+                    focus_field="kode_produk",
+                )
+                flash("Format level harga tidak dikenali.", "danger")
+                return redirect(redirect_target)
+
+        if not price_levels:
+            _store_prefill(
+                request.form,
+                normalized_price_entries=[],
+                focus_field="kode_produk",
+            )
+            flash(
+                "Belum ada level harga. Buat level terlebih dahulu di menu Level Harga.",
+                "warning",
+            )
+            return redirect(redirect_target)
+
+        normalized_price_entries = _build_price_level_entries(
+            price_level_payload, price_level_lookup
+        )
+
+        if not normalized_price_entries:
+            _store_prefill(
+                request.form,
+                normalized_price_entries=[],
+                focus_field="price_level_value",
+            )
+            flash(
+                "Tambahkan minimal satu level harga dengan nilai rupiah yang valid.",
+                "warning",
+            )
+            return redirect(redirect_target)
+
+        retail_level = next(
+            (
+                level
+                for level in price_levels
+                if (level.name or "").strip().lower() == "retail"
+            ),
+            None,
+        )
+
+        if retail_level and not any(
+            entry["level_id"] == retail_level.id for entry in normalized_price_entries
+        ):
+            _store_prefill(
+                request.form,
+                normalized_price_entries=normalized_price_entries,
+                focus_field="price_level_value",
+            )
+            flash(
+                "Isi harga untuk level Retail agar dapat menjadi harga default kasir.",
+                "warning",
+            )
+            return redirect(redirect_target)
+
+        if (
+            not kode_produk
+            or not nama_produk
+            or not satuan_id
+            or not kategori_id
+            or not supplier_id
+        ):
+            missing_field = None
+            for field_name, value in [
+                ("kode_produk", kode_produk),
+                ("nama_produk", nama_produk),
+                ("satuan", satuan_id),
+                ("kategori", kategori_id),
+                ("supplier", supplier_id),
+            ]:
+                if not value:
+                    missing_field = field_name
+                    break
+            _store_prefill(
+                request.form,
+                normalized_price_entries=normalized_price_entries,
+                focus_field=missing_field or "kode_produk",
+            )
+            flash("Pastikan semua field wajib diisi.", "warning")
+            return redirect(url_for("main.produk"))
+
+        try:
+            if produk_to_edit:
+                existing = Produk.query.filter(
+                    Produk.kode_produk == kode_produk, Produk.id != produk_to_edit.id
+                ).first()
+                if existing:
+                    _store_prefill(
+                        request.form,
+                        normalized_price_entries=normalized_price_entries,
+                        focus_field="kode_produk",
+                    )
+                    flash(f"Kode produk {kode_produk} sudah digunakan.", "warning")
+                    return redirect(url_for("main.produk", edit=produk_to_edit.id))
+
+                produk_to_edit.kode_produk = kode_produk
+                produk_to_edit.sku = sku
+                produk_to_edit.barcode = barcode
+                produk_to_edit.nama_produk = nama_produk
+                produk_to_edit.satuan_id = satuan_id
+                produk_to_edit.kategori_id = kategori_id
+                produk_to_edit.supplier_id = supplier_id
+                produk_to_edit.berat = berat
+                produk_to_edit.stok_minimal = stok_minimal or 0
+                produk_to_edit.tanggal_expired = tanggal_expired
+                _sync_product_price_levels(
+                    produk_to_edit,
+                    price_level_payload,
+                    price_level_lookup,
+                    normalized_entries=normalized_price_entries,
+                )
+                db.session.commit()
+                session.pop("produk_form_prefill", None)
+                flash("Produk updated successfully!", "success")
+            else:
+                existing = Produk.query.filter_by(kode_produk=kode_produk).first()
+                if existing:
+                    _store_prefill(
+                        request.form,
+                        normalized_price_entries=normalized_price_entries,
+                        focus_field="kode_produk",
+                    )
+                    flash(f"Kode produk {kode_produk} sudah digunakan.", "warning")
+                    return redirect(url_for("main.produk"))
+
+                new_produk = Produk(
+                    kode_produk=kode_produk,
+                    sku=sku,
+                    barcode=barcode,
+                    nama_produk=nama_produk,
+                    satuan_id=satuan_id,
+                    kategori_id=kategori_id,
+                    supplier_id=supplier_id,
+                    berat=berat,
+                    stok_minimal=stok_minimal or 0,
+                    tanggal_expired=tanggal_expired,
+                )
+                db.session.add(new_produk)
+                db.session.flush()
+                _sync_product_price_levels(
+                    new_produk,
+                    price_level_payload,
+                    price_level_lookup,
+                    normalized_entries=normalized_price_entries,
+                )
+                db.session.commit()
+                session.pop("produk_form_prefill", None)
+                flash("Produk added successfully!", "success")
+
+        except IntegrityError as exc:
+            db.session.rollback()
+            _store_prefill(
+                request.form,
+                normalized_price_entries=normalized_price_entries,
+                focus_field="kode_produk",
+            )
+            flash(f"Gagal menyimpan produk: {str(exc.orig)}", "danger")
+        except Exception as exc:
+            db.session.rollback()
+            logging.exception("Gagal menyimpan produk")
+            _store_prefill(
+                request.form,
+                normalized_price_entries=normalized_price_entries,
+                focus_field="kode_produk",
+            )
+            flash(f"Error: {str(exc)}", "danger")
+
+        return redirect("/produk")
+
+    # Logika pencarian dan filter
+    query = Produk.query
+    if search_query:
+        query = query.filter(
+            or_(
+                Produk.nama_produk.ilike(f"%{search_query}%"),
+                Produk.kode_produk.ilike(f"%{search_query}%"),
+                Produk.sku.ilike(f"%{search_query}%"),
+                Produk.barcode.ilike(f"%{search_query}%"),
+            )
+        )
+    if kategori_filter:
+        query = query.filter(Produk.kategori_id == kategori_filter)
+    if supplier_filter:
+        query = query.filter(Produk.supplier_id == supplier_filter)
+
+    page = request.args.get("page", 1, type=int)
+    per_page = request.args.get("per_page", 10, type=int)
+    per_page = max(5, min(per_page, 50))
+
+    base_query = (
+        query.options(
+            joinedload(Produk.satuan),
+            joinedload(Produk.kategori),
+            joinedload(Produk.supplier),
+        )
+        .order_by(Produk.nama_produk.asc())
+    )
+    pagination = base_query.paginate(page=page, per_page=per_page, error_out=False)
+    produks = pagination.items
+
+    product_ids = [produk.id for produk in produks]
+    product_price_levels_map = defaultdict(list)
+    if product_ids:
+        level_rows = (
+            ProductPriceLevel.query.options(
+                joinedload(ProductPriceLevel.level)
+            )
+            .join(PriceLevel)
+            .filter(ProductPriceLevel.product_id.in_(product_ids))
+            .order_by(PriceLevel.name.asc())
+            .all()
+        )
+        for row in level_rows:
+            product_price_levels_map[row.product_id].append(
+                {
+                    "level_id": row.level_id,
+                    "level_name": row.level.name if row.level else "Level",
+                    "price": row.price,
+                }
+            )
+
+    product_price_levels = {
+        product_id: sorted(
+            entries,
+            key=lambda item: (item["level_name"] or "").lower(),
+        )
+        for product_id, entries in product_price_levels_map.items()
+    }
+    price_updates = {}
+    if product_ids:
+        try:
+            latest_changes = (
+                PriceChange.query.filter(PriceChange.product_id.in_(product_ids))
+                .order_by(PriceChange.product_id.asc(), PriceChange.created_at.desc())
+                .all()
+            )
+            for change in latest_changes:
+                if change.product_id not in price_updates:
+                    price_updates[change.product_id] = {
+                        "new_price": change.new_price,
+                        "updated_at": change.created_at,
+                        "user": change.user.username if change.user else None,
+                    }
+        except Exception:
+            price_updates = {}
+
+    total_produk = pagination.total
+    total_kategori = len(kategoris)
+    total_suppliers = len(suppliers)
+    stok_threshold_missing = Produk.query.filter(
+        or_(Produk.stok_minimal.is_(None), Produk.stok_minimal <= 0)
+    ).count()
+    expiry_tracked = Produk.query.filter(Produk.tanggal_expired.isnot(None)).count()
+    no_barcode = Produk.query.filter(
+        or_(Produk.barcode.is_(None), Produk.barcode == "")
+    ).count()
+
+    prefill_state = session.pop("produk_form_prefill", None)
+    prefill_data = (prefill_state or {}).get("snapshot")
+    focus_field = (prefill_state or {}).get("focus_field")
+
+    edit_price_levels = []
+    if prefill_data and prefill_data.get("price_levels"):
+        edit_price_levels = prefill_data.get("price_levels") or []
+    elif produk_to_edit:
+        edit_price_levels = [
+            {
+                "level_id": entry.level_id,
+                "level_name": entry.level.name if entry.level else "",
+                "price": entry.price,
+            }
+            for entry in sorted(
+                produk_to_edit.level_prices,
+                key=lambda record: (
+                    (record.level.name or "").lower() if record.level else ""
+                ),
+            )
+        ]
+
+    stat_cards = [
+        {
+            "label": "Produk Aktif",
+            "value": total_produk,
+            "icon": "fa-box-open",
+            "accent": "text-primary",
+            "description": "Item tersedia di katalog",
+        },
+        {
+            "label": "Kategori",
+            "value": total_kategori,
+            "icon": "fa-tags",
+            "accent": "text-success",
+            "description": "Kelompok produk yang digunakan",
+        },
+        {
+            "label": "Supplier Terhubung",
+            "value": total_suppliers,
+            "icon": "fa-truck",
+            "accent": "text-warning",
+            "description": "Relasi pemasok tersimpan",
+        },
+        {
+            "label": "Kadaluarsa Dipantau",
+            "value": expiry_tracked,
+            "icon": "fa-hourglass-half",
+            "accent": "text-danger",
+            "description": "Produk memiliki tanggal expired",
+        },
+    ]
+
+    health_insights = [
+        {
+            "title": "Butuh target stok",
+            "value": stok_threshold_missing,
+            "status": "warning" if stok_threshold_missing else "success",
+            "description": "Produk belum memiliki batas stok minimal. Atur angka untuk menghindari kehabisan.",
+        },
+        {
+            "title": "Belum ada barcode",
+            "value": no_barcode,
+            "status": "info" if no_barcode else "success",
+            "description": "Lengkapi barcode agar proses penjualan kasir lebih cepat.",
+        },
+        {
+            "title": "Tanggal expired tercatat",
+            "value": expiry_tracked,
+            "status": "success" if expiry_tracked else "secondary",
+            "description": "Pantau masa kadaluarsa barang sensitif dan atur promo lebih awal.",
+        },
+    ]
+
+    expiring_products = (
+        Produk.query.filter(Produk.tanggal_expired.isnot(None))
+        .order_by(Produk.tanggal_expired.asc())
+        .limit(5)
+        .all()
+    )
+
+    product_import_schema = [
+        {
+            "column": "Kode Produk",
+            "required": True,
+            "description": "Kode unik setiap barang (maks. 50 karakter).",
+        },
+        {"column": "SKU", "required": False, "description": "Kode internal opsional."},
+        {
+            "column": "Nama Produk",
+            "required": True,
+            "description": "Nama barang sesuai katalog.",
+        },
+        {
+            "column": "Satuan ID",
+            "required": True,
+            "description": "ID dari master Data Satuan.",
+        },
+        {
+            "column": "Kategori ID",
+            "required": True,
+            "description": "ID dari master Data Kategori.",
+        },
+        {
+            "column": "Supplier ID",
+            "required": True,
+            "description": "ID pemasok terkait.",
+        },
+        {
+            "column": "Berat",
+            "required": False,
+            "description": "Dalam kilogram, gunakan titik untuk desimal.",
+        },
+        {
+            "column": "Stok Minimal",
+            "required": False,
+            "description": "Batas stok untuk peringatan restock.",
+        },
+        {
+            "column": "Tanggal Expired",
+            "required": False,
+            "description": "Format YYYY-MM-DD, kosongkan jika tidak perlu.",
+        },
+    ]
+
+    price_levels_context = [
+        {"id": level.id, "name": level.name or "", "description": level.description or ""}
+        for level in price_levels
+    ]
+
+    pagination_args = {
+        key: value
+        for key, value in request.args.to_dict().items()
+        if key not in {"page", "ajax"}
+    }
+    if request.args.get("ajax") == "1":
+        return render_template(
+            "partials/product_table.html",
+            produks=produks,
+            pagination=pagination,
+            pagination_args=pagination_args,
+            price_updates=price_updates,
+            product_price_levels=product_price_levels,
+        )
+
+    return render_template(
+        "data_produk.html",
+        produks=produks,
+        satuans=satuans,
+        kategoris=kategoris,
+        suppliers=suppliers,
+        price_levels=price_levels,
+        price_levels_context=price_levels_context,
+        stat_cards=stat_cards,
+        health_insights=health_insights,
+        expiring_products=expiring_products,
+        edit_produk=produk_to_edit,
+        edit_price_levels=edit_price_levels,
+        product_price_levels=product_price_levels,
+        product_import_schema=product_import_schema,
+        price_updates=price_updates,
+        pagination=pagination,
+        page=page,
+        per_page=per_page,
+        pagination_args=pagination_args,
+        prefill_data=prefill_data,
+        focus_field=focus_field,
+    )
+
+
+@bp.route("/produk/<int:produk_id>/json", methods=["GET"])
+@login_required
+@roles_required(*ALL_ROLE_CHOICES)
+def produk_data(produk_id):
+    produk = (
+        Produk.query.options(
+            joinedload(Produk.satuan),
+            joinedload(Produk.kategori),
+            joinedload(Produk.supplier),
+            joinedload(Produk.level_prices).joinedload(ProductPriceLevel.level),
+        )
+        .get_or_404(produk_id)
+    )
+
+    def _format_price_entries(entries):
+        sorted_entries = sorted(
+            entries,
+            key=lambda record: (
+                (record.level.name or "").lower() if record.level else ""
+            ),
+        )
+        result = []
+        for entry in sorted_entries:
+            result.append(
+                {
+                    "level_id": entry.level_id,
+                    "level_name": (entry.level.name if entry.level else ""),
+                    "price": float(entry.price or 0),
+                }
+            )
+        return result
+
+    payload = {
+        "id": produk.id,
+        "kode_produk": produk.kode_produk,
+        "sku": produk.sku,
+        "barcode": produk.barcode,
+        "nama_produk": produk.nama_produk,
+        "satuan_id": produk.satuan_id,
+        "kategori_id": produk.kategori_id,
+        "supplier_id": produk.supplier_id,
+        "berat": float(produk.berat) if produk.berat is not None else None,
+        "stok_minimal": produk.stok_minimal,
+        "tanggal_expired": produk.tanggal_expired.strftime("%Y-%m-%d")
+        if produk.tanggal_expired
+        else None,
+        "price_levels": _format_price_entries(produk.level_prices),
+    }
+    return jsonify(payload)
+
+
+@bp.route("/produk/check-code", methods=["GET"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def check_produk_code():
+    code = (request.args.get("code") or "").strip()
+    exclude_id = _parse_int_param(request.args.get("exclude_id"))
+    if not code:
+        return jsonify({"available": False, "message": "Kode produk kosong."})
+
+    existing = Produk.query.filter(
+        func.lower(Produk.kode_produk) == code.lower()
+    ).first()
+    if existing and exclude_id and existing.id == exclude_id:
+        existing = None
+
+    if existing:
+        return jsonify(
+            {
+                "available": False,
+                "message": f"Kode produk {code} sudah digunakan.",
+            }
+        )
+    return jsonify({"available": True, "message": "Kode produk tersedia."})
+
+
+@bp.route("/produk/check-sku", methods=["GET"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def check_produk_sku():
+    sku = (request.args.get("sku") or "").strip()
+    exclude_id = _parse_int_param(request.args.get("exclude_id"))
+    if not sku:
+        return jsonify({"available": True, "message": ""})
+
+    existing = Produk.query.filter(func.lower(Produk.sku) == sku.lower()).first()
+    if existing and exclude_id and existing.id == exclude_id:
+        existing = None
+
+    if existing:
+        return jsonify(
+            {
+                "available": False,
+                "message": f"SKU {sku} sudah digunakan.",
+            }
+        )
+    return jsonify({"available": True, "message": "SKU tersedia."})
+
+
+@bp.route("/produk/check-barcode", methods=["GET"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def check_produk_barcode():
+    barcode = (request.args.get("barcode") or "").strip()
+    exclude_id = _parse_int_param(request.args.get("exclude_id"))
+    if not barcode:
+        return jsonify({"available": True, "message": ""})
+
+    existing = Produk.query.filter(
+        func.lower(Produk.barcode) == barcode.lower()
+    ).first()
+    if existing and exclude_id and existing.id == exclude_id:
+        existing = None
+
+    if existing:
+        return jsonify(
+            {
+                "available": False,
+                "message": f"Barcode {barcode} sudah digunakan.",
+            }
+        )
+    return jsonify({"available": True, "message": "Barcode tersedia."})
+
+
+@bp.route("/produk/edit/<int:produk_id>", methods=["GET", "POST"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def edit_produk(produk_id):
+    produk = Produk.query.get_or_404(produk_id)
+
+    if request.method == "POST":
+        produk.kode_produk = request.form["kode_produk"]
+        produk.barcode = request.form["barcode"]
+        produk.nama_produk = request.form["nama_produk"]
+        produk.satuan_id = request.form["satuan"]
+        produk.kategori_id = request.form["kategori"]
+        produk.supplier_id = request.form["supplier"]
+        produk.berat = float(request.form["berat"]) if request.form["berat"] else None
+        produk.stok_minimal = (
+            int(request.form["stok_minimal"]) if request.form["stok_minimal"] else None
+        )
+        produk.tanggal_expired = (
+            request.form["tanggal_expired"] if request.form["tanggal_expired"] else None
+        )
+
+        db.session.commit()
+        flash("Produk updated successfully!", "success")
+        return redirect("/produk")
+
+    satuans = Satuan.query.all()
+    kategoris = Kategori.query.all()
+    suppliers = Supplier.query.all()
+    return render_template(
+        "edit_produk.html",
+        produk=produk,
+        satuans=satuans,
+        kategoris=kategoris,
+        suppliers=suppliers,
+    )
+
+
+@bp.route("/produk/delete/<int:produk_id>", methods=["POST"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def delete_produk(produk_id):
+    produk = Produk.query.get_or_404(produk_id)
+    try:
+        db.session.delete(produk)
+        db.session.commit()
+        flash("Produk deleted successfully!", "success")
+    except IntegrityError as exc:
+        db.session.rollback()
+        flash(
+            "Produk tidak dapat dihapus karena masih memiliki relasi transaksi.",
+            "warning",
+        )
+    except Exception as exc:
+        db.session.rollback()
+        logging.exception("Gagal menghapus produk")
+        flash(f"Gagal menghapus produk: {str(exc)}", "danger")
+    return redirect("/produk")
+
+
+@bp.route("/produk/detail/<int:produk_id>", methods=["GET"])
+@login_required
+@roles_required(*ALL_ROLE_CHOICES)
+def detail_produk(produk_id):
+    produk = Produk.query.get_or_404(produk_id)
+    return render_template("detail_produk.html", produk=produk)
+
+
+@bp.route("/produk/export", methods=["GET"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def export_produk():
+    import pandas as pd
+    produks = Produk.query.all()
+
+    data = [
+        {
+            "Kode Produk": produk.kode_produk,
+            "SKU": produk.sku or "",
+            "Nama Produk": produk.nama_produk,
+            "Satuan ID": produk.satuan_id,
+            "Kategori ID": produk.kategori_id,
+            "Supplier ID": produk.supplier_id,
+            "Berat": produk.berat or "",
+            "Stok Minimal": produk.stok_minimal or 0,
+            "Tanggal Expired": (
+                produk.tanggal_expired.strftime("%Y-%m-%d")
+                if produk.tanggal_expired
+                else ""
+            ),
+        }
+        for produk in produks
+    ]
+
+    df = pd.DataFrame(data)
+
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        df.to_excel(writer, index=False)
+    output.seek(0)
+
+    response = make_response(output.read())
+    response.headers["Content-Disposition"] = "attachment; filename=produk.xlsx"
+    response.headers["Content-Type"] = (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+    return response
+
+
+@bp.route("/produk/import", methods=["POST"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def import_produk():
+    file = request.files.get("file")
+    if file is None:
+        flash("Tidak ada file yang diunggah!", "danger")
+        return redirect("/produk")
+    if file.filename == "":
+        flash("File tidak dipilih!", "danger")
+        return redirect("/produk")
+    return _start_import_job("produk", file)
+
+
+def _generate_stock_reference():
+    return allocate_document_number(DOCUMENT_STOCK_OPNAME)
+
+
+@bp.route("/update-harga", methods=["GET", "POST"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def update_harga():
+    if request.method == "POST":
+        if not request.is_json:
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "message": "Content-Type harus application/json.",
+                    }
+                ),
+                415,
+            )
+
+        payload = request.get_json(silent=True) or {}
+        items = payload.get("items") or []
+        if not isinstance(items, list) or not items:
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "message": "Kirim minimal satu produk yang akan diperbarui.",
+                    }
+                ),
+                400,
+            )
+
+        errors = []
+        updated_rows = []
+        now = local_now()
+        price_log_available = table_ready("price_change")
+        for index, item in enumerate(items, start=1):
+            product_id = item.get("product_id")
+            new_price_raw = item.get("new_price")
+            reason = (item.get("reason") or "").strip()
+
+            try:
+                product_id = int(product_id)
+            except (TypeError, ValueError):
+                errors.append(f"Produk pada baris {index} tidak valid.")
+                continue
+
+            try:
+                new_price = float(new_price_raw)
+            except (TypeError, ValueError):
+                errors.append(f"Harga baru tidak valid (baris {index}).")
+                continue
+
+            if new_price <= 0:
+                errors.append(f"Harga harus lebih besar dari 0 (baris {index}).")
+                continue
+
+            product = db.session.get(Produk, product_id)
+            if not product:
+                errors.append(f"Produk dengan ID {product_id} tidak ditemukan.")
+                continue
+
+            old_price = float(product.harga or 0.0)
+            if math.isclose(old_price, new_price, rel_tol=0.0, abs_tol=0.005):
+                continue
+
+            cost_basis = _product_cost_basis(product)
+            margin_before = old_price - cost_basis
+            margin_after = new_price - cost_basis
+
+            product.harga = new_price
+            if price_log_available:
+                price_change = PriceChange(
+                    product_id=product.id,
+                    user_id=session.get("user_id"),
+                    old_price=old_price,
+                    new_price=new_price,
+                    margin_before=margin_before,
+                    margin_after=margin_after,
+                    reason=reason or None,
+                    created_at=now,
+                )
+                db.session.add(price_change)
+            updated_rows.append(
+                {
+                    "product_id": product.id,
+                    "name": product.nama_produk,
+                    "old_price": old_price,
+                    "new_price": new_price,
+                    "margin_after": margin_after,
+                }
+            )
+
+        if errors:
+            db.session.rollback()
+            return jsonify({"success": False, "message": " ".join(errors)}), 400
+
+        if not updated_rows:
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "message": "Tidak ada harga yang berubah dari nilai sebelumnya.",
+                    }
+                ),
+                400,
+            )
+
+        db.session.commit()
+        return jsonify(
+            {
+                "success": True,
+                "message": (
+                    f"{len(updated_rows)} harga berhasil diperbarui."
+                    + (
+                        " (Catatan: histori harga belum aktif, jalankan migrasi.)"
+                        if not price_log_available
+                        else ""
+                    )
+                ),
+                "updated": updated_rows,
+            }
+        )
+
+    products = (
+        Produk.query.options(
+            joinedload(Produk.kategori),
+            joinedload(Produk.supplier),
+        )
+        .order_by(Produk.nama_produk.asc())
+        .all()
+    )
+    product_rows = []
+    for product in products:
+        cost_basis = _product_cost_basis(product)
+        current_price = float(product.harga or 0.0)
+        margin_value = current_price - cost_basis
+        margin_pct = (margin_value / cost_basis * 100) if cost_basis else 0.0
+        product_rows.append(
+            {
+                "id": product.id,
+                "code": product.kode_produk,
+                "name": product.nama_produk,
+                "sku": product.sku or "-",
+                "kategori": (
+                    product.kategori.name if product.kategori else "Tanpa kategori"
+                ),
+                "supplier": (
+                    product.supplier.name if product.supplier else "Tanpa supplier"
+                ),
+                "cost": cost_basis,
+                "price": current_price,
+                "margin_value": margin_value,
+                "margin_percent": margin_pct,
+            }
+        )
+
+    price_change_ready = table_ready("price_change")
+    recent_changes = []
+    if price_change_ready:
+        try:
+            recent_changes = (
+                PriceChange.query.options(
+                    joinedload(PriceChange.product),
+                    joinedload(PriceChange.user),
+                )
+                .order_by(PriceChange.created_at.desc())
+                .limit(10)
+                .all()
+            )
+        except OperationalError:
+            db.session.rollback()
+            price_change_ready = False
+
+    return render_template(
+        "update_harga.html",
+        products=product_rows,
+        recent_changes=recent_changes,
+        price_change_ready=price_change_ready,
+    )
+
+
+@bp.route("/stok-opname", methods=["GET", "POST"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def stok_opname():
+    if request.method == "POST":
+        if not request.is_json:
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "message": "Content-Type harus application/json.",
+                    }
+                ),
+                415,
+            )
+        payload = request.get_json(silent=True) or {}
+        items = payload.get("items") or []
+        if not items:
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "message": "Tambahkan minimal satu produk untuk stock opname.",
+                    }
+                ),
+                400,
+            )
+        location = (payload.get("location") or "").strip()
+        note = (payload.get("note") or "").strip()
+        reference = (
+            payload.get("reference") or ""
+        ).strip() or _generate_stock_reference()
+
+        opname_session = StockOpnameSession(
+            reference=reference,
+            location=location or None,
+            note=note or None,
+            status="completed",
+            created_by=session.get("user_id"),
+            created_at=local_now(),
+            finalized_at=local_now(),
+        )
+        db.session.add(opname_session)
+        adjustments = []
+        increase_value = 0.0
+        decrease_value = 0.0
+        errors = []
+        for index, item in enumerate(items, start=1):
+            product_id = item.get("product_id")
+            counted_raw = item.get("counted_qty")
+            item_note = (item.get("note") or "").strip()
+            try:
+                product_id = int(product_id)
+            except (TypeError, ValueError):
+                errors.append(f"Produk tidak valid pada baris {index}.")
+                continue
+            try:
+                counted_qty = int(counted_raw)
+            except (TypeError, ValueError):
+                errors.append(f"Jumlah fisik tidak valid (baris {index}).")
+                continue
+            if counted_qty < 0:
+                errors.append(f"Jumlah fisik tidak boleh negatif (baris {index}).")
+                continue
+            product = db.session.get(Produk, product_id)
+            if not product:
+                errors.append(f"Produk dengan ID {product_id} tidak ditemukan.")
+                continue
+            system_qty = int(product.stok_lama or 0)
+            difference = counted_qty - system_qty
+            product.stok_lama = counted_qty
+            opname_item = StockOpnameItem(
+                session=opname_session,
+                product_id=product.id,
+                system_qty=system_qty,
+                counted_qty=counted_qty,
+                difference_qty=difference,
+                note=item_note or None,
+            )
+            db.session.add(opname_item)
+            if difference != 0:
+                cost_basis = float(
+                    product.harga_lama
+                    or product.harga_beli
+                    or product.harga
+                    or 0.0
+                )
+                adjustment_value = abs(difference) * cost_basis
+                if difference > 0:
+                    increase_value += adjustment_value
+                else:
+                    decrease_value += adjustment_value
+            adjustments.append(
+                {
+                    "product_id": product.id,
+                    "name": product.nama_produk,
+                    "system_qty": system_qty,
+                    "counted_qty": counted_qty,
+                    "difference": difference,
+                }
+            )
+        if errors:
+            db.session.rollback()
+            return jsonify({"success": False, "message": " ".join(errors)}), 400
+        if not adjustments:
+            db.session.rollback()
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "message": "Tidak ada baris valid yang diproses.",
+                    }
+                ),
+                400,
+            )
+        journal_entry = None
+        journal_warning = None
+        if increase_value > 0 or decrease_value > 0:
+            settings = _get_accounting_setting()
+            inventory_account = settings.inventory_account if settings else None
+            adjustment_account = (
+                settings.inventory_adjustment_account if settings else None
+            )
+            if inventory_account and adjustment_account:
+                journal_entry = JournalEntry(
+                    reference=_generate_journal_reference_with_prefix("SOJ"),
+                    date=local_today(),
+                    memo=f"Penyesuaian Persediaan - {reference}",
+                    created_by=session.get("user_id"),
+                )
+                db.session.add(journal_entry)
+                db.session.flush()
+                if increase_value > 0:
+                    db.session.add(
+                        JournalLine(
+                            entry_id=journal_entry.id,
+                            account_id=inventory_account.id,
+                            debit=round(increase_value, 2),
+                            credit=0.0,
+                            description="Penyesuaian persediaan (selisih lebih)",
+                        )
+                    )
+                    db.session.add(
+                        JournalLine(
+                            entry_id=journal_entry.id,
+                            account_id=adjustment_account.id,
+                            debit=0.0,
+                            credit=round(increase_value, 2),
+                            description="Penyesuaian persediaan (selisih lebih)",
+                        )
+                    )
+                if decrease_value > 0:
+                    db.session.add(
+                        JournalLine(
+                            entry_id=journal_entry.id,
+                            account_id=adjustment_account.id,
+                            debit=round(decrease_value, 2),
+                            credit=0.0,
+                            description="Penyesuaian persediaan (selisih kurang)",
+                        )
+                    )
+                    db.session.add(
+                        JournalLine(
+                            entry_id=journal_entry.id,
+                            account_id=inventory_account.id,
+                            debit=0.0,
+                            credit=round(decrease_value, 2),
+                            description="Penyesuaian persediaan (selisih kurang)",
+                        )
+                    )
+            else:
+                journal_warning = (
+                    "Jurnal penyesuaian tidak dibuat karena akun Persediaan/"
+                    "Penyesuaian Persediaan belum dikonfigurasi."
+                )
+        db.session.commit()
+        plus = sum(item["difference"] for item in adjustments if item["difference"] > 0)
+        minus = sum(
+            item["difference"] for item in adjustments if item["difference"] < 0
+        )
+        return jsonify(
+            {
+                "success": True,
+                "reference": reference,
+                "message": "Stock opname berhasil disimpan dan stok diperbarui.",
+                "summary": {
+                    "rows": len(adjustments),
+                    "plus": plus,
+                    "minus": minus,
+                },
+                "journal": {
+                    "created": bool(journal_entry),
+                    "reference": journal_entry.reference if journal_entry else None,
+                    "warning": journal_warning,
+                },
+            }
+        )
+
+    products = Produk.query.order_by(Produk.nama_produk.asc()).all()
+    product_payload = [
+        {
+            "id": product.id,
+            "code": product.kode_produk,
+            "name": product.nama_produk,
+            "sku": product.sku or "-",
+            "kategori": product.kategori.name if product.kategori else "Tanpa kategori",
+            "stock": int(product.stok_lama or 0),
+        }
+        for product in products
+    ]
+    opname_ready = table_ready("stock_opname_session")
+    sessions = []
+    if opname_ready:
+        try:
+            sessions = (
+                StockOpnameSession.query.options(
+                    joinedload(StockOpnameSession.user),
+                    joinedload(StockOpnameSession.items).joinedload(
+                        StockOpnameItem.product
+                    ),
+                )
+                .order_by(StockOpnameSession.created_at.desc())
+                .limit(5)
+                .all()
+            )
+        except OperationalError:
+            db.session.rollback()
+            opname_ready = False
+    session_payload = []
+    for opname in sessions:
+        diff_total = sum(item.difference_qty for item in opname.items)
+        item_count = len(opname.items)
+        session_payload.append(
+            {
+                "reference": opname.reference,
+                "created_at": (
+                    _format_date_id(opname.created_at.date())
+                    if opname.created_at
+                    else "-"
+                ),
+                "user": opname.user.username if opname.user else "System",
+                "location": opname.location or "-",
+                "status": opname.status.title() if opname.status else "-",
+                "item_count": item_count,
+                "diff_total": diff_total,
+            }
+        )
+    stats = {
+        "product_count": len(products),
+        "session_count": StockOpnameSession.query.count() if opname_ready else 0,
+        "last_reference": session_payload[0]["reference"] if session_payload else None,
+    }
+    import_status = (request.args.get("import_status") or "").strip().lower()
+    import_rows = _parse_int_param(request.args.get("import_rows"))
+    if import_status not in {"success"}:
+        import_status = None
+        import_rows = None
+    opname_import_schema = [
+        {
+            "column": "Kode Produk",
+            "required": False,
+            "description": "Kode unik barang (disarankan untuk akurasi).",
+        },
+        {"column": "SKU", "required": False, "description": "Kode internal opsional."},
+        {
+            "column": "Nama Produk",
+            "required": False,
+            "description": "Nama barang sesuai katalog (hindari nama ganda).",
+        },
+        {
+            "column": "Qty Fisik",
+            "required": True,
+            "description": "Jumlah fisik hasil hitung (angka bulat).",
+        },
+        {
+            "column": "HPP",
+            "required": False,
+            "description": "Harga pokok rata-rata per item (opsional).",
+        },
+        {
+            "column": "Catatan",
+            "required": False,
+            "description": "Catatan per item (opsional).",
+        },
+    ]
+    return render_template(
+        "stok_opname.html",
+        product_payload=product_payload,
+        sessions=session_payload,
+        stats=stats,
+        opname_ready=opname_ready,
+        opname_import_schema=opname_import_schema,
+        import_status=import_status,
+        import_rows=import_rows,
+    )
+
+
+@bp.route("/stok-opname/import", methods=["POST"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def import_stok_opname():
+    if not table_ready("stock_opname_session", "stock_opname_item"):
+        flash(
+            "Modul stok opname belum siap. Jalankan migrasi flask db upgrade terlebih dahulu.",
+            "warning",
+        )
+        return redirect(url_for("main.stok_opname"))
+
+    file = request.files.get("file")
+    if file is None:
+        flash("Tidak ada file yang diunggah!", "danger")
+        return redirect(url_for("main.stok_opname"))
+    if file.filename == "":
+        flash("File tidak dipilih!", "danger")
+        return redirect(url_for("main.stok_opname"))
+
+    options = {
+        "location": (request.form.get("location") or "").strip() or None,
+        "note": (request.form.get("note") or "").strip() or None,
+        "created_by": session.get("user_id"),
+    }
+    return _start_import_job("stok_opname", file, options)
+
+
+@bp.route("/stok-opname/template")
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def stok_opname_template():
+    import pandas as pd
+    fmt = (request.args.get("format") or "xlsx").strip().lower()
+    template_columns = [
+        "Kode Produk",
+        "SKU",
+        "Nama Produk",
+        "Qty Fisik",
+        "HPP",
+        "Catatan",
+    ]
+    df = pd.DataFrame(columns=template_columns)
+
+    if fmt == "csv":
+        output = StringIO()
+        df.to_csv(output, index=False)
+        response = make_response(output.getvalue().encode("utf-8-sig"))
+        response.headers["Content-Type"] = "text/csv; charset=utf-8"
+        response.headers["Content-Disposition"] = (
+            "attachment; filename=template_stok_opname.csv"
+        )
+        return response
+
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        df.to_excel(writer, index=False)
+    output.seek(0)
+    response = make_response(output.read())
+    response.headers["Content-Disposition"] = (
+        "attachment; filename=template_stok_opname.xlsx"
+    )
+    response.headers["Content-Type"] = (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+    return response
+
+
+@bp.route("/stok-opname/export")
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def export_stok_opname():
+    import pandas as pd
+    fmt = (request.args.get("format") or "xlsx").strip().lower()
+    products = Produk.query.order_by(Produk.nama_produk.asc()).all()
+    data = [
+        {
+            "Kode Produk": product.kode_produk,
+            "SKU": product.sku or "",
+            "Nama Produk": product.nama_produk,
+            "Qty Fisik": int(product.stok_lama or 0),
+            "HPP": _product_cost_basis(product),
+            "Catatan": "",
+        }
+        for product in products
+    ]
+    df = pd.DataFrame(data)
+
+    if fmt == "csv":
+        output = StringIO()
+        df.to_csv(output, index=False)
+        response = make_response(output.getvalue().encode("utf-8-sig"))
+        response.headers["Content-Type"] = "text/csv; charset=utf-8"
+        response.headers["Content-Disposition"] = (
+            "attachment; filename=stok_opname_export.csv"
+        )
+        return response
+
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        df.to_excel(writer, index=False)
+    output.seek(0)
+    response = make_response(output.read())
+    response.headers["Content-Disposition"] = (
+        "attachment; filename=stok_opname_export.xlsx"
+    )
+    response.headers["Content-Type"] = (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+    return response
+
+
+def _build_level_price_tables(price_levels, price_entries, req_args, per_page=8):
+    price_table = {}
+    price_table_pages = {}
+
+    args_dict = req_args.to_dict() if hasattr(req_args, "to_dict") else dict(req_args)
+
+    def _build_level_page_url(level_id, page_num, fragment=False):
+        params = dict(args_dict)
+        params[f"page_level_{level_id}"] = page_num
+        if fragment:
+            params["ajax"] = "1"
+            return url_for("main.harga_level_level_fragment", level_id=level_id, **params)
+        return url_for("main.harga_level", **params)
+
+    for level in price_levels:
+        level_entries = [
+            {
+                "id": entry.id,
+                "product_name": (
+                    entry.produk.nama_produk if entry.produk else "Produk dihapus"
+                ),
+                "product_code": entry.produk.kode_produk if entry.produk else "-",
+                "price": entry.price,
+            }
+            for entry in price_entries
+            if entry.level_id == level.id
+        ]
+
+        total_entries = len(level_entries)
+        total_pages = max(1, math.ceil(total_entries / per_page)) if total_entries else 1
+        page_param = f"page_level_{level.id}"
+        page = req_args.get(page_param, 1, type=int) if hasattr(req_args, "get") else 1
+        if not isinstance(page, int):
+            page = 1
+        if page < 1:
+            page = 1
+        if page > total_pages:
+            page = total_pages
+
+        start = (page - 1) * per_page
+        end = start + per_page
+        price_table[level.id] = level_entries[start:end]
+
+        page_links = [
+            {
+                "num": num,
+                "url": _build_level_page_url(level.id, num, fragment=False),
+                "fragment_url": _build_level_page_url(level.id, num, fragment=True),
+            }
+            for num in range(1, total_pages + 1)
+        ]
+
+        price_table_pages[level.id] = {
+            "page": page,
+            "pages": total_pages,
+            "has_prev": page > 1,
+            "has_next": page < total_pages,
+            "prev_url": _build_level_page_url(level.id, page - 1, fragment=False)
+            if page > 1
+            else None,
+            "next_url": _build_level_page_url(level.id, page + 1, fragment=False)
+            if page < total_pages
+            else None,
+            "prev_fragment_url": _build_level_page_url(level.id, page - 1, fragment=True)
+            if page > 1
+            else None,
+            "next_fragment_url": _build_level_page_url(level.id, page + 1, fragment=True)
+            if page < total_pages
+            else None,
+            "links": page_links,
+            "total": total_entries,
+        }
+
+    return price_table, price_table_pages
+
+
+def _build_level_price_export_rows(levels, products, entries, blank_prices=False):
+    entry_map = {(entry.product_id, entry.level_id): entry for entry in entries}
+    rows = []
+    for product in products:
+        for level in levels:
+            entry = entry_map.get((product.id, level.id))
+            price_value = None
+            if not blank_prices and entry:
+                price_value = entry.price
+            rows.append(
+                {
+                    "Level ID": level.id,
+                    "Level Name": level.name,
+                    "Product ID": product.id,
+                    "Product Code": product.kode_produk,
+                    "Product Name": product.nama_produk,
+                    "SKU": product.sku,
+                    "Barcode": product.barcode,
+                    "Price": price_value,
+                }
+            )
+    return rows
+
+
+@bp.route("/harga_level", methods=["GET", "POST"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def harga_level():
+    action = request.form.get("action") if request.method == "POST" else None
+    if action == "create_level":
+        name = (request.form.get("level_name") or "").strip()
+        description = (request.form.get("description") or "").strip()
+        if not name:
+            flash("Nama level harga wajib diisi.", "warning")
+        elif PriceLevel.query.filter(
+            func.lower(PriceLevel.name) == name.lower()
+        ).first():
+            flash("Nama level sudah digunakan.", "warning")
+        else:
+            new_level = PriceLevel(name=name, description=description)
+            db.session.add(new_level)
+            db.session.commit()
+            flash("Level harga baru berhasil ditambahkan.", "success")
+        return redirect(url_for("main.harga_level"))
+
+    if action == "set_price":
+        level_id = request.form.get("level_id")
+        product_id = request.form.get("product_id")
+        price_raw = request.form.get("price")
+        try:
+            level_id_int = int(level_id)
+            product_id_int = int(product_id)
+            price_value = float(price_raw)
+        except (TypeError, ValueError):
+            flash("Pastikan level, produk, dan harga valid.", "warning")
+            return redirect(url_for("main.harga_level"))
+
+        if price_value < 0:
+            flash("Harga tidak boleh negatif.", "warning")
+            return redirect(url_for("main.harga_level"))
+
+        level = db.session.get(PriceLevel, level_id_int)
+        product = db.session.get(Produk, product_id_int)
+        if not level or not product:
+            flash("Level atau produk tidak ditemukan.", "warning")
+            return redirect(url_for("main.harga_level"))
+
+        entry = ProductPriceLevel.query.filter_by(
+            product_id=product_id_int, level_id=level_id_int
+        ).first()
+        if entry:
+            entry.price = price_value
+        else:
+            entry = ProductPriceLevel(
+                product_id=product_id_int, level_id=level_id_int, price=price_value
+            )
+            db.session.add(entry)
+        db.session.commit()
+        flash(
+            f"Harga khusus untuk {product.nama_produk} ({level.name}) tersimpan.",
+            "success",
+        )
+        return redirect(url_for("main.harga_level"))
+
+    if action == "delete_price":
+        entry_id = request.form.get("entry_id")
+        try:
+            entry_int = int(entry_id)
+        except (TypeError, ValueError):
+            entry_int = None
+        if entry_int:
+            entry = db.session.get(ProductPriceLevel, entry_int)
+            if entry:
+                db.session.delete(entry)
+                db.session.commit()
+                flash("Harga khusus dihapus.", "success")
+        return redirect(url_for("main.harga_level"))
+
+    if action == "create_cost":
+        level_id = request.form.get("cost_level_id")
+        name = (request.form.get("cost_name") or "").strip()
+        cost_type = request.form.get("cost_type") or "percent"
+        value_raw = request.form.get("cost_value")
+        active_flag = request.form.get("cost_active") == "1"
+
+        try:
+            level_id_int = int(level_id)
+            value = float(value_raw)
+        except (TypeError, ValueError):
+            flash("Pastikan level dan nilai biaya valid.", "warning")
+            return redirect(url_for("main.harga_level"))
+
+        if value < 0:
+            flash("Nilai biaya tidak boleh negatif.", "warning")
+            return redirect(url_for("main.harga_level"))
+
+        level = db.session.get(PriceLevel, level_id_int)
+        if not level:
+            flash("Level harga tidak ditemukan.", "warning")
+            return redirect(url_for("main.harga_level"))
+
+        new_cost = PriceLevelCost(
+            level_id=level_id_int,
+            name=name or "Biaya baru",
+            type="percent" if cost_type not in ("nominal", "percent") else cost_type,
+            value=value,
+            is_active=active_flag,
+        )
+        db.session.add(new_cost)
+        db.session.commit()
+        flash("Biaya baru berhasil ditambahkan.", "success")
+        return redirect(url_for("main.harga_level"))
+
+    if action == "toggle_cost":
+        entry_id = request.form.get("cost_id")
+        try:
+            entry_int = int(entry_id)
+        except (TypeError, ValueError):
+            entry_int = None
+        if entry_int:
+            cost_entry = db.session.get(PriceLevelCost, entry_int)
+            if cost_entry:
+                cost_entry.is_active = not cost_entry.is_active
+                db.session.commit()
+                status = "diaktifkan" if cost_entry.is_active else "dinonaktifkan"
+                flash(f"Biaya {cost_entry.name} {status}.", "success")
+        return redirect(url_for("main.harga_level"))
+
+    if action == "delete_cost":
+        entry_id = request.form.get("cost_id")
+        try:
+            entry_int = int(entry_id)
+        except (TypeError, ValueError):
+            entry_int = None
+        if entry_int:
+            cost_entry = db.session.get(PriceLevelCost, entry_int)
+            if cost_entry:
+                db.session.delete(cost_entry)
+                db.session.commit()
+                flash(f"Biaya {cost_entry.name} dihapus.", "success")
+        return redirect(url_for("main.harga_level"))
+
+    price_levels = PriceLevel.query.order_by(PriceLevel.name.asc()).all()
+    price_entries = (
+        ProductPriceLevel.query.options(
+            joinedload(ProductPriceLevel.produk), joinedload(ProductPriceLevel.level)
+        )
+        .order_by(ProductPriceLevel.level_id.asc(), ProductPriceLevel.id.desc())
+        .all()
+    )
+
+    cost_entries = (
+        PriceLevelCost.query.options(joinedload(PriceLevelCost.level))
+        .order_by(PriceLevelCost.level_id.asc(), PriceLevelCost.name.asc())
+        .all()
+    )
+    price_level_costs = {}
+    for cost in cost_entries:
+        price_level_costs.setdefault(cost.level_id, []).append(cost)
+
+    cost_totals = {
+        level.id: {"percent": 0.0, "nominal": 0.0, "active": 0}
+        for level in price_levels
+    }
+    for cost in cost_entries:
+        if not cost.is_active:
+            continue
+        total_entry = cost_totals.setdefault(
+            cost.level_id, {"percent": 0.0, "nominal": 0.0, "active": 0}
+        )
+        if cost.type == "percent":
+            total_entry["percent"] += float(cost.value or 0.0)
+        else:
+            total_entry["nominal"] += float(cost.value or 0.0)
+        total_entry["active"] += 1
+
+    level_summary = []
+    for level in price_levels:
+        totals = cost_totals.get(level.id, {"percent": 0.0, "nominal": 0.0, "active": 0})
+        level_summary.append(
+            {
+                "id": level.id,
+                "name": level.name,
+                "description": level.description,
+                "customer_count": len(level.pelanggan),
+                "price_count": sum(
+                    1 for entry in price_entries if entry.level_id == level.id
+                ),
+                "cost_percent_total": totals["percent"],
+                "cost_nominal_total": totals["nominal"],
+                "cost_active_count": totals["active"],
+            }
+        )
+
+    price_table, price_table_pages = _build_level_price_tables(
+        price_levels, price_entries, request.args, per_page=8
+    )
+
+    return render_template(
+        "harga_level.html",
+        price_levels=price_levels,
+        level_summary=level_summary,
+        price_table=price_table,
+        price_table_pages=price_table_pages,
+        price_level_costs=price_level_costs,
+        cost_totals=cost_totals,
+    )
+
+
+@bp.route("/harga_level/level/<int:level_id>")
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def harga_level_level_fragment(level_id):
+    price_levels = PriceLevel.query.order_by(PriceLevel.name.asc()).all()
+    price_entries = (
+        ProductPriceLevel.query.options(
+            joinedload(ProductPriceLevel.produk), joinedload(ProductPriceLevel.level)
+        )
+        .order_by(ProductPriceLevel.level_id.asc(), ProductPriceLevel.id.desc())
+        .all()
+    )
+
+    level_lookup = {level.id: level for level in price_levels}
+    level = level_lookup.get(level_id)
+    if not level:
+        return jsonify({"error": "Level tidak ditemukan"}), 404
+
+    price_table, price_table_pages = _build_level_price_tables(
+        price_levels, price_entries, request.args, per_page=8
+    )
+
+    entries = price_table.get(level_id, [])
+    page_info = price_table_pages.get(level_id, {})
+
+    if request.args.get("ajax") == "1":
+        return render_template(
+            "partials/level_price_table.html",
+            entries=entries,
+            page_info=page_info,
+            level=level,
+        )
+
+    return redirect(url_for("main.harga_level", **request.args.to_dict()))
+
+
+@bp.route("/harga_level/export", methods=["GET"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def export_harga_level():
+    import pandas as pd
+    blank = request.args.get("template") == "1"
+    levels = PriceLevel.query.order_by(PriceLevel.name.asc()).all()
+    products = Produk.query.order_by(Produk.nama_produk.asc()).all()
+    entries = ProductPriceLevel.query.all()
+
+    rows = _build_level_price_export_rows(levels, products, entries, blank_prices=blank)
+    df = pd.DataFrame(rows)
+
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        df.to_excel(writer, index=False)
+    output.seek(0)
+
+    filename = "template_level_harga.xlsx" if blank else "level_harga.xlsx"
+    response = make_response(output.read())
+    response.headers["Content-Disposition"] = f"attachment; filename={filename}"
+    response.headers["Content-Type"] = (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+    return response
+
+
+@bp.route("/harga_level/import", methods=["POST"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def import_harga_level():
+    file = request.files.get("file")
+    if not file or not file.filename:
+        flash("File Excel belum dipilih.", "warning")
+        return redirect(url_for("main.harga_level"))
+    return _start_import_job("harga_level", file)
@@ -0,0 +1,2014 @@
+"""Route kasir: shift, penjualan, quotation, pelanggan dan pembayaran piutang."""
+
+import json
+import logging
+from io import BytesIO
+
+from flask import flash, make_response, redirect, render_template, request, session, url_for
+from sqlalchemy import case, func, or_
+from sqlalchemy.orm import joinedload
+
+from app.forms import SalesForm
+from app.models import (
+    CashierShift,
+    DetailPenjualan,
+    Expedisi,
+    JournalEntry,
+    PaymentChannel,
+    Pelanggan,
+    Penjualan,
+    PriceLevel,
+    Produk,
+    Quotation,
+    QuotationItem,
+    ReceivablePayment,
+    User,
+    db,
+)
+from app.routes import bp
+from app.routes.common import (
+    ADMIN_ONLY,
+    ROLE_ADMIN,
+    ROLE_KASIR,
+    ROLE_SALES,
+    SALES_ROLES,
+    _CHECKOUT_SCALAR_FIELDS,
+    _auth_required_response,
+    _build_draft_invoice,
+    _forbidden_response,
+    _format_date_id,
+    _get_company_profile,
+    _get_default_sales_tax,
+    _get_locked_period_for_date,
+    _get_open_shift,
+    _get_receipt_settings,
+    _get_sales_invoice_prefix,
+    _is_safe_redirect_target,
+    _parse_date_param,
+    _parse_float_param,
+    _parse_int_param,
+    _parse_tax_value,
+    _process_sale_checkout,
+    _resolve_next_target,
+    _start_import_job,
+    get_current_user,
+    login_required,
+    roles_required,
+)
+from app.schema_registry import table_ready
+from app.services.catalog_service import CATALOG_KINDS, serialize_customer
+from app.services.customer_service import customer_search_filter, customer_stats
+from app.services.document_number_service import DOCUMENT_QUOTATION, allocate_document_number
+from app.services.sales_summary_service import apply_sale_to_summary
+from app.services.shift_service import append_shift_note, close_stale_shifts, last_sweep
+from app.time_utils import local_now, local_today
+
+
+def _build_sale_print_payload(sale):
+    items = []
+    subtotal = 0.0
+    discount_total = 0.0
+    tax_total = 0.0
+    total_weight = 0.0
+
+    for detail in sale.detail_penjualan:
+        qty = detail.jumlah or 0
+        price = detail.harga_satuan or 0.0
+        discount_pct = detail.diskon or 0.0
+        tax_pct = detail.pajak or 0.0
+        unit_weight = (
+            float(detail.produk.berat or 0.0) if detail.produk else 0.0
+        )
+
+        line_subtotal = price * qty
+        line_discount = line_subtotal * (discount_pct / 100.0)
+        taxable = line_subtotal - line_discount
+        line_tax = taxable * (tax_pct / 100.0)
+        line_total = taxable + line_tax
+        line_weight = unit_weight * qty
+
+        subtotal += line_subtotal
+        discount_total += line_discount
+        tax_total += line_tax
+        total_weight += line_weight
+
+        items.append(
+            {
+                "name": detail.produk.nama_produk if detail.produk else "-",
+                "sku": detail.produk.sku if detail.produk else "-",
+                "qty": qty,
+                "price": price,
+                "discount_pct": discount_pct,
+                "tax_pct": tax_pct,
+                "total": line_total,
+                "unit_weight": unit_weight,
+                "total_weight": line_weight,
+            }
+        )
+
+    shipping_fee = float(sale.shipping_fee or 0.0)
+    net_subtotal = subtotal - discount_total
+    grand_total = net_subtotal + tax_total + shipping_fee
+
+    payment_label = sale.payment_method or "-"
+    if sale.payment_method in {"Kartu", "Transfer", "QRIS"} and sale.payment_channel:
+        payment_label = f"{sale.payment_method} - {sale.payment_channel.name}"
+
+    return {
+        "items": items,
+        "subtotal": subtotal,
+        "discount_total": discount_total,
+        "tax_total": tax_total,
+        "shipping_fee": shipping_fee,
+        "grand_total": grand_total,
+        "net_subtotal": net_subtotal,
+        "total_weight": total_weight,
+        "payment_label": payment_label,
+    }
+
+
+def _build_invoice_payload_from_items(raw_items, shipping_fee=0.0):
+    normalized_items = []
+    for item in raw_items or []:
+        product_id = _parse_int_param(item.get("product_id"))
+        if not product_id:
+            continue
+        qty = _parse_float_param(item.get("qty")) or 0.0
+        if qty <= 0:
+            continue
+        price = _parse_float_param(item.get("price")) or 0.0
+        discount_pct = _parse_tax_value(item.get("discount"), default=0.0)
+        tax_pct = _parse_tax_value(item.get("tax"), default=0.0)
+        normalized_items.append(
+            {
+                "product_id": product_id,
+                "qty": qty,
+                "price": max(0.0, price),
+                "discount_pct": discount_pct,
+                "tax_pct": tax_pct,
+            }
+        )
+
+    product_map = {}
+    if normalized_items:
+        product_ids = [item["product_id"] for item in normalized_items]
+        products = Produk.query.filter(Produk.id.in_(product_ids)).all()
+        product_map = {product.id: product for product in products}
+
+    items = []
+    subtotal = 0.0
+    discount_total = 0.0
+    tax_total = 0.0
+    total_weight = 0.0
+
+    for item in normalized_items:
+        product = product_map.get(item["product_id"])
+        if not product:
+            continue
+        qty = item["qty"]
+        price = item["price"]
+        discount_pct = item["discount_pct"]
+        tax_pct = item["tax_pct"]
+        unit_weight = float(product.berat or 0.0)
+
+        line_subtotal = price * qty
+        line_discount = line_subtotal * (discount_pct / 100.0)
+        taxable = line_subtotal - line_discount
+        line_tax = taxable * (tax_pct / 100.0)
+        line_total = taxable + line_tax
+        line_weight = unit_weight * qty
+
+        subtotal += line_subtotal
+        discount_total += line_discount
+        tax_total += line_tax
+        total_weight += line_weight
+
+        items.append(
+            {
+                "product_id": item["product_id"],
+                "name": product.nama_produk or "-",
+                "sku": product.sku or "-",
+                "qty": qty,
+                "price": price,
+                "discount_pct": discount_pct,
+                "tax_pct": tax_pct,
+                "total": line_total,
+                "unit_weight": unit_weight,
+                "total_weight": line_weight,
+            }
+        )
+
+    shipping_fee = float(_parse_float_param(shipping_fee) or 0.0)
+    net_subtotal = subtotal - discount_total
+    grand_total = net_subtotal + tax_total + shipping_fee
+
+    return {
+        "items": items,
+        "subtotal": subtotal,
+        "discount_total": discount_total,
+        "tax_total": tax_total,
+        "shipping_fee": shipping_fee,
+        "grand_total": grand_total,
+        "net_subtotal": net_subtotal,
+        "total_weight": total_weight,
+    }
+
+
+def _build_sales_filters(args):
+    search_query = (args.get("search") or "").strip()
+    pelanggan_id = _parse_int_param(args.get("pelanggan"))
+    sales_id = _parse_int_param(args.get("sales"))
+    start_date = _parse_date_param(args.get("start_date"))
+    end_date = _parse_date_param(args.get("end_date"))
+    min_total = _parse_float_param(args.get("min_total"))
+    max_total = _parse_float_param(args.get("max_total"))
+
+    filters = []
+    if search_query:
+        like = f"%{search_query}%"
+        filters.append(
+            or_(
+                Penjualan.no_faktur.ilike(like),
+                Penjualan.pelanggan.has(Pelanggan.nama.ilike(like)),
+                Penjualan.sales.has(User.username.ilike(like)),
+            )
+        )
+
+    if pelanggan_id:
+        filters.append(Penjualan.pelanggan_id == pelanggan_id)
+
+    if sales_id:
+        filters.append(Penjualan.sales_id == sales_id)
+
+    if start_date:
+        filters.append(Penjualan.tanggal_penjualan >= start_date)
+
+    if end_date:
+        filters.append(Penjualan.tanggal_penjualan <= end_date)
+
+    expr = case(
+        (
+            Penjualan.total_harga
+            - func.coalesce(Penjualan.marketplace_cost_total, 0)
+            < 0,
+            0,
+        ),
+        else_=Penjualan.total_harga
+        - func.coalesce(Penjualan.marketplace_cost_total, 0),
+    )
+    if min_total is not None:
+        filters.append(expr >= min_total)
+
+    if max_total is not None:
+        filters.append(expr <= max_total)
+
+    return {
+        "filters": filters,
+        "search_query": search_query,
+        "pelanggan_id": pelanggan_id,
+        "sales_id": sales_id,
+        "start_date": start_date,
+        "end_date": end_date,
+        "min_total": min_total,
+        "max_total": max_total,
+    }
+
+
+def _flash_shift_sweep(user):
+    sweep = last_sweep()
+    if not sweep or not sweep["count"]:
+        return
+    seen_key = "shift_sweep_seen"
+    stamp = sweep["day"].isoformat()
+    if session.get(seen_key) == stamp:
+        return
+    if (user.role or "").lower() == ROLE_ADMIN:
+        flash(f"{sweep['count']} shift lama ditutup otomatis hari ini.", "info")
+    elif user.id in sweep["user_ids"]:
+        flash("Shift Anda dari hari sebelumnya sudah ditutup otomatis.", "info")
+    else:
+        return
+    session[seen_key] = stamp
+
+
+def _build_customer_page_context(
+    edit_pelanggan=None,
+    search_query="",
+    page=1,
+    per_page=10,
+    show_duplicate_contacts=False,
+):
+    price_levels = PriceLevel.query.order_by(PriceLevel.name.asc()).all()
+    filtered_query = Pelanggan.query.order_by(Pelanggan.id.desc())
+    if search_query:
+        filtered_query = filtered_query.filter(customer_search_filter(search_query))
+    if show_duplicate_contacts:
+        duplicate_contact_values = (
+            db.session.query(func.lower(Pelanggan.kontak).label("kontak"))
+            .filter(Pelanggan.kontak.isnot(None), Pelanggan.kontak != "")
+            .group_by(func.lower(Pelanggan.kontak))
+            .having(func.count(Pelanggan.id) > 1)
+            .subquery()
+        )
+        filtered_query = filtered_query.filter(
+            func.lower(Pelanggan.kontak).in_(
+                db.session.query(duplicate_contact_values.c.kontak)
+            )
+        )
+
+    stats = customer_stats()
+    total_customers = stats.total
+    complete_contacts = stats.complete_contacts
+    complete_addresses = stats.complete_addresses
+    missing_contact = total_customers - complete_contacts
+    missing_address = total_customers - complete_addresses
+    unique_contacts = stats.unique_contacts
+
+    # tanpa filter, jumlah baris sudah ada di statistik; COUNT hanya untuk hasil filter
+    filtered = bool(search_query or show_duplicate_contacts)
+    pagination = filtered_query.paginate(
+        page=page, per_page=per_page, error_out=False, count=filtered
+    )
+    if not filtered:
+        pagination.total = total_customers
+    pelanggans = pagination.items
+
+    duplicate_contacts = max(0, complete_contacts - unique_contacts)
+
+    contact_completion = (
+        int(round((complete_contacts / total_customers) * 100))
+        if total_customers
+        else 0
+    )
+    address_completion = (
+        int(round((complete_addresses / total_customers) * 100))
+        if total_customers
+        else 0
+    )
+
+    stat_cards = [
+        {
+            "label": "Total Pelanggan",
+            "value": total_customers,
+            "icon": "fa-users",
+            "accent": "text-primary",
+            "description": "Relasi aktif tersimpan",
+        },
+        {
+            "label": "Kontak Lengkap",
+            "value": complete_contacts,
+            "icon": "fa-phone-alt",
+            "accent": "text-success",
+            "description": f"{contact_completion}% siap dihubungi",
+        },
+        {
+            "label": "Alamat Tercatat",
+            "value": complete_addresses,
+            "icon": "fa-map-marker-alt",
+            "accent": "text-info",
+            "description": f"{address_completion}% siap dikunjungi",
+        },
+        {
+            "label": "Perlu Kontak",
+            "value": missing_contact,
+            "icon": "fa-user-clock",
+            "accent": "text-warning",
+            "description": "Lengkapi agar mudah follow-up",
+        },
+    ]
+
+    insights = [
+        {
+            "title": "Pelanggan tanpa kontak",
+            "value": missing_contact,
+            "status": "warning" if missing_contact else "success",
+            "description": "Tambahkan nomor telepon agar mudah dihubungi.",
+        },
+        {
+            "title": "Pelanggan tanpa alamat",
+            "value": missing_address,
+            "status": "info" if missing_address else "success",
+            "description": "Alamat penting untuk pengiriman dan layanan purna jual.",
+        },
+        {
+            "title": "Kontak duplikat",
+            "value": duplicate_contacts,
+            "status": "secondary" if duplicate_contacts == 0 else "warning",
+            "description": "Gunakan data unik supaya kampanye marketing lebih akurat.",
+            "action_label": "Lihat duplikat" if duplicate_contacts else None,
+            "action_url": url_for("main.pelanggan", duplicate=1)
+            if duplicate_contacts
+            else None,
+        },
+    ]
+
+    next_customer_id = Pelanggan.generate_pelanggan_id()
+    recent_customers = Pelanggan.query.order_by(Pelanggan.id.desc()).limit(5).all()
+
+    return {
+        "pelanggans": pelanggans,
+        "pagination": pagination,
+        "filtered_count": pagination.total,
+        "page": page,
+        "per_page": per_page,
+        "stat_cards": stat_cards,
+        "insights": insights,
+        "recent_customers": recent_customers,
+        "contact_completion": contact_completion,
+        "address_completion": address_completion,
+        "next_customer_id": next_customer_id,
+        "edit_pelanggan": edit_pelanggan,
+        "search_query": search_query,
+        "total_customers": total_customers,
+        "price_levels": price_levels,
+        "show_duplicate_contacts": show_duplicate_contacts,
+    }
+
+
+@bp.route("/pelanggan", methods=["GET", "POST"])
+@login_required
+@roles_required(*SALES_ROLES)
+def pelanggan():
+    search_query = request.args.get("search", "").strip()
+    page = request.args.get("page", 1, type=int)
+    per_page = request.args.get("per_page", 10, type=int)
+    per_page = max(5, min(per_page, 50))
+    show_duplicate_contacts = (
+        str(request.args.get("duplicate", "")).lower() in ("1", "true", "yes")
+    )
+
+    if request.method == "POST":
+        # Gunakan generate_pelanggan_id jika pelanggan_id tidak diisi
+        pelanggan_id = (
+            request.form.get("pelanggan_id") or Pelanggan.generate_pelanggan_id()
+        )
+        nama = request.form["nama"].strip()
+        kontak = request.form["kontak"].strip()
+        email_input = request.form.get("email", "").strip()
+        email = email_input or None
+        alamat = request.form["alamat"].strip()
+        price_level_raw = request.form.get("price_level_id")
+        price_level_obj = None
+        if price_level_raw not in (None, "", "0"):
+            try:
+                price_level_obj = db.session.get(PriceLevel, int(price_level_raw))
+            except (TypeError, ValueError):
+                price_level_obj = None
+
+        required_fields = {"Nama Pelanggan": nama, "Kontak": kontak, "Alamat": alamat}
+        missing_fields = [
+            label for label, value in required_fields.items() if not value
+        ]
+        if missing_fields:
+            flash(f"Kolom berikut wajib diisi: {', '.join(missing_fields)}.", "warning")
+            return redirect(
+                url_for(
+                    "main.pelanggan",
+                    search=search_query,
+                    page=page,
+                    duplicate=1 if show_duplicate_contacts else None,
+                )
+            )
+
+        # Tambahkan pelanggan baru
+        new_pelanggan = Pelanggan(
+            pelanggan_id=pelanggan_id,
+            nama=nama,
+            kontak=kontak,
+            email=email,
+            alamat=alamat,
+            price_level=price_level_obj,
+        )
+        db.session.add(new_pelanggan)
+        db.session.commit()
+        flash("Pelanggan added successfully!", "success")
+        return redirect(url_for("main.pelanggan"))
+
+    return render_template(
+        "data_pelanggan.html",
+        **_build_customer_page_context(
+            search_query=search_query,
+            page=page,
+            per_page=per_page,
+            show_duplicate_contacts=show_duplicate_contacts,
+        ),
+    )
+
+
+@bp.route("/pelanggan/edit/<int:pelanggan_id>", methods=["GET", "POST"])
+@login_required
+@roles_required(*SALES_ROLES)
+def edit_pelanggan(pelanggan_id):
+    search_query = request.args.get("search", "").strip()
+    page = request.args.get("page", 1, type=int)
+    per_page = request.args.get("per_page", 10, type=int)
+    per_page = max(5, min(per_page, 50))
+    show_duplicate_contacts = (
+        str(request.args.get("duplicate", "")).lower() in ("1", "true", "yes")
+    )
+    pelanggan = Pelanggan.query.get_or_404(pelanggan_id)
+
+    if request.method == "POST":
+        nama = request.form["nama"].strip()
+        kontak = request.form["kontak"].strip()
+        email_input = request.form.get("email", "").strip()
+        email = email_input or None
+        alamat = request.form["alamat"].strip()
+        price_level_raw = request.form.get("price_level_id")
+        price_level_obj = None
+        if price_level_raw not in (None, "", "0"):
+            try:
+                price_level_obj = db.session.get(PriceLevel, int(price_level_raw))
+            except (TypeError, ValueError):
+                price_level_obj = None
+
+        if not nama or not kontak or not alamat:
+            flash("Nama, kontak, dan alamat wajib diisi.", "warning")
+            return redirect(
+                url_for(
+                    "main.edit_pelanggan",
+                    pelanggan_id=pelanggan_id,
+                    search=search_query,
+                    page=page,
+                    duplicate=1 if show_duplicate_contacts else None,
+                )
+            )
+
+        pelanggan.nama = nama
+        pelanggan.kontak = kontak
+        pelanggan.email = email
+        pelanggan.alamat = alamat
+        pelanggan.price_level = price_level_obj
+        db.session.commit()
+        flash(f"Pelanggan {pelanggan.nama} updated successfully!", "success")
+        return redirect(url_for("main.pelanggan", search=search_query, page=page))
+
+    return render_template(
+        "data_pelanggan.html",
+        **_build_customer_page_context(
+            edit_pelanggan=pelanggan,
+            search_query=search_query,
+            page=page,
+            per_page=per_page,
+            show_duplicate_contacts=show_duplicate_contacts,
+        ),
+    )
+
+
+@bp.route("/pelanggan/delete/<int:pelanggan_id>", methods=["POST"])
+@login_required
+@roles_required(*SALES_ROLES)
+def delete_pelanggan(pelanggan_id):
+    pelanggan = Pelanggan.query.get_or_404(pelanggan_id)
+    if Penjualan.query.filter_by(pelanggan_id=pelanggan.id).count():
+        flash(
+            "Pelanggan masih memiliki riwayat transaksi dan tidak dapat dihapus.",
+            "warning",
+        )
+        return redirect("/pelanggan")
+    pelanggan_name = pelanggan.nama  # Simpan nama pelanggan untuk pesan flash
+    db.session.delete(pelanggan)
+    db.session.commit()
+    flash(f"Pelanggan {pelanggan_name} deleted successfully!", "success")
+    return redirect("/pelanggan")
+
+
+@bp.route("/pelanggan/export", methods=["GET"])
+@login_required
+@roles_required(*SALES_ROLES)
+def export_pelanggan():
+    import pandas as pd
+    customers = Pelanggan.query.order_by(Pelanggan.nama.asc()).all()
+    data = [
+        {
+            "ID Pelanggan": customer.pelanggan_id,
+            "Nama Pelanggan": customer.nama,
+            "Kontak": customer.kontak,
+            "Email": customer.email or "",
+            "Alamat": customer.alamat,
+            "Level Harga": customer.price_level.name if customer.price_level else "",
+        }
+        for customer in customers
+    ]
+
+    df = pd.DataFrame(data)
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        df.to_excel(writer, index=False)
+    output.seek(0)
+
+    response = make_response(output.read())
+    response.headers["Content-Disposition"] = "attachment; filename=pelanggan.xlsx"
+    response.headers["Content-Type"] = (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+    return response
+
+
+@bp.route("/pelanggan/import", methods=["POST"])
+@login_required
+@roles_required(*SALES_ROLES)
+def import_pelanggan():
+    file = request.files.get("file")
+    if file is None:
+        flash("No file uploaded!", "danger")
+        return redirect("/pelanggan")
+    if file.filename == "":
+        flash("No selected file!", "danger")
+        return redirect("/pelanggan")
+    return _start_import_job("pelanggan", file)
+
+
+@bp.route("/shift/open", methods=["POST"])
+@login_required
+@roles_required(*SALES_ROLES)
+def shift_open():
+    user = get_current_user()
+    if not user:
+        return _auth_required_response()
+
+    today = local_today()
+    next_target = _resolve_next_target(url_for("main.penjualan"))
+    handover = request.form.get("handover") == "1"
+
+    is_admin = (user.role or "").lower() == ROLE_ADMIN
+    if is_admin:
+        close_stale_shifts(user.id)
+    else:
+        close_stale_shifts(user.id, only_user_id=user.id)
+
+    existing_today = CashierShift.query.filter_by(
+        user_id=user.id, shift_date=today
+    ).first()
+    if existing_today and not handover:
+        flash("Shift hari ini sudah dibuat. Tidak bisa membuka shift baru.", "warning")
+        return redirect(next_target)
+
+    open_shift = _get_open_shift(user.id)
+    if open_shift and not handover:
+        flash("Shift masih terbuka. Tutup shift sebelumnya terlebih dahulu.", "warning")
+        return redirect(next_target)
+
+    if existing_today and handover:
+        prev_opened = existing_today.opened_at
+        prev_closed = existing_today.closed_at or local_now()
+        existing_today.opened_at = local_now()
+        existing_today.closed_at = None
+        existing_today.closed_by = None
+        existing_today.forced_close = False
+        note = f"Handover {prev_opened.strftime('%H:%M')}-{prev_closed.strftime('%H:%M')}"
+        existing_today.note = append_shift_note(existing_today.note, note)
+        db.session.commit()
+        flash("Shift baru dibuka (handover).", "success")
+        return redirect(next_target)
+
+    shift = CashierShift(user_id=user.id, shift_date=today, opened_at=local_now())
+    db.session.add(shift)
+    db.session.commit()
+    flash("Shift kasir berhasil dibuka.", "success")
+    return redirect(next_target)
+
+
+@bp.route("/shift/close/<int:shift_id>", methods=["POST"])
+@login_required
+@roles_required(*SALES_ROLES)
+def shift_close(shift_id):
+    user = get_current_user()
+    if not user:
+        return _auth_required_response()
+
+    shift = CashierShift.query.get_or_404(shift_id)
+    next_target = _resolve_next_target(url_for("main.penjualan"))
+    is_admin = (user.role or "").lower() == ROLE_ADMIN
+    force_close = request.form.get("force") == "1"
+
+    if not is_admin and shift.user_id != user.id:
+        return _forbidden_response({ROLE_ADMIN, ROLE_KASIR, ROLE_SALES})
+
+    if shift.closed_at:
+        flash("Shift ini sudah ditutup.", "info")
+        return redirect(next_target)
+
+    shift.closed_at = local_now()
+    shift.closed_by = user.id
+    shift.forced_close = bool(force_close and is_admin)
+    db.session.commit()
+    flash(
+        "Shift ditutup paksa." if shift.forced_close else "Shift berhasil ditutup.",
+        "success",
+    )
+    return redirect(next_target)
+
+
+@bp.route("/shift/auto-close", methods=["POST"])
+@login_required
+@roles_required(*ADMIN_ONLY)
+def shift_auto_close():
+    user = get_current_user()
+    if not user:
+        return _auth_required_response()
+
+    next_target = _resolve_next_target(url_for("main.dashboard"))
+    result = close_stale_shifts(user.id, collect=True)
+    closed_count = result["count"]
+    if closed_count:
+        session["auto_closed_shift_log"] = result
+        flash(f"{closed_count} shift lama berhasil ditutup otomatis.", "success")
+    else:
+        session.pop("auto_closed_shift_log", None)
+        flash("Tidak ada shift lama yang perlu ditutup.", "info")
+    return redirect(next_target)
+
+
+@bp.route("/shift/user/<int:user_id>")
+@login_required
+@roles_required(*ADMIN_ONLY)
+def shift_user_detail(user_id):
+    user = User.query.get_or_404(user_id)
+    shifts = (
+        CashierShift.query.options(joinedload(CashierShift.closed_by_user))
+        .filter(CashierShift.user_id == user_id)
+        .order_by(CashierShift.opened_at.desc())
+        .limit(120)
+        .all()
+    )
+    open_count = sum(1 for shift in shifts if shift.closed_at is None)
+    total_count = len(shifts)
+    return render_template(
+        "shift_user_detail.html",
+        shift_user=user,
+        shifts=shifts,
+        open_count=open_count,
+        total_count=total_count,
+    )
+
+
+def _checkout_input_from_form(form_data, pelanggan_id):
+    return {
+        "pelanggan_id": pelanggan_id,
+        "produk_id": form_data.getlist("produk_id[]"),
+        "jumlah": form_data.getlist("jumlah[]"),
+        "harga": form_data.getlist("harga[]"),
+        "diskon": form_data.getlist("diskon[]"),
+        "pajak": form_data.getlist("pajak[]"),
+        **{key: form_data.get(key) for key in _CHECKOUT_SCALAR_FIELDS},
+    }
+
+
+@bp.route("/penjualan", methods=["GET", "POST"])
+@login_required
+@roles_required(*SALES_ROLES)
+def penjualan():
+    form = SalesForm()
+    user = get_current_user()
+    # shift lama ditutup oleh sweeper harian; halaman ini hanya membaca hasilnya
+    if request.method == "GET" and user:
+        _flash_shift_sweep(user)
+    # Katalog produk/pelanggan dimuat browser lewat /api/pos/catalog; halaman
+    # hanya perlu pelanggan yang sedang dipilih (mis. saat form gagal validasi).
+    selected_customer = None
+    if form.pelanggan_id.data:
+        selected_customer = db.session.get(Pelanggan, form.pelanggan_id.data)
+    form.pelanggan_id.choices = [(0, "Pilih pelanggan")]
+    customer_lookup = {}
+    if selected_customer:
+        form.pelanggan_id.choices.append(
+            (
+                selected_customer.id,
+                f"{selected_customer.nama} ({selected_customer.pelanggan_id})",
+            )
+        )
+        customer_lookup[selected_customer.id] = serialize_customer(selected_customer)
+    if form.pelanggan_id.data is None:
+        form.pelanggan_id.data = 0
+
+    # Simpan transaksi sebelum menyusun konteks halaman; POST yang berhasil
+    # langsung redirect ke struk tanpa menghitung statistik POS.
+    if form.validate_on_submit():
+        try:
+            checkout = _checkout_input_from_form(request.form, form.pelanggan_id.data)
+            penjualan = _process_sale_checkout(session.get("user_id"), checkout)
+            flash(
+                f"Penjualan berhasil disimpan (total Rp {penjualan.total_harga:,.0f}).",
+                "success",
+            )
+            return redirect(url_for("main.penjualan_receipt", sale_id=penjualan.id))
+
+        except ValueError as exc:
+            db.session.rollback()
+            flash(str(exc), "warning")
+        except Exception as e:
+            db.session.rollback()
+            logging.exception("Gagal menyimpan penjualan")
+            flash(f"Error: {str(e)}", "danger")
+
+    today = local_today()
+    active_shift = _get_open_shift(user.id) if user else None
+    shift_today = None
+    if user:
+        shift_today = (
+            CashierShift.query.filter_by(user_id=user.id, shift_date=today)
+            .order_by(CashierShift.id.desc())
+            .first()
+        )
+    is_admin = bool(user and (user.role or "").lower() == ROLE_ADMIN)
+    open_shifts = []
+    if is_admin:
+        open_shifts = (
+            CashierShift.query.options(joinedload(CashierShift.user))
+            .filter(CashierShift.closed_at.is_(None))
+            .order_by(CashierShift.opened_at.asc())
+            .all()
+        )
+
+    # Load available price levels for use in the sales UI (if needed)
+    price_levels = PriceLevel.query.order_by(PriceLevel.name.asc()).all()
+    expedisi_list = Expedisi.query.order_by(Expedisi.name.asc()).all()
+    payment_channels = (
+        PaymentChannel.query.filter(
+            PaymentChannel.channel_type.in_(["Kartu", "Transfer", "QRIS"])
+        )
+        .order_by(PaymentChannel.channel_type.asc(), PaymentChannel.name.asc())
+        .all()
+    )
+
+    total_orders = Penjualan.query.count()
+    total_revenue = (
+        db.session.query(func.coalesce(func.sum(Penjualan.total_harga), 0)).scalar()
+        or 0.0
+    )
+    items_sold = (
+        db.session.query(func.coalesce(func.sum(DetailPenjualan.jumlah), 0)).scalar()
+        or 0
+    )
+    today_orders = Penjualan.query.filter(Penjualan.tanggal_penjualan == today).count()
+    average_order = total_revenue / total_orders if total_orders else 0.0
+
+    sale_date_display = _format_date_id(today)
+    sales_prefix = _get_sales_invoice_prefix()
+    draft_invoice = _build_draft_invoice(sales_prefix, Penjualan)
+    sales_operator = session.get("username") or "Sales"
+
+    sales_stat_cards = [
+        {
+            "label": "Total Transaksi",
+            "value": total_orders,
+            "icon": "fa-receipt",
+            "accent": "text-primary",
+            "type": "count",
+            "description": "Jumlah penjualan tercatat.",
+        },
+        {
+            "label": "Pendapatan",
+            "value": total_revenue,
+            "icon": "fa-wallet",
+            "accent": "text-success",
+            "type": "currency",
+            "description": "Akumulasi nilai transaksi.",
+        },
+        {
+            "label": "Rata-rata Order",
+            "value": average_order,
+            "icon": "fa-chart-line",
+            "accent": "text-info",
+            "type": "currency",
+            "description": "Nilai rata-rata per transaksi.",
+        },
+        {
+            "label": "Transaksi Hari Ini",
+            "value": today_orders,
+            "icon": "fa-calendar-day",
+            "accent": "text-warning",
+            "type": "count",
+            "description": "Order yang tercatat pada tanggal ini.",
+        },
+    ]
+
+    sales_insights = [
+        {
+            "title": "Unit terjual",
+            "value": items_sold,
+            "status": "warning" if items_sold else "secondary",
+            "type": "count",
+            "description": "Akumulasi kuantitas produk di seluruh transaksi.",
+        },
+        {
+            "title": "Transaksi hari ini",
+            "value": today_orders,
+            "status": "info" if today_orders else "secondary",
+            "type": "count",
+            "description": "Pantau aktivitas penjualan harian.",
+        },
+        {
+            "title": "Rata-rata order",
+            "value": average_order,
+            "status": "success" if average_order else "secondary",
+            "type": "currency",
+            "description": "Indikasi nilai order rata-rata pelanggan.",
+        },
+    ]
+
+    top_customer = (
+        db.session.query(Pelanggan.nama, func.count(Penjualan.id).label("jumlah"))
+        .join(Penjualan, Penjualan.pelanggan_id == Pelanggan.id)
+        .group_by(Pelanggan.id)
+        .order_by(func.count(Penjualan.id).desc())
+        .first()
+    )
+    if top_customer:
+        sales_insights.append(
+            {
+                "title": "Pelanggan teraktif",
+                "value": top_customer.jumlah,
+                "status": "success",
+                "type": "count",
+                "description": f"{top_customer.nama} paling sering bertransaksi.",
+            }
+        )
+
+    recent_sales_query = (
+        Penjualan.query.order_by(
+            Penjualan.tanggal_penjualan.desc(), Penjualan.id.desc()
+        )
+        .limit(5)
+        .all()
+    )
+    recent_sales = [
+        {
+            "no_faktur": sale.no_faktur,
+            "tanggal": (
+                sale.tanggal_penjualan.strftime("%d %b %Y")
+                if sale.tanggal_penjualan
+                else "-"
+            ),
+            "pelanggan": sale.pelanggan.nama if sale.pelanggan else "Umum",
+            "total": float(sale.total_harga or 0.0),
+            "items": sum(detail.jumlah for detail in sale.detail_penjualan),
+        }
+        for sale in recent_sales_query
+    ]
+
+    catalog_urls = {
+        kind: url_for("main.pos_catalog", kind=kind) for kind in CATALOG_KINDS
+    }
+
+    return render_template(
+        "penjualan.html",
+        form=form,
+        catalog_urls=catalog_urls,
+        sales_stat_cards=sales_stat_cards,
+        sales_insights=sales_insights,
+        recent_sales=recent_sales,
+        customer_lookup=customer_lookup,
+        sales_operator=sales_operator,
+        draft_invoice=draft_invoice,
+        sale_date_display=sale_date_display,
+        price_levels=price_levels,
+        expedisi_list=expedisi_list,
+        payment_channels=payment_channels,
+        default_sales_tax=_get_default_sales_tax(),
+        active_shift=active_shift,
+        shift_today=shift_today,
+        open_shifts=open_shifts,
+        is_admin=is_admin,
+    )
+
+
+@bp.route("/penjualan/receipt/<int:sale_id>")
+@login_required
+@roles_required(*SALES_ROLES)
+def penjualan_receipt(sale_id):
+    sale = (
+        Penjualan.query.options(
+            joinedload(Penjualan.detail_penjualan).joinedload(DetailPenjualan.produk),
+            joinedload(Penjualan.pelanggan),
+            joinedload(Penjualan.sales),
+            joinedload(Penjualan.expedition),
+            joinedload(Penjualan.payment_channel),
+        )
+        .filter(Penjualan.id == sale_id)
+        .first_or_404()
+    )
+    payload = _build_sale_print_payload(sale)
+    receipt_settings = _get_receipt_settings()
+
+    return render_template(
+        "penjualan_struk.html",
+        sale=sale,
+        items=payload["items"],
+        subtotal=payload["subtotal"],
+        discount_total=payload["discount_total"],
+        tax_total=payload["tax_total"],
+        shipping_fee=payload["shipping_fee"],
+        grand_total=payload["grand_total"],
+        payment_label=payload["payment_label"],
+        total_weight=payload["total_weight"],
+        company_profile=_get_company_profile(),
+        receipt_settings=receipt_settings,
+    )
+
+
+@bp.route("/penjualan/invoice-draft", methods=["POST"])
+@login_required
+@roles_required(*SALES_ROLES)
+def penjualan_invoice_draft():
+    payload_raw = (request.form.get("draft_payload") or "").strip()
+    if not payload_raw:
+        flash("Draft invoice kosong.", "warning")
+        return redirect(url_for("main.penjualan"))
+
+    try:
+        draft_payload = json.loads(payload_raw)
+    except (TypeError, ValueError):
+        flash("Draft invoice tidak valid.", "warning")
+        return redirect(url_for("main.penjualan"))
+
+    raw_items = draft_payload.get("items") or []
+    shipping_fee = draft_payload.get("shipping_fee") or 0.0
+    payload = _build_invoice_payload_from_items(raw_items, shipping_fee=shipping_fee)
+    if not payload["items"]:
+        flash("Tambahkan minimal satu produk sebelum cetak invoice sementara.", "warning")
+        return redirect(url_for("main.penjualan"))
+
+    customer_id = _parse_int_param(draft_payload.get("customer_id"))
+    customer_label = (draft_payload.get("customer_label") or "").strip()
+    customer = db.session.get(Pelanggan, customer_id) if customer_id else None
+    customer_name = customer.nama if customer else (customer_label or "Customer")
+    customer_phone = customer.kontak if customer else "-"
+    customer_address = customer.alamat if customer else "-"
+
+    draft_invoice = (draft_payload.get("draft_invoice") or "").strip()
+    if not draft_invoice:
+        draft_invoice = _build_draft_invoice(_get_sales_invoice_prefix(), Penjualan)
+
+    payment_method = (draft_payload.get("payment_method") or "-").strip()
+    payment_channel_id = _parse_int_param(draft_payload.get("payment_channel_id"))
+    payment_channel = (
+        db.session.get(PaymentChannel, payment_channel_id) if payment_channel_id else None
+    )
+    payment_label = payment_method or "-"
+    if payment_method in {"Kartu", "Transfer", "QRIS"} and payment_channel:
+        payment_label = f"{payment_method} - {payment_channel.name}"
+
+    expedition_id = _parse_int_param(draft_payload.get("expedition_id"))
+    expedition = db.session.get(Expedisi, expedition_id) if expedition_id else None
+
+    return render_template(
+        "penjualan_invoice_draft.html",
+        invoice_number=draft_invoice,
+        invoice_date=local_now(),
+        customer={
+            "name": customer_name,
+            "phone": customer_phone,
+            "address": customer_address,
+        },
+        sales_name=session.get("username") or "-",
+        payment_label=payment_label,
+        payment_method=payment_method,
+        expedition_name=expedition.name if expedition else "-",
+        items=payload["items"],
+        subtotal=payload["subtotal"],
+        discount_total=payload["discount_total"],
+        tax_total=payload["tax_total"],
+        shipping_fee=payload["shipping_fee"],
+        grand_total=payload["grand_total"],
+        total_weight=payload["total_weight"],
+        company_profile=_get_company_profile(),
+    )
+
+
+@bp.route("/penjualan/invoice/<int:sale_id>")
+@login_required
+@roles_required(*SALES_ROLES)
+def penjualan_invoice(sale_id):
+    sale = (
+        Penjualan.query.options(
+            joinedload(Penjualan.detail_penjualan).joinedload(DetailPenjualan.produk),
+            joinedload(Penjualan.pelanggan),
+            joinedload(Penjualan.sales),
+            joinedload(Penjualan.expedition),
+            joinedload(Penjualan.payment_channel),
+        )
+        .filter(Penjualan.id == sale_id)
+        .first_or_404()
+    )
+    payload = _build_sale_print_payload(sale)
+    return render_template(
+        "penjualan_invoice.html",
+        sale=sale,
+        items=payload["items"],
+        subtotal=payload["subtotal"],
+        discount_total=payload["discount_total"],
+        tax_total=payload["tax_total"],
+        shipping_fee=payload["shipping_fee"],
+        grand_total=payload["grand_total"],
+        net_subtotal=payload["net_subtotal"],
+        payment_label=payload["payment_label"],
+        total_weight=payload["total_weight"],
+        company_profile=_get_company_profile(),
+    )
+
+
+@bp.route("/quotation")
+@login_required
+@roles_required(*SALES_ROLES)
+def quotation_list():
+
+    status_filter = (request.args.get("status") or "draft").strip().lower()
+    query = Quotation.query.options(
+        joinedload(Quotation.pelanggan),
+        joinedload(Quotation.sales),
+        joinedload(Quotation.items),
+    ).order_by(Quotation.created_at.desc(), Quotation.id.desc())
+    if status_filter and status_filter != "all":
+        query = query.filter(Quotation.status == status_filter)
+    quotations = query.limit(200).all()
+
+    status_counts = dict(
+        db.session.query(Quotation.status, func.count(Quotation.id)).group_by(
+            Quotation.status
+        )
+    )
+    total_all = sum(status_counts.values())
+
+    return render_template(
+        "quotation_list.html",
+        quotations=quotations,
+        status_filter=status_filter,
+        status_counts=status_counts,
+        total_all=total_all,
+    )
+
+
+@bp.route("/quotation/create", methods=["POST"])
+@login_required
+@roles_required(*SALES_ROLES)
+def quotation_create():
+
+    payload_raw = (request.form.get("draft_payload") or "").strip()
+    if not payload_raw:
+        flash("Draft quotation kosong.", "warning")
+        return redirect(url_for("main.penjualan"))
+
+    try:
+        draft_payload = json.loads(payload_raw)
+    except (TypeError, ValueError):
+        flash("Draft quotation tidak valid.", "warning")
+        return redirect(url_for("main.penjualan"))
+
+    raw_items = draft_payload.get("items") or []
+    shipping_fee = draft_payload.get("shipping_fee") or 0.0
+    payload = _build_invoice_payload_from_items(raw_items, shipping_fee=shipping_fee)
+    if not payload["items"]:
+        flash("Tambahkan minimal satu produk sebelum menyimpan quotation.", "warning")
+        return redirect(url_for("main.penjualan"))
+
+    customer_id = _parse_int_param(draft_payload.get("customer_id"))
+    customer_label = (draft_payload.get("customer_label") or "").strip()
+    customer = db.session.get(Pelanggan, customer_id) if customer_id else None
+    if customer and not customer_label:
+        customer_label = customer.nama
+
+    price_level_id = _parse_int_param(draft_payload.get("price_level_id"))
+    expedition_id = _parse_int_param(draft_payload.get("expedition_id"))
+    payment_channel_id = _parse_int_param(draft_payload.get("payment_channel_id"))
+    payment_method = (draft_payload.get("payment_method") or "").strip()
+    due_date = _parse_date_param(draft_payload.get("due_date"))
+
+    quotation = Quotation(
+        quote_number=_generate_quotation_number(),
+        sales_id=session.get("user_id"),
+        pelanggan_id=customer_id,
+        customer_label=customer_label or None,
+        price_level_id=price_level_id,
+        expedition_id=expedition_id,
+        payment_channel_id=payment_channel_id,
+        payment_method=payment_method or None,
+        due_date=due_date,
+        subtotal=payload["subtotal"],
+        discount_total=payload["discount_total"],
+        tax_total=payload["tax_total"],
+        shipping_fee=payload["shipping_fee"],
+        grand_total=payload["grand_total"],
+        total_weight=payload["total_weight"],
+    )
+
+    try:
+        db.session.add(quotation)
+        db.session.flush()
+
+        for item in payload["items"]:
+            db.session.add(
+                QuotationItem(
+                    quotation_id=quotation.id,
+                    product_id=item.get("product_id"),
+                    product_name=item.get("name") or "-",
+                    sku=item.get("sku") or "-",
+                    qty=item.get("qty") or 0.0,
+                    price=item.get("price") or 0.0,
+                    discount_pct=item.get("discount_pct") or 0.0,
+                    tax_pct=item.get("tax_pct") or 0.0,
+                    total=item.get("total") or 0.0,
+                    unit_weight=item.get("unit_weight") or 0.0,
+                    total_weight=item.get("total_weight") or 0.0,
+                )
+            )
+
+        db.session.commit()
+    except Exception as exc:
+        db.session.rollback()
+        logging.exception("Gagal menyimpan quotation")
+        flash(f"Gagal menyimpan quotation: {str(exc)}", "danger")
+        return redirect(url_for("main.penjualan"))
+
+    return redirect(url_for("main.quotation_print", quotation_id=quotation.id))
+
+
+@bp.route("/quotation/<int:quotation_id>/print")
+@login_required
+@roles_required(*SALES_ROLES)
+def quotation_print(quotation_id):
+
+    quotation = (
+        Quotation.query.options(
+            joinedload(Quotation.items),
+            joinedload(Quotation.sales),
+            joinedload(Quotation.pelanggan),
+            joinedload(Quotation.expedition),
+            joinedload(Quotation.payment_channel),
+        )
+        .filter(Quotation.id == quotation_id)
+        .first_or_404()
+    )
+
+    customer_name = quotation.customer_label or "-"
+    customer_phone = "-"
+    customer_address = "-"
+    if quotation.pelanggan:
+        customer_name = quotation.pelanggan.nama or customer_name
+        customer_phone = quotation.pelanggan.kontak or "-"
+        customer_address = quotation.pelanggan.alamat or "-"
+
+    payment_label = quotation.payment_method or "-"
+    if (
+        quotation.payment_method in {"Kartu", "Transfer", "QRIS"}
+        and quotation.payment_channel
+    ):
+        payment_label = f"{quotation.payment_method} - {quotation.payment_channel.name}"
+
+    return render_template(
+        "quotation_print.html",
+        quotation=quotation,
+        items=quotation.items,
+        customer={
+            "name": customer_name,
+            "phone": customer_phone,
+            "address": customer_address,
+        },
+        sales_name=quotation.sales.username if quotation.sales else "-",
+        payment_label=payment_label,
+        expedition_name=quotation.expedition.name if quotation.expedition else "-",
+        company_profile=_get_company_profile(),
+    )
+
+
+@bp.route("/quotation/<int:quotation_id>/cancel", methods=["POST"])
+@login_required
+@roles_required(*SALES_ROLES)
+def quotation_cancel(quotation_id):
+
+    quotation = Quotation.query.get_or_404(quotation_id)
+    if quotation.status == "converted":
+        flash("Quotation sudah dikonversi ke penjualan dan tidak bisa dibatalkan.", "warning")
+        return redirect(_resolve_next_target(url_for("main.quotation_list")))
+    if quotation.status != "cancelled":
+        quotation.status = "cancelled"
+        db.session.commit()
+        flash(f"Quotation {quotation.quote_number} dibatalkan.", "success")
+    return redirect(_resolve_next_target(url_for("main.quotation_list")))
+
+
+@bp.route("/quotation/<int:quotation_id>/convert")
+@login_required
+@roles_required(*SALES_ROLES)
+def quotation_convert(quotation_id):
+
+    quotation = (
+        Quotation.query.options(
+            joinedload(Quotation.items),
+        )
+        .filter(Quotation.id == quotation_id)
+        .first_or_404()
+    )
+    if quotation.status == "cancelled":
+        flash("Quotation sudah dibatalkan dan tidak bisa dikonversi.", "warning")
+        return redirect(url_for("main.quotation_list"))
+
+    items_payload = []
+    for item in quotation.items:
+        if not item.product_id:
+            continue
+        items_payload.append(
+            {
+                "product_id": item.product_id,
+                "qty": item.qty,
+                "price": item.price,
+                "discount": item.discount_pct,
+                "tax": item.tax_pct,
+            }
+        )
+
+    due_date = quotation.due_date.isoformat() if quotation.due_date else ""
+    payload = {
+        "items": items_payload,
+        "customer_id": quotation.pelanggan_id or "",
+        "customer_label": quotation.customer_label or "",
+        "price_level_id": quotation.price_level_id or "",
+        "shipping_fee": quotation.shipping_fee or "",
+        "payment_method": quotation.payment_method or "",
+        "payment_channel_id": quotation.payment_channel_id or "",
+        "due_date": due_date,
+        "expedition_id": quotation.expedition_id or "",
+        "amount_paid": "",
+        "quotation_id": quotation.id,
+        "quotation_number": quotation.quote_number,
+        "updated_at": int(local_now().timestamp() * 1000),
+    }
+
+    return render_template(
+        "quotation_convert.html",
+        payload=payload,
+    )
+
+
+@bp.route("/penjualan/surat_jalan/<int:sale_id>")
+@login_required
+@roles_required(*SALES_ROLES)
+def penjualan_surat_jalan(sale_id):
+    sale = (
+        Penjualan.query.options(
+            joinedload(Penjualan.detail_penjualan).joinedload(DetailPenjualan.produk),
+            joinedload(Penjualan.pelanggan),
+            joinedload(Penjualan.sales),
+            joinedload(Penjualan.expedition),
+        )
+        .filter(Penjualan.id == sale_id)
+        .first_or_404()
+    )
+    payload = _build_sale_print_payload(sale)
+    return render_template(
+        "penjualan_surat_jalan.html",
+        sale=sale,
+        items=payload["items"],
+        total_weight=payload["total_weight"],
+        company_profile=_get_company_profile(),
+    )
+
+
+@bp.route("/penjualan/delete/<int:sale_id>", methods=["POST"])
+@login_required
+@roles_required(*ADMIN_ONLY)
+def delete_penjualan(sale_id):
+    sale = (
+        Penjualan.query.options(
+            joinedload(Penjualan.detail_penjualan).joinedload(DetailPenjualan.produk)
+        )
+        .get_or_404(sale_id)
+    )
+    locked_period = _get_locked_period_for_date(sale.tanggal_penjualan)
+    if sale.is_locked or locked_period:
+        label = locked_period.label if locked_period else "periode terkunci"
+        flash(
+            f"Penjualan tidak bisa dihapus karena {label} sudah ditutup.",
+            "warning",
+        )
+        return redirect(url_for("main.data_penjualan"))
+
+    memo = f"Auto COGS – Penjualan {sale.no_faktur}"
+    journal_entries = JournalEntry.query.filter(JournalEntry.memo == memo).all()
+    if any(entry.is_locked for entry in journal_entries):
+        flash(
+            "Penjualan tidak bisa dihapus karena jurnal terkait sudah dikunci.",
+            "warning",
+        )
+        return redirect(url_for("main.data_penjualan"))
+
+    try:
+        apply_sale_to_summary(sale, sign=-1)
+        for detail in sale.detail_penjualan:
+            product = detail.produk
+            if product:
+                product.stok_lama = int(product.stok_lama or 0) + int(
+                    detail.jumlah or 0
+                )
+
+        for entry in journal_entries:
+            db.session.delete(entry)
+
+        for detail in list(sale.detail_penjualan):
+            db.session.delete(detail)
+
+        db.session.delete(sale)
+        db.session.commit()
+        flash(f"Penjualan {sale.no_faktur} berhasil dihapus.", "success")
+    except Exception as exc:
+        db.session.rollback()
+        logging.exception("Gagal menghapus penjualan")
+        flash(f"Gagal menghapus penjualan: {str(exc)}", "danger")
+
+    next_target = (request.form.get("next") or "").strip()
+    if next_target and _is_safe_redirect_target(next_target):
+        return redirect(next_target)
+    return redirect(url_for("main.data_penjualan"))
+
+
+@bp.route("/data_penjualan")
+@login_required
+@roles_required(*SALES_ROLES)
+def data_penjualan():
+    filter_payload = _build_sales_filters(request.args)
+    filters = filter_payload["filters"]
+    sort_option = request.args.get("sort", "date_desc")
+    per_page = request.args.get("per_page", type=int) or 10
+    per_page = max(5, min(per_page, 50))
+    page = request.args.get("page", type=int) or 1
+    if page < 1:
+        page = 1
+
+    def apply_filters(query):
+        return query.filter(*filters) if filters else query
+
+    def build_filtered_query(base_query):
+        return base_query.filter(*filters) if filters else base_query
+
+    net_expr = case(
+        (
+            Penjualan.total_harga
+            - func.coalesce(Penjualan.marketplace_cost_total, 0)
+            < 0,
+            0,
+        ),
+        else_=Penjualan.total_harga
+        - func.coalesce(Penjualan.marketplace_cost_total, 0),
+    )
+    sort_map = {
+        "date_asc": Penjualan.tanggal_penjualan.asc(),
+        "date_desc": Penjualan.tanggal_penjualan.desc(),
+        "total_asc": net_expr.asc(),
+        "total_desc": net_expr.desc(),
+    }
+    order_clause = sort_map.get(sort_option, Penjualan.tanggal_penjualan.desc())
+
+    total_records = (
+        apply_filters(db.session.query(func.count(Penjualan.id))).scalar() or 0
+    )
+    total_pages = max(1, (total_records + per_page - 1) // per_page)
+    if page > total_pages:
+        page = total_pages
+    offset = (page - 1) * per_page
+
+    base_query = apply_filters(
+        Penjualan.query.options(
+            joinedload(Penjualan.pelanggan),
+            joinedload(Penjualan.sales),
+            joinedload(Penjualan.detail_penjualan).joinedload(DetailPenjualan.produk),
+        )
+    )
+
+    penjualan_records = (
+        base_query.order_by(order_clause, Penjualan.id.desc())
+        .offset(offset)
+        .limit(per_page)
+        .all()
+    )
+
+    total_revenue = (
+        apply_filters(
+            db.session.query(func.coalesce(func.sum(net_expr), 0))
+        ).scalar()
+        or 0.0
+    )
+    average_order = total_revenue / total_records if total_records else 0.0
+    items_sold = (
+        apply_filters(
+            db.session.query(func.coalesce(func.sum(DetailPenjualan.jumlah), 0)).join(
+                Penjualan, DetailPenjualan.penjualan_id == Penjualan.id
+            )
+        ).scalar()
+        or 0
+    )
+    distinct_customers = (
+        apply_filters(
+            db.session.query(func.count(func.distinct(Penjualan.pelanggan_id)))
+        ).scalar()
+        or 0
+    )
+    total_marketplace_costs = (
+        apply_filters(
+            db.session.query(func.coalesce(func.sum(Penjualan.marketplace_cost_total), 0))
+        ).scalar()
+        or 0.0
+    )
+    today = local_today()
+    today_revenue = (
+        apply_filters(
+            db.session.query(func.coalesce(func.sum(net_expr), 0))
+        )
+        .filter(Penjualan.tanggal_penjualan == today)
+        .scalar()
+        or 0.0
+    )
+
+    net_sum_sales = func.coalesce(func.sum(net_expr), 0).label("total")
+    top_sales_raw = (
+        build_filtered_query(
+            db.session.query(
+                User.username.label("name"),
+                func.count(Penjualan.id).label("orders"),
+                net_sum_sales,
+            )
+            .join(User, Penjualan.sales_id == User.id)
+            .group_by(User.id)
+            .order_by(net_sum_sales.desc())
+        )
+        .limit(5)
+        .all()
+    )
+    net_sum_customers = func.coalesce(func.sum(net_expr), 0).label("total")
+    top_customers_raw = (
+        build_filtered_query(
+            db.session.query(
+                Pelanggan.nama.label("name"),
+                func.count(Penjualan.id).label("orders"),
+                net_sum_customers,
+            )
+            .join(Pelanggan, Penjualan.pelanggan_id == Pelanggan.id)
+            .group_by(Pelanggan.id)
+            .order_by(net_sum_customers.desc())
+        )
+        .limit(5)
+        .all()
+    )
+    top_products_raw = (
+        build_filtered_query(
+            db.session.query(
+                Produk.nama_produk.label("name"),
+                func.sum(DetailPenjualan.jumlah).label("qty"),
+                func.coalesce(func.sum(DetailPenjualan.harga_total), 0).label("total"),
+            )
+            .join(DetailPenjualan, DetailPenjualan.produk_id == Produk.id)
+            .join(Penjualan, DetailPenjualan.penjualan_id == Penjualan.id)
+            .group_by(Produk.id)
+            .order_by(func.sum(DetailPenjualan.jumlah).desc())
+        )
+        .limit(5)
+        .all()
+    )
+    daily_summary_raw = (
+        build_filtered_query(
+            db.session.query(
+                Penjualan.tanggal_penjualan.label("date"),
+                func.count(Penjualan.id).label("orders"),
+                func.coalesce(func.sum(net_expr), 0).label("total"),
+            )
+            .group_by(Penjualan.tanggal_penjualan)
+            .order_by(Penjualan.tanggal_penjualan.desc())
+        )
+        .limit(7)
+        .all()
+    )
+
+    top_sales = [
+        {"name": row.name, "orders": row.orders, "total": row.total}
+        for row in top_sales_raw
+    ]
+    top_customers = [
+        {"name": row.name, "orders": row.orders, "total": row.total}
+        for row in top_customers_raw
+    ]
+    top_products = [
+        {"name": row.name, "qty": row.qty, "total": row.total}
+        for row in top_products_raw
+    ]
+    daily_summary = [
+        {
+            "date": row.date,
+            "label": _format_date_id(row.date),
+            "orders": row.orders,
+            "total": row.total,
+        }
+        for row in daily_summary_raw
+    ]
+
+    filter_active = any(
+        [
+            filter_payload["search_query"],
+            filter_payload["pelanggan_id"],
+            filter_payload["sales_id"],
+            filter_payload["start_date"],
+            filter_payload["end_date"],
+            filter_payload["min_total"] is not None,
+            filter_payload["max_total"] is not None,
+        ]
+    )
+
+    def _date_value_to_str(value):
+        return value.strftime("%Y-%m-%d") if value else ""
+
+    filter_values = {
+        "search": filter_payload["search_query"],
+        "pelanggan": filter_payload["pelanggan_id"] or "",
+        "sales": filter_payload["sales_id"] or "",
+        "start_date": _date_value_to_str(filter_payload["start_date"]),
+        "end_date": _date_value_to_str(filter_payload["end_date"]),
+        "min_total": (
+            filter_payload["min_total"]
+            if filter_payload["min_total"] is not None
+            else ""
+        ),
+        "max_total": (
+            filter_payload["max_total"]
+            if filter_payload["max_total"] is not None
+            else ""
+        ),
+    }
+
+    if filter_payload["start_date"] and filter_payload["end_date"]:
+        range_label = f"{_format_date_id(filter_payload['start_date'])} - {_format_date_id(filter_payload['end_date'])}"
+    elif filter_payload["start_date"]:
+        range_label = f"Mulai {_format_date_id(filter_payload['start_date'])}"
+    elif filter_payload["end_date"]:
+        range_label = f"Sampai {_format_date_id(filter_payload['end_date'])}"
+    else:
+        range_label = "Semua tanggal"
+
+    stats_cards = [
+        {
+            "label": "Pendapatan Bersih",
+            "value": total_revenue,
+            "icon": "fa-wallet",
+            "accent": "text-success",
+            "type": "currency",
+            "description": "Setelah biaya marketplace.",
+        },
+        {
+            "label": "Biaya Marketplace",
+            "value": total_marketplace_costs,
+            "icon": "fa-coins",
+            "accent": "text-danger",
+            "type": "currency",
+            "description": "Komisi, cashback, dan bebas ongkir.",
+        },
+        {
+            "label": "Rata-rata Order",
+            "value": average_order,
+            "icon": "fa-divide",
+            "accent": "text-info",
+            "type": "currency",
+            "description": "Nilai rata-rata per faktur.",
+        },
+        {
+            "label": "Item Terjual",
+            "value": items_sold,
+            "icon": "fa-cubes",
+            "accent": "text-warning",
+            "description": "Akumulasi kuantitas produk.",
+        },
+    ]
+
+    insight_cards = [
+        {
+            "title": "Pelanggan unik",
+            "value": distinct_customers,
+            "description": "Jumlah pelanggan berbeda dalam hasil filter.",
+        },
+        {
+            "title": "Pendapatan hari ini",
+            "value": today_revenue,
+            "type": "currency",
+            "description": "Nilai bersih transaksi hari ini.",
+        },
+        {
+            "title": "Rentang tanggal",
+            "value": range_label,
+            "type": "text",
+            "description": "Periode data yang sedang dianalisis.",
+        },
+    ]
+
+    sales_options = User.query.order_by(User.username.asc()).all()
+    customer_options = Pelanggan.query.order_by(Pelanggan.nama.asc()).all()
+
+    query_args = request.args.to_dict(flat=True)
+    query_args.pop("page", None)
+    base_args = query_args.copy()
+
+    prev_url = (
+        url_for("main.data_penjualan", page=page - 1, **base_args) if page > 1 else None
+    )
+    next_url = (
+        url_for("main.data_penjualan", page=page + 1, **base_args)
+        if page < total_pages
+        else None
+    )
+
+    page_window_start = max(1, page - 2)
+    page_window_end = min(total_pages, page + 2)
+    page_links = [
+        {
+            "number": number,
+            "url": url_for("main.data_penjualan", page=number, **base_args),
+            "current": number == page,
+        }
+        for number in range(page_window_start, page_window_end + 1)
+    ]
+    pagination = {
+        "page": page,
+        "per_page": per_page,
+        "total_pages": total_pages,
+        "total_records": total_records,
+        "has_prev": page > 1,
+        "has_next": page < total_pages,
+        "base_args": base_args,
+        "prev_url": prev_url,
+        "next_url": next_url,
+        "page_links": page_links,
+    }
+
+    return render_template(
+        "data_penjualan.html",
+        penjualan_records=penjualan_records,
+        stats_cards=stats_cards,
+        insight_cards=insight_cards,
+        top_sales=top_sales,
+        top_customers=top_customers,
+        top_products=top_products,
+        daily_summary=daily_summary,
+        filter_values=filter_values,
+        sort_option=sort_option,
+        per_page=per_page,
+        pagination=pagination,
+        filter_active=filter_active,
+        sales_options=sales_options,
+        customer_options=customer_options,
+        format_date=_format_date_id,
+    )
+
+
+def _generate_quotation_number(prefix=None):
+    return allocate_document_number(DOCUMENT_QUOTATION, prefix=prefix)
+
+
+@bp.route("/utilitas/pembayaran-piutang", methods=["GET"])
+@login_required
+@roles_required(*SALES_ROLES)
+def pembayaran_piutang():
+    today = local_today()
+    default_start = today.replace(day=1)
+    start_date = _parse_date_param(request.args.get("start_date")) or default_start
+    end_date = _parse_date_param(request.args.get("end_date")) or today
+    if end_date < start_date:
+        start_date, end_date = end_date, start_date
+
+    search_query = (request.args.get("search") or "").strip()
+    open_id = _parse_int_param(request.args.get("open_id"))
+    pelanggan_id = _parse_int_param(request.args.get("pelanggan"))
+    sales_id = _parse_int_param(request.args.get("sales"))
+    per_page = request.args.get("per_page", type=int) or 10
+    per_page = max(5, min(per_page, 50))
+    page = request.args.get("page", type=int) or 1
+    if page < 1:
+        page = 1
+
+    outstanding_expr = Penjualan.total_harga - func.coalesce(Penjualan.amount_paid, 0)
+    base_filters = [
+        Penjualan.payment_method == "Tempo",
+        outstanding_expr > 0,
+    ]
+    if open_id:
+        base_filters.append(Penjualan.id == open_id)
+    else:
+        base_filters.extend(
+            [
+                Penjualan.tanggal_penjualan >= start_date,
+                Penjualan.tanggal_penjualan <= end_date,
+            ]
+        )
+        if pelanggan_id:
+            base_filters.append(Penjualan.pelanggan_id == pelanggan_id)
+        if sales_id:
+            base_filters.append(Penjualan.sales_id == sales_id)
+        if search_query:
+            like = f"%{search_query}%"
+            base_filters.append(
+                or_(
+                    Penjualan.no_faktur.ilike(like),
+                    Penjualan.pelanggan.has(Pelanggan.nama.ilike(like)),
+                    Penjualan.sales.has(User.username.ilike(like)),
+                )
+            )
+
+    total_records = (
+        db.session.query(func.count(Penjualan.id)).filter(*base_filters).scalar()
+        or 0
+    )
+    total_pages = max(1, (total_records + per_page - 1) // per_page)
+    if page > total_pages:
+        page = total_pages
+    offset = (page - 1) * per_page
+
+    nulls_last = case((Penjualan.due_date.is_(None), 1), else_=0)
+    order_clause = (
+        nulls_last.asc(),
+        Penjualan.due_date.asc(),
+        Penjualan.tanggal_penjualan.desc(),
+        Penjualan.id.desc(),
+    )
+
+    records = (
+        Penjualan.query.options(
+            joinedload(Penjualan.pelanggan),
+            joinedload(Penjualan.sales),
+        )
+        .filter(*base_filters)
+        .order_by(*order_clause)
+        .offset(offset)
+        .limit(per_page)
+        .all()
+    )
+
+    total_outstanding = (
+        db.session.query(func.coalesce(func.sum(outstanding_expr), 0))
+        .filter(*base_filters)
+        .scalar()
+        or 0.0
+    )
+
+    receivable_rows = []
+    for sale in records:
+        total = float(sale.total_harga or 0.0)
+        amount_paid = float(sale.amount_paid or 0.0)
+        outstanding = max(total - amount_paid, 0.0)
+        receivable_rows.append(
+            {
+                "id": sale.id,
+                "invoice": sale.no_faktur,
+                "sale_date": sale.tanggal_penjualan,
+                "due_date": sale.due_date,
+                "customer_name": sale.pelanggan.nama if sale.pelanggan else "Umum",
+                "customer_code": sale.pelanggan.pelanggan_id if sale.pelanggan else "-",
+                "sales_name": sale.sales.username if sale.sales else "-",
+                "total": total,
+                "amount_paid": amount_paid,
+                "outstanding": outstanding,
+            }
+        )
+
+    filter_values = {
+        "start_date": start_date.strftime("%Y-%m-%d"),
+        "end_date": end_date.strftime("%Y-%m-%d"),
+        "search": search_query,
+        "pelanggan": pelanggan_id or "",
+        "sales": sales_id or "",
+    }
+    filter_active = any([search_query, pelanggan_id, sales_id]) and not open_id
+
+    sales_options = (
+        User.query.filter(User.role.in_(SALES_ROLES)).order_by(User.username.asc()).all()
+    )
+    customer_options = Pelanggan.query.order_by(Pelanggan.nama.asc()).all()
+
+    query_args = request.args.to_dict(flat=True)
+    query_args.pop("page", None)
+    base_args = query_args.copy()
+    prev_url = (
+        url_for("main.pembayaran_piutang", page=page - 1, **base_args)
+        if page > 1
+        else None
+    )
+    next_url = (
+        url_for("main.pembayaran_piutang", page=page + 1, **base_args)
+        if page < total_pages
+        else None
+    )
+    page_window_start = max(1, page - 2)
+    page_window_end = min(total_pages, page + 2)
+    page_links = [
+        {
+            "number": number,
+            "url": url_for("main.pembayaran_piutang", page=number, **base_args),
+            "current": number == page,
+        }
+        for number in range(page_window_start, page_window_end + 1)
+    ]
+    pagination = {
+        "page": page,
+        "per_page": per_page,
+        "total_pages": total_pages,
+        "total_records": total_records,
+        "has_prev": page > 1,
+        "has_next": page < total_pages,
+        "prev_url": prev_url,
+        "next_url": next_url,
+        "page_links": page_links,
+    }
+
+    return render_template(
+        "pembayaran_piutang.html",
+        receivable_rows=receivable_rows,
+        filter_values=filter_values,
+        per_page=per_page,
+        pagination=pagination,
+        filter_active=filter_active,
+        total_outstanding=total_outstanding,
+        sales_options=sales_options,
+        customer_options=customer_options,
+        format_date=_format_date_id,
+        open_id=open_id,
+    )
+
+
+@bp.route("/utilitas/pembayaran-piutang/bayar", methods=["POST"])
+@login_required
+@roles_required(*SALES_ROLES)
+def pembayaran_piutang_bayar():
+    sale_id = _parse_int_param(request.form.get("sale_id"))
+    amount = _parse_float_param(request.form.get("payment_amount"))
+    payment_method = (request.form.get("payment_method") or "Tunai").strip()
+    reference = (request.form.get("reference") or "").strip() or None
+    note = (request.form.get("note") or "").strip() or None
+    update_due = request.form.get("update_due") == "1"
+    new_due_date = _parse_date_param(request.form.get("new_due_date"))
+    next_target = request.form.get("next") or url_for("main.pembayaran_piutang")
+
+    if not sale_id:
+        flash("Transaksi tidak ditemukan.", "warning")
+        return redirect(url_for("main.pembayaran_piutang"))
+
+    if not table_ready("receivable_payment"):
+        flash(
+            "Tabel riwayat pembayaran belum tersedia. Jalankan migrasi terlebih dahulu.",
+            "warning",
+        )
+        return redirect(
+            next_target
+            if _is_safe_redirect_target(next_target)
+            else url_for("main.pembayaran_piutang")
+        )
+
+    sale = Penjualan.query.get_or_404(sale_id)
+    if sale.payment_method != "Tempo":
+        flash("Transaksi ini bukan pembayaran tempo.", "warning")
+        return redirect(url_for("main.pembayaran_piutang"))
+
+    if amount is None or amount <= 0:
+        flash("Jumlah bayar wajib diisi dan lebih dari 0.", "warning")
+        return redirect(
+            next_target
+            if _is_safe_redirect_target(next_target)
+            else url_for("main.pembayaran_piutang")
+        )
+
+    allowed_methods = {"Tunai", "Transfer", "Kartu", "QRIS"}
+    if payment_method not in allowed_methods:
+        payment_method = "Tunai"
+
+    if update_due and not new_due_date:
+        flash("Tanggal jatuh tempo baru wajib diisi.", "warning")
+        return redirect(
+            next_target
+            if _is_safe_redirect_target(next_target)
+            else url_for("main.pembayaran_piutang")
+        )
+
+    total = float(sale.total_harga or 0.0)
+    current_paid = float(sale.amount_paid or 0.0)
+    outstanding = max(total - current_paid, 0.0)
+    if outstanding <= 0:
+        flash("Piutang sudah lunas.", "info")
+        return redirect(
+            next_target
+            if _is_safe_redirect_target(next_target)
+            else url_for("main.pembayaran_piutang")
+        )
+
+    payment = ReceivablePayment(
+        penjualan_id=sale.id,
+        amount=amount,
+        payment_method=payment_method,
+        reference=reference,
+        note=note,
+        created_by=session.get("user_id"),
+    )
+    db.session.add(payment)
+
+    sale.amount_paid = current_paid + amount
+    sale.change_due = max(0.0, sale.amount_paid - total)
+    if update_due and new_due_date:
+        sale.due_date = new_due_date
+
+    db.session.commit()
+    flash("Pembayaran piutang berhasil disimpan.", "success")
+    return redirect(
+        next_target if _is_safe_redirect_target(next_target) else url_for("main.pembayaran_piutang")
+    )
@@ -0,0 +1,1768 @@
+"""Route supplier, pembelian, purchase order dan pembayaran utang."""
+
+import csv
+import logging
+from datetime import datetime
+from io import BytesIO, StringIO
+
+from flask import (
+    Response,
+    flash,
+    jsonify,
+    make_response,
+    redirect,
+    render_template,
+    request,
+    session,
+    url_for,
+)
+from sqlalchemy import func, or_
+from sqlalchemy.orm import joinedload
+
+from app import normalize_phone
+from app.models import (
+    BarangPembelian,
+    PayablePayment,
+    Pembelian,
+    PriceLevel,
+    ProductPriceLevel,
+    Produk,
+    PurchaseOrder,
+    PurchaseOrderItem,
+    Supplier,
+    db,
+)
+from app.routes import bp
+from app.routes.common import (
+    ADMIN_ONLY,
+    INVENTORY_ROLES,
+    _build_draft_invoice,
+    _format_date_id,
+    _get_company_profile,
+    _get_default_purchase_tax,
+    _get_locked_period_for_date,
+    _get_purchase_invoice_prefix,
+    _is_safe_redirect_target,
+    _parse_date_param,
+    _parse_float_param,
+    _parse_int_param,
+    _payable_payment_sum_subquery,
+    _purchase_total_subquery,
+    _start_import_job,
+    login_required,
+    roles_required,
+)
+from app.schema_registry import columns_ready
+from app.services.document_number_service import (
+    DOCUMENT_PURCHASE_INVOICE,
+    DOCUMENT_PURCHASE_ORDER,
+    allocate_document_number,
+    claim_document_number,
+    preview_document_number,
+)
+from app.time_utils import local_now, local_today
+
+
+PURCHASE_PAYMENT_COLUMNS = ("due_date", "payment_bank", "payment_reference")
+
+
+def _purchase_payment_columns_ready():
+    return columns_ready("pembelian", *PURCHASE_PAYMENT_COLUMNS)
+
+
+def _build_supplier_page_context(
+    edit_supplier=None, search_query="", page=1, per_page=10
+):
+    base_query = Supplier.query.order_by(Supplier.name.asc())
+    if search_query:
+        like = f"%{search_query}%"
+        base_query = base_query.filter(
+            or_(
+                Supplier.name.ilike(like),
+                Supplier.email.ilike(like),
+                Supplier.contact_person.ilike(like),
+                Supplier.phone.ilike(like),
+            )
+        )
+
+    pagination = base_query.paginate(page=page, per_page=per_page, error_out=False)
+    suppliers = pagination.items
+
+    total_suppliers = Supplier.query.count()
+    contact_complete = Supplier.query.filter(
+        Supplier.phone.isnot(None), Supplier.phone != ""
+    ).count()
+    email_complete = Supplier.query.filter(
+        Supplier.email.isnot(None), Supplier.email != ""
+    ).count()
+    website_complete = Supplier.query.filter(
+        Supplier.website.isnot(None), Supplier.website != ""
+    ).count()
+    contact_missing = total_suppliers - contact_complete
+    email_missing = total_suppliers - email_complete
+
+    purchase_count = Pembelian.query.count()
+
+    supplier_stat_cards = [
+        {
+            "label": "Total Supplier",
+            "value": total_suppliers,
+            "icon": "fa-truck",
+            "accent": "text-primary",
+            "type": "count",
+            "description": "Partner pemasok yang siap dihubungi.",
+        },
+        {
+            "label": "Kontak Lengkap",
+            "value": contact_complete,
+            "icon": "fa-phone-alt",
+            "accent": "text-success",
+            "type": "count",
+            "description": "Supplier dengan nomor telepon tercatat.",
+        },
+        {
+            "label": "Punya Website",
+            "value": website_complete,
+            "icon": "fa-globe",
+            "accent": "text-info",
+            "type": "count",
+            "description": "Supplier yang menyediakan alamat website.",
+        },
+        {
+            "label": "Faktur Pembelian",
+            "value": purchase_count,
+            "icon": "fa-file-invoice",
+            "accent": "text-warning",
+            "type": "count",
+            "description": "Jumlah transaksi pembelian tercatat.",
+        },
+    ]
+
+    supplier_insights = [
+        {
+            "title": "Perlu nomor kontak",
+            "value": contact_missing,
+            "status": "warning" if contact_missing else "success",
+            "type": "count",
+            "description": "Lengkapi nomor telepon untuk respons cepat.",
+        },
+        {
+            "title": "Perlu email",
+            "value": email_missing,
+            "status": "info" if email_missing else "success",
+            "type": "count",
+            "description": "Email memudahkan pengiriman PO dan faktur.",
+        },
+        {
+            "title": "Memiliki website",
+            "value": website_complete,
+            "status": "success" if website_complete else "secondary",
+            "type": "count",
+            "description": "Website membantu akses katalog pemasok.",
+        },
+    ]
+
+    top_supplier = (
+        db.session.query(Supplier.name, func.count(Pembelian.id).label("jumlah"))
+        .join(Pembelian, Pembelian.supplier_id == Supplier.id)
+        .group_by(Supplier.id)
+        .order_by(func.count(Pembelian.id).desc())
+        .first()
+    )
+    if top_supplier:
+        supplier_insights.append(
+            {
+                "title": "Partner teraktif",
+                "value": top_supplier.jumlah,
+                "status": "success",
+                "type": "count",
+                "description": f"{top_supplier.name} paling sering memasok.",
+            }
+        )
+
+    supplier_payload = [
+        {
+            "id": supplier.id,
+            "name": supplier.name,
+            "address": supplier.address,
+            "phone": supplier.phone,
+            "bank_account": supplier.bank_account,
+            "account_name": supplier.account_name,
+            "contact_person": supplier.contact_person,
+            "email": supplier.email,
+            "website": supplier.website,
+        }
+        for supplier in suppliers
+    ]
+
+    recent_purchases = []
+    recent_query = (
+        Pembelian.query.order_by(Pembelian.tanggal_faktur.desc(), Pembelian.id.desc())
+        .limit(5)
+        .all()
+    )
+    for purchase in recent_query:
+        total_units = sum(item.jumlah or 0 for item in purchase.barang)
+        total_cost = sum(item.hpp or 0.0 for item in purchase.barang)
+        recent_purchases.append(
+            {
+                "no_faktur": purchase.no_faktur,
+                "tanggal": (
+                    purchase.tanggal_faktur.strftime("%d %b %Y")
+                    if purchase.tanggal_faktur
+                    else "-"
+                ),
+                "supplier": (
+                    purchase.supplier.name if purchase.supplier else "Tanpa supplier"
+                ),
+                "items": total_units,
+                "total": total_cost,
+            }
+        )
+
+    return {
+        "suppliers": suppliers,
+        "pagination": pagination,
+        "filtered_count": pagination.total,
+        "page": page,
+        "per_page": per_page,
+        "supplier_payload": supplier_payload,
+        "supplier_stat_cards": supplier_stat_cards,
+        "supplier_insights": supplier_insights,
+        "recent_purchases": recent_purchases,
+        "search_query": search_query,
+        "edit_supplier": edit_supplier,
+    }
+
+
+@bp.route("/supplier", methods=["GET", "POST"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def supplier():
+    search_query = request.args.get("search", "").strip()
+    page = request.args.get("page", 1, type=int)
+    per_page = request.args.get("per_page", 10, type=int)
+    per_page = max(5, min(per_page, 50))
+
+    if request.method == "POST":
+        # Ambil data dari formulir
+        name = request.form["name"].strip()
+        address = request.form["address"].strip()
+        phone = normalize_phone(request.form["phone"].strip())
+        bank_name = request.form.get("bank_name", "").strip()
+        bank_account = request.form["bank_account"].strip()
+        account_name = request.form["account_name"].strip()
+        contact_person = request.form["contact_person"].strip()
+        email_input = request.form.get("email", "").strip()
+        email = email_input or None
+        website = request.form["website"].strip() or None
+
+        required_fields = {
+            "Nama Supplier": name,
+            "Alamat": address,
+            "Nomor Telepon": phone,
+            "Nama Bank": bank_name,
+            "No. Rekening Bank": bank_account,
+            "Nama Rekening": account_name,
+            "Kontak Person": contact_person,
+        }
+        missing_fields = [
+            label for label, value in required_fields.items() if not value
+        ]
+        if missing_fields:
+            flash(f"Kolom berikut wajib diisi: {', '.join(missing_fields)}.", "warning")
+            return redirect(url_for("main.supplier", search=search_query, page=page))
+
+        if email:
+            existing_supplier = Supplier.query.filter_by(email=email).first()
+            if existing_supplier:
+                flash("Email supplier sudah terdaftar.", "warning")
+                return redirect(url_for("main.supplier"))
+
+        # Simpan ke database
+        new_supplier = Supplier(
+            name=name,
+            address=address,
+            phone=phone,
+            bank_name=bank_name or None,
+            bank_account=bank_account,
+            account_name=account_name,
+            contact_person=contact_person,
+            email=email,
+            website=website,
+        )
+
+        db.session.add(new_supplier)
+        db.session.commit()
+        flash("Supplier added successfully!", "success")
+        return redirect(url_for("main.supplier"))
+
+    return render_template(
+        "supplier.html",
+        **_build_supplier_page_context(
+            search_query=search_query, page=page, per_page=per_page
+        ),
+    )
+
+
+@bp.route("/supplier/edit/<int:supplier_id>", methods=["GET", "POST"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def edit_supplier(supplier_id):
+    search_query = request.args.get("search", "").strip()
+    page = request.args.get("page", 1, type=int)
+    per_page = request.args.get("per_page", 10, type=int)
+    per_page = max(5, min(per_page, 50))
+    supplier = Supplier.query.get_or_404(supplier_id)
+
+    if request.method == "POST":
+        supplier.name = request.form["name"].strip()
+        supplier.address = request.form["address"].strip()
+        supplier.phone = normalize_phone(request.form["phone"].strip())
+        supplier.bank_name = request.form.get("bank_name", "").strip() or None
+        supplier.bank_account = request.form["bank_account"].strip()
+        supplier.account_name = request.form["account_name"].strip()
+        supplier.contact_person = request.form["contact_person"].strip()
+        email_input = request.form.get("email", "").strip()
+        email = email_input or None
+        supplier.website = request.form["website"].strip() or None
+
+        required_fields = {
+            "Nama Supplier": supplier.name,
+            "Alamat": supplier.address,
+            "Nomor Telepon": supplier.phone,
+            "Nama Bank": supplier.bank_name,
+            "No. Rekening Bank": supplier.bank_account,
+            "Nama Rekening": supplier.account_name,
+            "Kontak Person": supplier.contact_person,
+        }
+        missing_fields = [
+            label for label, value in required_fields.items() if not value
+        ]
+        if missing_fields:
+            flash(f"Kolom berikut wajib diisi: {', '.join(missing_fields)}.", "warning")
+            return redirect(
+                url_for(
+                    "main.edit_supplier",
+                    supplier_id=supplier_id,
+                    search=search_query,
+                    page=page,
+                )
+            )
+
+        if email:
+            existing = Supplier.query.filter(
+                Supplier.email == email, Supplier.id != supplier.id
+            ).first()
+            if existing:
+                flash("Email supplier sudah digunakan oleh supplier lain.", "warning")
+                return redirect(url_for("main.edit_supplier", supplier_id=supplier_id))
+
+        supplier.email = email
+
+        db.session.commit()
+        flash("Supplier updated successfully!", "success")
+        return redirect(url_for("main.supplier", search=search_query, page=page))
+
+    return render_template(
+        "supplier.html",
+        **_build_supplier_page_context(
+            edit_supplier=supplier,
+            search_query=search_query,
+            page=page,
+            per_page=per_page,
+        ),
+    )
+
+
+@bp.route("/supplier/delete/<int:supplier_id>", methods=["POST"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def delete_supplier(supplier_id):
+    supplier = Supplier.query.get_or_404(supplier_id)
+    linked_products = Produk.query.filter_by(supplier_id=supplier.id).count()
+    linked_purchases = Pembelian.query.filter_by(supplier_id=supplier.id).count()
+    if linked_products or linked_purchases:
+        flash(
+            "Supplier tidak dapat dihapus karena masih dipakai pada produk atau faktur pembelian.",
+            "warning",
+        )
+        return redirect(url_for("main.supplier"))
+    db.session.delete(supplier)
+    db.session.commit()
+    flash("Supplier deleted successfully!", "success")
+    return redirect("/supplier")
+
+
+@bp.route("/supplier/<int:supplier_id>", methods=["GET"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def supplier_detail(supplier_id):
+    supplier = Supplier.query.get_or_404(supplier_id)
+    return render_template("supplier_detail.html", supplier=supplier)
+
+
+@bp.route("/supplier/export", methods=["GET"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def export_suppliers():
+    import pandas as pd
+    suppliers = Supplier.query.all()
+
+    def _normalize_phone(value):
+        return normalize_phone(value)
+
+    # Data untuk Excel
+    data = [
+        {
+            "ID Supplier": supplier.id,
+            "Nama Supplier": supplier.name,
+            "Alamat": supplier.address,
+            "No Telp": _normalize_phone(supplier.phone),
+            "Nama Bank": supplier.bank_name or "",
+            "No Rekening Bank": supplier.bank_account,
+            "Nama Rekening": supplier.account_name,
+            "Kontak Person": supplier.contact_person,
+            "Email": supplier.email,
+            "Website": supplier.website,
+        }
+        for supplier in suppliers
+    ]
+
+    # Buat DataFrame pandas
+    df = pd.DataFrame(data)
+
+    # Simpan ke file Excel di memori
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        df.to_excel(writer, index=False)
+    output.seek(0)
+
+    # Buat respons Flask
+    response = make_response(output.read())
+    response.headers["Content-Disposition"] = "attachment; filename=suppliers.xlsx"
+    response.headers["Content-Type"] = (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+    return response
+
+
+@bp.route("/supplier/import", methods=["POST"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def import_suppliers():
+    file = request.files.get("file")
+    if file is None:
+        flash("No file uploaded!", "danger")
+        return redirect("/supplier")
+    if file.filename == "":
+        flash("No selected file!", "danger")
+        return redirect("/supplier")
+    return _start_import_job("supplier", file)
+
+
+@bp.route("/pembelian", methods=["GET", "POST"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def pembelian():
+    if not _purchase_payment_columns_ready():
+        flash(
+            "Kolom pembayaran pembelian belum tersedia. Jalankan migrasi untuk pembelian.",
+            "warning",
+        )
+    if request.method == "POST":
+        try:
+            if not request.is_json:
+                return (
+                    jsonify(
+                        {
+                            "success": False,
+                            "message": "Content-Type harus 'application/json'",
+                        }
+                    ),
+                    415,
+                )
+
+            payload = request.get_json(silent=True) or {}
+
+            tanggal_faktur = payload.get("tanggal_faktur")
+            no_faktur = (payload.get("no_faktur") or "").strip()
+            supplier_id = payload.get("supplier")
+            items = payload.get("items") or []
+            jenis_pembayaran = (payload.get("jenis_pembayaran") or "Tunai").strip()
+            due_date_raw = (payload.get("due_date") or "").strip()
+            payment_bank = (payload.get("payment_bank") or "").strip()
+            payment_reference = (payload.get("payment_reference") or "").strip()
+            allowed_payments = {"Tunai", "Tempo", "Transfer"}
+
+            if not tanggal_faktur or not no_faktur or not supplier_id:
+                return (
+                    jsonify({"success": False, "message": "Data utama tidak lengkap."}),
+                    400,
+                )
+
+            if jenis_pembayaran not in allowed_payments:
+                return (
+                    jsonify(
+                        {"success": False, "message": "Jenis pembayaran tidak valid."}
+                    ),
+                    400,
+                )
+
+            if Pembelian.query.filter_by(no_faktur=no_faktur).first():
+                return (
+                    jsonify(
+                        {
+                            "success": False,
+                            "message": f"Nomor faktur {no_faktur} sudah ada.",
+                        }
+                    ),
+                    400,
+                )
+
+            parsed_date = None
+            try:
+                parsed_date = datetime.strptime(tanggal_faktur, "%Y-%m-%d").date()
+            except ValueError:
+                return (
+                    jsonify(
+                        {
+                            "success": False,
+                            "message": "Format tanggal faktur tidak valid.",
+                        }
+                    ),
+                    400,
+                )
+
+            due_date = None
+            if due_date_raw:
+                try:
+                    due_date = datetime.strptime(due_date_raw, "%Y-%m-%d").date()
+                except ValueError:
+                    return (
+                        jsonify(
+                            {
+                                "success": False,
+                                "message": "Format tanggal jatuh tempo tidak valid.",
+                            }
+                        ),
+                        400,
+                    )
+
+            if jenis_pembayaran == "Tempo" and not due_date:
+                return (
+                    jsonify(
+                        {
+                            "success": False,
+                            "message": "Tanggal jatuh tempo wajib diisi untuk pembayaran tempo.",
+                        }
+                    ),
+                    400,
+                )
+            if jenis_pembayaran == "Transfer" and not payment_reference:
+                return (
+                    jsonify(
+                        {
+                            "success": False,
+                            "message": "Nomor referensi wajib diisi untuk pembayaran transfer.",
+                        }
+                    ),
+                    400,
+                )
+            if jenis_pembayaran != "Transfer":
+                payment_bank = ""
+                payment_reference = ""
+            if jenis_pembayaran != "Tempo":
+                due_date = None
+
+            try:
+                supplier_id = int(supplier_id)
+            except (TypeError, ValueError):
+                return (
+                    jsonify({"success": False, "message": "Supplier tidak valid."}),
+                    400,
+                )
+
+            supplier = db.session.get(Supplier, supplier_id)
+            if not supplier:
+                return (
+                    jsonify({"success": False, "message": "Supplier tidak ditemukan."}),
+                    404,
+                )
+
+            locked_period_for_purchase = _get_locked_period_for_date(parsed_date)
+            if locked_period_for_purchase:
+                return (
+                    jsonify(
+                        {
+                            "success": False,
+                            "message": f"Periode {locked_period_for_purchase.label} sudah ditutup; tidak bisa menyimpan pembelian.",
+                        }
+                    ),
+                    400,
+                )
+
+            if not items:
+                return (
+                    jsonify(
+                        {
+                            "success": False,
+                            "message": "Tidak ada data barang yang dikirim.",
+                        }
+                    ),
+                    400,
+                )
+
+            valid_items = []
+            errors = []
+
+            for index, item in enumerate(items, start=1):
+                kode_barang = (item.get("kode_barang") or "").strip()
+                nama_barang = (item.get("nama_barang") or "").strip()
+                kategori = (item.get("kategori") or "").strip()
+
+                try:
+                    jumlah = int(item.get("jumlah") or 0)
+                except (TypeError, ValueError):
+                    jumlah = 0
+
+                try:
+                    harga_beli = float(item.get("harga_beli") or 0.0)
+                except (TypeError, ValueError):
+                    harga_beli = 0.0
+
+                try:
+                    diskon = float(item.get("diskon") or 0.0)
+                except (TypeError, ValueError):
+                    diskon = 0.0
+
+                try:
+                    pajak = float(item.get("pajak") or 0.0)
+                except (TypeError, ValueError):
+                    pajak = 0.0
+
+                try:
+                    harga_jual = float(item.get("harga_jual") or 0.0)
+                except (TypeError, ValueError):
+                    harga_jual = 0.0
+
+                exp_date_raw = item.get("exp_date")
+                exp_date = None
+                if exp_date_raw:
+                    try:
+                        exp_date = datetime.strptime(exp_date_raw, "%Y-%m-%d")
+                    except ValueError:
+                        errors.append(f"Tanggal exp tidak valid pada baris {index}.")
+
+                if not kode_barang or not nama_barang or not kategori:
+                    errors.append(
+                        f"Kode, nama, dan kategori wajib diisi (baris {index})."
+                    )
+                    continue
+
+                if jumlah <= 0:
+                    errors.append(f"Jumlah harus lebih dari 0 (baris {index}).")
+                    continue
+
+                diskon = max(0.0, min(diskon, 100.0))
+                pajak = max(0.0, pajak)
+
+                discount_amount = harga_beli * (diskon / 100.0)
+                net_cost = max(harga_beli - discount_amount, 0.0)
+                tax_amount = net_cost * (pajak / 100.0)
+                harga_final = net_cost + tax_amount
+                total_hpp = net_cost * jumlah  # HPP tanpa memasukkan pajak
+
+                produk = Produk.query.filter_by(kode_produk=kode_barang).first()
+                if not produk:
+                    errors.append(
+                        f"Produk dengan kode {kode_barang} tidak ditemukan (baris {index})."
+                    )
+                    continue
+
+                valid_items.append(
+                    {
+                        "kode_barang": kode_barang,
+                        "nama_barang": nama_barang,
+                        "kategori": kategori,
+                        "jumlah": jumlah,
+                        "harga_beli": harga_beli,
+                        "diskon": diskon,
+                        "pajak": pajak,
+                        "harga_jual": harga_jual,
+                        "exp_date": exp_date,
+                        "harga_final": harga_final,  # tetap simpan harga akhir termasuk pajak bila perlu dilaporkan
+                        "total_hpp": total_hpp,
+                        "produk": produk,
+                        "cost_basis": net_cost,
+                    }
+                )
+
+            if errors:
+                return jsonify({"success": False, "message": " ".join(errors)}), 400
+
+            if not valid_items:
+                return (
+                    jsonify(
+                        {
+                            "success": False,
+                            "message": "Tidak ada baris barang yang valid.",
+                        }
+                    ),
+                    400,
+                )
+
+            pembelian = Pembelian(
+                tanggal_faktur=parsed_date,
+                no_faktur=no_faktur,
+                supplier_id=supplier_id,
+                jenis_pembayaran=jenis_pembayaran,
+                due_date=due_date,
+                payment_bank=payment_bank or None,
+                payment_reference=payment_reference or None,
+            )
+            db.session.add(pembelian)
+            db.session.flush()
+            # jika nomor pratinjau dipakai, jangan tawarkan lagi ke form berikutnya
+            claim_document_number(
+                DOCUMENT_PURCHASE_INVOICE,
+                no_faktur,
+                prefix=_get_purchase_invoice_prefix(),
+            )
+
+            total_pembelian = 0.0
+            total_items = 0
+
+            for item in valid_items:
+                produk = item["produk"]
+                if produk:
+                    produk.update_stok_dan_hpp(item["cost_basis"], item["jumlah"])
+
+                barang_pembelian = BarangPembelian(
+                    pembelian_id=pembelian.id,
+                    kode_barang=item["kode_barang"],
+                    nama_barang=item["nama_barang"],
+                    kategori=item["kategori"],
+                    jumlah=item["jumlah"],
+                    harga_beli=item["harga_beli"],
+                    diskon=item["diskon"],
+                    pajak=item["pajak"],
+                    harga_jual=item["harga_jual"],
+                    exp_date=item["exp_date"],
+                    hpp=item["total_hpp"],
+                )
+                total_pembelian += item["total_hpp"]
+                total_items += item["jumlah"]
+                db.session.add(barang_pembelian)
+
+            db.session.commit()
+
+            return (
+                jsonify(
+                    {
+                        "success": True,
+                        "message": "Pembelian berhasil disimpan!",
+                        "total_biaya": total_pembelian,
+                        "total_barang": total_items,
+                    }
+                ),
+                200,
+            )
+
+        except Exception as exc:
+            db.session.rollback()
+            logging.exception("Gagal menyimpan pembelian")
+            return jsonify({"success": False, "message": f"Error: {str(exc)}"}), 500
+
+    po_id = _parse_int_param(request.args.get("po_id"))
+
+    suppliers = Supplier.query.order_by(Supplier.name.asc()).all()
+    supplier_payload = [
+        {
+            "id": supplier.id,
+            "name": supplier.name,
+            "contact_person": supplier.contact_person,
+            "phone": supplier.phone,
+            "email": supplier.email,
+            "address": supplier.address,
+        }
+        for supplier in suppliers
+    ]
+
+    supplier_lookup = {supplier["id"]: supplier for supplier in supplier_payload}
+
+    produk_records = Produk.query.order_by(Produk.nama_produk.asc()).all()
+    level_price_entries_penjualan = ProductPriceLevel.query.all()
+    level_price_map = {}
+    for entry in level_price_entries_penjualan:
+        level_price_map.setdefault(entry.product_id, {})[entry.level_id] = float(
+            entry.price or 0.0
+        )
+    price_levels = PriceLevel.query.order_by(PriceLevel.name.asc()).all()
+    product_payload = [
+        {
+            "id": produk.id,
+            "kode": produk.kode_produk,
+            "nama": produk.nama_produk,
+            "kategori": produk.kategori.name if produk.kategori else None,
+            "harga_beli": float(produk.harga_beli or 0.0),
+            "harga_jual": float(produk.harga or 0.0),
+            "sku": produk.sku,
+            "supplier": produk.supplier.name if produk.supplier else None,
+            "satuan": produk.satuan.name if produk.satuan else None,
+            "stok": produk.stok_lama,
+            "stok_minimal": produk.stok_minimal,
+        }
+        for produk in produk_records
+    ]
+
+    default_purchase_tax_value = _get_default_purchase_tax()
+    po_prefill = None
+    if po_id:
+        po = (
+            PurchaseOrder.query.options(
+                joinedload(PurchaseOrder.items),
+                joinedload(PurchaseOrder.supplier),
+            )
+            .filter(PurchaseOrder.id == po_id)
+            .first()
+        )
+        if not po:
+            flash("PO tidak ditemukan.", "warning")
+        elif po.status != "received":
+            flash("PO belum berstatus received, belum bisa dibuatkan pembelian.", "warning")
+        else:
+            product_lookup = {product["id"]: product for product in product_payload}
+            items = []
+            for item in po.items:
+                product = product_lookup.get(item.product_id)
+                if not product:
+                    continue
+                items.append(
+                    {
+                        "kode_barang": product.get("kode") or "",
+                        "nama_barang": product.get("nama") or "",
+                        "kategori": product.get("kategori") or "Tanpa kategori",
+                        "satuan": product.get("satuan") or "",
+                        "jumlah": float(item.qty or 0),
+                        "harga_beli": float(item.unit_price or 0.0),
+                        "diskon": 0,
+                        "pajak": float(default_purchase_tax_value or 0),
+                        "harga_jual": float(product.get("harga_jual") or 0.0),
+                        "exp_date": None,
+                    }
+                )
+            if items:
+                po_prefill = {
+                    "po_id": po.id,
+                    "po_number": po.po_number,
+                    "supplier_id": po.supplier_id,
+                    "items": items,
+                }
+            else:
+                flash("Item PO tidak ditemukan untuk prefill pembelian.", "warning")
+
+    total_invoices = Pembelian.query.count()
+    total_spent = (
+        db.session.query(func.coalesce(func.sum(BarangPembelian.hpp), 0)).scalar()
+        or 0.0
+    )
+    total_items = (
+        db.session.query(func.coalesce(func.sum(BarangPembelian.jumlah), 0)).scalar()
+        or 0
+    )
+    today = local_today()
+    today_invoices = Pembelian.query.filter(Pembelian.tanggal_faktur == today).count()
+    average_invoice = total_spent / total_invoices if total_invoices else 0.0
+
+    purchase_stat_cards = [
+        {
+            "label": "Total Faktur",
+            "value": total_invoices,
+            "icon": "fa-file-invoice",
+            "accent": "text-primary",
+            "type": "count",
+            "description": "Jumlah transaksi pembelian tersimpan.",
+        },
+        {
+            "label": "Total Pengeluaran",
+            "value": total_spent,
+            "icon": "fa-coins",
+            "accent": "text-success",
+            "type": "currency",
+            "description": "Akumulasi biaya restock.",
+        },
+        {
+            "label": "Faktur Hari Ini",
+            "value": today_invoices,
+            "icon": "fa-calendar-day",
+            "accent": "text-info",
+            "type": "count",
+            "description": "Restock yang tercatat hari ini.",
+        },
+        {
+            "label": "Rata-rata Faktur",
+            "value": average_invoice,
+            "icon": "fa-chart-bar",
+            "accent": "text-warning",
+            "type": "currency",
+            "description": "Nilai rata-rata per transaksi pembelian.",
+        },
+    ]
+
+    purchase_insights = [
+        {
+            "title": "Total barang masuk",
+            "value": total_items,
+            "status": "info" if total_items else "secondary",
+            "type": "count",
+            "description": "Jumlah unit yang direstock dari seluruh faktur.",
+        },
+        {
+            "title": "Supplier aktif",
+            "value": len(suppliers),
+            "status": "success" if suppliers else "secondary",
+            "type": "count",
+            "description": "Partner pemasok yang siap memenuhi restock.",
+        },
+        {
+            "title": "Pengeluaran rata-rata",
+            "value": average_invoice,
+            "status": "warning" if average_invoice else "secondary",
+            "type": "currency",
+            "description": "Gunakan sebagai acuan budgeting pembelian.",
+        },
+    ]
+
+    upcoming_expiry = (
+        BarangPembelian.query.filter(BarangPembelian.exp_date.isnot(None))
+        .order_by(BarangPembelian.exp_date.asc())
+        .limit(5)
+        .all()
+    )
+    if upcoming_expiry:
+        earliest = upcoming_expiry[0]
+        purchase_insights.append(
+            {
+                "title": "Produk mendekati kadaluarsa",
+                "value": (
+                    earliest.exp_date.strftime("%d %b %Y") if earliest.exp_date else "-"
+                ),
+                "status": "warning",
+                "type": "text",
+                "description": f"{earliest.nama_barang} perlu diprioritaskan.",
+            }
+        )
+
+    recent_purchases = []
+    recent_query = (
+        Pembelian.query.order_by(Pembelian.tanggal_faktur.desc(), Pembelian.id.desc())
+        .limit(5)
+        .all()
+    )
+    for purchase in recent_query:
+        total_cost = sum(barang.hpp for barang in purchase.barang)
+        total_units = sum(barang.jumlah for barang in purchase.barang)
+        recent_purchases.append(
+            {
+                "no_faktur": purchase.no_faktur,
+                "tanggal": (
+                    purchase.tanggal_faktur.strftime("%d %b %Y")
+                    if purchase.tanggal_faktur
+                    else "-"
+                ),
+                "supplier": (
+                    purchase.supplier.name if purchase.supplier else "Tanpa supplier"
+                ),
+                "total": total_cost,
+                "items": total_units,
+            }
+        )
+
+    return render_template(
+        "pembelian.html",
+        supplier_payload=supplier_payload,
+        supplier_lookup=supplier_lookup,
+        product_payload=product_payload,
+        purchase_stat_cards=purchase_stat_cards,
+        purchase_insights=purchase_insights,
+        recent_purchases=recent_purchases,
+        default_purchase_tax=default_purchase_tax_value,
+        po_prefill=po_prefill,
+        draft_purchase_invoice=_build_draft_invoice(
+            _get_purchase_invoice_prefix(), Pembelian
+        ),
+    )
+
+
+@bp.route("/check_no_faktur", methods=["POST"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def check_no_faktur():
+    try:
+        # Pastikan request dalam format JSON
+        if not request.is_json:
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "message": "Content-Type harus 'application/json'",
+                    }
+                ),
+                415,
+            )
+
+        # Ambil data dari request
+        data = request.json
+        no_faktur = data.get("no_faktur")
+
+        if not no_faktur:
+            return (
+                jsonify({"success": False, "message": "Nomor faktur tidak diberikan."}),
+                400,
+            )
+
+        # Cek apakah nomor faktur sudah ada
+        existing_pembelian = Pembelian.query.filter_by(no_faktur=no_faktur).first()
+        if existing_pembelian:
+            return (
+                jsonify(
+                    {
+                        "success": True,
+                        "available": False,
+                        "exists": True,
+                        "message": f"Nomor faktur {no_faktur} sudah ada.",
+                    }
+                ),
+                200,
+            )
+
+        # Jika tidak ada
+        return (
+            jsonify(
+                {
+                    "success": True,
+                    "available": True,
+                    "exists": False,
+                    "message": "Nomor faktur tersedia.",
+                }
+            ),
+            200,
+        )
+
+    except Exception as e:
+        print("Error:", str(e))
+        return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
+
+
+def _generate_po_number(prefix=None):
+    return allocate_document_number(DOCUMENT_PURCHASE_ORDER, prefix=prefix)
+
+
+def _calculate_purchase_total(items):
+    total = 0.0
+    for item in items:
+        qty = float(item.jumlah or 0)
+        price = float(item.harga_beli or 0.0)
+        discount_pct = float(item.diskon or 0.0)
+        tax_pct = float(item.pajak or 0.0)
+        base_total = price * qty
+        discount_value = base_total * (discount_pct / 100.0)
+        taxable_total = base_total - discount_value
+        tax_value = taxable_total * (tax_pct / 100.0)
+        total += taxable_total + tax_value
+    return round(total, 2)
+
+
+@bp.route("/pembelian/po")
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def pembelian_po_list():
+
+    status = (request.args.get("status") or "all").strip().lower()
+    supplier_id = _parse_int_param(request.args.get("supplier"))
+    search_query = (request.args.get("search") or "").strip()
+
+    filters = []
+    if status and status != "all":
+        filters.append(PurchaseOrder.status == status)
+    if supplier_id:
+        filters.append(PurchaseOrder.supplier_id == supplier_id)
+    if search_query:
+        like = f"%{search_query}%"
+        filters.append(PurchaseOrder.po_number.ilike(like))
+
+    query = PurchaseOrder.query.options(
+        joinedload(PurchaseOrder.supplier),
+        joinedload(PurchaseOrder.items),
+    )
+    if filters:
+        query = query.filter(*filters)
+    purchase_orders = query.order_by(PurchaseOrder.created_at.desc()).limit(200).all()
+
+    status_counts = dict(
+        db.session.query(PurchaseOrder.status, func.count(PurchaseOrder.id)).group_by(
+            PurchaseOrder.status
+        )
+    )
+    total_all = sum(status_counts.values())
+
+    supplier_options = Supplier.query.order_by(Supplier.name.asc()).all()
+    filter_values = {
+        "status": status,
+        "supplier": supplier_id or "",
+        "search": search_query,
+    }
+
+    return render_template(
+        "pembelian_po_list.html",
+        purchase_orders=purchase_orders,
+        status_counts=status_counts,
+        total_all=total_all,
+        supplier_options=supplier_options,
+        filter_values=filter_values,
+    )
+
+
+@bp.route("/pembelian/po/new", methods=["GET", "POST"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def pembelian_po_new():
+
+    supplier_options = Supplier.query.order_by(Supplier.name.asc()).all()
+    product_options = Produk.query.order_by(Produk.nama_produk.asc()).all()
+    product_payload = [
+        {
+            "id": product.id,
+            "name": product.nama_produk,
+            "code": product.kode_produk,
+            "sku": product.sku,
+            "price": float(product.harga or 0.0),
+            "stock": float(product.stok_lama or 0),
+        }
+        for product in product_options
+    ]
+    draft_number = preview_document_number(DOCUMENT_PURCHASE_ORDER)
+
+    if request.method == "POST":
+        try:
+            supplier_id = _parse_int_param(request.form.get("supplier_id"))
+            expected_date = _parse_date_param(request.form.get("expected_date"))
+            note = (request.form.get("note") or "").strip()
+            tax_percent = _parse_float_param(request.form.get("tax_percent")) or 0.0
+            shipping_fee = _parse_float_param(request.form.get("shipping_fee")) or 0.0
+
+            if not supplier_id:
+                raise ValueError("Supplier wajib dipilih.")
+
+            product_ids = request.form.getlist("product_id[]")
+            qty_list = request.form.getlist("qty[]")
+            price_list = request.form.getlist("price[]")
+
+            items = []
+            subtotal = 0.0
+            for idx, raw_product_id in enumerate(product_ids):
+                product_id = _parse_int_param(raw_product_id)
+                if not product_id:
+                    continue
+                qty = _parse_float_param(qty_list[idx]) if idx < len(qty_list) else 0.0
+                price = _parse_float_param(price_list[idx]) if idx < len(price_list) else 0.0
+                if not qty or qty <= 0:
+                    continue
+                product = db.session.get(Produk, product_id)
+                if not product:
+                    continue
+                total_price = max(qty, 0.0) * max(price, 0.0)
+                subtotal += total_price
+                items.append(
+                    {
+                        "product": product,
+                        "qty": qty,
+                        "price": price,
+                        "total": total_price,
+                    }
+                )
+
+            if not items:
+                raise ValueError("Tambahkan minimal satu item untuk PO.")
+
+            tax_percent = min(max(tax_percent, 0.0), 100.0)
+            tax_total = subtotal * (tax_percent / 100.0)
+            shipping_fee = max(shipping_fee, 0.0)
+            grand_total = subtotal + tax_total + shipping_fee
+
+            po = PurchaseOrder(
+                po_number=_generate_po_number(),
+                supplier_id=supplier_id,
+                status="draft",
+                created_by=session.get("user_id"),
+                expected_date=expected_date,
+                note=note or None,
+                tax_percent=tax_percent,
+                subtotal_estimate=subtotal,
+                tax_total=tax_total,
+                shipping_fee=shipping_fee,
+                grand_total_estimate=grand_total,
+            )
+            db.session.add(po)
+            db.session.flush()
+
+            for item in items:
+                product = item["product"]
+                db.session.add(
+                    PurchaseOrderItem(
+                        purchase_order_id=po.id,
+                        product_id=product.id,
+                        product_code=product.kode_produk,
+                        product_name=product.nama_produk,
+                        sku=product.sku,
+                        qty=item["qty"],
+                        unit_price=item["price"],
+                        total_price=item["total"],
+                    )
+                )
+
+            db.session.commit()
+            flash("PO berhasil dibuat sebagai draft.", "success")
+            return redirect(url_for("main.pembelian_po_detail", po_id=po.id))
+        except ValueError as exc:
+            db.session.rollback()
+            flash(str(exc), "warning")
+        except Exception as exc:
+            db.session.rollback()
+            logging.exception("Gagal membuat PO")
+            flash(f"Gagal membuat PO: {str(exc)}", "danger")
+
+    return render_template(
+        "pembelian_po_form.html",
+        supplier_options=supplier_options,
+        product_options=product_options,
+        product_payload=product_payload,
+        draft_number=draft_number,
+    )
+
+
+@bp.route("/pembelian/po/<int:po_id>")
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def pembelian_po_detail(po_id):
+
+    po = (
+        PurchaseOrder.query.options(
+            joinedload(PurchaseOrder.supplier),
+            joinedload(PurchaseOrder.items),
+            joinedload(PurchaseOrder.creator),
+            joinedload(PurchaseOrder.approver),
+            joinedload(PurchaseOrder.sender),
+            joinedload(PurchaseOrder.receiver),
+        )
+        .filter(PurchaseOrder.id == po_id)
+        .first_or_404()
+    )
+    return render_template("pembelian_po_detail.html", po=po)
+
+
+@bp.route("/pembelian/po/<int:po_id>/edit", methods=["GET", "POST"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def pembelian_po_edit(po_id):
+
+    po = (
+        PurchaseOrder.query.options(
+            joinedload(PurchaseOrder.items),
+        )
+        .filter(PurchaseOrder.id == po_id)
+        .first_or_404()
+    )
+    if po.status != "draft":
+        flash("Hanya PO draft yang bisa diedit.", "warning")
+        return redirect(url_for("main.pembelian_po_detail", po_id=po.id))
+
+    supplier_options = Supplier.query.order_by(Supplier.name.asc()).all()
+    product_options = Produk.query.order_by(Produk.nama_produk.asc()).all()
+    product_payload = [
+        {
+            "id": product.id,
+            "name": product.nama_produk,
+            "code": product.kode_produk,
+            "sku": product.sku,
+            "price": float(product.harga or 0.0),
+            "stock": float(product.stok_lama or 0),
+        }
+        for product in product_options
+    ]
+
+    if request.method == "POST":
+        try:
+            supplier_id = _parse_int_param(request.form.get("supplier_id"))
+            expected_date = _parse_date_param(request.form.get("expected_date"))
+            note = (request.form.get("note") or "").strip()
+            tax_percent = _parse_float_param(request.form.get("tax_percent")) or 0.0
+            shipping_fee = _parse_float_param(request.form.get("shipping_fee")) or 0.0
+
+            if not supplier_id:
+                raise ValueError("Supplier wajib dipilih.")
+
+            product_ids = request.form.getlist("product_id[]")
+            qty_list = request.form.getlist("qty[]")
+            price_list = request.form.getlist("price[]")
+
+            items = []
+            subtotal = 0.0
+            for idx, raw_product_id in enumerate(product_ids):
+                product_id = _parse_int_param(raw_product_id)
+                if not product_id:
+                    continue
+                qty = _parse_float_param(qty_list[idx]) if idx < len(qty_list) else 0.0
+                price = _parse_float_param(price_list[idx]) if idx < len(price_list) else 0.0
+                if not qty or qty <= 0:
+                    continue
+                product = db.session.get(Produk, product_id)
+                if not product:
+                    continue
+                total_price = max(qty, 0.0) * max(price, 0.0)
+                subtotal += total_price
+                items.append(
+                    {
+                        "product": product,
+                        "qty": qty,
+                        "price": price,
+                        "total": total_price,
+                    }
+                )
+
+            if not items:
+                raise ValueError("Tambahkan minimal satu item untuk PO.")
+
+            tax_percent = min(max(tax_percent, 0.0), 100.0)
+            tax_total = subtotal * (tax_percent / 100.0)
+            shipping_fee = max(shipping_fee, 0.0)
+            grand_total = subtotal + tax_total + shipping_fee
+
+            po.supplier_id = supplier_id
+            po.expected_date = expected_date
+            po.note = note or None
+            po.tax_percent = tax_percent
+            po.subtotal_estimate = subtotal
+            po.tax_total = tax_total
+            po.shipping_fee = shipping_fee
+            po.grand_total_estimate = grand_total
+
+            po.items.clear()
+            db.session.flush()
+
+            for item in items:
+                product = item["product"]
+                db.session.add(
+                    PurchaseOrderItem(
+                        purchase_order_id=po.id,
+                        product_id=product.id,
+                        product_code=product.kode_produk,
+                        product_name=product.nama_produk,
+                        sku=product.sku,
+                        qty=item["qty"],
+                        unit_price=item["price"],
+                        total_price=item["total"],
+                    )
+                )
+
+            db.session.commit()
+            flash("Draft PO berhasil diperbarui.", "success")
+            return redirect(url_for("main.pembelian_po_detail", po_id=po.id))
+        except ValueError as exc:
+            db.session.rollback()
+            flash(str(exc), "warning")
+        except Exception as exc:
+            db.session.rollback()
+            logging.exception("Gagal memperbarui PO")
+            flash(f"Gagal memperbarui PO: {str(exc)}", "danger")
+
+    return render_template(
+        "pembelian_po_form.html",
+        supplier_options=supplier_options,
+        product_options=product_options,
+        product_payload=product_payload,
+        draft_number=po.po_number,
+        po=po,
+        is_edit=True,
+        form_action=url_for("main.pembelian_po_edit", po_id=po.id),
+    )
+
+
+@bp.route("/pembelian/po/<int:po_id>/print")
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def pembelian_po_print(po_id):
+
+    po = (
+        PurchaseOrder.query.options(
+            joinedload(PurchaseOrder.items),
+            joinedload(PurchaseOrder.supplier),
+        )
+        .filter(PurchaseOrder.id == po_id)
+        .first_or_404()
+    )
+
+    return render_template(
+        "pembelian_po_print.html",
+        po=po,
+        printed_at=local_now(),
+        company_profile=_get_company_profile(),
+    )
+
+
+@bp.route("/pembelian/po/<int:po_id>/export")
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def pembelian_po_export(po_id):
+
+    po = (
+        PurchaseOrder.query.options(
+            joinedload(PurchaseOrder.items),
+            joinedload(PurchaseOrder.supplier),
+        )
+        .filter(PurchaseOrder.id == po_id)
+        .first_or_404()
+    )
+
+    output = StringIO()
+    writer = csv.writer(output)
+    writer.writerow(
+        [
+            "PO Number",
+            "Status",
+            "Supplier",
+            "Tanggal",
+            "Estimasi Datang",
+            "Kode Produk",
+            "Nama Produk",
+            "Qty",
+            "Harga Estimasi",
+            "Total Estimasi",
+        ]
+    )
+
+    for item in po.items:
+        writer.writerow(
+            [
+                po.po_number,
+                po.status,
+                po.supplier.name if po.supplier else "-",
+                po.created_at.strftime("%Y-%m-%d") if po.created_at else "",
+                po.expected_date.strftime("%Y-%m-%d") if po.expected_date else "",
+                item.product_code or "",
+                item.product_name,
+                item.qty,
+                item.unit_price,
+                item.total_price,
+            ]
+        )
+
+    filename = f"po_{po.po_number}.csv"
+    output.seek(0)
+    return Response(
+        output.getvalue(),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
+@bp.route("/pembelian/po/<int:po_id>/approve", methods=["POST"])
+@login_required
+@roles_required(*ADMIN_ONLY)
+def pembelian_po_approve(po_id):
+    po = PurchaseOrder.query.get_or_404(po_id)
+    if po.status != "draft":
+        flash("PO tidak berada di status draft.", "warning")
+        return redirect(url_for("main.pembelian_po_detail", po_id=po.id))
+    po.status = "approved"
+    po.approved_at = local_now()
+    po.approved_by = session.get("user_id")
+    db.session.commit()
+    flash("PO disetujui.", "success")
+    return redirect(url_for("main.pembelian_po_detail", po_id=po.id))
+
+
+@bp.route("/pembelian/po/<int:po_id>/send", methods=["POST"])
+@login_required
+@roles_required(*ADMIN_ONLY)
+def pembelian_po_send(po_id):
+    po = PurchaseOrder.query.get_or_404(po_id)
+    if po.status != "approved":
+        flash("PO harus disetujui sebelum dikirim.", "warning")
+        return redirect(url_for("main.pembelian_po_detail", po_id=po.id))
+    po.status = "sent"
+    po.sent_at = local_now()
+    po.sent_by = session.get("user_id")
+    db.session.commit()
+    flash("PO ditandai sebagai terkirim.", "success")
+    return redirect(url_for("main.pembelian_po_detail", po_id=po.id))
+
+
+@bp.route("/pembelian/po/<int:po_id>/receive", methods=["POST"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def pembelian_po_receive(po_id):
+    po = PurchaseOrder.query.get_or_404(po_id)
+    if po.status != "sent":
+        flash("PO harus terkirim sebelum diterima.", "warning")
+        return redirect(url_for("main.pembelian_po_detail", po_id=po.id))
+    po.status = "received"
+    po.received_at = local_now()
+    po.received_by = session.get("user_id")
+    db.session.commit()
+    flash("PO ditandai sudah diterima.", "success")
+    return redirect(url_for("main.pembelian_po_detail", po_id=po.id))
+
+
+@bp.route("/pembelian/po/<int:po_id>/cancel", methods=["POST"])
+@login_required
+@roles_required(*ADMIN_ONLY)
+def pembelian_po_cancel(po_id):
+    po = PurchaseOrder.query.get_or_404(po_id)
+    if po.status == "received":
+        flash("PO yang sudah diterima tidak bisa dibatalkan.", "warning")
+        return redirect(url_for("main.pembelian_po_detail", po_id=po.id))
+    po.status = "cancelled"
+    db.session.commit()
+    flash("PO dibatalkan.", "info")
+    return redirect(url_for("main.pembelian_po_detail", po_id=po.id))
+
+
+@bp.route("/utilitas/pembayaran-utang", methods=["GET"])
+@login_required
+@roles_required(*ADMIN_ONLY)
+def pembayaran_utang():
+    today = local_today()
+    default_start = today.replace(day=1)
+    start_date = _parse_date_param(request.args.get("start_date")) or default_start
+    end_date = _parse_date_param(request.args.get("end_date")) or today
+    if end_date < start_date:
+        start_date, end_date = end_date, start_date
+
+    search_query = (request.args.get("search") or "").strip()
+    open_id = _parse_int_param(request.args.get("open_id"))
+    supplier_id = _parse_int_param(request.args.get("supplier"))
+    per_page = request.args.get("per_page", type=int) or 10
+    per_page = max(5, min(per_page, 50))
+    page = request.args.get("page", type=int) or 1
+    if page < 1:
+        page = 1
+
+    total_sub = _purchase_total_subquery()
+    paid_sub = _payable_payment_sum_subquery()
+    total_expr = func.coalesce(total_sub.c.total_amount, 0)
+    paid_expr = func.coalesce(paid_sub.c.amount_paid, 0)
+    outstanding_expr = total_expr - paid_expr
+
+    base_filters = [
+        Pembelian.jenis_pembayaran == "Tempo",
+        outstanding_expr > 0,
+    ]
+    if open_id:
+        base_filters.append(Pembelian.id == open_id)
+    else:
+        base_filters.extend(
+            [
+                Pembelian.tanggal_faktur >= start_date,
+                Pembelian.tanggal_faktur <= end_date,
+            ]
+        )
+        if supplier_id:
+            base_filters.append(Pembelian.supplier_id == supplier_id)
+        if search_query:
+            like = f"%{search_query}%"
+            base_filters.append(
+                or_(
+                    Pembelian.no_faktur.ilike(like),
+                    Pembelian.supplier.has(Supplier.name.ilike(like)),
+                )
+            )
+
+    def apply_filters(query, filters):
+        return query.filter(*filters) if filters else query
+
+    base_query = (
+        Pembelian.query.options(joinedload(Pembelian.supplier))
+        .outerjoin(total_sub, total_sub.c.pembelian_id == Pembelian.id)
+        .outerjoin(paid_sub, paid_sub.c.pembelian_id == Pembelian.id)
+    )
+    list_query = apply_filters(base_query, base_filters)
+
+    total_records = (
+        list_query.with_entities(func.count(Pembelian.id)).scalar() or 0
+    )
+    total_pages = max(1, (total_records + per_page - 1) // per_page)
+    if page > total_pages:
+        page = total_pages
+    offset = (page - 1) * per_page
+
+    records = (
+        list_query.add_columns(
+            total_expr.label("total_amount"),
+            paid_expr.label("amount_paid"),
+        )
+        .order_by(Pembelian.tanggal_faktur.desc(), Pembelian.id.desc())
+        .offset(offset)
+        .limit(per_page)
+        .all()
+    )
+
+    total_outstanding = (
+        list_query.with_entities(func.coalesce(func.sum(outstanding_expr), 0))
+        .scalar()
+        or 0.0
+    )
+
+    payable_rows = []
+    for purchase, total_amount, amount_paid in records:
+        total_amount = float(total_amount or 0.0)
+        amount_paid = float(amount_paid or 0.0)
+        outstanding = max(total_amount - amount_paid, 0.0)
+        supplier_name = purchase.supplier.name if purchase.supplier else "Tanpa supplier"
+        payable_rows.append(
+            {
+                "id": purchase.id,
+                "invoice": purchase.no_faktur,
+                "purchase_date": purchase.tanggal_faktur,
+                "supplier_name": supplier_name,
+                "total": total_amount,
+                "amount_paid": amount_paid,
+                "outstanding": outstanding,
+                "due_date": purchase.due_date,
+            }
+        )
+
+    filter_active = any([search_query, supplier_id]) and not open_id
+
+    def _date_value_to_str(value):
+        return value.strftime("%Y-%m-%d") if value else ""
+
+    filter_values = {
+        "search": search_query,
+        "supplier": supplier_id or "",
+        "start_date": _date_value_to_str(start_date),
+        "end_date": _date_value_to_str(end_date),
+    }
+
+    supplier_options = Supplier.query.order_by(Supplier.name.asc()).all()
+
+    query_args = request.args.to_dict(flat=True)
+    query_args.pop("page", None)
+    base_args = query_args.copy()
+    prev_url = (
+        url_for("main.pembayaran_utang", page=page - 1, **base_args)
+        if page > 1
+        else None
+    )
+    next_url = (
+        url_for("main.pembayaran_utang", page=page + 1, **base_args)
+        if page < total_pages
+        else None
+    )
+    page_window_start = max(1, page - 2)
+    page_window_end = min(total_pages, page + 2)
+    page_links = [
+        {
+            "number": number,
+            "url": url_for("main.pembayaran_utang", page=number, **base_args),
+            "current": number == page,
+        }
+        for number in range(page_window_start, page_window_end + 1)
+    ]
+    pagination = {
+        "page": page,
+        "per_page": per_page,
+        "total_pages": total_pages,
+        "total_records": total_records,
+        "has_prev": page > 1,
+        "has_next": page < total_pages,
+        "prev_url": prev_url,
+        "next_url": next_url,
+        "page_links": page_links,
+    }
+
+    return render_template(
+        "pembayaran_utang.html",
+        payable_rows=payable_rows,
+        total_outstanding=total_outstanding,
+        filter_values=filter_values,
+        filter_active=filter_active,
+        per_page=per_page,
+        pagination=pagination,
+        supplier_options=supplier_options,
+        open_id=open_id,
+        format_date=_format_date_id,
+    )
+
+
+@bp.route("/utilitas/pembayaran-utang/bayar", methods=["POST"])
+@login_required
+@roles_required(*ADMIN_ONLY)
+def pembayaran_utang_bayar():
+    purchase_id = _parse_int_param(request.form.get("purchase_id"))
+    amount = _parse_float_param(request.form.get("payment_amount"))
+    payment_method = (request.form.get("payment_method") or "Tunai").strip()
+    reference = (request.form.get("reference") or "").strip()
+    note = (request.form.get("note") or "").strip()
+    update_due = request.form.get("update_due") == "1"
+    new_due_date = _parse_date_param(request.form.get("new_due_date"))
+    next_target = request.form.get("next") or url_for("main.pembayaran_utang")
+
+    if not purchase_id:
+        flash("Data pembelian tidak valid.", "warning")
+        return redirect(url_for("main.pembayaran_utang"))
+
+    purchase = (
+        Pembelian.query.options(
+            joinedload(Pembelian.barang),
+            joinedload(Pembelian.supplier),
+        )
+        .filter(Pembelian.id == purchase_id)
+        .first()
+    )
+    if not purchase:
+        flash("Pembelian tidak ditemukan.", "warning")
+        return redirect(url_for("main.pembayaran_utang"))
+    if purchase.jenis_pembayaran != "Tempo":
+        flash("Pembelian ini bukan tempo.", "warning")
+        return redirect(next_target)
+
+    total_amount = _calculate_purchase_total(purchase.barang)
+    current_paid = sum(payment.amount for payment in purchase.payments)
+    outstanding = max(total_amount - current_paid, 0.0)
+    if outstanding <= 0:
+        flash("Utang sudah lunas.", "info")
+        return redirect(next_target)
+    if not amount or amount <= 0:
+        flash("Nominal pembayaran harus lebih dari 0.", "warning")
+        return redirect(next_target)
+    if update_due and not new_due_date:
+        flash("Tanggal jatuh tempo baru wajib diisi.", "warning")
+        return redirect(next_target)
+
+    allowed_methods = {"Tunai", "Transfer", "Kartu", "QRIS"}
+    if payment_method not in allowed_methods:
+        payment_method = "Tunai"
+    if amount > outstanding:
+        flash("Nominal pembayaran melebihi sisa utang.", "warning")
+        return redirect(next_target)
+
+    payment = PayablePayment(
+        pembelian_id=purchase.id,
+        amount=amount,
+        payment_method=payment_method,
+        reference=reference or None,
+        note=note or None,
+        created_by=session.get("user_id"),
+    )
+    db.session.add(payment)
+
+    if update_due and new_due_date:
+        purchase.due_date = new_due_date
+
+    db.session.commit()
+    flash("Pembayaran utang berhasil disimpan.", "success")
+    return redirect(
+        next_target if _is_safe_redirect_target(next_target) else url_for("main.pembayaran_utang")
+    )
@@ -0,0 +1,2822 @@
+"""Route laporan ``/laporan/...`` (laba rugi, neraca, penjualan, stok, dll.)."""
+
+import csv
+from collections import defaultdict
+from datetime import datetime, timedelta
+from io import BytesIO, StringIO
+
+from flask import Response, make_response, render_template, request, url_for
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import joinedload
+
+from app import normalize_phone
+from app.models import (
+    Account,
+    CashierShift,
+    DetailPenjualan,
+    Kategori,
+    Pelanggan,
+    Pembelian,
+    Penjualan,
+    Produk,
+    SalesDailySummary,
+    StockOpnameItem,
+    StockOpnameSession,
+    Supplier,
+    User,
+    db,
+)
+from app.routes import bp
+from app.routes.common import (
+    ADMIN_ONLY,
+    INVENTORY_ROLES,
+    SALES_ROLES,
+    _format_date_id,
+    _get_company_profile,
+    _parse_bool_param,
+    _parse_date_param,
+    _parse_int_param,
+    _payable_payment_sum_subquery,
+    _product_cost_basis,
+    _purchase_total_subquery,
+    login_required,
+    roles_required,
+)
+from app.schema_registry import table_ready
+from app.services.ledger_service import account_net_movements
+from app.services.report_service import profit_loss_breakdown
+from app.services.sales_summary_service import summary_grouped, summary_totals
+from app.time_utils import local_now, local_today
+
+
+def _supplier_report_query(search_query):
+    base_query = Supplier.query.order_by(Supplier.name.asc())
+    if search_query:
+        like = f"%{search_query}%"
+        filters = [
+            Supplier.name.ilike(like),
+            Supplier.contact_person.ilike(like),
+            Supplier.phone.ilike(like),
+            Supplier.email.ilike(like),
+            Supplier.bank_account.ilike(like),
+            Supplier.bank_name.ilike(like),
+            Supplier.account_name.ilike(like),
+            Supplier.address.ilike(like),
+            Supplier.website.ilike(like),
+        ]
+        if search_query.isdigit():
+            filters.append(Supplier.id == int(search_query))
+        base_query = base_query.filter(or_(*filters))
+    return base_query
+
+
+@bp.route("/laporan/supplier", methods=["GET"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def laporan_supplier():
+    search_query = (request.args.get("search") or "").strip()
+    suppliers = _supplier_report_query(search_query).all()
+    total = Supplier.query.count()
+    return render_template(
+        "laporan_supplier.html",
+        suppliers=suppliers,
+        total=total,
+        search_query=search_query,
+    )
+
+
+@bp.route("/laporan/supplier/preview", methods=["GET"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def laporan_supplier_preview():
+    search_query = (request.args.get("search") or "").strip()
+    suppliers = _supplier_report_query(search_query).all()
+    total = Supplier.query.count()
+    return render_template(
+        "laporan_supplier_preview.html",
+        suppliers=suppliers,
+        total=total,
+        filtered_total=len(suppliers),
+        search_query=search_query,
+        printed_at=local_now(),
+        company_profile=_get_company_profile(),
+    )
+
+
+@bp.route("/laporan/supplier/export", methods=["GET"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def laporan_supplier_export():
+    import pandas as pd
+    search_query = (request.args.get("search") or "").strip()
+    suppliers = _supplier_report_query(search_query).all()
+
+    data = [
+        {
+            "ID Supplier": supplier.id,
+            "Nama Supplier": supplier.name,
+            "Alamat": supplier.address,
+            "No Telp": normalize_phone(supplier.phone),
+            "Nama Bank": supplier.bank_name or "",
+            "No Rekening Bank": supplier.bank_account,
+            "Nama Rekening": supplier.account_name,
+            "Kontak Person": supplier.contact_person,
+            "Email": supplier.email,
+            "Website": supplier.website,
+        }
+        for supplier in suppliers
+    ]
+
+    df = pd.DataFrame(data)
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        df.to_excel(writer, index=False)
+    output.seek(0)
+
+    response = make_response(output.read())
+    response.headers["Content-Disposition"] = "attachment; filename=laporan_supplier.xlsx"
+    response.headers["Content-Type"] = (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+    return response
+
+
+@bp.route("/laporan/laba-rugi")
+@login_required
+@roles_required(*ADMIN_ONLY)
+def laporan_laba_rugi():
+    today = local_today()
+    default_start = today.replace(day=1)
+    start_date = _parse_date_param(request.args.get("start_date")) or default_start
+    end_date = _parse_date_param(request.args.get("end_date")) or today
+    if end_date < start_date:
+        start_date, end_date = end_date, start_date
+
+    # total omzet dari rekap harian; HPP & tren dihitung dengan agregat SQL
+    # memakai hpp_satuan saat checkout (biaya produk hanya untuk baris lama)
+    period_summary = summary_totals(
+        SalesDailySummary.summary_date >= start_date,
+        SalesDailySummary.summary_date <= end_date,
+    )
+    breakdown = profit_loss_breakdown(start_date, end_date)
+    totals = {
+        "gross_revenue": period_summary["gross_sales"],
+        "net_revenue": 0.0,
+        "cogs": breakdown["cogs"],
+        "gross_profit": breakdown["gross_profit"],
+        "net_profit": 0.0,
+        "discount": period_summary["discount_total"],
+        "tax": period_summary["tax_total"],
+        "marketplace_costs": period_summary["marketplace_cost"],
+        "orders": period_summary["orders"],
+        "units": period_summary["units"],
+    }
+    totals["net_revenue"] = totals["gross_revenue"] - totals["marketplace_costs"]
+    totals["net_profit"] = totals["gross_profit"] - totals["marketplace_costs"]
+
+    gross_margin_percent = (
+        (totals["gross_profit"] / totals["gross_revenue"]) * 100
+        if totals["gross_revenue"]
+        else 0.0
+    )
+    net_margin_percent = (
+        (totals["net_profit"] / totals["net_revenue"]) * 100
+        if totals["net_revenue"]
+        else 0.0
+    )
+    average_order = totals["net_revenue"] / totals["orders"] if totals["orders"] else 0.0
+
+    daily_points = [
+        {
+            "date": point["date"].isoformat(),
+            "label": _format_date_id(point["date"]),
+            "revenue": round(point["revenue"], 2),
+            "gross": round(point["gross"], 2),
+        }
+        for point in breakdown["daily"]
+    ]
+
+    monthly_breakdown = [
+        {
+            "label": datetime(year=entry["year"], month=entry["month"], day=1).strftime(
+                "%b %Y"
+            ),
+            "revenue": entry["revenue"],
+            "gross": entry["gross"],
+        }
+        for entry in breakdown["monthly"]
+    ]
+
+    top_products = breakdown["top_products"]
+
+    summary_cards = [
+        {
+            "label": "Penjualan Kotor",
+            "value": totals["gross_revenue"],
+            "icon": "fa-coins",
+            "accent": "text-primary",
+            "subtitle": "Sebelum biaya marketplace",
+        },
+        {
+            "label": "Penjualan Bersih",
+            "value": totals["net_revenue"],
+            "icon": "fa-wallet",
+            "accent": "text-info",
+            "subtitle": "Setelah biaya marketplace",
+        },
+        {
+            "label": "Biaya Marketplace",
+            "value": totals["marketplace_costs"],
+            "icon": "fa-coins",
+            "accent": "text-danger",
+            "subtitle": "Komisi, cashback, bebas ongkir",
+        },
+        {
+            "label": "HPP",
+            "value": totals["cogs"],
+            "icon": "fa-boxes",
+            "accent": "text-secondary",
+            "subtitle": "Total biaya barang",
+        },
+        {
+            "label": "Laba Kotor",
+            "value": totals["gross_profit"],
+            "icon": "fa-chart-line",
+            "accent": "text-success",
+            "subtitle": f"Margin kotor {gross_margin_percent:.1f}%",
+        },
+        {
+            "label": "Laba Bersih",
+            "value": totals["net_profit"],
+            "icon": "fa-balance-scale",
+            "accent": "text-success",
+            "subtitle": f"Margin bersih {net_margin_percent:.1f}%",
+        },
+    ]
+
+    insight_cards = [
+        {
+            "title": "Rata-rata Order",
+            "value": average_order,
+            "type": "currency",
+            "description": "Nilai penjualan bersih per transaksi.",
+        },
+        {
+            "title": "Total Transaksi",
+            "value": totals["orders"],
+            "type": "count",
+            "description": "Jumlah faktur pada periode ini.",
+        },
+        {
+            "title": "Item Terjual",
+            "value": totals["units"],
+            "type": "count",
+            "description": "Agregasi kuantitas dari seluruh penjualan.",
+        },
+        {
+            "title": "Diskon Diberikan",
+            "value": totals["discount"],
+            "type": "currency",
+            "description": "Total nilai potongan harga.",
+        },
+    ]
+
+    range_label = f"{_format_date_id(start_date)} - {_format_date_id(end_date)}"
+    filter_values = {
+        "start_date": start_date.strftime("%Y-%m-%d"),
+        "end_date": end_date.strftime("%Y-%m-%d"),
+    }
+
+    return render_template(
+        "laporan_laba_rugi.html",
+        summary_cards=summary_cards,
+        insight_cards=insight_cards,
+        top_products=top_products,
+        daily_points=daily_points,
+        monthly_breakdown=monthly_breakdown,
+        totals=totals,
+        gross_margin_percent=gross_margin_percent,
+        net_margin_percent=net_margin_percent,
+        average_order=average_order,
+        range_label=range_label,
+        filter_values=filter_values,
+    )
+
+
+@bp.route("/laporan/neraca")
+@login_required
+@roles_required(*ADMIN_ONLY)
+def laporan_neraca():
+
+    today = local_today()
+    default_start = today.replace(month=1, day=1)
+    start_date = _parse_date_param(request.args.get("start_date")) or default_start
+    end_date = _parse_date_param(request.args.get("end_date")) or today
+    if end_date < start_date:
+        start_date, end_date = end_date, start_date
+
+    show_zero = _parse_bool_param(request.args.get("show_zero"), default=False)
+    movements = account_net_movements(start_date, end_date)
+    accounts = (
+        Account.query.filter(Account.type.in_(["asset", "liability", "equity"]))
+        .order_by(Account.code.asc())
+        .all()
+    )
+
+    groups = {"asset": [], "liability": [], "equity": []}
+    totals = {
+        "asset": {"debit": 0.0, "credit": 0.0, "net": 0.0},
+        "liability": {"debit": 0.0, "credit": 0.0, "net": 0.0},
+        "equity": {"debit": 0.0, "credit": 0.0, "net": 0.0},
+    }
+    for account in accounts:
+        net = movements.get(account.id, 0.0)
+        debit_balance = net if net > 0 else 0.0
+        credit_balance = -net if net < 0 else 0.0
+        if not show_zero and debit_balance == 0 and credit_balance == 0:
+            continue
+        groups[account.type].append(
+            {
+                "code": account.code,
+                "name": account.name,
+                "debit": debit_balance,
+                "credit": credit_balance,
+            }
+        )
+        totals[account.type]["debit"] += debit_balance
+        totals[account.type]["credit"] += credit_balance
+        totals[account.type]["net"] += net
+
+    asset_total = totals["asset"]["net"]
+    liability_total = -totals["liability"]["net"]
+    equity_total = -totals["equity"]["net"]
+    total_le = liability_total + equity_total
+    difference = asset_total - total_le
+    warning_message = abs(difference) if difference != 0 else None
+
+    summary_cards = [
+        {
+            "label": "Total Aset",
+            "value": asset_total,
+            "icon": "fa-piggy-bank",
+            "accent": "text-primary",
+        },
+        {
+            "label": "Total Liabilitas",
+            "value": liability_total,
+            "icon": "fa-balance-scale",
+            "accent": "text-warning",
+        },
+        {
+            "label": "Total Ekuitas",
+            "value": equity_total,
+            "icon": "fa-university",
+            "accent": "text-success",
+        },
+        {
+            "label": "Selisih",
+            "value": abs(difference),
+            "icon": "fa-exclamation-triangle",
+            "accent": "text-danger" if difference != 0 else "text-success",
+        },
+    ]
+
+    type_labels = {
+        "asset": "Aset",
+        "liability": "Liabilitas",
+        "equity": "Ekuitas",
+    }
+    range_label = f"{_format_date_id(start_date)} - {_format_date_id(end_date)}"
+    filter_values = {
+        "start_date": start_date.strftime("%Y-%m-%d"),
+        "end_date": end_date.strftime("%Y-%m-%d"),
+        "show_zero": show_zero,
+    }
+
+    return render_template(
+        "laporan_neraca.html",
+        groups=groups,
+        totals=totals,
+        summary_cards=summary_cards,
+        warning_message=warning_message,
+        type_labels=type_labels,
+        range_label=range_label,
+        filter_values=filter_values,
+        total_le=total_le,
+    )
+
+
+@bp.route("/laporan/pembelian")
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def laporan_pembelian():
+    today = local_today()
+    default_start = today.replace(day=1)
+    start_date = _parse_date_param(request.args.get("start_date")) or default_start
+    end_date = _parse_date_param(request.args.get("end_date")) or today
+    if end_date < start_date:
+        start_date, end_date = end_date, start_date
+    search_query = (request.args.get("search") or "").strip()
+    supplier_id = _parse_int_param(request.args.get("supplier"))
+
+    purchase_query = (
+        Pembelian.query.options(
+            joinedload(Pembelian.barang),
+            joinedload(Pembelian.supplier),
+        )
+        .filter(Pembelian.tanggal_faktur >= start_date)
+        .filter(Pembelian.tanggal_faktur <= end_date)
+        .order_by(Pembelian.tanggal_faktur.asc(), Pembelian.id.asc())
+    )
+    if supplier_id:
+        purchase_query = purchase_query.filter(Pembelian.supplier_id == supplier_id)
+    if search_query:
+        like = f"%{search_query}%"
+        purchase_query = purchase_query.outerjoin(Supplier).filter(
+            or_(Pembelian.no_faktur.ilike(like), Supplier.name.ilike(like))
+        )
+    purchase_records = purchase_query.all()
+
+    totals = {
+        "spend": 0.0,
+        "discount": 0.0,
+        "tax": 0.0,
+        "units": 0,
+        "invoices": len(purchase_records),
+    }
+    daily_map = defaultdict(lambda: {"spent": 0.0, "units": 0})
+    monthly_map = defaultdict(lambda: {"spent": 0.0, "units": 0})
+    supplier_map = defaultdict(
+        lambda: {"name": "Tanpa supplier", "spent": 0.0, "units": 0, "invoices": 0}
+    )
+
+    largest_invoice = {"amount": 0.0, "supplier": "Tanpa supplier", "date": "-"}
+    purchase_table = []
+
+    for purchase in purchase_records:
+        invoice_total = 0.0
+        invoice_units = 0
+        invoice_date = purchase.tanggal_faktur or today
+        month_key = (invoice_date.year, invoice_date.month)
+        line_items = []
+
+        for item in purchase.barang:
+            qty = item.jumlah or 0
+            unit_price = item.harga_beli or 0.0
+            discount_pct = item.diskon or 0.0
+            tax_pct = item.pajak or 0.0
+
+            base_total = unit_price * qty
+            discount_value = base_total * (discount_pct / 100.0)
+            taxable_total = base_total - discount_value
+            tax_value = taxable_total * (tax_pct / 100.0)
+            final_total = taxable_total + tax_value
+
+            totals["spend"] += final_total
+            totals["discount"] += discount_value
+            totals["tax"] += tax_value
+            totals["units"] += qty
+
+            invoice_total += final_total
+            invoice_units += qty
+            line_items.append(
+                {
+                    "name": item.nama_barang,
+                    "code": item.kode_barang,
+                    "qty": qty,
+                    "unit_price": unit_price,
+                    "discount": f"{discount_pct:.1f}%",
+                    "tax": f"{tax_pct:.1f}%",
+                    "line_total": final_total,
+                }
+            )
+
+        daily_map[invoice_date]["spent"] += invoice_total
+        daily_map[invoice_date]["units"] += invoice_units
+        monthly_map[month_key]["spent"] += invoice_total
+        monthly_map[month_key]["units"] += invoice_units
+
+        supplier_key = purchase.supplier_id or f"anon-{purchase.id}"
+        supplier_entry = supplier_map[supplier_key]
+        if purchase.supplier:
+            supplier_entry["name"] = purchase.supplier.name
+        supplier_entry["spent"] += invoice_total
+        supplier_entry["units"] += invoice_units
+        supplier_entry["invoices"] += 1
+
+        if invoice_total > largest_invoice["amount"]:
+            largest_invoice["amount"] = invoice_total
+            largest_invoice["supplier"] = (
+                purchase.supplier.name if purchase.supplier else "Tanpa supplier"
+            )
+            largest_invoice["date"] = _format_date_id(invoice_date)
+        payment_label = purchase.jenis_pembayaran or "Tunai"
+        if purchase.jenis_pembayaran == "Tempo" and purchase.due_date:
+            payment_label = f"Tempo • {_format_date_id(purchase.due_date)}"
+        elif purchase.jenis_pembayaran == "Transfer":
+            transfer_detail = purchase.payment_reference or purchase.payment_bank
+            if transfer_detail:
+                payment_label = f"Transfer • {transfer_detail}"
+        purchase_table.append(
+            {
+                "id": purchase.id,
+                "no_faktur": purchase.no_faktur,
+                "supplier": purchase.supplier.name if purchase.supplier else "Tanpa supplier",
+                "tanggal_label": _format_date_id(invoice_date),
+                "payment": payment_label,
+                "payment_raw": purchase.jenis_pembayaran,
+                "due_date_label": _format_date_id(purchase.due_date) if purchase.due_date else "-",
+                "payment_bank": purchase.payment_bank or "-",
+                "payment_reference": purchase.payment_reference or "-",
+                "units": invoice_units,
+                "total": invoice_total,
+                "line_items": line_items,
+            }
+        )
+
+    average_invoice = (
+        totals["spend"] / totals["invoices"] if totals["invoices"] else 0.0
+    )
+    active_suppliers = len([entry for entry in supplier_map.values() if entry["spent"]])
+
+    daily_points = [
+        {
+            "date": date_key.isoformat(),
+            "label": _format_date_id(date_key),
+            "spent": round(values["spent"], 2),
+        }
+        for date_key, values in sorted(daily_map.items())
+    ]
+
+    monthly_breakdown = [
+        {
+            "label": datetime(year=year, month=month, day=1).strftime("%b %Y"),
+            "spent": values["spent"],
+            "units": values["units"],
+        }
+        for (year, month), values in sorted(monthly_map.items())
+    ]
+
+    top_suppliers = sorted(
+        supplier_map.values(), key=lambda entry: entry["spent"], reverse=True
+    )[:5]
+    supplier_breakdown = [
+        entry for entry in supplier_map.values() if entry["spent"]
+    ]
+    supplier_breakdown = sorted(
+        supplier_breakdown, key=lambda entry: entry["spent"], reverse=True
+    )
+
+    summary_cards = [
+        {
+            "label": "Total Pengeluaran",
+            "value": totals["spend"],
+            "icon": "fa-coins",
+            "accent": "text-primary",
+            "subtitle": "Nilai faktur bersih",
+        },
+        {
+            "label": "Diskon Diterima",
+            "value": totals["discount"],
+            "icon": "fa-percentage",
+            "accent": "text-success",
+            "subtitle": "Potongan supplier",
+        },
+        {
+            "label": "Pajak Dibayar",
+            "value": totals["tax"],
+            "icon": "fa-file-invoice-dollar",
+            "accent": "text-warning",
+            "subtitle": "PPN pembelian",
+        },
+        {
+            "label": "Barang Direstock",
+            "value": totals["units"],
+            "icon": "fa-boxes",
+            "accent": "text-info",
+            "subtitle": "Total unit masuk",
+        },
+    ]
+
+    insight_cards = [
+        {
+            "title": "Rata-rata Faktur",
+            "value": average_invoice,
+            "type": "currency",
+            "description": "Pengeluaran rata-rata per transaksi.",
+        },
+        {
+            "title": "Supplier aktif",
+            "value": active_suppliers,
+            "type": "count",
+            "description": "Partner yang memasok periode ini.",
+        },
+        {
+            "title": "Faktur terbesar",
+            "value": largest_invoice["amount"],
+            "type": "currency",
+            "description": f"{largest_invoice['supplier']} • {largest_invoice['date']}",
+        },
+        {
+            "title": "Jumlah faktur",
+            "value": totals["invoices"],
+            "type": "count",
+            "description": "Banyaknya transaksi pembelian.",
+        },
+    ]
+
+    filter_values = {
+        "start_date": start_date.strftime("%Y-%m-%d"),
+        "end_date": end_date.strftime("%Y-%m-%d"),
+        "supplier": supplier_id or "",
+        "search": search_query,
+    }
+    range_label = f"{_format_date_id(start_date)} - {_format_date_id(end_date)}"
+    filter_active = any(
+        [
+            search_query,
+            supplier_id,
+            request.args.get("start_date"),
+            request.args.get("end_date"),
+        ]
+    )
+    supplier_options = Supplier.query.order_by(Supplier.name.asc()).all()
+
+    return render_template(
+        "laporan_pembelian.html",
+        summary_cards=summary_cards,
+        insight_cards=insight_cards,
+        purchase_table=purchase_table,
+        filter_active=filter_active,
+        supplier_options=supplier_options,
+        supplier_breakdown=supplier_breakdown,
+        top_suppliers=top_suppliers,
+        daily_points=daily_points,
+        monthly_breakdown=monthly_breakdown,
+        totals=totals,
+        average_invoice=average_invoice,
+        active_suppliers=active_suppliers,
+        largest_invoice=largest_invoice,
+        range_label=range_label,
+        filter_values=filter_values,
+    )
+
+
+@bp.route("/laporan/pembelian/print")
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def laporan_pembelian_print():
+    today = local_today()
+    default_start = today.replace(day=1)
+    start_date = _parse_date_param(request.args.get("start_date")) or default_start
+    end_date = _parse_date_param(request.args.get("end_date")) or today
+    if end_date < start_date:
+        start_date, end_date = end_date, start_date
+    search_query = (request.args.get("search") or "").strip()
+    supplier_id = _parse_int_param(request.args.get("supplier"))
+
+    purchase_query = (
+        Pembelian.query.options(
+            joinedload(Pembelian.barang),
+            joinedload(Pembelian.supplier),
+        )
+        .filter(Pembelian.tanggal_faktur >= start_date)
+        .filter(Pembelian.tanggal_faktur <= end_date)
+        .order_by(Pembelian.tanggal_faktur.asc(), Pembelian.id.asc())
+    )
+    if supplier_id:
+        purchase_query = purchase_query.filter(Pembelian.supplier_id == supplier_id)
+    if search_query:
+        like = f"%{search_query}%"
+        purchase_query = purchase_query.outerjoin(Supplier).filter(
+            or_(Pembelian.no_faktur.ilike(like), Supplier.name.ilike(like))
+        )
+
+    purchase_records = purchase_query.all()
+    purchase_table = []
+    total_spend = 0.0
+    total_units = 0
+
+    for purchase in purchase_records:
+        invoice_total = 0.0
+        invoice_units = 0
+        invoice_date = purchase.tanggal_faktur or today
+        line_items = []
+
+        for item in purchase.barang:
+            qty = item.jumlah or 0
+            unit_price = item.harga_beli or 0.0
+            discount_pct = item.diskon or 0.0
+            tax_pct = item.pajak or 0.0
+
+            base_total = unit_price * qty
+            discount_value = base_total * (discount_pct / 100.0)
+            taxable_total = base_total - discount_value
+            tax_value = taxable_total * (tax_pct / 100.0)
+            final_total = taxable_total + tax_value
+
+            invoice_total += final_total
+            invoice_units += qty
+            line_items.append(
+                {
+                    "name": item.nama_barang,
+                    "code": item.kode_barang,
+                    "qty": qty,
+                    "unit_price": unit_price,
+                    "discount": f"{discount_pct:.1f}%",
+                    "tax": f"{tax_pct:.1f}%",
+                    "line_total": final_total,
+                }
+            )
+
+        payment_label = purchase.jenis_pembayaran or "Tunai"
+        if purchase.jenis_pembayaran == "Tempo" and purchase.due_date:
+            payment_label = f"Tempo • {_format_date_id(purchase.due_date)}"
+        elif purchase.jenis_pembayaran == "Transfer":
+            transfer_detail = purchase.payment_reference or purchase.payment_bank
+            if transfer_detail:
+                payment_label = f"Transfer • {transfer_detail}"
+
+        purchase_table.append(
+            {
+                "id": purchase.id,
+                "no_faktur": purchase.no_faktur,
+                "supplier": purchase.supplier.name if purchase.supplier else "Tanpa supplier",
+                "tanggal_label": _format_date_id(invoice_date),
+                "payment": payment_label,
+                "units": invoice_units,
+                "total": invoice_total,
+                "line_items": line_items,
+            }
+        )
+        total_spend += invoice_total
+        total_units += invoice_units
+
+    range_label = f"{_format_date_id(start_date)} - {_format_date_id(end_date)}"
+    supplier_name = "-"
+    if supplier_id:
+        supplier = db.session.get(Supplier, supplier_id)
+        if supplier:
+            supplier_name = supplier.name
+
+    return render_template(
+        "laporan_pembelian_print.html",
+        purchase_table=purchase_table,
+        range_label=range_label,
+        search_query=search_query,
+        supplier_name=supplier_name,
+        total_spend=total_spend,
+        total_units=total_units,
+        total_invoices=len(purchase_table),
+        printed_at=local_now(),
+        company_profile=_get_company_profile(),
+    )
+
+
+@bp.route("/laporan/pembelian/print/<int:purchase_id>")
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def laporan_pembelian_print_detail(purchase_id):
+    purchase = (
+        Pembelian.query.options(
+            joinedload(Pembelian.barang),
+            joinedload(Pembelian.supplier),
+        )
+        .filter(Pembelian.id == purchase_id)
+        .first_or_404()
+    )
+    invoice_date = purchase.tanggal_faktur or local_today()
+    line_items = []
+    invoice_total = 0.0
+    total_units = 0
+
+    for item in purchase.barang:
+        qty = item.jumlah or 0
+        unit_price = item.harga_beli or 0.0
+        discount_pct = item.diskon or 0.0
+        tax_pct = item.pajak or 0.0
+
+        base_total = unit_price * qty
+        discount_value = base_total * (discount_pct / 100.0)
+        taxable_total = base_total - discount_value
+        tax_value = taxable_total * (tax_pct / 100.0)
+        final_total = taxable_total + tax_value
+
+        invoice_total += final_total
+        total_units += qty
+        line_items.append(
+            {
+                "name": item.nama_barang,
+                "code": item.kode_barang,
+                "qty": qty,
+                "unit_price": unit_price,
+                "discount": f"{discount_pct:.1f}%",
+                "tax": f"{tax_pct:.1f}%",
+                "line_total": final_total,
+            }
+        )
+
+    payment_label = purchase.jenis_pembayaran or "Tunai"
+    if purchase.jenis_pembayaran == "Tempo" and purchase.due_date:
+        payment_label = f"Tempo • {_format_date_id(purchase.due_date)}"
+    elif purchase.jenis_pembayaran == "Transfer":
+        transfer_detail = purchase.payment_reference or purchase.payment_bank
+        if transfer_detail:
+            payment_label = f"Transfer • {transfer_detail}"
+
+    return render_template(
+        "pembelian_print.html",
+        purchase=purchase,
+        invoice_date=_format_date_id(invoice_date),
+        payment_label=payment_label,
+        line_items=line_items,
+        total_units=total_units,
+        total_amount=invoice_total,
+        printed_at=local_now(),
+        company_profile=_get_company_profile(),
+    )
+
+
+@bp.route("/laporan/stok-opname")
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def laporan_stok_opname():
+    start_date = _parse_date_param(request.args.get("start_date"))
+    end_date = _parse_date_param(request.args.get("end_date"))
+    today = local_today()
+    if not start_date or not end_date:
+        end_date = today
+        start_date = today.replace(day=1)
+    if end_date < start_date:
+        start_date, end_date = end_date, start_date
+
+    opname_ready = table_ready("stock_opname_session", "stock_opname_item")
+
+    sessions = []
+    if opname_ready:
+        sessions = (
+            StockOpnameSession.query.options(
+                joinedload(StockOpnameSession.items).joinedload(
+                    StockOpnameItem.product
+                ),
+                joinedload(StockOpnameSession.user),
+            )
+            .filter(
+                StockOpnameSession.created_at
+                >= datetime.combine(start_date, datetime.min.time())
+            )
+            .filter(
+                StockOpnameSession.created_at
+                <= datetime.combine(end_date, datetime.max.time())
+            )
+            .order_by(StockOpnameSession.created_at.desc())
+            .all()
+        )
+
+    totals = {
+        "sessions": len(sessions),
+        "items": 0,
+        "over": 0,
+        "short": 0,
+    }
+    daily_map = defaultdict(lambda: {"count": 0, "over": 0, "short": 0})
+    product_variances = defaultdict(lambda: {"name": "", "diff": 0})
+
+    for session in sessions:
+        session_date = session.created_at.date() if session.created_at else today
+        diff = sum(item.difference_qty for item in session.items)
+        totals["items"] += len(session.items)
+        for item in session.items:
+            difference = item.difference_qty or 0
+            if difference > 0:
+                totals["over"] += difference
+                daily_map[session_date]["over"] += difference
+            elif difference < 0:
+                totals["short"] += difference
+                daily_map[session_date]["short"] += difference
+            product = item.product
+            key = item.product_id
+            if key not in product_variances and product:
+                product_variances[key]["name"] = product.nama_produk
+            product_variances[key]["diff"] += difference
+        daily_map[session_date]["count"] += 1
+
+    daily_points = [
+        {
+            "date": date.isoformat(),
+            "label": _format_date_id(date),
+            "sessions": values["count"],
+            "over": values["over"],
+            "short": values["short"],
+        }
+        for date, values in sorted(daily_map.items())
+    ]
+
+    top_variances = sorted(
+        product_variances.values(), key=lambda entry: abs(entry["diff"]), reverse=True
+    )[:5]
+
+    summary_cards = [
+        {
+            "label": "Total Sesi",
+            "value": totals["sessions"],
+            "icon": "fa-clipboard-check",
+            "accent": "text-primary",
+            "subtitle": "Rentang dipilih",
+        },
+        {
+            "label": "Item Dihitung",
+            "value": totals["items"],
+            "icon": "fa-boxes",
+            "accent": "text-success",
+            "subtitle": "Total baris opname",
+        },
+        {
+            "label": "Selisih +",
+            "value": totals["over"],
+            "icon": "fa-plus-circle",
+            "accent": "text-info",
+            "subtitle": "Penambahan stok",
+        },
+        {
+            "label": "Selisih -",
+            "value": totals["short"],
+            "icon": "fa-minus-circle",
+            "accent": "text-danger",
+            "subtitle": "Pengurangan stok",
+        },
+    ]
+
+    recent_sessions = []
+    for session in sessions[:5]:
+        diff_total = 0
+        plus_total = 0
+        minus_total = 0
+        for item in session.items:
+            difference = item.difference_qty or 0
+            diff_total += difference
+            if difference > 0:
+                plus_total += difference
+            elif difference < 0:
+                minus_total += abs(difference)
+        recent_sessions.append(
+            {
+                "reference": session.reference,
+                "date": (
+                    _format_date_id(session.created_at.date())
+                    if session.created_at
+                    else "-"
+                ),
+                "user": session.user.username if session.user else "System",
+                "location": session.location or "-",
+                "items": len(session.items),
+                "diff": diff_total,
+                "plus": plus_total,
+                "minus": minus_total,
+            }
+        )
+
+    range_label = f"{_format_date_id(start_date)} - {_format_date_id(end_date)}"
+    filter_values = {
+        "start_date": start_date.strftime("%Y-%m-%d"),
+        "end_date": end_date.strftime("%Y-%m-%d"),
+    }
+
+    return render_template(
+        "laporan_stok_opname.html",
+        summary_cards=summary_cards,
+        daily_points=daily_points,
+        top_variances=top_variances,
+        recent_sessions=recent_sessions,
+        totals=totals,
+        range_label=range_label,
+        filter_values=filter_values,
+        opname_ready=opname_ready,
+    )
+
+
+@bp.route("/laporan/stok-barang")
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def laporan_stok_barang():
+    search_query = (request.args.get("search") or "").strip()
+    kategori_filter = request.args.get("kategori")
+    supplier_filter = request.args.get("supplier")
+
+    filtered_query = Produk.query
+    if search_query:
+        like = f"%{search_query}%"
+        filtered_query = filtered_query.filter(
+            or_(
+                Produk.nama_produk.ilike(like),
+                Produk.kode_produk.ilike(like),
+                Produk.sku.ilike(like),
+            )
+        )
+    if kategori_filter:
+        filtered_query = filtered_query.filter(Produk.kategori_id == kategori_filter)
+    if supplier_filter:
+        filtered_query = filtered_query.filter(Produk.supplier_id == supplier_filter)
+
+    query = filtered_query.options(
+        joinedload(Produk.kategori),
+        joinedload(Produk.supplier),
+        joinedload(Produk.satuan),
+    )
+
+    page = request.args.get("page", 1, type=int)
+    per_page = request.args.get("per_page", 15, type=int)
+    per_page = max(5, min(per_page, 100))
+
+    base_query = query.order_by(Produk.nama_produk.asc())
+    pagination = base_query.paginate(page=page, per_page=per_page, error_out=False)
+    products = pagination.items
+    total_products = pagination.total
+    aggregate = (
+        filtered_query.with_entities(
+            func.coalesce(func.sum(Produk.stok_lama), 0).label("total_stock"),
+            func.coalesce(
+                func.sum(
+                    Produk.stok_lama
+                    * func.coalesce(
+                        Produk.harga_lama, Produk.harga_beli, Produk.harga, 0.0
+                    )
+                ),
+                0.0,
+            ).label("total_value"),
+            func.coalesce(
+                func.sum(
+                    Produk.stok_lama * func.coalesce(Produk.harga, 0.0)
+                ),
+                0.0,
+            ).label("total_sell_value"),
+        ).first()
+    )
+    total_stock = int(aggregate.total_stock or 0) if aggregate else 0
+    total_value = float(aggregate.total_value or 0.0) if aggregate else 0.0
+    total_sell_value = (
+        float(aggregate.total_sell_value or 0.0) if aggregate else 0.0
+    )
+
+    low_stock_items = []
+    category_map = defaultdict(lambda: {"label": "Tanpa kategori", "stock": 0})
+
+    product_rows = []
+    for product in products:
+        stock = int(product.stok_lama or 0)
+        cost = _product_cost_basis(product)
+        price = float(product.harga or 0.0)
+        minimal = int(product.stok_minimal or 0)
+        low_stock = minimal > 0 and stock <= minimal
+        if low_stock:
+            low_stock_items.append(
+                {
+                    "name": product.nama_produk,
+                    "code": product.kode_produk,
+                    "stock": stock,
+                    "minimal": minimal,
+                    "supplier": (
+                        product.supplier.name if product.supplier else "Tanpa supplier"
+                    ),
+                }
+            )
+        category_name = product.kategori.name if product.kategori else "Tanpa kategori"
+        category_entry = category_map[category_name]
+        category_entry["label"] = category_name
+        category_entry["stock"] += stock
+
+        product_rows.append(
+            {
+                "id": product.id,
+                "name": product.nama_produk,
+                "code": product.kode_produk,
+                "sku": product.sku or "-",
+                "kategori": category_name,
+                "supplier": (
+                    product.supplier.name if product.supplier else "Tanpa supplier"
+                ),
+                "stock": stock,
+                "minimal": minimal,
+                "cost": cost,
+                "price": price,
+                "value": stock * cost,
+                "unit_value": stock * cost / stock if stock else cost,
+            }
+        )
+
+    low_stock_items = sorted(low_stock_items, key=lambda item: item["stock"])[:5]
+    category_distribution = sorted(
+        category_map.values(), key=lambda entry: entry["stock"], reverse=True
+    )
+
+    summary_cards = [
+        {
+            "label": "Produk Ditampilkan",
+            "value": total_products,
+            "icon": "fa-box-open",
+            "accent": "text-primary",
+            "subtitle": f"Halaman {pagination.page} dari {pagination.pages}" if pagination.pages else "Sesuai filter",
+        },
+        {
+            "label": "Total Stok (pcs)",
+            "value": total_stock,
+            "icon": "fa-layer-group",
+            "accent": "text-success",
+            "subtitle": "Jumlah unit fisik",
+        },
+        {
+            "label": "Nilai HPP",
+            "value": total_value,
+            "icon": "fa-coins",
+            "accent": "text-warning",
+            "subtitle": "Stok × biaya",
+        },
+        {
+            "label": "Nilai Jual",
+            "value": total_sell_value,
+            "icon": "fa-wallet",
+            "accent": "text-info",
+            "subtitle": "Potensi revenue",
+        },
+    ]
+
+    filter_values = {
+        "search": search_query,
+        "kategori": kategori_filter or "",
+        "supplier": supplier_filter or "",
+    }
+
+    kategori_options = Kategori.query.order_by(Kategori.name.asc()).all()
+    supplier_options = Supplier.query.order_by(Supplier.name.asc()).all()
+
+    return render_template(
+        "laporan_stok_barang.html",
+        summary_cards=summary_cards,
+        products=product_rows,
+        low_stock_items=low_stock_items,
+        category_distribution=category_distribution,
+        filter_values=filter_values,
+        kategori_options=kategori_options,
+        supplier_options=supplier_options,
+        pagination=pagination,
+        page=page,
+        per_page=per_page,
+        pagination_args={k: v for k, v in request.args.to_dict().items() if k != "page"},
+    )
+
+
+@bp.route("/laporan/shift")
+@login_required
+@roles_required(*ADMIN_ONLY)
+def laporan_shift():
+    today = local_today()
+    default_start = today.replace(day=1)
+    start_date = _parse_date_param(request.args.get("start_date")) or default_start
+    end_date = _parse_date_param(request.args.get("end_date")) or today
+    if end_date < start_date:
+        start_date, end_date = end_date, start_date
+
+    user_id = _parse_int_param(request.args.get("user"))
+    status = (request.args.get("status") or "all").strip().lower()
+    if status not in {"all", "open", "closed", "auto"}:
+        status = "all"
+
+    filters = [
+        CashierShift.shift_date >= start_date,
+        CashierShift.shift_date <= end_date,
+    ]
+    if user_id:
+        filters.append(CashierShift.user_id == user_id)
+    if status == "open":
+        filters.append(CashierShift.closed_at.is_(None))
+    elif status == "closed":
+        filters.append(CashierShift.closed_at.isnot(None))
+        filters.append(CashierShift.forced_close.is_(False))
+    elif status == "auto":
+        filters.append(CashierShift.closed_at.isnot(None))
+        filters.append(CashierShift.forced_close.is_(True))
+
+    shifts = (
+        CashierShift.query.options(
+            joinedload(CashierShift.user),
+            joinedload(CashierShift.closed_by_user),
+        )
+        .filter(*filters)
+        .order_by(CashierShift.opened_at.desc())
+        .all()
+    )
+
+    def format_minutes(total_minutes):
+        total_minutes = max(int(total_minutes), 0)
+        hours = total_minutes // 60
+        minutes = total_minutes % 60
+        if hours and minutes:
+            return f"{hours}j {minutes}m"
+        if hours:
+            return f"{hours}j"
+        return f"{minutes}m"
+
+    def format_duration(start, end):
+        if not start or not end:
+            return "-"
+        total_minutes = int((end - start).total_seconds() / 60)
+        return format_minutes(total_minutes)
+
+    total_shifts = len(shifts)
+    open_count = sum(1 for shift in shifts if shift.closed_at is None)
+    auto_count = sum(1 for shift in shifts if shift.closed_at and shift.forced_close)
+    closed_count = total_shifts - open_count
+    manual_closed_count = max(closed_count - auto_count, 0)
+
+    duration_minutes = 0
+    closed_shift_count = 0
+    for shift in shifts:
+        if shift.opened_at and shift.closed_at:
+            duration_minutes += int(
+                (shift.closed_at - shift.opened_at).total_seconds() / 60
+            )
+            closed_shift_count += 1
+    avg_duration_label = (
+        format_minutes(duration_minutes / closed_shift_count)
+        if closed_shift_count
+        else "-"
+    )
+
+    # total per shift dari rekap harian (tanpa join ke detail yang menggandakan total)
+    range_summary = summary_totals(
+        *filters,
+        query=db.session.query(SalesDailySummary).join(
+            CashierShift, SalesDailySummary.shift_id == CashierShift.id
+        ),
+    )
+    total_sales_count = range_summary["orders"]
+    total_gross = range_summary["total_amount"]
+    total_net = range_summary["net_revenue"]
+    total_items = range_summary["units"]
+
+    shift_ids = [shift.id for shift in shifts]
+    sales_map = {}
+    if shift_ids:
+        for shift_id, values in summary_grouped(
+            [SalesDailySummary.shift_id],
+            SalesDailySummary.shift_id.in_(shift_ids),
+        ):
+            sales_map[shift_id] = {
+                "transactions": values["orders"],
+                "gross_total": values["total_amount"],
+                "net_total": values["net_revenue"],
+                "items": values["units"],
+            }
+
+    now = local_now()
+    shift_rows = []
+    user_summary = {}
+    for shift in shifts:
+        summary = sales_map.get(
+            shift.id,
+            {"transactions": 0, "gross_total": 0.0, "net_total": 0.0, "items": 0},
+        )
+        is_open = shift.closed_at is None
+        duration_label = format_duration(
+            shift.opened_at, shift.closed_at if shift.closed_at else now
+        )
+        if is_open:
+            status_label = "Aktif"
+            status_class = "badge-warning"
+        elif shift.forced_close:
+            status_label = "Auto-close"
+            status_class = "badge-danger"
+        else:
+            status_label = "Selesai"
+            status_class = "badge-success"
+
+        shift_rows.append(
+            {
+                "id": shift.id,
+                "user_id": shift.user_id,
+                "user_name": shift.user.username if shift.user else "-",
+                "shift_date": shift.shift_date,
+                "opened_at": shift.opened_at,
+                "closed_at": shift.closed_at,
+                "closed_by": shift.closed_by_user.username
+                if shift.closed_by_user
+                else "-",
+                "forced_close": shift.forced_close,
+                "note": shift.note or "-",
+                "duration": duration_label,
+                "is_open": is_open,
+                "status_label": status_label,
+                "status_class": status_class,
+                "transactions": summary["transactions"],
+                "gross_total": summary["gross_total"],
+                "net_total": summary["net_total"],
+                "items_count": summary["items"],
+            }
+        )
+
+        entry = user_summary.setdefault(
+            shift.user_id,
+            {
+                "user_id": shift.user_id,
+                "user_name": shift.user.username if shift.user else "-",
+                "shift_count": 0,
+                "open_count": 0,
+                "auto_count": 0,
+                "transactions": 0,
+                "net_total": 0.0,
+            },
+        )
+        entry["shift_count"] += 1
+        if is_open:
+            entry["open_count"] += 1
+        if shift.forced_close:
+            entry["auto_count"] += 1
+        entry["transactions"] += summary["transactions"]
+        entry["net_total"] += summary["net_total"]
+
+    user_summary_rows = sorted(
+        user_summary.values(),
+        key=lambda row: (row["net_total"], row["shift_count"]),
+        reverse=True,
+    )
+
+    daily_map = {}
+    for shift in shifts:
+        date_key = shift.shift_date or (
+            shift.opened_at.date() if shift.opened_at else None
+        )
+        if not date_key:
+            continue
+        entry = daily_map.setdefault(
+            date_key, {"shift_count": 0, "transactions": 0, "net_total": 0.0}
+        )
+        entry["shift_count"] += 1
+        summary = sales_map.get(
+            shift.id,
+            {"transactions": 0, "gross_total": 0.0, "net_total": 0.0, "items": 0},
+        )
+        entry["transactions"] += summary["transactions"]
+        entry["net_total"] += summary["net_total"]
+
+    daily_points = [
+        {
+            "label": _format_date_id(date_key),
+            "shift_count": data["shift_count"],
+            "transactions": data["transactions"],
+            "net_total": round(data["net_total"], 2),
+        }
+        for date_key, data in sorted(daily_map.items())
+    ]
+
+    summary_cards = [
+        {
+            "label": "Total Shift",
+            "value": total_shifts,
+            "icon": "fa-calendar-check",
+            "accent": "text-primary",
+            "subtitle": f"{manual_closed_count} selesai manual",
+            "type": "count",
+        },
+        {
+            "label": "Shift Aktif",
+            "value": open_count,
+            "icon": "fa-user-clock",
+            "accent": "text-warning",
+            "subtitle": f"{auto_count} auto-close",
+            "type": "count",
+        },
+        {
+            "label": "Total Transaksi",
+            "value": total_sales_count,
+            "icon": "fa-receipt",
+            "accent": "text-info",
+            "subtitle": f"{int(total_items)} item terjual",
+            "type": "count",
+        },
+        {
+            "label": "Revenue Kotor",
+            "value": total_gross,
+            "icon": "fa-coins",
+            "accent": "text-success",
+            "subtitle": "Akumulasi per shift",
+            "type": "currency",
+        },
+        {
+            "label": "Revenue Bersih",
+            "value": total_net,
+            "icon": "fa-chart-line",
+            "accent": "text-primary",
+            "subtitle": "Sudah dikurangi biaya MP",
+            "type": "currency",
+        },
+        {
+            "label": "Rata-rata Durasi",
+            "value": avg_duration_label,
+            "icon": "fa-stopwatch",
+            "accent": "text-secondary",
+            "subtitle": f"{closed_shift_count} shift selesai",
+            "type": "text",
+        },
+    ]
+
+    filter_values = {
+        "start_date": start_date.strftime("%Y-%m-%d"),
+        "end_date": end_date.strftime("%Y-%m-%d"),
+        "user": user_id or "",
+        "status": status,
+    }
+    range_label = f"{_format_date_id(start_date)} - {_format_date_id(end_date)}"
+    filter_active = (
+        start_date != default_start
+        or end_date != today
+        or user_id
+        or status != "all"
+    )
+
+    cashier_options = (
+        User.query.filter(User.role.in_(SALES_ROLES))
+        .order_by(User.username.asc())
+        .all()
+    )
+
+    return render_template(
+        "laporan_shift.html",
+        summary_cards=summary_cards,
+        shift_rows=shift_rows,
+        user_summary_rows=user_summary_rows,
+        cashier_options=cashier_options,
+        filter_values=filter_values,
+        filter_active=filter_active,
+        range_label=range_label,
+        total_shifts=total_shifts,
+        daily_points=daily_points,
+    )
+
+
+@bp.route("/laporan/shift/export")
+@login_required
+@roles_required(*ADMIN_ONLY)
+def laporan_shift_export():
+    today = local_today()
+    default_start = today.replace(day=1)
+    start_date = _parse_date_param(request.args.get("start_date")) or default_start
+    end_date = _parse_date_param(request.args.get("end_date")) or today
+    if end_date < start_date:
+        start_date, end_date = end_date, start_date
+
+    user_id = _parse_int_param(request.args.get("user"))
+    status = (request.args.get("status") or "all").strip().lower()
+    if status not in {"all", "open", "closed", "auto"}:
+        status = "all"
+
+    filters = [
+        CashierShift.shift_date >= start_date,
+        CashierShift.shift_date <= end_date,
+    ]
+    if user_id:
+        filters.append(CashierShift.user_id == user_id)
+    if status == "open":
+        filters.append(CashierShift.closed_at.is_(None))
+    elif status == "closed":
+        filters.append(CashierShift.closed_at.isnot(None))
+        filters.append(CashierShift.forced_close.is_(False))
+    elif status == "auto":
+        filters.append(CashierShift.closed_at.isnot(None))
+        filters.append(CashierShift.forced_close.is_(True))
+
+    shifts = (
+        CashierShift.query.options(
+            joinedload(CashierShift.user),
+            joinedload(CashierShift.closed_by_user),
+        )
+        .filter(*filters)
+        .order_by(CashierShift.opened_at.desc())
+        .all()
+    )
+
+    shift_ids = [shift.id for shift in shifts]
+    sales_map = {}
+    if shift_ids:
+        for shift_id, values in summary_grouped(
+            [SalesDailySummary.shift_id],
+            SalesDailySummary.shift_id.in_(shift_ids),
+        ):
+            sales_map[shift_id] = {
+                "transactions": values["orders"],
+                "net_total": values["net_revenue"],
+                "items": values["units"],
+            }
+
+    def format_datetime(dt):
+        if not dt:
+            return ""
+        return dt.strftime("%Y-%m-%d %H:%M")
+
+    def format_date(value):
+        if not value:
+            return ""
+        return value.strftime("%Y-%m-%d")
+
+    output = StringIO()
+    writer = csv.writer(output)
+    writer.writerow(
+        [
+            "Shift ID",
+            "Tanggal Shift",
+            "Kasir",
+            "Mulai",
+            "Selesai",
+            "Durasi Menit",
+            "Status",
+            "Auto Close",
+            "Ditutup Oleh",
+            "Transaksi",
+            "Item",
+            "Revenue Bersih",
+            "Catatan",
+        ]
+    )
+
+    for shift in shifts:
+        summary = sales_map.get(
+            shift.id, {"transactions": 0, "net_total": 0.0, "items": 0}
+        )
+        if shift.closed_at and shift.opened_at:
+            duration_minutes = int(
+                (shift.closed_at - shift.opened_at).total_seconds() / 60
+            )
+        elif shift.opened_at:
+            duration_minutes = int(
+                (local_now() - shift.opened_at).total_seconds() / 60
+            )
+        else:
+            duration_minutes = 0
+
+        if shift.closed_at is None:
+            status_label = "Aktif"
+        elif shift.forced_close:
+            status_label = "Auto-close"
+        else:
+            status_label = "Selesai"
+
+        writer.writerow(
+            [
+                shift.id,
+                format_date(shift.shift_date),
+                shift.user.username if shift.user else "-",
+                format_datetime(shift.opened_at),
+                format_datetime(shift.closed_at),
+                max(duration_minutes, 0),
+                status_label,
+                "Ya" if shift.forced_close else "Tidak",
+                shift.closed_by_user.username if shift.closed_by_user else "-",
+                summary["transactions"],
+                summary["items"],
+                summary["net_total"],
+                shift.note or "",
+            ]
+        )
+
+    filename = f"laporan_shift_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}.csv"
+    output.seek(0)
+    return Response(
+        output.getvalue(),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
+@bp.route("/laporan/penjualan")
+@login_required
+@roles_required(*SALES_ROLES)
+def laporan_penjualan_report():
+    today = local_today()
+    default_start = today.replace(day=1)
+    start_date = _parse_date_param(request.args.get("start_date")) or default_start
+    end_date = _parse_date_param(request.args.get("end_date")) or today
+    if end_date < start_date:
+        start_date, end_date = end_date, start_date
+
+    search_query = (request.args.get("search") or "").strip()
+    selected_sales_id = request.args.get("sales")
+    selected_customer_id = request.args.get("customer")
+    try:
+        selected_sales_id = int(selected_sales_id) if selected_sales_id else None
+    except (TypeError, ValueError):
+        selected_sales_id = None
+    try:
+        selected_customer_id = int(selected_customer_id) if selected_customer_id else None
+    except (TypeError, ValueError):
+        selected_customer_id = None
+
+    sales_query = (
+        Penjualan.query.options(
+            joinedload(Penjualan.detail_penjualan).joinedload(DetailPenjualan.produk),
+            joinedload(Penjualan.pelanggan),
+            joinedload(Penjualan.sales),
+            joinedload(Penjualan.payment_channel),
+        )
+        .filter(Penjualan.tanggal_penjualan >= start_date)
+        .filter(Penjualan.tanggal_penjualan <= end_date)
+        .order_by(Penjualan.tanggal_penjualan.asc(), Penjualan.id.asc())
+    )
+
+    if selected_sales_id:
+        sales_query = sales_query.filter(Penjualan.sales_id == selected_sales_id)
+    if selected_customer_id:
+        sales_query = sales_query.filter(Penjualan.pelanggan_id == selected_customer_id)
+    if search_query:
+        like = f"%{search_query}%"
+        sales_query = (
+            sales_query.join(Penjualan.pelanggan)
+            .join(Penjualan.sales)
+            .filter(
+                or_(
+                    Penjualan.no_faktur.ilike(like),
+                    Pelanggan.nama.ilike(like),
+                    User.username.ilike(like),
+                )
+            )
+        )
+    sales_records = sales_query.all()
+
+    totals = {
+        "gross_revenue": 0.0,
+        "net_revenue": 0.0,
+        "discount": 0.0,
+        "tax": 0.0,
+        "cogs": 0.0,
+        "gross_profit": 0.0,
+        "net_profit": 0.0,
+        "marketplace_costs": 0.0,
+        "orders": len(sales_records),
+        "items": 0,
+    }
+    daily_map = defaultdict(lambda: {"revenue": 0.0, "gross": 0.0})
+    monthly_map = defaultdict(lambda: {"revenue": 0.0, "gross": 0.0, "orders": 0})
+    product_map = defaultdict(
+        lambda: {"name": "Produk dihapus", "units": 0, "revenue": 0.0, "gross": 0.0}
+    )
+    customer_map = defaultdict(
+        lambda: {"name": "Pelanggan umum", "orders": 0, "revenue": 0.0}
+    )
+    sales_map = defaultdict(
+        lambda: {"name": "Sales", "orders": 0, "revenue": 0.0}
+    )
+    largest_invoice = {"amount": 0.0, "customer": "Pelanggan umum", "date": "-"}
+    transaction_details = []
+
+    for sale in sales_records:
+        sale_date = sale.tanggal_penjualan or today
+        month_key = (sale_date.year, sale_date.month)
+        invoice_revenue = 0.0
+        invoice_gross = 0.0
+        invoice_total = 0.0
+        gross_subtotal_sum = 0.0
+        discount_sum = 0.0
+        tax_sum = 0.0
+        cost_sum = 0.0
+        item_rows = []
+
+        for detail in sale.detail_penjualan:
+            qty = detail.jumlah or 0
+            price = detail.harga_satuan or 0.0
+            discount_pct = detail.diskon or 0.0
+            tax_pct = detail.pajak or 0.0
+
+            base_total = price * qty
+            discount_value = base_total * (discount_pct / 100.0)
+            taxable = base_total - discount_value
+            tax_value = taxable * (tax_pct / 100.0)
+            line_total = taxable + tax_value
+
+            product_cost = 0.0
+            if detail.produk:
+                product_cost = (
+                    detail.produk.harga_lama
+                    or detail.produk.harga_beli
+                    or detail.produk.harga
+                    or 0.0
+                )
+            cost_value = product_cost * qty
+            gross_value = taxable - cost_value
+
+            totals["items"] += qty
+            totals["gross_revenue"] += taxable
+            totals["discount"] += discount_value
+            totals["tax"] += tax_value
+            totals["cogs"] += cost_value
+            totals["gross_profit"] += gross_value
+
+            invoice_revenue += taxable
+            invoice_gross += gross_value
+            invoice_total += line_total
+            gross_subtotal_sum += base_total
+            discount_sum += discount_value
+            tax_sum += tax_value
+            cost_sum += cost_value
+
+            item_rows.append(
+                {
+                    "product_id": detail.produk.id if detail.produk else None,
+                    "product_name": (
+                        detail.produk.nama_produk if detail.produk else detail.produk_id
+                    ),
+                    "sku": detail.produk.sku if detail.produk else "-",
+                    "qty": qty,
+                    "unit_price": price,
+                    "discount_percent": discount_pct,
+                    "discount_value": discount_value,
+                    "tax_percent": tax_pct,
+                    "tax_value": tax_value,
+                    "line_total": line_total,
+                    "cost_value": cost_value,
+                    "gross_value": gross_value,
+                }
+            )
+
+            product_key = detail.produk.id if detail.produk else f"detail-{detail.id}"
+            if detail.produk:
+                product_map[product_key]["name"] = detail.produk.nama_produk
+            product_map[product_key]["units"] += qty
+            product_map[product_key]["revenue"] += taxable
+            product_map[product_key]["gross"] += gross_value
+
+        cost_total = float(sale.marketplace_cost_total or 0.0)
+        net_invoice_revenue = max(invoice_revenue - cost_total, 0.0)
+        totals["marketplace_costs"] += cost_total
+        totals["net_revenue"] += net_invoice_revenue
+        daily_map[sale_date]["revenue"] += invoice_revenue
+        daily_map[sale_date]["gross"] += invoice_gross
+        monthly_map[month_key]["revenue"] += invoice_revenue
+        monthly_map[month_key]["gross"] += invoice_gross
+        monthly_map[month_key]["orders"] += 1
+
+        customer_key = sale.pelanggan_id or f"anon-{sale.id}"
+        customer_entry = customer_map[customer_key]
+        if sale.pelanggan:
+            customer_entry["name"] = sale.pelanggan.nama
+        customer_entry["orders"] += 1
+        customer_entry["revenue"] += net_invoice_revenue
+
+        sales_key = sale.sales_id or f"sales-{sale.id}"
+        sales_entry = sales_map[sales_key]
+        if sale.sales:
+            sales_entry["name"] = sale.sales.username
+        sales_entry["orders"] += 1
+        sales_entry["revenue"] += net_invoice_revenue
+
+        if invoice_total > largest_invoice["amount"]:
+            largest_invoice["amount"] = invoice_total
+            largest_invoice["customer"] = (
+                sale.pelanggan.nama if sale.pelanggan else "Pelanggan umum"
+            )
+            largest_invoice["date"] = _format_date_id(sale_date)
+
+        net_subtotal = gross_subtotal_sum - discount_sum
+        staff_name = sale.sales.username if sale.sales else "Sales"
+        customer_name = sale.pelanggan.nama if sale.pelanggan else "Umum"
+        customer_code = sale.pelanggan.pelanggan_id if sale.pelanggan else "-"
+        price_level_name = (
+            sale.pelanggan.price_level.name
+            if sale.pelanggan and sale.pelanggan.price_level
+            else "Harga standar"
+        )
+        payment_label = sale.payment_method or "Belum dicatat"
+        if sale.payment_method in {"Kartu", "Transfer", "QRIS"}:
+            if sale.payment_channel and sale.payment_channel.name:
+                payment_label = f"{sale.payment_method} - {sale.payment_channel.name}"
+        items_count = sum(item["qty"] for item in item_rows)
+        transaction_details.append(
+            {
+                "id": sale.id,
+                "invoice": sale.no_faktur,
+                "timestamp": _format_date_id(sale_date),
+                "staff": staff_name,
+                "customer": {"name": customer_name, "code": customer_code},
+                "items": item_rows,
+                "line_items": item_rows,
+                "items_count": items_count,
+                "subtotal_before_discount": gross_subtotal_sum,
+                "total_discount": discount_sum,
+                "net_subtotal": net_subtotal,
+                "tax_total": tax_sum,
+                "grand_total": net_subtotal + tax_sum,
+                "shipping_fee": 0.0,
+                "extra_fee": 0.0,
+                "payment_method": payment_label,
+                "price_level": price_level_name,
+                "note": "-",
+                "status": "Selesai",
+                "cost_total": cost_sum,
+                "marketplace_cost_total": cost_total,
+                "gross_profit": net_subtotal - cost_sum,
+                "net_profit": net_invoice_revenue - cost_sum,
+                "net_revenue": net_invoice_revenue,
+                "print_link": url_for("main.penjualan_receipt", sale_id=sale.id),
+            }
+        )
+
+    totals["net_profit"] = totals["gross_profit"] - totals["marketplace_costs"]
+    average_order = (
+        totals["net_revenue"] / totals["orders"] if totals["orders"] else 0.0
+    )
+    gross_margin_percent = (
+        (totals["gross_profit"] / totals["gross_revenue"]) * 100
+        if totals["gross_revenue"]
+        else 0.0
+    )
+    net_margin_percent = (
+        (totals["net_profit"] / totals["net_revenue"]) * 100
+        if totals["net_revenue"]
+        else 0.0
+    )
+
+    daily_points = [
+        {
+            "date": date_key.isoformat(),
+            "label": _format_date_id(date_key),
+            "revenue": round(values["revenue"], 2),
+            "gross": round(values["gross"], 2),
+        }
+        for date_key, values in sorted(daily_map.items())
+    ]
+
+    monthly_breakdown = [
+        {
+            "label": datetime(year=year, month=month, day=1).strftime("%b %Y"),
+            "revenue": values["revenue"],
+            "gross": values["gross"],
+            "orders": values["orders"],
+            "avg_order": (
+                (values["revenue"] / values["orders"]) if values["orders"] else 0.0
+            ),
+        }
+        for (year, month), values in sorted(monthly_map.items())
+    ]
+
+    top_products = sorted(
+        product_map.values(), key=lambda entry: entry["revenue"], reverse=True
+    )[:5]
+    top_customers = sorted(
+        customer_map.values(), key=lambda entry: entry["revenue"], reverse=True
+    )[:5]
+    sales_breakdown = [
+        entry for entry in sales_map.values() if entry["revenue"]
+    ]
+    sales_breakdown = sorted(
+        sales_breakdown, key=lambda entry: entry["revenue"], reverse=True
+    )
+    customer_breakdown = [
+        entry for entry in customer_map.values() if entry["revenue"]
+    ]
+    customer_breakdown = sorted(
+        customer_breakdown, key=lambda entry: entry["revenue"], reverse=True
+    )
+
+    summary_cards = [
+        {
+            "label": "Pendapatan Kotor",
+            "value": totals["gross_revenue"],
+            "icon": "fa-coins",
+            "accent": "text-primary",
+            "subtitle": "Setelah diskon, sebelum biaya marketplace",
+        },
+        {
+            "label": "Pendapatan Bersih",
+            "value": totals["net_revenue"],
+            "icon": "fa-wallet",
+            "accent": "text-info",
+            "subtitle": "Setelah biaya marketplace",
+        },
+        {
+            "label": "Biaya Marketplace",
+            "value": totals["marketplace_costs"],
+            "icon": "fa-coins",
+            "accent": "text-danger",
+            "subtitle": "Komisi, cashback, bebas ongkir",
+        },
+        {
+            "label": "Laba Kotor",
+            "value": totals["gross_profit"],
+            "icon": "fa-chart-line",
+            "accent": "text-success",
+            "subtitle": f"Margin kotor {gross_margin_percent:.1f}%",
+        },
+        {
+            "label": "Laba Bersih",
+            "value": totals["net_profit"],
+            "icon": "fa-balance-scale",
+            "accent": "text-success",
+            "subtitle": f"Margin bersih {net_margin_percent:.1f}%",
+        },
+        {
+            "label": "Transaksi",
+            "value": totals["orders"],
+            "icon": "fa-receipt",
+            "accent": "text-info",
+            "subtitle": "Jumlah faktur",
+        },
+    ]
+
+    insight_cards = [
+        {
+            "title": "Rata-rata Order",
+            "value": average_order,
+            "type": "currency",
+            "description": "Nilai penjualan bersih per faktur.",
+        },
+        {
+            "title": "Barang Terjual",
+            "value": totals["items"],
+            "type": "count",
+            "description": "Total unit yang keluar.",
+        },
+        {
+            "title": "Diskon Diberikan",
+            "value": totals["discount"],
+            "type": "currency",
+            "description": "Potongan harga keseluruhan.",
+        },
+        {
+            "title": "Faktur terbesar",
+            "value": largest_invoice["amount"],
+            "type": "currency",
+            "description": f"{largest_invoice['customer']} • {largest_invoice['date']}",
+        },
+    ]
+
+    filter_values = {
+        "start_date": start_date.strftime("%Y-%m-%d"),
+        "end_date": end_date.strftime("%Y-%m-%d"),
+        "sales": selected_sales_id or "",
+        "customer": selected_customer_id or "",
+        "search": search_query,
+    }
+    range_label = f"{_format_date_id(start_date)} - {_format_date_id(end_date)}"
+
+    sales_options = (
+        User.query.filter(User.role.in_(SALES_ROLES)).order_by(User.username.asc()).all()
+    )
+    customer_options = Pelanggan.query.order_by(Pelanggan.nama.asc()).all()
+
+    return render_template(
+        "laporan_penjualan.html",
+        summary_cards=summary_cards,
+        insight_cards=insight_cards,
+        top_products=top_products,
+        top_customers=top_customers,
+        daily_points=daily_points,
+        monthly_breakdown=monthly_breakdown,
+        totals=totals,
+        average_order=average_order,
+        gross_margin_percent=gross_margin_percent,
+        net_margin_percent=net_margin_percent,
+        range_label=range_label,
+        filter_values=filter_values,
+        sales_options=sales_options,
+        customer_options=customer_options,
+        largest_invoice=largest_invoice,
+        transaction_details=transaction_details,
+        sales_breakdown=sales_breakdown,
+        customer_breakdown=customer_breakdown,
+    )
+
+
+@bp.route("/laporan/penjualan/print")
+@login_required
+@roles_required(*SALES_ROLES)
+def laporan_penjualan_print():
+    today = local_today()
+    default_start = today.replace(day=1)
+    start_date = _parse_date_param(request.args.get("start_date")) or default_start
+    end_date = _parse_date_param(request.args.get("end_date")) or today
+    if end_date < start_date:
+        start_date, end_date = end_date, start_date
+
+    search_query = (request.args.get("search") or "").strip()
+    selected_sales_id = _parse_int_param(request.args.get("sales"))
+    selected_customer_id = _parse_int_param(request.args.get("customer"))
+
+    sales_query = (
+        Penjualan.query.options(
+            joinedload(Penjualan.detail_penjualan).joinedload(DetailPenjualan.produk),
+            joinedload(Penjualan.pelanggan),
+            joinedload(Penjualan.sales),
+            joinedload(Penjualan.payment_channel),
+        )
+        .filter(Penjualan.tanggal_penjualan >= start_date)
+        .filter(Penjualan.tanggal_penjualan <= end_date)
+        .order_by(Penjualan.tanggal_penjualan.asc(), Penjualan.id.asc())
+    )
+
+    if selected_sales_id:
+        sales_query = sales_query.filter(Penjualan.sales_id == selected_sales_id)
+    if selected_customer_id:
+        sales_query = sales_query.filter(Penjualan.pelanggan_id == selected_customer_id)
+    if search_query:
+        like = f"%{search_query}%"
+        sales_query = (
+            sales_query.join(Penjualan.pelanggan)
+            .join(Penjualan.sales)
+            .filter(
+                or_(
+                    Penjualan.no_faktur.ilike(like),
+                    Pelanggan.nama.ilike(like),
+                    User.username.ilike(like),
+                )
+            )
+        )
+
+    sales_records = sales_query.all()
+    rows = []
+    total_revenue = 0.0
+    total_orders = 0
+    total_items = 0
+
+    for sale in sales_records:
+        sale_date = sale.tanggal_penjualan or today
+        invoice_total = 0.0
+        items_count = 0
+        for detail in sale.detail_penjualan:
+            qty = detail.jumlah or 0
+            price = detail.harga_satuan or 0.0
+            discount_pct = detail.diskon or 0.0
+            tax_pct = detail.pajak or 0.0
+
+            base_total = price * qty
+            discount_value = base_total * (discount_pct / 100.0)
+            taxable = base_total - discount_value
+            tax_value = taxable * (tax_pct / 100.0)
+            line_total = taxable + tax_value
+
+            invoice_total += line_total
+            items_count += qty
+
+        cost_total = float(sale.marketplace_cost_total or 0.0)
+        net_total = max(invoice_total - cost_total, 0.0)
+
+        total_revenue += net_total
+        total_orders += 1
+        total_items += items_count
+
+        payment_label = sale.payment_method or "Belum dicatat"
+        if sale.payment_method in {"Kartu", "Transfer", "QRIS"} and sale.payment_channel:
+            if sale.payment_channel.name:
+                payment_label = f"{sale.payment_method} - {sale.payment_channel.name}"
+        due_label = "-"
+        if sale.payment_method == "Tempo" and sale.due_date:
+            due_label = _format_date_id(sale.due_date)
+
+        rows.append(
+            {
+                "invoice": sale.no_faktur,
+                "date": _format_date_id(sale_date),
+                "customer": sale.pelanggan.nama if sale.pelanggan else "Umum",
+                "sales": sale.sales.username if sale.sales else "Sales",
+                "payment_method": payment_label,
+                "due_date": due_label,
+                "items_count": items_count,
+                "total": net_total,
+            }
+        )
+
+    sales_name = "-"
+    if selected_sales_id:
+        sales_user = db.session.get(User, selected_sales_id)
+        if sales_user:
+            sales_name = sales_user.username
+    customer_name = "-"
+    if selected_customer_id:
+        customer = db.session.get(Pelanggan, selected_customer_id)
+        if customer:
+            customer_name = customer.nama
+
+    return render_template(
+        "laporan_penjualan_print.html",
+        rows=rows,
+        range_label=f"{_format_date_id(start_date)} - {_format_date_id(end_date)}",
+        search_query=search_query,
+        sales_name=sales_name,
+        customer_name=customer_name,
+        total_revenue=total_revenue,
+        total_orders=total_orders,
+        total_items=total_items,
+        printed_at=local_now(),
+        company_profile=_get_company_profile(),
+    )
+
+
+@bp.route("/laporan/piutang")
+@login_required
+@roles_required(*SALES_ROLES)
+def laporan_piutang():
+    today = local_today()
+    search_query = (request.args.get("search") or "").strip()
+    pelanggan_id = _parse_int_param(request.args.get("pelanggan"))
+    sales_id = _parse_int_param(request.args.get("sales"))
+    status_filter = (request.args.get("status") or "").strip()
+    start_due = _parse_date_param(request.args.get("start_due"))
+    end_due = _parse_date_param(request.args.get("end_due"))
+    sort_option = request.args.get("sort", "due_asc")
+    per_page = request.args.get("per_page", type=int) or 10
+    per_page = max(5, min(per_page, 50))
+    page = request.args.get("page", type=int) or 1
+    if page < 1:
+        page = 1
+
+    base_filters = [Penjualan.payment_method == "Tempo"]
+    if search_query:
+        like = f"%{search_query}%"
+        base_filters.append(
+            or_(
+                Penjualan.no_faktur.ilike(like),
+                Penjualan.pelanggan.has(Pelanggan.nama.ilike(like)),
+                Penjualan.sales.has(User.username.ilike(like)),
+            )
+        )
+    if pelanggan_id:
+        base_filters.append(Penjualan.pelanggan_id == pelanggan_id)
+    if sales_id:
+        base_filters.append(Penjualan.sales_id == sales_id)
+    if start_due:
+        base_filters.append(Penjualan.due_date >= start_due)
+    if end_due:
+        base_filters.append(Penjualan.due_date <= end_due)
+
+    outstanding_expr = Penjualan.total_harga - func.coalesce(Penjualan.amount_paid, 0)
+    status_filters = []
+    if status_filter == "open":
+        status_filters.append(outstanding_expr > 0)
+    elif status_filter == "overdue":
+        status_filters.append(
+            and_(outstanding_expr > 0, Penjualan.due_date < today)
+        )
+    elif status_filter == "upcoming":
+        status_filters.append(
+            and_(outstanding_expr > 0, Penjualan.due_date >= today)
+        )
+    elif status_filter == "paid":
+        status_filters.append(outstanding_expr <= 0)
+    elif status_filter == "nodue":
+        status_filters.append(
+            and_(outstanding_expr > 0, Penjualan.due_date.is_(None))
+        )
+
+    list_filters = base_filters + status_filters
+
+    def apply_filters(query, filters):
+        return query.filter(*filters) if filters else query
+
+    total_records = (
+        apply_filters(db.session.query(func.count(Penjualan.id)), list_filters)
+        .scalar()
+        or 0
+    )
+    total_pages = max(1, (total_records + per_page - 1) // per_page)
+    if page > total_pages:
+        page = total_pages
+    offset = (page - 1) * per_page
+
+    sort_map = {
+        "due_asc": Penjualan.due_date.asc(),
+        "due_desc": Penjualan.due_date.desc(),
+        "total_desc": Penjualan.total_harga.desc(),
+        "total_asc": Penjualan.total_harga.asc(),
+        "outstanding_desc": outstanding_expr.desc(),
+        "outstanding_asc": outstanding_expr.asc(),
+    }
+    order_clause = sort_map.get(sort_option, Penjualan.due_date.asc())
+
+    base_query = apply_filters(
+        Penjualan.query.options(
+            joinedload(Penjualan.pelanggan),
+            joinedload(Penjualan.sales),
+            joinedload(Penjualan.payment_channel),
+        ),
+        list_filters,
+    )
+    records = (
+        base_query.order_by(order_clause, Penjualan.id.desc())
+        .offset(offset)
+        .limit(per_page)
+        .all()
+    )
+
+    summary_base = base_filters
+    total_outstanding = (
+        apply_filters(
+            db.session.query(func.coalesce(func.sum(outstanding_expr), 0)),
+            summary_base + [outstanding_expr > 0],
+        ).scalar()
+        or 0.0
+    )
+    open_count = (
+        apply_filters(
+            db.session.query(func.count(Penjualan.id)),
+            summary_base + [outstanding_expr > 0],
+        ).scalar()
+        or 0
+    )
+    overdue_count = (
+        apply_filters(
+            db.session.query(func.count(Penjualan.id)),
+            summary_base + [outstanding_expr > 0, Penjualan.due_date < today],
+        ).scalar()
+        or 0
+    )
+    due_soon_end = today + timedelta(days=7)
+    due_soon_count = (
+        apply_filters(
+            db.session.query(func.count(Penjualan.id)),
+            summary_base
+            + [
+                outstanding_expr > 0,
+                Penjualan.due_date >= today,
+                Penjualan.due_date <= due_soon_end,
+            ],
+        ).scalar()
+        or 0
+    )
+    no_due_count = (
+        apply_filters(
+            db.session.query(func.count(Penjualan.id)),
+            summary_base + [outstanding_expr > 0, Penjualan.due_date.is_(None)],
+        ).scalar()
+        or 0
+    )
+
+    aging_summary = {
+        "current": 0.0,
+        "1_30": 0.0,
+        "31_60": 0.0,
+        "61_90": 0.0,
+        "90_plus": 0.0,
+        "no_due": 0.0,
+    }
+    aging_rows = apply_filters(
+        db.session.query(Penjualan.due_date, outstanding_expr),
+        summary_base + [outstanding_expr > 0],
+    ).all()
+    for due_date, outstanding in aging_rows:
+        outstanding = float(outstanding or 0.0)
+        if outstanding <= 0:
+            continue
+        if not due_date:
+            aging_summary["no_due"] += outstanding
+            continue
+        if due_date >= today:
+            aging_summary["current"] += outstanding
+            continue
+        days_overdue = (today - due_date).days
+        if days_overdue <= 30:
+            aging_summary["1_30"] += outstanding
+        elif days_overdue <= 60:
+            aging_summary["31_60"] += outstanding
+        elif days_overdue <= 90:
+            aging_summary["61_90"] += outstanding
+        else:
+            aging_summary["90_plus"] += outstanding
+
+    receivable_rows = []
+    for sale in records:
+        total = float(sale.total_harga or 0.0)
+        amount_paid = float(sale.amount_paid or 0.0)
+        outstanding = max(total - amount_paid, 0.0)
+        due_date = sale.due_date
+        status_label = "Lunas"
+        status_badge = "badge-soft-success"
+        status_hint = ""
+        if outstanding > 0:
+            if due_date:
+                delta_days = (due_date - today).days
+                if delta_days < 0:
+                    status_label = "Jatuh tempo"
+                    status_badge = "badge-soft-danger"
+                    status_hint = f"Terlambat {abs(delta_days)} hari"
+                elif delta_days == 0:
+                    status_label = "Jatuh tempo"
+                    status_badge = "badge-soft-warning"
+                    status_hint = "Jatuh tempo hari ini"
+                else:
+                    status_label = "Belum jatuh tempo"
+                    status_badge = "badge-soft-warning"
+                    status_hint = f"H-{delta_days} hari"
+            else:
+                status_label = "Tanpa tanggal"
+                status_badge = "badge-soft-secondary"
+                status_hint = "Isi tanggal tempo"
+
+        customer_name = sale.pelanggan.nama if sale.pelanggan else "Umum"
+        customer_code = sale.pelanggan.pelanggan_id if sale.pelanggan else "-"
+        sales_name = sale.sales.username if sale.sales else "-"
+
+        receivable_rows.append(
+            {
+                "id": sale.id,
+                "invoice": sale.no_faktur,
+                "sale_date": sale.tanggal_penjualan,
+                "due_date": due_date,
+                "customer_name": customer_name,
+                "customer_code": customer_code,
+                "sales_name": sales_name,
+                "total": total,
+                "amount_paid": amount_paid,
+                "outstanding": outstanding,
+                "status_label": status_label,
+                "status_badge": status_badge,
+                "status_hint": status_hint,
+            }
+        )
+
+    filter_active = any(
+        [search_query, pelanggan_id, sales_id, start_due, end_due, status_filter]
+    )
+
+    def _date_value_to_str(value):
+        return value.strftime("%Y-%m-%d") if value else ""
+
+    filter_values = {
+        "search": search_query,
+        "pelanggan": pelanggan_id or "",
+        "sales": sales_id or "",
+        "start_due": _date_value_to_str(start_due),
+        "end_due": _date_value_to_str(end_due),
+        "status": status_filter,
+    }
+
+    summary_cards = [
+        {
+            "label": "Total piutang",
+            "value": total_outstanding,
+            "type": "currency",
+            "icon": "fa-wallet",
+            "accent": "text-danger",
+            "description": "Nilai tempo yang masih terbuka.",
+        },
+        {
+            "label": "Tempo terbuka",
+            "value": open_count,
+            "type": "count",
+            "icon": "fa-file-invoice-dollar",
+            "accent": "text-primary",
+            "description": "Jumlah faktur yang belum lunas.",
+        },
+        {
+            "label": "Jatuh tempo",
+            "value": overdue_count,
+            "type": "count",
+            "icon": "fa-exclamation-triangle",
+            "accent": "text-danger",
+            "description": "Faktur melewati tanggal jatuh tempo.",
+        },
+        {
+            "label": "Tempo 7 hari",
+            "value": due_soon_count,
+            "type": "count",
+            "icon": "fa-hourglass-half",
+            "accent": "text-warning",
+            "description": "Jatuh tempo dalam 7 hari ke depan.",
+        },
+    ]
+    aging_cards = [
+        {
+            "label": "Belum jatuh tempo",
+            "value": aging_summary["current"],
+            "accent": "text-info",
+        },
+        {
+            "label": "1-30 hari",
+            "value": aging_summary["1_30"],
+            "accent": "text-warning",
+        },
+        {
+            "label": "31-60 hari",
+            "value": aging_summary["31_60"],
+            "accent": "text-warning",
+        },
+        {
+            "label": "61-90 hari",
+            "value": aging_summary["61_90"],
+            "accent": "text-danger",
+        },
+        {
+            "label": ">90 hari",
+            "value": aging_summary["90_plus"],
+            "accent": "text-danger",
+        },
+        {
+            "label": "Tanpa tanggal",
+            "value": aging_summary["no_due"],
+            "accent": "text-secondary",
+        },
+    ]
+
+    sales_options = (
+        User.query.filter(User.role.in_(SALES_ROLES)).order_by(User.username.asc()).all()
+    )
+    customer_options = Pelanggan.query.order_by(Pelanggan.nama.asc()).all()
+
+    query_args = request.args.to_dict(flat=True)
+    query_args.pop("page", None)
+    base_args = query_args.copy()
+    prev_url = (
+        url_for("main.laporan_piutang", page=page - 1, **base_args)
+        if page > 1
+        else None
+    )
+    next_url = (
+        url_for("main.laporan_piutang", page=page + 1, **base_args)
+        if page < total_pages
+        else None
+    )
+    page_window_start = max(1, page - 2)
+    page_window_end = min(total_pages, page + 2)
+    page_links = [
+        {
+            "number": number,
+            "url": url_for("main.laporan_piutang", page=number, **base_args),
+            "current": number == page,
+        }
+        for number in range(page_window_start, page_window_end + 1)
+    ]
+    pagination = {
+        "page": page,
+        "per_page": per_page,
+        "total_pages": total_pages,
+        "total_records": total_records,
+        "has_prev": page > 1,
+        "has_next": page < total_pages,
+        "prev_url": prev_url,
+        "next_url": next_url,
+        "page_links": page_links,
+    }
+
+    return render_template(
+        "laporan_piutang.html",
+        receivable_rows=receivable_rows,
+        summary_cards=summary_cards,
+        aging_cards=aging_cards,
+        filter_values=filter_values,
+        sort_option=sort_option,
+        per_page=per_page,
+        pagination=pagination,
+        filter_active=filter_active,
+        sales_options=sales_options,
+        customer_options=customer_options,
+        no_due_count=no_due_count,
+        total_outstanding=total_outstanding,
+        overdue_count=overdue_count,
+        format_date=_format_date_id,
+    )
+
+
+@bp.route("/laporan/utang")
+@login_required
+@roles_required(*ADMIN_ONLY)
+def laporan_utang():
+    today = local_today()
+    search_query = (request.args.get("search") or "").strip()
+    supplier_id = _parse_int_param(request.args.get("supplier"))
+    status_filter = (request.args.get("status") or "").strip()
+    start_due = _parse_date_param(request.args.get("start_due"))
+    end_due = _parse_date_param(request.args.get("end_due"))
+    sort_option = request.args.get("sort", "due_asc")
+    per_page = request.args.get("per_page", type=int) or 10
+    per_page = max(5, min(per_page, 50))
+    page = request.args.get("page", type=int) or 1
+    if page < 1:
+        page = 1
+
+    total_sub = _purchase_total_subquery()
+    paid_sub = _payable_payment_sum_subquery()
+    total_expr = func.coalesce(total_sub.c.total_amount, 0)
+    paid_expr = func.coalesce(paid_sub.c.amount_paid, 0)
+    outstanding_expr = total_expr - paid_expr
+
+    base_filters = [Pembelian.jenis_pembayaran == "Tempo"]
+    if search_query:
+        like = f"%{search_query}%"
+        base_filters.append(
+            or_(
+                Pembelian.no_faktur.ilike(like),
+                Pembelian.supplier.has(Supplier.name.ilike(like)),
+            )
+        )
+    if supplier_id:
+        base_filters.append(Pembelian.supplier_id == supplier_id)
+    if start_due:
+        base_filters.append(Pembelian.due_date >= start_due)
+    if end_due:
+        base_filters.append(Pembelian.due_date <= end_due)
+
+    status_filters = []
+    if status_filter == "open":
+        status_filters.append(outstanding_expr > 0)
+    elif status_filter == "overdue":
+        status_filters.append(
+            and_(outstanding_expr > 0, Pembelian.due_date < today)
+        )
+    elif status_filter == "upcoming":
+        status_filters.append(
+            and_(outstanding_expr > 0, Pembelian.due_date >= today)
+        )
+    elif status_filter == "paid":
+        status_filters.append(outstanding_expr <= 0)
+    elif status_filter == "nodue":
+        status_filters.append(
+            and_(outstanding_expr > 0, Pembelian.due_date.is_(None))
+        )
+
+    list_filters = base_filters + status_filters
+
+    def apply_filters(query, filters):
+        return query.filter(*filters) if filters else query
+
+    base_query = (
+        Pembelian.query.options(joinedload(Pembelian.supplier))
+        .outerjoin(total_sub, total_sub.c.pembelian_id == Pembelian.id)
+        .outerjoin(paid_sub, paid_sub.c.pembelian_id == Pembelian.id)
+    )
+    list_query = apply_filters(base_query, list_filters)
+
+    total_records = (
+        list_query.with_entities(func.count(Pembelian.id)).scalar() or 0
+    )
+    total_pages = max(1, (total_records + per_page - 1) // per_page)
+    if page > total_pages:
+        page = total_pages
+    offset = (page - 1) * per_page
+
+    sort_map = {
+        "due_asc": Pembelian.due_date.asc(),
+        "due_desc": Pembelian.due_date.desc(),
+        "total_desc": total_expr.desc(),
+        "total_asc": total_expr.asc(),
+        "outstanding_desc": outstanding_expr.desc(),
+        "outstanding_asc": outstanding_expr.asc(),
+    }
+    order_clause = sort_map.get(sort_option, Pembelian.due_date.asc())
+
+    records = (
+        list_query.add_columns(
+            total_expr.label("total_amount"),
+            paid_expr.label("amount_paid"),
+        )
+        .order_by(order_clause, Pembelian.id.desc())
+        .offset(offset)
+        .limit(per_page)
+        .all()
+    )
+
+    summary_query = apply_filters(base_query, base_filters)
+    total_outstanding = (
+        summary_query.with_entities(func.coalesce(func.sum(outstanding_expr), 0))
+        .filter(outstanding_expr > 0)
+        .scalar()
+        or 0.0
+    )
+    open_count = (
+        summary_query.with_entities(func.count(Pembelian.id))
+        .filter(outstanding_expr > 0)
+        .scalar()
+        or 0
+    )
+    overdue_count = (
+        summary_query.with_entities(func.count(Pembelian.id))
+        .filter(outstanding_expr > 0, Pembelian.due_date < today)
+        .scalar()
+        or 0
+    )
+    due_soon_end = today + timedelta(days=7)
+    due_soon_count = (
+        summary_query.with_entities(func.count(Pembelian.id))
+        .filter(
+            outstanding_expr > 0,
+            Pembelian.due_date >= today,
+            Pembelian.due_date <= due_soon_end,
+        )
+        .scalar()
+        or 0
+    )
+    no_due_count = (
+        summary_query.with_entities(func.count(Pembelian.id))
+        .filter(outstanding_expr > 0, Pembelian.due_date.is_(None))
+        .scalar()
+        or 0
+    )
+
+    aging_summary = {
+        "current": 0.0,
+        "1_30": 0.0,
+        "31_60": 0.0,
+        "61_90": 0.0,
+        "90_plus": 0.0,
+        "no_due": 0.0,
+    }
+    aging_rows = (
+        summary_query.with_entities(Pembelian.due_date, outstanding_expr)
+        .filter(outstanding_expr > 0)
+        .all()
+    )
+    for due_date, outstanding in aging_rows:
+        outstanding = float(outstanding or 0.0)
+        if outstanding <= 0:
+            continue
+        if not due_date:
+            aging_summary["no_due"] += outstanding
+            continue
+        if due_date >= today:
+            aging_summary["current"] += outstanding
+            continue
+        days_overdue = (today - due_date).days
+        if days_overdue <= 30:
+            aging_summary["1_30"] += outstanding
+        elif days_overdue <= 60:
+            aging_summary["31_60"] += outstanding
+        elif days_overdue <= 90:
+            aging_summary["61_90"] += outstanding
+        else:
+            aging_summary["90_plus"] += outstanding
+
+    payable_rows = []
+    for purchase, total_amount, amount_paid in records:
+        total_amount = float(total_amount or 0.0)
+        amount_paid = float(amount_paid or 0.0)
+        outstanding = max(total_amount - amount_paid, 0.0)
+        due_date = purchase.due_date
+        status_label = "Lunas"
+        status_badge = "badge-soft-success"
+        status_hint = ""
+        if outstanding > 0:
+            if due_date:
+                delta_days = (due_date - today).days
+                if delta_days < 0:
+                    status_label = "Jatuh tempo"
+                    status_badge = "badge-soft-danger"
+                    status_hint = f"Terlambat {abs(delta_days)} hari"
+                elif delta_days == 0:
+                    status_label = "Jatuh tempo"
+                    status_badge = "badge-soft-warning"
+                    status_hint = "Jatuh tempo hari ini"
+                else:
+                    status_label = "Belum jatuh tempo"
+                    status_badge = "badge-soft-warning"
+                    status_hint = f"H-{delta_days} hari"
+            else:
+                status_label = "Tanpa tanggal"
+                status_badge = "badge-soft-secondary"
+                status_hint = "Isi tanggal tempo"
+
+        supplier_name = purchase.supplier.name if purchase.supplier else "Tanpa supplier"
+        payable_rows.append(
+            {
+                "id": purchase.id,
+                "invoice": purchase.no_faktur,
+                "purchase_date": purchase.tanggal_faktur,
+                "due_date": due_date,
+                "supplier_name": supplier_name,
+                "total": total_amount,
+                "amount_paid": amount_paid,
+                "outstanding": outstanding,
+                "status_label": status_label,
+                "status_badge": status_badge,
+                "status_hint": status_hint,
+            }
+        )
+
+    filter_active = any(
+        [search_query, supplier_id, start_due, end_due, status_filter]
+    )
+
+    def _date_value_to_str(value):
+        return value.strftime("%Y-%m-%d") if value else ""
+
+    filter_values = {
+        "search": search_query,
+        "supplier": supplier_id or "",
+        "start_due": _date_value_to_str(start_due),
+        "end_due": _date_value_to_str(end_due),
+        "status": status_filter,
+    }
+
+    summary_cards = [
+        {
+            "label": "Total utang",
+            "value": total_outstanding,
+            "type": "currency",
+            "icon": "fa-wallet",
+            "accent": "text-danger",
+            "description": "Nilai tempo yang masih terbuka.",
+        },
+        {
+            "label": "Tempo terbuka",
+            "value": open_count,
+            "type": "count",
+            "icon": "fa-file-invoice-dollar",
+            "accent": "text-primary",
+            "description": "Jumlah faktur yang belum lunas.",
+        },
+        {
+            "label": "Jatuh tempo",
+            "value": overdue_count,
+            "type": "count",
+            "icon": "fa-exclamation-triangle",
+            "accent": "text-danger",
+            "description": "Faktur melewati tanggal jatuh tempo.",
+        },
+        {
+            "label": "Tempo 7 hari",
+            "value": due_soon_count,
+            "type": "count",
+            "icon": "fa-hourglass-half",
+            "accent": "text-warning",
+            "description": "Jatuh tempo dalam 7 hari ke depan.",
+        },
+    ]
+    aging_cards = [
+        {
+            "label": "Belum jatuh tempo",
+            "value": aging_summary["current"],
+            "accent": "text-info",
+        },
+        {
+            "label": "1-30 hari",
+            "value": aging_summary["1_30"],
+            "accent": "text-warning",
+        },
+        {
+            "label": "31-60 hari",
+            "value": aging_summary["31_60"],
+            "accent": "text-warning",
+        },
+        {
+            "label": "61-90 hari",
+            "value": aging_summary["61_90"],
+            "accent": "text-danger",
+        },
+        {
+            "label": ">90 hari",
+            "value": aging_summary["90_plus"],
+            "accent": "text-danger",
+        },
+        {
+            "label": "Tanpa tanggal",
+            "value": aging_summary["no_due"],
+            "accent": "text-secondary",
+        },
+    ]
+
+    supplier_options = Supplier.query.order_by(Supplier.name.asc()).all()
+
+    query_args = request.args.to_dict(flat=True)
+    query_args.pop("page", None)
+    base_args = query_args.copy()
+    prev_url = (
+        url_for("main.laporan_utang", page=page - 1, **base_args)
+        if page > 1
+        else None
+    )
+    next_url = (
+        url_for("main.laporan_utang", page=page + 1, **base_args)
+        if page < total_pages
+        else None
+    )
+    page_window_start = max(1, page - 2)
+    page_window_end = min(total_pages, page + 2)
+    page_links = [
+        {
+            "number": number,
+            "url": url_for("main.laporan_utang", page=number, **base_args),
+            "current": number == page,
+        }
+        for number in range(page_window_start, page_window_end + 1)
+    ]
+    pagination = {
+        "page": page,
+        "per_page": per_page,
+        "total_pages": total_pages,
+        "total_records": total_records,
+        "has_prev": page > 1,
+        "has_next": page < total_pages,
+        "prev_url": prev_url,
+        "next_url": next_url,
+        "page_links": page_links,
+    }
+
+    return render_template(
+        "laporan_utang.html",
+        payable_rows=payable_rows,
+        summary_cards=summary_cards,
+        aging_cards=aging_cards,
+        filter_values=filter_values,
+        sort_option=sort_option,
+        per_page=per_page,
+        pagination=pagination,
+        filter_active=filter_active,
+        supplier_options=supplier_options,
+        no_due_count=no_due_count,
+        total_outstanding=total_outstanding,
+        overdue_count=overdue_count,
+        format_date=_format_date_id,
+    )
@@ -0,0 +1,926 @@
+"""Route pengaturan perusahaan/struk/database, ekspedisi, metode pembayaran, status."""
+
+import os
+import shutil
+import sqlite3
+import time
+from datetime import datetime
+
+from flask import (
+    current_app,
+    flash,
+    redirect,
+    render_template,
+    request,
+    send_from_directory,
+    session,
+    url_for,
+)
+from importlib import util
+from sqlalchemy import func, or_, text
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.orm import joinedload
+from werkzeug.utils import secure_filename
+
+from app.db_pool import pool_status
+from app.models import Expedisi, ExpedisiVolumetricItem, PaymentChannel, Penjualan, Produk, db
+from app.routes import bp
+from app.routes.common import (
+    ADMIN_ONLY,
+    INVENTORY_ROLES,
+    SALES_ROLES,
+    _flash_import_summary,
+    _get_company_profile,
+    _get_default_purchase_tax,
+    _get_default_sales_tax,
+    _get_purchase_invoice_prefix,
+    _get_receipt_settings,
+    _get_sales_invoice_prefix,
+    _import_page_url,
+    _owned_import_job,
+    _parse_bool_param,
+    _parse_float_param,
+    _parse_int_param,
+    _parse_tax_value,
+    login_required,
+    roles_required,
+)
+from app.services.import_jobs import job_payload
+from app.services.import_service import notes_detail
+from app.services.settings_service import save_settings
+from app.sql_profiler import endpoint_profiles, recent_profiles
+from app.time_utils import local_now
+
+
+_psutil_spec = util.find_spec("psutil")
+psutil = __import__("psutil") if _psutil_spec else None
+
+
+@bp.route("/import-jobs/<int:job_id>/hasil")
+@login_required
+def import_job_result(job_id):
+    """Tampilkan ringkasan job sebagai flash lalu kembali ke halaman import."""
+    job = _owned_import_job(job_id)
+    if job is None:
+        flash("Job import tidak ditemukan.", "danger")
+        return redirect(url_for("main.dashboard"))
+    payload = job_payload(job)
+    if not payload["done"]:
+        flash(
+            f"Import {job.filename or ''} masih diproses ({payload['progress']}%). "
+            "Buka lagi halaman ini nanti untuk melihat hasilnya.",
+            "info",
+        )
+        return redirect(_import_page_url(job.kind))
+    _flash_import_summary(payload["summary"], payload["error"])
+    notes = (payload["summary"] or {}).get("notes") or []
+    if payload["error"] and len(notes) > 1:
+        flash(f"Detail: {notes_detail(notes)}", "warning")
+    return redirect(_import_page_url(job.kind, payload["summary"]))
+
+
+@bp.route("/pengaturan/perusahaan", methods=["GET", "POST"])
+@login_required
+@roles_required(*ADMIN_ONLY)
+def pengaturan_perusahaan():
+    profile = _get_company_profile()
+
+    if request.method == "POST":
+        name = (request.form.get("company_name") or "").strip()
+        address = (request.form.get("company_address") or "").strip()
+        city = (request.form.get("company_city") or "").strip()
+        phone = (request.form.get("company_phone") or "").strip()
+        email = (request.form.get("company_email") or "").strip()
+        website = (request.form.get("company_website") or "").strip()
+        logo_url = (request.form.get("company_logo_url") or "").strip()
+        bank_info = (request.form.get("company_bank_info") or "").strip()
+
+        if not name:
+            flash("Nama perusahaan wajib diisi.", "warning")
+            return redirect(url_for("main.pengaturan_perusahaan"))
+        if not address:
+            flash("Alamat perusahaan wajib diisi.", "warning")
+            return redirect(url_for("main.pengaturan_perusahaan"))
+        if not city:
+            flash("Kota perusahaan wajib diisi.", "warning")
+            return redirect(url_for("main.pengaturan_perusahaan"))
+
+        updates = {
+            "COMPANY_NAME": name,
+            "COMPANY_ADDRESS": address,
+            "COMPANY_CITY": city,
+            "COMPANY_PHONE": phone,
+            "COMPANY_EMAIL": email,
+            "COMPANY_WEBSITE": website,
+            "COMPANY_LOGO_URL": logo_url,
+            "COMPANY_BANK_INFO": bank_info,
+        }
+        save_settings(updates, user_id=session.get("user_id"))
+
+        flash("Profil perusahaan berhasil diperbarui.", "success")
+        return redirect(url_for("main.pengaturan_perusahaan"))
+
+    return render_template("pengaturan_perusahaan.html", profile=profile)
+
+
+@bp.route("/pengaturan/faktur-pajak", methods=["GET", "POST"])
+@login_required
+@roles_required(*ADMIN_ONLY)
+def pengaturan_faktur_pajak():
+    if request.method == "POST":
+        sales_prefix = (request.form.get("sales_invoice_prefix") or "").strip().upper()
+        purchase_prefix = (
+            request.form.get("purchase_invoice_prefix") or ""
+        ).strip().upper()
+        sales_tax_raw = request.form.get("default_sales_tax") or "0"
+        purchase_tax_raw = request.form.get("default_purchase_tax") or "0"
+
+        if not sales_prefix:
+            flash("Prefix faktur penjualan wajib diisi.", "warning")
+            return redirect(url_for("main.pengaturan_faktur_pajak"))
+        if not purchase_prefix:
+            flash("Prefix faktur pembelian wajib diisi.", "warning")
+            return redirect(url_for("main.pengaturan_faktur_pajak"))
+
+        sales_tax = _parse_tax_value(sales_tax_raw, default=0.0)
+        purchase_tax = _parse_tax_value(purchase_tax_raw, default=0.0)
+
+        updates = {
+            "SALES_INVOICE_PREFIX": sales_prefix,
+            "PURCHASE_INVOICE_PREFIX": purchase_prefix,
+            "DEFAULT_SALES_TAX_PERCENT": str(sales_tax),
+            "DEFAULT_PURCHASE_TAX_PERCENT": str(purchase_tax),
+        }
+        save_settings(updates, user_id=session.get("user_id"))
+
+        flash("Pengaturan faktur & pajak berhasil diperbarui.", "success")
+        return redirect(url_for("main.pengaturan_faktur_pajak"))
+
+    sales_prefix = _get_sales_invoice_prefix()
+    purchase_prefix = _get_purchase_invoice_prefix()
+    sales_tax = _get_default_sales_tax()
+    purchase_tax = _get_default_purchase_tax()
+
+    now = local_now()
+    preview_stamp = now.strftime("%Y%m%d%H%M")
+    return render_template(
+        "pengaturan_faktur_pajak.html",
+        sales_prefix=sales_prefix,
+        purchase_prefix=purchase_prefix,
+        sales_tax=sales_tax,
+        purchase_tax=purchase_tax,
+        sales_preview=f"{sales_prefix}{preview_stamp}",
+        purchase_preview=f"{purchase_prefix}{preview_stamp}",
+    )
+
+
+@bp.route("/pengaturan/struk", methods=["GET", "POST"])
+@login_required
+@roles_required(*ADMIN_ONLY)
+def pengaturan_struk():
+    settings = _get_receipt_settings()
+
+    if request.method == "POST":
+        font_family = (request.form.get("receipt_font_family") or "").strip()
+        font_weight_raw = request.form.get("receipt_font_weight")
+        font_size_raw = request.form.get("receipt_font_size")
+        thank_you_text = (request.form.get("receipt_thank_you_text") or "").strip()
+        promo_label = (request.form.get("receipt_promo_label") or "").strip()
+        promo_barcode = (request.form.get("receipt_promo_barcode") or "").strip()
+        show_promo_barcode = _parse_bool_param(
+            request.form.get("receipt_show_promo_barcode"), default=False
+        )
+
+        if not font_family:
+            flash("Font struk wajib diisi.", "warning")
+            return redirect(url_for("main.pengaturan_struk"))
+
+        font_weight = _parse_int_param(font_weight_raw)
+        if font_weight is None:
+            font_weight = 500
+        font_weight = min(700, max(300, font_weight))
+
+        font_size = _parse_float_param(font_size_raw)
+        if font_size is None:
+            font_size = 12.5
+        font_size = min(16.0, max(9.0, font_size))
+
+        updates = {
+            "RECEIPT_FONT_FAMILY": font_family,
+            "RECEIPT_FONT_WEIGHT": str(font_weight),
+            "RECEIPT_FONT_SIZE": f"{font_size:g}",
+            "RECEIPT_THANK_YOU_TEXT": thank_you_text,
+            "RECEIPT_PROMO_LABEL": promo_label,
+            "RECEIPT_PROMO_BARCODE": promo_barcode,
+            "RECEIPT_SHOW_PROMO_BARCODE": "1" if show_promo_barcode else "0",
+        }
+        save_settings(updates, user_id=session.get("user_id"))
+
+        flash("Pengaturan struk berhasil diperbarui.", "success")
+        return redirect(url_for("main.pengaturan_struk"))
+
+    return render_template("pengaturan_struk.html", settings=settings)
+
+
+@bp.route("/pengaturan/database", methods=["GET", "POST"])
+@login_required
+@roles_required(*ADMIN_ONLY)
+def pengaturan_database():
+    if request.method == "POST":
+        action = (request.form.get("action") or "").strip()
+        backup_supported = _resolve_sqlite_path() is not None
+
+        if action == "check":
+            result = _check_db_connection()
+            flash(
+                result["message"],
+                "success" if result["ok"] else "danger",
+            )
+            return redirect(url_for("main.pengaturan_database"))
+
+        if action == "backup":
+            if not backup_supported:
+                flash("Backup hanya tersedia untuk database SQLite.", "warning")
+                return redirect(url_for("main.pengaturan_database"))
+            backup_name, error = _backup_sqlite_database()
+            if error:
+                flash(error, "danger")
+            else:
+                flash(f"Backup tersimpan: {backup_name}", "success")
+            return redirect(url_for("main.pengaturan_database"))
+
+        if action == "restore":
+            if not backup_supported:
+                flash("Restore hanya tersedia untuk database SQLite.", "warning")
+                return redirect(url_for("main.pengaturan_database"))
+            backup_dir = _get_backup_directory()
+            uploaded = request.files.get("backup_file")
+            selected_name = (request.form.get("backup_choice") or "").strip()
+            backup_path = None
+
+            if uploaded and uploaded.filename:
+                safe_name = secure_filename(uploaded.filename)
+                if not _is_allowed_backup_name(safe_name):
+                    flash("Format file backup tidak didukung.", "warning")
+                    return redirect(url_for("main.pengaturan_database"))
+                stamp = local_now().strftime("%Y%m%d%H%M%S")
+                stored_name = f"restore_{stamp}_{safe_name}"
+                backup_path = os.path.join(backup_dir, stored_name)
+                uploaded.save(backup_path)
+            elif selected_name:
+                selected_name = os.path.basename(selected_name)
+                backup_path = os.path.join(backup_dir, selected_name)
+
+            if not backup_path:
+                flash("Pilih file backup atau unggah file untuk restore.", "warning")
+                return redirect(url_for("main.pengaturan_database"))
+
+            error = _restore_sqlite_database(backup_path)
+            if error:
+                flash(error, "danger")
+            else:
+                flash("Restore database berhasil.", "success")
+            return redirect(url_for("main.pengaturan_database"))
+
+        if action == "delete":
+            if not backup_supported:
+                flash("Hapus backup hanya tersedia untuk database SQLite.", "warning")
+                return redirect(url_for("main.pengaturan_database"))
+            target_name = (request.form.get("backup_name") or "").strip()
+            if not target_name:
+                flash("Nama file backup tidak ditemukan.", "warning")
+                return redirect(url_for("main.pengaturan_database"))
+            target_name = os.path.basename(target_name)
+            if not _is_allowed_backup_name(target_name):
+                flash("Format file backup tidak didukung.", "warning")
+                return redirect(url_for("main.pengaturan_database"))
+            backup_path = os.path.join(_get_backup_directory(), target_name)
+            if not os.path.exists(backup_path):
+                flash("File backup tidak ditemukan.", "warning")
+                return redirect(url_for("main.pengaturan_database"))
+            try:
+                os.remove(backup_path)
+                flash("Backup berhasil dihapus.", "success")
+            except Exception as exc:
+                flash(f"Gagal menghapus backup: {exc}", "danger")
+            return redirect(url_for("main.pengaturan_database"))
+
+        flash("Aksi pengaturan database tidak dikenal.", "warning")
+        return redirect(url_for("main.pengaturan_database"))
+
+    connection_status = _check_db_connection()
+    db_info = _collect_system_metrics().get("database", {})
+    backup_supported = _resolve_sqlite_path() is not None
+    backups = _list_db_backups() if backup_supported else []
+
+    return render_template(
+        "pengaturan_database.html",
+        connection_status=connection_status,
+        db_info=db_info,
+        backup_supported=backup_supported,
+        backups=backups,
+    )
+
+
+@bp.route("/pengaturan/database/backup/<path:backup_name>")
+@login_required
+@roles_required(*ADMIN_ONLY)
+def download_db_backup(backup_name):
+    if _resolve_sqlite_path() is None:
+        flash("Download hanya tersedia untuk database SQLite.", "warning")
+        return redirect(url_for("main.pengaturan_database"))
+
+    safe_name = os.path.basename(backup_name or "")
+    if not _is_allowed_backup_name(safe_name):
+        flash("Format file backup tidak didukung.", "warning")
+        return redirect(url_for("main.pengaturan_database"))
+
+    backup_dir = _get_backup_directory()
+    backup_path = os.path.join(backup_dir, safe_name)
+    if not os.path.exists(backup_path):
+        flash("File backup tidak ditemukan.", "warning")
+        return redirect(url_for("main.pengaturan_database"))
+
+    return send_from_directory(backup_dir, safe_name, as_attachment=True, download_name=safe_name)
+
+
+@bp.route("/expedisi", methods=["GET", "POST"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def expedisi():
+    if request.method == "POST":
+        name = request.form.get("name", "").strip()
+        phone = request.form.get("phone", "").strip()
+        address = request.form.get("address", "").strip()
+        note = request.form.get("note", "").strip()
+        volume_divisor = _parse_float_param(request.form.get("volume_divisor"))
+        if volume_divisor is None or volume_divisor <= 0:
+            volume_divisor = 6000.0
+        if not name:
+            flash("Nama expedisi wajib diisi.", "warning")
+            return redirect("/expedisi")
+        existing = Expedisi.query.filter(func.lower(Expedisi.name) == name.lower()).first()
+        if existing:
+            flash("Nama expedisi sudah terdaftar.", "warning")
+            return redirect("/expedisi")
+        new_expedisi = Expedisi(
+            name=name,
+            phone=phone or None,
+            address=address or None,
+            note=note or None,
+            volume_divisor=volume_divisor,
+        )
+        db.session.add(new_expedisi)
+        db.session.commit()
+        flash("Expedisi added successfully!", "success")
+        return redirect("/expedisi")
+
+    expedisi_list = Expedisi.query.order_by(Expedisi.name.asc()).all()
+    payment_channels = (
+        PaymentChannel.query.filter(
+            PaymentChannel.channel_type.in_(["Kartu", "Transfer", "QRIS"])
+        )
+        .order_by(PaymentChannel.channel_type.asc(), PaymentChannel.name.asc())
+        .all()
+    )
+    return render_template("data_expedisi.html", expedisi_list=expedisi_list)
+
+
+@bp.route("/expedisi/volumetrik", methods=["GET", "POST"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def expedisi_volumetrik():
+    action = (request.form.get("action") or "").strip()
+    if request.method == "POST":
+        if action == "save":
+            item_id = _parse_int_param(request.form.get("item_id"))
+            expedisi_id = _parse_int_param(request.form.get("expedisi_id"))
+            product_id = _parse_int_param(request.form.get("product_id"))
+            packaging = (request.form.get("packaging") or "").strip()
+            qty_per_pack = _parse_int_param(request.form.get("qty_per_pack")) or 1
+            length_cm = _parse_float_param(request.form.get("length_cm"))
+            width_cm = _parse_float_param(request.form.get("width_cm"))
+            height_cm = _parse_float_param(request.form.get("height_cm"))
+            actual_weight = _parse_float_param(request.form.get("actual_weight"))
+            use_volumetric = request.form.get("use_volumetric") == "1"
+            note = (request.form.get("note") or "").strip()
+
+            if not expedisi_id or not product_id or not packaging:
+                flash("Expedisi, produk, dan kemasan wajib diisi.", "warning")
+                return redirect(url_for("main.expedisi_volumetrik"))
+            if qty_per_pack <= 0:
+                flash("Qty per kemasan minimal 1.", "warning")
+                return redirect(url_for("main.expedisi_volumetrik"))
+            if not length_cm or not width_cm or not height_cm:
+                flash("Dimensi kemasan wajib diisi.", "warning")
+                return redirect(url_for("main.expedisi_volumetrik"))
+            if length_cm <= 0 or width_cm <= 0 or height_cm <= 0:
+                flash("Dimensi harus lebih dari 0.", "warning")
+                return redirect(url_for("main.expedisi_volumetrik"))
+
+            expedisi_obj = db.session.get(Expedisi, expedisi_id)
+            product_obj = db.session.get(Produk, product_id)
+            if not expedisi_obj or not product_obj:
+                flash("Expedisi atau produk tidak ditemukan.", "warning")
+                return redirect(url_for("main.expedisi_volumetrik"))
+
+            existing = ExpedisiVolumetricItem.query.filter_by(
+                expedisi_id=expedisi_id,
+                product_id=product_id,
+                packaging=packaging,
+            ).first()
+
+            if item_id:
+                item = db.session.get(ExpedisiVolumetricItem, item_id)
+                if not item:
+                    flash("Data volumetrik tidak ditemukan.", "warning")
+                    return redirect(url_for("main.expedisi_volumetrik"))
+                if existing and existing.id != item.id:
+                    flash("Kombinasi produk, expedisi, dan kemasan sudah ada.", "warning")
+                    return redirect(
+                        url_for("main.expedisi_volumetrik", edit=item.id)
+                    )
+            else:
+                if existing:
+                    item = existing
+                    flash("Data sudah ada, diperbarui otomatis.", "info")
+                else:
+                    item = ExpedisiVolumetricItem(
+                        expedisi_id=expedisi_id,
+                        product_id=product_id,
+                        packaging=packaging,
+                    )
+                    db.session.add(item)
+
+            item.expedisi_id = expedisi_id
+            item.product_id = product_id
+            item.packaging = packaging
+            item.qty_per_pack = qty_per_pack
+            item.length_cm = length_cm
+            item.width_cm = width_cm
+            item.height_cm = height_cm
+            item.actual_weight = actual_weight
+            item.use_volumetric = use_volumetric
+            item.note = note or None
+            db.session.commit()
+            flash("Data volumetrik tersimpan.", "success")
+            return redirect(url_for("main.expedisi_volumetrik"))
+
+        if action == "delete":
+            item_id = _parse_int_param(request.form.get("item_id"))
+            if not item_id:
+                flash("Data tidak ditemukan.", "warning")
+                return redirect(url_for("main.expedisi_volumetrik"))
+            item = db.session.get(ExpedisiVolumetricItem, item_id)
+            if item:
+                db.session.delete(item)
+                db.session.commit()
+                flash("Data volumetrik dihapus.", "success")
+            return redirect(url_for("main.expedisi_volumetrik"))
+
+    search = (request.args.get("q") or "").strip()
+    edit_id = _parse_int_param(request.args.get("edit"))
+    edit_item = (
+        ExpedisiVolumetricItem.query.options(
+            joinedload(ExpedisiVolumetricItem.produk),
+            joinedload(ExpedisiVolumetricItem.expedisi),
+        ).get(edit_id)
+        if edit_id
+        else None
+    )
+
+    expedisi_list = Expedisi.query.order_by(Expedisi.name.asc()).all()
+    items_query = ExpedisiVolumetricItem.query.options(
+        joinedload(ExpedisiVolumetricItem.produk),
+        joinedload(ExpedisiVolumetricItem.expedisi),
+    ).join(Expedisi, Expedisi.id == ExpedisiVolumetricItem.expedisi_id).join(
+        Produk, Produk.id == ExpedisiVolumetricItem.product_id
+    )
+    if search:
+        like = f"%{search}%"
+        items_query = items_query.filter(
+            or_(
+                Produk.nama_produk.ilike(like),
+                Produk.kode_produk.ilike(like),
+                Expedisi.name.ilike(like),
+                ExpedisiVolumetricItem.packaging.ilike(like),
+            )
+        )
+
+    items = items_query.order_by(
+        ExpedisiVolumetricItem.updated_at.desc(),
+        ExpedisiVolumetricItem.id.desc(),
+    ).all()
+
+    item_rows = []
+    for item in items:
+        factor = float(item.expedisi.volume_divisor or 0.0) if item.expedisi else 0.0
+        volume_weight = (
+            (item.length_cm * item.width_cm * item.height_cm) / factor
+            if factor > 0
+            else 0.0
+        )
+        actual_weight_value = float(item.actual_weight or 0.0)
+        chargeable = (
+            volume_weight
+            if item.use_volumetric
+            else max(actual_weight_value, volume_weight)
+        )
+        item_rows.append(
+            {
+                "id": item.id,
+                "expedisi_name": item.expedisi.name if item.expedisi else "-",
+                "expedisi_factor": factor,
+                "product_name": item.produk.nama_produk if item.produk else "-",
+                "product_code": item.produk.kode_produk if item.produk else "-",
+                "packaging": item.packaging,
+                "qty_per_pack": item.qty_per_pack,
+                "length_cm": item.length_cm,
+                "width_cm": item.width_cm,
+                "height_cm": item.height_cm,
+                "volume_weight": volume_weight,
+                "actual_weight": item.actual_weight,
+                "chargeable_weight": chargeable,
+                "use_volumetric": item.use_volumetric,
+                "note": item.note,
+            }
+        )
+
+    return render_template(
+        "expedisi_volumetrik.html",
+        expedisi_list=expedisi_list,
+        items=item_rows,
+        search_query=search,
+        edit_item=edit_item,
+    )
+
+
+@bp.route("/expedisi/edit/<int:expedisi_id>", methods=["GET", "POST"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def edit_expedisi(expedisi_id):
+    expedisi_item = Expedisi.query.get_or_404(expedisi_id)
+    if request.method == "POST":
+        name = request.form.get("name", "").strip()
+        phone = request.form.get("phone", "").strip()
+        address = request.form.get("address", "").strip()
+        note = request.form.get("note", "").strip()
+        volume_divisor = _parse_float_param(request.form.get("volume_divisor"))
+        if volume_divisor is None or volume_divisor <= 0:
+            volume_divisor = 6000.0
+        if not name:
+            flash("Nama expedisi wajib diisi.", "warning")
+            return redirect(url_for("main.edit_expedisi", expedisi_id=expedisi_id))
+        existing = Expedisi.query.filter(
+            func.lower(Expedisi.name) == name.lower(),
+            Expedisi.id != expedisi_item.id,
+        ).first()
+        if existing:
+            flash("Nama expedisi sudah digunakan.", "warning")
+            return redirect(url_for("main.edit_expedisi", expedisi_id=expedisi_id))
+        expedisi_item.name = name
+        expedisi_item.phone = phone or None
+        expedisi_item.address = address or None
+        expedisi_item.note = note or None
+        expedisi_item.volume_divisor = volume_divisor
+        db.session.commit()
+        flash("Expedisi updated successfully!", "success")
+        return redirect("/expedisi")
+
+    expedisi_list = Expedisi.query.order_by(Expedisi.name.asc()).all()
+    return render_template(
+        "data_expedisi.html",
+        expedisi_list=expedisi_list,
+        edit_expedisi=expedisi_item,
+    )
+
+
+@bp.route("/expedisi/delete/<int:expedisi_id>", methods=["POST"])
+@login_required
+@roles_required(*INVENTORY_ROLES)
+def delete_expedisi(expedisi_id):
+    expedisi_item = Expedisi.query.get_or_404(expedisi_id)
+    if Penjualan.query.filter_by(expedition_id=expedisi_item.id).count():
+        flash(
+            "Tidak dapat menghapus expedisi karena masih digunakan pada transaksi.",
+            "warning",
+        )
+        return redirect("/expedisi")
+    db.session.delete(expedisi_item)
+    db.session.commit()
+    flash("Expedisi deleted successfully!", "success")
+    return redirect("/expedisi")
+
+
+@bp.route("/metode_pembayaran", methods=["GET", "POST"])
+@login_required
+@roles_required(*SALES_ROLES)
+def metode_pembayaran():
+    if request.method == "POST":
+        name = request.form.get("name", "").strip()
+        channel_type = request.form.get("channel_type", "Kartu").strip()
+        note = request.form.get("note", "").strip()
+        if not name:
+            flash("Nama metode pembayaran wajib diisi.", "warning")
+            return redirect("/metode_pembayaran")
+        if channel_type not in {"Kartu", "Tunai", "Tempo", "Transfer", "QRIS"}:
+            flash("Jenis metode pembayaran tidak valid.", "warning")
+            return redirect("/metode_pembayaran")
+        existing = PaymentChannel.query.filter(
+            func.lower(PaymentChannel.name) == name.lower()
+        ).first()
+        if existing:
+            flash("Nama metode pembayaran sudah terdaftar.", "warning")
+            return redirect("/metode_pembayaran")
+        new_channel = PaymentChannel(
+            name=name,
+            channel_type=channel_type,
+            note=note or None,
+        )
+        db.session.add(new_channel)
+        db.session.commit()
+        flash("Metode pembayaran added successfully!", "success")
+        return redirect("/metode_pembayaran")
+
+    channels = PaymentChannel.query.order_by(
+        PaymentChannel.channel_type.asc(), PaymentChannel.name.asc()
+    ).all()
+    return render_template("data_metode_pembayaran.html", channels=channels)
+
+
+@bp.route("/metode_pembayaran/edit/<int:channel_id>", methods=["GET", "POST"])
+@login_required
+@roles_required(*SALES_ROLES)
+def edit_metode_pembayaran(channel_id):
+    channel = PaymentChannel.query.get_or_404(channel_id)
+    if request.method == "POST":
+        name = request.form.get("name", "").strip()
+        channel_type = request.form.get("channel_type", "Kartu").strip()
+        note = request.form.get("note", "").strip()
+        if not name:
+            flash("Nama metode pembayaran wajib diisi.", "warning")
+            return redirect(url_for("main.edit_metode_pembayaran", channel_id=channel_id))
+        if channel_type not in {"Kartu", "Tunai", "Tempo", "Transfer", "QRIS"}:
+            flash("Jenis metode pembayaran tidak valid.", "warning")
+            return redirect(url_for("main.edit_metode_pembayaran", channel_id=channel_id))
+        existing = PaymentChannel.query.filter(
+            func.lower(PaymentChannel.name) == name.lower(),
+            PaymentChannel.id != channel.id,
+        ).first()
+        if existing:
+            flash("Nama metode pembayaran sudah digunakan.", "warning")
+            return redirect(url_for("main.edit_metode_pembayaran", channel_id=channel_id))
+        channel.name = name
+        channel.channel_type = channel_type
+        channel.note = note or None
+        db.session.commit()
+        flash("Metode pembayaran updated successfully!", "success")
+        return redirect("/metode_pembayaran")
+
+    channels = PaymentChannel.query.order_by(
+        PaymentChannel.channel_type.asc(), PaymentChannel.name.asc()
+    ).all()
+    return render_template(
+        "data_metode_pembayaran.html",
+        channels=channels,
+        edit_channel=channel,
+    )
+
+
+@bp.route("/metode_pembayaran/delete/<int:channel_id>", methods=["POST"])
+@login_required
+@roles_required(*SALES_ROLES)
+def delete_metode_pembayaran(channel_id):
+    channel = PaymentChannel.query.get_or_404(channel_id)
+    if Penjualan.query.filter_by(payment_channel_id=channel.id).count():
+        flash(
+            "Metode pembayaran tidak dapat dihapus karena sudah digunakan pada transaksi.",
+            "warning",
+        )
+        return redirect("/metode_pembayaran")
+    db.session.delete(channel)
+    db.session.commit()
+    flash("Metode pembayaran deleted successfully!", "success")
+    return redirect("/metode_pembayaran")
+
+
+@bp.route("/status", methods=["GET"])
+@login_required
+@roles_required(*ADMIN_ONLY)
+def status():
+    metrics = _collect_system_metrics()
+    app = current_app._get_current_object()
+    return render_template(
+        "server_status.html",
+        metrics=metrics,
+        sql_enabled=app.config.get("SQL_PROFILER_ENABLED", False),
+        sql_repeat_threshold=app.config.get("SQL_PROFILER_REPEAT_THRESHOLD"),
+        sql_endpoints=endpoint_profiles(app),
+        sql_recent=recent_profiles(app, limit=30),
+        db_pool=pool_status(db.engine),
+        db_pool_options={
+            key: value
+            for key, value in app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}).items()
+            if key.startswith("pool_") or key == "max_overflow"
+        },
+    )
+
+
+def _resolve_sqlite_path():
+    uri = current_app.config.get("SQLALCHEMY_DATABASE_URI") or ""
+    if not uri.startswith("sqlite:"):
+        return None
+    trimmed = uri.split("sqlite://")[1]
+    if trimmed.startswith("/"):
+        trimmed = trimmed[1:]
+    return os.path.abspath(trimmed)
+
+
+def _check_db_connection():
+    start = time.perf_counter()
+    try:
+        db.session.execute(text("SELECT 1"))
+        latency_ms = (time.perf_counter() - start) * 1000
+        return {
+            "ok": True,
+            "message": "Koneksi database berhasil.",
+            "latency_ms": round(latency_ms, 2),
+        }
+    except Exception as exc:
+        db.session.rollback()
+        return {"ok": False, "message": f"Gagal: {exc}", "latency_ms": None}
+
+
+def _get_backup_directory():
+    base_dir = current_app.instance_path or os.getcwd()
+    backup_dir = os.path.join(base_dir, "db_backups")
+    os.makedirs(backup_dir, exist_ok=True)
+    return backup_dir
+
+
+def _list_db_backups():
+    backup_dir = _get_backup_directory()
+    backups = []
+    for name in os.listdir(backup_dir):
+        path = os.path.join(backup_dir, name)
+        if not os.path.isfile(path):
+            continue
+        stat = os.stat(path)
+        backups.append(
+            {
+                "name": name,
+                "size": stat.st_size,
+                "mtime": datetime.fromtimestamp(stat.st_mtime),
+                "path": path,
+            }
+        )
+    backups.sort(key=lambda item: item["mtime"], reverse=True)
+    return backups
+
+
+def _is_allowed_backup_name(filename):
+    if not filename:
+        return False
+    lowered = filename.lower()
+    return lowered.endswith((".db", ".sqlite", ".sqlite3", ".bak"))
+
+
+def _backup_sqlite_database():
+    db_path = _resolve_sqlite_path()
+    if not db_path or not os.path.exists(db_path):
+        return None, "Database SQLite tidak ditemukan."
+    backup_dir = _get_backup_directory()
+    stamp = local_now().strftime("%Y%m%d%H%M%S")
+    backup_name = f"backup_{stamp}.sqlite3"
+    backup_path = os.path.join(backup_dir, backup_name)
+
+    try:
+        with sqlite3.connect(db_path) as source, sqlite3.connect(backup_path) as target:
+            source.backup(target)
+        return backup_name, None
+    except Exception as exc:
+        return None, f"Gagal membuat backup: {exc}"
+
+
+def _restore_sqlite_database(backup_path):
+    db_path = _resolve_sqlite_path()
+    if not db_path:
+        return "Database SQLite tidak ditemukan."
+    if not backup_path or not os.path.exists(backup_path):
+        return "File backup tidak ditemukan."
+
+    try:
+        db.session.remove()
+        db.engine.dispose()
+    except Exception:
+        pass
+
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    try:
+        with sqlite3.connect(backup_path) as source, sqlite3.connect(db_path) as target:
+            source.backup(target)
+        return None
+    except Exception as exc:
+        return f"Gagal restore database: {exc}"
+
+
+def _collect_system_metrics():
+    metrics = {
+        "timestamp": local_now().strftime("%Y-%m-%d %H:%M:%S"),
+        "environment": current_app.config.get("FLASK_ENV", "production"),
+    }
+
+    db_info = {
+        "engine": None,
+        "name": None,
+        "host": None,
+        "path": None,
+        "size": None,
+    }
+    base_dir = current_app.instance_path
+
+    db_uri = current_app.config.get("SQLALCHEMY_DATABASE_URI") or ""
+    url_obj = None
+    try:
+        url_obj = make_url(db_uri)
+        db_info.update(
+            {
+                "engine": url_obj.get_backend_name(),
+                "name": url_obj.database,
+                "host": url_obj.host,
+            }
+        )
+    except Exception:
+        url_obj = None
+
+    db_path = _resolve_sqlite_path()
+    if url_obj and url_obj.get_backend_name().startswith("sqlite"):
+        if db_path and os.path.exists(db_path):
+            db_info["path"] = db_path
+            db_info["size"] = os.path.getsize(db_path)
+            base_dir = os.path.dirname(db_path) or base_dir
+    elif url_obj:
+        db_info["size"] = _fetch_remote_db_size(url_obj)
+
+    metrics["database"] = db_info
+
+    if not os.path.exists(base_dir):
+        base_dir = os.getcwd()
+
+    try:
+        disk = shutil.disk_usage(base_dir)
+        metrics["disk"] = {
+            "total": disk.total,
+            "used": disk.used,
+            "free": disk.free,
+        }
+    except Exception:
+        metrics["disk"] = {"total": None, "used": None, "free": None}
+
+    if psutil:
+        vm = psutil.virtual_memory()
+        metrics["memory"] = {
+            "total": vm.total,
+            "available": vm.available,
+            "percent": vm.percent,
+        }
+        metrics["cpu"] = {
+            "count": psutil.cpu_count(logical=True),
+            "percent": psutil.cpu_percent(interval=0.1),
+            "load_avg": os.getloadavg() if hasattr(os, "getloadavg") else None,
+        }
+        process = psutil.Process()
+        mem_info = process.memory_full_info()
+        metrics["process_memory"] = {
+            "rss": mem_info.rss,
+            "uss": getattr(mem_info, "uss", None),
+        }
+    else:
+        metrics["memory"] = None
+        metrics["cpu"] = {
+            "count": os.cpu_count(),
+            "percent": None,
+            "load_avg": os.getloadavg() if hasattr(os, "getloadavg") else None,
+        }
+        metrics["process_memory"] = None
+
+    return metrics
+
+
+def _fetch_remote_db_size(url_obj):
+    backend = url_obj.get_backend_name() if url_obj else None
+    if backend == "postgresql":
+        query = text("SELECT pg_database_size(current_database())")
+    elif backend == "mysql":
+        query = text(
+            "SELECT SUM(data_length + index_length) "
+            "FROM information_schema.tables WHERE table_schema = DATABASE()"
+        )
+    else:
+        return None
+
+    try:
+        result = db.session.execute(query).scalar()
+        return int(result) if result is not None else None
+    except Exception:
+        return None
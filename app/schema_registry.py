@@ -0,0 +1,237 @@
+"""Peta kemampuan skema database, diperiksa sekali per proses.
+
+Dulu handler memanggil ``_ensure_table`` / ``inspect(...).has_table`` di setiap
+request; di MySQL itu berarti beberapa query information_schema per halaman.
+Sekarang skema di-probe satu kali sebelum request pertama, hasilnya disimpan di
+``app.extensions["schema_registry"]`` dan handler cukup membaca flag lewat
+``table_ready`` / ``columns_ready``.
+
+DDL yang kurang (tabel di ``MANAGED_TABLES`` dan kolom lama di
+``LEGACY_COLUMNS``) diterapkan lewat ``flask schema apply``. Selama
+``SCHEMA_AUTO_APPLY`` aktif (default 1) DDL yang sama juga diterapkan otomatis
+saat probe pertama, sama seperti perilaku lama; matikan di produksi bila skema
+hanya boleh berubah lewat migrasi. Proses yang sudah berjalan tidak melihat
+perubahan skema dari proses lain sampai di-restart.
+"""
+
+import logging
+import os
+import threading
+
+from flask import current_app
+from sqlalchemy import inspect, text
+
+# tabel yang dulu dibuat otomatis oleh handler (``_ensure_table``)
+MANAGED_TABLES = (
+    "account",
+    "account_period_balance",
+    "accounting_setting",
+    "app_setting",
+    "catalog_change",
+    "document_sequence",
+    "expedisi_volumetric_item",
+    "fixed_asset",
+    "import_job",
+    "journal_entry",
+    "journal_line",
+    "marketplace_pricing_setting",
+    "payable_payment",
+    "price_change",
+    "purchase_order",
+    "purchase_order_item",
+    "quotation",
+    "quotation_item",
+    "receivable_payment",
+    "sales_daily_summary",
+    "sales_search_index",
+    "stock_opname_item",
+    "stock_opname_session",
+)
+
+# kolom yang ditambahkan lewat ALTER di luar migrasi pada instalasi lama
+LEGACY_COLUMNS = {
+    "pembelian": (
+        ("due_date", "DATE"),
+        ("payment_bank", "VARCHAR(120)"),
+        ("payment_reference", "VARCHAR(100)"),
+    ),
+    "accounting_setting": (("inventory_adjustment_account_id", "INTEGER"),),
+    "expedisi": (("volume_divisor", "FLOAT DEFAULT 6000"),),
+    "user": (
+        ("auth_version", "INTEGER NOT NULL DEFAULT 1"),
+        ("password_version", "INTEGER NOT NULL DEFAULT 1"),
+    ),
+    "detail_penjualan": (("hpp_satuan", "FLOAT"),),
+    "import_job": (("updated_at", "TIMESTAMP NULL"),),
+}
+
+
+class SchemaState:
+    """Hasil satu kali probe: nama tabel dan kolom untuk tabel di ``LEGACY_COLUMNS``."""
+
+    __slots__ = ("tables", "columns")
+
+    def __init__(self, tables, columns):
+        self.tables = frozenset(tables)
+        self.columns = {name: frozenset(cols) for name, cols in columns.items()}
+
+    def has_table(self, name):
+        return name in self.tables
+
+    def has_columns(self, table, *names):
+        available = self.columns.get(table)
+        if available is None:
+            return False
+        return all(name in available for name in names)
+
+    def missing_tables(self):
+        return [name for name in MANAGED_TABLES if name not in self.tables]
+
+    def missing_columns(self):
+        """``(tabel, kolom, tipe)`` yang belum ada; tabel yang belum ada dilewati."""
+        missing = []
+        for table, columns in LEGACY_COLUMNS.items():
+            available = self.columns.get(table)
+            if available is None:
+                continue
+            missing.extend(
+                (table, column, ddl_type)
+                for column, ddl_type in columns
+                if column not in available
+            )
+        return missing
+
+    def pending_ddl(self):
+        statements = [f"CREATE TABLE {name}" for name in self.missing_tables()]
+        statements.extend(
+            f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}"
+            for table, column, ddl_type in self.missing_columns()
+        )
+        return statements
+
+
+def probe_schema(engine):
+    """Satu pass inspector: daftar tabel + kolom untuk tabel lama."""
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    columns = {
+        table: {column["name"] for column in inspector.get_columns(table)}
+        for table in LEGACY_COLUMNS
+        if table in tables
+    }
+    return SchemaState(tables, columns)
+
+
+def apply_schema(engine, state=None):
+    """Terapkan DDL yang kurang lalu probe ulang; kembalikan ``(state, statements)``."""
+    from app import db, models  # noqa: F401  (mendaftarkan semua tabel di metadata)
+
+    state = state or probe_schema(engine)
+    applied = state.pending_ddl()
+    if not applied:
+        return state, applied
+
+    missing = set(state.missing_tables())
+    with engine.begin() as connection:
+        if missing:
+            db.metadata.create_all(
+                bind=connection,
+                tables=[
+                    table
+                    for table in db.metadata.sorted_tables
+                    if table.name in missing
+                ],
+                checkfirst=True,
+            )
+        quote = connection.dialect.identifier_preparer.quote
+        for table, column, ddl_type in state.missing_columns():
+            # "user" adalah kata kunci di PostgreSQL, jadi nama selalu di-quote
+            connection.execute(
+                text(f"ALTER TABLE {quote(table)} ADD COLUMN {quote(column)} {ddl_type}")
+            )
+    return probe_schema(engine), applied
+
+
+class SchemaRegistry:
+    """Ekstensi Flask; pasang dengan ``schema_registry.init_app(app)``."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault(
+            "SCHEMA_AUTO_APPLY",
+            os.environ.get("SCHEMA_AUTO_APPLY", "1").strip().lower()
+            not in {"0", "false", "no", "off"},
+        )
+        app.extensions["schema_registry"] = {"state": None, "lock": threading.Lock()}
+        app.before_request(self._ensure_probed)
+
+    @staticmethod
+    def _ensure_probed():
+        if current_app.extensions["schema_registry"]["state"] is None:
+            ensure_schema_state(current_app._get_current_object())
+
+
+def ensure_schema_state(app):
+    """Probe sekali per proses (dan terapkan DDL jika ``SCHEMA_AUTO_APPLY``)."""
+    from app import db
+
+    registry = app.extensions["schema_registry"]
+    with registry["lock"]:
+        if registry["state"] is not None:
+            return registry["state"]
+        try:
+            state = probe_schema(db.engine)
+            pending = state.pending_ddl()
+            if pending and app.config["SCHEMA_AUTO_APPLY"]:
+                state, applied = apply_schema(db.engine, state)
+                logging.info("Skema dilengkapi otomatis: %s", "; ".join(applied))
+            elif pending:
+                logging.warning(
+                    "Skema belum lengkap (%s). Jalankan `flask schema apply`.",
+                    "; ".join(pending),
+                )
+        except Exception:
+            logging.exception("Gagal memeriksa skema database")
+            return None
+        registry["state"] = state
+        return state
+
+
+def refresh_schema_state(app=None):
+    """Probe ulang tanpa DDL, misalnya setelah migrasi di proses yang sama."""
+    from app import db
+
+    app = app or current_app._get_current_object()
+    state = probe_schema(db.engine)
+    app.extensions["schema_registry"]["state"] = state
+    return state
+
+
+def schema_state(app=None):
+    app = app or current_app._get_current_object()
+    state = app.extensions["schema_registry"]["state"]
+    if state is None:
+        state = ensure_schema_state(app)
+    return state
+
+
+def table_ready(*names, connection=None):
+    """True jika semua tabel ada menurut peta skema (tanpa query ke database).
+
+    Dari hook flush, kirim ``connection`` sesi: bila proses belum pernah
+    probe, inspector berjalan di transaksi itu (tanpa DDL, tanpa disimpan)
+    alih-alih meminjam koneksi lain di tengah flush.
+    """
+    if connection is not None:
+        state = current_app.extensions["schema_registry"]["state"] or probe_schema(connection)
+        return all(state.has_table(name) for name in names)
+    state = schema_state()
+    return state is not None and all(state.has_table(name) for name in names)
+
+
+def columns_ready(table, *names):
+    state = schema_state()
+    return state is not None and state.has_columns(table, *names)
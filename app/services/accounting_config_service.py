@@ -0,0 +1,121 @@
+"""Cache per proses untuk pengaturan akuntansi dan periode yang dikunci.
+
+Keduanya hanya berubah beberapa kali setahun tetapi dibaca di setiap
+checkout, hapus penjualan dan pembelian. Cache dikunci ke revisi global
+``app_setting`` (lihat ``settings_service``): perubahan ``AccountingSetting``
+atau ``AccountingPeriod`` menaikkan revisi itu di transaksi yang sama, dan
+semua worker memuat ulang pada request berikutnya. Karena revisi sudah dicek
+sekali per request untuk pengaturan aplikasi, pembacaan di sini tidak
+menambah query.
+"""
+
+import threading
+from bisect import bisect_right
+from collections import namedtuple
+from datetime import datetime
+
+from sqlalchemy import event
+
+from app import db
+from app.models import AccountingPeriod, AccountingSetting
+from app.schema_registry import table_ready
+from app.services.settings_service import bump_settings_revision, settings_revision
+
+AccountingConfig = namedtuple(
+    "AccountingConfig",
+    [
+        "inventory_account_id",
+        "cogs_account_id",
+        "inventory_adjustment_account_id",
+        "marketplace_expense_account_id",
+        "marketplace_payable_account_id",
+    ],
+)
+LockedPeriod = namedtuple("LockedPeriod", ["id", "label", "start_date", "end_date"])
+
+
+class LockedPeriodIndex:
+    """Interval periode terkunci, urut ``start_date``; cari dengan bisect."""
+
+    __slots__ = ("periods", "starts", "max_ends")
+
+    def __init__(self, periods):
+        self.periods = sorted(periods, key=lambda item: (item.start_date, item.id))
+        self.starts = [period.start_date for period in self.periods]
+        # end_date terjauh sampai indeks i, supaya pencarian mundur bisa berhenti
+        self.max_ends = []
+        for period in self.periods:
+            previous = self.max_ends[-1] if self.max_ends else period.end_date
+            self.max_ends.append(max(previous, period.end_date))
+
+    def find(self, day):
+        """Periode terkunci yang memuat ``day``; start terbaru menang jika tumpang tindih."""
+        index = bisect_right(self.starts, day) - 1
+        while index >= 0 and self.max_ends[index] >= day:
+            period = self.periods[index]
+            if period.end_date >= day:
+                return period
+            index -= 1
+        return None
+
+
+_cache = {"revision": None, "config": None, "locked": None}
+_cache_lock = threading.Lock()
+
+
+def _load_config():
+    setting = AccountingSetting.query.order_by(AccountingSetting.id.asc()).first()
+    if setting is None:
+        return None
+    return AccountingConfig(*(getattr(setting, field) for field in AccountingConfig._fields))
+
+
+def _load_locked_periods():
+    rows = db.session.query(
+        AccountingPeriod.id,
+        AccountingPeriod.label,
+        AccountingPeriod.start_date,
+        AccountingPeriod.end_date,
+    ).filter(AccountingPeriod.is_locked.is_(True))
+    return LockedPeriodIndex(LockedPeriod(*row) for row in rows)
+
+
+def _cached():
+    revision = settings_revision()
+    if revision is None:
+        return None
+    if _cache["revision"] != revision:
+        config = _load_config()
+        locked = _load_locked_periods()
+        with _cache_lock:
+            _cache.update(revision=revision, config=config, locked=locked)
+    return _cache
+
+
+def accounting_config():
+    """Id akun dari ``AccountingSetting`` sebagai ``AccountingConfig`` (atau None)."""
+    cache = _cached()
+    if cache is None:
+        return _load_config()
+    return cache["config"]
+
+
+def locked_period_for(day):
+    """``LockedPeriod`` yang memuat tanggal ``day``, atau None."""
+    if not day:
+        return None
+    if isinstance(day, datetime):
+        day = day.date()
+    cache = _cached()
+    index = cache["locked"] if cache is not None else _load_locked_periods()
+    return index.find(day)
+
+
+@event.listens_for(db.session, "after_flush")
+def _bump_on_accounting_change(session, _flush_context):
+    changed = (
+        isinstance(obj, (AccountingSetting, AccountingPeriod))
+        for obj in (*session.new, *session.dirty, *session.deleted)
+    )
+    if any(changed) and table_ready("app_setting"):
+        bump_settings_revision(session.connection())
@@ -0,0 +1,458 @@
+"""Katalog produk/pelanggan untuk layar POS dengan versi dan delta sync.
+
+Setiap perubahan ``Produk``, ``ProductPriceLevel`` dan ``Pelanggan`` dicatat
+di tabel ``catalog_change``; id baris terakhir menjadi versi katalog. Klien
+menyimpan versi terakhir yang dimilikinya lalu meminta perubahan sesudahnya.
+
+Id autoincrement dibagikan saat insert, bukan saat commit: di MySQL/PostgreSQL
+transaksi yang commit belakangan bisa memunculkan id di bawah versi yang
+sudah diterima klien. Karena itu versi dikirim bersama ``window``: jumlah
+baris log sampai versi itu yang dibuat dalam ``CATALOG_SYNC_WINDOW`` detik
+(default 120) sebelumnya. Jumlah ini hanya berubah bila ada commit terlambat;
+saat itu ETag ikut berubah dan delta membaca ulang jendela tersebut.
+Transaksi yang commit lebih lama dari jendela tidak tertangani.
+
+Log dipadatkan lewat ``flask catalog compact``; klien yang versinya lebih tua
+dari baris tertua yang tersisa menerima snapshot penuh.
+"""
+
+import os
+from collections import namedtuple
+from datetime import timedelta
+
+from flask import current_app
+from sqlalchemy import event, func
+
+from app import db
+from app.models import (
+    CatalogChange,
+    Kategori,
+    Pelanggan,
+    PriceLevel,
+    ProductPriceLevel,
+    Produk,
+    Satuan,
+)
+from app.time_utils import local_now
+
+CATALOG_PRODUCTS = "products"
+CATALOG_CUSTOMERS = "customers"
+CATALOG_KINDS = (CATALOG_PRODUCTS, CATALOG_CUSTOMERS)
+
+DEFAULT_PAGE_SIZE = 2000
+MAX_PAGE_SIZE = 5000
+# Delta yang lebih besar dari ini lebih murah dikirim sebagai snapshot penuh
+MAX_DELTA_ITEMS = 5000
+DEFAULT_SYNC_WINDOW = 120
+DEFAULT_RETENTION_DAYS = 30
+
+CatalogState = namedtuple("CatalogState", "version window")
+
+
+def _collect_changes(session):
+    changes = []
+
+    def add(entity, entity_id, op="upsert"):
+        changes.append((entity, entity_id, op))
+
+    for obj in session.new:
+        if isinstance(obj, Produk):
+            add(CATALOG_PRODUCTS, obj.id)
+        elif isinstance(obj, ProductPriceLevel):
+            add(CATALOG_PRODUCTS, obj.product_id)
+        elif isinstance(obj, Pelanggan):
+            add(CATALOG_CUSTOMERS, obj.id)
+
+    for obj in session.dirty:
+        if not session.is_modified(obj, include_collections=False):
+            continue
+        if isinstance(obj, Produk):
+            add(CATALOG_PRODUCTS, obj.id)
+        elif isinstance(obj, ProductPriceLevel):
+            add(CATALOG_PRODUCTS, obj.product_id)
+        elif isinstance(obj, Pelanggan):
+            add(CATALOG_CUSTOMERS, obj.id)
+        elif isinstance(obj, (Kategori, Satuan)):
+            add(CATALOG_PRODUCTS, None, "reset")
+        elif isinstance(obj, PriceLevel):
+            add(CATALOG_CUSTOMERS, None, "reset")
+
+    for obj in session.deleted:
+        if isinstance(obj, Produk):
+            add(CATALOG_PRODUCTS, obj.id, "delete")
+        elif isinstance(obj, ProductPriceLevel):
+            add(CATALOG_PRODUCTS, obj.product_id)
+        elif isinstance(obj, Pelanggan):
+            add(CATALOG_CUSTOMERS, obj.id, "delete")
+        elif isinstance(obj, (Kategori, Satuan)):
+            add(CATALOG_PRODUCTS, None, "reset")
+        elif isinstance(obj, PriceLevel):
+            add(CATALOG_PRODUCTS, None, "reset")
+            add(CATALOG_CUSTOMERS, None, "reset")
+
+    # buang duplikat dalam satu flush; penghapusan selalu menang
+    unique = {}
+    for entity, entity_id, op in changes:
+        if unique.get((entity, entity_id)) == "delete":
+            continue
+        unique[(entity, entity_id)] = op
+    return unique
+
+
+@event.listens_for(db.session, "after_flush")
+def _log_catalog_changes(session, _flush_context):
+    unique = _collect_changes(session)
+    if not unique:
+        return
+    now = local_now()
+    rows = [
+        {"entity": entity, "entity_id": entity_id, "op": op, "created_at": now}
+        for (entity, entity_id), op in unique.items()
+    ]
+    session.connection().execute(CatalogChange.__table__.insert(), rows)
+    session.info["catalog_changed"] = True
+
+
+def record_catalog_changes(entity, entity_ids, op="upsert"):
+    """Catat perubahan yang ditulis lewat bulk UPDATE/INSERT (melewati ORM)."""
+    ids = sorted({int(entity_id) for entity_id in entity_ids if entity_id})
+    if not ids:
+        return
+    now = local_now()
+    db.session.execute(
+        CatalogChange.__table__.insert(),
+        [
+            {"entity": entity, "entity_id": entity_id, "op": op, "created_at": now}
+            for entity_id in ids
+        ],
+    )
+    db.session.info["catalog_changed"] = True
+
+
+def get_catalog_version(kind):
+    version = (
+        db.session.query(func.max(CatalogChange.id))
+        .filter(CatalogChange.entity == kind)
+        .scalar()
+    )
+    return int(version or 0)
+
+
+def sync_window():
+    """Jendela aman (timedelta) untuk perubahan yang commit terlambat."""
+    value = current_app.config.get("CATALOG_SYNC_WINDOW")
+    if value is None:
+        try:
+            value = float(os.environ.get("CATALOG_SYNC_WINDOW", DEFAULT_SYNC_WINDOW))
+        except ValueError:
+            value = float(DEFAULT_SYNC_WINDOW)
+        current_app.config["CATALOG_SYNC_WINDOW"] = value
+    return timedelta(seconds=float(value))
+
+
+def _window_count(kind, version, version_at):
+    return int(
+        db.session.query(func.count(CatalogChange.id))
+        .filter(CatalogChange.entity == kind)
+        .filter(CatalogChange.id <= version)
+        .filter(CatalogChange.created_at >= version_at - sync_window())
+        .scalar()
+        or 0
+    )
+
+
+def get_catalog_state(kind):
+    """``CatalogState`` terkini; dibaca sebelum data agar commit sesudahnya ikut delta berikutnya."""
+    latest = (
+        db.session.query(CatalogChange.id, CatalogChange.created_at)
+        .filter(CatalogChange.entity == kind)
+        .order_by(CatalogChange.id.desc())
+        .first()
+    )
+    if latest is None:
+        return CatalogState(0, 0)
+    return CatalogState(latest[0], _window_count(kind, *latest))
+
+
+def catalog_etag(kind, state):
+    return f"catalog-{kind}-v{state.version}.{state.window}"
+
+
+def compact_catalog_changes(days=DEFAULT_RETENTION_DAYS):
+    """
+    Hapus log perubahan yang lebih tua dari ``days`` hari.
+
+    Baris terbaru per katalog selalu disisakan agar versi tidak mundur; klien
+    dengan versi di bawah baris tertua yang tersisa akan sinkron ulang penuh.
+    """
+    cutoff = local_now() - timedelta(days=days)
+    removed = 0
+    for kind in CATALOG_KINDS:
+        version = get_catalog_version(kind)
+        removed += (
+            db.session.query(CatalogChange)
+            .filter(CatalogChange.entity == kind)
+            .filter(CatalogChange.created_at < cutoff)
+            .filter(CatalogChange.id < version)
+            .delete(synchronize_session=False)
+        )
+    return removed
+
+
+def _delta_floor(kind, since, window):
+    """Id awal pembacaan delta untuk ``since``, atau None jika perlu sinkron penuh."""
+    oldest = (
+        db.session.query(func.min(CatalogChange.id))
+        .filter(CatalogChange.entity == kind)
+        .scalar()
+    )
+    if oldest is None or since < oldest:
+        return None
+    since_at = (
+        db.session.query(CatalogChange.created_at)
+        .filter(CatalogChange.id == since, CatalogChange.entity == kind)
+        .scalar()
+    )
+    if since_at is None:
+        return None
+    if window is not None and _window_count(kind, since, since_at) == window:
+        return since
+    # ada commit terlambat (atau klien lama tanpa ``window``): baca ulang jendela
+    floor = (
+        db.session.query(func.min(CatalogChange.id))
+        .filter(CatalogChange.entity == kind)
+        .filter(CatalogChange.created_at >= since_at - sync_window())
+        .scalar()
+    )
+    return min(since, floor) - 1
+
+
+def serialize_products(criterion, limit=None):
+    """Baris katalog produk (dict) untuk ``criterion``, urut id."""
+    query = (
+        db.session.query(
+            Produk.id,
+            Produk.nama_produk,
+            Produk.kode_produk,
+            Produk.harga,
+            Produk.sku,
+            Produk.barcode,
+            Kategori.name,
+            Satuan.name,
+            Produk.stok_lama,
+            Produk.stok_minimal,
+            Produk.harga_lama,
+            Produk.harga_beli,
+            Produk.berat,
+        )
+        .outerjoin(Kategori, Produk.kategori_id == Kategori.id)
+        .outerjoin(Satuan, Produk.satuan_id == Satuan.id)
+        .filter(criterion)
+        .order_by(Produk.id.asc())
+    )
+    if limit:
+        query = query.limit(limit)
+    rows = query.all()
+    product_ids = [row[0] for row in rows]
+    level_price_map = {}
+    if product_ids:
+        level_rows = (
+            db.session.query(
+                ProductPriceLevel.product_id,
+                ProductPriceLevel.level_id,
+                ProductPriceLevel.price,
+            )
+            .filter(ProductPriceLevel.product_id.in_(product_ids))
+            .all()
+        )
+        for product_id, level_id, price in level_rows:
+            level_price_map.setdefault(product_id, {})[level_id] = float(price or 0.0)
+
+    payload = []
+    for (
+        product_id,
+        name,
+        code,
+        price,
+        sku,
+        barcode,
+        kategori_name,
+        satuan_name,
+        stok,
+        stok_minimal,
+        harga_lama,
+        harga_beli,
+        berat,
+    ) in rows:
+        payload.append(
+            {
+                "id": product_id,
+                "name": name,
+                "code": code,
+                "price": float(price or 0.0),
+                "sku": sku,
+                "barcode": barcode,
+                "kategori": kategori_name,
+                "satuan": satuan_name,
+                "level_prices": level_price_map.get(product_id, {}),
+                "stok": stok,
+                "stok_minimal": stok_minimal,
+                "hpp": float(harga_lama or harga_beli or 0.0),
+                "last_cost": float(harga_beli or 0.0),
+                "harga_beli": float(harga_beli or 0.0),
+                "weight": float(berat or 0.0),
+            }
+        )
+    return payload
+
+
+def _serialize_customers(criterion, limit=None):
+    query = (
+        db.session.query(
+            Pelanggan.id,
+            Pelanggan.nama,
+            Pelanggan.pelanggan_id,
+            Pelanggan.kontak,
+            Pelanggan.alamat,
+            Pelanggan.price_level_id,
+            PriceLevel.name,
+        )
+        .outerjoin(PriceLevel, Pelanggan.price_level_id == PriceLevel.id)
+        .filter(criterion)
+        .order_by(Pelanggan.id.asc())
+    )
+    if limit:
+        query = query.limit(limit)
+    rows = query.all()
+    return [
+        {
+            "id": customer_id,
+            "name": name,
+            "code": code,
+            "kontak": kontak,
+            "alamat": alamat,
+            "price_level_id": price_level_id,
+            "price_level_name": price_level_name,
+        }
+        for (
+            customer_id,
+            name,
+            code,
+            kontak,
+            alamat,
+            price_level_id,
+            price_level_name,
+        ) in rows
+    ]
+
+
+def _catalog_model(kind):
+    return Produk if kind == CATALOG_PRODUCTS else Pelanggan
+
+
+def _serialize(kind, criterion, limit=None):
+    if kind == CATALOG_PRODUCTS:
+        return serialize_products(criterion, limit)
+    return _serialize_customers(criterion, limit)
+
+
+def serialize_customer(customer):
+    """Payload satu pelanggan dengan format yang sama seperti katalog."""
+    if not customer:
+        return None
+    return {
+        "id": customer.id,
+        "name": customer.nama,
+        "code": customer.pelanggan_id,
+        "kontak": customer.kontak,
+        "alamat": customer.alamat,
+        "price_level_id": customer.price_level_id,
+        "price_level_name": (
+            customer.price_level.name if customer.price_level else None
+        ),
+    }
+
+
+def _full_page(kind, state, after, limit):
+    model = _catalog_model(kind)
+    items = _serialize(kind, model.id > after, limit)
+    next_after = items[-1]["id"] if len(items) == limit else None
+    return {
+        "kind": kind,
+        "version": state.version,
+        "window": state.window,
+        "mode": "full",
+        "items": items,
+        "deleted": [],
+        "next_after": next_after,
+    }
+
+
+def build_catalog_payload(
+    kind, since=None, after=None, limit=None, state=None, window=None
+):
+    """
+    Bangun respons katalog.
+
+    ``since`` kosong/0 menghasilkan snapshot penuh yang dipaging dengan
+    ``after`` (id terakhir halaman sebelumnya). ``since`` > 0 mengembalikan
+    item yang berubah setelah versi tersebut (ditambah jendela sinkron), atau
+    snapshot penuh jika log perubahan meminta sinkron ulang atau sudah
+    dipadatkan melewati ``since``. ``window`` adalah nilai yang diterima
+    klien bersama ``since``; tanpa itu jendela sinkron selalu dibaca ulang.
+    """
+    if kind not in CATALOG_KINDS:
+        raise ValueError(f"Katalog tidak dikenal: {kind}")
+    limit = max(1, min(int(limit or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+    if state is None:
+        state = get_catalog_state(kind)
+    version = state.version
+    since = int(since or 0)
+    after = int(after or 0)
+
+    if since <= 0 or since > version:
+        return _full_page(kind, state, after, limit)
+    floor = _delta_floor(kind, since, window)
+    if floor is None:
+        return _full_page(kind, state, 0, limit)
+
+    changes = (
+        db.session.query(CatalogChange.entity_id, CatalogChange.op)
+        .filter(CatalogChange.entity == kind)
+        .filter(CatalogChange.id > floor)
+        .filter(CatalogChange.id <= version)
+        .order_by(CatalogChange.id.asc())
+        .all()
+    )
+    latest_ops = {}
+    for entity_id, op in changes:
+        if entity_id is None:
+            return _full_page(kind, state, 0, limit)
+        latest_ops[entity_id] = op
+    if len(latest_ops) > MAX_DELTA_ITEMS:
+        return _full_page(kind, state, 0, limit)
+
+    deleted = sorted(
+        entity_id for entity_id, op in latest_ops.items() if op == "delete"
+    )
+    upsert_ids = sorted(
+        entity_id for entity_id, op in latest_ops.items() if op != "delete"
+    )
+    items = []
+    model = _catalog_model(kind)
+    for offset in range(0, len(upsert_ids), 500):
+        chunk = upsert_ids[offset : offset + 500]
+        items.extend(_serialize(kind, model.id.in_(chunk)))
+    # baris yang sudah dihapus setelah dicatat sebagai upsert
+    found_ids = {item["id"] for item in items}
+    deleted.extend(entity_id for entity_id in upsert_ids if entity_id not in found_ids)
+
+    return {
+        "kind": kind,
+        "version": version,
+        "window": state.window,
+        "mode": "delta",
+        "items": items,
+        "deleted": sorted(deleted),
+        "next_after": None,
+    }
@@ -0,0 +1,98 @@
+"""Pencarian pelanggan dengan keyset pagination dan statistik ber-cache.
+
+Saran pelanggan diurutkan ``(nama, id)`` dan dipaging dengan cursor
+``after=<nama>,<id>``; ``has_next`` diketahui dari mengambil ``limit + 1``
+baris, jadi tidak ada ``COUNT(*)`` di setiap ketikan.
+
+Statistik halaman pelanggan (total, kontak/alamat lengkap, kontak unik)
+dihitung dengan satu query agregat dan disimpan per proses, dikunci ke versi
+katalog pelanggan (``catalog_change``). Setiap tulis ``Pelanggan`` menaikkan
+versi itu, sehingga semua worker menghitung ulang pada request berikutnya.
+"""
+
+import threading
+from collections import namedtuple
+
+from sqlalchemy import and_, case, func, or_
+from sqlalchemy.orm import joinedload
+
+from app import db
+from app.models import Pelanggan
+from app.services.catalog_service import CATALOG_CUSTOMERS, get_catalog_version
+
+CustomerStats = namedtuple(
+    "CustomerStats", ["total", "complete_contacts", "complete_addresses", "unique_contacts"]
+)
+
+SEARCH_COLUMNS = ("nama", "pelanggan_id", "kontak", "email")
+
+_cache = {"version": None, "stats": None}
+_cache_lock = threading.Lock()
+
+
+def customer_search_filter(term):
+    like = f"%{term}%"
+    return or_(*(getattr(Pelanggan, name).ilike(like) for name in SEARCH_COLUMNS))
+
+
+def encode_cursor(customer):
+    return f"{customer.nama},{customer.id}"
+
+
+def decode_cursor(value):
+    """``"<nama>,<id>"`` -> ``(nama, id)``; nama boleh mengandung koma."""
+    if not value:
+        return None
+    nama, _, raw_id = value.rpartition(",")
+    try:
+        return nama, int(raw_id)
+    except ValueError:
+        return None
+
+
+def suggest_customers(term, after=None, limit=8):
+    """Satu halaman saran: ``(pelanggan, cursor_berikutnya_atau_None)``."""
+    query = Pelanggan.query.options(joinedload(Pelanggan.price_level)).filter(
+        customer_search_filter(term)
+    )
+    cursor = decode_cursor(after)
+    if cursor:
+        nama, customer_id = cursor
+        query = query.filter(
+            or_(
+                Pelanggan.nama > nama,
+                and_(Pelanggan.nama == nama, Pelanggan.id > customer_id),
+            )
+        )
+    rows = query.order_by(Pelanggan.nama.asc(), Pelanggan.id.asc()).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
+
+
+def _filled(column):
+    return and_(column.isnot(None), column != "")
+
+
+def _load_stats():
+    row = db.session.query(
+        func.count(Pelanggan.id),
+        func.coalesce(func.sum(case((_filled(Pelanggan.kontak), 1), else_=0)), 0),
+        func.coalesce(func.sum(case((_filled(Pelanggan.alamat), 1), else_=0)), 0),
+        func.count(
+            func.distinct(case((_filled(Pelanggan.kontak), func.lower(Pelanggan.kontak))))
+        ),
+    ).one()
+    return CustomerStats(*(int(value or 0) for value in row))
+
+
+def customer_stats():
+    """``CustomerStats`` terkini; dihitung ulang hanya jika versi katalog pelanggan berubah."""
+    version = get_catalog_version(CATALOG_CUSTOMERS)
+    if _cache["version"] != version or _cache["stats"] is None:
+        stats = _load_stats()
+        with _cache_lock:
+            _cache.update(version=version, stats=stats)
+        return stats
+    return _cache["stats"]
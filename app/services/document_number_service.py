@@ -0,0 +1,191 @@
+"""Penomoran dokumen berbasis tabel ``document_sequence``.
+
+Setiap kombinasi prefix + periode punya satu baris penghitung. Nomor diambil
+dengan satu upsert atomik (``INSERT ... ON CONFLICT/ON DUPLICATE KEY UPDATE``)
+di dalam transaksi pemanggil, jadi rollback ikut mengembalikan nomornya dan
+tidak ada lagi loop ``filter_by(...).first()`` untuk mencari nomor kosong.
+
+Format bisa diatur per jenis dokumen lewat env:
+``DOCUMENT_NUMBER_FORMAT_<JENIS>`` (placeholder ``{prefix}``, ``{period}``,
+``{seq}``) dan ``DOCUMENT_PERIOD_FORMAT_<JENIS>`` (pola strftime, kosong =
+tidak pernah reset). Contoh: ``DOCUMENT_NUMBER_FORMAT_SALES_INVOICE=
+{prefix}/{period}/{seq:05d}`` dan ``DOCUMENT_PERIOD_FORMAT_SALES_INVOICE=%Y%m``.
+"""
+
+import os
+import re
+import sqlite3
+import string
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app import db
+from app.models import DocumentSequence
+from app.time_utils import local_now
+
+DOCUMENT_SALES_INVOICE = "sales_invoice"
+DOCUMENT_PURCHASE_INVOICE = "purchase_invoice"
+DOCUMENT_QUOTATION = "quotation"
+DOCUMENT_PURCHASE_ORDER = "purchase_order"
+DOCUMENT_JOURNAL = "journal"
+DOCUMENT_STOCK_OPNAME = "stock_opname"
+
+DOCUMENT_DEFAULT_PREFIXES = {
+    DOCUMENT_SALES_INVOICE: "F",
+    DOCUMENT_PURCHASE_INVOICE: "INV",
+    DOCUMENT_QUOTATION: "Q",
+    DOCUMENT_PURCHASE_ORDER: "PO",
+    DOCUMENT_JOURNAL: "JV",
+    DOCUMENT_STOCK_OPNAME: "SO",
+}
+
+# tanda "-" memisahkan nomor urut dari tanggal sehingga tidak pernah bentrok
+# dengan nomor lama berbasis timestamp (mis. F202610171230)
+DEFAULT_NUMBER_FORMAT = "{prefix}{period}-{seq:04d}"
+DEFAULT_PERIOD_FORMAT = "%Y%m%d"
+
+_UPSERT_RETURNING_DIALECTS = {"postgresql"}
+if sqlite3.sqlite_version_info >= (3, 35):
+    _UPSERT_RETURNING_DIALECTS.add("sqlite")
+
+
+def get_document_format(doc_type):
+    """Kembalikan ``(format_nomor, format_periode)`` untuk jenis dokumen."""
+    if doc_type not in DOCUMENT_DEFAULT_PREFIXES:
+        raise ValueError(f"Jenis dokumen tidak dikenal: {doc_type}")
+    key = doc_type.upper()
+    number_format = (
+        os.environ.get(f"DOCUMENT_NUMBER_FORMAT_{key}") or ""
+    ).strip() or DEFAULT_NUMBER_FORMAT
+    if "{seq" not in number_format:
+        raise ValueError(f"Format nomor {doc_type} wajib memuat {{seq}}.")
+    period_format = os.environ.get(f"DOCUMENT_PERIOD_FORMAT_{key}")
+    if period_format is None:
+        period_format = DEFAULT_PERIOD_FORMAT
+    return number_format, period_format.strip()
+
+
+def _resolve(doc_type, prefix, when):
+    number_format, period_format = get_document_format(doc_type)
+    clean_prefix = (prefix or "").strip() or DOCUMENT_DEFAULT_PREFIXES[doc_type]
+    period = (when or local_now()).strftime(period_format) if period_format else ""
+    return number_format, clean_prefix, period
+
+
+def _format_number(number_format, prefix, period, seq):
+    return number_format.format(prefix=prefix, period=period, seq=seq)
+
+
+def _upsert_counter(prefix, period, initial, counter_expr):
+    """
+    Naikkan penghitung dalam satu round-trip dan kembalikan nilai barunya.
+
+    ``initial`` dipakai saat baris belum ada; ``counter_expr`` adalah nilai
+    baru untuk baris yang sudah ada.
+    """
+    table = DocumentSequence.__table__
+    now = local_now()
+    values = {"prefix": prefix, "period": period, "counter": initial, "updated_at": now}
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect in _UPSERT_RETURNING_DIALECTS:
+        insert_fn = sqlite_insert if dialect == "sqlite" else postgresql_insert
+        stmt = (
+            insert_fn(table)
+            .values(**values)
+            .on_conflict_do_update(
+                index_elements=[table.c.prefix, table.c.period],
+                set_={"counter": counter_expr, "updated_at": now},
+            )
+            .returning(table.c.counter)
+        )
+        return int(db.session.execute(stmt).scalar_one())
+
+    if dialect in ("mysql", "mariadb"):
+        # LAST_INSERT_ID(expr) menyimpan nilai counter untuk koneksi ini
+        stmt = mysql_insert(table).values(**values)
+        stmt = stmt.on_duplicate_key_update(
+            counter=func.last_insert_id(counter_expr), updated_at=now
+        )
+        result = db.session.execute(stmt)
+        if result.rowcount == 1:
+            return initial
+        return int(db.session.execute(select(func.last_insert_id())).scalar_one())
+
+    criteria = (table.c.prefix == prefix, table.c.period == period)
+    result = db.session.execute(
+        update(table).where(*criteria).values(counter=counter_expr, updated_at=now)
+    )
+    if not result.rowcount:
+        db.session.execute(table.insert().values(**values))
+        return initial
+    return int(db.session.execute(select(table.c.counter).where(*criteria)).scalar_one())
+
+
+def allocate_document_numbers(doc_type, count=1, prefix=None, when=None):
+    """Pesan ``count`` nomor berurutan sekaligus (mis. untuk impor massal)."""
+    count = int(count)
+    if count <= 0:
+        return []
+    number_format, clean_prefix, period = _resolve(doc_type, prefix, when)
+    counter = DocumentSequence.__table__.c.counter
+    last = _upsert_counter(clean_prefix, period, count, counter + count)
+    return [
+        _format_number(number_format, clean_prefix, period, seq)
+        for seq in range(last - count + 1, last + 1)
+    ]
+
+
+def allocate_document_number(doc_type, prefix=None, when=None):
+    return allocate_document_numbers(doc_type, 1, prefix=prefix, when=when)[0]
+
+
+def preview_document_number(doc_type, prefix=None, when=None):
+    """Nomor berikutnya untuk ditampilkan di form; tidak memesan apa pun."""
+    number_format, clean_prefix, period = _resolve(doc_type, prefix, when)
+    current = (
+        db.session.query(DocumentSequence.counter)
+        .filter_by(prefix=clean_prefix, period=period)
+        .scalar()
+    )
+    return _format_number(number_format, clean_prefix, period, int(current or 0) + 1)
+
+
+def _parse_sequence(number_format, prefix, period, number):
+    parts = []
+    for literal, field, spec, _conversion in string.Formatter().parse(number_format):
+        parts.append(re.escape(literal))
+        if field is None:
+            continue
+        if field == "seq":
+            parts.append(r"(?P<seq>\d+)")
+        elif field == "prefix":
+            parts.append(re.escape(format(prefix, spec or "")))
+        elif field == "period":
+            parts.append(re.escape(format(period, spec or "")))
+        else:
+            return None
+    match = re.fullmatch("".join(parts), number or "")
+    return int(match.group("seq")) if match else None
+
+
+def claim_document_number(doc_type, number, prefix=None, when=None):
+    """
+    Tandai nomor hasil ``preview_document_number`` sebagai terpakai.
+
+    Penghitung dimajukan ke nomor tersebut (tidak pernah mundur) agar alokasi
+    berikutnya tidak mengulanginya. Nomor dengan format lain diabaikan dan
+    fungsi mengembalikan False.
+    """
+    number_format, clean_prefix, period = _resolve(doc_type, prefix, when)
+    seq = _parse_sequence(number_format, clean_prefix, period, (number or "").strip())
+    if not seq:
+        return False
+    counter = DocumentSequence.__table__.c.counter
+    _upsert_counter(
+        clean_prefix, period, seq, case((counter < seq, seq), else_=counter)
+    )
+    return True
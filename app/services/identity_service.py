@@ -0,0 +1,148 @@
+"""Identitas user yang login, tanpa query dan tanpa menulis cookie per request.
+
+Session menyimpan ``user_id``, ``username``, ``role``, ``email`` dan
+``auth_version`` (stamp) sejak login. Setiap worker punya cache kecil
+``user_id -> identitas`` yang berlaku ``USER_CACHE_TTL`` detik (default 30);
+selama masih berlaku tidak ada query ke tabel user. Setelah kedaluwarsa satu
+query ringan memuat ulang identitas. Payload session hanya ditulis ulang bila
+stamp di session berbeda dengan ``User.auth_version`` (role, email, username
+atau password berubah), jadi response biasa tidak mengirim ``Set-Cookie``.
+Jika ``User.password_version`` ikut berubah (password diganti/direset) session
+dibersihkan dan user harus login ulang; session yang sedang mengganti
+passwordnya sendiri di-stamp ulang lewat ``remember_login``.
+
+Perubahan user lewat ORM langsung membuang entri cache di worker yang sama;
+worker lain melihatnya paling lambat setelah TTL.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from flask import current_app
+from sqlalchemy import event, inspect
+
+from app import db
+from app.models import User
+
+CurrentUser = namedtuple(
+    "CurrentUser", ["id", "username", "role", "email", "auth_version", "password_version"]
+)
+
+SESSION_KEYS = ("username", "role", "email", "auth_version", "password_version")
+STAMPED_FIELDS = ("username", "email", "role", "password")
+MAX_CACHED_USERS = 512
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _ttl():
+    value = current_app.config.get("USER_CACHE_TTL")
+    if value is None:
+        try:
+            value = float(os.environ.get("USER_CACHE_TTL", 30))
+        except ValueError:
+            value = 30.0
+        current_app.config["USER_CACHE_TTL"] = value
+    return float(value)
+
+
+def forget_user(user_id):
+    with _cache_lock:
+        _cache.pop(user_id, None)
+
+
+def _load_identity(user_id):
+    row = (
+        db.session.query(
+            User.id,
+            User.username,
+            User.role,
+            User.email,
+            User.auth_version,
+            User.password_version,
+        )
+        .filter(User.id == user_id)
+        .first()
+    )
+    return CurrentUser(*row) if row else None
+
+
+def _cached_identity(user_id):
+    now = time.monotonic()
+    with _cache_lock:
+        entry = _cache.get(user_id)
+    if entry and entry[1] > now:
+        return entry[0]
+    identity = _load_identity(user_id)
+    with _cache_lock:
+        if identity is None:
+            _cache.pop(user_id, None)
+        else:
+            _cache[user_id] = (identity, now + _ttl())
+            _cache.move_to_end(user_id)
+            while len(_cache) > MAX_CACHED_USERS:
+                _cache.popitem(last=False)
+    return identity
+
+
+def remember_login(session, user):
+    """Isi payload session saat login (atau saat stamp berubah)."""
+    session["user_id"] = user.id
+    for key in SESSION_KEYS:
+        session[key] = getattr(user, key)
+
+
+def clear_login(session):
+    session.pop("user_id", None)
+    for key in SESSION_KEYS:
+        session.pop(key, None)
+
+
+def current_identity(session):
+    """``CurrentUser`` untuk session ini, atau None (session dibersihkan)."""
+    user_id = session.get("user_id")
+    identity = _cached_identity(user_id) if user_id else None
+    if identity is None:
+        if user_id or any(key in session for key in SESSION_KEYS):
+            clear_login(session)
+        return None
+    if session.get("auth_version") != identity.auth_version:
+        password_version = session.get("password_version")
+        # session lama tanpa stamp password dilengkapi sekali
+        if password_version is not None and password_version != identity.password_version:
+            clear_login(session)
+            return None
+        remember_login(session, identity)
+    return identity
+
+
+@event.listens_for(db.session, "before_flush")
+def _stamp_user_changes(session, _flush_context, _instances):
+    changed = session.info.setdefault("changed_user_ids", set())
+    for obj in session.dirty:
+        if not isinstance(obj, User):
+            continue
+        state = inspect(obj)
+        if any(state.attrs[field].history.has_changes() for field in STAMPED_FIELDS):
+            obj.auth_version = (obj.auth_version or 1) + 1
+            if state.attrs.password.history.has_changes():
+                obj.password_version = (obj.password_version or 1) + 1
+            changed.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            changed.add(obj.id)
+
+
+@event.listens_for(db.session, "after_commit")
+def _forget_changed_users(session):
+    # dibuang setelah commit supaya request lain tidak menyimpan baris lama
+    for user_id in session.info.pop("changed_user_ids", ()):
+        forget_user(user_id)
+
+
+@event.listens_for(db.session, "after_rollback")
+def _discard_changed_users(session):
+    session.info.pop("changed_user_ids", None)
@@ -0,0 +1,311 @@
+"""Job import latar belakang (tabel ``import_job``).
+
+Route upload menyimpan file ke berkas sementara, membuat baris ``import_job``
+lalu langsung mengembalikan id job; runner di ``import_service`` berjalan di
+thread pool per proses (``IMPORT_JOB_WORKERS``, default 2) dengan app context
+sendiri. Progres disimpan di memori proses dan juga ke baris job lewat koneksi
+terpisah (paling sering tiap ``PROGRESS_INTERVAL`` detik) supaya worker lain
+yang menerima polling ikut melihatnya. Tulisan itu sekaligus heartbeat
+(``updated_at``); di SQLite dilewati selama sesi import sendiri memegang
+kunci tulis, karena itu runner per baris commit tiap ``ROW_BATCH`` baris.
+
+Thread pool hidup di dalam proses worker, jadi job ikut hilang bila worker
+di-restart atau dimatikan. Polling menandai job ``queued``/``running`` yang
+tidak berjalan di proses ini dan tanpa heartbeat selama
+``IMPORT_JOB_STALE_MINUTES`` (default 15) sebagai gagal; penyelesaian job
+hanya berlaku untuk job yang masih ``running``.
+
+Job gagal tetap menyimpan pesan error dan catatan baris yang sudah terkumpul.
+``IMPORT_JOBS_INLINE=1`` (otomatis untuk SQLite in-memory) menjalankan job
+langsung di request, tetap lewat tabel yang sama.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from flask import current_app
+from sqlalchemy import func, or_, update
+
+from app import db
+from app.models import ImportJob
+from app.services.import_service import IMPORT_RUNNERS
+from app.time_utils import local_now
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+FINAL_STATUSES = (STATUS_DONE, STATUS_FAILED)
+
+PROGRESS_INTERVAL = 1.0
+MAX_STORED_NOTES = 200
+DEFAULT_STALE_MINUTES = 15
+STALE_ERROR = (
+    "Job import terhenti: worker yang memprosesnya berhenti atau di-restart "
+    "sebelum selesai. Unggah ulang file."
+)
+
+# job yang antre/berjalan di proses ini (heartbeat tidak perlu dicek)
+_local_jobs = set()
+_progress = {}
+_progress_lock = threading.Lock()
+_executor_lock = threading.Lock()
+
+
+def _flag(value):
+    return str(value).strip().lower() not in {"0", "false", "no", "off", ""}
+
+
+def jobs_inline(app):
+    inline = app.config.get("IMPORT_JOBS_INLINE", os.environ.get("IMPORT_JOBS_INLINE", "0"))
+    # SQLite in-memory hanya punya satu koneksi bersama; jangan dipakai dua thread
+    return _flag(inline) or db.engine.url.database in (None, "", ":memory:")
+
+
+def stale_after(app):
+    minutes = app.config.get("IMPORT_JOB_STALE_MINUTES") or os.environ.get(
+        "IMPORT_JOB_STALE_MINUTES", DEFAULT_STALE_MINUTES
+    )
+    return timedelta(minutes=max(float(minutes), 1.0))
+
+
+def _executor(app):
+    with _executor_lock:
+        state = app.extensions.setdefault("import_jobs", {"executor": None})
+        if state["executor"] is None:
+            workers = app.config.get("IMPORT_JOB_WORKERS") or os.environ.get(
+                "IMPORT_JOB_WORKERS", "2"
+            )
+            state["executor"] = ThreadPoolExecutor(
+                max_workers=max(int(workers), 1), thread_name_prefix="import-job"
+            )
+        return state["executor"]
+
+
+def submit_import_job(kind, upload_path, filename, user_id=None, options=None):
+    """Catat job lalu jalankan (thread pool atau inline); file upload dihapus setelah selesai."""
+    if kind not in IMPORT_RUNNERS:
+        raise ValueError(f"Jenis import tidak dikenal: {kind}")
+    options = options or {}
+    job = ImportJob(
+        kind=kind,
+        status=STATUS_QUEUED,
+        progress=0,
+        message="Menunggu giliran...",
+        filename=filename,
+        options=json.dumps(options),
+        created_by=user_id,
+        created_at=local_now(),
+        updated_at=local_now(),
+    )
+    db.session.add(job)
+    db.session.commit()
+    app = current_app._get_current_object()
+    with _progress_lock:
+        _local_jobs.add(job.id)
+    if jobs_inline(app):
+        run_import_job(app, job.id, upload_path)
+    else:
+        _executor(app).submit(run_import_job, app, job.id, upload_path)
+    return job
+
+
+class _ProgressReporter:
+    def __init__(self, job_id, persist):
+        self.job_id = job_id
+        self.persist = persist
+        self._last_write = 0.0
+
+    def __call__(self, value, message):
+        value = max(0, min(int(value), 100))
+        with _progress_lock:
+            _progress[self.job_id] = (value, message)
+        now = time.monotonic()
+        if not self.persist or now - self._last_write < PROGRESS_INTERVAL:
+            return
+        if _holds_sqlite_write_lock():
+            # koneksi kedua hanya akan menunggu kunci milik thread ini sendiri
+            return
+        self._last_write = now
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(
+                    update(ImportJob.__table__)
+                    .where(ImportJob.__table__.c.id == self.job_id)
+                    .values(
+                        progress=value,
+                        message=(message or "")[:255],
+                        updated_at=local_now(),
+                    )
+                )
+        except Exception:
+            logging.debug("Gagal menyimpan progres import job %s", self.job_id, exc_info=True)
+
+
+def _holds_sqlite_write_lock():
+    connection = db.session.connection()
+    if connection.dialect.name != "sqlite":
+        return False
+    raw_connection = connection.connection.dbapi_connection
+    return isinstance(raw_connection, sqlite3.Connection) and raw_connection.in_transaction
+
+
+def _claim_job(job_id):
+    """queued -> running; gagal bila job sudah ditandai basi oleh polling."""
+    table = ImportJob.__table__
+    now = local_now()
+    result = db.session.execute(
+        update(table)
+        .where(table.c.id == job_id, table.c.status == STATUS_QUEUED)
+        .values(
+            status=STATUS_RUNNING,
+            started_at=now,
+            updated_at=now,
+            message="Memproses file...",
+        )
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+
+def run_import_job(app, job_id, upload_path):
+    with app.app_context():
+        try:
+            if not _claim_job(job_id):
+                logging.warning("Import job %s tidak lagi antre; dilewati", job_id)
+                return
+            job = db.session.get(ImportJob, job_id)
+            kind, filename = job.kind, job.filename
+            options = json.loads(job.options or "{}")
+            report = _ProgressReporter(job_id, persist=not jobs_inline(app))
+            _run_claimed_job(job_id, kind, filename, options, upload_path, report)
+        finally:
+            with _progress_lock:
+                _local_jobs.discard(job_id)
+                _progress.pop(job_id, None)
+            try:
+                os.unlink(upload_path)
+            except OSError:
+                pass
+
+
+def _run_claimed_job(job_id, kind, filename, options, upload_path, report):
+    try:
+        summary = IMPORT_RUNNERS[kind](upload_path, filename, progress_cb=report, **options)
+    except Exception as exc:
+        db.session.rollback()
+        if not isinstance(exc, ValueError):
+            logging.exception("Import job %s (%s) gagal", job_id, kind)
+        notes = getattr(exc, "notes", [])
+        _finish(job_id, STATUS_FAILED, _stored_summary({"notes": notes}), error=str(exc))
+    else:
+        _finish(job_id, STATUS_DONE, _stored_summary(summary))
+
+
+def _stored_summary(summary):
+    """Batasi catatan baris yang disimpan; jumlah aslinya tetap dicatat."""
+    summary = dict(summary)
+    for key in ("notes", "skipped_notes"):
+        notes = summary.get(key) or []
+        if len(notes) > MAX_STORED_NOTES:
+            summary[key] = notes[:MAX_STORED_NOTES]
+            summary[f"{key}_total"] = len(notes)
+    return summary
+
+
+def _finish(job_id, status, summary, error=None):
+    """running -> selesai/gagal; tidak menimpa job yang sudah ditandai basi oleh polling."""
+    table = ImportJob.__table__
+    now = local_now()
+    values = {
+        "status": status,
+        "message": "Import selesai" if status == STATUS_DONE else "Import gagal",
+        "summary": json.dumps(summary, default=str),
+        "error": error,
+        "finished_at": now,
+        "updated_at": now,
+    }
+    if status == STATUS_DONE:
+        values["progress"] = 100
+    result = db.session.execute(
+        update(table)
+        .where(table.c.id == job_id, table.c.status == STATUS_RUNNING)
+        .values(**values)
+    )
+    db.session.commit()
+    if not result.rowcount:
+        logging.error(
+            "Import job %s selesai (%s) tetapi sudah tidak berstatus running; hasil tidak dicatat",
+            job_id,
+            status,
+        )
+    return bool(result.rowcount)
+
+
+def fail_stale_job(job):
+    """
+    Tandai gagal job ``queued``/``running`` yang heartbeat-nya lewat batas.
+
+    Job yang antre/berjalan di proses ini tidak disentuh. UPDATE bersyarat
+    pada heartbeat lama, jadi job yang baru saja menulis progres tetap hidup.
+    """
+    if job.status in FINAL_STATUSES:
+        return False
+    with _progress_lock:
+        if job.id in _local_jobs:
+            return False
+    cutoff = local_now() - stale_after(current_app)
+    last_seen = job.updated_at or job.started_at or job.created_at
+    if last_seen is not None and last_seen >= cutoff:
+        # cek di Python dulu: polling biasa tidak perlu menulis apa pun
+        return False
+    table = ImportJob.__table__
+    heartbeat = func.coalesce(table.c.updated_at, table.c.started_at, table.c.created_at)
+    now = local_now()
+    result = db.session.execute(
+        update(table)
+        .where(table.c.id == job.id)
+        .where(or_(table.c.status == STATUS_QUEUED, table.c.status == STATUS_RUNNING))
+        .where(heartbeat < cutoff)
+        .values(
+            status=STATUS_FAILED,
+            message="Import gagal",
+            error=STALE_ERROR,
+            finished_at=now,
+            updated_at=now,
+        )
+    )
+    db.session.commit()
+    if result.rowcount:
+        logging.warning("Import job %s ditandai gagal: tanpa heartbeat sejak %s", job.id, cutoff)
+    db.session.refresh(job)
+    return bool(result.rowcount)
+
+
+def job_payload(job):
+    """Status job untuk polling; progres dari memori jika job berjalan di proses ini."""
+    fail_stale_job(job)
+    progress, message = job.progress, job.message
+    with _progress_lock:
+        live = _progress.get(job.id)
+    if live and job.status not in FINAL_STATUSES:
+        progress, message = live
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "done": job.status in FINAL_STATUSES,
+        "progress": progress,
+        "message": message,
+        "filename": job.filename,
+        "error": job.error,
+        "summary": json.loads(job.summary) if job.summary else None,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
@@ -0,0 +1,177 @@
+"""Pembaca file import per potongan baris (memori pembaca tetap berapa pun ukuran file).
+
+``.xlsx`` dibaca dengan openpyxl ``read_only`` (XML sheet di-stream, bukan
+dimuat utuh), ``.csv`` dengan ``pd.read_csv(chunksize=...)`` setelah pemisah
+kolom ditebak dari awal file. Setiap potongan adalah DataFrame berisi paling
+banyak ``CHUNK_ROWS`` baris dengan index lanjutan dari potongan sebelumnya,
+jadi ``index + 2`` tetap nomor baris Excel seperti ``pd.read_excel`` biasa.
+
+Tabel shared strings xlsx tetap dimuat utuh oleh openpyxl, jadi memori .xlsx
+masih tumbuh pelan mengikuti jumlah teks unik. ``.xls`` (format lama, lewat
+xlrd) dimuat utuh lalu dipotong; xlrd tidak punya mode streaming. File upload
+sendiri sudah disalin ke berkas sementara oleh route, tidak pernah ke
+``BytesIO``.
+
+Batas memori ini hanya untuk pembacaan: import produk dan level harga tetap
+menyimpan perubahan yang lolos validasi sampai ditulis sekaligus di akhir.
+"""
+
+import csv
+import os
+
+CHUNK_ROWS = int(os.environ.get("IMPORT_CHUNK_ROWS", "5000"))
+SNIFF_BYTES = 64 * 1024
+CSV_DELIMITERS = ",;\t|"
+
+
+class ImportChunks:
+    """Sumber potongan DataFrame dari satu file upload.
+
+    ``columns`` tersedia sebelum iterasi (untuk cek kolom wajib),
+    ``total_rows`` adalah perkiraan jumlah baris data untuk progres
+    (bisa ``None`` jika tidak diketahui). Iterasi hanya bisa sekali.
+    """
+
+    def __init__(self, path, filename, allow_csv=False, chunk_rows=None):
+        self.path = path
+        self.chunk_rows = max(int(chunk_rows or CHUNK_ROWS), 1)
+        self.total_rows = None
+        self._workbook = None
+        self._csv_reader = None
+        name = (filename or "").lower()
+        try:
+            if allow_csv and name.endswith(".csv"):
+                self._chunks = self._open_csv()
+            elif name.endswith(".xls"):
+                self._chunks = self._open_xls()
+            else:
+                self._chunks = self._open_xlsx()
+        except ImportError as exc:
+            raise ValueError(
+                "File .xls membutuhkan modul xlrd. Simpan sebagai .xlsx atau install xlrd."
+            ) from exc
+        except Exception as exc:
+            raise ValueError(f"Gagal membaca file: {exc}") from exc
+
+    def __iter__(self):
+        # error di sini selalu dari pembacaan file, bukan dari pemakai potongan
+        try:
+            for chunk in self._chunks:
+                if len(chunk.index):
+                    yield chunk
+        except Exception as exc:
+            raise ValueError(f"Gagal membaca file: {exc}") from exc
+        finally:
+            self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._workbook is not None:
+            self._workbook.close()
+            self._workbook = None
+        if self._csv_reader is not None:
+            self._csv_reader.close()
+            self._csv_reader = None
+
+    def frame(self):
+        """Gabungkan semua potongan (untuk file kecil/pemakai lama)."""
+        import pandas as pd
+
+        chunks = list(self)
+        if not chunks:
+            return pd.DataFrame(columns=self.columns)
+        return pd.concat(chunks) if len(chunks) > 1 else chunks[0]
+
+    # --- xlsx ---
+
+    def _open_xlsx(self):
+        from openpyxl import load_workbook
+
+        self._workbook = load_workbook(self.path, read_only=True, data_only=True)
+        sheet = self._workbook.active
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None) or ()
+        width = len(header)
+        while width and header[width - 1] is None:
+            width -= 1
+        self.columns = [
+            f"Unnamed: {idx}" if value is None else value
+            for idx, value in enumerate(header[:width])
+        ]
+        if sheet.max_row:
+            self.total_rows = max(sheet.max_row - 1, 0)
+        return self._xlsx_chunks(rows, width)
+
+    def _xlsx_chunks(self, rows, width):
+        # baris kosong di akhir sheet diabaikan (seperti pd.read_excel); di tengah tetap dihitung
+        padding = (None,) * width
+        buffer = []
+        blank_run = 0
+        start = 0
+        for values in rows:
+            values = tuple(values[:width])
+            if all(value is None or value == "" for value in values):
+                blank_run += 1
+                continue
+            if blank_run:
+                buffer.extend([padding] * blank_run)
+                blank_run = 0
+            buffer.append(values + padding[len(values) :])
+            if len(buffer) >= self.chunk_rows:
+                yield self._records_frame(buffer[: self.chunk_rows], start)
+                start += self.chunk_rows
+                buffer = buffer[self.chunk_rows :]
+        while buffer:
+            yield self._records_frame(buffer[: self.chunk_rows], start)
+            start += self.chunk_rows
+            buffer = buffer[self.chunk_rows :]
+
+    def _records_frame(self, records, start):
+        import pandas as pd
+
+        index = pd.RangeIndex(start, start + len(records))
+        return pd.DataFrame(records, columns=self.columns, index=index)
+
+    # --- csv ---
+
+    def _open_csv(self):
+        import pandas as pd
+
+        with open(self.path, "rb") as handle:
+            sample = handle.read(SNIFF_BYTES)
+        text = sample.decode("utf-8-sig", errors="ignore")
+        try:
+            delimiter = csv.Sniffer().sniff(text.split("\n", 1)[0], CSV_DELIMITERS).delimiter
+        except csv.Error:
+            delimiter = ","
+        options = {"sep": delimiter, "encoding": "utf-8-sig"}
+        self.columns = list(pd.read_csv(self.path, nrows=0, **options).columns)
+        self.total_rows = max(_count_lines(self.path) - 1, 0)
+        self._csv_reader = pd.read_csv(self.path, chunksize=self.chunk_rows, **options)
+        return iter(self._csv_reader)
+
+    # --- xls ---
+
+    def _open_xls(self):
+        import pandas as pd
+
+        frame = pd.read_excel(self.path, engine="xlrd")
+        self.columns = list(frame.columns)
+        self.total_rows = len(frame.index)
+        return (
+            frame.iloc[offset : offset + self.chunk_rows]
+            for offset in range(0, len(frame.index), self.chunk_rows)
+        )
+
+
+def _count_lines(path):
+    count = 0
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1024 * 1024), b""):
+            count += block.count(b"\n")
+    return count
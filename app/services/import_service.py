@@ -0,0 +1,1428 @@
+"""Mesin import massal berbasis kolom pandas dan runner per jenis import.
+
+Pembersihan nilai dilakukan per kolom (``to_numeric``/``to_datetime`` dengan
+``errors="coerce"``), validasi memakai ``isin``/``duplicated``/``merge`` dan
+penulisan memakai bulk INSERT/UPDATE ORM per potongan ``WRITE_CHUNK`` baris,
+bukan ``iterrows`` + objek ORM satu per satu.
+
+Bulk write melewati hook ``after_flush``, jadi perubahan katalog dicatat
+eksplisit dengan ``record_catalog_changes`` (snapshot POS dan cache katalog
+ikut diperbarui). Indeks pencarian produk di SQLite disinkronkan trigger.
+pandas/numpy di-import di dalam fungsi agar tidak ikut termuat saat start.
+"""
+
+import re
+from itertools import chain
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app import db
+from app.models import (
+    Kategori,
+    Pelanggan,
+    PriceLevel,
+    ProductPriceLevel,
+    Produk,
+    Satuan,
+    StockOpnameItem,
+    StockOpnameSession,
+    Supplier,
+)
+from app.services.catalog_service import CATALOG_PRODUCTS, record_catalog_changes
+from app.services.document_number_service import (
+    DOCUMENT_STOCK_OPNAME,
+    allocate_document_number,
+)
+from app.services.import_reader import ImportChunks
+from app.time_utils import local_now
+
+WRITE_CHUNK = 1000
+# runner per baris (supplier/pelanggan) commit tiap ROW_BATCH baris
+ROW_BATCH = 500
+# pemilik SKU yang diklaim produk baru yang belum ditulis (id asli tidak pernah 0)
+PENDING_SKU_OWNER = 0
+LOOKUP_CHUNK = 500
+NOTES_IN_MESSAGE = 5
+
+
+class ImportFailed(ValueError):
+    """Import ditolak/gagal; ``notes`` berisi catatan baris yang sudah terkumpul."""
+
+    def __init__(self, message, notes=None):
+        super().__init__(message)
+        self.notes = list(notes or [])
+
+
+PRODUCT_IMPORT_COLUMNS = [
+    "Kode Produk",
+    "SKU",
+    "Nama Produk",
+    "Satuan ID",
+    "Kategori ID",
+    "Supplier ID",
+    "Berat",
+    "Stok Minimal",
+    "Tanggal Expired",
+]
+
+_PRODUCT_FIELDS = [
+    "sku",
+    "nama_produk",
+    "satuan_id",
+    "kategori_id",
+    "supplier_id",
+    "berat",
+    "stok_minimal",
+    "tanggal_expired",
+]
+
+
+def _blank_to_nan(series):
+    blank = series.map(lambda value: isinstance(value, str) and not value.strip())
+    return series.where(~blank.astype(bool))
+
+
+def clean_str_series(series):
+    """Teks ter-strip per kolom; sel kosong/NaN -> None."""
+    # kolom yang seluruhnya kosong dibaca sebagai float NaN; paksa ke object dulu
+    text = series.astype(object).map(str, na_action="ignore").astype(object).str.strip()
+    text = text.where(text.str.len() > 0)
+    return text.astype(object).where(text.notna(), None)
+
+
+def clean_int_series(series):
+    """Bilangan bulat per kolom (dibulatkan ke nol); kosong/bukan angka -> <NA>."""
+    import numpy as np
+    import pandas as pd
+
+    numbers = pd.to_numeric(_blank_to_nan(series), errors="coerce").astype(float)
+    numbers = numbers.where(np.isfinite(numbers))
+    return np.trunc(numbers).astype("Int64")
+
+
+def clean_float_series(series):
+    import pandas as pd
+
+    return pd.to_numeric(_blank_to_nan(series), errors="coerce").astype(float)
+
+
+def clean_date_series(series):
+    import pandas as pd
+
+    dates = pd.to_datetime(_blank_to_nan(series), errors="coerce", format="mixed")
+    return dates.dt.date.astype(object).where(dates.notna(), None)
+
+
+def frame_records(frame, columns):
+    """Baris DataFrame -> list dict dengan nilai Python yang bisa di-bind driver DB."""
+    import numpy as np
+    import pandas as pd
+
+    def python_value(value):
+        if value is None or value is pd.NA or value is pd.NaT:
+            return None
+        if isinstance(value, float) and np.isnan(value):
+            return None
+        if isinstance(value, np.integer):
+            return int(value)
+        if isinstance(value, np.floating):
+            return float(value)
+        return value
+
+    values = [frame[column].astype(object).tolist() for column in columns]
+    return [
+        {column: python_value(value) for column, value in zip(columns, row)}
+        for row in zip(*values)
+    ]
+
+
+def chunked(items, size):
+    for offset in range(0, len(items), size):
+        yield items[offset : offset + size]
+
+
+def existing_ids(model, ids):
+    """Subset ``ids`` yang ada di tabel ``model`` (query per potongan)."""
+    ids = sorted({int(value) for value in ids})
+    found = set()
+    for chunk in chunked(ids, LOOKUP_CHUNK):
+        found.update(db.session.scalars(select(model.id).where(model.id.in_(chunk))))
+    return found
+
+
+def _load_products(column, keys):
+    import pandas as pd
+
+    columns = [
+        Produk.id,
+        Produk.kode_produk,
+        *(getattr(Produk, name) for name in _PRODUCT_FIELDS),
+    ]
+    rows = []
+    for chunk in chunked(sorted(set(keys)), LOOKUP_CHUNK):
+        rows.extend(db.session.execute(select(*columns).where(column.in_(chunk))).all())
+    return pd.DataFrame(
+        rows, columns=["product_id", "kode", *(f"current_{name}" for name in _PRODUCT_FIELDS)]
+    )
+
+
+def _note(notes, frame, mask, order, template):
+    """Tambah ``(baris, urutan, pesan)``; ``template`` diformat dengan kolom baris."""
+    subset = frame.loc[mask]
+    for record in subset.to_dict("records"):
+        notes.append((record["row"], order, template.format(**record)))
+
+
+def perform_produk_import(df, progress_cb=None):
+    """Import/perbarui produk dari DataFrame template export produk.
+
+    Mengembalikan ``{"created", "updated", "skipped_notes"}`` dengan nomor
+    baris Excel (header = baris 1), urutan catatan sama seperti per baris.
+    Kode produk yang muncul lagi di file dilewati (baris pertama yang dipakai).
+    """
+    return import_product_chunks(
+        df.columns, [df], progress_cb=progress_cb, total_rows=len(df.index)
+    )
+
+
+def import_product_chunks(columns, chunks, progress_cb=None, total_rows=None):
+    """Versi per potongan dari ``perform_produk_import`` (lihat ``import_reader``).
+
+    Semua potongan divalidasi dulu tanpa menulis; perubahannya baru ditulis
+    dan di-commit sekaligus di akhir, supaya kunci tulis (terutama SQLite,
+    yang juga dipakai checkout kasir) hanya dipegang selama penulisan itu.
+    Kode yang sudah muncul di potongan sebelumnya dilewati dan klaim SKU
+    potongan sebelumnya dibawa di memori, jadi hasilnya sama dengan membaca
+    file utuh. Akibatnya memori tumbuh mengikuti jumlah baris yang berubah
+    (bukan ukuran file): frame update/baru semua potongan ditahan sampai akhir.
+    """
+    import pandas as pd
+
+    if not all(column in columns for column in PRODUCT_IMPORT_COLUMNS):
+        raise ValueError("Format file tidak valid! Pastikan semua kolom yang diperlukan ada.")
+
+    def report_progress(value, message):
+        if progress_cb:
+            progress_cb(value, message)
+
+    report_progress(5, "Memeriksa kolom dan menyiapkan data...")
+    seen_codes = set()
+    sku_owners = {}
+    skipped_notes = []
+    updates = []
+    creates = []
+    done = 0
+    try:
+        for df in chunks:
+            notes, chunk_updates, chunk_creates = _prepare_product_chunk(
+                df, seen_codes, sku_owners
+            )
+            skipped_notes.extend(message for _, _, message in notes)
+            updates.append(chunk_updates)
+            creates.append(chunk_creates)
+            done += len(df.index)
+            _row_progress(progress_cb, done, total_rows, every=1)
+        report_progress(92, "Menyimpan perubahan...")
+        update_frame = pd.concat(updates, ignore_index=True) if updates else None
+        create_frame = pd.concat(creates, ignore_index=True) if creates else None
+        updated_ids, created_ids = _write_products(update_frame, create_frame)
+        record_catalog_changes(CATALOG_PRODUCTS, updated_ids + created_ids)
+        db.session.commit()
+    except ValueError:
+        db.session.rollback()
+        raise
+    except Exception as exc:
+        db.session.rollback()
+        raise ImportFailed(f"Gagal menyimpan data produk: {exc}", skipped_notes) from exc
+    report_progress(100, "Import selesai")
+
+    return {
+        "created": len(created_ids),
+        "updated": len(updated_ids),
+        "skipped_notes": skipped_notes,
+    }
+
+
+def _prepare_product_chunk(df, seen_codes, sku_owners):
+    """Validasi satu potongan; hasil ``(catatan, frame_update, frame_baru)``.
+
+    ``sku_owners`` memetakan SKU yang diklaim/dilepas potongan sebelumnya
+    (belum ditulis) ke pemilik barunya: id produk, ``PENDING_SKU_OWNER`` untuk
+    produk baru, atau ``None`` bila dilepas.
+    """
+    import numpy as np
+    import pandas as pd
+
+    frame = pd.DataFrame(
+        {
+            "row": np.asarray(df.index, dtype=np.int64) + 2,  # +2 karena header di baris pertama
+            "kode": clean_str_series(df["Kode Produk"]),
+            "sku": clean_str_series(df["SKU"]),
+            "nama_produk": clean_str_series(df["Nama Produk"]),
+            "satuan_id": clean_int_series(df["Satuan ID"]),
+            "kategori_id": clean_int_series(df["Kategori ID"]),
+            "supplier_id": clean_int_series(df["Supplier ID"]),
+            "berat": clean_float_series(df["Berat"]),
+            "stok_minimal": clean_int_series(df["Stok Minimal"]),
+            "tanggal_expired": clean_date_series(df["Tanggal Expired"]),
+        }
+    ).reset_index(drop=True)
+    notes = []
+
+    blank = frame["kode"].isna()
+    _note(notes, frame, blank, 0, "Baris {row}: Kode Produk kosong.")
+    frame = frame[~blank]
+    repeated = frame["kode"].duplicated() | frame["kode"].isin(seen_codes)
+    seen_codes.update(frame["kode"])
+    _note(
+        notes, frame, repeated, 0, "Baris {row}: Kode Produk {kode} duplikat di file, dilewati."
+    )
+    frame = frame[~repeated]
+
+    existing = _load_products(Produk.kode_produk, frame["kode"])
+    frame = frame.merge(existing, on="kode", how="left")
+    is_existing = frame["product_id"].notna()
+
+    valid = {}
+    for field, model in (
+        ("satuan_id", Satuan),
+        ("kategori_id", Kategori),
+        ("supplier_id", Supplier),
+    ):
+        given = frame[field].notna()
+        valid[field] = given & frame[field].isin(existing_ids(model, frame.loc[given, field]))
+
+    # baris baru yang gagal validasi tidak ikut mengklaim SKU
+    new_rows = ~is_existing
+    no_name = new_rows & frame["nama_produk"].isna()
+    _note(notes, frame, no_name, 0, "Baris {row}: Nama Produk kosong untuk kode {kode}.")
+    refs_valid = valid["satuan_id"] & valid["kategori_id"] & valid["supplier_id"]
+    bad_refs = new_rows & ~no_name & ~refs_valid
+    _note(
+        notes, frame, bad_refs, 1, "Baris {row}: Satuan/Kategori/Supplier tidak valid untuk {kode}."
+    )
+    creatable = new_rows & ~no_name & ~bad_refs
+
+    # SKU bebas jika belum dimiliki produk lain di DB dan belum diklaim baris sebelumnya
+    sku_changed = is_existing & (frame["sku"] != frame["current_sku"])
+    claims = frame["sku"].notna() & (creatable | sku_changed)
+    owners = _load_products(Produk.sku, frame.loc[claims, "sku"])
+    owner_map = dict(zip(owners["current_sku"], owners["product_id"]))
+    owner_map.update(sku_owners)
+    owner = frame["sku"].map(owner_map)
+    taken = claims & owner.notna() & (owner != frame["product_id"])
+    free = claims & ~taken
+    taken |= free & frame["sku"].where(free).duplicated()
+    sku_note = "Baris {row}: SKU {sku} sudah dipakai produk lain."
+    _note(notes, frame, taken & is_existing, 0, sku_note)
+    _note(notes, frame, taken & creatable, 2, sku_note)
+
+    for order, field, label in (
+        (1, "satuan_id", "Satuan"),
+        (2, "kategori_id", "Kategori"),
+        (3, "supplier_id", "Supplier"),
+    ):
+        invalid = is_existing & frame[field].notna() & ~valid[field]
+        template = f"Baris {{row}}: {label} ID {{{field}}} tidak ditemukan."
+        _note(notes, frame, invalid, order, template)
+
+    # perubahan produk lama: kolom yang diisi (dan valid) menimpa nilai sekarang
+    updates = frame[is_existing].copy()
+    set_sku = (claims & ~taken)[is_existing]
+    set_nama = updates["nama_produk"].notna() & (
+        updates["nama_produk"] != updates["current_nama_produk"]
+    )
+    changed = set_sku | set_nama
+    updates["sku"] = updates["sku"].where(set_sku, updates["current_sku"])
+    updates["nama_produk"] = updates["nama_produk"].where(set_nama, updates["current_nama_produk"])
+    for field in ("satuan_id", "kategori_id", "supplier_id"):
+        use = valid[field][is_existing]
+        changed |= use
+        updates[field] = updates[field].astype(object).where(use, updates[f"current_{field}"])
+    for field in ("berat", "stok_minimal", "tanggal_expired"):
+        use = updates[field].notna()
+        changed |= use
+        updates[field] = updates[field].astype(object).where(use, updates[f"current_{field}"])
+    updates = updates[changed]
+
+    creates = frame[creatable].copy()
+    creates["sku"] = creates["sku"].where(~taken[creatable], None)
+    creates["berat"] = creates["berat"].fillna(0.0)
+    creates["stok_minimal"] = creates["stok_minimal"].fillna(0)
+    creates = creates.rename(columns={"kode": "kode_produk"})
+
+    # klaim potongan ini berlaku untuk potongan berikutnya sebelum ditulis
+    moved = updates[set_sku[changed] & (updates["sku"] != updates["current_sku"])]
+    sku_owners.update(dict.fromkeys(moved["current_sku"].dropna()))
+    sku_owners.update(zip(moved["sku"], moved["product_id"].astype(int)))
+    sku_owners.update(dict.fromkeys(creates["sku"].dropna(), PENDING_SKU_OWNER))
+
+    notes.sort(key=lambda note: (note[0], note[1]))
+    update_frame = updates.rename(columns={"product_id": "id"})[["id", *_PRODUCT_FIELDS]]
+    return notes, update_frame, creates[["kode_produk", *_PRODUCT_FIELDS]]
+
+
+def _write_products(update_frame, create_frame):
+    """Bulk UPDATE/INSERT per ``WRITE_CHUNK``; mengembalikan ``(id_diubah, id_baru)``.
+
+    Statement Core ``executemany``: bulk ORM memecah INSERT per pola nilai
+    NULL sehingga 100 ribu baris bisa jadi puluhan ribu statement, padahal
+    semua ini berjalan sambil memegang kunci tulis.
+    """
+    produk = Produk.__table__
+    update_stmt = (
+        update(produk)
+        .where(produk.c.id == bindparam("b_id"))
+        .values({field: bindparam(f"b_{field}") for field in _PRODUCT_FIELDS})
+    )
+    updated_ids = []
+    created_ids = []
+    if update_frame is not None:
+        for offset in range(0, len(update_frame.index), WRITE_CHUNK):
+            chunk = frame_records(
+                update_frame.iloc[offset : offset + WRITE_CHUNK], ["id", *_PRODUCT_FIELDS]
+            )
+            db.session.execute(
+                update_stmt,
+                [{f"b_{key}": value for key, value in row.items()} for row in chunk],
+            )
+            updated_ids.extend(row["id"] for row in chunk)
+    if create_frame is not None:
+        for offset in range(0, len(create_frame.index), WRITE_CHUNK):
+            chunk = frame_records(
+                create_frame.iloc[offset : offset + WRITE_CHUNK],
+                ["kode_produk", *_PRODUCT_FIELDS],
+            )
+            db.session.execute(produk.insert(), chunk)
+            codes = [row["kode_produk"] for row in chunk]
+            created_ids.extend(
+                db.session.scalars(select(Produk.id).where(Produk.kode_produk.in_(codes)))
+            )
+    return updated_ids, created_ids
+
+
+# --- runner per jenis import (dipanggil job latar, lihat ``import_jobs``) ---
+#
+# Setiap runner menerima path file upload dan mengembalikan ringkasan dict
+# dengan ``messages``: list ``[kategori_flash, teks]`` untuk ditampilkan saat
+# job selesai, ditambah hitungan per jenis. Kesalahan format/validasi
+# dilempar sebagai ``ValueError``/``ImportFailed``.
+
+
+def _clean_str(value):
+    import pandas as pd
+
+    if pd.isna(value):
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def notes_detail(notes, limit=NOTES_IN_MESSAGE):
+    detail = "; ".join(notes[:limit])
+    if len(notes) > limit:
+        detail += f"; dan {len(notes) - limit} baris lainnya."
+    return detail
+
+
+def _row_progress(progress_cb, position, total, every=ROW_BATCH):
+    """Progres 10-90% per baris; ``total`` dari ``ImportChunks`` bisa perkiraan/None."""
+    if not progress_cb or (position % every and position != total):
+        return
+    if total:
+        value = 10 + int(min(position / total, 1) * 80)
+        progress_cb(value, f"Memproses baris {position} dari {total}")
+    else:
+        progress_cb(10 + min(position // 1000, 80), f"Memproses baris {position}")
+
+
+def _row_checkpoint(progress_cb, position, total):
+    """
+    Commit tiap ``ROW_BATCH`` baris lalu laporkan progres.
+
+    Runner per baris memegang kunci tulis SQLite sejak autoflush pertama;
+    commit berkala melepasnya untuk checkout POS dan memberi kesempatan
+    heartbeat job ditulis. Jika import gagal, batch yang sudah di-commit
+    tetap tersimpan; mengunggah ulang aman karena baris dicocokkan ke data
+    yang sudah ada.
+    """
+    if position % ROW_BATCH == 0:
+        db.session.commit()
+    _row_progress(progress_cb, position, total, every=ROW_BATCH)
+
+
+def iter_chunk_rows(chunks):
+    """``(index, row)`` dari semua potongan, seperti ``df.iterrows()`` pada file utuh."""
+    for df in chunks:
+        yield from df.iterrows()
+
+
+def run_produk_import(path, filename, progress_cb=None):
+    with ImportChunks(path, filename) as reader:
+        summary = import_product_chunks(
+            reader.columns, reader, progress_cb=progress_cb, total_rows=reader.total_rows
+        )
+    status_parts = []
+    if summary.get("created"):
+        status_parts.append(f"{summary['created']} produk baru ditambahkan")
+    if summary.get("updated"):
+        status_parts.append(f"{summary['updated']} produk diperbarui")
+    if not status_parts:
+        status_parts.append("Tidak ada perubahan dari file import")
+    messages = [["success", "; ".join(status_parts)]]
+    if summary["skipped_notes"]:
+        messages.append(
+            ["warning", f"Beberapa baris dilewati: {notes_detail(summary['skipped_notes'])}"]
+        )
+    return {**summary, "messages": messages}
+
+
+def _clean_cell(value):
+    import pandas as pd
+
+    if pd.isna(value):
+        return ""
+    return str(value).strip()
+
+
+def _normalize_supplier_phone(value):
+    value = (value or "").strip()
+    if not value:
+        return ""
+    if re.fullmatch(r"\d+\.0+", value):
+        value = value.split(".", 1)[0]
+    digits = re.sub(r"\D", "", value)
+    if digits.startswith("62"):
+        digits = digits[2:]
+    if not digits.startswith("0"):
+        digits = "0" + digits
+    return digits
+
+
+def _normalize_bank_account(value):
+    value = (value or "").strip()
+    if not value:
+        return ""
+    if re.fullmatch(r"\d+\.0+", value):
+        value = value.split(".", 1)[0]
+    digits = re.sub(r"\D", "", value)
+    return digits.lstrip("0") or digits
+
+
+def run_supplier_import(path, filename, progress_cb=None):
+    reader = ImportChunks(path, filename)
+    required_columns = ["Nama Supplier", "Alamat"]
+    missing_columns = [column for column in required_columns if column not in reader.columns]
+    if missing_columns:
+        reader.close()
+        raise ValueError(
+            "Invalid file format! Missing required columns: " + ", ".join(missing_columns)
+        )
+
+    created_count = 0
+    updated_count = 0
+    skipped_notes = []
+    existing_bank_map = {}
+    for s in Supplier.query.all():
+        key = _normalize_bank_account(s.bank_account)
+        if key:
+            existing_bank_map.setdefault(key, s)
+
+    total = reader.total_rows
+    for position, (_, row) in enumerate(iter_chunk_rows(reader), start=1):
+        _row_checkpoint(progress_cb, position, total)
+        name = _clean_cell(row.get("Nama Supplier", ""))
+        address = _clean_cell(row.get("Alamat", ""))
+        phone_raw = _clean_cell(row.get("No Telp", ""))
+        bank_name = _clean_cell(row.get("Nama Bank", row.get("Bank", "")))
+        bank_account = _clean_cell(row.get("No Rekening Bank", row.get("No Rekening", "")))
+        bank_account_key = _normalize_bank_account(bank_account)
+        account_name = _clean_cell(row.get("Nama Rekening", ""))
+        contact_person = _clean_cell(row.get("Kontak Person", ""))
+        email = _clean_cell(row.get("Email", "")) or None
+        website_value = _clean_cell(row.get("Website", "")) or None
+        phone_key = _normalize_supplier_phone(phone_raw)
+
+        if not name or not address:
+            skipped_notes.append(f'Data supplier "{name or "-"}" tidak lengkap dan dilewati.')
+            continue
+
+        existing = None
+        candidate_queries = []
+        if bank_account_key and bank_account_key in existing_bank_map:
+            existing = existing_bank_map[bank_account_key]
+        if not existing and bank_account:
+            candidate_queries.append(Supplier.query.filter_by(bank_account=bank_account))
+        if email:
+            candidate_queries.append(Supplier.query.filter_by(email=email))
+        if phone_key:
+            candidate_queries.append(
+                Supplier.query.filter(Supplier.phone.in_([phone_key, phone_raw]))
+            )
+        candidate_queries.append(Supplier.query.filter(func.lower(Supplier.name) == name.lower()))
+
+        for q in candidate_queries:
+            if existing:
+                break
+            existing = q.first()
+
+        if existing:
+            existing.name = name or existing.name
+            existing.address = address or existing.address
+            existing.phone = phone_key or existing.phone
+            existing.bank_name = bank_name or existing.bank_name
+            existing.bank_account = bank_account or existing.bank_account
+            existing.account_name = account_name or existing.account_name
+            existing.contact_person = contact_person or existing.contact_person
+            existing.email = email or existing.email
+            existing.website = website_value or existing.website
+            updated_count += 1
+            if bank_account_key:
+                existing_bank_map[bank_account_key] = existing
+            continue
+
+        supplier = Supplier(
+            name=name,
+            address=address,
+            phone=phone_key,
+            bank_name=bank_name,
+            bank_account=bank_account,
+            account_name=account_name,
+            contact_person=contact_person,
+            email=email,
+            website=website_value,
+        )
+        db.session.add(supplier)
+        if bank_account_key:
+            existing_bank_map[bank_account_key] = supplier
+        created_count += 1
+
+    db.session.commit()
+    message_parts = []
+    if created_count:
+        message_parts.append(f"{created_count} supplier baru")
+    if updated_count:
+        message_parts.append(f"{updated_count} supplier diupdate")
+    text = ", ".join(message_parts) if message_parts else "Tidak ada perubahan"
+    messages = [["success", f"Import supplier selesai: {text}."]]
+    if skipped_notes:
+        messages.append(["warning", f"Beberapa baris dilewati: {notes_detail(skipped_notes)}"])
+    return {
+        "created": created_count,
+        "updated": updated_count,
+        "skipped_notes": skipped_notes,
+        "messages": messages,
+    }
+
+
+def _clean_customer_cell(value):
+    text = _clean_cell(value)
+    if re.fullmatch(r"\d+\.0+", text):
+        text = text.split(".", 1)[0]
+    return text
+
+
+def run_pelanggan_import(path, filename, progress_cb=None):
+    reader = ImportChunks(path, filename)
+    required_columns = ["Nama Pelanggan", "Kontak", "Alamat"]
+    missing_columns = [column for column in required_columns if column not in reader.columns]
+    if missing_columns:
+        reader.close()
+        raise ValueError(
+            "Invalid file format! Missing required columns: " + ", ".join(missing_columns)
+        )
+
+    price_levels = PriceLevel.query.all()
+    price_level_by_id = {level.id: level for level in price_levels}
+    price_level_by_name = {level.name.lower(): level for level in price_levels if level.name}
+
+    existing_ids = {row[0] for row in db.session.query(Pelanggan.pelanggan_id).all() if row[0]}
+    new_ids = set()
+    next_id_num = 1
+    last_customer = Pelanggan.query.order_by(Pelanggan.id.desc()).first()
+    if last_customer and last_customer.pelanggan_id:
+        match = re.match(r"(?i)^CUST(\d+)$", last_customer.pelanggan_id.strip())
+        if match:
+            next_id_num = int(match.group(1)) + 1
+
+    def _generate_id():
+        nonlocal next_id_num
+        while True:
+            candidate = f"CUST{next_id_num:03d}"
+            next_id_num += 1
+            if candidate not in existing_ids and candidate not in new_ids:
+                new_ids.add(candidate)
+                return candidate
+
+    created_count = 0
+    updated_count = 0
+    skipped_notes = []
+
+    total = reader.total_rows
+    for position, (idx, row) in enumerate(iter_chunk_rows(reader), start=1):
+        _row_checkpoint(progress_cb, position, total)
+        row_number = idx + 2
+        pelanggan_id = _clean_customer_cell(row.get("ID Pelanggan", row.get("Pelanggan ID", "")))
+        nama = _clean_customer_cell(row.get("Nama Pelanggan", ""))
+        kontak = _clean_customer_cell(row.get("Kontak", ""))
+        email = _clean_customer_cell(row.get("Email", "")) or None
+        alamat = _clean_customer_cell(row.get("Alamat", ""))
+
+        if not nama or not kontak or not alamat:
+            skipped_notes.append(
+                f'Baris {row_number}: Data pelanggan "{nama or "-"}" tidak lengkap dan dilewati.'
+            )
+            continue
+
+        level_obj = None
+        level_id_raw = _clean_customer_cell(row.get("Level Harga ID", ""))
+        if level_id_raw:
+            try:
+                level_id = int(level_id_raw)
+            except ValueError:
+                level_id = None
+            if level_id:
+                level_obj = price_level_by_id.get(level_id)
+        if not level_obj:
+            level_name = _clean_customer_cell(row.get("Level Harga", ""))
+            if level_name:
+                level_obj = price_level_by_name.get(level_name.lower())
+
+        existing = None
+        if pelanggan_id:
+            existing = Pelanggan.query.filter_by(pelanggan_id=pelanggan_id).first()
+        if not existing and email:
+            existing = Pelanggan.query.filter_by(email=email).first()
+        if not existing:
+            existing = Pelanggan.query.filter(
+                func.lower(Pelanggan.nama) == nama.lower(),
+                Pelanggan.kontak == kontak,
+            ).first()
+
+        if existing:
+            existing.nama = nama
+            existing.kontak = kontak
+            if email is not None:
+                existing.email = email
+            existing.alamat = alamat
+            if level_obj is not None:
+                existing.price_level = level_obj
+            updated_count += 1
+            continue
+
+        if pelanggan_id:
+            if pelanggan_id in new_ids:
+                skipped_notes.append(
+                    f'Baris {row_number}: ID pelanggan "{pelanggan_id}" duplikat di file '
+                    "dan dilewati."
+                )
+                continue
+            if pelanggan_id in existing_ids:
+                pelanggan_id = _generate_id()
+            else:
+                new_ids.add(pelanggan_id)
+        else:
+            pelanggan_id = _generate_id()
+
+        db.session.add(
+            Pelanggan(
+                pelanggan_id=pelanggan_id,
+                nama=nama,
+                kontak=kontak,
+                email=email,
+                alamat=alamat,
+                price_level=level_obj,
+            )
+        )
+        created_count += 1
+
+    db.session.commit()
+    message_parts = []
+    if created_count:
+        message_parts.append(f"{created_count} pelanggan baru")
+    if updated_count:
+        message_parts.append(f"{updated_count} pelanggan diupdate")
+    if skipped_notes:
+        message_parts.append(f"{len(skipped_notes)} dilewati")
+    text = ", ".join(message_parts) if message_parts else "Tidak ada perubahan"
+    messages = [["success", f"Import pelanggan selesai: {text}."]]
+    if skipped_notes:
+        messages.append(["warning", notes_detail(skipped_notes)])
+    return {
+        "created": created_count,
+        "updated": updated_count,
+        "skipped_notes": skipped_notes,
+        "messages": messages,
+    }
+
+
+STOCK_KODE_KEYS = ["kode produk", "kode barang", "kode", "kode_produk", "product code"]
+STOCK_SKU_KEYS = ["sku", "kode sku"]
+STOCK_NAMA_KEYS = ["nama produk", "nama barang", "nama", "product name", "produk"]
+STOCK_QTY_KEYS = ["qty fisik", "qty", "stok fisik", "jumlah fisik", "qty hitung", "counted qty"]
+STOCK_HPP_KEYS = [
+    "hpp",
+    "harga pokok",
+    "harga pokok rata-rata",
+    "harga pokok rata rata",
+    "harga pokok rata2",
+    "harga beli",
+    "cost",
+    "cost basis",
+]
+STOCK_NOTE_KEYS = ["catatan", "keterangan", "note"]
+STOCK_MAX_ERRORS = 8
+
+
+def _normalize_column_name(value):
+    value = str(value or "").strip().lower()
+    return re.sub(r"[\s_]+", " ", value)
+
+
+def parse_counted_qty(value):
+    import pandas as pd
+
+    if pd.isna(value) or value == "":
+        return None
+    raw = str(value).strip()
+    if not raw:
+        return None
+    raw = raw.replace(" ", "")
+    if raw.isdigit():
+        return int(raw)
+    if re.fullmatch(r"\d{1,3}(\.\d{3})+", raw):
+        return int(raw.replace(".", ""))
+    if re.fullmatch(r"\d{1,3}(,\d{3})+", raw):
+        return int(raw.replace(",", ""))
+    try:
+        number = float(raw.replace(",", "."))
+    except (TypeError, ValueError):
+        return None
+    if not number.is_integer():
+        return None
+    return int(number)
+
+
+def parse_cost(value):
+    import pandas as pd
+
+    if pd.isna(value) or value == "":
+        return None
+    raw = str(value).strip()
+    if not raw:
+        return None
+    raw = raw.replace(" ", "")
+    if re.fullmatch(r"\d{1,3}(\.\d{3})+(,\d+)?", raw):
+        normalized = raw.replace(".", "").replace(",", ".")
+    elif re.fullmatch(r"\d{1,3}(,\d{3})+(\.\d+)?", raw):
+        normalized = raw.replace(",", "")
+    else:
+        normalized = raw.replace(",", ".")
+    try:
+        return float(normalized)
+    except (TypeError, ValueError):
+        return None
+
+
+# kode kesalahan per baris stok opname, urut sesuai prioritas pemeriksaan
+_OPNAME_ERRORS = (
+    None,
+    "Baris {row}: Kode Produk {kode} tidak ditemukan.",
+    "Baris {row}: SKU {sku} tidak ditemukan.",
+    "Baris {row}: Nama Produk {nama} tidak ditemukan.",
+    "Baris {row}: Nama Produk {nama} duplikat, gunakan Kode Produk atau SKU.",
+    "Baris {row}: Identitas produk kosong atau tidak dikenali.",
+    "Baris {row}: Produk {kode_produk} duplikat di file.",
+    "Baris {row}: Qty fisik tidak valid atau bukan angka bulat.",
+    "Baris {row}: Qty fisik tidak boleh negatif.",
+    "Baris {row}: HPP tidak valid.",
+    "Baris {row}: HPP tidak boleh negatif.",
+)
+
+
+def _opname_column(df, column_map, keys):
+    import pandas as pd
+
+    for key in keys:
+        column = column_map.get(key)
+        if column is not None:
+            return df[column]
+    return pd.Series(None, index=df.index, dtype=object)
+
+
+def _parse_unique(series, parser):
+    """``parser`` per nilai unik saja (qty/HPP di file opname banyak yang berulang)."""
+    import pandas as pd
+
+    mapping = {value: parser(value) for value in pd.unique(series.dropna())}
+    return pd.to_numeric(series.map(mapping), errors="coerce")
+
+
+def _products_by_text(column, values, exact=True):
+    """Produk yang ``kolom``-nya cocok (tanpa beda huruf/spasi tepi) dengan ``values``.
+
+    ``exact`` mencoba nilai apa adanya dulu (memakai index kode/SKU); sisa
+    kunci dicari lewat ``lower(trim(kolom))``. Hasil: DataFrame ``key``
+    (huruf kecil), ``product_id``, ``kode_produk``; id terbesar di akhir.
+    """
+    import pandas as pd
+
+    keys = {value.lower() for value in values}
+    rows = []
+    if exact:
+        for chunk in chunked(sorted(set(values)), LOOKUP_CHUNK):
+            rows.extend(
+                db.session.execute(
+                    select(column, Produk.id, Produk.kode_produk).where(column.in_(chunk))
+                ).all()
+            )
+        keys -= {str(value).strip().lower() for value, _, _ in rows}
+    target = func.lower(func.trim(column))
+    if len(keys) > LOOKUP_CHUNK:
+        # banyak kunci tanpa index: satu kali baca kolom lebih murah dari scan per potongan
+        scanned = db.session.execute(select(target, Produk.id, Produk.kode_produk))
+        rows.extend(row for row in scanned if row[0] in keys)
+    else:
+        for chunk in chunked(sorted(keys), LOOKUP_CHUNK):
+            rows.extend(
+                db.session.execute(
+                    select(target, Produk.id, Produk.kode_produk).where(target.in_(chunk))
+                ).all()
+            )
+    frame = pd.DataFrame(rows, columns=["key", "product_id", "kode_produk"])
+    frame["key"] = frame["key"].astype(str).str.strip().str.lower()
+    return frame.drop_duplicates("product_id").sort_values("product_id")
+
+
+def _resolve_opname_products(frame):
+    """Tambah ``product_id``/``kode_produk``/``error`` hasil merge kode -> SKU -> nama."""
+    import numpy as np
+    import pandas as pd
+
+    use_kode = frame["kode"].notna()
+    use_sku = ~use_kode & frame["sku"].notna()
+    use_nama = ~use_kode & ~use_sku & frame["nama"].notna()
+    resolved = []
+    for name, column, mask in (
+        ("kode", Produk.kode_produk, use_kode),
+        ("sku", Produk.sku, use_sku),
+        ("nama", Produk.nama_produk, use_nama),
+    ):
+        values = frame.loc[mask, name]
+        keys = values.str.lower()
+        products = _products_by_text(column, set(values), exact=name != "nama")
+        matches = products.groupby("key").size()
+        products = products.drop_duplicates("key", keep="last").set_index("key")
+        resolved.append(
+            pd.DataFrame(
+                {
+                    "product_id": keys.map(products["product_id"]),
+                    "kode_produk": keys.map(products["kode_produk"]),
+                    "matches": keys.map(matches),
+                },
+                index=keys.index,
+            )
+        )
+    found = pd.concat(resolved).reindex(frame.index)
+    ambiguous = use_nama & (found["matches"] > 1)
+    frame["product_id"] = found["product_id"].where(~ambiguous)
+    frame["kode_produk"] = found["kode_produk"]
+
+    frame["error"] = np.select(
+        [
+            use_kode & found["product_id"].isna(),
+            use_sku & found["product_id"].isna(),
+            use_nama & found["product_id"].isna(),
+            ambiguous,
+            ~(use_kode | use_sku | use_nama),
+        ],
+        [1, 2, 3, 4, 5],
+        default=0,
+    )
+    return frame
+
+
+def _opname_chunk(df, column_map, seen_product_ids):
+    """Validasi satu potongan: ``(baris_valid, catatan_error)``."""
+    import numpy as np
+    import pandas as pd
+
+    qty_raw = _opname_column(df, column_map, STOCK_QTY_KEYS)
+    hpp_raw = _opname_column(df, column_map, STOCK_HPP_KEYS)
+    frame = pd.DataFrame(
+        {
+            "row": np.asarray(df.index, dtype=np.int64) + 2,
+            "kode": clean_str_series(_opname_column(df, column_map, STOCK_KODE_KEYS)),
+            "sku": clean_str_series(_opname_column(df, column_map, STOCK_SKU_KEYS)),
+            "nama": clean_str_series(_opname_column(df, column_map, STOCK_NAMA_KEYS)),
+            "note": clean_str_series(_opname_column(df, column_map, STOCK_NOTE_KEYS)),
+            "hpp_given": clean_str_series(hpp_raw).notna(),
+            "counted_qty": _parse_unique(qty_raw, parse_counted_qty),
+            "hpp": _parse_unique(hpp_raw, parse_cost),
+        }
+    )
+    qty_blank = qty_raw.isna() | (qty_raw.astype(object) == "")
+    blank = (
+        frame[["kode", "sku", "nama", "note"]].isna().all(axis=1)
+        & qty_blank
+        & ~frame["hpp_given"]
+    )
+    frame = _resolve_opname_products(frame[~blank].reset_index(drop=True))
+
+    checks = [
+        (7, frame["counted_qty"].isna()),
+        (8, frame["counted_qty"] < 0),
+        (9, frame["hpp_given"] & frame["hpp"].isna()),
+        (10, frame["hpp_given"] & (frame["hpp"] < 0)),
+    ]
+    value_error = np.select([mask for _, mask in checks], [code for code, _ in checks], default=0)
+    # baris pertama yang lolos semua cek "memiliki" produk; baris lain untuk produk itu duplikat
+    usable = (frame["error"] == 0) & (value_error == 0)
+    first_usable = frame.index.to_series()[usable].groupby(frame["product_id"][usable]).min()
+    duplicate = (frame["error"] == 0) & (
+        frame["product_id"].isin(seen_product_ids)
+        | (frame.index.to_series() > frame["product_id"].map(first_usable))
+    )
+    frame.loc[duplicate, "error"] = 6
+    frame["error"] = frame["error"].where(frame["error"] != 0, value_error)
+
+    failed = frame[frame["error"] != 0]
+    errors = [
+        _OPNAME_ERRORS[record["error"]].format(**record)
+        for record in failed.to_dict("records")
+    ]
+    valid = frame[frame["error"] == 0]
+    seen_product_ids.update(valid["product_id"].astype(int))
+    return valid[["product_id", "counted_qty", "hpp", "note"]], errors
+
+
+def run_stok_opname_import(
+    path, filename, progress_cb=None, location=None, note=None, created_by=None
+):
+    """Import hasil hitung fisik; semua baris valid atau tidak ada yang disimpan.
+
+    Produk dicocokkan per potongan lewat merge kode -> SKU -> nama (hanya
+    produk yang dirujuk yang dibaca), lalu stok/HPP ditulis dengan bulk
+    UPDATE per id dan item opname dengan bulk INSERT.
+    """
+    import pandas as pd
+
+    reader = ImportChunks(path, filename, allow_csv=True)
+    chunks = iter(reader)
+    first = next(chunks, None)
+    if first is None:
+        return {"rows": 0, "messages": [["warning", "File tidak memiliki data untuk diproses."]]}
+
+    column_map = {_normalize_column_name(col): col for col in reader.columns}
+    if not any(key in column_map for key in STOCK_QTY_KEYS):
+        reader.close()
+        raise ValueError(
+            "Kolom Qty Fisik tidak ditemukan. Gunakan header seperti 'Qty Fisik' atau 'Qty'."
+        )
+    if not any(key in column_map for key in (STOCK_KODE_KEYS + STOCK_SKU_KEYS + STOCK_NAMA_KEYS)):
+        reader.close()
+        raise ValueError(
+            "Kolom identitas produk tidak ditemukan. "
+            "Gunakan 'Kode Produk', 'SKU', atau 'Nama Produk'."
+        )
+
+    prepared = []
+    errors = []
+    seen_product_ids = set()
+    done = 0
+    for df in chain([first], chunks):
+        valid, chunk_errors = _opname_chunk(df, column_map, seen_product_ids)
+        prepared.append(valid)
+        errors.extend(chunk_errors)
+        done += len(df.index)
+        _row_progress(progress_cb, done, reader.total_rows, every=1)
+
+    if errors:
+        raise ImportFailed(
+            f"Gagal import stok opname: {notes_detail(errors, STOCK_MAX_ERRORS)}", errors
+        )
+    rows = pd.concat(prepared, ignore_index=True)
+    if rows.empty:
+        return {
+            "rows": 0,
+            "messages": [["warning", "Tidak ada baris valid yang diproses dari file import."]],
+        }
+
+    if progress_cb:
+        progress_cb(92, "Menyimpan hasil stok opname...")
+    opname_session = StockOpnameSession(
+        reference=allocate_document_number(DOCUMENT_STOCK_OPNAME),
+        location=location,
+        note=note,
+        status="completed",
+        created_by=created_by,
+        created_at=local_now(),
+        finalized_at=local_now(),
+    )
+    db.session.add(opname_session)
+    db.session.flush()
+
+    summary = _apply_stock_counts(opname_session.id, rows)
+    db.session.commit()
+    summary["reference"] = opname_session.reference
+    summary["messages"] = [
+        ["success", f"Import stok opname berhasil. {summary['rows']} item diproses."]
+    ]
+    return summary
+
+
+def _apply_stock_counts(session_id, rows):
+    """Bulk UPDATE stok/HPP produk dan bulk INSERT item opname untuk ``rows``.
+
+    Memakai statement Core ``executemany`` (bukan bulk ORM) karena nilainya
+    sudah lengkap per baris; stok sistem dibaca ulang di transaksi yang sama.
+    """
+    product_ids = rows["product_id"].astype(int).tolist()
+    system_qty = {}
+    for chunk in chunked(product_ids, LOOKUP_CHUNK):
+        system_qty.update(
+            db.session.execute(
+                select(Produk.id, Produk.stok_lama).where(Produk.id.in_(chunk))
+            ).all()
+        )
+    counted = rows["counted_qty"].astype(int).tolist()
+    costs = rows["hpp"].astype(object).where(rows["hpp"].notna(), None).tolist()
+    notes = rows["note"].astype(object).where(rows["note"].notna(), None).tolist()
+    system = [int(system_qty.get(product_id) or 0) for product_id in product_ids]
+
+    produk = Produk.__table__
+    by_id = produk.c.id == bindparam("b_id")
+    stock_updates = []
+    cost_updates = []
+    for product_id, qty, cost in zip(product_ids, counted, costs):
+        if cost is None:
+            stock_updates.append({"b_id": product_id, "b_stok": qty})
+        else:
+            cost_updates.append({"b_id": product_id, "b_stok": qty, "b_cost": float(cost)})
+    statements = (
+        (update(produk).where(by_id).values(stok_lama=bindparam("b_stok")), stock_updates),
+        (
+            update(produk)
+            .where(by_id)
+            .values(
+                stok_lama=bindparam("b_stok"),
+                harga_lama=bindparam("b_cost"),
+                harga_beli=bindparam("b_cost"),
+            ),
+            cost_updates,
+        ),
+    )
+    for statement, params in statements:
+        for chunk in chunked(params, WRITE_CHUNK):
+            db.session.execute(statement, chunk)
+
+    differences = [qty - current for qty, current in zip(counted, system)]
+    items = [
+        {
+            "session_id": session_id,
+            "product_id": product_id,
+            "system_qty": current,
+            "counted_qty": qty,
+            "difference_qty": difference,
+            "note": item_note,
+        }
+        for product_id, current, qty, difference, item_note in zip(
+            product_ids, system, counted, differences, notes
+        )
+    ]
+    for chunk in chunked(items, WRITE_CHUNK):
+        db.session.execute(StockOpnameItem.__table__.insert(), chunk)
+    record_catalog_changes(CATALOG_PRODUCTS, product_ids)
+
+    return {
+        "rows": len(items),
+        "plus": sum(value for value in differences if value > 0),
+        "minus": sum(value for value in differences if value < 0),
+    }
+
+
+def _normalize_price_column(name):
+    return re.sub(r"[^a-z0-9]+", "_", str(name).strip().lower())
+
+
+PRICE_LEVEL_KEY = ("product_id", "level_id")
+_PRODUCT_LOOKUPS = (
+    ("product_id", ("product_id", "id_produk", "produk_id")),
+    ("kode_produk", ("product_code", "kode_produk", "kode")),
+    ("sku", ("sku",)),
+    ("barcode", ("barcode",)),
+)
+
+
+def _price_row_value(row, keys):
+    for key in keys:
+        if key in row:
+            return row[key]
+    return None
+
+
+def _lookup_text(value):
+    import pandas as pd
+
+    if value is None or pd.isna(value) or not value:
+        return None
+    return str(value).strip().lower() or None
+
+
+def _lookup_int(value):
+    import pandas as pd
+
+    if value is None or pd.isna(value):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _load_price_products(refs):
+    """Produk yang dirujuk file saja: ``{kolom: {kunci: product_id}}``.
+
+    ``refs`` berisi ``{kolom: {kunci: nilai asli}}``. Nilai asli dicari dulu
+    lewat index kolom; hanya kunci yang belum ketemu dicari lewat
+    ``lower(trim(kolom))``, sama seperti ``_products_by_text``.
+    """
+    found = {column: {} for column, _ in _PRODUCT_LOOKUPS}
+    for column, _ in _PRODUCT_LOOKUPS:
+        keys = refs[column]
+        if not keys:
+            continue
+        if column == "product_id":
+            for chunk in chunked(sorted(keys), LOOKUP_CHUNK):
+                ids = db.session.scalars(select(Produk.id).where(Produk.id.in_(chunk)))
+                found[column].update((product_id, product_id) for product_id in ids)
+            continue
+
+        attr = getattr(Produk, column)
+        rows = []
+        for chunk in chunked(sorted(set(keys.values())), LOOKUP_CHUNK):
+            rows.extend(db.session.execute(select(attr, Produk.id).where(attr.in_(chunk))))
+        pending = set(keys) - {str(value).strip().lower() for value, _ in rows}
+        target = func.lower(func.trim(attr))
+        if len(pending) > LOOKUP_CHUNK:
+            # banyak kunci tanpa index: satu kali baca kolom lebih murah dari scan per potongan
+            scanned = db.session.execute(select(target, Produk.id))
+            rows.extend(row for row in scanned if row[0] in pending)
+        else:
+            for chunk in chunked(sorted(pending), LOOKUP_CHUNK):
+                rows.extend(
+                    db.session.execute(select(target, Produk.id).where(target.in_(chunk)))
+                )
+        # id terbesar menang untuk kunci kembar
+        for value, product_id in sorted(rows, key=lambda row: row[1]):
+            found[column][str(value).strip().lower()] = product_id
+    return found
+
+
+def _load_level_prices(pairs):
+    """Harga tersimpan untuk pasangan ``(product_id, level_id)`` yang dirujuk."""
+    prices = {}
+    product_ids = sorted({product_id for product_id, _ in pairs})
+    for chunk in chunked(product_ids, LOOKUP_CHUNK):
+        rows = db.session.execute(
+            select(
+                ProductPriceLevel.product_id,
+                ProductPriceLevel.level_id,
+                ProductPriceLevel.price,
+            ).where(ProductPriceLevel.product_id.in_(chunk))
+        )
+        for product_id, level_id, price in rows:
+            if (product_id, level_id) in pairs:
+                prices[(product_id, level_id)] = price
+    return prices
+
+
+def upsert_level_prices(rows, new_keys=()):
+    """Tulis ``[{"product_id", "level_id", "price"}]`` dengan satu upsert per dialek.
+
+    Bergantung pada ``uq_product_level_price``. Dialek tanpa upsert memakai
+    UPDATE untuk baris lama dan INSERT untuk ``new_keys``.
+    """
+    if not rows:
+        return
+    table = ProductPriceLevel.__table__
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect in ("sqlite", "postgresql"):
+        insert_fn = sqlite_insert if dialect == "sqlite" else postgresql_insert
+        stmt = insert_fn(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(PRICE_LEVEL_KEY), set_={"price": stmt.excluded.price}
+        )
+    elif dialect in ("mysql", "mariadb"):
+        stmt = mysql_insert(table)
+        stmt = stmt.on_duplicate_key_update(price=stmt.inserted.price)
+    else:
+        new_keys = set(new_keys)
+        existing = [row for row in rows if (row["product_id"], row["level_id"]) not in new_keys]
+        created = [row for row in rows if (row["product_id"], row["level_id"]) in new_keys]
+        if existing:
+            db.session.execute(
+                update(table)
+                .where(
+                    table.c.product_id == bindparam("b_product_id"),
+                    table.c.level_id == bindparam("b_level_id"),
+                )
+                .values(price=bindparam("b_price")),
+                [{f"b_{key}": value for key, value in row.items()} for row in existing],
+            )
+        if created:
+            db.session.execute(table.insert(), created)
+        return
+
+    for chunk in chunked(rows, WRITE_CHUNK):
+        db.session.execute(stmt, chunk)
+
+
+def run_harga_level_import(path, filename, progress_cb=None):
+    """Import harga per level; hanya produk/harga yang dirujuk file yang dibaca.
+
+    Setiap potongan file: kumpulkan kunci produk (ID, kode, SKU, barcode)
+    lalu ambil produk dan harga level yang cocok saja. Baris baru/berubah dari
+    semua potongan baru ditulis di akhir dengan satu upsert pada
+    ``(product_id, level_id)``, jadi kunci tulis tidak dipegang selama file
+    dibaca. Baris yang sama muncul dua kali: nilai terakhir yang dipakai.
+    Harga yang sudah dilihat dan baris yang akan ditulis ditahan di memori
+    sampai akhir, jadi memori tumbuh mengikuti jumlah pasangan produk/level.
+    """
+    import pandas as pd
+
+    reader = ImportChunks(path, filename)
+    chunks = iter(reader)
+    first = next(chunks, None)
+    if first is None:
+        return {"messages": [["warning", "File Excel kosong."]]}
+
+    normalized_columns = {_normalize_price_column(col): col for col in reader.columns}
+    if not {"price", "harga"}.intersection(normalized_columns.keys()):
+        reader.close()
+        raise ValueError("Kolom harga tidak ditemukan di file Excel.")
+
+    level_rows = db.session.execute(select(PriceLevel.id, PriceLevel.name)).all()
+    level_by_id = {level_id: level_id for level_id, _ in level_rows}
+    level_by_name = {(name or "").lower(): level_id for level_id, name in level_rows}
+
+    known_prices = {}
+    pending = {}
+    new_keys = set()
+    changed_products = set()
+    created_count = 0
+    updated_count = 0
+    skipped_count = 0
+    errors = 0
+    done = 0
+
+    for df in chain([first], chunks):
+        entries = []
+        refs = {column: {} for column, _ in _PRODUCT_LOOKUPS}
+        for record in df.to_dict("records"):
+            row = {_normalize_price_column(col): value for col, value in record.items()}
+            price_value = _price_row_value(row, ("price", "harga", "harga_level"))
+            if price_value is None or pd.isna(price_value):
+                skipped_count += 1
+                continue
+            try:
+                price_value = float(price_value)
+            except (TypeError, ValueError):
+                errors += 1
+                continue
+            if price_value < 0:
+                errors += 1
+                continue
+
+            level_id = level_by_id.get(_lookup_int(_price_row_value(row, ("level_id", "id_level"))))
+            if not level_id:
+                level_name = _lookup_text(
+                    _price_row_value(row, ("level_name", "nama_level", "level"))
+                )
+                level_id = level_by_name.get(level_name)
+
+            product_keys = []
+            for column, keys in _PRODUCT_LOOKUPS:
+                raw = _price_row_value(row, keys)
+                key = _lookup_int(raw) if column == "product_id" else _lookup_text(raw)
+                product_keys.append(key)
+                if key is not None:
+                    refs[column].setdefault(key, str(raw).strip())
+            entries.append((price_value, level_id, product_keys))
+
+        products = _load_price_products(refs)
+        resolved = []
+        for price_value, level_id, product_keys in entries:
+            product_id = next(
+                (
+                    products[column].get(key)
+                    for (column, _), key in zip(_PRODUCT_LOOKUPS, product_keys)
+                    if key is not None and products[column].get(key)
+                ),
+                None,
+            )
+            if not level_id or not product_id:
+                skipped_count += 1
+                continue
+            resolved.append(((product_id, level_id), price_value))
+
+        missing = {key for key, _ in resolved if key not in known_prices}
+        known_prices.update(_load_level_prices(missing))
+        for key, price_value in resolved:
+            if key not in known_prices:
+                created_count += 1
+                new_keys.add(key)
+            elif known_prices[key] != price_value:
+                updated_count += 1
+            else:
+                skipped_count += 1
+                continue
+            known_prices[key] = price_value
+            pending[key] = price_value
+            changed_products.add(key[0])
+        done += len(df.index)
+        _row_progress(progress_cb, done, reader.total_rows, every=1)
+
+    if created_count or updated_count:
+        if progress_cb:
+            progress_cb(92, "Menyimpan harga level...")
+        upsert_level_prices(
+            [
+                {"product_id": product_id, "level_id": level_id, "price": price}
+                for (product_id, level_id), price in pending.items()
+            ],
+            new_keys,
+        )
+        record_catalog_changes(CATALOG_PRODUCTS, sorted(changed_products))
+        db.session.commit()
+
+    message_parts = []
+    if created_count:
+        message_parts.append(f"{created_count} dibuat")
+    if updated_count:
+        message_parts.append(f"{updated_count} diupdate")
+    if skipped_count:
+        message_parts.append(f"{skipped_count} dilewati")
+    if errors:
+        message_parts.append(f"{errors} error")
+    text = ", ".join(message_parts) if message_parts else "Tidak ada perubahan"
+    return {
+        "created": created_count,
+        "updated": updated_count,
+        "skipped": skipped_count,
+        "errors": errors,
+        "messages": [["success", f"Import level harga selesai: {text}."]],
+    }
+
+
+IMPORT_RUNNERS = {
+    "produk": run_produk_import,
+    "pelanggan": run_pelanggan_import,
+    "supplier": run_supplier_import,
+    "stok_opname": run_stok_opname_import,
+    "harga_level": run_harga_level_import,
+}
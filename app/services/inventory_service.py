@@ -0,0 +1,91 @@
+"""Operasi stok produk yang aman untuk transaksi kasir yang berjalan bersamaan."""
+
+import sqlite3
+
+from sqlalchemy import case, update
+
+from app import db
+from app.models import Produk
+from app.services.catalog_service import CATALOG_PRODUCTS, record_catalog_changes
+
+ROW_LOCK_DIALECTS = {"mysql", "mariadb", "postgresql"}
+
+
+class InsufficientStockError(ValueError):
+    """Stok tidak cukup saat pengurangan kondisional dijalankan."""
+
+    def __init__(self, shortages):
+        self.shortages = shortages
+        details = ", ".join(
+            f"{item['name']} (sisa {item['available']}, diminta {item['requested']})"
+            for item in shortages
+        )
+        super().__init__(f"Stok tidak mencukupi: {details}.")
+
+
+def begin_stock_write_lock():
+    """
+    Ambil kunci tulis sebelum membaca stok.
+
+    MySQL/Postgres memakai ``SELECT ... FOR UPDATE`` per baris (lihat
+    ``load_products_for_update``). SQLite tidak punya row lock, jadi transaksi
+    dibuka dengan ``BEGIN IMMEDIATE`` agar kasir lain menunggu (busy_timeout)
+    alih-alih gagal karena snapshot WAL yang basi.
+    """
+    connection = db.session.connection()
+    if connection.dialect.name != "sqlite":
+        return
+    raw_connection = connection.connection.dbapi_connection
+    if isinstance(raw_connection, sqlite3.Connection) and not raw_connection.in_transaction:
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def load_products_for_update(product_ids):
+    """Muat semua produk keranjang dalam satu query ``IN``, dikunci bila didukung."""
+    ids = sorted({int(product_id) for product_id in product_ids})
+    if not ids:
+        return {}
+    query = Produk.query.filter(Produk.id.in_(ids)).order_by(Produk.id.asc())
+    if db.session.get_bind().dialect.name in ROW_LOCK_DIALECTS:
+        # urutan id yang tetap mencegah deadlock antar kasir
+        query = query.with_for_update()
+    return {product.id: product for product in query.all()}
+
+
+def decrement_stock(qty_by_product):
+    """
+    Kurangi ``stok_lama`` dengan satu ``UPDATE ... WHERE stok_lama >= qty``.
+
+    Jika ada produk yang stoknya sudah tidak cukup, tidak ada baris yang
+    dianggap berhasil dan ``InsufficientStockError`` dilempar; pemanggil wajib
+    rollback.
+    """
+    qty_map = {int(pid): int(qty) for pid, qty in qty_by_product.items() if qty > 0}
+    if not qty_map:
+        return
+    qty_expr = case(qty_map, value=Produk.id, else_=0)
+    result = db.session.execute(
+        update(Produk)
+        .where(Produk.id.in_(list(qty_map)))
+        .where(Produk.stok_lama >= qty_expr)
+        .values(stok_lama=Produk.stok_lama - qty_expr)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != len(qty_map):
+        rows = (
+            db.session.query(Produk.id, Produk.nama_produk, Produk.stok_lama)
+            .filter(Produk.id.in_(list(qty_map)))
+            .all()
+        )
+        shortages = [
+            {"id": pid, "name": name, "available": stok or 0, "requested": qty_map[pid]}
+            for pid, name, stok in rows
+            if (stok or 0) < qty_map[pid]
+        ]
+        raise InsufficientStockError(shortages)
+
+    # UPDATE langsung melewati ORM: segarkan objek di session dan catat katalog
+    for product in db.session.identity_map.values():
+        if isinstance(product, Produk) and product.id in qty_map:
+            db.session.expire(product, ["stok_lama"])
+    record_catalog_changes(CATALOG_PRODUCTS, qty_map)
@@ -0,0 +1,352 @@
+"""Saldo akun buku besar berbasis snapshot ``account_period_balance``.
+
+Setiap periode akuntansi menyimpan saldo kumulatif per akun sampai tanggal
+akhirnya. Saldo per tanggal dihitung dari snapshot terdekat sebelum tanggal
+itu ditambah jurnal sesudahnya, bukan dari seluruh riwayat jurnal.
+
+Jurnal yang dibuat/diubah/dihapus dengan tanggal <= akhir periode membuat
+snapshot periode tersebut ``is_stale`` (hook ``after_flush``) dan dihitung
+ulang di transaksi penulis itu sendiri sebelum commit, dengan baris periode
+dikunci. Laporan (GET) tidak pernah menulis: snapshot basi dilewati dan
+saldonya dihitung dari snapshot valid sebelumnya ditambah jurnal.
+"""
+
+from datetime import timedelta
+
+from sqlalchemy import case, event, func, inspect, or_, select, update
+
+from app import db
+from app.models import (
+    Account,
+    AccountingPeriod,
+    AccountPeriodBalance,
+    JournalEntry,
+    JournalLine,
+)
+from app.services.inventory_service import ROW_LOCK_DIALECTS, begin_stock_write_lock
+from app.time_utils import local_now
+
+ADJUSTMENT_MEMO_PATTERN = "Penyesuaian%"
+REFRESH_FLAG = "period_balances_stale"
+# MySQL REPEATABLE READ membaca snapshot awal transaksi; saat hitung ulang
+# jurnal dibaca dengan locking read agar commit penulis lain ikut terlihat
+SHARE_LOCK_DIALECTS = {"mysql", "mariadb"}
+
+
+def _net_columns():
+    """Net debit - kredit dan bagian jurnal "Penyesuaian" (pola neraca saldo)."""
+    net = JournalLine.debit - JournalLine.credit
+    is_adjustment = JournalEntry.memo.ilike(ADJUSTMENT_MEMO_PATTERN)
+    return (
+        func.coalesce(func.sum(net), 0.0),
+        func.coalesce(func.sum(case((is_adjustment, net), else_=0.0)), 0.0),
+    )
+
+
+def _line_query(*columns):
+    return (
+        db.session.query(JournalLine.account_id, *columns)
+        .join(JournalEntry, JournalLine.entry_id == JournalEntry.id)
+        .group_by(JournalLine.account_id)
+    )
+
+
+def _lock_for_refresh(query):
+    if db.session.get_bind().dialect.name in SHARE_LOCK_DIALECTS:
+        return query.with_for_update(read=True)
+    return query
+
+
+def _sum_lines(after=None, until=None, account_ids=None, locked=False):
+    """``{account_id: (net, net_penyesuaian)}`` untuk jurnal ``after < date <= until``."""
+    query = _line_query(*_net_columns())
+    if locked:
+        query = _lock_for_refresh(query)
+    if after is not None:
+        query = query.filter(JournalEntry.date > after)
+    if until is not None:
+        query = query.filter(JournalEntry.date <= until)
+    if account_ids is not None:
+        query = query.filter(JournalLine.account_id.in_(account_ids))
+    return {
+        account_id: (float(net or 0.0), float(adjustment or 0.0))
+        for account_id, net, adjustment in query.all()
+    }
+
+
+def _valid_period_ids():
+    rows = (
+        db.session.query(AccountPeriodBalance.period_id)
+        .filter(AccountPeriodBalance.is_stale.is_(False))
+        .distinct()
+        .all()
+    )
+    return {period_id for (period_id,) in rows}
+
+
+def _snapshot_balances(period_id):
+    rows = db.session.query(
+        AccountPeriodBalance.account_id,
+        AccountPeriodBalance.closing_balance,
+        AccountPeriodBalance.closing_adjustment,
+    ).filter(AccountPeriodBalance.period_id == period_id)
+    return {account_id: (balance, adjustment) for account_id, balance, adjustment in rows}
+
+
+def _write_snapshot(period, previous_end, previous_balances):
+    """Hitung ulang snapshot ``period`` dari snapshot sebelumnya + jurnal sesudahnya."""
+    balances = dict(previous_balances)
+    for account_id, (net, adjustment) in _sum_lines(
+        after=previous_end, until=period.end_date, locked=True
+    ).items():
+        base_net, base_adjustment = balances.get(account_id, (0.0, 0.0))
+        balances[account_id] = (base_net + net, base_adjustment + adjustment)
+
+    activity_query = _line_query(
+        func.coalesce(func.sum(JournalLine.debit), 0.0),
+        func.coalesce(func.sum(JournalLine.credit), 0.0),
+    )
+    activity = {
+        account_id: (float(debit or 0.0), float(credit or 0.0))
+        for account_id, debit, credit in _lock_for_refresh(activity_query)
+        .filter(JournalEntry.date >= period.start_date)
+        .filter(JournalEntry.date <= period.end_date)
+        .all()
+    }
+
+    table = AccountPeriodBalance.__table__
+    db.session.execute(table.delete().where(table.c.period_id == period.id))
+    now = local_now()
+    # satu baris per akun (termasuk saldo nol) agar snapshot yang lengkap bisa
+    # dibedakan dari periode yang belum pernah dihitung
+    rows = []
+    for (account_id,) in db.session.query(Account.id).all():
+        balance, adjustment = balances.get(account_id, (0.0, 0.0))
+        debit, credit = activity.get(account_id, (0.0, 0.0))
+        rows.append(
+            {
+                "period_id": period.id,
+                "account_id": account_id,
+                "period_start": period.start_date,
+                "period_end": period.end_date,
+                "debit": debit,
+                "credit": credit,
+                "closing_balance": balance,
+                "closing_adjustment": adjustment,
+                "is_stale": False,
+                "refreshed_at": now,
+            }
+        )
+    if rows:
+        db.session.execute(table.insert(), rows)
+    return balances
+
+
+def lock_accounting_periods():
+    """
+    Kunci semua baris ``accounting_period`` (urut id) untuk hitung ulang snapshot.
+
+    Penulis jurnal mundur tanggal dan penghitung ulang snapshot saling
+    menunggu di sini sehingga snapshot tidak ditandai valid tanpa jurnal yang
+    di-commit bersamaan. SQLite memakai ``BEGIN IMMEDIATE``.
+    """
+    begin_stock_write_lock()
+    if db.session.get_bind().dialect.name in ROW_LOCK_DIALECTS:
+        db.session.execute(
+            select(AccountingPeriod.id).order_by(AccountingPeriod.id.asc()).with_for_update()
+        ).all()
+
+
+def refresh_account_period_balances():
+    """
+    Hitung ulang snapshot yang basi atau belum ada, urut tanggal akhir periode.
+
+    Baris periode dikunci dulu, lalu status ``is_stale`` dibaca ulang. Snapshot
+    yang masih valid hanya dibaca bila periode sesudahnya perlu dihitung
+    ulang. Tidak commit; mengembalikan jumlah periode yang dihitung.
+    """
+    lock_accounting_periods()
+    periods = AccountingPeriod.query.order_by(
+        AccountingPeriod.end_date.asc(), AccountingPeriod.id.asc()
+    ).all()
+    valid = _valid_period_ids()
+    if all(period.id in valid for period in periods):
+        return 0
+
+    refreshed = 0
+    previous = None
+    previous_balances = None
+    for period in periods:
+        if period.id in valid:
+            previous, previous_balances = period, None
+            continue
+        if previous is not None and previous_balances is None:
+            previous_balances = _snapshot_balances(previous.id)
+        previous_balances = _write_snapshot(
+            period,
+            previous.end_date if previous is not None else None,
+            previous_balances or {},
+        )
+        previous = period
+        refreshed += 1
+    return refreshed
+
+
+def _nearest_snapshot(day, not_before=None):
+    """Periode dengan snapshot valid terakhir yang berakhir <= ``day``."""
+    query = (
+        db.session.query(AccountPeriodBalance.period_id, AccountPeriodBalance.period_end)
+        .filter(AccountPeriodBalance.is_stale.is_(False))
+        .filter(AccountPeriodBalance.period_end <= day)
+    )
+    if not_before is not None:
+        query = query.filter(AccountPeriodBalance.period_end >= not_before)
+    return query.order_by(
+        AccountPeriodBalance.period_end.desc(), AccountPeriodBalance.period_id.desc()
+    ).first()
+
+
+def _balances_as_of(day, account_ids=None, exclude_adjustments=False):
+    snapshot = _nearest_snapshot(day)
+    balances = {}
+    if snapshot is not None:
+        query = db.session.query(
+            AccountPeriodBalance.account_id,
+            AccountPeriodBalance.closing_balance,
+            AccountPeriodBalance.closing_adjustment,
+        ).filter(AccountPeriodBalance.period_id == snapshot.period_id)
+        if account_ids is not None:
+            query = query.filter(AccountPeriodBalance.account_id.in_(account_ids))
+        balances = {
+            account_id: (balance, adjustment)
+            for account_id, balance, adjustment in query.all()
+        }
+    after = snapshot.period_end if snapshot is not None else None
+    for account_id, (net, adjustment) in _sum_lines(
+        after=after, until=day, account_ids=account_ids
+    ).items():
+        base_net, base_adjustment = balances.get(account_id, (0.0, 0.0))
+        balances[account_id] = (base_net + net, base_adjustment + adjustment)
+    return {
+        account_id: net - adjustment if exclude_adjustments else net
+        for account_id, (net, adjustment) in balances.items()
+    }
+
+
+def account_balances_before(day, account_ids=None):
+    """Saldo awal (debit - kredit) tiap akun untuk jurnal bertanggal < ``day``."""
+    return _balances_as_of(day - timedelta(days=1), account_ids)
+
+
+def opening_balance(account_id, day):
+    return account_balances_before(day, [account_id]).get(account_id, 0.0)
+
+
+def account_net_movements(start_date, end_date, exclude_adjustments=False):
+    """
+    Net debit - kredit per akun untuk jurnal ``start_date..end_date``.
+
+    Bila ada snapshot yang berakhir di dalam rentang, hasilnya dihitung
+    sebagai saldo(akhir) - saldo(awal - 1) sehingga jurnal di periode yang
+    sudah di-snapshot tidak dipindai ulang. Tanpa snapshot seperti itu,
+    menjumlahkan jurnal dalam rentang langsung lebih murah.
+    """
+    if _nearest_snapshot(end_date, not_before=start_date) is None:
+        query = _line_query(func.coalesce(func.sum(JournalLine.debit - JournalLine.credit), 0.0))
+        if exclude_adjustments:
+            query = query.filter(
+                or_(
+                    JournalEntry.memo.is_(None),
+                    ~JournalEntry.memo.ilike(ADJUSTMENT_MEMO_PATTERN),
+                )
+            )
+        rows = (
+            query.filter(JournalEntry.date >= start_date)
+            .filter(JournalEntry.date <= end_date)
+            .all()
+        )
+        return {account_id: float(net or 0.0) for account_id, net in rows}
+
+    closing = _balances_as_of(end_date, exclude_adjustments=exclude_adjustments)
+    opening = _balances_as_of(
+        start_date - timedelta(days=1), exclude_adjustments=exclude_adjustments
+    )
+    # selisih dua jumlah besar menyisakan noise float; bulatkan di bawah sen
+    return {
+        account_id: round(closing.get(account_id, 0.0) - opening.get(account_id, 0.0), 6)
+        for account_id in set(closing) | set(opening)
+    }
+
+
+def _changed_journal_dates(session):
+    dates = []
+    entry_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, JournalEntry):
+            if obj in session.dirty and not session.is_modified(
+                obj, include_collections=False
+            ):
+                continue
+            history = inspect(obj).attrs.date.history
+            dates.extend(value for value in (obj.date, *history.deleted) if value)
+        elif isinstance(obj, JournalLine):
+            if obj in session.dirty and not session.is_modified(
+                obj, include_collections=False
+            ):
+                continue
+            history = inspect(obj).attrs.entry_id.history
+            entry_ids.update(
+                value for value in (obj.entry_id, *history.deleted) if value
+            )
+    if entry_ids:
+        rows = session.connection().execute(
+            select(JournalEntry.date).where(JournalEntry.id.in_(entry_ids))
+        )
+        dates.extend(value for (value,) in rows if value)
+    return dates
+
+
+@event.listens_for(db.session, "after_flush")
+def _mark_period_balances_stale(session, _flush_context):
+    new_period = any(isinstance(obj, AccountingPeriod) for obj in session.new)
+    dates = _changed_journal_dates(session)
+    if dates:
+        connection = session.connection()
+        affected = connection.execute(
+            select(AccountingPeriod.id).where(AccountingPeriod.end_date >= min(dates)).limit(1)
+        ).first()
+        if affected is None:
+            # jurnal sesudah periode terakhir (kasus umum checkout) tidak menyentuh snapshot
+            dates = []
+        else:
+            # kunci periode sebelum baris snapshot agar urutan kunci sama
+            # dengan refresh_account_period_balances (hindari deadlock)
+            if connection.dialect.name in ROW_LOCK_DIALECTS:
+                connection.execute(
+                    select(AccountingPeriod.id)
+                    .order_by(AccountingPeriod.id.asc())
+                    .with_for_update()
+                ).all()
+            table = AccountPeriodBalance.__table__
+            connection.execute(
+                update(table)
+                .where(table.c.period_end >= min(dates))
+                .where(table.c.is_stale.is_(False))
+                .values(is_stale=True)
+            )
+    if dates or new_period:
+        session.info[REFRESH_FLAG] = True
+
+
+@event.listens_for(db.session, "before_commit")
+def _refresh_stale_period_balances(session):
+    # before_commit jalan sebelum flush terakhir; flush dulu agar jurnal yang
+    # masih pending ikut menandai snapshot
+    session.flush()
+    if session.info.pop(REFRESH_FLAG, False):
+        refresh_account_period_balances()
+
+
+@event.listens_for(db.session, "after_rollback")
+def _drop_period_refresh_flag(session):
+    session.info.pop(REFRESH_FLAG, None)
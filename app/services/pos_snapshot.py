@@ -0,0 +1,287 @@
+"""Snapshot katalog produk di memori worker untuk scan barcode di kasir.
+
+Setiap worker menyimpan semua produk sebagai ``ProductRecord`` (``__slots__``,
+label kategori/satuan dipakai bersama) ditambah tiga dict: barcode, kode
+produk dan SKU -> record, jadi satu scan cukup satu lookup hash tanpa query.
+
+Snapshot mengikuti versi katalog (``catalog_change``, lihat
+``catalog_service``). Paling sering setiap ``POS_SNAPSHOT_TTL`` detik (default
+2) versi terakhir dicek dengan dua query ber-indeks (versi dan jendela commit
+terlambat, lihat ``CatalogState``); jika berubah hanya
+produk yang tercatat di log yang dimuat ulang. Commit yang mengubah katalog di
+worker yang sama langsung menandai snapshot untuk dicek di scan berikutnya.
+
+Snapshot dimuat di thread latar saat request pertama (``POS_SNAPSHOT_WARM``,
+default 1). 100 ribu SKU (30% dengan dua harga level) memakai sekitar 70 MB
+per worker dan dimuat dalam ~3 detik; lihat ``benchmarks/bench_pos_snapshot.py``.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import event
+
+from app import db
+from app.models import Produk
+from app.services.catalog_service import (
+    CATALOG_PRODUCTS,
+    build_catalog_payload,
+    get_catalog_state,
+    serialize_products,
+)
+
+LOAD_PAGE_SIZE = 5000
+
+_state = {"snapshot": None, "stale": False}
+_lock = threading.Lock()
+
+
+class ProductRecord:
+    __slots__ = (
+        "id",
+        "code",
+        "sku",
+        "barcode",
+        "name",
+        "price",
+        "kategori",
+        "satuan",
+        "level_prices",
+        "stok",
+        "stok_minimal",
+        "hpp",
+        "last_cost",
+        "weight",
+    )
+
+    def __init__(self, item, labels):
+        self.id = item["id"]
+        self.code = item["code"]
+        self.sku = item["sku"]
+        self.barcode = item["barcode"]
+        self.name = item["name"]
+        self.price = item["price"]
+        # nama kategori/satuan berulang ribuan kali; simpan satu objek string saja
+        self.kategori = labels.setdefault(item["kategori"], item["kategori"])
+        self.satuan = labels.setdefault(item["satuan"], item["satuan"])
+        self.level_prices = item["level_prices"] or None
+        self.stok = item["stok"]
+        self.stok_minimal = item["stok_minimal"]
+        self.hpp = item["hpp"]
+        self.last_cost = item["last_cost"]
+        self.weight = item["weight"]
+
+    def as_dict(self):
+        """Format sama dengan item ``/api/pos/catalog/products``."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "code": self.code,
+            "price": self.price,
+            "sku": self.sku,
+            "barcode": self.barcode,
+            "kategori": self.kategori,
+            "satuan": self.satuan,
+            "level_prices": dict(self.level_prices or {}),
+            "stok": self.stok,
+            "stok_minimal": self.stok_minimal,
+            "hpp": self.hpp,
+            "last_cost": self.last_cost,
+            "harga_beli": self.last_cost,
+            "weight": self.weight,
+        }
+
+
+def _key(value):
+    if value is None:
+        return None
+    text = str(value)
+    key = text.strip().upper()
+    # kode yang sudah bersih tidak perlu salinan string kedua
+    return (text if key == text else key) or None
+
+
+class ProductSnapshot:
+    """Produk per id plus indeks barcode/kode/SKU; urutan lookup: barcode, kode, SKU."""
+
+    __slots__ = ("state", "records", "by_barcode", "by_code", "by_sku", "labels", "checked_at")
+
+    def __init__(self, state):
+        self.state = state
+        self.records = {}
+        self.by_barcode = {}
+        self.by_code = {}
+        self.by_sku = {}
+        self.labels = {}
+        self.checked_at = time.monotonic()
+
+    def _indexes(self, record):
+        return (
+            (self.by_barcode, _key(record.barcode)),
+            (self.by_code, _key(record.code)),
+            (self.by_sku, _key(record.sku)),
+        )
+
+    def remove(self, product_id):
+        record = self.records.pop(product_id, None)
+        if record is None:
+            return
+        for index, key in self._indexes(record):
+            if key is not None and index.get(key) is record:
+                del index[key]
+
+    def put(self, item):
+        """Tambah/ganti produk tanpa celah bagi pembaca tanpa lock.
+
+        Entri indeks ditimpa di tempat; hanya kunci lama yang tidak dipakai
+        record baru yang dihapus, jadi kode yang tidak berubah selalu ketemu.
+        """
+        record = ProductRecord(item, self.labels)
+        old = self.records.get(record.id)
+        for index, key in self._indexes(record):
+            if key is not None:
+                index[key] = record
+        self.records[record.id] = record
+        if old is not None:
+            for (index, key), (_, new_key) in zip(self._indexes(old), self._indexes(record)):
+                if key is not None and key != new_key and index.get(key) is old:
+                    del index[key]
+        return record
+
+    def lookup_code(self, value):
+        """Hanya kode produk (tanpa barcode/SKU), huruf besar/kecil diabaikan."""
+        key = _key(value)
+        return self.by_code.get(key) if key is not None else None
+
+    def lookup(self, value):
+        key = _key(value)
+        if key is None:
+            return None
+        return self.by_barcode.get(key) or self.by_code.get(key) or self.by_sku.get(key)
+
+    def __len__(self):
+        return len(self.records)
+
+
+def _ttl():
+    value = current_app.config.get("POS_SNAPSHOT_TTL")
+    if value is None:
+        try:
+            value = float(os.environ.get("POS_SNAPSHOT_TTL", 2))
+        except ValueError:
+            value = 2.0
+        current_app.config["POS_SNAPSHOT_TTL"] = value
+    return float(value)
+
+
+def load_snapshot():
+    """Muat seluruh produk per halaman id; versi diambil dulu agar tidak ada perubahan terlewat."""
+    snapshot = ProductSnapshot(get_catalog_state(CATALOG_PRODUCTS))
+    after = 0
+    while True:
+        items = serialize_products(Produk.id > after, LOAD_PAGE_SIZE)
+        for item in items:
+            snapshot.put(item)
+        if len(items) < LOAD_PAGE_SIZE:
+            break
+        after = items[-1]["id"]
+    return snapshot
+
+
+def refresh_snapshot(snapshot):
+    """Terapkan perubahan katalog sejak ``snapshot.state``.
+
+    Mengembalikan snapshot baru bila perlu sinkron penuh.
+    """
+    state = get_catalog_state(CATALOG_PRODUCTS)
+    if state != snapshot.state:
+        payload = build_catalog_payload(
+            CATALOG_PRODUCTS,
+            since=snapshot.state.version,
+            limit=1,
+            state=state,
+            window=snapshot.state.window,
+        )
+        if payload["mode"] != "delta":
+            return load_snapshot()
+        for product_id in payload["deleted"]:
+            snapshot.remove(product_id)
+        for item in payload["items"]:
+            snapshot.put(item)
+        snapshot.state = state
+    snapshot.checked_at = time.monotonic()
+    return snapshot
+
+
+def current_snapshot():
+    """Snapshot worker ini; dimuat atau disegarkan bila sudah waktunya."""
+    snapshot = _state["snapshot"]
+    if snapshot is None:
+        with _lock:
+            if _state["snapshot"] is None:
+                _state.update(snapshot=load_snapshot(), stale=False)
+            return _state["snapshot"]
+    due = _state["stale"] or time.monotonic() - snapshot.checked_at >= _ttl()
+    # thread lain yang sedang menyegarkan: pakai snapshot yang ada
+    if due and _lock.acquire(blocking=False):
+        try:
+            _state["stale"] = False
+            _state["snapshot"] = refresh_snapshot(_state["snapshot"])
+        finally:
+            _lock.release()
+    return _state["snapshot"]
+
+
+def scan_product(value):
+    """``ProductRecord`` untuk barcode/kode/SKU hasil scan, atau None."""
+    return current_snapshot().lookup(value)
+
+
+def product_by_code(value):
+    """``ProductRecord`` dengan kode produk persis ``value``, atau None."""
+    return current_snapshot().lookup_code(value)
+
+
+def reset_snapshot():
+    with _lock:
+        _state.update(snapshot=None, stale=False)
+
+
+def _warm(app):
+    with app.app_context():
+        try:
+            current_snapshot()
+        except Exception:
+            logging.exception("Gagal memuat snapshot katalog POS")
+        finally:
+            db.session.remove()
+
+
+def warm_snapshot_async(app):
+    """Muat snapshot di thread latar supaya scan pertama tidak menunggu."""
+    enabled = os.environ.get("POS_SNAPSHOT_WARM", "1").strip().lower() not in (
+        "0",
+        "false",
+        "no",
+        "off",
+    )
+    # SQLite in-memory hanya punya satu koneksi bersama; jangan dipakai dua thread
+    if not enabled or db.engine.url.database in (None, "", ":memory:"):
+        return None
+    thread = threading.Thread(target=_warm, args=(app,), name="pos-snapshot-warm", daemon=True)
+    thread.start()
+    return thread
+
+
+@event.listens_for(db.session, "after_commit")
+def _mark_stale(session):
+    if session.info.pop("catalog_changed", False):
+        _state["stale"] = True
+
+
+@event.listens_for(db.session, "after_rollback")
+def _discard_catalog_flag(session):
+    session.info.pop("catalog_changed", None)
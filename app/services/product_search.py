@@ -0,0 +1,272 @@
+"""Pencarian produk (nama, kode, SKU, barcode) lewat indeks per database.
+
+``ilike('%q%')`` tidak bisa memakai indeks B-tree, jadi setiap ketikan di
+kolom pencarian memindai seluruh tabel produk. Modul ini memilih backend
+sesuai dialect dan menyimpan pilihannya sekali per proses:
+
+- SQLite: tabel virtual FTS5 ``produk_fts`` (tokenizer trigram, jadi tetap
+  cocok untuk potongan kata) yang disinkronkan trigger insert/update/delete.
+- MySQL: indeks FULLTEXT dengan parser ngram. MariaDB tidak punya parser
+  ngram (FULLTEXT biasa hanya cocok per kata), jadi memakai ``ilike``.
+- PostgreSQL: indeks GIN ``gin_trgm_ops`` (pg_trgm) per kolom; ``ILIKE``
+  yang sama langsung dilayani indeks itu.
+- Selain itu, atau selama indeks belum terpasang: ``ilike`` biasa.
+
+Indeks FULLTEXT dan trigram dirawat database sendiri; FTS5 lewat trigger, jadi
+bulk insert/update di luar ORM juga ikut tersinkron. Indeks dipasang oleh
+migrasi, ``flask schema search-index``, atau otomatis saat pertama dipakai jika
+``SCHEMA_AUTO_APPLY`` aktif. Hasil selalu diurutkan: kode/barcode/SKU yang sama
+persis dulu, lalu skor relevansi backend, lalu nama.
+"""
+
+import logging
+import threading
+
+from flask import current_app
+from sqlalchemy import case, column, func, or_, table, text
+from sqlalchemy.dialects.mysql import match as mysql_match
+
+from app import db
+from app.models import Produk
+
+SEARCH_COLUMNS = ("nama_produk", "kode_produk", "sku", "barcode")
+
+_lock = threading.Lock()
+
+
+def _ilike_filter(term, columns=SEARCH_COLUMNS):
+    like = f"%{term}%"
+    return or_(*(getattr(Produk, name).ilike(like) for name in columns))
+
+
+class FallbackSearch:
+    """Tanpa indeks: ``ilike`` di setiap kolom (memindai tabel)."""
+
+    name = "ilike"
+    indexed = False
+
+    def ddl(self):
+        return []
+
+    def is_installed(self, connection):
+        return True
+
+    def rebuild(self, connection):
+        pass
+
+    def apply(self, query, term, columns=SEARCH_COLUMNS):
+        return query.filter(_ilike_filter(term, columns)), []
+
+
+class SqliteFtsSearch(FallbackSearch):
+    name = "sqlite-fts5"
+    indexed = True
+    # tokenizer trigram tidak bisa mencari kurang dari 3 karakter
+    min_length = 3
+    _fts = table("produk_fts", column("rowid"), column("rank"))
+
+    def ddl(self):
+        columns = ", ".join(SEARCH_COLUMNS)
+        new_values = ", ".join(f"new.{name}" for name in SEARCH_COLUMNS)
+        old_values = ", ".join(f"old.{name}" for name in SEARCH_COLUMNS)
+        delete_old = (
+            f"INSERT INTO produk_fts(produk_fts, rowid, {columns}) "
+            f"VALUES ('delete', old.id, {old_values});"
+        )
+        insert_new = (
+            f"INSERT INTO produk_fts(rowid, {columns}) VALUES (new.id, {new_values});"
+        )
+        return [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS produk_fts USING fts5({columns}, "
+            "content='produk', content_rowid='id', tokenize='trigram')",
+            f"CREATE TRIGGER IF NOT EXISTS produk_fts_ai AFTER INSERT ON produk "
+            f"BEGIN {insert_new} END",
+            f"CREATE TRIGGER IF NOT EXISTS produk_fts_ad AFTER DELETE ON produk "
+            f"BEGIN {delete_old} END",
+            f"CREATE TRIGGER IF NOT EXISTS produk_fts_au AFTER UPDATE ON produk "
+            f"BEGIN {delete_old} {insert_new} END",
+        ]
+
+    def is_installed(self, connection):
+        names = set(
+            connection.execute(
+                text(
+                    "SELECT name FROM sqlite_master WHERE name IN "
+                    "('produk_fts', 'produk_fts_ai', 'produk_fts_ad', 'produk_fts_au')"
+                )
+            ).scalars()
+        )
+        return len(names) == 4
+
+    def rebuild(self, connection):
+        connection.execute(text("INSERT INTO produk_fts(produk_fts) VALUES ('rebuild')"))
+
+    def apply(self, query, term, columns=SEARCH_COLUMNS):
+        if len(term) < self.min_length:
+            return super().apply(query, term, columns)
+        phrase = '"' + term.replace('"', '""') + '"'
+        if tuple(columns) != SEARCH_COLUMNS:
+            phrase = "{" + " ".join(columns) + "} : " + phrase
+        query = query.join(self._fts, self._fts.c.rowid == Produk.id).filter(
+            text("produk_fts MATCH :product_search").bindparams(product_search=phrase)
+        )
+        # rank FTS5 = bm25, makin kecil makin relevan
+        return query, [self._fts.c.rank.asc()]
+
+
+class MysqlFulltextSearch(FallbackSearch):
+    name = "mysql-fulltext"
+    indexed = True
+    index_name = "ft_produk_search"
+    # ngram_token_size default MySQL adalah 2
+    min_length = 2
+
+    def ddl(self):
+        return [
+            f"CREATE FULLTEXT INDEX {self.index_name} ON produk "
+            f"({', '.join(SEARCH_COLUMNS)}) WITH PARSER ngram"
+        ]
+
+    def is_installed(self, connection):
+        return bool(
+            connection.execute(
+                text(
+                    "SELECT COUNT(*) FROM information_schema.statistics "
+                    "WHERE table_schema = DATABASE() AND table_name = 'produk' "
+                    "AND index_name = :name"
+                ),
+                {"name": self.index_name},
+            ).scalar()
+        )
+
+    def apply(self, query, term, columns=SEARCH_COLUMNS):
+        # MATCH harus memakai daftar kolom yang sama persis dengan indeks
+        if len(term) < self.min_length or tuple(columns) != SEARCH_COLUMNS:
+            return super().apply(query, term, columns)
+        match = mysql_match(
+            *(getattr(Produk, name) for name in SEARCH_COLUMNS),
+            against='"' + term.replace('"', " ") + '"',
+        ).in_boolean_mode()
+        return query.filter(match), [match.desc()]
+
+
+class PostgresTrigramSearch(FallbackSearch):
+    name = "postgres-trgm"
+    indexed = True
+
+    @staticmethod
+    def _index_name(name):
+        return f"ix_produk_{name}_trgm"
+
+    def ddl(self):
+        statements = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"]
+        statements.extend(
+            f"CREATE INDEX IF NOT EXISTS {self._index_name(name)} "
+            f"ON produk USING gin ({name} gin_trgm_ops)"
+            for name in SEARCH_COLUMNS
+        )
+        return statements
+
+    def is_installed(self, connection):
+        found = connection.execute(
+            text(
+                "SELECT COUNT(*) FROM pg_indexes WHERE tablename = 'produk' "
+                "AND indexname = ANY(:names)"
+            ),
+            {"names": [self._index_name(name) for name in SEARCH_COLUMNS]},
+        ).scalar()
+        return found == len(SEARCH_COLUMNS)
+
+    def apply(self, query, term, columns=SEARCH_COLUMNS):
+        # ILIKE yang sama, tetapi dilayani indeks GIN trigram
+        score = func.greatest(
+            *(func.similarity(func.coalesce(getattr(Produk, name), ""), term) for name in columns)
+        )
+        return query.filter(_ilike_filter(term, columns)), [score.desc()]
+
+
+BACKENDS = {
+    "sqlite": SqliteFtsSearch,
+    "mysql": MysqlFulltextSearch,
+    "mariadb": FallbackSearch,
+    "postgresql": PostgresTrigramSearch,
+}
+
+
+def backend_for(engine):
+    # URL mysql:// ke server MariaDB baru dikenali setelah koneksi pertama
+    if getattr(engine.dialect, "is_mariadb", False):
+        return FallbackSearch()
+    return BACKENDS.get(engine.dialect.name, FallbackSearch)()
+
+
+def install_search_index(engine, rebuild=True):
+    """Pasang DDL indeks pencarian (idempoten) dan isi ulang indeksnya."""
+    backend = backend_for(engine)
+    with engine.begin() as connection:
+        if not backend.is_installed(connection):
+            for statement in backend.ddl():
+                connection.execute(text(statement))
+        if rebuild:
+            backend.rebuild(connection)
+    return backend
+
+
+def _resolve_backend(app):
+    engine = db.engine
+    try:
+        with engine.connect() as connection:
+            backend = backend_for(connection)
+            if not backend.indexed:
+                return backend
+            installed = backend.is_installed(connection)
+        if not installed and app.config.get("SCHEMA_AUTO_APPLY"):
+            install_search_index(engine)
+            installed = True
+    except Exception:
+        logging.exception("Indeks pencarian produk tidak bisa dipakai")
+        installed = False
+    if not installed:
+        logging.warning(
+            "Indeks pencarian produk belum terpasang; jalankan `flask schema search-index`."
+        )
+        return FallbackSearch()
+    return backend
+
+
+def search_backend(app=None):
+    """Backend pencarian untuk proses ini (di-resolve sekali)."""
+    app = app or current_app._get_current_object()
+    backend = app.extensions.get("product_search")
+    if backend is None:
+        with _lock:
+            backend = app.extensions.get("product_search")
+            if backend is None:
+                backend = app.extensions["product_search"] = _resolve_backend(app)
+    return backend
+
+
+def reset_search_backend(app=None):
+    app = app or current_app._get_current_object()
+    app.extensions.pop("product_search", None)
+
+
+def search_products(query, term, columns=SEARCH_COLUMNS):
+    """Saring ``query`` (berbasis ``Produk``) dengan ``term`` dan urutkan relevansi."""
+    term = (term or "").strip()
+    if not term:
+        return query
+    query, rank = search_backend().apply(query, term, columns)
+    lowered = term.lower()
+    exact = case(
+        (
+            or_(
+                func.lower(Produk.kode_produk) == lowered,
+                func.lower(Produk.barcode) == lowered,
+                func.lower(Produk.sku) == lowered,
+            ),
+            0,
+        ),
+        else_=1,
+    )
+    return query.order_by(exact, *rank, Produk.nama_produk.asc(), Produk.id.asc())
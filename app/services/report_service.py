@@ -0,0 +1,120 @@
+"""Agregasi laporan penjualan yang dihitung di database."""
+
+from sqlalchemy import func
+
+from app import db
+from app.models import DetailPenjualan, Penjualan, Produk
+from app.services.sales_summary_service import detail_line_columns
+
+TOP_PRODUCT_LIMIT = 5
+
+
+def _detail_query(*columns, start_date, end_date):
+    return (
+        db.session.query(*columns)
+        .select_from(DetailPenjualan)
+        .join(Penjualan, Penjualan.id == DetailPenjualan.penjualan_id)
+        .outerjoin(Produk, Produk.id == DetailPenjualan.produk_id)
+        .filter(Penjualan.tanggal_penjualan >= start_date)
+        .filter(Penjualan.tanggal_penjualan <= end_date)
+    )
+
+
+def profit_loss_breakdown(start_date, end_date, top_limit=TOP_PRODUCT_LIMIT):
+    """
+    HPP, laba kotor, tren harian/bulanan dan produk terlaris untuk laba rugi.
+
+    Dua query agregat (per tanggal dan per produk) menggantikan pemuatan
+    seluruh ``Penjualan`` + detail + produk ke Python. Bulan dijumlahkan dari
+    hasil harian yang sudah ringkas.
+    """
+    line = detail_line_columns()
+    gross_value = line["taxable"] - line["cost"]
+
+    daily_rows = (
+        _detail_query(
+            Penjualan.tanggal_penjualan,
+            func.sum(line["taxable"]),
+            func.sum(line["cost"]),
+            func.sum(gross_value),
+            start_date=start_date,
+            end_date=end_date,
+        )
+        .group_by(Penjualan.tanggal_penjualan)
+        .order_by(Penjualan.tanggal_penjualan.asc())
+        .all()
+    )
+
+    cogs = 0.0
+    gross_profit = 0.0
+    daily = []
+    monthly = {}
+    for sale_date, revenue, cost, gross in daily_rows:
+        revenue = float(revenue or 0.0)
+        gross = float(gross or 0.0)
+        cogs += float(cost or 0.0)
+        gross_profit += gross
+        daily.append({"date": sale_date, "revenue": revenue, "gross": gross})
+        month = monthly.setdefault(
+            (sale_date.year, sale_date.month), {"revenue": 0.0, "gross": 0.0}
+        )
+        month["revenue"] += revenue
+        month["gross"] += gross
+
+    gross_sum = func.sum(gross_value)
+    # urutan kedua meniru urutan kemunculan pertama pada laporan lama
+    first_seen = func.min(DetailPenjualan.id)
+    product_rows = (
+        _detail_query(
+            Produk.nama_produk,
+            func.sum(DetailPenjualan.jumlah),
+            func.sum(line["taxable"]),
+            gross_sum,
+            first_seen,
+            start_date=start_date,
+            end_date=end_date,
+        )
+        .filter(Produk.id.isnot(None))
+        .group_by(Produk.id, Produk.nama_produk)
+        .order_by(gross_sum.desc(), first_seen.asc())
+        .limit(top_limit)
+        .all()
+    )
+    # detail yang produknya sudah dihapus tetap tampil per baris
+    orphan_rows = (
+        _detail_query(
+            DetailPenjualan.jumlah,
+            line["taxable"],
+            gross_value,
+            DetailPenjualan.id,
+            start_date=start_date,
+            end_date=end_date,
+        )
+        .filter(Produk.id.is_(None))
+        .order_by(gross_value.desc(), DetailPenjualan.id.asc())
+        .limit(top_limit)
+        .all()
+    )
+    candidates = [
+        (float(gross or 0.0), seen, name, int(units or 0), float(revenue or 0.0))
+        for name, units, revenue, gross, seen in product_rows
+    ] + [
+        (float(gross or 0.0), detail_id, "Produk dihapus", int(qty or 0), float(revenue or 0.0))
+        for qty, revenue, gross, detail_id in orphan_rows
+    ]
+    candidates.sort(key=lambda item: (-item[0], item[1]))
+    top_products = [
+        {"name": name, "units": units, "revenue": revenue, "gross": gross}
+        for gross, _seen, name, units, revenue in candidates[:top_limit]
+    ]
+
+    return {
+        "cogs": cogs,
+        "gross_profit": gross_profit,
+        "daily": daily,
+        "monthly": [
+            {"year": year, "month": month, **values}
+            for (year, month), values in sorted(monthly.items())
+        ],
+        "top_products": top_products,
+    }
@@ -0,0 +1,369 @@
+"""Indeks pencarian laporan penjualan (``sales_search_index``).
+
+Saran di laporan penjualan dulu menjalankan tiga query ``ilike`` (faktur,
+pelanggan lewat penjualan, sales lewat penjualan) di setiap ketikan. Sekarang
+setiap faktur, pelanggan dan sales yang pernah bertransaksi punya baris kata
+kunci: label huruf kecil mulai dari setiap awal kata ("toko budi jaya",
+"budi jaya", "jaya"). Pencarian menjadi satu query prefix ber-indeks
+``(kind, term)`` dengan filter overlap rentang tanggal.
+
+Indeks dirawat di ``after_flush`` saat ``Penjualan`` ditambah/diubah/dihapus
+dan saat nama pelanggan atau user berubah. Rentang tanggal pelanggan/sales
+hanya melebar; penjualan yang dihapus tidak mempersempitnya sampai
+``rebuild_sales_search_index`` dijalankan.
+"""
+
+import re
+import sqlite3
+
+from sqlalchemy import case, delete, event, func, inspect, select, union_all, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app import db
+from app.models import Pelanggan, Penjualan, SalesSearchIndex, User
+from app.schema_registry import table_ready
+
+KIND_INVOICE = "faktur"
+KIND_CUSTOMER = "pelanggan"
+KIND_STAFF = "sales"
+KIND_ORDER = (KIND_INVOICE, KIND_CUSTOMER, KIND_STAFF)
+
+MAX_TERM_LENGTH = 120
+SUGGEST_LIMIT = 6
+INSERT_CHUNK = 1000
+
+_WORD_BREAK = re.compile(r"[\W_]+")
+_table = SalesSearchIndex.__table__
+_ENTITY_KEY = ("kind", "entity_id", "term")
+
+_UPSERT_DIALECTS = {"postgresql"}
+if sqlite3.sqlite_version_info >= (3, 24):
+    _UPSERT_DIALECTS.add("sqlite")
+
+
+def normalize_term(value):
+    return " ".join((value or "").lower().split())[:MAX_TERM_LENGTH]
+
+
+def search_terms(label):
+    """Label yang dinormalisasi, mulai dari setiap awal kata/segmen."""
+    text = normalize_term(label)
+    if not text:
+        return []
+    terms = [text]
+    for match in _WORD_BREAK.finditer(text):
+        rest = text[match.end():]
+        if rest and rest not in terms:
+            terms.append(rest)
+    return terms
+
+
+def _rows(kind, entity_id, label, subtext, first_date, last_date):
+    return [
+        {
+            "kind": kind,
+            "entity_id": entity_id,
+            "term": term,
+            "label": (label or "")[:150],
+            "subtext": (subtext or "")[:200] or None,
+            "first_date": first_date,
+            "last_date": last_date,
+        }
+        for term in search_terms(label)
+    ]
+
+
+def _insert(connection, rows):
+    for offset in range(0, len(rows), INSERT_CHUNK):
+        connection.execute(_table.insert(), rows[offset : offset + INSERT_CHUNK])
+
+
+def _customer_display(connection, customer_id):
+    row = connection.execute(
+        select(Pelanggan.nama, Pelanggan.pelanggan_id, Pelanggan.kontak).where(
+            Pelanggan.id == customer_id
+        )
+    ).first()
+    if row is None:
+        return None, None
+    return row.nama, " • ".join(part for part in (row.pelanggan_id, row.kontak) if part)
+
+
+def _staff_display(connection, user_id):
+    row = connection.execute(select(User.username, User.role).where(User.id == user_id)).first()
+    if row is None:
+        return None, None
+    return row.username, (row.role or "").strip()
+
+
+def _invoice_subtext(customer_name):
+    # tanggal faktur sudah ada di first_date/last_date; diformat saat ditampilkan
+    return customer_name or "Pelanggan umum"
+
+
+def _entity_filter(kind, entity_id):
+    return (_table.c.kind == kind) & (_table.c.entity_id == entity_id)
+
+
+def _upsert_entity(connection, rows):
+    """Insert baris entitas; jika transaksi lain sudah membuatnya, rentangnya dilebarkan."""
+    dialect = connection.dialect.name
+    if dialect in _UPSERT_DIALECTS:
+        if dialect == "sqlite":
+            stmt, earlier, later = sqlite_insert(_table), func.min, func.max
+        else:
+            stmt, earlier, later = postgresql_insert(_table), func.least, func.greatest
+        set_ = {
+            "first_date": earlier(_table.c.first_date, stmt.excluded.first_date),
+            "last_date": later(_table.c.last_date, stmt.excluded.last_date),
+        }
+        connection.execute(
+            stmt.on_conflict_do_update(index_elements=list(_ENTITY_KEY), set_=set_),
+            rows,
+        )
+        return
+
+    if dialect in ("mysql", "mariadb"):
+        stmt = mysql_insert(_table)
+        connection.execute(
+            stmt.on_duplicate_key_update(
+                first_date=func.least(_table.c.first_date, stmt.inserted.first_date),
+                last_date=func.greatest(_table.c.last_date, stmt.inserted.last_date),
+            ),
+            rows,
+        )
+        return
+
+    _insert(connection, rows)
+
+
+def _extend_entity(connection, kind, entity_id, day, display):
+    """Lebarkan rentang tanggal entitas; buat barisnya jika belum ada."""
+    result = connection.execute(
+        update(_table)
+        .where(_entity_filter(kind, entity_id))
+        .values(
+            first_date=case((_table.c.first_date > day, day), else_=_table.c.first_date),
+            last_date=case((_table.c.last_date < day, day), else_=_table.c.last_date),
+        )
+    )
+    if result.rowcount:
+        return
+    # penjualan pertama entitas ini bisa bersamaan di dua transaksi
+    label, subtext = display(connection, entity_id)
+    if label:
+        _upsert_entity(connection, _rows(kind, entity_id, label, subtext, day, day))
+
+
+def _relabel_entity(connection, kind, entity_id, label, subtext):
+    first_date, last_date = connection.execute(
+        select(func.min(_table.c.first_date), func.max(_table.c.last_date)).where(
+            _entity_filter(kind, entity_id)
+        )
+    ).one()
+    if first_date is None:
+        return
+    connection.execute(delete(_table).where(_entity_filter(kind, entity_id)))
+    _insert(connection, _rows(kind, entity_id, label, subtext, first_date, last_date))
+
+
+def index_sale(connection, sale):
+    """Tulis ulang baris faktur lalu lebarkan rentang pelanggan dan sales-nya."""
+    connection.execute(delete(_table).where(_entity_filter(KIND_INVOICE, sale.id)))
+    day = sale.tanggal_penjualan
+    if day is None:
+        return
+    customer_name, _ = _customer_display(connection, sale.pelanggan_id)
+    _insert(
+        connection,
+        _rows(
+            KIND_INVOICE,
+            sale.id,
+            sale.no_faktur,
+            _invoice_subtext(customer_name),
+            day,
+            day,
+        ),
+    )
+    if sale.pelanggan_id:
+        _extend_entity(connection, KIND_CUSTOMER, sale.pelanggan_id, day, _customer_display)
+    if sale.sales_id:
+        _extend_entity(connection, KIND_STAFF, sale.sales_id, day, _staff_display)
+
+
+def _changed(obj, fields):
+    state = inspect(obj)
+    return any(state.attrs[field].history.has_changes() for field in fields)
+
+
+SALE_FIELDS = ("no_faktur", "tanggal_penjualan", "pelanggan_id", "sales_id")
+CUSTOMER_FIELDS = ("nama", "pelanggan_id", "kontak")
+STAFF_FIELDS = ("username", "role")
+
+
+@event.listens_for(db.session, "after_flush")
+def _maintain_sales_search_index(session, _flush_context):
+    sales, customers, staff, removed = [], [], [], []
+    for obj in session.new:
+        if isinstance(obj, Penjualan):
+            sales.append(obj)
+    for obj in session.dirty:
+        if isinstance(obj, Penjualan) and _changed(obj, SALE_FIELDS):
+            sales.append(obj)
+        elif isinstance(obj, Pelanggan) and _changed(obj, CUSTOMER_FIELDS):
+            customers.append(obj)
+        elif isinstance(obj, User) and _changed(obj, STAFF_FIELDS):
+            staff.append(obj)
+    for obj in session.deleted:
+        if isinstance(obj, Penjualan):
+            removed.append((KIND_INVOICE, obj.id))
+        elif isinstance(obj, Pelanggan):
+            removed.append((KIND_CUSTOMER, obj.id))
+        elif isinstance(obj, User):
+            removed.append((KIND_STAFF, obj.id))
+    if not (sales or customers or staff or removed):
+        return
+    connection = session.connection()
+    if not table_ready("sales_search_index", connection=connection):
+        return
+    for kind, entity_id in removed:
+        connection.execute(delete(_table).where(_entity_filter(kind, entity_id)))
+    for customer in customers:
+        _, subtext = _customer_display(connection, customer.id)
+        _relabel_entity(connection, KIND_CUSTOMER, customer.id, customer.nama, subtext)
+        connection.execute(
+            update(_table)
+            .where(
+                _table.c.kind == KIND_INVOICE,
+                _table.c.entity_id.in_(
+                    select(Penjualan.id).where(Penjualan.pelanggan_id == customer.id)
+                ),
+            )
+            .values(subtext=_invoice_subtext(customer.nama))
+        )
+    for user in staff:
+        _relabel_entity(connection, KIND_STAFF, user.id, user.username, (user.role or "").strip())
+    for sale in sales:
+        index_sale(connection, sale)
+
+
+def suggest_sales_entities(term, start_date, end_date, limit=SUGGEST_LIMIT):
+    """Saran faktur/pelanggan/sales untuk ``term`` yang bertransaksi di rentang tanggal.
+
+    Satu statement: tiga SELECT prefix ber-indeks (satu per jenis) digabung
+    ``UNION ALL``. Mengembalikan list dict ``kind/label/value/subtext/last_date``.
+    """
+    prefix = normalize_term(term)
+    if not prefix:
+        return []
+    selects = []
+    for kind in KIND_ORDER:
+        last_date = func.max(_table.c.last_date).label("last_date")
+        order = (
+            (last_date.desc(), _table.c.entity_id.desc())
+            if kind == KIND_INVOICE
+            else (_table.c.label.asc(), _table.c.entity_id.asc())
+        )
+        per_kind = (
+            select(
+                _table.c.kind,
+                _table.c.entity_id,
+                _table.c.label,
+                _table.c.subtext,
+                last_date,
+            )
+            .where(
+                _table.c.kind == kind,
+                _table.c.term >= prefix,
+                _table.c.term < prefix + "\uffff",
+                _table.c.first_date <= end_date,
+                _table.c.last_date >= start_date,
+            )
+            .group_by(_table.c.kind, _table.c.entity_id, _table.c.label, _table.c.subtext)
+            .order_by(*order)
+            .limit(limit)
+            .subquery()
+        )
+        selects.append(select(per_kind))
+    rows = db.session.execute(union_all(*selects)).all()
+    position = {kind: index for index, kind in enumerate(KIND_ORDER)}
+    # urutan dalam jenis mengikuti query; jenis: faktur, pelanggan, sales
+    rows = sorted(enumerate(rows), key=lambda item: (position[item[1].kind], item[0]))
+    return [
+        {
+            "kind": row.kind,
+            "label": row.label,
+            "value": row.label,
+            "subtext": row.subtext or "",
+            "last_date": row.last_date,
+        }
+        for _, row in rows
+    ]
+
+
+def rebuild_sales_search_index():
+    """Susun ulang seluruh indeks dari data transaksi. Tidak commit."""
+    connection = db.session.connection()
+    connection.execute(delete(_table))
+    rows = []
+    invoices = connection.execute(
+        select(
+            Penjualan.id, Penjualan.no_faktur, Penjualan.tanggal_penjualan, Pelanggan.nama
+        ).outerjoin(Pelanggan, Pelanggan.id == Penjualan.pelanggan_id)
+    )
+    for sale_id, no_faktur, day, customer_name in invoices:
+        rows.extend(
+            _rows(
+                KIND_INVOICE,
+                sale_id,
+                no_faktur,
+                _invoice_subtext(customer_name),
+                day,
+                day,
+            )
+        )
+    customers = connection.execute(
+        select(
+            Pelanggan.id,
+            Pelanggan.nama,
+            Pelanggan.pelanggan_id,
+            Pelanggan.kontak,
+            func.min(Penjualan.tanggal_penjualan),
+            func.max(Penjualan.tanggal_penjualan),
+        )
+        .join(Penjualan, Penjualan.pelanggan_id == Pelanggan.id)
+        .group_by(Pelanggan.id, Pelanggan.nama, Pelanggan.pelanggan_id, Pelanggan.kontak)
+    )
+    for customer_id, nama, code, kontak, first_date, last_date in customers:
+        subtext = " • ".join(part for part in (code, kontak) if part)
+        rows.extend(_rows(KIND_CUSTOMER, customer_id, nama, subtext, first_date, last_date))
+    staff = connection.execute(
+        select(
+            User.id,
+            User.username,
+            User.role,
+            func.min(Penjualan.tanggal_penjualan),
+            func.max(Penjualan.tanggal_penjualan),
+        )
+        .join(Penjualan, Penjualan.sales_id == User.id)
+        .group_by(User.id, User.username, User.role)
+    )
+    for user_id, username, role, first_date, last_date in staff:
+        rows.extend(
+            _rows(KIND_STAFF, user_id, username, (role or "").strip(), first_date, last_date)
+        )
+    _insert(connection, rows)
+    return len(rows)
+
+
+def ensure_sales_search_backfilled():
+    """Isi indeks sekali bila tabel baru dibuat sementara penjualan sudah ada."""
+    if db.session.query(SalesSearchIndex.id).first():
+        return False
+    if not db.session.query(Penjualan.id).first():
+        return False
+    rebuild_sales_search_index()
+    db.session.commit()
+    return True
@@ -0,0 +1,310 @@
+"""Rekap harian penjualan (``sales_daily_summary``).
+
+Checkout dan hapus penjualan memanggil ``apply_sale_to_summary`` di transaksi
+yang sama, sehingga dashboard dan laporan cukup menjumlahkan baris rekap,
+bukan seluruh riwayat ``Penjualan``. ``rebuild_sales_summary`` menyusun ulang
+rekap dari data transaksi (dipakai CLI dan pengisian awal).
+"""
+
+import sqlite3
+
+from sqlalchemy import case, delete, func, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app import db
+from app.models import DetailPenjualan, Penjualan, Produk, SalesDailySummary
+from app.time_utils import local_now
+
+SUMMARY_KEYS = ("summary_date", "shift_id", "sales_id", "payment_method")
+SUMMARY_MEASURES = (
+    "orders",
+    "total_amount",
+    "net_revenue",
+    "gross_sales",
+    "net_sales",
+    "discount_total",
+    "tax_total",
+    "marketplace_cost",
+    "units",
+    "hpp",
+)
+
+_UPSERT_DIALECTS = {"postgresql"}
+if sqlite3.sqlite_version_info >= (3, 24):
+    _UPSERT_DIALECTS.add("sqlite")
+
+
+def product_cost_basis(product):
+    """Biaya per unit yang dipakai laporan laba (HPP)."""
+    if not product:
+        return 0.0
+    return float(product.harga_lama or product.harga_beli or product.harga or 0.0)
+
+
+def detail_cost(detail):
+    """HPP per unit yang tersimpan di detail; baris lama jatuh ke biaya produk."""
+    if detail.hpp_satuan is not None:
+        return float(detail.hpp_satuan)
+    return product_cost_basis(detail.produk)
+
+
+def sale_lines(sale):
+    """Baris rekap dari ``detail_penjualan`` yang sudah tersimpan."""
+    return [
+        {
+            "qty": detail.jumlah or 0,
+            "price": detail.harga_satuan or 0.0,
+            "discount": detail.diskon or 0.0,
+            "tax": detail.pajak or 0.0,
+            "cost": detail_cost(detail),
+        }
+        for detail in sale.detail_penjualan
+    ]
+
+
+def _sale_key(sale):
+    return {
+        "summary_date": sale.tanggal_penjualan,
+        "shift_id": sale.shift_id or 0,
+        "sales_id": sale.sales_id or 0,
+        "payment_method": sale.payment_method or "",
+    }
+
+
+def _sale_measures(sale, lines):
+    gross = discount = tax = hpp = 0.0
+    units = 0
+    for line in lines:
+        qty = line["qty"] or 0
+        base_total = (line["price"] or 0.0) * qty
+        discount_value = base_total * ((line["discount"] or 0.0) / 100.0)
+        taxable = base_total - discount_value
+        gross += taxable
+        discount += discount_value
+        tax += taxable * ((line["tax"] or 0.0) / 100.0)
+        hpp += (line["cost"] or 0.0) * qty
+        units += qty
+    marketplace_cost = float(sale.marketplace_cost_total or 0.0)
+    return {
+        "orders": 1,
+        "total_amount": float(sale.total_harga or 0.0),
+        "net_revenue": sale.net_revenue,
+        "gross_sales": gross,
+        "net_sales": max(gross - marketplace_cost, 0.0),
+        "discount_total": discount,
+        "tax_total": tax,
+        "marketplace_cost": marketplace_cost,
+        "units": units,
+        "hpp": hpp,
+    }
+
+
+def _increment(key, measures):
+    table = SalesDailySummary.__table__
+    now = local_now()
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect in _UPSERT_DIALECTS:
+        insert_fn = sqlite_insert if dialect == "sqlite" else postgresql_insert
+        stmt = insert_fn(table).values(**key, **measures, updated_at=now)
+        set_ = {name: table.c[name] + stmt.excluded[name] for name in SUMMARY_MEASURES}
+        set_["updated_at"] = now
+        db.session.execute(
+            stmt.on_conflict_do_update(index_elements=list(SUMMARY_KEYS), set_=set_)
+        )
+        return
+
+    if dialect in ("mysql", "mariadb"):
+        stmt = mysql_insert(table).values(**key, **measures, updated_at=now)
+        set_ = {name: table.c[name] + stmt.inserted[name] for name in SUMMARY_MEASURES}
+        set_["updated_at"] = now
+        db.session.execute(stmt.on_duplicate_key_update(**set_))
+        return
+
+    criteria = [table.c[name] == value for name, value in key.items()]
+    result = db.session.execute(
+        update(table)
+        .where(*criteria)
+        .values(
+            updated_at=now,
+            **{name: table.c[name] + measures[name] for name in SUMMARY_MEASURES},
+        )
+    )
+    if not result.rowcount:
+        db.session.execute(table.insert().values(**key, **measures, updated_at=now))
+
+
+def apply_sale_to_summary(sale, lines=None, sign=1):
+    """
+    Tambahkan (``sign=1``) atau kurangi (``sign=-1``) satu penjualan dari rekap.
+
+    ``lines`` berisi dict qty/price/discount/tax/cost; default diambil dari
+    ``sale.detail_penjualan``.
+    """
+    if lines is None:
+        lines = sale_lines(sale)
+    measures = {
+        name: value * sign for name, value in _sale_measures(sale, lines).items()
+    }
+    _increment(_sale_key(sale), measures)
+
+
+def detail_line_columns():
+    """
+    Ekspresi SQL per baris ``DetailPenjualan`` dengan rumus yang sama seperti
+    laporan: diskon, nilai setelah diskon (``taxable``), pajak dan HPP.
+
+    Query pemakai wajib ``outerjoin(Produk, Produk.id == DetailPenjualan.produk_id)``.
+    """
+    base_total = DetailPenjualan.harga_satuan * DetailPenjualan.jumlah
+    discount_value = base_total * (func.coalesce(DetailPenjualan.diskon, 0) / 100.0)
+    taxable = base_total - discount_value
+    cost_basis = func.coalesce(
+        DetailPenjualan.hpp_satuan,
+        func.nullif(Produk.harga_lama, 0),
+        func.nullif(Produk.harga_beli, 0),
+        func.nullif(Produk.harga, 0),
+        0,
+    )
+    return {
+        "discount": discount_value,
+        "taxable": taxable,
+        "tax": taxable * (func.coalesce(DetailPenjualan.pajak, 0) / 100.0),
+        "cost": cost_basis * DetailPenjualan.jumlah,
+    }
+
+
+def _rebuild_select(start_date=None, end_date=None):
+    line = detail_line_columns()
+    per_sale = (
+        select(
+            DetailPenjualan.penjualan_id.label("penjualan_id"),
+            func.sum(line["taxable"]).label("gross"),
+            func.sum(line["discount"]).label("discount"),
+            func.sum(line["tax"]).label("tax"),
+            func.sum(DetailPenjualan.jumlah).label("units"),
+            func.sum(line["cost"]).label("hpp"),
+        )
+        .outerjoin(Produk, Produk.id == DetailPenjualan.produk_id)
+        .group_by(DetailPenjualan.penjualan_id)
+        .subquery()
+    )
+
+    marketplace_cost = func.coalesce(Penjualan.marketplace_cost_total, 0)
+    gross = func.coalesce(per_sale.c.gross, 0)
+    net_revenue = case(
+        (Penjualan.total_harga - marketplace_cost < 0, 0),
+        else_=Penjualan.total_harga - marketplace_cost,
+    )
+    net_sales = case((gross - marketplace_cost < 0, 0), else_=gross - marketplace_cost)
+    keys = (
+        Penjualan.tanggal_penjualan,
+        func.coalesce(Penjualan.shift_id, 0),
+        Penjualan.sales_id,
+        func.coalesce(Penjualan.payment_method, ""),
+    )
+    stmt = (
+        select(
+            *keys,
+            func.count(Penjualan.id),
+            func.sum(Penjualan.total_harga),
+            func.sum(net_revenue),
+            func.sum(gross),
+            func.sum(net_sales),
+            func.sum(func.coalesce(per_sale.c.discount, 0)),
+            func.sum(func.coalesce(per_sale.c.tax, 0)),
+            func.sum(marketplace_cost),
+            func.sum(func.coalesce(per_sale.c.units, 0)),
+            func.sum(func.coalesce(per_sale.c.hpp, 0)),
+        )
+        .outerjoin(per_sale, per_sale.c.penjualan_id == Penjualan.id)
+        .group_by(*keys)
+    )
+    if start_date:
+        stmt = stmt.where(Penjualan.tanggal_penjualan >= start_date)
+    if end_date:
+        stmt = stmt.where(Penjualan.tanggal_penjualan <= end_date)
+    return stmt
+
+
+def rebuild_sales_summary(start_date=None, end_date=None):
+    """Susun ulang rekap untuk rentang tanggal (default semua). Tidak commit."""
+    table = SalesDailySummary.__table__
+    cleanup = delete(table)
+    if start_date:
+        cleanup = cleanup.where(table.c.summary_date >= start_date)
+    if end_date:
+        cleanup = cleanup.where(table.c.summary_date <= end_date)
+    db.session.execute(cleanup)
+
+    now = local_now()
+    rows = []
+    for row in db.session.execute(_rebuild_select(start_date, end_date)):
+        values = dict(zip(SUMMARY_KEYS + SUMMARY_MEASURES, row))
+        for name in ("orders", "units", "shift_id", "sales_id"):
+            values[name] = int(values[name] or 0)
+        values["updated_at"] = now
+        rows.append(values)
+    if rows:
+        db.session.execute(table.insert(), rows)
+    return len(rows)
+
+
+def ensure_sales_summary_backfilled():
+    """Isi rekap sekali bila tabel baru dibuat sementara penjualan sudah ada."""
+    if db.session.query(SalesDailySummary.id).first():
+        return False
+    if not db.session.query(Penjualan.id).first():
+        return False
+    rebuild_sales_summary()
+    db.session.commit()
+    return True
+
+
+def _measure_columns():
+    return [
+        func.coalesce(func.sum(getattr(SalesDailySummary, name)), 0).label(name)
+        for name in SUMMARY_MEASURES
+    ]
+
+
+def _as_measures(row):
+    values = {}
+    for name in SUMMARY_MEASURES:
+        value = getattr(row, name, 0) if row is not None else 0
+        values[name] = int(value or 0) if name in ("orders", "units") else float(value or 0.0)
+    return values
+
+
+def summary_totals(*criteria, query=None):
+    """Jumlah seluruh ukuran rekap yang memenuhi ``criteria``."""
+    query = query if query is not None else db.session.query(SalesDailySummary)
+    row = query.with_entities(*_measure_columns()).filter(*criteria).one()
+    return _as_measures(row)
+
+
+def summary_grouped(group_columns, *criteria, query=None, order_by=None, limit=None):
+    """
+    Rekap dikelompokkan; mengembalikan list ``(kunci, ukuran)``.
+
+    Grup tanpa transaksi (mis. semua penjualannya sudah dihapus) dilewati.
+    """
+    query = query if query is not None else db.session.query(SalesDailySummary)
+    labelled = [column.label(f"key_{idx}") for idx, column in enumerate(group_columns)]
+    query = (
+        query.with_entities(*labelled, *_measure_columns())
+        .filter(*criteria)
+        .group_by(*group_columns)
+        .having(func.sum(SalesDailySummary.orders) > 0)
+    )
+    if order_by is not None:
+        query = query.order_by(*order_by)
+    if limit:
+        query = query.limit(limit)
+    grouped = []
+    for row in query.all():
+        key = tuple(getattr(row, f"key_{idx}") for idx in range(len(group_columns)))
+        grouped.append((key if len(key) > 1 else key[0], _as_measures(row)))
+    return grouped
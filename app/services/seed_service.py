@@ -0,0 +1,487 @@
+"""Data sintetis berskala produksi untuk benchmark lokal (``flask seed-bench``).
+
+Distribusi dibuat menyerupai toko sungguhan: harga log-normal, popularitas
+produk dan pelanggan mengikuti Zipf (sedikit barang/pelanggan mendominasi),
+akhir pekan lebih ramai, sebagian besar transaksi 1-3 item dan tanpa diskon.
+Semua data ditulis dengan insert massal lalu rekap penjualan disusun ulang.
+"""
+
+import math
+import random
+from datetime import datetime, time, timedelta
+from itertools import accumulate
+
+from sqlalchemy import insert, update
+from werkzeug.security import generate_password_hash
+
+from app import db
+from app.models import (
+    Account,
+    AccountPeriodBalance,
+    BarangPembelian,
+    CatalogChange,
+    CashierShift,
+    DetailPenjualan,
+    JournalEntry,
+    JournalLine,
+    Kategori,
+    Pelanggan,
+    Pembelian,
+    Penjualan,
+    Produk,
+    Satuan,
+    Supplier,
+    User,
+)
+from app.services.catalog_service import CATALOG_KINDS
+from app.services.sales_summary_service import rebuild_sales_summary
+from app.time_utils import local_now, local_today
+
+BENCH_PASSWORD = "bench123"
+BENCH_ADMIN_USERNAME = "bench_admin"
+BATCH_SIZE = 2000
+
+BENCH_ACCOUNTS = (
+    ("1101", "Kas", "asset"),
+    ("1102", "Bank", "asset"),
+    ("1301", "Persediaan Barang", "asset"),
+    ("2101", "Utang Usaha", "liability"),
+    ("3101", "Modal Pemilik", "equity"),
+    ("4101", "Penjualan", "income"),
+    ("5101", "Harga Pokok Penjualan", "expense"),
+    ("5201", "Beban Operasional", "expense"),
+)
+CATEGORY_NAMES = (
+    "Sembako",
+    "Minuman",
+    "Makanan Ringan",
+    "Perawatan Diri",
+    "Kebersihan",
+    "Alat Tulis",
+    "Obat-obatan",
+    "Frozen Food",
+)
+UNIT_NAMES = ("pcs", "box", "pak", "botol", "kg")
+# metode kredit yang dikenali checkout/pembelian (piutang, hutang, jatuh tempo)
+CREDIT_METHOD = "Tempo"
+PAYMENT_METHODS = (("Tunai", 55), ("Transfer", 20), ("QRIS", 15), (CREDIT_METHOD, 10))
+QTY_WEIGHTS = ((1, 55), (2, 20), (3, 10), (4, 6), (5, 5), (10, 4))
+WALK_IN_SHARE = 0.4
+
+
+def _zipf_cum_weights(count, exponent=1.1):
+    return list(accumulate(1.0 / (rank + 1) ** exponent for rank in range(count)))
+
+
+def _weighted(rng, options):
+    values, weights = zip(*options)
+    return rng.choices(values, weights=weights)[0]
+
+
+def _insert_returning_ids(model, rows):
+    """Insert massal dan kembalikan id sesuai urutan ``rows``."""
+    if not rows:
+        return []
+    dialect = db.session.get_bind().dialect
+    if dialect.insert_executemany_returning_sort_by_parameter_order:
+        result = db.session.execute(
+            insert(model).returning(model.id, sort_by_parameter_order=True), rows
+        )
+        return list(result.scalars())
+    objects = [model(**row) for row in rows]
+    db.session.add_all(objects)
+    db.session.flush()
+    return [obj.id for obj in objects]
+
+
+def _chunks(rows, size=BATCH_SIZE):
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
+
+def _ensure_accounts():
+    existing = {
+        account.code: account.id
+        for account in Account.query.filter(
+            Account.code.in_([code for code, _name, _type in BENCH_ACCOUNTS])
+        )
+    }
+    for code, name, account_type in BENCH_ACCOUNTS:
+        if code not in existing:
+            account = Account(code=code, name=name, type=account_type)
+            db.session.add(account)
+            db.session.flush()
+            existing[code] = account.id
+    return existing
+
+
+def _day_weights(days, end_date):
+    """Bobot transaksi per hari: akhir pekan +30%, tren naik pelan."""
+    first_day = end_date - timedelta(days=days - 1)
+    weights = []
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        weekend = 1.3 if day.weekday() >= 5 else 1.0
+        trend = 0.8 + 0.4 * (offset / max(days - 1, 1))
+        weights.append(weekend * trend)
+    return first_day, weights
+
+
+def _round_price(value, step=500):
+    return float(max(step, int(math.ceil(value / step)) * step))
+
+
+def generate_bench_dataset(
+    products=2000,
+    customers=1000,
+    sales=20000,
+    lines_per_sale=3,
+    purchases=500,
+    journals=2000,
+    days=180,
+    cashiers=3,
+    suppliers=20,
+    seed=42,
+    end_date=None,
+    tag="",
+    progress=None,
+):
+    """
+    Isi database dengan data sintetis dan commit.
+
+    ``tag`` ditambahkan ke kode/nomor dokumen agar bisa dijalankan lebih dari
+    sekali pada database yang sama. Shift kasir di ``end_date`` dibiarkan
+    terbuka supaya checkout langsung bisa dicoba. Mengembalikan jumlah baris
+    per tabel.
+    """
+    rng = random.Random(seed)
+    end_date = end_date or local_today()
+    days = max(int(days), 1)
+    report = progress or (lambda _message: None)
+    counts = {}
+
+    # --- master data -------------------------------------------------------
+    password_hash = generate_password_hash(
+        BENCH_PASSWORD, method="pbkdf2:sha256", salt_length=8
+    )
+    admin = User.query.filter_by(username=BENCH_ADMIN_USERNAME).first()
+    if not admin:
+        admin = User(
+            username=BENCH_ADMIN_USERNAME,
+            email=f"{BENCH_ADMIN_USERNAME}@example.com",
+            password=password_hash,
+            role="admin",
+        )
+        db.session.add(admin)
+    cashier_users = []
+    for idx in range(max(int(cashiers), 1)):
+        username = f"bench_kasir{tag}{idx + 1}"
+        user = User(
+            username=username,
+            email=f"{username}@example.com",
+            password=password_hash,
+            role="kasir",
+        )
+        db.session.add(user)
+        cashier_users.append(user)
+
+    units = [Satuan(name=f"{name}{tag}") for name in UNIT_NAMES]
+    categories = [Kategori(name=f"{name}{tag}") for name in CATEGORY_NAMES]
+    supplier_rows = [
+        Supplier(
+            name=f"Supplier {tag}{idx + 1}",
+            address=f"Jl. Pemasok No. {idx + 1}",
+            phone=f"08{rng.randint(100000000, 999999999)}",
+            bank_account=str(rng.randint(10**9, 10**10 - 1)),
+            account_name=f"PT Pemasok {idx + 1}",
+            contact_person=f"Kontak {idx + 1}",
+        )
+        for idx in range(max(int(suppliers), 1))
+    ]
+    db.session.add_all(units + categories + supplier_rows)
+    db.session.flush()
+    account_ids = _ensure_accounts()
+    counts["users"] = len(cashier_users) + 1
+    counts["suppliers"] = len(supplier_rows)
+
+    # --- produk ------------------------------------------------------------
+    product_rows = []
+    for idx in range(int(products)):
+        price = _round_price(rng.lognormvariate(math.log(25000), 0.8))
+        cost = round(price * rng.uniform(0.55, 0.8), 2)
+        minimum = rng.choice((0, 5, 10, 20))
+        stock = rng.randint(0, minimum) if rng.random() < 0.05 else rng.randint(20, 500)
+        product_rows.append(
+            {
+                "kode_produk": f"BP{tag}{idx + 1:06d}",
+                "sku": f"BSKU{tag}{idx + 1:06d}",
+                "barcode": f"899{tag}{idx + 1:09d}",
+                "nama_produk": f"{rng.choice(CATEGORY_NAMES)} Produk {tag}{idx + 1}",
+                "harga": price,
+                "satuan_id": rng.choice(units).id,
+                "kategori_id": rng.choice(categories).id,
+                "supplier_id": rng.choice(supplier_rows).id,
+                "berat": round(rng.uniform(0.05, 5.0), 2),
+                "stok_minimal": minimum,
+                "stok_lama": stock,
+                "harga_lama": cost,
+                "harga_beli": cost,
+            }
+        )
+    product_ids = []
+    for chunk in _chunks(product_rows):
+        product_ids.extend(_insert_returning_ids(Produk, chunk))
+    products_by_id = dict(zip(product_ids, product_rows))
+    # urutan popularitas diacak agar produk laris tidak selalu id terkecil
+    popular_products = product_ids[:]
+    rng.shuffle(popular_products)
+    product_cum_weights = _zipf_cum_weights(len(popular_products))
+    counts["products"] = len(product_ids)
+    report(f"Produk: {len(product_ids)}")
+
+    # --- pelanggan ---------------------------------------------------------
+    customer_rows = [
+        {
+            "pelanggan_id": f"BC{tag}{idx + 1:07d}",
+            "nama": "Pelanggan Umum" if idx == 0 else f"Pelanggan {tag}{idx + 1}",
+            "kontak": f"08{rng.randint(100000000, 999999999)}",
+            "email": None if rng.random() < 0.6 else f"pelanggan{tag}{idx + 1}@example.com",
+            "alamat": f"Jl. Contoh No. {rng.randint(1, 300)}",
+        }
+        for idx in range(max(int(customers), 1))
+    ]
+    customer_ids = []
+    for chunk in _chunks(customer_rows):
+        customer_ids.extend(_insert_returning_ids(Pelanggan, chunk))
+    walk_in_id, regular_customers = customer_ids[0], customer_ids[1:] or customer_ids
+    customer_cum_weights = _zipf_cum_weights(len(regular_customers), exponent=0.9)
+    counts["customers"] = len(customer_ids)
+    report(f"Pelanggan: {len(customer_ids)}")
+
+    # --- shift kasir -------------------------------------------------------
+    db.session.flush()
+    first_day, day_weights = _day_weights(days, end_date)
+    shift_rows = []
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        for user in cashier_users:
+            opened_at = datetime.combine(day, time(8, rng.randint(0, 30)))
+            shift_rows.append(
+                {
+                    "user_id": user.id,
+                    "shift_date": day,
+                    "opened_at": opened_at,
+                    "closed_at": (
+                        None if day == end_date else opened_at + timedelta(hours=9)
+                    ),
+                    "forced_close": False,
+                }
+            )
+    shift_ids = []
+    for chunk in _chunks(shift_rows):
+        shift_ids.extend(_insert_returning_ids(CashierShift, chunk))
+    shift_by_key = {
+        (row["user_id"], row["shift_date"]): shift_id
+        for row, shift_id in zip(shift_rows, shift_ids)
+    }
+    counts["cashier_shifts"] = len(shift_ids)
+
+    # --- penjualan + detail ------------------------------------------------
+    sale_days = rng.choices(range(days), weights=day_weights, k=int(sales))
+    sale_days.sort()
+    mean_extra_lines = max(float(lines_per_sale) - 1.0, 0.0)
+    sale_count = 0
+    detail_count = 0
+    for chunk_start in range(0, len(sale_days), BATCH_SIZE):
+        sale_rows = []
+        sale_lines = []
+        for seq, offset in enumerate(
+            sale_days[chunk_start : chunk_start + BATCH_SIZE], start=chunk_start + 1
+        ):
+            day = first_day + timedelta(days=offset)
+            cashier = rng.choice(cashier_users)
+            line_count = 1
+            if mean_extra_lines:
+                line_count += min(int(rng.expovariate(1.0 / mean_extra_lines)), 19)
+            chosen = rng.choices(
+                popular_products, cum_weights=product_cum_weights, k=line_count
+            )
+            lines = []
+            total = 0.0
+            for product_id in dict.fromkeys(chosen):
+                product = products_by_id[product_id]
+                qty = _weighted(rng, QTY_WEIGHTS)
+                discount = 0.0 if rng.random() < 0.85 else float(rng.choice((5, 10)))
+                tax = 11.0 if rng.random() < 0.3 else 0.0
+                base = product["harga"] * qty
+                taxable = base - base * discount / 100.0
+                line_total = taxable + taxable * tax / 100.0
+                total += line_total
+                lines.append(
+                    {
+                        "produk_id": product_id,
+                        "jumlah": qty,
+                        "harga_satuan": product["harga"],
+                        "diskon": discount,
+                        "pajak": tax,
+                        "harga_total": round(line_total, 2),
+                        "hpp_satuan": product["harga_lama"],
+                    }
+                )
+            method = _weighted(rng, PAYMENT_METHODS)
+            customer_id = (
+                walk_in_id
+                if rng.random() < WALK_IN_SHARE
+                else rng.choices(regular_customers, cum_weights=customer_cum_weights)[0]
+            )
+            total = round(total, 2)
+            paid = 0.0 if method == CREDIT_METHOD else _round_price(total, 1000)
+            sale_rows.append(
+                {
+                    "no_faktur": f"SB{tag}{day:%Y%m%d}-{seq:07d}",
+                    "tanggal_penjualan": day,
+                    "sales_id": cashier.id,
+                    "pelanggan_id": customer_id,
+                    "shift_id": shift_by_key.get((cashier.id, day)),
+                    "total_harga": total,
+                    "payment_method": method,
+                    "due_date": day + timedelta(days=30) if method == CREDIT_METHOD else None,
+                    "amount_paid": paid,
+                    "change_due": round(max(paid - total, 0.0), 2),
+                    "marketplace_cost_total": 0.0,
+                }
+            )
+            sale_lines.append(lines)
+        sale_ids = _insert_returning_ids(Penjualan, sale_rows)
+        detail_rows = [
+            {"penjualan_id": sale_id, **line}
+            for sale_id, lines in zip(sale_ids, sale_lines)
+            for line in lines
+        ]
+        if detail_rows:
+            db.session.execute(insert(DetailPenjualan), detail_rows)
+        sale_count += len(sale_ids)
+        detail_count += len(detail_rows)
+        report(f"Penjualan: {sale_count}/{len(sale_days)}")
+    counts["sales"] = sale_count
+    counts["sale_details"] = detail_count
+
+    # --- pembelian ---------------------------------------------------------
+    category_names = {category.id: category.name for category in categories}
+    purchase_rows = []
+    purchase_items = []
+    for idx in range(int(purchases)):
+        day = first_day + timedelta(days=rng.randrange(days))
+        supplier = rng.choice(supplier_rows)
+        method = CREDIT_METHOD if rng.random() < 0.4 else "Tunai"
+        purchase_rows.append(
+            {
+                "no_faktur": f"PB{tag}{day:%Y%m%d}-{idx + 1:06d}",
+                "tanggal_faktur": day,
+                "supplier_id": supplier.id,
+                "jenis_pembayaran": method,
+                "due_date": day + timedelta(days=30) if method == CREDIT_METHOD else None,
+            }
+        )
+        items = []
+        for product_id in dict.fromkeys(rng.sample(product_ids, min(len(product_ids), rng.randint(1, 8)))):
+            product = products_by_id[product_id]
+            items.append(
+                {
+                    "kode_barang": product["kode_produk"],
+                    "nama_barang": product["nama_produk"],
+                    "kategori": category_names.get(product["kategori_id"], "-"),
+                    "jumlah": rng.choice((12, 24, 48, 100)),
+                    "harga_beli": product["harga_beli"],
+                    "diskon": 0.0 if rng.random() < 0.8 else 2.5,
+                    "pajak": 11.0 if rng.random() < 0.5 else 0.0,
+                    "harga_jual": product["harga"],
+                    "exp_date": None,
+                    "hpp": product["harga_beli"],
+                }
+            )
+        purchase_items.append(items)
+    item_count = 0
+    for start in range(0, len(purchase_rows), BATCH_SIZE):
+        purchase_ids = _insert_returning_ids(
+            Pembelian, purchase_rows[start : start + BATCH_SIZE]
+        )
+        rows = [
+            {"pembelian_id": purchase_id, **item}
+            for purchase_id, items in zip(purchase_ids, purchase_items[start : start + BATCH_SIZE])
+            for item in items
+        ]
+        if rows:
+            db.session.execute(insert(BarangPembelian), rows)
+        item_count += len(rows)
+    counts["purchases"] = len(purchase_rows)
+    counts["purchase_items"] = item_count
+    report(f"Pembelian: {len(purchase_rows)}")
+
+    # --- jurnal ------------------------------------------------------------
+    journal_templates = (
+        ("Penjualan harian", "1101", "4101", 45, 500000, 5000000),
+        ("HPP penjualan", "5101", "1301", 25, 300000, 3500000),
+        ("Pembelian kredit", "1301", "2101", 12, 1000000, 15000000),
+        ("Pembayaran utang", "2101", "1102", 8, 1000000, 10000000),
+        ("Beban operasional", "5201", "1101", 7, 50000, 2000000),
+        ("Penyesuaian persediaan", "5101", "1301", 3, 10000, 500000),
+    )
+    template_weights = [template[3] for template in journal_templates]
+    entry_rows = []
+    entry_lines = []
+    for idx in range(int(journals)):
+        memo, debit_code, credit_code, _weight, low, high = rng.choices(
+            journal_templates, weights=template_weights
+        )[0]
+        day = first_day + timedelta(days=rng.choices(range(days), weights=day_weights)[0])
+        amount = _round_price(rng.uniform(low, high), 1000)
+        entry_rows.append(
+            {
+                "reference": f"JB{tag}{day:%Y%m%d}-{idx + 1:07d}",
+                "date": day,
+                "memo": memo,
+                "created_by": admin.id,
+                "is_locked": False,
+            }
+        )
+        entry_lines.append(
+            [
+                {"account_id": account_ids[debit_code], "debit": amount, "credit": 0.0},
+                {"account_id": account_ids[credit_code], "debit": 0.0, "credit": amount},
+            ]
+        )
+    line_count = 0
+    for start in range(0, len(entry_rows), BATCH_SIZE):
+        entry_ids = _insert_returning_ids(
+            JournalEntry, entry_rows[start : start + BATCH_SIZE]
+        )
+        rows = [
+            {"entry_id": entry_id, "description": None, **line}
+            for entry_id, lines in zip(entry_ids, entry_lines[start : start + BATCH_SIZE])
+            for line in lines
+        ]
+        db.session.execute(insert(JournalLine), rows)
+        line_count += len(rows)
+    counts["journal_entries"] = len(entry_rows)
+    counts["journal_lines"] = line_count
+    report(f"Jurnal: {len(entry_rows)}")
+
+    # insert massal melewati hook after_flush: minta klien POS sinkron ulang
+    # katalog dan tandai snapshot saldo akun sejak hari pertama sebagai basi
+    now = local_now()
+    db.session.execute(
+        insert(CatalogChange),
+        [
+            {"entity": kind, "entity_id": None, "op": "reset", "created_at": now}
+            for kind in CATALOG_KINDS
+        ],
+    )
+    db.session.execute(
+        update(AccountPeriodBalance)
+        .where(AccountPeriodBalance.period_end >= first_day)
+        .values(is_stale=True)
+    )
+    rebuild_sales_summary(first_day, end_date)
+    db.session.commit()
+    return counts
@@ -0,0 +1,190 @@
+"""Pengaturan aplikasi di tabel ``app_setting`` dengan cache per proses.
+
+Setiap worker menyimpan salinan semua pengaturan beserta nomor revisinya.
+Sekali per request (saat pengaturan pertama kali dibaca) revisi di baris
+``__version__`` dicek; salinan hanya dimuat ulang jika revisinya berubah, jadi
+perubahan dari satu worker langsung terlihat di worker lain tanpa restart.
+
+Saat tabel masih kosong, nilai dari env/.env (kunci di ``SETTING_KEYS``)
+disalin sekali sebagai nilai awal. Selama tabel belum ada, pembacaan jatuh
+kembali ke ``os.environ`` seperti sebelumnya.
+"""
+
+import os
+import threading
+
+from flask import g, has_request_context
+from sqlalchemy import event, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import AppSetting
+from app.schema_registry import table_ready
+from app.time_utils import local_now
+
+VERSION_KEY = "__version__"
+
+SETTING_KEYS = (
+    "COMPANY_NAME",
+    "COMPANY_ADDRESS",
+    "COMPANY_CITY",
+    "COMPANY_PHONE",
+    "COMPANY_EMAIL",
+    "COMPANY_WEBSITE",
+    "COMPANY_LOGO_URL",
+    "COMPANY_BANK_INFO",
+    "RECEIPT_FONT_FAMILY",
+    "RECEIPT_FONT_WEIGHT",
+    "RECEIPT_FONT_SIZE",
+    "RECEIPT_THANK_YOU_TEXT",
+    "RECEIPT_PROMO_LABEL",
+    "RECEIPT_PROMO_BARCODE",
+    "RECEIPT_SHOW_PROMO_BARCODE",
+    "SALES_INVOICE_PREFIX",
+    "PURCHASE_INVOICE_PREFIX",
+    "DEFAULT_SALES_TAX_PERCENT",
+    "DEFAULT_PURCHASE_TAX_PERCENT",
+)
+
+_cache = {"revision": None, "values": {}}
+_cache_lock = threading.Lock()
+
+
+def _current_revision():
+    return db.session.execute(
+        select(AppSetting.revision).where(AppSetting.key == VERSION_KEY)
+    ).scalar()
+
+
+def _load_values():
+    rows = db.session.execute(
+        select(AppSetting.key, AppSetting.value).where(AppSetting.key != VERSION_KEY)
+    ).all()
+    return {key: value for key, value in rows}
+
+
+def settings_revision():
+    """Revisi global pengaturan, dibaca paling banyak sekali per request.
+
+    ``None`` jika tabel belum ada atau belum diisi; cache turunan (mis.
+    pengaturan akuntansi) sebaiknya tidak dipakai dalam kondisi itu.
+    """
+    if not table_ready("app_setting"):
+        return None
+    if not has_request_context():
+        return _current_revision()
+    revision = g.get("app_settings_revision")
+    if revision is None:
+        revision = g.app_settings_revision = _current_revision()
+    return revision
+
+
+def bump_settings_revision(connection=None, user_id=None):
+    """Naikkan revisi global; worker lain memuat ulang cache pada request berikutnya.
+
+    UPDATE ini mengunci baris versi sampai commit sehingga penyimpanan paralel
+    berurutan. Cache request ini dibuang setelah commit (lihat ``_forget_revision``).
+    """
+    statement = (
+        update(AppSetting)
+        .where(AppSetting.key == VERSION_KEY)
+        .values(
+            revision=AppSetting.revision + 1,
+            updated_at=local_now(),
+            updated_by=user_id,
+        )
+    )
+    if connection is None:
+        db.session.execute(statement)
+    else:
+        connection.execute(statement)
+    db.session.info["app_settings_bumped"] = True
+
+
+@event.listens_for(db.session, "after_commit")
+def _forget_revision(session):
+    if session.info.pop("app_settings_bumped", False) and has_request_context():
+        g.pop("app_settings_revision", None)
+        g.pop("app_settings", None)
+
+
+@event.listens_for(db.session, "after_rollback")
+def _discard_bump(session):
+    session.info.pop("app_settings_bumped", None)
+
+
+def current_settings():
+    """Semua pengaturan sebagai dict; revisi dicek paling banyak sekali per request."""
+    if not table_ready("app_setting"):
+        return os.environ
+    if has_request_context():
+        values = g.get("app_settings")
+        if values is not None:
+            return values
+    revision = settings_revision()
+    if revision is None:
+        # tabel belum diisi (request pertama belum lewat); pakai env dulu
+        values = {key: os.environ[key] for key in SETTING_KEYS if key in os.environ}
+    else:
+        if _cache["revision"] != revision:
+            loaded = _load_values()
+            with _cache_lock:
+                _cache["revision"] = revision
+                _cache["values"] = loaded
+        values = _cache["values"]
+    if has_request_context():
+        g.app_settings = values
+    return values
+
+
+def get_setting(key, default=None):
+    value = current_settings().get(key)
+    return default if value is None else value
+
+
+def save_settings(updates, user_id=None):
+    """Simpan beberapa pengaturan sekaligus dan naikkan revisi global, lalu commit."""
+    cleaned = {
+        key: (value or "").replace("\n", " ").strip() for key, value in updates.items()
+    }
+    bump_settings_revision(user_id=user_id)
+    revision = _current_revision()
+    if revision is None:
+        db.session.rollback()
+        seed_settings_from_env()
+        return save_settings(updates, user_id)
+
+    existing = {
+        setting.key: setting
+        for setting in AppSetting.query.filter(AppSetting.key.in_(list(cleaned)))
+    }
+    for key, value in cleaned.items():
+        setting = existing.get(key)
+        if setting is None:
+            setting = AppSetting(key=key)
+            db.session.add(setting)
+        setting.value = value
+        setting.revision = revision
+        setting.updated_by = user_id
+    db.session.commit()
+    return revision
+
+
+def seed_settings_from_env():
+    """Salin nilai env/.env ke ``app_setting`` jika tabel belum pernah diisi."""
+    if _current_revision() is not None:
+        return False
+    now = local_now()
+    db.session.add(AppSetting(key=VERSION_KEY, value=None, revision=1, updated_at=now))
+    for key in SETTING_KEYS:
+        if key in os.environ:
+            db.session.add(
+                AppSetting(key=key, value=os.environ[key], revision=1, updated_at=now)
+            )
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # worker lain sudah lebih dulu mengisi
+        db.session.rollback()
+        return False
+    return True
@@ -0,0 +1,145 @@
+"""Penutupan otomatis shift kasir yang tertinggal dari hari sebelumnya.
+
+Shift yang belum ditutup sampai lewat tengah malam ditutup paksa oleh sweeper
+harian, bukan lagi di setiap request halaman POS. Setiap proses menyimpan
+penanda tanggal sweep terakhir; request pertama setelah pergantian hari
+menjalankan sweep sekali, request lain hanya membandingkan tanggal. Untuk
+deployment yang memakai cron, matikan ``SHIFT_AUTO_CLOSE`` dan jadwalkan
+``flask shifts close-stale``.
+
+Hasil sweep terakhir (jumlah dan daftar shift) disimpan di proses yang
+menjalankannya supaya halaman POS/dashboard bisa menampilkan log tanpa query.
+"""
+
+import os
+import threading
+
+from sqlalchemy.orm import joinedload
+
+from app import db
+from app.models import CashierShift
+from app.time_utils import local_now, local_today
+
+DEFAULT_LOG_LIMIT = 12
+
+_state = {"day": None, "result": None}
+_sweep_lock = threading.Lock()
+
+
+def append_shift_note(existing_note, new_note):
+    if not new_note:
+        return existing_note
+    combined = f"{existing_note} | {new_note}" if existing_note else new_note
+    return combined[:255]
+
+
+def _empty_result():
+    return {"count": 0, "items": [], "extra_count": 0, "user_ids": []}
+
+
+def close_stale_shifts(actor_id=None, only_user_id=None, collect=False, log_limit=DEFAULT_LOG_LIMIT):
+    """Tutup shift terbuka dengan ``shift_date`` sebelum hari ini, lalu commit.
+
+    ``actor_id`` None berarti ditutup oleh sistem (sweeper/cron). Mengembalikan
+    jumlah shift, atau dict ``count/items/extra_count/user_ids`` jika ``collect``.
+    """
+    today = local_today()
+    now = local_now()
+    query = CashierShift.query.filter(
+        CashierShift.closed_at.is_(None),
+        CashierShift.shift_date < today,
+    )
+    if only_user_id:
+        query = query.filter(CashierShift.user_id == only_user_id)
+    if collect:
+        query = query.options(joinedload(CashierShift.user))
+    stale_shifts = query.order_by(CashierShift.opened_at.asc()).all()
+    if not stale_shifts:
+        return _empty_result() if collect else 0
+
+    result = _empty_result()
+    if collect:
+        for shift in stale_shifts[:log_limit]:
+            result["items"].append(
+                {
+                    "user_id": shift.user_id,
+                    "user": shift.user.username if shift.user else "-",
+                    "shift_date": shift.shift_date.strftime("%d %b %Y")
+                    if shift.shift_date
+                    else "-",
+                    "opened_at": shift.opened_at.strftime("%H:%M")
+                    if shift.opened_at
+                    else "-",
+                    "closed_at": now.strftime("%H:%M"),
+                }
+            )
+        result["extra_count"] = max(len(stale_shifts) - log_limit, 0)
+        result["user_ids"] = sorted({shift.user_id for shift in stale_shifts})
+    note = f"Auto-close {now.strftime('%d/%m/%Y %H:%M')}"
+    for shift in stale_shifts:
+        shift.closed_at = now
+        shift.closed_by = actor_id
+        shift.forced_close = True
+        shift.note = append_shift_note(shift.note, note)
+    db.session.commit()
+    if collect:
+        result["count"] = len(stale_shifts)
+        return result
+    return len(stale_shifts)
+
+
+def auto_close_enabled(app):
+    value = app.config.get("SHIFT_AUTO_CLOSE")
+    if value is None:
+        value = os.environ.get("SHIFT_AUTO_CLOSE", "1").strip().lower() not in (
+            "0",
+            "false",
+            "no",
+            "off",
+        )
+        app.config["SHIFT_AUTO_CLOSE"] = value
+    return bool(value)
+
+
+def sweep_due(today=None):
+    return _state["day"] != (today or local_today())
+
+
+def sweep_stale_shifts(today=None):
+    """Jalankan sweep sekarang dan catat penanda hari ini untuk proses ini."""
+    today = today or local_today()
+    result = close_stale_shifts(collect=True)
+    result["day"] = today
+    result["ran_at"] = local_now()
+    _state.update(day=today, result=result)
+    return result
+
+
+def sweep_stale_shifts_if_due():
+    """Sweep sekali per hari per proses; ``None`` jika belum waktunya."""
+    today = local_today()
+    if not sweep_due(today):
+        return None
+    # thread lain yang sedang sweep cukup ditunggu hasilnya di request berikutnya
+    if not _sweep_lock.acquire(blocking=False):
+        return None
+    try:
+        if not sweep_due(today):
+            return None
+        # tandai dulu supaya sweep yang gagal tidak diulang di setiap request
+        _state["day"] = today
+        return sweep_stale_shifts(today)
+    finally:
+        _sweep_lock.release()
+
+
+def last_sweep(today=None):
+    """Hasil sweep hari ini di proses ini (dict), atau None."""
+    result = _state["result"]
+    if result is None or result["day"] != (today or local_today()):
+        return None
+    return result
+
+
+def reset_sweep_state():
+    _state.update(day=None, result=None)
@@ -0,0 +1,211 @@
+"""Profil SQL per request: jumlah query, waktu DB dan pola query berulang (N+1).
+
+Event ``before/after_cursor_execute`` milik SQLAlchemy mencatat setiap statement
+yang dijalankan selama request. Di akhir request hasilnya dikirim lewat header
+``Server-Timing`` dan disimpan di tabel bergulir (in-memory, per proses) yang
+ditampilkan di halaman status server.
+
+Konfigurasi (app.config atau env):
+``SQL_PROFILER_ENABLED`` (default 1), ``SQL_PROFILER_HISTORY`` (jumlah request
+yang disimpan, default 200) dan ``SQL_PROFILER_REPEAT_THRESHOLD`` (berapa kali
+SELECT yang sama boleh diulang sebelum dianggap N+1, default 5).
+"""
+
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .time_utils import local_now
+
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)"
+_IN_LIST_RE = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+\s*\)")
+_NUMBER_RE = re.compile(r"(?<![\w.])\d+(?:\.\d+)?\b")
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_SPACE_RE = re.compile(r"\s+")
+SHAPE_PREVIEW_LENGTH = 240
+
+
+def statement_shape(statement):
+    """Bentuk statement tanpa nilai: daftar ``IN (?, ?, ...)`` dan literal diseragamkan."""
+    shape = _SPACE_RE.sub(" ", statement or "").strip()
+    shape = _STRING_RE.sub("?", shape)
+    shape = _NUMBER_RE.sub("?", shape)
+    return _IN_LIST_RE.sub("(?)", shape)
+
+
+class RequestProfile:
+    __slots__ = ("started", "statements", "db_time", "shapes")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.db_time = 0.0
+        self.shapes = {}
+
+    def record(self, statement, elapsed):
+        self.statements += 1
+        self.db_time += elapsed
+        shape = statement_shape(statement)
+        count, total = self.shapes.get(shape, (0, 0.0))
+        self.shapes[shape] = (count + 1, total + elapsed)
+
+    def repeated_selects(self, threshold):
+        """Pola SELECT yang dijalankan >= ``threshold`` kali, terbanyak dulu."""
+        repeated = [
+            {
+                "shape": shape[:SHAPE_PREVIEW_LENGTH],
+                "count": count,
+                "db_ms": round(total * 1000, 2),
+            }
+            for shape, (count, total) in self.shapes.items()
+            if count >= threshold and shape[:6].upper() == "SELECT"
+        ]
+        repeated.sort(key=lambda item: (-item["count"], -item["db_ms"]))
+        return repeated
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(_conn, _cursor, _statement, _parameters, context, _executemany):
+    if context is not None and has_request_context() and g.get("sql_profile") is not None:
+        context._sql_profiler_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(_conn, _cursor, statement, _parameters, context, _executemany):
+    started = getattr(context, "_sql_profiler_started", None)
+    if started is None or not has_request_context():
+        return
+    profile = g.get("sql_profile")
+    if profile is not None:
+        profile.record(statement, time.perf_counter() - started)
+
+
+class SQLProfiler:
+    """Ekstensi Flask; pasang dengan ``sql_profiler.init_app(app)``."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        enabled = app.config.setdefault(
+            "SQL_PROFILER_ENABLED",
+            os.environ.get("SQL_PROFILER_ENABLED", "1").strip().lower()
+            not in {"0", "false", "no", "off"},
+        )
+        app.config.setdefault(
+            "SQL_PROFILER_HISTORY", _env_int("SQL_PROFILER_HISTORY", 200)
+        )
+        app.config.setdefault(
+            "SQL_PROFILER_REPEAT_THRESHOLD",
+            _env_int("SQL_PROFILER_REPEAT_THRESHOLD", 5),
+        )
+        app.extensions["sql_profiler"] = {
+            "history": deque(maxlen=max(int(app.config["SQL_PROFILER_HISTORY"]), 1)),
+            "lock": threading.Lock(),
+        }
+        if not enabled:
+            return
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    @staticmethod
+    def _start_request():
+        if request.endpoint != "static":
+            g.sql_profile = RequestProfile()
+
+    @staticmethod
+    def _finish_request(response):
+        profile = g.pop("sql_profile", None)
+        if profile is None:
+            return response
+        total_ms = (time.perf_counter() - profile.started) * 1000
+        db_ms = profile.db_time * 1000
+        repeated = profile.repeated_selects(
+            current_app.config["SQL_PROFILER_REPEAT_THRESHOLD"]
+        )
+
+        timings = [
+            f'db;dur={db_ms:.2f};desc="{profile.statements} queries"',
+            f"app;dur={total_ms:.2f}",
+        ]
+        if repeated:
+            timings.append(f'n1;desc="{len(repeated)} pola query berulang"')
+        response.headers.add("Server-Timing", ", ".join(timings))
+
+        state = current_app.extensions["sql_profiler"]
+        entry = {
+            "at": local_now(),
+            "method": request.method,
+            "path": request.path,
+            "endpoint": request.endpoint or "-",
+            "status": response.status_code,
+            "statements": profile.statements,
+            "db_ms": round(db_ms, 2),
+            "total_ms": round(total_ms, 2),
+            "repeated": repeated,
+        }
+        with state["lock"]:
+            state["history"].append(entry)
+        return response
+
+
+def recent_profiles(app, limit=50):
+    """Request terbaru (terbaru dulu) dari tabel bergulir."""
+    state = app.extensions.get("sql_profiler")
+    if not state:
+        return []
+    with state["lock"]:
+        entries = list(state["history"])
+    return entries[::-1][:limit]
+
+
+def endpoint_profiles(app):
+    """Ringkasan per endpoint dari tabel bergulir, query DB terlama dulu."""
+    grouped = {}
+    for entry in recent_profiles(app, limit=None):
+        row = grouped.setdefault(
+            entry["endpoint"],
+            {
+                "endpoint": entry["endpoint"],
+                "requests": 0,
+                "statements": 0,
+                "max_statements": 0,
+                "db_ms": 0.0,
+                "max_db_ms": 0.0,
+                "n_plus_one": 0,
+                "shapes": Counter(),
+            },
+        )
+        row["requests"] += 1
+        row["statements"] += entry["statements"]
+        row["max_statements"] = max(row["max_statements"], entry["statements"])
+        row["db_ms"] += entry["db_ms"]
+        row["max_db_ms"] = max(row["max_db_ms"], entry["db_ms"])
+        if entry["repeated"]:
+            row["n_plus_one"] += 1
+            for item in entry["repeated"]:
+                row["shapes"][item["shape"]] += item["count"]
+
+    rows = []
+    for row in grouped.values():
+        shapes = row.pop("shapes")
+        row["avg_statements"] = round(row["statements"] / row["requests"], 1)
+        row["avg_db_ms"] = round(row["db_ms"] / row["requests"], 2)
+        row["top_repeated"] = shapes.most_common(1)[0][0] if shapes else None
+        rows.append(row)
+    rows.sort(key=lambda item: (-item["avg_db_ms"], item["endpoint"]))
+    return rows
@@ -0,0 +1,118 @@
+/*
+ * Upload import sebagai job latar (produk, pelanggan, supplier, stok opname, level harga).
+ *
+ * Form dengan atribut `data-import-job` dikirim lewat fetch (Accept: JSON):
+ *   POST <action>                 -> 202 {job_id, status_url, result_url},
+ *                                    400 {error} atau 200 {redirect} (tanpa tabel job)
+ *   GET  /api/import-jobs/<id>    -> {status, progress, message, done, ...}
+ * Progres ditampilkan di elemen `[data-import-progress]` dalam form; setelah
+ * job selesai halaman pindah ke `result_url` yang menampilkan ringkasan.
+ */
+(function (window, document) {
+    'use strict';
+
+    const POLL_INTERVAL_MS = 1000;
+
+    function progressView(form) {
+        const wrapper = form.querySelector('[data-import-progress]');
+        const bar = form.querySelector('[data-import-progress-bar]');
+        const label = form.querySelector('[data-import-progress-label]');
+        const message = form.querySelector('[data-import-progress-message]');
+        return function update(value, text) {
+            if (wrapper) {
+                wrapper.classList.remove('d-none');
+            }
+            const safe = Math.max(0, Math.min(100, Math.round(value || 0)));
+            if (bar) {
+                bar.style.width = `${safe}%`;
+                bar.setAttribute('aria-valuenow', String(safe));
+            }
+            if (label) {
+                label.textContent = `${safe}%`;
+            }
+            if (message && text) {
+                message.textContent = text;
+            }
+        };
+    }
+
+    function poll(statusUrl, update) {
+        return new Promise((resolve, reject) => {
+            function tick() {
+                fetch(statusUrl, { headers: { Accept: 'application/json' } })
+                    .then(response => {
+                        if (!response.ok) {
+                            throw new Error('Status import tidak bisa dibaca');
+                        }
+                        return response.json();
+                    })
+                    .then(job => {
+                        update(job.progress, job.message);
+                        if (job.done) {
+                            resolve(job);
+                        } else {
+                            window.setTimeout(tick, POLL_INTERVAL_MS);
+                        }
+                    })
+                    .catch(reject);
+            }
+            tick();
+        });
+    }
+
+    function submitAsJob(form, event) {
+        const fileInput = form.querySelector('input[type="file"]');
+        if (!window.fetch || !fileInput || !fileInput.files || !fileInput.files.length) {
+            return;
+        }
+        event.preventDefault();
+        const button = form.querySelector('[type="submit"]');
+        const buttonHtml = button ? button.innerHTML : '';
+        const update = progressView(form);
+        if (button) {
+            button.disabled = true;
+            button.innerHTML =
+                '<span class="spinner-border spinner-border-sm mr-2 me-2" role="status" aria-hidden="true"></span>Memproses import...';
+        }
+        update(2, 'Mengunggah file...');
+
+        fetch(form.action, {
+            method: 'POST',
+            body: new FormData(form),
+            headers: { Accept: 'application/json' },
+            credentials: 'same-origin',
+        })
+            .then(response => {
+                const type = response.headers.get('Content-Type') || '';
+                if (type.indexOf('application/json') === -1) {
+                    window.location.reload();
+                    return null;
+                }
+                return response.json().then(payload => {
+                    if (payload.redirect) {
+                        window.location.href = payload.redirect;
+                        return null;
+                    }
+                    if (!payload.status_url) {
+                        throw new Error(payload.error || 'Import gagal dimulai');
+                    }
+                    return poll(payload.status_url, update).then(() => {
+                        window.location.href = payload.result_url;
+                    });
+                });
+            })
+            .catch(error => {
+                if (button) {
+                    button.disabled = false;
+                    button.innerHTML = buttonHtml;
+                }
+                update(0, (error && error.message) || 'Gagal memantau import.');
+            });
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        document.querySelectorAll('form[data-import-job]').forEach(form => {
+            form.addEventListener('submit', event => submitAsJob(form, event));
+        });
+    });
+})(window, document);
@@ -0,0 +1,230 @@
+/*
+ * Cache katalog POS (produk & pelanggan) di IndexedDB dengan delta sync.
+ *
+ * Server: GET /api/pos/catalog/<kind>?since=<versi>&window=<n>&after=<id>&limit=<n>
+ *   - since=0  -> snapshot penuh, dipaging lewat `next_after`
+ *   - since=N  -> hanya item yang berubah setelah versi N (mode "delta");
+ *                 `window` dikirim balik apa adanya untuk mendeteksi commit terlambat
+ *   - If-None-Match dengan ETag versi terakhir -> 304 bila tidak ada perubahan
+ */
+(function (window) {
+    'use strict';
+
+    const DB_NAME = 'pos-catalog';
+    const STORE_NAME = 'snapshots';
+    const DB_VERSION = 1;
+    const REFRESH_INTERVAL_MS = 60000;
+
+    let dbPromise = null;
+    const memoryStore = new Map();
+
+    function openDatabase() {
+        if (dbPromise) {
+            return dbPromise;
+        }
+        dbPromise = new Promise(resolve => {
+            if (!window.indexedDB) {
+                resolve(null);
+                return;
+            }
+            let request;
+            try {
+                request = window.indexedDB.open(DB_NAME, DB_VERSION);
+            } catch (error) {
+                resolve(null);
+                return;
+            }
+            request.onupgradeneeded = () => {
+                const db = request.result;
+                if (!db.objectStoreNames.contains(STORE_NAME)) {
+                    db.createObjectStore(STORE_NAME);
+                }
+            };
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => resolve(null);
+            request.onblocked = () => resolve(null);
+        });
+        return dbPromise;
+    }
+
+    async function readSnapshot(key) {
+        const db = await openDatabase();
+        if (!db) {
+            return memoryStore.get(key) || null;
+        }
+        return new Promise(resolve => {
+            try {
+                const tx = db.transaction(STORE_NAME, 'readonly');
+                const request = tx.objectStore(STORE_NAME).get(key);
+                request.onsuccess = () => resolve(request.result || null);
+                request.onerror = () => resolve(null);
+            } catch (error) {
+                resolve(null);
+            }
+        });
+    }
+
+    async function writeSnapshot(key, snapshot) {
+        const db = await openDatabase();
+        if (!db) {
+            memoryStore.set(key, snapshot);
+            return;
+        }
+        await new Promise(resolve => {
+            try {
+                const tx = db.transaction(STORE_NAME, 'readwrite');
+                tx.objectStore(STORE_NAME).put(snapshot, key);
+                tx.oncomplete = () => resolve();
+                tx.onerror = () => resolve();
+                tx.onabort = () => resolve();
+            } catch (error) {
+                resolve();
+            }
+        });
+    }
+
+    function buildUrl(baseUrl, params) {
+        const url = new URL(baseUrl, window.location.origin);
+        Object.entries(params).forEach(([key, value]) => {
+            if (value !== undefined && value !== null) {
+                url.searchParams.set(key, value);
+            }
+        });
+        return url.toString();
+    }
+
+    async function fetchPage(baseUrl, params, etag) {
+        const headers = { Accept: 'application/json' };
+        if (etag) {
+            headers['If-None-Match'] = etag;
+        }
+        const response = await fetch(buildUrl(baseUrl, params), {
+            headers,
+            credentials: 'same-origin',
+            cache: 'no-cache'
+        });
+        if (response.status === 304) {
+            return { notModified: true, etag: response.headers.get('ETag') || etag };
+        }
+        if (!response.ok) {
+            throw new Error(`Gagal memuat katalog (${response.status})`);
+        }
+        const payload = await response.json();
+        payload.etag = response.headers.get('ETag');
+        return payload;
+    }
+
+    async function fetchFull(baseUrl) {
+        const items = [];
+        let after = 0;
+        let first = null;
+        do {
+            const page = await fetchPage(baseUrl, { since: 0, after });
+            if (!first) {
+                first = page;
+            }
+            items.push(...(page.items || []));
+            after = page.next_after;
+        } while (after);
+        // versi halaman pertama dipakai agar perubahan selama paging ikut di delta berikutnya
+        return { version: first.version, window: first.window, etag: first.etag, items };
+    }
+
+    function mergeDelta(snapshot, payload) {
+        const byId = new Map(snapshot.items.map(item => [String(item.id), item]));
+        (payload.deleted || []).forEach(id => byId.delete(String(id)));
+        (payload.items || []).forEach(item => byId.set(String(item.id), item));
+        return {
+            version: payload.version,
+            window: payload.window,
+            etag: payload.etag,
+            items: Array.from(byId.values())
+        };
+    }
+
+    async function refresh(kind, baseUrl, snapshot) {
+        if (!snapshot || !snapshot.version) {
+            return fetchFull(baseUrl);
+        }
+        const payload = await fetchPage(
+            baseUrl,
+            { since: snapshot.version, window: snapshot.window },
+            snapshot.etag
+        );
+        if (payload.notModified) {
+            return null;
+        }
+        if (payload.mode === 'full') {
+            if (!payload.next_after) {
+                return {
+                    version: payload.version,
+                    window: payload.window,
+                    etag: payload.etag,
+                    items: payload.items || []
+                };
+            }
+            return fetchFull(baseUrl);
+        }
+        if (!(payload.items || []).length && !(payload.deleted || []).length) {
+            return { ...snapshot, version: payload.version, window: payload.window, etag: payload.etag };
+        }
+        return mergeDelta(snapshot, payload);
+    }
+
+    /**
+     * Hidrasi katalog: panggil `onData(items)` dengan salinan lokal (jika ada),
+     * lalu lagi setiap kali server mengirim perubahan.
+     */
+    function hydrate(kind, baseUrl, onData, options = {}) {
+        const storageKey = `${kind}:${baseUrl}`;
+        const interval = options.refreshInterval ?? REFRESH_INTERVAL_MS;
+        let snapshot = null;
+        let syncing = false;
+
+        async function sync() {
+            if (syncing) {
+                return;
+            }
+            syncing = true;
+            try {
+                const updated = await refresh(kind, baseUrl, snapshot);
+                if (updated) {
+                    const changed = !snapshot || updated.items !== snapshot.items;
+                    snapshot = updated;
+                    await writeSnapshot(storageKey, snapshot);
+                    if (changed) {
+                        onData(snapshot.items, { source: 'network', version: snapshot.version });
+                    }
+                }
+            } catch (error) {
+                console.warn(`Sinkronisasi katalog ${kind} gagal:`, error);
+                if (!snapshot) {
+                    onData([], { source: 'error', version: 0 });
+                }
+            } finally {
+                syncing = false;
+            }
+        }
+
+        const ready = readSnapshot(storageKey).then(cached => {
+            if (cached && Array.isArray(cached.items)) {
+                snapshot = cached;
+                onData(snapshot.items, { source: 'cache', version: snapshot.version });
+            }
+            return sync();
+        });
+
+        if (interval > 0) {
+            window.setInterval(sync, interval);
+        }
+        document.addEventListener('visibilitychange', () => {
+            if (document.visibilityState === 'visible') {
+                sync();
+            }
+        });
+
+        return { ready, sync };
+    }
+
+    window.PosCatalog = { hydrate };
+})(window);
@@ -0,0 +1,162 @@
+"""Bandingkan biaya checkout lewat form POST /penjualan vs JSON /api/penjualan.
+
+Contoh:
+    python -m benchmarks.bench_checkout --products 5000 --customers 5000 --sales 200
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+
+def _build_app(db_path):
+    os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{db_path}"
+    from app import create_app, db
+
+    app = create_app()
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    with app.app_context():
+        db.create_all()
+    return app, db
+
+
+def _seed(db, product_count, customer_count):
+    from app.models import CashierShift, Kategori, Pelanggan, Produk, Satuan, Supplier, User
+    from app.time_utils import local_now, local_today
+
+    satuan = Satuan(name="pcs")
+    kategori = Kategori(name="Umum")
+    supplier = Supplier(
+        name="Bench",
+        address="-",
+        phone="-",
+        bank_account="-",
+        account_name="-",
+        contact_person="-",
+    )
+    user = User(username="bench", email="bench@example.com", password="-", role="kasir")
+    db.session.add_all([satuan, kategori, supplier, user])
+    db.session.flush()
+    db.session.bulk_insert_mappings(
+        Produk,
+        [
+            {
+                "kode_produk": f"P{idx:06d}",
+                "sku": f"SKU{idx:06d}",
+                "nama_produk": f"Produk {idx}",
+                "harga": 10000.0,
+                "satuan_id": satuan.id,
+                "kategori_id": kategori.id,
+                "supplier_id": supplier.id,
+                "stok_lama": 1_000_000,
+                "harga_lama": 6000.0,
+                "harga_beli": 6000.0,
+            }
+            for idx in range(product_count)
+        ],
+    )
+    db.session.bulk_insert_mappings(
+        Pelanggan,
+        [
+            {
+                "pelanggan_id": f"CUST{idx:06d}",
+                "nama": f"Pelanggan {idx}",
+                "kontak": "0800",
+                "alamat": "-",
+            }
+            for idx in range(customer_count)
+        ],
+    )
+    db.session.add(CashierShift(user_id=user.id, shift_date=local_today(), opened_at=local_now()))
+    db.session.commit()
+    return user.id
+
+
+def _summary(label, samples):
+    ordered = sorted(samples)
+    return {
+        "label": label,
+        "count": len(samples),
+        "mean_ms": round(statistics.mean(samples), 2),
+        "p50_ms": round(statistics.median(samples), 2),
+        "p95_ms": round(ordered[max(0, int(len(ordered) * 0.95) - 1)], 2),
+    }
+
+
+def _interleaved(count, funcs):
+    """Jalankan tiap skenario bergantian supaya kondisi DB (jumlah faktur, dll.) setara."""
+    samples = {label: [] for label in funcs}
+    for idx in range(count):
+        for label, func in funcs.items():
+            started = time.perf_counter()
+            func(idx)
+            samples[label].append((time.perf_counter() - started) * 1000)
+    return [_summary(label, values) for label, values in samples.items()]
+
+
+def run(product_count, customer_count, sales_count):
+    with tempfile.TemporaryDirectory() as tmp:
+        app, db = _build_app(os.path.join(tmp, "bench.db"))
+        with app.app_context():
+            user_id = _seed(db, product_count, customer_count)
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess["user_id"] = user_id
+
+        def form_post(idx):
+            response = client.post(
+                "/penjualan",
+                data={
+                    "pelanggan_id": (idx % customer_count) + 1,
+                    "produk_id[]": [(idx % product_count) + 1],
+                    "jumlah[]": [1],
+                    "harga[]": [10000],
+                    "payment_method": "Tunai",
+                    "amount_paid": 10000,
+                },
+            )
+            assert response.status_code == 302, response.status_code
+
+        def json_post(idx):
+            response = client.post(
+                "/api/penjualan",
+                json={
+                    "pelanggan_id": (idx % customer_count) + 1,
+                    "items": [{"produk_id": (idx % product_count) + 1, "jumlah": 1, "harga": 10000}],
+                    "payment_method": "Tunai",
+                    "amount_paid": 10000,
+                },
+            )
+            assert response.status_code == 201, response.get_data(as_text=True)
+
+        def page_get(_idx):
+            assert client.get("/penjualan").status_code == 200
+
+        results = _interleaved(
+            sales_count,
+            {
+                "GET /penjualan (konteks halaman)": page_get,
+                "POST /penjualan (form)": form_post,
+                "POST /api/penjualan (JSON)": json_post,
+            },
+        )
+    return {
+        "products": product_count,
+        "customers": customer_count,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--customers", type=int, default=2000)
+    parser.add_argument("--sales", type=int, default=100)
+    args = parser.parse_args()
+    print(json.dumps(run(args.products, args.customers, args.sales), indent=2))
+
+
+if __name__ == "__main__":
+    main()
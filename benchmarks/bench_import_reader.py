@@ -0,0 +1,106 @@
+"""Bandingkan memori baca file import: ``pd.read_excel`` utuh vs ``ImportChunks``.
+
+File stok opname sintetis (.xlsx dan .csv, kolom Kode Produk/Qty Fisik/HPP/
+Catatan) dibuat sekali, lalu setiap cara baca dijalankan di proses Python
+baru agar puncak RSS (``ru_maxrss``) tidak tercampur. Pembaca per potongan
+hanya menjumlahkan baris setiap potongan, seperti runner import.
+
+Contoh:
+    python -m benchmarks.bench_import_reader --rows 50000 200000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+_MEASURE = r"""
+import json, resource, sys, time
+mode, path = sys.argv[1], sys.argv[2]
+import pandas as pd
+from app.services.import_reader import ImportChunks
+base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+started = time.perf_counter()
+if mode == "read_excel":
+    rows = len(pd.read_excel(path).index)
+elif mode == "read_csv":
+    rows = len(pd.read_csv(path).index)
+else:
+    rows = sum(len(chunk.index) for chunk in ImportChunks(path, path, allow_csv=True))
+elapsed = time.perf_counter() - started
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"rows": rows, "seconds": elapsed, "extra_mb": (peak - base) / 1024}))
+"""
+
+
+def _write_files(directory, count):
+    from openpyxl import Workbook
+
+    xlsx_path = os.path.join(directory, f"opname-{count}.xlsx")
+    csv_path = os.path.join(directory, f"opname-{count}.csv")
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    header = ["Kode Produk", "Qty Fisik", "HPP", "Catatan"]
+    sheet.append(header)
+    with open(csv_path, "w", encoding="utf-8") as handle:
+        handle.write(",".join(header) + "\n")
+        for idx in range(count):
+            row = [f"P{idx:07d}", idx % 90, 1000 + idx % 500, f"Rak {idx % 40}"]
+            sheet.append(row)
+            handle.write(",".join(str(value) for value in row) + "\n")
+    workbook.save(xlsx_path)
+    return xlsx_path, csv_path
+
+
+def _measure(mode, path):
+    output = subprocess.run(
+        [sys.executable, "-c", _MEASURE, mode, path],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output)
+
+
+def run(args):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in args.rows:
+            xlsx_path, csv_path = _write_files(tmp, count)
+            for mode, path in (
+                ("read_excel", xlsx_path),
+                ("chunks", xlsx_path),
+                ("read_csv", csv_path),
+                ("chunks", csv_path),
+            ):
+                item = _measure(mode, path)
+                results.append(
+                    {
+                        "rows": count,
+                        "file": os.path.splitext(path)[1],
+                        "reader": mode,
+                        "seconds": round(item["seconds"], 2),
+                        "extra_mb": round(item["extra_mb"], 1),
+                    }
+                )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[50_000, 200_000])
+    args = parser.parse_args()
+
+    results = run(args)
+    for item in results:
+        print(
+            f"{item['rows']} baris {item['file']} ({item['reader']}): "
+            f"{item['seconds']} s, +{item['extra_mb']} MB RSS",
+            file=sys.stderr,
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
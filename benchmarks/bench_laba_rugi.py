@@ -0,0 +1,272 @@
+"""Bandingkan agregasi laporan laba rugi lama (loop ORM) dengan agregat SQL.
+
+Contoh:
+    python -m benchmarks.bench_laba_rugi --products 2000 --sales 20000 --lines 3
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from benchmarks.bench_checkout import _build_app, _summary
+
+
+def legacy_profit_loss(start_date, end_date):
+    """Implementasi lama laporan laba rugi (sebelum agregat SQL), untuk pembanding."""
+    from sqlalchemy.orm import joinedload
+
+    from app.models import DetailPenjualan, Penjualan
+
+    sales_records = (
+        Penjualan.query.options(
+            joinedload(Penjualan.detail_penjualan).joinedload(DetailPenjualan.produk)
+        )
+        .filter(Penjualan.tanggal_penjualan >= start_date)
+        .filter(Penjualan.tanggal_penjualan <= end_date)
+        .order_by(Penjualan.tanggal_penjualan.asc())
+        .all()
+    )
+    totals = {
+        "gross_revenue": 0.0,
+        "cogs": 0.0,
+        "gross_profit": 0.0,
+        "discount": 0.0,
+        "tax": 0.0,
+        "marketplace_costs": 0.0,
+        "orders": len(sales_records),
+        "units": 0,
+    }
+    daily_map = defaultdict(lambda: {"revenue": 0.0, "gross": 0.0})
+    monthly_map = defaultdict(lambda: {"revenue": 0.0, "gross": 0.0})
+    product_map = defaultdict(
+        lambda: {"name": "Produk dihapus", "units": 0, "revenue": 0.0, "gross": 0.0}
+    )
+    for sale in sales_records:
+        sale_date = sale.tanggal_penjualan
+        month_key = (sale_date.year, sale_date.month)
+        for detail in sale.detail_penjualan:
+            qty = detail.jumlah or 0
+            price = detail.harga_satuan or 0.0
+            base_amount = price * qty
+            discount_value = base_amount * ((detail.diskon or 0.0) / 100.0)
+            taxable = base_amount - discount_value
+            tax_value = taxable * ((detail.pajak or 0.0) / 100.0)
+            product_cost = 0.0
+            if detail.produk:
+                product_cost = (
+                    detail.produk.harga_lama
+                    or detail.produk.harga_beli
+                    or detail.produk.harga
+                    or 0.0
+                )
+            cost_value = product_cost * qty
+            gross_value = taxable - cost_value
+
+            totals["units"] += qty
+            totals["gross_revenue"] += taxable
+            totals["discount"] += discount_value
+            totals["tax"] += tax_value
+            totals["cogs"] += cost_value
+            totals["gross_profit"] += gross_value
+            daily_map[sale_date]["revenue"] += taxable
+            daily_map[sale_date]["gross"] += gross_value
+            monthly_map[month_key]["revenue"] += taxable
+            monthly_map[month_key]["gross"] += gross_value
+
+            product_key = detail.produk.id if detail.produk else f"detail-{detail.id}"
+            if detail.produk:
+                product_map[product_key]["name"] = detail.produk.nama_produk
+            product_map[product_key]["units"] += qty
+            product_map[product_key]["revenue"] += taxable
+            product_map[product_key]["gross"] += gross_value
+        totals["marketplace_costs"] += float(sale.marketplace_cost_total or 0.0)
+
+    return {
+        "totals": totals,
+        "daily_points": [
+            {
+                "date": date_key.isoformat(),
+                "revenue": round(values["revenue"], 2),
+                "gross": round(values["gross"], 2),
+            }
+            for date_key, values in sorted(daily_map.items())
+        ],
+        "monthly_breakdown": [
+            {
+                "label": datetime(year=year, month=month, day=1).strftime("%b %Y"),
+                "revenue": values["revenue"],
+                "gross": values["gross"],
+            }
+            for (year, month), values in sorted(monthly_map.items())
+        ],
+        "top_products": sorted(
+            product_map.values(), key=lambda item: item["gross"], reverse=True
+        )[:5],
+    }
+
+
+def _seed(db, product_count, sales_count, lines_per_sale, days):
+    from app.models import (
+        DetailPenjualan,
+        Kategori,
+        Pelanggan,
+        Penjualan,
+        Produk,
+        Satuan,
+        Supplier,
+        User,
+    )
+    from app.services.sales_summary_service import rebuild_sales_summary
+
+    rng = random.Random(42)
+    satuan = Satuan(name="pcs")
+    kategori = Kategori(name="Umum")
+    supplier = Supplier(
+        name="Bench",
+        address="-",
+        phone="-",
+        bank_account="-",
+        account_name="-",
+        contact_person="-",
+    )
+    user = User(username="bench", email="bench@example.com", password="-", role="admin")
+    customer = Pelanggan(pelanggan_id="CUST1", nama="Pelanggan", kontak="0800", alamat="-")
+    db.session.add_all([satuan, kategori, supplier, user, customer])
+    db.session.flush()
+    db.session.bulk_insert_mappings(
+        Produk,
+        [
+            {
+                "kode_produk": f"P{idx:06d}",
+                "sku": f"SKU{idx:06d}",
+                "nama_produk": f"Produk {idx}",
+                "harga": 10000.0 + idx,
+                "satuan_id": satuan.id,
+                "kategori_id": kategori.id,
+                "supplier_id": supplier.id,
+                "stok_lama": 1000,
+                "harga_lama": 5000.0 + (idx % 500),
+                "harga_beli": 5000.0,
+            }
+            for idx in range(product_count)
+        ],
+    )
+    first_day = date.today() - timedelta(days=days - 1)
+    db.session.bulk_insert_mappings(
+        Penjualan,
+        [
+            {
+                "no_faktur": f"B{idx:08d}",
+                "tanggal_penjualan": first_day + timedelta(days=idx % days),
+                "sales_id": user.id,
+                "pelanggan_id": customer.id,
+                "total_harga": 0.0,
+                "marketplace_cost_total": float(rng.choice((0, 0, 1500))),
+                "payment_method": "Tunai",
+            }
+            for idx in range(sales_count)
+        ],
+    )
+    details = []
+    for sale_id in range(1, sales_count + 1):
+        for _ in range(lines_per_sale):
+            qty = rng.randint(1, 5)
+            price = float(rng.randint(8, 20) * 1000)
+            details.append(
+                {
+                    "penjualan_id": sale_id,
+                    "produk_id": rng.randint(1, product_count),
+                    "jumlah": qty,
+                    "harga_satuan": price,
+                    "diskon": float(rng.choice((0, 0, 5, 10))),
+                    "pajak": float(rng.choice((0, 11))),
+                    "harga_total": price * qty,
+                }
+            )
+    db.session.bulk_insert_mappings(DetailPenjualan, details)
+    rebuild_sales_summary()
+    db.session.commit()
+    return user.id, first_day
+
+
+def _timed(count, func):
+    samples = []
+    for _ in range(count):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def run(product_count, sales_count, lines_per_sale, days, repeat):
+    with tempfile.TemporaryDirectory() as tmp:
+        app, db = _build_app(os.path.join(tmp, "bench.db"))
+        with app.app_context():
+            user_id, first_day = _seed(db, product_count, sales_count, lines_per_sale, days)
+        end_day = date.today()
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess["user_id"] = user_id
+        url = (
+            f"/laporan/laba-rugi?start_date={first_day.isoformat()}"
+            f"&end_date={end_day.isoformat()}"
+        )
+
+        def legacy():
+            with app.app_context():
+                legacy_profit_loss(first_day, end_day)
+                db.session.remove()
+
+        def aggregated():
+            from app.models import SalesDailySummary
+            from app.services.report_service import profit_loss_breakdown
+            from app.services.sales_summary_service import summary_totals
+
+            with app.app_context():
+                summary_totals(
+                    SalesDailySummary.summary_date >= first_day,
+                    SalesDailySummary.summary_date <= end_day,
+                )
+                profit_loss_breakdown(first_day, end_day)
+                db.session.remove()
+
+        def route():
+            assert client.get(url).status_code == 200
+
+        results = [
+            _summary("legacy: loop ORM (agregasi saja)", _timed(repeat, legacy)),
+            _summary("baru: rekap + agregat SQL", _timed(repeat, aggregated)),
+            _summary("GET /laporan/laba-rugi (baru, termasuk render)", _timed(repeat, route)),
+        ]
+    return {
+        "products": product_count,
+        "sales": sales_count,
+        "lines_per_sale": lines_per_sale,
+        "days": days,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--sales", type=int, default=10000)
+    parser.add_argument("--lines", type=int, default=3)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print(
+        json.dumps(
+            run(args.products, args.sales, args.lines, args.days, args.repeat),
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
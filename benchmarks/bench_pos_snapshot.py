@@ -0,0 +1,149 @@
+"""Ukur memori dan kecepatan snapshot katalog POS (scan barcode) vs query.
+
+Database SQLite sementara diisi ``--products`` SKU (default 100 ribu, semua
+dengan barcode, sebagian dengan harga level). Laporan berisi waktu muat
+snapshot, memori yang ditahan snapshot (tracemalloc) dan latensi lookup
+snapshot dibanding ``Produk.query.filter_by(kode_produk=...)``.
+
+Contoh:
+    python -m benchmarks.bench_pos_snapshot --products 100000
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.bench_routes import _stats
+
+
+def _build_app(db_path):
+    os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{db_path}"
+    os.environ["POS_SNAPSHOT_WARM"] = "0"
+    from app import create_app, db
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+    return app, db
+
+
+def _seed(db, product_count, level_ratio):
+    from app.models import Kategori, PriceLevel, ProductPriceLevel, Produk, Satuan, Supplier
+
+    satuans = [Satuan(name=f"Satuan {idx}") for idx in range(5)]
+    kategoris = [Kategori(name=f"Kategori {idx}") for idx in range(40)]
+    supplier = Supplier(
+        name="Bench",
+        address="-",
+        phone="-",
+        bank_account="-",
+        account_name="-",
+        contact_person="-",
+    )
+    levels = [PriceLevel(name=f"Level {idx}") for idx in range(3)]
+    db.session.add_all([*satuans, *kategoris, supplier, *levels])
+    db.session.flush()
+    rows = [
+        {
+            "id": idx + 1,
+            "kode_produk": f"P{idx:06d}",
+            "sku": f"SKU{idx:06d}",
+            "barcode": f"899{idx:010d}",
+            "nama_produk": f"Produk bench {idx}",
+            "harga": 10000.0 + idx % 500,
+            "satuan_id": satuans[idx % len(satuans)].id,
+            "kategori_id": kategoris[idx % len(kategoris)].id,
+            "supplier_id": supplier.id,
+            "stok_lama": 100,
+            "harga_lama": 6000.0,
+            "harga_beli": 6000.0,
+        }
+        for idx in range(product_count)
+    ]
+    db.session.execute(Produk.__table__.insert(), rows)
+    level_rows = [
+        {"product_id": idx + 1, "level_id": level.id, "price": 9500.0}
+        for idx in range(int(product_count * level_ratio))
+        for level in levels[:2]
+    ]
+    if level_rows:
+        db.session.execute(ProductPriceLevel.__table__.insert(), level_rows)
+    db.session.commit()
+
+
+def run(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        app, db = _build_app(os.path.join(tmp, "snapshot.db"))
+        with app.app_context():
+            _seed(db, args.products, args.level_ratio)
+            from app.models import Produk
+            from app.services.pos_snapshot import load_snapshot
+
+            # waktu muat diukur tanpa tracemalloc (yang memperlambat alokasi)
+            started = time.perf_counter()
+            load_snapshot()
+            load_ms = (time.perf_counter() - started) * 1000
+            db.session.expunge_all()
+
+            gc.collect()
+            tracemalloc.start()
+            snapshot = load_snapshot()
+            gc.collect()
+            retained, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            rng = random.Random(args.seed)
+            codes = [
+                rng.choice((f"899{idx:010d}", f"P{idx:06d}", f"SKU{idx:06d}"))
+                for idx in (rng.randrange(args.products) for _ in range(args.lookups))
+            ]
+            snapshot_samples = []
+            for code in codes:
+                started = time.perf_counter()
+                assert snapshot.lookup(code) is not None
+                snapshot_samples.append((time.perf_counter() - started) * 1_000_000)
+
+            query_samples = []
+            for code in codes[: args.query_lookups]:
+                started = time.perf_counter()
+                Produk.query.filter_by(kode_produk=code).first()
+                query_samples.append((time.perf_counter() - started) * 1_000_000)
+
+    return {
+        "products": args.products,
+        "records": len(snapshot),
+        "load_ms": round(load_ms, 1),
+        "retained_mb": round(retained / 1024 / 1024, 2),
+        "peak_mb": round(peak / 1024 / 1024, 2),
+        "bytes_per_sku": round(retained / max(len(snapshot), 1)),
+        "snapshot_lookup_us": _stats(snapshot_samples),
+        "query_lookup_us": _stats(query_samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--level-ratio", type=float, default=0.3,
+                        help="Porsi produk yang punya harga level (2 level).")
+    parser.add_argument("--lookups", type=int, default=100_000)
+    parser.add_argument("--query-lookups", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    report = run(args)
+    print(
+        f"{report['records']} SKU: {report['retained_mb']} MB "
+        f"({report['bytes_per_sku']} B/SKU), muat {report['load_ms']} ms",
+        file=sys.stderr,
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Ukur import produk (``perform_produk_import``) untuk katalog supplier besar.
+
+Database SQLite sementara; setiap ukuran di ``--rows`` menjalankan dua pass
+pada DataFrame yang sama: pass pertama membuat semua produk, pass kedua
+memperbarui semuanya (nama + stok minimal berubah). Sebagian kecil baris
+sengaja tidak valid (satuan salah, SKU kembar, kode kosong) agar jalur catatan
+baris ikut terukur. ``lock_seconds`` adalah jeda dari INSERT/UPDATE pertama
+sampai commit, yaitu lama kunci tulis SQLite dipegang (checkout kasir menunggu
+selama itu, maksimal ``busy_timeout``).
+
+Contoh:
+    python -m benchmarks.bench_product_import --rows 10000 100000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+
+def _build_app(db_path):
+    os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{db_path}"
+    os.environ["POS_SNAPSHOT_WARM"] = "0"
+    from app import create_app, db
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+    return app, db
+
+
+def _seed_refs(db):
+    from app.models import Kategori, Satuan, Supplier
+
+    satuans = [Satuan(name=f"Satuan {idx}") for idx in range(5)]
+    kategoris = [Kategori(name=f"Kategori {idx}") for idx in range(40)]
+    suppliers = [
+        Supplier(
+            name=f"Supplier {idx}",
+            address="-",
+            phone="-",
+            bank_account="-",
+            account_name="-",
+            contact_person="-",
+        )
+        for idx in range(10)
+    ]
+    db.session.add_all([*satuans, *kategoris, *suppliers])
+    db.session.commit()
+    return [s.id for s in satuans], [k.id for k in kategoris], [s.id for s in suppliers]
+
+
+def _frame(count, satuan_ids, kategori_ids, supplier_ids, prefix, suffix=""):
+    import pandas as pd
+
+    rows = []
+    for idx in range(count):
+        rows.append(
+            {
+                "Kode Produk": "" if idx % 997 == 0 else f"{prefix}{idx:07d}",
+                "SKU": f"{prefix}S{idx // 2 if idx % 503 == 0 else idx:07d}",
+                "Nama Produk": f"Produk {prefix} {idx}{suffix}",
+                "Satuan ID": 999999 if idx % 211 == 0 else satuan_ids[idx % len(satuan_ids)],
+                "Kategori ID": kategori_ids[idx % len(kategori_ids)],
+                "Supplier ID": supplier_ids[idx % len(supplier_ids)],
+                "Berat": round(0.1 + idx % 50 / 10, 2),
+                "Stok Minimal": idx % 20 + (1 if suffix else 0),
+                "Tanggal Expired": "2030-12-31" if idx % 3 == 0 else None,
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+class _WriteLockTimer:
+    """Catat jeda INSERT/UPDATE pertama -> commit pada engine."""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.first_write = None
+        self.seconds = 0.0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+        event.listen(engine, "commit", self._on_commit)
+
+    def _on_execute(self, _conn, _cursor, statement, *_args):
+        if self.first_write is None and statement.lstrip()[:6].upper() in ("INSERT", "UPDATE"):
+            self.first_write = time.perf_counter()
+
+    def _on_commit(self, _conn):
+        if self.first_write is not None:
+            self.seconds = max(self.seconds, time.perf_counter() - self.first_write)
+            self.first_write = None
+
+    def reset(self):
+        self.first_write = None
+        self.seconds = 0.0
+
+
+def run(args):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        app, db = _build_app(os.path.join(tmp, "import.db"))
+        with app.app_context():
+            from app.services.import_service import perform_produk_import
+
+            refs = _seed_refs(db)
+            lock_timer = _WriteLockTimer(db.engine)
+            for position, count in enumerate(args.rows):
+                prefix = f"B{position}"
+                for label, suffix in (("create", ""), ("update", " v2")):
+                    frame = _frame(count, *refs, prefix=prefix, suffix=suffix)
+                    lock_timer.reset()
+                    started = time.perf_counter()
+                    summary = perform_produk_import(frame)
+                    elapsed = time.perf_counter() - started
+                    db.session.expunge_all()
+                    results.append(
+                        {
+                            "rows": count,
+                            "pass": label,
+                            "seconds": round(elapsed, 2),
+                            "rows_per_second": round(count / elapsed),
+                            "lock_seconds": round(lock_timer.seconds, 2),
+                            "created": summary["created"],
+                            "updated": summary["updated"],
+                            "skipped_notes": len(summary["skipped_notes"]),
+                        }
+                    )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    results = run(args)
+    for item in results:
+        print(
+            f"{item['rows']} baris ({item['pass']}): {item['seconds']} s, "
+            f"{item['rows_per_second']} baris/s, kunci tulis {item['lock_seconds']} s",
+            file=sys.stderr,
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+"""Ukur waktu route utama terhadap dataset sintetis dan simpan laporan JSON.
+
+Database SQLite sementara diisi lewat ``generate_bench_dataset`` (sama dengan
+``flask seed-bench``), lalu setiap route dipanggil ``--repeat`` kali lewat
+test client. Jumlah query dan waktu DB diambil dari header ``Server-Timing``.
+Simpan laporan dengan ``--output`` dan bandingkan antar commit dengan
+``--baseline laporan_lama.json``.
+
+Contoh:
+    python -m benchmarks.bench_routes --sales 20000 --output bench-routes.json
+    python -m benchmarks.bench_routes --baseline bench-routes.json --only laporan
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from io import BytesIO
+
+from benchmarks.bench_checkout import _build_app
+
+_TIMING_RE = re.compile(r"db;dur=(?P<dur>[\d.]+);desc=\"(?P<queries>\d+) queries\"")
+
+
+def _git(*args):
+    try:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def _stats(samples):
+    ordered = sorted(samples)
+    return {
+        "min": round(ordered[0], 2),
+        "p50": round(statistics.median(ordered), 2),
+        "p95": round(ordered[max(0, int(len(ordered) * 0.95 + 0.5) - 1)], 2),
+        "max": round(ordered[-1], 2),
+    }
+
+
+def _excel_upload(frame, name):
+    buffer = BytesIO()
+    frame.to_excel(buffer, index=False)
+    buffer.seek(0)
+    return {"file": (buffer, name)}
+
+
+def _scenarios(app, args):
+    """Daftar ``(nama, method, url, user_id, pembuat_kwargs_request)`` yang diukur."""
+    import pandas as pd
+
+    from app.models import Account, CashierShift, Pelanggan, Produk, User
+    from app.services.seed_service import BENCH_ADMIN_USERNAME
+    from app.time_utils import local_today
+
+    today = local_today()
+    start = (today - timedelta(days=args.days - 1)).isoformat()
+    month_start = today.replace(day=1).isoformat()
+    full_range = f"start_date={start}&end_date={today.isoformat()}"
+    month_range = f"start_date={month_start}&end_date={today.isoformat()}"
+
+    with app.app_context():
+        admin_id = User.query.filter_by(username=BENCH_ADMIN_USERNAME).one().id
+        cashier_id = (
+            CashierShift.query.filter_by(shift_date=today, closed_at=None).first().user_id
+        )
+        cash_account_id = Account.query.filter_by(code="1101").one().id
+        products = Produk.query.order_by(Produk.stok_lama.desc()).limit(50).all()
+        product_refs = [(product.id, product.harga) for product in products]
+        import_frame = pd.DataFrame(
+            [
+                {
+                    "Kode Produk": product.kode_produk,
+                    "SKU": product.sku,
+                    "Nama Produk": product.nama_produk,
+                    "Satuan ID": product.satuan_id,
+                    "Kategori ID": product.kategori_id,
+                    "Supplier ID": product.supplier_id,
+                    "Berat": product.berat,
+                    "Stok Minimal": product.stok_minimal,
+                    "Tanggal Expired": None,
+                }
+                for product in Produk.query.order_by(Produk.id.asc())
+                .limit(args.import_rows)
+                .all()
+            ]
+        )
+        customer_frame = pd.DataFrame(
+            [
+                {
+                    "ID Pelanggan": customer.pelanggan_id,
+                    "Nama Pelanggan": customer.nama,
+                    "Kontak": customer.kontak,
+                    "Alamat": customer.alamat,
+                }
+                for customer in Pelanggan.query.order_by(Pelanggan.id.asc())
+                .limit(args.import_rows)
+                .all()
+            ]
+        )
+        customer_id = Pelanggan.query.order_by(Pelanggan.id.asc()).first().id
+
+    def checkout_item(idx):
+        product_id, price = product_refs[idx % len(product_refs)]
+        return product_id, price
+
+    def form_checkout(idx):
+        product_id, price = checkout_item(idx)
+        return {
+            "data": {
+                "pelanggan_id": customer_id,
+                "produk_id[]": [product_id],
+                "jumlah[]": [1],
+                "harga[]": [price],
+                "payment_method": "Tunai",
+                "amount_paid": price,
+            }
+        }
+
+    def json_checkout(idx):
+        product_id, price = checkout_item(idx)
+        return {
+            "json": {
+                "pelanggan_id": customer_id,
+                "items": [{"produk_id": product_id, "jumlah": 1, "harga": price}],
+                "payment_method": "Tunai",
+                "amount_paid": price,
+            }
+        }
+
+    def admin_get(url):
+        return "GET", url, admin_id, lambda _idx: {}
+
+    return [
+        ("dashboard", *admin_get("/dashboard")),
+        ("penjualan GET", "GET", "/penjualan", cashier_id, lambda _idx: {}),
+        ("penjualan POST (form)", "POST", "/penjualan", cashier_id, form_checkout),
+        ("api/penjualan POST", "POST", "/api/penjualan", cashier_id, json_checkout),
+        ("data_penjualan", *admin_get("/data_penjualan")),
+        ("laporan_penjualan", *admin_get(f"/laporan/penjualan?{month_range}")),
+        ("laporan_laba_rugi", *admin_get(f"/laporan/laba-rugi?{full_range}")),
+        ("laporan_shift", *admin_get(f"/laporan/shift?{month_range}")),
+        ("laporan_pembelian", *admin_get(f"/laporan/pembelian?{month_range}")),
+        ("laporan_stok_barang", *admin_get("/laporan/stok-barang")),
+        ("laporan_piutang", *admin_get("/laporan/piutang")),
+        ("laporan_neraca", *admin_get(f"/laporan/neraca?{full_range}")),
+        ("buku_besar", *admin_get(f"/buku-besar?{month_range}")),
+        (
+            "buku_besar (akun kas)",
+            *admin_get(f"/buku-besar?account={cash_account_id}&{month_range}"),
+        ),
+        ("neraca_saldo", *admin_get(f"/neraca-saldo?{full_range}")),
+        (
+            "import produk",
+            "POST",
+            "/produk/import",
+            admin_id,
+            lambda _idx: {"data": _excel_upload(import_frame, "produk.xlsx")},
+        ),
+        (
+            "import pelanggan",
+            "POST",
+            "/pelanggan/import",
+            admin_id,
+            lambda _idx: {"data": _excel_upload(customer_frame, "pelanggan.xlsx")},
+        ),
+    ]
+
+
+def _measure(client, name, method, url, user_id, build_request, repeat):
+    with client.session_transaction() as sess:
+        sess["user_id"] = user_id
+    # satu panggilan pemanasan: cache template & skema tidak ikut diukur
+    warmup = client.open(url, method=method, **build_request(0))
+    samples = []
+    db_ms = []
+    queries = []
+    statuses = set()
+    for idx in range(1, repeat + 1):
+        kwargs = build_request(idx)
+        started = time.perf_counter()
+        response = client.open(url, method=method, **kwargs)
+        samples.append((time.perf_counter() - started) * 1000)
+        statuses.add(response.status_code)
+        match = _TIMING_RE.search(response.headers.get("Server-Timing", ""))
+        if match:
+            db_ms.append(float(match.group("dur")))
+            queries.append(int(match.group("queries")))
+    return {
+        "name": name,
+        "method": method,
+        "url": url,
+        "status": sorted(statuses | {warmup.status_code}),
+        "wall_ms": _stats(samples),
+        "db_ms": _stats(db_ms) if db_ms else None,
+        "queries": int(statistics.median(queries)) if queries else None,
+    }
+
+
+def _compare(results, baseline_path):
+    with open(baseline_path, encoding="utf-8") as handle:
+        baseline = {item["name"]: item for item in json.load(handle)["routes"]}
+    comparison = []
+    for item in results:
+        previous = baseline.get(item["name"])
+        if not previous:
+            continue
+        old, new = previous["wall_ms"]["p50"], item["wall_ms"]["p50"]
+        comparison.append(
+            {
+                "name": item["name"],
+                "baseline_p50_ms": old,
+                "p50_ms": new,
+                "ratio": round(new / old, 3) if old else None,
+                "baseline_queries": previous.get("queries"),
+                "queries": item.get("queries"),
+            }
+        )
+    return comparison
+
+
+def run(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        app, db = _build_app(os.path.join(tmp, "bench.db"))
+        # ukur import sampai selesai, bukan hanya penyerahan job ke thread
+        app.config["IMPORT_JOBS_INLINE"] = True
+        from app.services.seed_service import generate_bench_dataset
+
+        started = time.perf_counter()
+        with app.app_context():
+            counts = generate_bench_dataset(
+                products=args.products,
+                customers=args.customers,
+                sales=args.sales,
+                lines_per_sale=args.lines,
+                purchases=args.purchases,
+                journals=args.journals,
+                days=args.days,
+                seed=args.seed,
+            )
+            db.session.remove()
+        seed_seconds = time.perf_counter() - started
+
+        client = app.test_client()
+        results = []
+        for name, method, url, user_id, build_request in _scenarios(app, args):
+            if args.only and not any(token in name for token in args.only):
+                continue
+            result = _measure(client, name, method, url, user_id, build_request, args.repeat)
+            print(
+                f"{name:<28} p50 {result['wall_ms']['p50']:>9.2f} ms"
+                f"  queries {result['queries']}",
+                file=sys.stderr,
+            )
+            results.append(result)
+
+    report = {
+        "meta": {
+            "commit": _git("rev-parse", "--short", "HEAD"),
+            "branch": _git("rev-parse", "--abbrev-ref", "HEAD"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": "sqlite",
+            "repeat": args.repeat,
+            "dataset": counts,
+            "seed": args.seed,
+            "seed_seconds": round(seed_seconds, 2),
+        },
+        "routes": results,
+    }
+    if args.baseline:
+        report["comparison"] = _compare(results, args.baseline)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--customers", type=int, default=1000)
+    parser.add_argument("--sales", type=int, default=20000)
+    parser.add_argument("--lines", type=float, default=3)
+    parser.add_argument("--purchases", type=int, default=500)
+    parser.add_argument("--journals", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--import-rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--only", nargs="*", help="Hanya ukur skenario yang namanya memuat teks ini."
+    )
+    parser.add_argument("--output", help="Simpan laporan JSON ke file ini.")
+    parser.add_argument("--baseline", help="Laporan JSON sebelumnya untuk pembanding.")
+    args = parser.parse_args()
+
+    report = run(args)
+    payload = json.dumps(report, indent=2, default=str)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(payload)
+    print(payload)
+
+
+if __name__ == "__main__":
+    main()
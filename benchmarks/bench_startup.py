@@ -0,0 +1,156 @@
+"""Ukur biaya start worker: waktu import ``app``, ``create_app()`` dan RSS.
+
+Setiap percobaan berjalan di proses Python baru. Bytecode ``app/`` dikompilasi
+dulu (seperti worker produksi yang sudah punya ``__pycache__``); pakai
+``--cold`` untuk mengukur start tanpa cache bytecode. Laporan juga mencatat
+modul berat (pandas/numpy/openpyxl) yang ikut termuat dan modul dengan waktu
+import sendiri terbesar dari ``python -X importtime``.
+
+Contoh:
+    python -m benchmarks.bench_startup --output bench-startup.json
+    python -m benchmarks.bench_startup --baseline bench-startup.json
+"""
+import argparse
+import compileall
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.bench_routes import _git, _stats
+
+HEAVY_MODULES = ("pandas", "numpy", "openpyxl", "xlrd", "xlsxwriter")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+create_app()
+finished = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "create_app_ms": (finished - imported) * 1000,
+    "total_ms": (finished - started) * 1000,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "heavy": [name for name in %r if name in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def _probe_env(db_path):
+    env = dict(os.environ)
+    env["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{db_path}"
+    return env
+
+
+def _run_probe(env, cold):
+    command = [sys.executable]
+    if cold:
+        command.append("-B")
+        env = {**env, "PYTHONDONTWRITEBYTECODE": "1"}
+    command += ["-c", _PROBE]
+    output = subprocess.run(
+        command, cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _top_imports(env, limit):
+    """Modul dengan waktu import sendiri (self) terbesar, dalam ms."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "from app import create_app; create_app()"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append(
+            {
+                "module": name.strip(),
+                "self_ms": round(int(self_us) / 1000, 2),
+                "cumulative_ms": round(int(cumulative_us) / 1000, 2),
+            }
+        )
+    rows.sort(key=lambda item: -item["self_ms"])
+    return rows[:limit]
+
+
+def _compare(report, baseline_path):
+    with open(baseline_path, encoding="utf-8") as handle:
+        baseline = json.load(handle)
+    comparison = {}
+    for key in ("import_ms", "create_app_ms", "total_ms", "rss_mb"):
+        old, new = baseline["results"][key]["p50"], report["results"][key]["p50"]
+        comparison[key] = {
+            "baseline_p50": old,
+            "p50": new,
+            "ratio": round(new / old, 3) if old else None,
+        }
+    return comparison
+
+
+def run(args):
+    if not args.cold:
+        compileall.compile_dir(os.path.join(ROOT, "app"), quiet=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        env = _probe_env(os.path.join(tmp, "startup.db"))
+        samples = [_run_probe(env, args.cold) for _ in range(args.repeat)]
+        top_imports = _top_imports(env, args.top) if args.top else []
+
+    results = {
+        key: _stats([sample[key] for sample in samples])
+        for key in ("import_ms", "create_app_ms", "total_ms", "rss_mb")
+    }
+    report = {
+        "meta": {
+            "commit": _git("rev-parse", "--short", "HEAD"),
+            "branch": _git("rev-parse", "--abbrev-ref", "HEAD"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "bytecode_cache": not args.cold,
+        },
+        "results": results,
+        "heavy_modules": sorted({name for sample in samples for name in sample["heavy"]}),
+        "top_imports": top_imports,
+    }
+    if args.baseline:
+        report["comparison"] = _compare(report, args.baseline)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--top", type=int, default=15,
+                        help="Jumlah modul import terlama yang dicatat (0 = lewati).")
+    parser.add_argument("--cold", action="store_true",
+                        help="Ukur tanpa cache bytecode (python -B).")
+    parser.add_argument("--output", help="Simpan laporan JSON ke file ini.")
+    parser.add_argument("--baseline", help="Laporan JSON sebelumnya untuk pembanding.")
+    args = parser.parse_args()
+
+    report = run(args)
+    for key, stats in report["results"].items():
+        print(f"{key:<14} p50 {stats['p50']:>9.2f}  max {stats['max']:>9.2f}", file=sys.stderr)
+    if report["heavy_modules"]:
+        print(f"modul berat saat start: {', '.join(report['heavy_modules'])}", file=sys.stderr)
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(payload)
+    print(payload)
+
+
+if __name__ == "__main__":
+    main()
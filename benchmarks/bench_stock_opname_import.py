@@ -0,0 +1,120 @@
+"""Ukur import stok opname (``run_stok_opname_import``) untuk hitung fisik gudang penuh.
+
+Database SQLite sementara diisi ``--products`` produk, lalu untuk setiap ukuran
+di ``--lines`` dibuat file .csv dan .xlsx (kode produk, sebagian lewat SKU dan
+nama; qty dan HPP acak) dan diimpor sebagai satu sesi opname. Waktu mencakup
+baca file, validasi, bulk UPDATE produk dan bulk INSERT item.
+
+Contoh:
+    python -m benchmarks.bench_stock_opname_import --products 60000 --lines 50000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_product_import import _build_app, _seed_refs
+
+
+def _seed_products(db, count, refs):
+    from sqlalchemy import insert
+
+    from app.models import Produk
+
+    satuan_ids, kategori_ids, supplier_ids = refs
+    rows = [
+        {
+            "kode_produk": f"O{idx:07d}",
+            "sku": f"OS{idx:07d}",
+            "nama_produk": f"Produk Opname {idx}",
+            "satuan_id": satuan_ids[idx % len(satuan_ids)],
+            "kategori_id": kategori_ids[idx % len(kategori_ids)],
+            "supplier_id": supplier_ids[idx % len(supplier_ids)],
+            "stok_lama": idx % 50,
+            "harga_lama": 1000.0,
+            "harga_beli": 1000.0,
+        }
+        for idx in range(count)
+    ]
+    for offset in range(0, count, 5000):
+        db.session.execute(insert(Produk), rows[offset : offset + 5000])
+    db.session.commit()
+
+
+def _write_files(directory, lines):
+    from openpyxl import Workbook
+
+    header = ["Kode Produk", "SKU", "Nama Produk", "Qty Fisik", "HPP", "Catatan"]
+    rows = []
+    for idx in range(lines):
+        kode = sku = nama = None
+        if idx % 10 == 1:
+            sku = f"OS{idx:07d}"
+        elif idx % 10 == 2:
+            nama = f"Produk Opname {idx}"
+        else:
+            kode = f"O{idx:07d}"
+        hpp = 1000 + idx % 300 if idx % 4 == 0 else None
+        rows.append([kode, sku, nama, (idx * 7) % 60, hpp, "recount" if idx % 97 == 0 else None])
+
+    csv_path = os.path.join(directory, f"opname-{lines}.csv")
+    with open(csv_path, "w", encoding="utf-8") as handle:
+        handle.write(",".join(header) + "\n")
+        for row in rows:
+            handle.write(",".join("" if value is None else str(value) for value in row) + "\n")
+    xlsx_path = os.path.join(directory, f"opname-{lines}.xlsx")
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(header)
+    for row in rows:
+        sheet.append(row)
+    workbook.save(xlsx_path)
+    return csv_path, xlsx_path
+
+
+def run(args):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        app, db = _build_app(os.path.join(tmp, "opname.db"))
+        with app.app_context():
+            from app.services.import_service import run_stok_opname_import
+
+            _seed_products(db, max(args.products, max(args.lines)), _seed_refs(db))
+            for lines in args.lines:
+                for path in _write_files(tmp, lines):
+                    started = time.perf_counter()
+                    summary = run_stok_opname_import(path, os.path.basename(path))
+                    elapsed = time.perf_counter() - started
+                    db.session.expunge_all()
+                    results.append(
+                        {
+                            "lines": lines,
+                            "file": os.path.splitext(path)[1],
+                            "seconds": round(elapsed, 2),
+                            "lines_per_second": round(lines / elapsed),
+                            "rows": summary["rows"],
+                        }
+                    )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=60_000)
+    parser.add_argument("--lines", type=int, nargs="+", default=[50_000])
+    args = parser.parse_args()
+
+    results = run(args)
+    for item in results:
+        print(
+            f"{item['lines']} baris {item['file']}: {item['seconds']} s, "
+            f"{item['lines_per_second']} baris/s",
+            file=sys.stderr,
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
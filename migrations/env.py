@@ -20,6 +20,15 @@ def _get_url():
         load_env_once()
         return resolve_database_uri()
 
+def _include_object(obj, name, type_, reflected, compare_to):
+    # indeks pencarian produk dikelola app.services.product_search, bukan model
+    if reflected and compare_to is None and name:
+        if type_ == "table" and name.startswith("produk_fts"):
+            return False
+        if type_ == "index" and (name == "ft_produk_search" or name.endswith("_trgm")):
+            return False
+    return True
+
 def run_migrations_offline():
     url = _get_url()
     context.configure(
@@ -27,6 +36,7 @@ def run_migrations_offline():
         target_metadata=_target_metadata(),
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=_include_object,
     )
     with context.begin_transaction():
         context.run_migrations()
@@ -35,6 +45,10 @@ def run_migrations_online():
     url = _get_url()
     connectable = create_engine(url, poolclass=pool.NullPool)
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=_target_metadata())
+        context.configure(
+            connection=connection,
+            target_metadata=_target_metadata(),
+            include_object=_include_object,
+        )
         with context.begin_transaction():
             context.run_migrations()
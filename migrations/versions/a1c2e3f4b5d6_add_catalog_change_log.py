@@ -0,0 +1,48 @@
+"""add catalog change log for POS delta sync
+
+Revision ID: a1c2e3f4b5d6
+Revises: f8c1d2e3f4a6
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a1c2e3f4b5d6"
+down_revision = "f8c1d2e3f4a6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+
+    if "catalog_change" not in existing_tables:
+        op.create_table(
+            "catalog_change",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("entity", sa.String(length=20), nullable=False),
+            sa.Column("entity_id", sa.Integer(), nullable=True),
+            sa.Column(
+                "op",
+                sa.String(length=10),
+                nullable=False,
+                server_default="upsert",
+            ),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index(
+            "ix_catalog_change_entity_id",
+            "catalog_change",
+            ["entity", "id"],
+        )
+        op.alter_column("catalog_change", "op", server_default=None)
+
+
+def downgrade():
+    op.drop_index("ix_catalog_change_entity_id", table_name="catalog_change")
+    op.drop_table("catalog_change")
@@ -0,0 +1,35 @@
+"""add import_job.updated_at heartbeat
+
+Job import berjalan di thread pool worker; job yang worker-nya mati tidak
+pernah selesai. Heartbeat ini dipakai polling untuk menandainya gagal.
+
+Revision ID: a2c4e6f8b0d1
+Revises: f3a5c7e9b1d3
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a2c4e6f8b0d1"
+down_revision = "f3a5c7e9b1d3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "import_job" not in set(inspector.get_table_names()):
+        return
+    columns = {column["name"] for column in inspector.get_columns("import_job")}
+    if "updated_at" not in columns:
+        with op.batch_alter_table("import_job") as batch_op:
+            batch_op.add_column(sa.Column("updated_at", sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("import_job") as batch_op:
+        batch_op.drop_column("updated_at")
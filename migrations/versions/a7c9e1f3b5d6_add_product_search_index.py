@@ -0,0 +1,95 @@
+"""add product search index (fts5 / fulltext / pg_trgm)
+
+Revision ID: a7c9e1f3b5d6
+Revises: f6b8d0e2a4c5
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a7c9e1f3b5d6"
+down_revision = "f6b8d0e2a4c5"
+branch_labels = None
+depends_on = None
+
+
+# DDL disalin dari app/services/product_search.py saat migrasi ini dibuat;
+# migrasi tidak boleh ikut berubah bila modul aplikasi berubah.
+SEARCH_COLUMNS = ("nama_produk", "kode_produk", "sku", "barcode")
+
+
+def _sqlite_ddl():
+    columns = ", ".join(SEARCH_COLUMNS)
+    new_values = ", ".join(f"new.{name}" for name in SEARCH_COLUMNS)
+    old_values = ", ".join(f"old.{name}" for name in SEARCH_COLUMNS)
+    delete_old = (
+        f"INSERT INTO produk_fts(produk_fts, rowid, {columns}) "
+        f"VALUES ('delete', old.id, {old_values});"
+    )
+    insert_new = f"INSERT INTO produk_fts(rowid, {columns}) VALUES (new.id, {new_values});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS produk_fts USING fts5({columns}, "
+        "content='produk', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS produk_fts_ai AFTER INSERT ON produk "
+        f"BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS produk_fts_ad AFTER DELETE ON produk "
+        f"BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS produk_fts_au AFTER UPDATE ON produk "
+        f"BEGIN {delete_old} {insert_new} END",
+        "INSERT INTO produk_fts(produk_fts) VALUES ('rebuild')",
+    ]
+
+
+def _is_mariadb(bind):
+    return bind.dialect.name == "mariadb" or getattr(bind.dialect, "is_mariadb", False)
+
+
+def upgrade():
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+    if dialect == "sqlite":
+        installed = bind.execute(
+            sa.text(
+                "SELECT COUNT(*) FROM sqlite_master WHERE name IN "
+                "('produk_fts', 'produk_fts_ai', 'produk_fts_ad', 'produk_fts_au')"
+            )
+        ).scalar()
+        if installed != 4:
+            for statement in _sqlite_ddl():
+                bind.execute(sa.text(statement))
+    elif dialect == "mysql" and not _is_mariadb(bind):
+        # MariaDB tidak punya parser ngram; di sana pencarian memakai ilike
+        indexes = {index["name"] for index in sa.inspect(bind).get_indexes("produk")}
+        if "ft_produk_search" not in indexes:
+            bind.execute(
+                sa.text(
+                    "CREATE FULLTEXT INDEX ft_produk_search ON produk "
+                    f"({', '.join(SEARCH_COLUMNS)}) WITH PARSER ngram"
+                )
+            )
+    elif dialect == "postgresql":
+        bind.execute(sa.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        for name in SEARCH_COLUMNS:
+            bind.execute(
+                sa.text(
+                    f"CREATE INDEX IF NOT EXISTS ix_produk_{name}_trgm "
+                    f"ON produk USING gin ({name} gin_trgm_ops)"
+                )
+            )
+
+
+def downgrade():
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+    if dialect == "sqlite":
+        for trigger in ("produk_fts_ai", "produk_fts_ad", "produk_fts_au"):
+            bind.execute(sa.text(f"DROP TRIGGER IF EXISTS {trigger}"))
+        bind.execute(sa.text("DROP TABLE IF EXISTS produk_fts"))
+    elif dialect == "mysql" and not _is_mariadb(bind):
+        op.drop_index("ft_produk_search", table_name="produk")
+    elif dialect == "postgresql":
+        for name in SEARCH_COLUMNS:
+            bind.execute(sa.text(f"DROP INDEX IF EXISTS ix_produk_{name}_trgm"))
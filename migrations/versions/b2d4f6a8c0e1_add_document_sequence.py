@@ -0,0 +1,51 @@
+"""add document sequence for invoice/journal numbering
+
+Revision ID: b2d4f6a8c0e1
+Revises: a1c2e3f4b5d6
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b2d4f6a8c0e1"
+down_revision = "a1c2e3f4b5d6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+
+    if "document_sequence" not in existing_tables:
+        op.create_table(
+            "document_sequence",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("prefix", sa.String(length=32), nullable=False),
+            sa.Column(
+                "period",
+                sa.String(length=16),
+                nullable=False,
+                server_default="",
+            ),
+            sa.Column(
+                "counter",
+                sa.Integer(),
+                nullable=False,
+                server_default="0",
+            ),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+            sa.UniqueConstraint(
+                "prefix", "period", name="uq_document_sequence_prefix_period"
+            ),
+        )
+        op.alter_column("document_sequence", "period", server_default=None)
+        op.alter_column("document_sequence", "counter", server_default=None)
+
+
+def downgrade():
+    op.drop_table("document_sequence")
@@ -0,0 +1,36 @@
+"""add catalog_change (entity, created_at) index
+
+Dipakai untuk jendela sinkron commit terlambat dan pemadatan log katalog.
+
+Revision ID: b4d6f8a0c2e4
+Revises: a2c4e6f8b0d1
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b4d6f8a0c2e4"
+down_revision = "a2c4e6f8b0d1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "catalog_change" not in set(inspector.get_table_names()):
+        return
+    indexes = {index["name"] for index in inspector.get_indexes("catalog_change")}
+    if "ix_catalog_change_entity_created" not in indexes:
+        op.create_index(
+            "ix_catalog_change_entity_created",
+            "catalog_change",
+            ["entity", "created_at"],
+        )
+
+
+def downgrade():
+    op.drop_index("ix_catalog_change_entity_created", table_name="catalog_change")
@@ -0,0 +1,28 @@
+"""add pelanggan (nama, id) index for keyset suggest
+
+Revision ID: b8d0f2a4c6e7
+Revises: a7c9e1f3b5d6
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b8d0f2a4c6e7"
+down_revision = "a7c9e1f3b5d6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    indexes = {index["name"] for index in inspector.get_indexes("pelanggan")}
+    if "ix_pelanggan_nama_id" not in indexes:
+        op.create_index("ix_pelanggan_nama_id", "pelanggan", ["nama", "id"])
+
+
+def downgrade():
+    op.drop_index("ix_pelanggan_nama_id", table_name="pelanggan")
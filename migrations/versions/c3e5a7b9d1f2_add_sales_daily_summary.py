@@ -0,0 +1,68 @@
+"""add sales daily summary rollup
+
+Revision ID: c3e5a7b9d1f2
+Revises: b2d4f6a8c0e1
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c3e5a7b9d1f2"
+down_revision = "b2d4f6a8c0e1"
+branch_labels = None
+depends_on = None
+
+
+def _amount(name):
+    return sa.Column(name, sa.Float(), nullable=False, server_default="0")
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+
+    if "sales_daily_summary" not in existing_tables:
+        op.create_table(
+            "sales_daily_summary",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("summary_date", sa.Date(), nullable=False),
+            sa.Column("shift_id", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("sales_id", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column(
+                "payment_method",
+                sa.String(length=20),
+                nullable=False,
+                server_default="",
+            ),
+            sa.Column("orders", sa.Integer(), nullable=False, server_default="0"),
+            _amount("total_amount"),
+            _amount("net_revenue"),
+            _amount("gross_sales"),
+            _amount("net_sales"),
+            _amount("discount_total"),
+            _amount("tax_total"),
+            _amount("marketplace_cost"),
+            sa.Column("units", sa.Integer(), nullable=False, server_default="0"),
+            _amount("hpp"),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+            sa.UniqueConstraint(
+                "summary_date",
+                "shift_id",
+                "sales_id",
+                "payment_method",
+                name="uq_sales_daily_summary_key",
+            ),
+        )
+        op.create_index(
+            "ix_sales_daily_summary_shift", "sales_daily_summary", ["shift_id"]
+        )
+    # data lama diisi otomatis saat aplikasi start (atau: flask sales-summary rebuild)
+
+
+def downgrade():
+    op.drop_index("ix_sales_daily_summary_shift", table_name="sales_daily_summary")
+    op.drop_table("sales_daily_summary")
@@ -0,0 +1,37 @@
+"""add user password version stamp
+
+Session yang stamp password-nya berbeda (password diganti/direset) harus login
+ulang; perubahan username/email/role cukup memperbarui session.
+
+Revision ID: c6e8a0b2d4f7
+Revises: b4d6f8a0c2e4
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c6e8a0b2d4f7"
+down_revision = "b4d6f8a0c2e4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {column["name"] for column in inspector.get_columns("user")}
+    if "password_version" not in columns:
+        with op.batch_alter_table("user") as batch_op:
+            batch_op.add_column(
+                sa.Column(
+                    "password_version", sa.Integer(), nullable=False, server_default="1"
+                )
+            )
+
+
+def downgrade():
+    with op.batch_alter_table("user") as batch_op:
+        batch_op.drop_column("password_version")
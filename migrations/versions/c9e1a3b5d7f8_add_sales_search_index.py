@@ -0,0 +1,46 @@
+"""add sales search index for report suggestions
+
+Revision ID: c9e1a3b5d7f8
+Revises: b8d0f2a4c6e7
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c9e1a3b5d7f8"
+down_revision = "b8d0f2a4c6e7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "sales_search_index" in set(inspector.get_table_names()):
+        return
+    op.create_table(
+        "sales_search_index",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("kind", sa.String(length=20), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column("term", sa.String(length=120), nullable=False),
+        sa.Column("label", sa.String(length=150), nullable=False),
+        sa.Column("subtext", sa.String(length=200), nullable=True),
+        sa.Column("first_date", sa.Date(), nullable=False),
+        sa.Column("last_date", sa.Date(), nullable=False),
+        sa.UniqueConstraint(
+            "kind", "entity_id", "term", name="uq_sales_search_index_entity_term"
+        ),
+    )
+    op.create_index(
+        "ix_sales_search_index_kind_term", "sales_search_index", ["kind", "term"]
+    )
+    # isi awal dilakukan aplikasi saat request pertama (atau `flask sales-search rebuild`)
+
+
+def downgrade():
+    op.drop_index("ix_sales_search_index_kind_term", table_name="sales_search_index")
+    op.drop_table("sales_search_index")
@@ -0,0 +1,48 @@
+"""add import job table for background imports
+
+Revision ID: d0f2a4c6e8b9
+Revises: c9e1a3b5d7f8
+Create Date: 2026-10-17 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d0f2a4c6e8b9"
+down_revision = "c9e1a3b5d7f8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "import_job" in set(inspector.get_table_names()):
+        return
+    op.create_table(
+        "import_job",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("kind", sa.String(length=30), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("progress", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("message", sa.String(length=255), nullable=True),
+        sa.Column("filename", sa.String(length=255), nullable=True),
+        sa.Column("options", sa.Text(), nullable=True),
+        sa.Column("summary", sa.Text(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column(
+            "created_by",
+            sa.Integer(),
+            sa.ForeignKey("user.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_table("import_job")
@@ -0,0 +1,67 @@
+"""add account period balance snapshots
+
+Revision ID: d4f6b8c0e2a3
+Revises: c3e5a7b9d1f2
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d4f6b8c0e2a3"
+down_revision = "c3e5a7b9d1f2"
+branch_labels = None
+depends_on = None
+
+
+def _amount(name):
+    return sa.Column(name, sa.Float(), nullable=False, server_default="0")
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+
+    if "account_period_balance" not in existing_tables:
+        op.create_table(
+            "account_period_balance",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("period_id", sa.Integer(), nullable=False),
+            sa.Column("account_id", sa.Integer(), nullable=False),
+            sa.Column("period_start", sa.Date(), nullable=False),
+            sa.Column("period_end", sa.Date(), nullable=False),
+            _amount("debit"),
+            _amount("credit"),
+            _amount("closing_balance"),
+            _amount("closing_adjustment"),
+            sa.Column(
+                "is_stale",
+                sa.Boolean(),
+                nullable=False,
+                server_default=sa.false(),
+            ),
+            sa.Column("refreshed_at", sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(
+                ["period_id"], ["accounting_period.id"], ondelete="CASCADE"
+            ),
+            sa.ForeignKeyConstraint(["account_id"], ["account.id"], ondelete="CASCADE"),
+            sa.UniqueConstraint(
+                "period_id", "account_id", name="uq_account_period_balance"
+            ),
+        )
+        op.create_index(
+            "ix_account_period_balance_end",
+            "account_period_balance",
+            ["period_end"],
+        )
+    # snapshot diisi saat laporan buku besar/neraca pertama kali dibuka
+
+
+def downgrade():
+    op.drop_index(
+        "ix_account_period_balance_end", table_name="account_period_balance"
+    )
+    op.drop_table("account_period_balance")
@@ -0,0 +1,71 @@
+"""ensure unique (product_id, level_id) on product_price_level
+
+Import level harga memakai upsert pada pasangan ini. Database yang tabelnya
+dibuat di luar migrasi 8b7835f8c0f1 bisa belum punya constraint-nya; baris
+kembar dibersihkan dulu (id terbesar dipertahankan) lalu unique index dibuat.
+
+Revision ID: e1b3d5f7a9c0
+Revises: d0f2a4c6e8b9
+Create Date: 2026-10-17 23:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e1b3d5f7a9c0"
+down_revision = "d0f2a4c6e8b9"
+branch_labels = None
+depends_on = None
+
+KEY_COLUMNS = ["product_id", "level_id"]
+
+
+def _has_unique_key(inspector):
+    for constraint in inspector.get_unique_constraints("product_price_level"):
+        if sorted(constraint["column_names"]) == sorted(KEY_COLUMNS):
+            return True
+    for index in inspector.get_indexes("product_price_level"):
+        if index.get("unique") and sorted(index["column_names"]) == sorted(KEY_COLUMNS):
+            return True
+    return False
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "product_price_level" not in set(inspector.get_table_names()):
+        return
+    if _has_unique_key(inspector):
+        return
+    # subquery dibungkus agar MySQL mau DELETE dari tabel yang sama
+    op.execute(
+        """
+        DELETE FROM product_price_level
+        WHERE id NOT IN (
+            SELECT keep_id FROM (
+                SELECT MAX(id) AS keep_id FROM product_price_level
+                GROUP BY product_id, level_id
+            ) AS keep
+        )
+        """
+    )
+    op.create_index(
+        "uq_product_level_price", "product_price_level", KEY_COLUMNS, unique=True
+    )
+
+
+def downgrade():
+    # constraint asli dari 8b7835f8c0f1 tidak dihapus; hanya index buatan migrasi ini
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "product_price_level" not in set(inspector.get_table_names()):
+        return
+    names = {index["name"] for index in inspector.get_indexes("product_price_level")}
+    constraints = {
+        constraint["name"]
+        for constraint in inspector.get_unique_constraints("product_price_level")
+    }
+    if "uq_product_level_price" in names and "uq_product_level_price" not in constraints:
+        op.drop_index("uq_product_level_price", table_name="product_price_level")
@@ -0,0 +1,40 @@
+"""add app setting store
+
+Revision ID: e5a7c9d1f3b4
+Revises: d4f6b8c0e2a3
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e5a7c9d1f3b4"
+down_revision = "d4f6b8c0e2a3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+
+    if "app_setting" not in existing_tables:
+        op.create_table(
+            "app_setting",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("key", sa.String(length=100), nullable=False),
+            sa.Column("value", sa.Text(), nullable=True),
+            sa.Column("revision", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+            sa.Column("updated_by", sa.Integer(), nullable=True),
+            sa.ForeignKeyConstraint(["updated_by"], ["user.id"], ondelete="SET NULL"),
+            sa.UniqueConstraint("key"),
+        )
+    # nilai awal disalin dari .env/env saat aplikasi pertama kali menerima request
+
+
+def downgrade():
+    op.drop_table("app_setting")
@@ -0,0 +1,50 @@
+"""store unit cost (hpp_satuan) on detail_penjualan
+
+Rekap harian menambah HPP saat checkout dan menguranginya saat penjualan
+dihapus; keduanya (dan rebuild) harus memakai biaya yang sama. Baris lama
+diisi dari biaya produk saat ini, yang dulu juga dipakai rekap.
+
+Revision ID: f3a5c7e9b1d3
+Revises: e1b3d5f7a9c0
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f3a5c7e9b1d3"
+down_revision = "e1b3d5f7a9c0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {column["name"] for column in inspector.get_columns("detail_penjualan")}
+    if "hpp_satuan" not in columns:
+        with op.batch_alter_table("detail_penjualan") as batch_op:
+            batch_op.add_column(sa.Column("hpp_satuan", sa.Float(), nullable=True))
+    op.execute(
+        """
+        UPDATE detail_penjualan
+        SET hpp_satuan = (
+            SELECT COALESCE(
+                NULLIF(produk.harga_lama, 0),
+                NULLIF(produk.harga_beli, 0),
+                NULLIF(produk.harga, 0),
+                0
+            )
+            FROM produk
+            WHERE produk.id = detail_penjualan.produk_id
+        )
+        WHERE hpp_satuan IS NULL
+        """
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("detail_penjualan") as batch_op:
+        batch_op.drop_column("hpp_satuan")
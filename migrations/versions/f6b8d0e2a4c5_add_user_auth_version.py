@@ -0,0 +1,34 @@
+"""add user auth version stamp
+
+Revision ID: f6b8d0e2a4c5
+Revises: e5a7c9d1f3b4
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f6b8d0e2a4c5"
+down_revision = "e5a7c9d1f3b4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {column["name"] for column in inspector.get_columns("user")}
+    if "auth_version" not in columns:
+        with op.batch_alter_table("user") as batch_op:
+            batch_op.add_column(
+                sa.Column(
+                    "auth_version", sa.Integer(), nullable=False, server_default="1"
+                )
+            )
+
+
+def downgrade():
+    with op.batch_alter_table("user") as batch_op:
+        batch_op.drop_column("auth_version")
@@ -0,0 +1,77 @@
+from datetime import date
+
+from sqlalchemy import event
+
+from app import db
+from app.models import AccountingPeriod
+from app.services.accounting_config_service import (
+    LockedPeriod,
+    LockedPeriodIndex,
+    locked_period_for,
+)
+from tests.test_pos import (
+    _checkout_payload,
+    _create_customer,
+    _create_product,
+    _create_user,
+    _login,
+    _open_shift,
+)
+
+
+def test_locked_period_index_handles_overlaps():
+    index = LockedPeriodIndex(
+        [
+            LockedPeriod(1, "2020", date(2020, 1, 1), date(2020, 12, 31)),
+            LockedPeriod(2, "2020-03", date(2020, 3, 1), date(2020, 3, 31)),
+            LockedPeriod(3, "2021-02", date(2021, 2, 1), date(2021, 2, 28)),
+        ]
+    )
+    assert index.find(date(2020, 3, 15)).label == "2020-03"
+    assert index.find(date(2020, 6, 1)).label == "2020"
+    assert index.find(date(2021, 1, 15)) is None
+    assert index.find(date(2021, 2, 28)).label == "2021-02"
+    assert index.find(date(2019, 12, 31)) is None
+
+
+def test_checkout_reads_accounting_cache_without_queries(client, app):
+    with app.app_context():
+        kasir_id = _create_user().id
+        _open_shift(kasir_id)
+        customer_id = _create_customer().id
+        product_id = _create_product(stok=10).id
+        engine = db.engine
+
+    _login(client, kasir_id)
+    payload = _checkout_payload(customer_id, product_id, 1)
+    assert client.post("/api/penjualan", json=payload).status_code == 201
+
+    lookups = []
+
+    def _capture(_conn, _cursor, statement, *_args):
+        if "FROM accounting_setting" in statement or "FROM accounting_period" in statement:
+            lookups.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        assert client.post("/api/penjualan", json=payload).status_code == 201
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+    assert lookups == []
+
+    with app.app_context():
+        assert locked_period_for(date(2016, 5, 10)) is None
+        period = AccountingPeriod(
+            label="AC-2016-05",
+            start_date=date(2016, 5, 1),
+            end_date=date(2016, 5, 31),
+            status="closed",
+            is_locked=True,
+        )
+        db.session.add(period)
+        db.session.commit()
+        # revisi naik di transaksi yang sama, jadi indeks dimuat ulang
+        assert locked_period_for(date(2016, 5, 10)).label == "AC-2016-05"
+        db.session.delete(period)
+        db.session.commit()
+        assert locked_period_for(date(2016, 5, 10)) is None
@@ -0,0 +1,86 @@
+from sqlalchemy import event, update
+
+from app import db
+from app.models import AppSetting
+from app.services.settings_service import (
+    VERSION_KEY,
+    get_setting,
+    save_settings,
+    seed_settings_from_env,
+)
+from tests.test_pos import _create_user, _login
+
+
+def test_settings_saved_to_table_and_reloaded_on_revision_change(client, app):
+    with app.app_context():
+        admin_id = _create_user("admin").id
+        original = {
+            key: get_setting(key)
+            for key in ("SALES_INVOICE_PREFIX", "PURCHASE_INVOICE_PREFIX")
+        }
+
+    _login(client, admin_id)
+    client.get("/dashboard")  # request pertama menyalin env ke app_setting
+    response = client.post(
+        "/pengaturan/faktur-pajak",
+        data={
+            "sales_invoice_prefix": "fx",
+            "purchase_invoice_prefix": "px",
+            "default_sales_tax": "11",
+            "default_purchase_tax": "0",
+        },
+    )
+    assert response.status_code == 302
+
+    with app.app_context():
+        row = AppSetting.query.filter_by(key="SALES_INVOICE_PREFIX").one()
+        version = AppSetting.query.filter_by(key=VERSION_KEY).one()
+        assert row.value == "FX"
+        assert row.updated_by == admin_id
+        assert row.revision == version.revision
+        engine = db.engine
+    client.get("/pengaturan/faktur-pajak")  # cache worker ini memuat revisi baru
+
+    loads = []
+
+    def _capture(_conn, _cursor, statement, *_args):
+        if "app_setting" in statement and "app_setting.value" in statement:
+            loads.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        assert "FX" in client.get("/pengaturan/faktur-pajak").get_data(as_text=True)
+        assert loads == []  # revisi sama: tidak memuat ulang
+
+        # worker lain menyimpan perubahan: revisi naik, cache dimuat ulang
+        with app.app_context():
+            db.session.execute(
+                update(AppSetting)
+                .where(AppSetting.key == "SALES_INVOICE_PREFIX")
+                .values(value="GX")
+            )
+            db.session.execute(
+                update(AppSetting)
+                .where(AppSetting.key == VERSION_KEY)
+                .values(revision=AppSetting.revision + 1)
+            )
+            db.session.commit()
+        assert "GX" in client.get("/pengaturan/faktur-pajak").get_data(as_text=True)
+        assert len(loads) == 1
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+        with app.app_context():
+            save_settings({key: value or "" for key, value in original.items()})
+
+
+def test_seed_copies_env_values_once(app, monkeypatch):
+    monkeypatch.setenv("COMPANY_CITY", "Bandung")
+    with app.app_context():
+        AppSetting.query.delete()
+        db.session.commit()
+        assert seed_settings_from_env() is True
+        assert seed_settings_from_env() is False
+        assert AppSetting.query.filter_by(key="COMPANY_CITY").one().value == "Bandung"
+        assert get_setting("COMPANY_CITY") == "Bandung"
+        AppSetting.query.filter_by(key="COMPANY_CITY").delete()
+        db.session.commit()
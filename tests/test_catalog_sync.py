@@ -0,0 +1,130 @@
+from datetime import timedelta
+
+from sqlalchemy import func, insert, update
+
+from app import db
+from app.models import CatalogChange, Pelanggan, Produk
+from app.services.catalog_service import (
+    CATALOG_CUSTOMERS,
+    CATALOG_PRODUCTS,
+    compact_catalog_changes,
+    get_catalog_version,
+)
+from app.services.pos_snapshot import load_snapshot, refresh_snapshot
+from app.time_utils import local_now
+from tests.test_pos import (
+    _create_customer,
+    _create_product,
+    _create_user,
+    _login,
+    _unique,
+)
+
+
+def _log_row(row_id, entity_id, entity=CATALOG_CUSTOMERS):
+    db.session.execute(
+        insert(CatalogChange).values(
+            id=row_id,
+            entity=entity,
+            entity_id=entity_id,
+            op="upsert",
+            created_at=local_now(),
+        )
+    )
+
+
+def test_catalog_delta_includes_rows_committed_below_client_version(client, app):
+    with app.app_context():
+        user_id = _create_user().id
+        first_id = _create_customer().id
+        base = db.session.query(func.max(CatalogChange.id)).scalar()
+        # transaksi lain mendapat id lebih tinggi dan commit lebih dulu
+        _log_row(base + 10, first_id)
+        db.session.commit()
+
+    _login(client, user_id)
+    first = client.get(f"/api/pos/catalog/{CATALOG_CUSTOMERS}")
+    payload = first.get_json()
+    assert payload["version"] == base + 10
+    query = f"since={payload['version']}&window={payload['window']}"
+
+    with app.app_context():
+        # transaksi lama commit belakangan dengan id di bawah versi klien
+        code = _unique("LATE")
+        late_id = db.session.execute(
+            insert(Pelanggan).values(
+                pelanggan_id=code, nama=f"Pelanggan {code}", kontak="0811", alamat="-"
+            )
+        ).inserted_primary_key[0]
+        _log_row(base + 5, late_id)
+        db.session.commit()
+
+    late = client.get(
+        f"/api/pos/catalog/{CATALOG_CUSTOMERS}?{query}",
+        headers={"If-None-Match": first.headers["ETag"]},
+    )
+    assert late.status_code == 200
+    payload = late.get_json()
+    assert payload["mode"] == "delta"
+    assert payload["version"] == base + 10
+    assert late_id in [item["id"] for item in payload["items"]]
+
+    # tanpa commit terlambat baru, jendela tidak dibaca ulang
+    query = f"since={payload['version']}&window={payload['window']}"
+    quiet = client.get(f"/api/pos/catalog/{CATALOG_CUSTOMERS}?{query}")
+    assert quiet.get_json()["items"] == []
+    cached = client.get(
+        f"/api/pos/catalog/{CATALOG_CUSTOMERS}?{query}",
+        headers={"If-None-Match": late.headers["ETag"]},
+    )
+    assert cached.status_code == 304
+
+
+def test_pos_snapshot_applies_rows_committed_below_its_version(app):
+    with app.app_context():
+        product = _create_product()
+        base = db.session.query(func.max(CatalogChange.id)).scalar()
+        _log_row(base + 10, product.id, CATALOG_PRODUCTS)
+        db.session.commit()
+        snapshot = load_snapshot()
+        assert snapshot.state.version == base + 10
+
+        db.session.execute(
+            update(Produk).where(Produk.id == product.id).values(harga=777.0)
+        )
+        _log_row(base + 5, product.id, CATALOG_PRODUCTS)
+        db.session.commit()
+
+        snapshot = refresh_snapshot(snapshot)
+        assert snapshot.records[product.id].price == 777.0
+
+
+def test_compaction_keeps_latest_row_and_forces_full_resync(client, app):
+    with app.app_context():
+        user_id = _create_user().id
+        _create_customer()
+        old_version = get_catalog_version(CATALOG_CUSTOMERS)
+        _create_customer()
+        version = get_catalog_version(CATALOG_CUSTOMERS)
+        db.session.execute(
+            update(CatalogChange)
+            .where(CatalogChange.entity == CATALOG_CUSTOMERS)
+            .values(created_at=local_now() - timedelta(days=40))
+        )
+        db.session.commit()
+
+        assert compact_catalog_changes(30) > 0
+        db.session.commit()
+        assert get_catalog_version(CATALOG_CUSTOMERS) == version
+        assert (
+            db.session.query(func.count(CatalogChange.id))
+            .filter(CatalogChange.entity == CATALOG_CUSTOMERS)
+            .scalar()
+            == 1
+        )
+
+    _login(client, user_id)
+    stale = client.get(f"/api/pos/catalog/{CATALOG_CUSTOMERS}?since={old_version}")
+    assert stale.get_json()["mode"] == "full"
+    current = client.get(f"/api/pos/catalog/{CATALOG_CUSTOMERS}?since={version}")
+    assert current.get_json()["mode"] == "delta"
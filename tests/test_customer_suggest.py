@@ -0,0 +1,74 @@
+from sqlalchemy import event
+
+from app import db
+from app.models import Pelanggan
+from app.services.customer_service import customer_stats
+from tests.test_pos import _create_customer, _create_user, _login, _unique
+
+
+def _count_statements(engine, func):
+    counts = []
+
+    def _capture(_conn, _cursor, statement, *_args):
+        if "count(" in statement.lower():
+            counts.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        result = func()
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+    return result, counts
+
+
+def test_customer_suggest_uses_keyset_cursor_without_count(client, app):
+    marker = _unique("Keyset")
+    with app.app_context():
+        user_id = _create_user("admin").id
+        # nama sama untuk sebagian baris: cursor harus memakai id sebagai pemecah
+        names = [f"{marker} A"] * 3 + [f"{marker} B, Jr"] * 2 + [f"{marker} C"] * 2
+        for index, name in enumerate(names):
+            db.session.add(
+                Pelanggan(
+                    pelanggan_id=f"{marker}-{index}", nama=name, kontak="0812", alamat="-"
+                )
+            )
+        db.session.commit()
+        engine = db.engine
+
+    _login(client, user_id)
+    response, counts = _count_statements(
+        engine, lambda: client.get(f"/api/pelanggan/suggest?q={marker}&per_page=5")
+    )
+    first = response.get_json()
+    assert counts == []
+    assert len(first["customers"]) == 5
+    assert first["has_next"] is True
+    assert first["next_after"].startswith(f"{marker} B, Jr,")
+
+    second = client.get(
+        "/api/pelanggan/suggest",
+        query_string={"q": marker, "per_page": 5, "after": first["next_after"]},
+    ).get_json()
+    assert [item["nama"] for item in second["customers"]] == [f"{marker} C"] * 2
+    assert second["has_next"] is False
+    seen = {item["id"] for item in first["customers"] + second["customers"]}
+    assert len(seen) == len(names)
+
+
+def test_customer_page_stats_cached_until_customer_write(client, app):
+    with app.app_context():
+        user_id = _create_user("admin").id
+        _create_customer()
+        engine = db.engine
+
+    _login(client, user_id)
+    assert client.get("/pelanggan").status_code == 200
+    response, counts = _count_statements(engine, lambda: client.get("/pelanggan"))
+    assert response.status_code == 200
+    assert counts == []
+
+    with app.app_context():
+        before = customer_stats().total
+        _create_customer()
+        assert customer_stats().total == before + 1
@@ -0,0 +1,46 @@
+from sqlalchemy import create_engine, text
+
+from app.config_db import resolve_engine_options
+from app.db_pool import TimedQueuePool, pool_status
+from tests.test_pos import _create_user, _login
+
+
+def test_engine_options_per_backend_with_env_override(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "12")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "0")
+    mysql = resolve_engine_options("mysql+pymysql://u:p@db:3306/pos")
+    assert mysql["pool_size"] == 12
+    assert mysql["pool_pre_ping"] is False
+    assert mysql["pool_recycle"] == 280
+    assert mysql["poolclass"] is TimedQueuePool
+
+    monkeypatch.delenv("DB_POOL_SIZE")
+    monkeypatch.delenv("DB_POOL_PRE_PING")
+    postgres = resolve_engine_options("postgresql://u:p@db/pos")
+    assert postgres["pool_pre_ping"] is True
+    mariadb = resolve_engine_options("mariadb+pymysql://u:p@db:3306/pos")
+    assert mariadb["pool_pre_ping"] is True
+    assert mariadb["pool_recycle"] == 280
+    assert mariadb["poolclass"] is TimedQueuePool
+    assert resolve_engine_options("sqlite:///:memory:") == {}
+
+
+def test_pool_status_tracks_checkouts(tmp_path, client, app):
+    options = resolve_engine_options(f"sqlite:///{tmp_path / 'pool.db'}")
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", **options)
+    with engine.connect() as first, engine.connect() as second:
+        first.execute(text("SELECT 1"))
+        second.execute(text("SELECT 1"))
+        status = pool_status(engine)
+        assert status["checked_out"] == 2
+    status = pool_status(engine)
+    assert status["checked_out"] == 0
+    assert status["wait"]["checkouts"] == 2
+    assert status["wait"]["timeouts"] == 0
+    engine.dispose()
+
+    with app.app_context():
+        admin_id = _create_user("admin").id
+    _login(client, admin_id)
+    page = client.get("/status").get_data(as_text=True)
+    assert "Pool koneksi database" in page
@@ -0,0 +1,74 @@
+from datetime import datetime
+
+from app import db
+from app.services.document_number_service import (
+    DOCUMENT_JOURNAL,
+    DOCUMENT_QUOTATION,
+    DOCUMENT_SALES_INVOICE,
+    allocate_document_number,
+    allocate_document_numbers,
+    claim_document_number,
+    preview_document_number,
+)
+
+WHEN = datetime(2026, 10, 17, 9, 30)
+
+
+def test_allocate_is_sequential_per_prefix_and_period(app):
+    with app.app_context():
+        first = allocate_document_number(DOCUMENT_JOURNAL, prefix="TSA", when=WHEN)
+        batch = allocate_document_numbers(DOCUMENT_JOURNAL, 3, prefix="TSA", when=WHEN)
+        other = allocate_document_number(DOCUMENT_JOURNAL, prefix="TSB", when=WHEN)
+        next_day = allocate_document_number(
+            DOCUMENT_JOURNAL, prefix="TSA", when=datetime(2026, 10, 18)
+        )
+        db.session.commit()
+
+    assert first == "TSA20261017-0001"
+    assert batch == ["TSA20261017-0002", "TSA20261017-0003", "TSA20261017-0004"]
+    assert other == "TSB20261017-0001"
+    assert next_day == "TSA20261018-0001"
+
+
+def test_rollback_releases_allocated_number(app):
+    with app.app_context():
+        allocate_document_number(DOCUMENT_QUOTATION, prefix="TQR", when=WHEN)
+        db.session.rollback()
+        assert (
+            allocate_document_number(DOCUMENT_QUOTATION, prefix="TQR", when=WHEN)
+            == "TQR20261017-0001"
+        )
+        db.session.commit()
+
+
+def test_preview_and_claim_advance_sequence(app):
+    with app.app_context():
+        preview = preview_document_number(DOCUMENT_SALES_INVOICE, prefix="TF", when=WHEN)
+        assert preview == "TF20261017-0001"
+        # pratinjau tidak memesan nomor
+        assert preview_document_number(DOCUMENT_SALES_INVOICE, prefix="TF", when=WHEN) == preview
+
+        assert claim_document_number(DOCUMENT_SALES_INVOICE, preview, prefix="TF", when=WHEN)
+        assert not claim_document_number(
+            DOCUMENT_SALES_INVOICE, "CUSTOM-77", prefix="TF", when=WHEN
+        )
+        assert (
+            allocate_document_number(DOCUMENT_SALES_INVOICE, prefix="TF", when=WHEN)
+            == "TF20261017-0002"
+        )
+        db.session.commit()
+
+
+def test_custom_format_from_env(app, monkeypatch):
+    monkeypatch.setenv("DOCUMENT_NUMBER_FORMAT_QUOTATION", "{prefix}/{period}/{seq:05d}")
+    monkeypatch.setenv("DOCUMENT_PERIOD_FORMAT_QUOTATION", "%Y%m")
+    with app.app_context():
+        number = allocate_document_number(DOCUMENT_QUOTATION, prefix="TQM", when=WHEN)
+        assert claim_document_number(
+            DOCUMENT_QUOTATION, "TQM/202610/00005", prefix="TQM", when=WHEN
+        )
+        following = allocate_document_number(DOCUMENT_QUOTATION, prefix="TQM", when=WHEN)
+        db.session.commit()
+
+    assert number == "TQM/202610/00001"
+    assert following == "TQM/202610/00006"
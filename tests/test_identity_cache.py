@@ -0,0 +1,103 @@
+from sqlalchemy import event
+
+from app import db
+from app.models import User
+from tests.test_pos import _create_user, _login
+
+
+def test_identity_cached_without_query_or_cookie_rewrite(client, app):
+    with app.app_context():
+        user = _create_user("admin")
+        user_id, version = user.id, user.auth_version
+        engine = db.engine
+
+    _login(client, user_id)
+    first = client.get("/status")
+    assert first.status_code == 200
+    # session lama tanpa stamp dilengkapi sekali
+    assert "Set-Cookie" in first.headers
+    with client.session_transaction() as sess:
+        assert sess["auth_version"] == version
+        assert sess["role"] == "admin"
+
+    lookups = []
+
+    def _capture(_conn, _cursor, statement, *_args):
+        if 'FROM "user"' in statement or "FROM user" in statement:
+            lookups.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        response = client.get("/status")
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+    assert response.status_code == 200
+    assert "Set-Cookie" not in response.headers
+    assert lookups == []
+
+    # perubahan role menaikkan stamp; session diperbarui di request berikutnya
+    with app.app_context():
+        user = db.session.get(User, user_id)
+        user.role = "kasir"
+        db.session.commit()
+        assert user.auth_version == version + 1
+
+    response = client.get("/status")
+    assert response.status_code in (302, 403)
+    assert "Set-Cookie" in response.headers
+    with client.session_transaction() as sess:
+        assert sess["role"] == "kasir"
+        assert sess["auth_version"] == version + 1
+
+
+def test_deleted_user_is_logged_out(client, app):
+    with app.app_context():
+        user_id = _create_user().id
+    _login(client, user_id)
+    assert client.get("/penjualan").status_code == 200
+
+    with app.app_context():
+        db.session.delete(db.session.get(User, user_id))
+        db.session.commit()
+
+    response = client.get("/penjualan")
+    assert response.status_code == 302
+    with client.session_transaction() as sess:
+        assert "user_id" not in sess
+
+
+def test_password_change_signs_out_other_sessions(client, app):
+    with app.app_context():
+        user = _create_user("admin")
+        user_id, username, email = user.id, user.username, user.email
+    other = app.test_client()
+    for browser in (client, other):
+        _login(browser, user_id)
+        assert browser.get("/status").status_code == 200
+
+    response = client.post(
+        "/profile",
+        data={
+            "username": username,
+            "email": email,
+            "current_password": "secret123",
+            "new_password": "rahasia-baru-123",
+            "confirm_password": "rahasia-baru-123",
+        },
+    )
+    assert response.status_code == 302
+
+    # session yang mengganti password tetap login, session lain harus login ulang
+    assert client.get("/status").status_code == 200
+    response = other.get("/status")
+    assert response.status_code == 302
+    with other.session_transaction() as sess:
+        assert "user_id" not in sess
+
+    # reset password (tanpa session) juga mengeluarkan session yang ada
+    with app.app_context():
+        db.session.get(User, user_id).password = "reset-hash"
+        db.session.commit()
+    assert client.get("/status").status_code == 302
+    with client.session_transaction() as sess:
+        assert "user_id" not in sess
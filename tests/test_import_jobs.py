@@ -0,0 +1,187 @@
+import io
+from datetime import timedelta
+
+import pandas as pd
+
+from app import db
+from app.models import ImportJob, Produk, Supplier
+from app.services import import_service
+from app.services.import_jobs import STALE_ERROR, _finish, run_import_job
+from app.time_utils import local_now
+from tests.test_pos import _create_product, _create_user, _login, _unique
+
+JSON_HEADERS = {"Accept": "application/json"}
+
+
+def _xlsx(rows):
+    buffer = io.BytesIO()
+    pd.DataFrame(rows).to_excel(buffer, index=False)
+    buffer.seek(0)
+    return buffer
+
+
+def _product_row(kode, nama, satuan, kategori, supplier):
+    return {
+        "Kode Produk": kode,
+        "SKU": None,
+        "Nama Produk": nama,
+        "Satuan ID": satuan,
+        "Kategori ID": kategori,
+        "Supplier ID": supplier,
+        "Berat": None,
+        "Stok Minimal": None,
+        "Tanggal Expired": None,
+    }
+
+
+def _upload(client, url, rows, filename="import.xlsx", **form):
+    data = {**form, "file": (_xlsx(rows), filename)}
+    return client.post(url, data=data, headers=JSON_HEADERS, content_type="multipart/form-data")
+
+
+def test_product_import_runs_as_job_and_reports_result(client, app):
+    with app.app_context():
+        user_id = _create_user(role="gudang").id
+        other_id = _create_user(role="gudang").id
+        product = _create_product()
+        refs = (product.satuan_id, product.kategori_id, product.supplier_id)
+        code = _unique("JOB")
+
+    _login(client, user_id)
+    response = _upload(
+        client,
+        "/produk/import",
+        [
+            _product_row(code, "Produk dari job", *refs),
+            _product_row(_unique("JOB"), "Satuan salah", 999999, *refs[1:]),
+        ],
+    )
+    assert response.status_code == 202
+    started = response.get_json()
+
+    status = client.get(started["status_url"]).get_json()
+    assert status["status"] == "done", status["error"]
+    assert status["done"] is True
+    assert status["progress"] == 100
+    assert status["summary"]["created"] == 1
+    assert [note.split(":")[0] for note in status["summary"]["skipped_notes"]] == ["Baris 3"]
+
+    result = client.get(started["result_url"])
+    assert result.status_code == 302
+    assert result.headers["Location"].endswith("/produk")
+    with client.session_transaction() as session:
+        messages = [message for _, message in session.get("_flashes", [])]
+    assert any("1 produk baru" in message for message in messages)
+
+    with app.app_context():
+        assert Produk.query.filter_by(kode_produk=code).one().nama_produk == "Produk dari job"
+
+    _login(client, other_id)
+    assert client.get(started["status_url"]).status_code == 404
+
+
+def test_failed_stock_opname_job_keeps_error_and_notes(client, app):
+    with app.app_context():
+        user_id = _create_user(role="admin").id
+        product = _create_product(stok=4)
+        product_id, code = product.id, product.kode_produk
+
+    _login(client, user_id)
+    response = _upload(
+        client,
+        "/stok-opname/import",
+        [
+            {"Kode Produk": code, "Qty Fisik": 6},
+            {"Kode Produk": _unique("NOPE"), "Qty Fisik": 1},
+        ],
+        location="Gudang A",
+    )
+    assert response.status_code == 202
+    status = client.get(response.get_json()["status_url"]).get_json()
+
+    assert status["status"] == "failed"
+    assert status["error"].startswith("Gagal import stok opname")
+    assert status["summary"]["notes"]
+    assert "Baris 3" in status["summary"]["notes"][0]
+    with app.app_context():
+        job = db.session.get(ImportJob, status["id"])
+        assert job.finished_at is not None
+        assert db.session.get(Produk, product_id).stok_lama == 4
+
+
+def test_import_without_file_content_is_rejected(client, app):
+    with app.app_context():
+        user_id = _create_user(role="admin").id
+    _login(client, user_id)
+    response = client.post(
+        "/supplier/import",
+        data={"file": (io.BytesIO(b""), "kosong.xlsx")},
+        headers=JSON_HEADERS,
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 400
+    assert "kosong" in response.get_json()["error"]
+
+
+def test_job_without_heartbeat_is_marked_failed(client, app, tmp_path):
+    with app.app_context():
+        user_id = _create_user(role="admin").id
+        long_ago = local_now() - timedelta(hours=2)
+        jobs = {
+            "dead": ImportJob(kind="produk", status="running", created_by=user_id,
+                              created_at=long_ago, started_at=long_ago, updated_at=long_ago),
+            "alive": ImportJob(kind="produk", status="running", created_by=user_id,
+                               created_at=long_ago, started_at=long_ago, updated_at=local_now()),
+            "queued": ImportJob(kind="produk", status="queued", created_by=user_id,
+                                created_at=long_ago),
+        }
+        db.session.add_all(jobs.values())
+        db.session.commit()
+        ids = {name: job.id for name, job in jobs.items()}
+
+    _login(client, user_id)
+    statuses = {
+        name: client.get(f"/api/import-jobs/{job_id}").get_json()
+        for name, job_id in ids.items()
+    }
+    assert statuses["dead"]["status"] == "failed"
+    assert statuses["dead"]["done"] is True
+    assert statuses["dead"]["error"] == STALE_ERROR
+    assert statuses["alive"]["status"] == "running"
+    assert statuses["queued"]["status"] == "failed"
+
+    # worker yang baru kebagian job basi tidak menjalankannya lagi
+    upload = tmp_path / "basi.xlsx"
+    upload.write_bytes(b"")
+    run_import_job(app, ids["queued"], str(upload))
+    with app.app_context():
+        assert db.session.get(ImportJob, ids["queued"]).status == "failed"
+    assert not upload.exists()
+
+    # worker lama yang ternyata masih hidup tidak menimpa status gagal
+    with app.app_context():
+        assert _finish(ids["dead"], "done", {"created": 1}) is False
+        job = db.session.get(ImportJob, ids["dead"])
+        assert (job.status, job.error) == ("failed", STALE_ERROR)
+
+
+def test_row_import_commits_per_batch_so_heartbeat_can_be_written(app, tmp_path, monkeypatch):
+    monkeypatch.setattr(import_service, "ROW_BATCH", 2)
+    prefix = _unique("SupBatch")
+    path = tmp_path / "supplier.xlsx"
+    pd.DataFrame(
+        [{"Nama Supplier": f"{prefix}-{n}", "Alamat": "Jl. Batch"} for n in range(5)]
+    ).to_excel(path, index=False)
+    checkpoints = []
+
+    def _progress(value, message):
+        connection = db.session.connection().connection.dbapi_connection
+        checkpoints.append(connection.in_transaction)
+
+    with app.app_context():
+        summary = import_service.run_supplier_import(
+            str(path), "supplier.xlsx", progress_cb=_progress
+        )
+        assert summary["created"] == 5
+        assert checkpoints and not any(checkpoints)
+        assert Supplier.query.filter(Supplier.name.like(f"{prefix}-%")).count() == 5
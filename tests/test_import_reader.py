@@ -0,0 +1,108 @@
+import pandas as pd
+import pytest
+
+from app import db
+from app.models import Produk
+from app.services.import_reader import ImportChunks
+from app.services.import_service import import_product_chunks
+from tests.test_pos import _create_product, _unique
+from tests.test_product_import import _row
+
+
+def test_xlsx_chunks_keep_row_numbers_and_drop_trailing_blank_rows(tmp_path):
+    from openpyxl import Workbook
+
+    path = tmp_path / "opname.xlsx"
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Kode Produk", "Qty Fisik", None])
+    for row in (["A1", 3], ["A2", 4], [None, None], ["A4", "7"], ["A5", 1.5], [None], [None]):
+        sheet.append(row)
+    workbook.save(path)
+
+    reader = ImportChunks(str(path), "opname.xlsx", chunk_rows=2)
+    assert reader.columns == ["Kode Produk", "Qty Fisik"]
+    chunks = list(reader)
+
+    assert [list(chunk.index) for chunk in chunks] == [[0, 1], [2, 3], [4]]
+    combined = pd.concat(chunks)
+    expected = pd.read_excel(path)
+    assert combined["Kode Produk"].tolist()[:2] == expected["Kode Produk"].tolist()[:2]
+    assert len(combined.index) == len(expected.index)
+    assert combined.loc[3, "Qty Fisik"] == "7"
+
+
+def test_csv_chunks_sniff_separator_and_handle_header_only(tmp_path):
+    path = tmp_path / "opname.csv"
+    path.write_text("Kode;Qty Fisik\n" + "".join(f"K{idx};{idx}\n" for idx in range(5)))
+    reader = ImportChunks(str(path), "opname.csv", allow_csv=True, chunk_rows=2)
+    assert reader.columns == ["Kode", "Qty Fisik"]
+    assert reader.total_rows == 5
+    chunks = list(reader)
+    assert [len(chunk.index) for chunk in chunks] == [2, 2, 1]
+    assert chunks[-1].index.tolist() == [4]
+
+    header_only = tmp_path / "kosong.csv"
+    header_only.write_text("Kode,Qty Fisik\n")
+    reader = ImportChunks(str(header_only), "kosong.csv", allow_csv=True)
+    assert reader.columns == ["Kode", "Qty Fisik"]
+    assert list(reader) == []
+
+    with pytest.raises(ValueError, match="Gagal membaca file"):
+        ImportChunks(str(path), "opname.xlsx")
+
+
+def test_product_import_chunks_share_state_across_chunks(app):
+    with app.app_context():
+        product = _create_product()
+        refs = (product.satuan_id, product.kategori_id, product.supplier_id)
+        code, sku = _unique("CHK"), _unique("SKU-CHK")
+        first = pd.DataFrame([_row(code, sku, "Potongan satu", *refs)], index=[0])
+        second = pd.DataFrame(
+            [
+                _row(code, None, "Kode sama di potongan dua", *refs),
+                _row(_unique("CHK"), sku, "SKU sama di potongan dua", *refs),
+            ],
+            index=[1, 2],
+        )
+
+        summary = import_product_chunks(first.columns, [first, second], total_rows=3)
+
+        assert summary["created"] == 2
+        assert summary["skipped_notes"] == [
+            f"Baris 3: Kode Produk {code} duplikat di file, dilewati.",
+            f"Baris 4: SKU {sku} sudah dipakai produk lain.",
+        ]
+        created = db.session.execute(
+            db.select(Produk).where(Produk.kode_produk == code)
+        ).scalar_one()
+        assert created.nama_produk == "Potongan satu"
+        assert created.sku == sku
+
+
+def test_product_import_writes_only_after_last_chunk(app):
+    with app.app_context():
+        product = _create_product()
+        refs = (product.satuan_id, product.kategori_id, product.supplier_id)
+        old_sku, moved_sku = product.sku, _unique("SKU-PINDAH")
+        new_code = _unique("CHK")
+        first = pd.DataFrame(
+            [_row(product.kode_produk, moved_sku, None, *refs)], index=[0]
+        )
+        # SKU lama dilepas di potongan satu, jadi boleh diklaim produk baru
+        second = pd.DataFrame([_row(new_code, old_sku, "Ambil SKU lama", *refs)], index=[1])
+
+        def chunks():
+            yield first
+            # belum ada yang ditulis (dan tidak ada kunci tulis) selama file dibaca
+            assert not db.session.connection().connection.dbapi_connection.in_transaction
+            assert db.session.get(Produk, product.id).sku == old_sku
+            yield second
+
+        summary = import_product_chunks(first.columns, chunks(), total_rows=2)
+
+        assert (summary["created"], summary["updated"]) == (1, 1)
+        assert summary["skipped_notes"] == []
+        db.session.expire_all()
+        assert db.session.get(Produk, product.id).sku == moved_sku
+        assert Produk.query.filter_by(kode_produk=new_code).one().sku == old_sku
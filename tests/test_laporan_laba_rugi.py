@@ -0,0 +1,180 @@
+from contextlib import contextmanager
+from datetime import date
+
+import pytest
+from flask import template_rendered
+
+from app import db
+from app.models import DetailPenjualan, Penjualan
+from app.services.sales_summary_service import rebuild_sales_summary
+from benchmarks.bench_laba_rugi import legacy_profit_loss
+from tests.test_pos import _create_customer, _create_product, _create_user, _login, _unique
+
+START = date(2020, 3, 1)
+END = date(2020, 4, 30)
+
+
+@contextmanager
+def _captured_context(app):
+    recorded = []
+
+    def record(_sender, template, context, **_extra):
+        recorded.append(context)
+
+    template_rendered.connect(record, app)
+    try:
+        yield recorded
+    finally:
+        template_rendered.disconnect(record, app)
+
+
+def _seed_sales(user_id):
+    customer_id = _create_customer().id
+    products = [_create_product(harga=harga) for harga in (12000.0, 8000.0, 20000.0)]
+    lines = [
+        (date(2020, 3, 2), 0.0, [(0, 2, 12000.0, 0, 0), (1, 1, 8000.0, 10, 11)]),
+        (date(2020, 3, 2), 1500.0, [(2, 3, 19000.0, 5, 0)]),
+        (date(2020, 3, 15), 0.0, [(1, 4, 7500.0, 0, 11), (0, 1, 12000.0, 0, 0)]),
+        (date(2020, 4, 9), 500.0, [(2, 1, 20000.0, 0, 0), (1, 2, 8000.0, 0, 0)]),
+    ]
+    for sale_date, marketplace_cost, items in lines:
+        sale = Penjualan(
+            no_faktur=_unique("PL"),
+            tanggal_penjualan=sale_date,
+            sales_id=user_id,
+            pelanggan_id=customer_id,
+            total_harga=0.0,
+            marketplace_cost_total=marketplace_cost,
+            payment_method="Tunai",
+        )
+        db.session.add(sale)
+        db.session.flush()
+        for product_idx, qty, price, discount, tax in items:
+            line_total = price * qty * (1 - discount / 100.0) * (1 + tax / 100.0)
+            sale.total_harga += line_total
+            db.session.add(
+                DetailPenjualan(
+                    penjualan_id=sale.id,
+                    produk_id=products[product_idx].id,
+                    jumlah=qty,
+                    harga_satuan=price,
+                    diskon=discount,
+                    pajak=tax,
+                    harga_total=line_total,
+                )
+            )
+    # biaya produk berubah setelah penjualan; tanpa hpp_satuan kedua versi
+    # memakai biaya terkini
+    products[1].harga_lama = 5500.0
+    db.session.flush()
+    rebuild_sales_summary(START, END)
+    db.session.commit()
+
+
+def test_laba_rugi_matches_legacy_implementation(client, app):
+    with app.app_context():
+        user_id = _create_user(role="admin").id
+        _seed_sales(user_id)
+        expected = legacy_profit_loss(START, END)
+
+    _login(client, user_id)
+    with _captured_context(app) as contexts:
+        response = client.get(
+            f"/laporan/laba-rugi?start_date={START.isoformat()}&end_date={END.isoformat()}"
+        )
+    assert response.status_code == 200
+    context = contexts[-1]
+
+    for key, value in expected["totals"].items():
+        assert context["totals"][key] == pytest.approx(value), key
+    assert [
+        {key: point[key] for key in ("date", "revenue", "gross")}
+        for point in context["daily_points"]
+    ] == expected["daily_points"]
+    for key in ("monthly_breakdown", "top_products"):
+        assert len(context[key]) == len(expected[key]), key
+        for got, want in zip(context[key], expected[key]):
+            assert got == pytest.approx(want), key
+
+
+def _seed_sale_with_unit_cost(user_id, sale_date, qty, price, unit_cost, current_cost):
+    product = _create_product(harga=price)
+    sale = Penjualan(
+        no_faktur=_unique("PL"),
+        tanggal_penjualan=sale_date,
+        sales_id=user_id,
+        pelanggan_id=_create_customer().id,
+        total_harga=price * qty,
+        payment_method="Tunai",
+    )
+    db.session.add(sale)
+    db.session.flush()
+    db.session.add(
+        DetailPenjualan(
+            penjualan_id=sale.id,
+            produk_id=product.id,
+            jumlah=qty,
+            harga_satuan=price,
+            diskon=0,
+            pajak=0,
+            harga_total=price * qty,
+            hpp_satuan=unit_cost,
+        )
+    )
+    # biaya produk berubah sesudah penjualan
+    product.harga_lama = product.harga_beli = current_cost
+    db.session.commit()
+    return product
+
+
+def test_closing_hpp_uses_same_cost_basis_as_laba_rugi(client, app):
+    day = date(2019, 5, 10)
+    with app.app_context():
+        user_id = _create_user(role="admin").id
+        _seed_sale_with_unit_cost(user_id, day, 2, 10000.0, 4000.0, 9999.0)
+
+    _login(client, user_id)
+    query = f"start_date={day.isoformat()}&end_date={day.isoformat()}"
+    with _captured_context(app) as contexts:
+        assert client.get(f"/laporan/laba-rugi?{query}").status_code == 200
+        assert client.get(f"/tutup-buku?{query}").status_code == 200
+    report, closing = contexts[0], contexts[-1]
+
+    assert report["totals"]["cogs"] == pytest.approx(8000.0)
+    assert closing["summary"]["hpp_total"] == pytest.approx(8000.0)
+    assert closing["summary"]["net_income"] == pytest.approx(12000.0)
+
+
+def test_laba_rugi_uses_checkout_unit_cost_over_current_cost(client, app):
+    day = date(2019, 7, 3)
+    with app.app_context():
+        user_id = _create_user(role="admin").id
+        recorded = _seed_sale_with_unit_cost(user_id, day, 2, 10000.0, 4000.0, 9000.0)
+        # baris lama tanpa hpp_satuan tetap memakai biaya produk terkini
+        legacy = _seed_sale_with_unit_cost(user_id, day, 1, 6000.0, None, 5000.0)
+        rebuild_sales_summary(day, day)
+        db.session.commit()
+        recorded_name, legacy_name = recorded.nama_produk, legacy.nama_produk
+        legacy_cogs = legacy_profit_loss(day, day)["totals"]["cogs"]
+
+    _login(client, user_id)
+    with _captured_context(app) as contexts:
+        response = client.get(
+            f"/laporan/laba-rugi?start_date={day.isoformat()}&end_date={day.isoformat()}"
+        )
+    assert response.status_code == 200
+    context = contexts[-1]
+
+    # implementasi lama menilai ulang baris pertama dengan biaya 9000
+    assert legacy_cogs == pytest.approx(23000.0)
+    assert context["totals"]["gross_revenue"] == pytest.approx(26000.0)
+    assert context["totals"]["cogs"] == pytest.approx(13000.0)
+    assert context["totals"]["gross_profit"] == pytest.approx(13000.0)
+    assert [
+        {key: point[key] for key in ("date", "revenue", "gross")}
+        for point in context["daily_points"]
+    ] == [{"date": day.isoformat(), "revenue": 26000.0, "gross": 13000.0}]
+    assert [(item["name"], item["gross"]) for item in context["top_products"]] == [
+        (recorded_name, 12000.0),
+        (legacy_name, 1000.0),
+    ]
@@ -0,0 +1,147 @@
+from datetime import date
+
+from sqlalchemy import func, or_
+
+from app import db
+from app.models import (
+    Account,
+    AccountingPeriod,
+    AccountPeriodBalance,
+    JournalEntry,
+    JournalLine,
+)
+from app.services.ledger_service import (
+    account_net_movements,
+    opening_balance,
+    refresh_account_period_balances,
+)
+from tests.test_pos import _create_user, _login, _unique
+
+
+def _account(kind):
+    code = _unique("L")[:20]
+    account = Account(code=code, name=f"Akun {code}", type=kind)
+    db.session.add(account)
+    db.session.flush()
+    return account
+
+
+def _journal(day, debit_account, credit_account, amount, memo=None):
+    entry = JournalEntry(reference=_unique("JL"), date=day, memo=memo)
+    db.session.add(entry)
+    db.session.flush()
+    db.session.add_all(
+        [
+            JournalLine(entry_id=entry.id, account_id=debit_account.id, debit=amount, credit=0.0),
+            JournalLine(entry_id=entry.id, account_id=credit_account.id, debit=0.0, credit=amount),
+        ]
+    )
+    db.session.flush()
+    return entry
+
+
+def _scan_net(account_id, start=None, end=None, exclude_adjustments=False):
+    query = (
+        db.session.query(func.coalesce(func.sum(JournalLine.debit - JournalLine.credit), 0.0))
+        .join(JournalEntry, JournalLine.entry_id == JournalEntry.id)
+        .filter(JournalLine.account_id == account_id)
+    )
+    if start:
+        query = query.filter(JournalEntry.date >= start)
+    if end:
+        query = query.filter(JournalEntry.date <= end)
+    if exclude_adjustments:
+        query = query.filter(
+            or_(JournalEntry.memo.is_(None), ~JournalEntry.memo.ilike("Penyesuaian%"))
+        )
+    return float(query.scalar() or 0.0)
+
+
+def _snapshot(account_id, label):
+    return (
+        AccountPeriodBalance.query.join(AccountingPeriod)
+        .filter(AccountingPeriod.label == label)
+        .filter(AccountPeriodBalance.account_id == account_id)
+        .one()
+    )
+
+
+def test_snapshots_match_full_scan_and_go_stale_on_backdated_journal(app):
+    with app.app_context():
+        cash = _account("asset")
+        equity = _account("equity")
+        _journal(date(2019, 1, 5), cash, equity, 1000.0)
+        _journal(date(2019, 1, 31), cash, equity, 250.0, memo="Penyesuaian stok")
+        _journal(date(2019, 2, 10), equity, cash, 300.0)
+        _journal(date(2019, 3, 3), cash, equity, 75.0)
+        for label, start, end in (
+            ("LB-2019-01", date(2019, 1, 1), date(2019, 1, 31)),
+            ("LB-2019-02", date(2019, 2, 1), date(2019, 2, 28)),
+        ):
+            db.session.add(AccountingPeriod(label=label, start_date=start, end_date=end))
+        # periode baru dihitung saat commit; tidak ada yang tersisa untuk refresh
+        db.session.commit()
+        assert refresh_account_period_balances() == 0
+        snapshot = _snapshot(cash.id, "LB-2019-02")
+        assert snapshot.closing_balance == 950.0
+        assert snapshot.closing_adjustment == 250.0
+        assert (snapshot.debit, snapshot.credit) == (0.0, 300.0)
+
+        assert opening_balance(cash.id, date(2019, 3, 10)) == _scan_net(
+            cash.id, end=date(2019, 3, 9)
+        )
+        movements = account_net_movements(
+            date(2019, 1, 15), date(2019, 3, 31), exclude_adjustments=True
+        )
+        assert movements[cash.id] == _scan_net(
+            cash.id, date(2019, 1, 15), date(2019, 3, 31), exclude_adjustments=True
+        )
+
+        # jurnal mundur tanggal membuat snapshot Januari & Februari basi;
+        # transaksi penulisnya menghitung ulang sebelum commit
+        _journal(date(2019, 1, 20), cash, equity, 40.0)
+        assert AccountPeriodBalance.query.filter_by(
+            account_id=cash.id, is_stale=True
+        ).count() == 2
+        db.session.commit()
+        assert AccountPeriodBalance.query.filter_by(
+            account_id=cash.id, is_stale=True
+        ).count() == 0
+        assert opening_balance(cash.id, date(2019, 3, 10)) == 1065.0
+        assert _snapshot(cash.id, "LB-2019-01").closing_balance == 1290.0
+
+
+def test_ledger_reports_use_snapshots(client, app):
+    with app.app_context():
+        admin_id = _create_user("admin").id
+        cash = _account("asset")
+        equity = _account("equity")
+        _journal(date(2018, 5, 2), cash, equity, 500.0)
+        _journal(date(2018, 6, 15), cash, equity, 125.0)
+        db.session.add(
+            AccountingPeriod(
+                label="LB-2018-05", start_date=date(2018, 5, 1), end_date=date(2018, 5, 31)
+            )
+        )
+        db.session.commit()
+        cash_id, cash_code = cash.id, cash.code
+        assert _snapshot(cash_id, "LB-2018-05").closing_balance == 500.0
+        # snapshot basi (mis. dari data lama) hanya dilewati oleh laporan
+        db.session.execute(
+            AccountPeriodBalance.__table__.update().values(is_stale=True)
+        )
+        db.session.commit()
+
+    _login(client, admin_id)
+    response = client.get(
+        f"/buku-besar?account={cash_id}&start_date=2018-06-01&end_date=2018-06-30"
+    )
+    assert response.status_code == 200
+    with app.app_context():
+        assert _snapshot(cash_id, "LB-2018-05").is_stale
+        assert opening_balance(cash_id, date(2018, 6, 1)) == 500.0
+
+    for url in ("/neraca-saldo", "/laporan/neraca"):
+        response = client.get(f"{url}?start_date=2018-05-01&end_date=2018-06-30")
+        assert response.status_code == 200
+        assert cash_code in response.get_data(as_text=True)
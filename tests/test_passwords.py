@@ -2,7 +2,7 @@ from werkzeug.security import generate_password_hash, check_password_hash
 
 from app import db
 from app.models import User, PasswordResetToken
-from app.routes import _create_password_reset_token
+from app.routes.auth import _create_password_reset_token
 
 
 def _create_user(username, email, password):
@@ -0,0 +1,338 @@
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import generate_password_hash
+
+from app import create_app, db
+from app.models import (
+    CashierShift,
+    DetailPenjualan,
+    Kategori,
+    Pelanggan,
+    Penjualan,
+    PriceLevel,
+    ProductPriceLevel,
+    Produk,
+    Satuan,
+    Supplier,
+    User,
+)
+from app.time_utils import local_now, local_today
+
+_seq = itertools.count(1)
+
+
+def _unique(prefix):
+    return f"{prefix}{next(_seq)}"
+
+
+def _create_user(role="kasir"):
+    name = _unique("pos_user_")
+    user = User(
+        username=name,
+        email=f"{name}@example.com",
+        password=generate_password_hash("secret123", method="pbkdf2:sha256", salt_length=8),
+        role=role,
+    )
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def _create_product(stok=10, harga=10000.0):
+    satuan = Satuan(name=_unique("pcs"))
+    kategori = Kategori(name=_unique("kat"))
+    supplier = Supplier(
+        name=_unique("sup"),
+        address="Jl. Test",
+        phone="0800",
+        bank_account="123",
+        account_name="Test",
+        contact_person="Test",
+    )
+    db.session.add_all([satuan, kategori, supplier])
+    db.session.flush()
+    code = _unique("P")
+    product = Produk(
+        kode_produk=code,
+        sku=f"SKU-{code}",
+        nama_produk=f"Produk {code}",
+        harga=harga,
+        satuan_id=satuan.id,
+        kategori_id=kategori.id,
+        supplier_id=supplier.id,
+        stok_lama=stok,
+        harga_lama=harga / 2,
+        harga_beli=harga / 2,
+    )
+    db.session.add(product)
+    db.session.commit()
+    return product
+
+
+def _create_customer():
+    code = _unique("CUST")
+    customer = Pelanggan(
+        pelanggan_id=code, nama=f"Pelanggan {code}", kontak="0811", alamat="Jl. Test"
+    )
+    db.session.add(customer)
+    db.session.commit()
+    return customer
+
+
+def _login(client, user_id):
+    with client.session_transaction() as session:
+        session["user_id"] = user_id
+
+
+def _fetch_full(client, kind):
+    items = []
+    after = 0
+    version = None
+    while True:
+        response = client.get(f"/api/pos/catalog/{kind}?since=0&after={after}&limit=2")
+        assert response.status_code == 200
+        payload = response.get_json()
+        if version is None:
+            version = payload["version"]
+        items.extend(payload["items"])
+        after = payload["next_after"]
+        if not after:
+            return version, items
+
+
+def test_catalog_full_snapshot_pages_and_delta(client, app):
+    with app.app_context():
+        user_id = _create_user().id
+        product_ids = [_create_product().id for _ in range(3)]
+
+    _login(client, user_id)
+    version, items = _fetch_full(client, "products")
+    assert set(product_ids) <= {item["id"] for item in items}
+    assert version > 0
+
+    with app.app_context():
+        product = db.session.get(Produk, product_ids[0])
+        product.stok_lama = 3
+        level = PriceLevel(name=_unique("Grosir"))
+        db.session.add(level)
+        db.session.flush()
+        db.session.add(
+            ProductPriceLevel(product_id=product_ids[1], level_id=level.id, price=9000)
+        )
+        db.session.delete(db.session.get(Produk, product_ids[2]))
+        db.session.commit()
+
+    response = client.get(f"/api/pos/catalog/products?since={version}")
+    payload = response.get_json()
+    assert payload["mode"] == "delta"
+    assert payload["version"] > version
+    changed = {item["id"]: item for item in payload["items"]}
+    assert changed[product_ids[0]]["stok"] == 3
+    assert list(changed[product_ids[1]]["level_prices"].values()) == [9000.0]
+    assert product_ids[2] in payload["deleted"]
+
+
+def test_catalog_etag_returns_not_modified(client, app):
+    with app.app_context():
+        user_id = _create_user().id
+        _create_customer()
+
+    _login(client, user_id)
+    first = client.get("/api/pos/catalog/customers")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    version, window = first.get_json()["version"], first.get_json()["window"]
+
+    cached = client.get(
+        f"/api/pos/catalog/customers?since={version}&window={window}",
+        headers={"If-None-Match": etag},
+    )
+    assert cached.status_code == 304
+
+    with app.app_context():
+        customer_id = _create_customer().id
+
+    changed = client.get(
+        f"/api/pos/catalog/customers?since={version}&window={window}",
+        headers={"If-None-Match": etag},
+    )
+    assert changed.status_code == 200
+    assert [item["id"] for item in changed.get_json()["items"]] == [customer_id]
+
+
+def test_penjualan_page_does_not_embed_catalog(client, app):
+    with app.app_context():
+        user_id = _create_user().id
+        product_name = db.session.get(Produk, _create_product().id).nama_produk
+
+    _login(client, user_id)
+    response = client.get("/penjualan")
+    assert response.status_code == 200
+    html = response.get_data(as_text=True)
+    assert "/api/pos/catalog/products" in html
+    assert product_name not in html
+
+
+def _open_shift(user_id):
+    shift = CashierShift(user_id=user_id, shift_date=local_today(), opened_at=local_now())
+    db.session.add(shift)
+    db.session.commit()
+    return shift
+
+
+def _checkout_payload(customer_id, product_id, qty, price=10000.0):
+    return {
+        "pelanggan_id": customer_id,
+        "items": [{"produk_id": product_id, "jumlah": qty, "harga": price}],
+        "payment_method": "Tunai",
+        "amount_paid": price * qty,
+    }
+
+
+def test_api_checkout_saves_sale_and_returns_receipt_url(client, app):
+    with app.app_context():
+        user_id = _create_user().id
+        _open_shift(user_id)
+        product_id = _create_product(stok=5).id
+        customer_id = _create_customer().id
+
+    _login(client, user_id)
+    response = client.post(
+        "/api/penjualan", json=_checkout_payload(customer_id, product_id, 2)
+    )
+    assert response.status_code == 201
+    payload = response.get_json()
+    assert payload["success"] is True
+    assert payload["receipt_url"] == f"/penjualan/receipt/{payload['sale_id']}"
+
+    with app.app_context():
+        sale = db.session.get(Penjualan, payload["sale_id"])
+        assert sale.total_harga == 20000.0
+        assert db.session.get(Produk, product_id).stok_lama == 3
+
+
+def test_api_checkout_rejects_insufficient_stock(client, app):
+    with app.app_context():
+        user_id = _create_user().id
+        _open_shift(user_id)
+        product_id = _create_product(stok=1).id
+        customer_id = _create_customer().id
+
+    _login(client, user_id)
+    response = client.post(
+        "/api/penjualan", json=_checkout_payload(customer_id, product_id, 2)
+    )
+    assert response.status_code == 400
+    assert "tidak mencukupi" in response.get_json()["message"]
+
+    with app.app_context():
+        assert db.session.get(Produk, product_id).stok_lama == 1
+
+
+def test_api_checkout_rejects_non_object_json(client, app):
+    with app.app_context():
+        user_id = _create_user().id
+        _open_shift(user_id)
+
+    _login(client, user_id)
+    for body in ("[]", '"x"', "1", "null", "{bukan json"):
+        response = client.post(
+            "/api/penjualan", data=body, content_type="application/json"
+        )
+        assert response.status_code == 400
+        assert response.get_json()["success"] is False
+
+
+def test_api_checkout_rejects_non_string_text_fields(client, app):
+    with app.app_context():
+        user_id = _create_user().id
+        _open_shift(user_id)
+        product_id = _create_product(stok=5).id
+        customer_id = _create_customer().id
+
+    _login(client, user_id)
+    for field, value in (
+        ("payment_method", 5),
+        ("draft_invoice", True),
+        ("due_date", 20240101),
+        ("amount_paid", True),
+        ("shipping_fee", [1]),
+    ):
+        payload = {**_checkout_payload(customer_id, product_id, 1), field: value}
+        response = client.post("/api/penjualan", json=payload)
+        assert response.status_code == 400, field
+        assert response.get_json()["success"] is False
+
+    with app.app_context():
+        assert db.session.get(Produk, product_id).stok_lama == 5
+
+
+def test_form_checkout_redirects_to_receipt(client, app):
+    with app.app_context():
+        user_id = _create_user().id
+        _open_shift(user_id)
+        product_id = _create_product(stok=4).id
+        customer_id = _create_customer().id
+
+    _login(client, user_id)
+    response = client.post(
+        "/penjualan",
+        data={
+            "pelanggan_id": customer_id,
+            "produk_id[]": [product_id],
+            "jumlah[]": [1],
+            "harga[]": [10000],
+            "payment_method": "Tunai",
+            "amount_paid": 10000,
+        },
+    )
+    assert response.status_code == 302
+    assert "/penjualan/receipt/" in response.headers["Location"]
+    with app.app_context():
+        assert db.session.get(Produk, product_id).stok_lama == 3
+
+
+def test_concurrent_checkouts_never_oversell(tmp_path, monkeypatch):
+    # database file agar setiap thread memakai koneksi dan transaksi sendiri
+    monkeypatch.setenv("SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'pos.db'}")
+    app = create_app()
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    with app.app_context():
+        db.create_all()
+        user_id = _create_user().id
+        _open_shift(user_id)
+        product_id = _create_product(stok=5).id
+        customer_id = _create_customer().id
+
+    workers = 8
+    barrier = threading.Barrier(workers)
+
+    def checkout(_):
+        client = app.test_client()
+        _login(client, user_id)
+        barrier.wait()
+        response = client.post(
+            "/api/penjualan", json=_checkout_payload(customer_id, product_id, 1)
+        )
+        return response.status_code
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            statuses = sorted(pool.map(checkout, range(workers)))
+
+        assert statuses == [201] * 5 + [400] * 3
+        with app.app_context():
+            assert db.session.get(Produk, product_id).stok_lama == 0
+            sold = (
+                db.session.query(db.func.sum(DetailPenjualan.jumlah))
+                .filter(DetailPenjualan.produk_id == product_id)
+                .scalar()
+            )
+            assert sold == 5
+            assert Penjualan.query.count() == 5
+    finally:
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
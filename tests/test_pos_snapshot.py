@@ -0,0 +1,122 @@
+from sqlalchemy import event
+
+from app import db
+from app.models import Produk
+from app.services.pos_snapshot import ProductSnapshot, reset_snapshot
+from tests.test_pos import _create_product, _create_user, _login, _unique
+
+
+def test_scan_served_from_snapshot_and_follows_catalog_changes(client, app):
+    barcode = _unique("899")
+    with app.app_context():
+        user_id = _create_user().id
+        product = _create_product()
+        product.barcode = barcode
+        db.session.commit()
+        product_id, code = product.id, product.kode_produk
+        engine = db.engine
+    app.config["POS_SNAPSHOT_TTL"] = 3600
+    reset_snapshot()
+
+    _login(client, user_id)
+    response = client.get(f"/api/pos/scan?code={barcode}")
+    assert response.status_code == 200
+    item = response.get_json()["product"]
+    assert item["id"] == product_id
+    assert item["satuan"]
+
+    statements = []
+
+    def _capture(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        by_code = client.get(f"/api/pos/scan?code={code.lower()}")
+        legacy = client.get(f"/api/get_product?product_code={code}")
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+    assert by_code.get_json()["product"]["id"] == product_id
+    assert legacy.get_json()["success"] is True
+    assert statements == []
+
+    # commit di worker ini menandai snapshot; hanya produk yang berubah dimuat ulang
+    with app.app_context():
+        db.session.get(Produk, product_id).harga = 12345.0
+        db.session.commit()
+    item = client.get(f"/api/pos/scan?code={barcode}").get_json()["product"]
+    assert item["price"] == 12345.0
+
+    with app.app_context():
+        db.session.delete(db.session.get(Produk, product_id))
+        db.session.commit()
+    assert client.get(f"/api/pos/scan?code={barcode}").status_code == 404
+    app.config.pop("POS_SNAPSHOT_TTL", None)
+
+
+def test_get_product_matches_code_only(client, app):
+    barcode = _unique("899")
+    with app.app_context():
+        user_id = _create_user().id
+        product = _create_product()
+        product.barcode = barcode
+        db.session.commit()
+        code, sku = product.kode_produk, product.sku
+    reset_snapshot()
+
+    _login(client, user_id)
+    found = client.get(f"/api/get_product?product_code={code}")
+    assert found.get_json()["product_name"] == f"Produk {code}"
+    for other in (barcode, sku):
+        assert client.get(f"/api/get_product?product_code={other}").status_code == 404
+        assert client.get(f"/api/pos/scan?code={other}").status_code == 200
+
+
+class _TrackingIndex(dict):
+    def __init__(self):
+        super().__init__()
+        self.deleted = []
+
+    def __delitem__(self, key):
+        self.deleted.append(key)
+        super().__delitem__(key)
+
+
+def _snapshot_item(**values):
+    item = {
+        "id": 1,
+        "code": "K-1",
+        "sku": "SKU-1",
+        "barcode": "8990001",
+        "name": "Kopi",
+        "price": 1000.0,
+        "kategori": "Minuman",
+        "satuan": "pcs",
+        "level_prices": None,
+        "stok": 5,
+        "stok_minimal": 0,
+        "hpp": 500.0,
+        "last_cost": 500.0,
+        "weight": 0.0,
+    }
+    item.update(values)
+    return item
+
+
+def test_snapshot_put_overwrites_index_entries_in_place():
+    snapshot = ProductSnapshot(None)
+    snapshot.by_barcode = _TrackingIndex()
+    snapshot.by_code = _TrackingIndex()
+    snapshot.by_sku = _TrackingIndex()
+    snapshot.put(_snapshot_item())
+
+    updated = snapshot.put(_snapshot_item(code="K-2", price=1500.0))
+
+    # kunci yang tetap tidak pernah hilang sesaat dari indeks
+    assert snapshot.by_barcode.deleted == []
+    assert snapshot.by_sku.deleted == []
+    assert snapshot.by_code.deleted == ["K-1"]
+    assert snapshot.lookup("8990001") is updated
+    assert snapshot.lookup_code("k-2") is updated
+    assert snapshot.lookup_code("K-1") is None
+    assert snapshot.records[1] is updated
@@ -0,0 +1,101 @@
+import pandas as pd
+from sqlalchemy import event
+
+from app import db
+from app.models import PriceLevel, ProductPriceLevel
+from app.services.catalog_service import CATALOG_PRODUCTS, get_catalog_version
+from app.services.import_service import run_harga_level_import
+from tests.test_pos import _create_product, _unique
+
+
+def _level_price(product_id, level_id):
+    return db.session.execute(
+        db.select(ProductPriceLevel.price).where(
+            ProductPriceLevel.product_id == product_id,
+            ProductPriceLevel.level_id == level_id,
+        )
+    ).scalar_one_or_none()
+
+
+def test_price_level_import_upserts_only_referenced_products(app, tmp_path):
+    with app.app_context():
+        grosir = PriceLevel(name=_unique("Grosir"))
+        member = PriceLevel(name=_unique("Member"))
+        db.session.add_all([grosir, member])
+        first, second, third = _create_product(), _create_product(), _create_product()
+        third.barcode = _unique("899")
+        db.session.add(ProductPriceLevel(product_id=first.id, level_id=grosir.id, price=9000))
+        db.session.add(ProductPriceLevel(product_id=second.id, level_id=grosir.id, price=8000))
+        db.session.commit()
+        ids = (first.id, second.id, third.id)
+        levels = (grosir.id, member.id)
+        version = get_catalog_version(CATALOG_PRODUCTS)
+
+        path = tmp_path / "harga.xlsx"
+        pd.DataFrame(
+            [
+                {"Kode Produk": first.kode_produk, "Level": grosir.name, "Harga": 9500},
+                {"Kode Produk": second.kode_produk, "Level ID": grosir.id, "Harga": 8000},
+                {"SKU": second.sku.lower(), "Level": member.name, "Harga": 7000},
+                {"Barcode": third.barcode, "Level ID": member.id, "Harga": 6000},
+                {"Barcode": third.barcode, "Level ID": member.id, "Harga": 6500},
+                {"Kode Produk": _unique("NOPE"), "Level ID": grosir.id, "Harga": 100},
+                {"Kode Produk": first.kode_produk, "Level": "tidak ada", "Harga": 100},
+                {"Kode Produk": first.kode_produk, "Level ID": member.id, "Harga": -1},
+                {"Kode Produk": first.kode_produk, "Level ID": member.id, "Harga": "abc"},
+                {"Kode Produk": first.kode_produk, "Level ID": member.id, "Harga": None},
+            ]
+        ).to_excel(path, index=False)
+
+        summary = run_harga_level_import(str(path), "harga.xlsx")
+
+        assert (summary["created"], summary["updated"]) == (2, 2)
+        assert (summary["skipped"], summary["errors"]) == (4, 2)
+        assert _level_price(ids[0], levels[0]) == 9500
+        assert _level_price(ids[1], levels[0]) == 8000
+        assert _level_price(ids[1], levels[1]) == 7000
+        assert _level_price(ids[2], levels[1]) == 6500
+        assert _level_price(ids[0], levels[1]) is None
+        assert db.session.execute(
+            db.select(db.func.count()).select_from(ProductPriceLevel).where(
+                ProductPriceLevel.product_id.in_(ids)
+            )
+        ).scalar_one() == 4
+        assert get_catalog_version(CATALOG_PRODUCTS) > version
+
+
+def test_price_level_import_matches_exact_keys_without_lower_scan(app, tmp_path):
+    with app.app_context():
+        level = PriceLevel(name=_unique("Grosir"))
+        db.session.add(level)
+        first, second = _create_product(), _create_product()
+        db.session.commit()
+        level_id, ids = level.id, (first.id, second.id)
+        engine = db.engine
+
+        path = tmp_path / "harga.xlsx"
+        pd.DataFrame(
+            [
+                {"Kode Produk": first.kode_produk, "Level ID": level_id, "Harga": 5000},
+                {"SKU": second.sku.lower(), "Level ID": level_id, "Harga": 4000},
+            ]
+        ).to_excel(path, index=False)
+
+        statements = []
+
+        def _capture(_conn, _cursor, statement, *_args):
+            if "FROM produk" in statement and "lower(" in statement:
+                statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", _capture)
+        try:
+            summary = run_harga_level_import(str(path), "harga.xlsx")
+        finally:
+            event.remove(engine, "before_cursor_execute", _capture)
+
+        assert summary["created"] == 2
+        assert _level_price(ids[0], level_id) == 5000
+        assert _level_price(ids[1], level_id) == 4000
+        # hanya SKU huruf kecil yang jatuh ke pencarian tanpa beda huruf
+        assert len(statements) == 1
+        assert "produk.sku" in statements[0]
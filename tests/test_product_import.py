@@ -0,0 +1,74 @@
+from datetime import date
+
+import pandas as pd
+
+from app import db
+from app.models import Produk
+from app.services.catalog_service import CATALOG_PRODUCTS, get_catalog_version
+from app.services.import_service import perform_produk_import
+from tests.test_pos import _create_product, _unique
+
+
+def _row(kode, sku=None, nama=None, satuan=None, kategori=None, supplier=None, **extra):
+    return {
+        "Kode Produk": kode,
+        "SKU": sku,
+        "Nama Produk": nama,
+        "Satuan ID": satuan,
+        "Kategori ID": kategori,
+        "Supplier ID": supplier,
+        "Berat": extra.get("berat"),
+        "Stok Minimal": extra.get("stok_minimal"),
+        "Tanggal Expired": extra.get("expired"),
+    }
+
+
+def test_product_import_creates_updates_and_reports_rows(app):
+    with app.app_context():
+        existing = _create_product()
+        other = _create_product()
+        refs = (existing.satuan_id, existing.kategori_id, existing.supplier_id)
+        existing_id, existing_code = existing.id, existing.kode_produk
+        other_code, other_sku = other.kode_produk, other.sku
+        version = get_catalog_version(CATALOG_PRODUCTS)
+        new_code, dup_sku = _unique("IMP"), _unique("SKU-IMP")
+
+        progress = []
+        summary = perform_produk_import(
+            pd.DataFrame(
+                [
+                    _row(existing_code, nama="Nama Baru", stok_minimal="5", berat=" "),
+                    _row(None, nama="Tanpa kode"),
+                    _row(new_code, dup_sku, "Produk impor", *refs, berat=1.5, expired="2030-01-31"),
+                    _row(_unique("IMP"), dup_sku, "Produk SKU kembar", *refs),
+                    _row(_unique("IMP"), other_sku, "SKU milik produk lain", *refs),
+                    _row(_unique("IMP"), None, "Satuan salah", 999999, *refs[1:]),
+                    _row(new_code, None, "Kode kembar", *refs),
+                    _row(other_code, satuan=999999),
+                ]
+            ),
+            progress_cb=lambda value, message: progress.append(value),
+        )
+
+        assert summary["created"] == 3
+        assert summary["updated"] == 1
+        assert [note.split(":")[0] for note in summary["skipped_notes"]] == [
+            "Baris 3",
+            "Baris 5",
+            "Baris 6",
+            "Baris 7",
+            "Baris 8",
+            "Baris 9",
+        ]
+        assert "duplikat" in summary["skipped_notes"][4]
+        assert "Satuan ID 999999" in summary["skipped_notes"][5]
+        assert progress[-1] == 100 and progress == sorted(progress)
+
+        db.session.expire_all()
+        updated = db.session.get(Produk, existing_id)
+        assert (updated.nama_produk, updated.stok_minimal) == ("Nama Baru", 5)
+        created = Produk.query.filter_by(kode_produk=new_code).one()
+        assert (created.sku, created.berat, created.stok_minimal) == (dup_sku, 1.5, 0)
+        assert created.tanggal_expired == date(2030, 1, 31)
+        assert Produk.query.filter_by(nama_produk="SKU milik produk lain").one().sku is None
+        assert get_catalog_version(CATALOG_PRODUCTS) > version
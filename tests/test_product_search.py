@@ -0,0 +1,83 @@
+from sqlalchemy import event, text
+
+from app import db
+from app.models import Produk
+from app.services.product_search import search_backend
+from tests.test_pos import _create_product, _create_user, _login, _unique
+
+
+def test_product_search_uses_fts_and_ranks_exact_code_first(client, app):
+    marker = _unique("Kopi").lower()
+    with app.app_context():
+        user_id = _create_user("admin").id
+        # produk dibuat sebelum dan sesudah indeks dipasang
+        first = _create_product()
+        first.nama_produk = f"{marker} susu"
+        db.session.commit()
+        first_id = first.id
+        assert search_backend().name == "sqlite-fts5"
+        exact = _create_product()
+        exact.nama_produk = "Gula pasir"
+        exact.barcode = marker
+        db.session.commit()
+        exact_id = exact.id
+        engine = db.engine
+
+    _login(client, user_id)
+    statements = []
+
+    def _capture(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        response = client.get(f"/api/products?q={marker.upper()}")
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+    ids = [item["id"] for item in response.get_json()["products"]]
+    assert ids == [exact_id, first_id]
+    assert any("produk_fts MATCH" in statement for statement in statements)
+
+    # update dan hapus ikut tersinkron lewat trigger
+    with app.app_context():
+        db.session.get(Produk, first_id).nama_produk = "Teh melati"
+        db.session.delete(db.session.get(Produk, exact_id))
+        db.session.commit()
+        assert db.session.execute(
+            text("SELECT count(*) FROM produk_fts WHERE produk_fts MATCH 'melati'")
+        ).scalar() >= 1
+    response = client.get(f"/api/products?q={marker}")
+    assert response.get_json()["products"] == []
+
+
+def test_stock_suggest_short_term_falls_back_to_ilike(client, app):
+    with app.app_context():
+        user_id = _create_user("admin").id
+        product = _create_product()
+        code = product.kode_produk
+
+    _login(client, user_id)
+    response = client.get(f"/api/laporan/stok-barang/suggest?q={code}")
+    assert [item["code"] for item in response.get_json()["products"]] == [code]
+
+    # dua huruf di bawah batas trigram tetap dicari lewat ilike
+    response = client.get(f"/api/laporan/stok-barang/suggest?q={code[:2]}")
+    assert response.status_code == 200
+    assert response.get_json()["products"]
+
+
+def test_mariadb_uses_ilike_backend_without_ngram():
+    from sqlalchemy import create_engine
+
+    from app.services.product_search import (
+        FallbackSearch,
+        MysqlFulltextSearch,
+        backend_for,
+    )
+
+    mariadb = create_engine("mariadb+pymysql://user:pw@localhost/pos")
+    assert isinstance(backend_for(mariadb), FallbackSearch)
+    mysql = create_engine("mysql+pymysql://user:pw@localhost/pos")
+    assert isinstance(backend_for(mysql), MysqlFulltextSearch)
+    mysql.dialect.is_mariadb = True
+    assert isinstance(backend_for(mysql), FallbackSearch)
@@ -0,0 +1,151 @@
+from datetime import timedelta
+
+from sqlalchemy import event
+
+from app import db
+from app.models import Pelanggan, Penjualan, SalesSearchIndex, User
+from app.services.sales_search_service import (
+    KIND_CUSTOMER,
+    _extend_entity,
+    rebuild_sales_search_index,
+)
+from app.time_utils import local_today
+from tests.test_pos import (
+    _checkout_payload,
+    _create_customer,
+    _create_product,
+    _create_user,
+    _login,
+    _open_shift,
+    _unique,
+)
+
+
+def _suggest(client, term, **dates):
+    response = client.get(
+        "/api/laporan/penjualan/suggest", query_string={"q": term, **dates}
+    )
+    assert response.status_code == 200
+    return response.get_json()["results"]
+
+
+def test_sales_suggest_reads_index_maintained_on_checkout(client, app):
+    word = _unique("Sentosa").lower()
+    with app.app_context():
+        user = _create_user("admin")
+        user_id, username = user.id, user.username
+        _open_shift(user_id)
+        product_id = _create_product(stok=10).id
+        customer = _create_customer()
+        customer.nama = f"Toko {word} Jaya"
+        db.session.commit()
+        customer_id = customer.id
+        engine = db.engine
+
+    _login(client, user_id)
+    response = client.post("/api/penjualan", json=_checkout_payload(customer_id, product_id, 1))
+    sale_id = response.get_json()["sale_id"]
+    with app.app_context():
+        no_faktur = db.session.get(Penjualan, sale_id).no_faktur
+
+    statements = []
+
+    def _capture(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        # awal kata di tengah nama tetap ketemu
+        results = _suggest(client, word[:5].upper())
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+    assert {"kind": "pelanggan", "label": f"Toko {word} Jaya"}.items() <= results[0].items()
+    search_queries = [s for s in statements if "sales_search_index" in s]
+    assert len(search_queries) == 1
+    assert not any("FROM penjualan" in s for s in statements)
+
+    invoice = _suggest(client, no_faktur)
+    assert invoice[0]["kind"] == "faktur"
+    assert f"Toko {word} Jaya" in invoice[0]["subtext"]
+    assert any(item["kind"] == "sales" for item in _suggest(client, username))
+
+    # rentang tanggal tanpa transaksi
+    past = local_today() - timedelta(days=400)
+    assert _suggest(
+        client, word, start_date=past.isoformat(), end_date=(past + timedelta(days=5)).isoformat()
+    ) == []
+
+    # ganti nama pelanggan ikut memperbarui indeks
+    with app.app_context():
+        db.session.get(Pelanggan, customer_id).nama = f"Warung {word}"
+        db.session.commit()
+    assert _suggest(client, "toko " + word) == []
+    assert _suggest(client, "warung")[0]["label"] == f"Warung {word}"
+
+
+def test_rebuild_matches_incremental_index(client, app):
+    with app.app_context():
+        user_id = _create_user().id
+        _open_shift(user_id)
+        product_id = _create_product(stok=10).id
+        customer_id = _create_customer().id
+
+    _login(client, user_id)
+    client.post("/api/penjualan", json=_checkout_payload(customer_id, product_id, 1))
+
+    def _snapshot():
+        return sorted(
+            (row.kind, row.entity_id, row.term, row.first_date, row.last_date)
+            for row in SalesSearchIndex.query.filter(
+                SalesSearchIndex.kind.in_(["pelanggan", "sales"]),
+                SalesSearchIndex.entity_id.in_([customer_id, user_id]),
+            )
+        )
+
+    with app.app_context():
+        incremental = _snapshot()
+        assert incremental
+        rebuild_sales_search_index()
+        db.session.commit()
+        assert _snapshot() == incremental
+        assert db.session.get(User, user_id).username
+
+
+def test_first_sale_insert_widens_rows_created_concurrently(app):
+    today = local_today()
+    with app.app_context():
+        customer = _create_customer()
+        calls = []
+
+        def _display(connection, entity_id):
+            # transaksi lain menulis baris yang sama di antara UPDATE dan INSERT
+            if not calls:
+                connection.execute(
+                    SalesSearchIndex.__table__.insert().values(
+                        kind=KIND_CUSTOMER,
+                        entity_id=entity_id,
+                        term=customer.nama.lower(),
+                        label=customer.nama,
+                        first_date=today,
+                        last_date=today,
+                    )
+                )
+            calls.append(entity_id)
+            return customer.nama, customer.pelanggan_id
+
+        connection = db.session.connection()
+        _extend_entity(
+            connection,
+            KIND_CUSTOMER,
+            customer.id,
+            today - timedelta(days=3),
+            _display,
+        )
+        db.session.commit()
+
+        rows = SalesSearchIndex.query.filter_by(
+            kind=KIND_CUSTOMER, entity_id=customer.id
+        ).all()
+        assert calls == [customer.id]
+        ranges = {row.term: (row.first_date, row.last_date) for row in rows}
+        assert ranges[customer.nama.lower()] == (today - timedelta(days=3), today)
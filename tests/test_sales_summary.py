@@ -0,0 +1,119 @@
+from app import db
+from app.models import Penjualan, Produk, SalesDailySummary
+from app.services.sales_summary_service import rebuild_sales_summary, summary_totals
+from tests.test_pos import (
+    _checkout_payload,
+    _create_customer,
+    _create_product,
+    _create_user,
+    _login,
+    _open_shift,
+)
+
+
+def _user_totals(user_id):
+    return summary_totals(SalesDailySummary.sales_id == user_id)
+
+
+def test_checkout_and_delete_update_summary(client, app):
+    with app.app_context():
+        user_id = _create_user(role="admin").id
+        shift_id = _open_shift(user_id).id
+        product_id = _create_product(stok=10, harga=10000.0).id
+        customer_id = _create_customer().id
+
+    _login(client, user_id)
+    sale_ids = []
+    for qty in (2, 3):
+        response = client.post(
+            "/api/penjualan", json=_checkout_payload(customer_id, product_id, qty)
+        )
+        assert response.status_code == 201
+        sale_ids.append(response.get_json()["sale_id"])
+
+    with app.app_context():
+        totals = _user_totals(user_id)
+        assert totals["orders"] == 2
+        assert totals["units"] == 5
+        assert totals["gross_sales"] == 50000.0
+        assert totals["hpp"] == 25000.0
+        row = SalesDailySummary.query.filter_by(sales_id=user_id).one()
+        assert row.shift_id == shift_id
+        assert row.payment_method == "Tunai"
+
+    response = client.post(f"/penjualan/delete/{sale_ids[0]}")
+    assert response.status_code == 302
+
+    with app.app_context():
+        assert db.session.get(Penjualan, sale_ids[0]) is None
+        totals = _user_totals(user_id)
+        assert totals["orders"] == 1
+        assert totals["units"] == 3
+        assert totals["total_amount"] == 30000.0
+
+
+def test_delete_after_cost_change_reverses_checkout_hpp(client, app):
+    with app.app_context():
+        user_id = _create_user(role="admin").id
+        _open_shift(user_id)
+        product_id = _create_product(stok=10, harga=10000.0).id
+        customer_id = _create_customer().id
+
+    _login(client, user_id)
+    response = client.post(
+        "/api/penjualan", json=_checkout_payload(customer_id, product_id, 2)
+    )
+    assert response.status_code == 201
+    sale_id = response.get_json()["sale_id"]
+
+    with app.app_context():
+        checkout_hpp = _user_totals(user_id)["hpp"]
+        product = db.session.get(Produk, product_id)
+        # pembelian/opname mengubah HPP produk sesudah penjualan
+        product.harga_lama = product.harga_beli = 7777.0
+        db.session.commit()
+        rebuild_sales_summary()
+        db.session.commit()
+        assert _user_totals(user_id)["hpp"] == checkout_hpp
+
+    assert client.post(f"/penjualan/delete/{sale_id}").status_code == 302
+
+    with app.app_context():
+        assert _user_totals(user_id)["hpp"] == 0.0
+
+
+def test_rebuild_matches_incremental_summary(client, app):
+    with app.app_context():
+        user_id = _create_user().id
+        _open_shift(user_id)
+        product_id = _create_product(stok=10).id
+        customer_id = _create_customer().id
+
+    _login(client, user_id)
+    payload = _checkout_payload(customer_id, product_id, 2)
+    payload["items"][0]["diskon"] = 10
+    payload["items"][0]["pajak"] = 11
+    assert client.post("/api/penjualan", json=payload).status_code == 201
+
+    with app.app_context():
+        incremental = _user_totals(user_id)
+        rebuild_sales_summary()
+        db.session.commit()
+        rebuilt = _user_totals(user_id)
+
+    assert incremental["discount_total"] == 2000.0
+    for name, value in incremental.items():
+        assert abs(rebuilt[name] - value) < 1e-6, name
+
+
+def test_rebuild_command_and_reports_render(client, app, runner):
+    with app.app_context():
+        user_id = _create_user(role="admin").id
+
+    result = runner.invoke(args=["sales-summary", "rebuild"])
+    assert result.exit_code == 0
+    assert "Rekap penjualan disusun ulang" in result.output
+
+    _login(client, user_id)
+    for url in ("/dashboard", "/laporan/laba-rugi", "/laporan/shift"):
+        assert client.get(url).status_code == 200, url
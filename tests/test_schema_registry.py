@@ -0,0 +1,55 @@
+from sqlalchemy import create_engine, event, text
+
+from app import db
+from app.schema_registry import apply_schema, probe_schema
+from tests.test_pos import _create_user, _login
+
+
+def test_probe_reports_and_apply_fills_legacy_schema():
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE pembelian (id INTEGER PRIMARY KEY)"))
+        connection.execute(
+            text("CREATE TABLE expedisi (id INTEGER PRIMARY KEY, name VARCHAR(100))")
+        )
+
+    state = probe_schema(engine)
+    assert not state.has_columns("pembelian", "due_date")
+    assert not state.has_table("price_change")
+    pending = state.pending_ddl()
+    assert "ALTER TABLE pembelian ADD COLUMN payment_bank VARCHAR(120)" in pending
+    assert "ALTER TABLE expedisi ADD COLUMN volume_divisor FLOAT DEFAULT 6000" in pending
+    assert "CREATE TABLE price_change" in pending
+
+    state, applied = apply_schema(engine, state)
+    assert applied == pending
+    assert state.pending_ddl() == []
+    assert state.has_columns("pembelian", "due_date", "payment_bank", "payment_reference")
+    assert state.has_table("journal_line")
+
+
+def test_handlers_read_cached_schema_flags(client, app, runner):
+    with app.app_context():
+        admin_id = _create_user("admin").id
+        engine = db.engine
+
+    _login(client, admin_id)
+    client.get("/dashboard")  # probe pertama
+
+    inspections = []
+
+    def _capture(_conn, _cursor, statement, *_args):
+        if "sqlite_master" in statement or "table_info" in statement:
+            inspections.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        for url in ("/pembelian", "/buku-besar", "/neraca-saldo", "/expedisi", "/update-harga"):
+            assert client.get(url).status_code == 200, url
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+    assert inspections == []
+
+    result = runner.invoke(args=["schema", "status"])
+    assert result.exit_code == 0
+    assert "Skema lengkap." in result.output
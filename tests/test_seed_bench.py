@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+from app import db
+from app.models import Penjualan, SalesDailySummary
+from app.services.sales_summary_service import summary_totals
+from app.time_utils import local_today
+
+
+def test_seed_bench_cli_generates_consistent_dataset(app, runner):
+    args = [
+        "seed-bench",
+        "--products", "20",
+        "--customers", "10",
+        "--sales", "40",
+        "--purchases", "5",
+        "--journals", "12",
+        "--days", "7",
+        "--cashiers", "2",
+        "--suppliers", "3",
+        # database test dipakai bersama, jadi hampir pasti sudah berisi data
+        "--force",
+    ]
+    result = runner.invoke(args=args)
+    assert result.exit_code == 0, result.output
+    assert "sales: 40" in result.output
+    assert "journal_lines: 24" in result.output
+
+    with app.app_context():
+        first_day = local_today() - timedelta(days=6)
+        orders = (
+            db.session.query(Penjualan)
+            .filter(Penjualan.tanggal_penjualan >= first_day)
+            .count()
+        )
+        totals = summary_totals(SalesDailySummary.summary_date >= first_day)
+        # rekap disusun ulang setelah insert massal
+        assert totals["orders"] == orders
+
+        # penjualan kredit memakai metode "Tempo" agar laporan piutang ikut terukur
+        seeded = Penjualan.query.filter(Penjualan.no_faktur.like("SB%"))
+        credit = seeded.filter(Penjualan.payment_method == "Tempo").all()
+        assert credit
+        assert all(sale.due_date and sale.amount_paid == 0 for sale in credit)
+        assert not seeded.filter(Penjualan.payment_method == "Kredit").count()
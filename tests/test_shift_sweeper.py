@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+from sqlalchemy import event
+
+from app import db
+from app.models import CashierShift
+from app.services.shift_service import last_sweep, reset_sweep_state
+from app.time_utils import local_now, local_today
+from tests.test_pos import _create_user, _login
+
+
+def _stale_shift(user_id):
+    yesterday = local_today() - timedelta(days=1)
+    shift = CashierShift(
+        user_id=user_id,
+        shift_date=yesterday,
+        opened_at=local_now() - timedelta(days=1),
+    )
+    db.session.add(shift)
+    db.session.commit()
+    return shift.id
+
+
+def test_stale_shift_closed_once_per_day(client, app):
+    with app.app_context():
+        cashier_id = _create_user("kasir").id
+        shift_id = _stale_shift(cashier_id)
+        engine = db.engine
+    reset_sweep_state()
+
+    _login(client, cashier_id)
+    response = client.get("/penjualan")
+    assert response.status_code == 200
+    assert "ditutup otomatis" in response.get_data(as_text=True)
+
+    with app.app_context():
+        shift = db.session.get(CashierShift, shift_id)
+        assert shift.closed_at is not None
+        assert shift.forced_close is True
+        assert shift.closed_by is None
+        assert "Auto-close" in shift.note
+    sweep = last_sweep()
+    assert sweep["count"] >= 1
+    assert cashier_id in sweep["user_ids"]
+
+    # sweep sudah tercatat hari ini: POS tidak lagi menyentuh cashier_shift
+    writes = []
+
+    def _capture(_conn, _cursor, statement, *_args):
+        if statement.lstrip().upper().startswith("UPDATE") and "cashier_shift" in statement:
+            writes.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        response = client.get("/penjualan")
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+    assert response.status_code == 200
+    assert writes == []
+    # notifikasi hanya sekali per session
+    assert "ditutup otomatis" not in response.get_data(as_text=True)
+
+
+def test_close_stale_command(app):
+    with app.app_context():
+        shift_id = _stale_shift(_create_user("kasir").id)
+
+    result = app.test_cli_runner().invoke(args=["shifts", "close-stale"])
+    assert result.exit_code == 0
+    assert "Shift lama ditutup:" in result.output
+
+    with app.app_context():
+        assert db.session.get(CashierShift, shift_id).closed_at is not None
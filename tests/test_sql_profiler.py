@@ -0,0 +1,49 @@
+from app.sql_profiler import recent_profiles, statement_shape
+from tests.test_pos import (
+    _checkout_payload,
+    _create_customer,
+    _create_product,
+    _create_user,
+    _login,
+    _open_shift,
+)
+
+
+def test_statement_shape_ignores_values_and_in_list_length():
+    first = statement_shape("SELECT * FROM produk WHERE id IN (?, ?, ?) AND nama = 'a'")
+    second = statement_shape("SELECT *\n  FROM produk WHERE id IN (?, ?) AND nama = 'b b'")
+    assert first == second == "SELECT * FROM produk WHERE id IN (?) AND nama = ?"
+    assert statement_shape("SELECT a FROM t LIMIT 5") == "SELECT a FROM t LIMIT ?"
+
+
+def test_request_profile_flags_repeated_lazy_loads(client, app):
+    with app.app_context():
+        kasir_id = _create_user().id
+        admin_id = _create_user("admin").id
+        _open_shift(kasir_id)
+        customer_id = _create_customer().id
+        product_ids = [_create_product(stok=5).id for _ in range(5)]
+
+    _login(client, kasir_id)
+    for product_id in product_ids:
+        response = client.post(
+            "/api/penjualan", json=_checkout_payload(customer_id, product_id, 1)
+        )
+        assert response.status_code == 201
+
+    response = client.get("/penjualan")
+    assert response.status_code == 200
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("db;dur=")
+    assert "n1;" in timing
+
+    entry = recent_profiles(app, limit=1)[0]
+    assert entry["endpoint"] == "main.penjualan"
+    assert entry["statements"] > 0
+    # sale.pelanggan / sale.detail_penjualan dimuat satu per satu di recent_sales
+    assert any("detail_penjualan" in item["shape"] for item in entry["repeated"])
+
+    _login(client, admin_id)
+    page = client.get("/status").get_data(as_text=True)
+    assert "Profil SQL per endpoint" in page
+    assert "main.penjualan" in page
@@ -0,0 +1,28 @@
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.bench_startup import HEAVY_MODULES
+
+
+def test_create_app_does_not_import_spreadsheet_libraries(tmp_path):
+    env = dict(os.environ, SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'start.db'}")
+    script = (
+        "import json, sys\n"
+        "from app import create_app\n"
+        "app = create_app()\n"
+        "print(json.dumps({'routes': len(app.url_map._rules),"
+        f" 'heavy': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    assert result["routes"] > 100
+    assert result["heavy"] == []
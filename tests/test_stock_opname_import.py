@@ -0,0 +1,102 @@
+import pytest
+
+from app import db
+from app.models import Produk, StockOpnameItem, StockOpnameSession
+from app.services.catalog_service import CATALOG_PRODUCTS, get_catalog_version
+from app.services.import_service import ImportFailed, run_stok_opname_import
+from tests.test_pos import _create_product, _unique
+
+
+def _write_csv(path, rows):
+    lines = ["Kode Produk;SKU;Nama Produk;Qty Fisik;HPP;Catatan"]
+    lines.extend(";".join("" if value is None else str(value) for value in row) for row in rows)
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+@pytest.fixture()
+def small_chunks(monkeypatch):
+    monkeypatch.setattr("app.services.import_reader.CHUNK_ROWS", 2)
+
+
+def test_stock_opname_import_applies_counts_in_bulk(app, tmp_path, small_chunks):
+    with app.app_context():
+        first = _create_product(stok=4)
+        second = _create_product(stok=10)
+        third = _create_product(stok=2)
+        third.nama_produk = _unique("Nama Unik")
+        db.session.commit()
+        ids = (first.id, second.id, third.id)
+        path = _write_csv(
+            tmp_path / "opname.csv",
+            [
+                (first.kode_produk.lower(), None, None, 6, 1500, None),
+                (None, None, None, None, None, None),
+                (None, second.sku, None, 1000, None, "rak atas"),
+                (None, None, f" {third.nama_produk.upper()} ", 0, None, None),
+            ],
+        )
+        version = get_catalog_version(CATALOG_PRODUCTS)
+
+        summary = run_stok_opname_import(path, "opname.csv", location="Gudang", created_by=None)
+
+        assert (summary["rows"], summary["plus"], summary["minus"]) == (3, 992, -2)
+        products = {product.id: product for product in Produk.query.filter(Produk.id.in_(ids))}
+        assert products[ids[0]].stok_lama == 6
+        assert products[ids[0]].harga_beli == 1500.0
+        assert products[ids[0]].harga_lama == 1500.0
+        assert products[ids[1]].stok_lama == 1000
+        assert products[ids[1]].harga_beli == 5000.0
+        assert products[ids[2]].stok_lama == 0
+
+        opname = StockOpnameSession.query.filter_by(reference=summary["reference"]).one()
+        assert opname.location == "Gudang"
+        items = {
+            item.product_id: item
+            for item in StockOpnameItem.query.filter_by(session_id=opname.id)
+        }
+        assert (items[ids[0]].system_qty, items[ids[0]].difference_qty) == (4, 2)
+        assert items[ids[1]].note == "rak atas"
+        assert items[ids[2]].difference_qty == -2
+        assert get_catalog_version(CATALOG_PRODUCTS) > version
+
+
+def test_stock_opname_import_reports_every_invalid_row(app, tmp_path, small_chunks):
+    with app.app_context():
+        first, twin_a, twin_b = _create_product(stok=4), _create_product(), _create_product()
+        twin_name = _unique("Kembar")
+        twin_a.nama_produk = twin_name
+        twin_b.nama_produk = twin_name
+        db.session.commit()
+        first_id, code = first.id, first.kode_produk
+        missing = _unique("NOPE")
+        sessions = StockOpnameSession.query.count()
+        path = _write_csv(
+            tmp_path / "opname.csv",
+            [
+                (code, None, None, 1.5, None, None),
+                (code, None, None, 5, None, None),
+                (missing, None, None, 1, None, None),
+                (None, "sku-tidak-ada", None, 1, None, None),
+                (None, None, twin_name, 1, None, None),
+                (code, None, None, 7, None, None),
+                (None, None, None, 3, None, None),
+                (first.sku, None, None, -1, None, None),
+            ],
+        )
+
+        with pytest.raises(ImportFailed) as failure:
+            run_stok_opname_import(path, "opname.csv")
+
+        assert failure.value.notes == [
+            "Baris 2: Qty fisik tidak valid atau bukan angka bulat.",
+            f"Baris 4: Kode Produk {missing} tidak ditemukan.",
+            "Baris 5: SKU sku-tidak-ada tidak ditemukan.",
+            f"Baris 6: Nama Produk {twin_name} duplikat, gunakan Kode Produk atau SKU.",
+            f"Baris 7: Produk {code} duplikat di file.",
+            "Baris 8: Identitas produk kosong atau tidak dikenali.",
+            f"Baris 9: Kode Produk {first.sku} tidak ditemukan.",
+        ]
+        db.session.rollback()
+        assert db.session.get(Produk, first_id).stok_lama == 4
+        assert StockOpnameSession.query.count() == sessions